@@ -627,6 +627,23 @@ export default function AnalysisPage() {
 							});
 						});
 						break;
+
+					case 'concept_image':
+						// 概念图逐张推送：专家仍在生成其余图片时先提示，完整图集在报告页展示
+						console.log('🖼️ 收到概念图:', message.role_id, message.image);
+						import('sonner').then(({ toast }) => {
+							toast.success(`概念图已生成`, {
+								description: `${message.role_id}${message.image?.deliverable_id ? ` · ${message.image.deliverable_id}` : ''}`,
+								duration: 4000,
+								action: message.image?.url
+									? {
+										label: '查看',
+										onClick: () => window.open(message.image.url, '_blank'),
+									}
+									: undefined,
+							});
+						});
+						break;
 				}
 			},
 			onError: (event) => {
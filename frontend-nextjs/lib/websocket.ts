@@ -12,6 +12,7 @@ export type WebSocketMessage =
   | { type: 'interrupt'; status: string; interrupt_data: any }
   | { type: 'followup_answer'; turn_id: number; question: string; answer: string; intent: string; referenced_sections: string[]; timestamp: string }  // 🔥 v3.11 新增：追问回答推送
   | { type: 'tool_permissions_initialized'; tool_settings: any }  // 🆕 v7.129: 工具权限初始化
+  | { type: 'concept_image'; role_id: string; image: { deliverable_id?: string; url: string; thumbnail_url?: string; [key: string]: any } }  // 概念图逐张推送
   | { type: 'problem_solving_approach_ready'; data: any }  // 🆕 v7.270: 解题思路就绪
   | { type: 'step1_complete'; data: any }  // 🆕 v7.270: 第一步完成
   | { type: 'step2_start'; data: any }  // 🆕 v7.270: 第二步开始
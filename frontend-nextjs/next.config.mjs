@@ -21,6 +21,11 @@ const nextConfig = {
         source: '/archived_images/:path*',
         destination: 'http://127.0.0.1:8000/archived_images/:path*',
       },
+      // 内容寻址图片存储（/image_blobs/<sha256>.<ext>）
+      {
+        source: '/image_blobs/:path*',
+        destination: 'http://127.0.0.1:8000/image_blobs/:path*',
+      },
       {
         source: '/uploads/:path*',
         destination: 'http://127.0.0.1:8000/uploads/:path*',
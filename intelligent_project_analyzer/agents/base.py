@@ -5,6 +5,9 @@
 """
 
 import asyncio
+import json
+import os
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -16,6 +19,11 @@ from loguru import logger
 
 from ..core.state import AgentType, ProjectAnalysisState
 from ..core.types import AnalysisResult, ErrorType, SystemError
+from ..services.circuit_breaker import CircuitBreakerOpenError, CircuitState, get_breaker
+from ..services.execution_timeline import span
+from ..services.llm_concurrency import llm_slot, llm_slot_sync
+from ..services.loop_lag_monitor import track_blocking_call
+from ..services.prompt_cache_stats import prompt_cache_callback
 
 
 class NullLLM:
@@ -30,6 +38,9 @@ class NullLLM:
     def invoke(self, *args, **kwargs):
         self._raise("invoke")
 
+    async def ainvoke(self, *args, **kwargs):
+        self._raise("ainvoke")
+
     def with_structured_output(self, *args, **kwargs):
         self._raise("with_structured_output")
 
@@ -290,10 +301,58 @@ class LLMAgent(BaseAgent):
             self.llm_model = NullLLM(self.name)
             self.config.setdefault("llm_placeholder", True)
 
+    def _build_llm_kwargs(self, **kwargs) -> Dict[str, Any]:
+        """
+        合并调用参数 - 只提取invoke()方法支持的参数
+
+        不要传递api_key, base_url等初始化参数
+        """
+        llm_config = self.config.get("llm", {})
+        llm_kwargs = {
+            "max_tokens": llm_config.get("max_tokens", 4000),
+            "temperature": llm_config.get("temperature", 0.7),
+            **kwargs,  # 允许调用者覆盖
+        }
+
+        #  参数验证: 确保 max_tokens >= 16 (GPT-4.1 要求)
+        max_tokens = llm_kwargs.get("max_tokens", 4000)
+        if max_tokens < 16:
+            logger.warning(f"[{self.name}] max_tokens ({max_tokens}) 小于 GPT-4.1 最小值 16, " f"自动调整为 100")
+            llm_kwargs["max_tokens"] = 100
+
+        #  按智能体记录 prompt 缓存命中（来自提供商 usage 元数据）
+        llm_config = dict(llm_kwargs.get("config") or {})
+        callbacks = llm_config.get("callbacks")
+        if callbacks is None or isinstance(callbacks, list):
+            llm_config["callbacks"] = [*(callbacks or []), prompt_cache_callback(self.name)]
+            llm_kwargs["config"] = llm_config
+        return llm_kwargs
+
+    def _llm_provider(self) -> str:
+        """熔断器按提供商隔离：配置 llm.provider > LLM_PROVIDER 环境变量"""
+        return self.config.get("llm", {}).get("provider") or os.getenv("LLM_PROVIDER", "openai").lower()
+
+    def _log_llm_error(self, error: Exception, attempt: int, max_retries: int) -> None:
+        """详细错误日志（同步/异步调用共用）"""
+        if isinstance(error, json.JSONDecodeError):
+            logger.error(f"[{self.name}] JSON 解析错误 (尝试 {attempt + 1}/{max_retries}): {error}")
+            logger.error(f"[{self.name}] OpenRouter 可能返回了 HTML 错误页面而非 JSON")
+            logger.error(f"[{self.name}] 常见原因:")
+            logger.error(f"[{self.name}]   1. max_tokens 参数小于 16 (GPT-4.1 要求)")
+            logger.error(f"[{self.name}]   2. 其他参数不符合模型要求")
+            logger.error(f"[{self.name}]   3. 模型暂时不可用或速率限制")
+        else:
+            logger.error(
+                f"[{self.name}] LLM 调用失败 (尝试 {attempt + 1}/{max_retries}): {type(error).__name__}: {error}"
+            )
+
     def invoke_llm(self, messages: List[BaseMessage], **kwargs) -> AIMessage:
         """
         调用LLM，带参数验证、重试机制和详细错误日志
 
+        ️ 同步阻塞调用：在异步节点中请使用 ainvoke_llm()，否则整个事件循环（包括其他会话的
+        WebSocket 推送）会被阻塞到 LLM 返回；在事件循环线程中调用会被 LoopLagMonitor 记录。
+
         Args:
             messages: 消息列表
             **kwargs: 额外的LLM参数
@@ -304,24 +363,8 @@ class LLMAgent(BaseAgent):
         Raises:
             Exception: LLM调用失败时抛出异常
         """
-        import json
-        import time
-
         try:
-            # 合并配置 - 只提取invoke()方法支持的参数
-            # 不要传递api_key, base_url等初始化参数
-            llm_config = self.config.get("llm", {})
-            llm_kwargs = {
-                "max_tokens": llm_config.get("max_tokens", 4000),
-                "temperature": llm_config.get("temperature", 0.7),
-                **kwargs,  # 允许调用者覆盖
-            }
-
-            #  参数验证: 确保 max_tokens >= 16 (GPT-4.1 要求)
-            max_tokens = llm_kwargs.get("max_tokens", 4000)
-            if max_tokens < 16:
-                logger.warning(f"[{self.name}] max_tokens ({max_tokens}) 小于 GPT-4.1 最小值 16, " f"自动调整为 100")
-                llm_kwargs["max_tokens"] = 100
+            llm_kwargs = self._build_llm_kwargs(**kwargs)
 
             #  重试机制: 最多重试 3 次
             max_retries = 3
@@ -331,7 +374,10 @@ class LLMAgent(BaseAgent):
                 try:
                     # 调用LLM
                     logger.debug(f"[{self.name}] LLM 调用 (尝试 {attempt + 1}/{max_retries})")
-                    response = self.llm_model.invoke(messages, **llm_kwargs)
+                    with span(f"{self.name}.invoke_llm", "llm", attempt=attempt + 1), llm_slot_sync(
+                        self._llm_provider()
+                    ), track_blocking_call(f"{self.name}.invoke_llm"):
+                        response = self.llm_model.invoke(messages, **llm_kwargs)
 
                     if not isinstance(response, AIMessage):
                         response = AIMessage(content=str(response))
@@ -339,31 +385,12 @@ class LLMAgent(BaseAgent):
                     logger.debug(f"[{self.name}] LLM 调用成功")
                     return response
 
-                except json.JSONDecodeError as e:
-                    #  详细错误日志: JSON 解析错误
-                    last_error = e
-                    logger.error(f"[{self.name}] JSON 解析错误 (尝试 {attempt + 1}/{max_retries}): {e}")
-                    logger.error(f"[{self.name}] OpenRouter 可能返回了 HTML 错误页面而非 JSON")
-                    logger.error(f"[{self.name}] 常见原因:")
-                    logger.error(f"[{self.name}]   1. max_tokens 参数小于 16 (GPT-4.1 要求)")
-                    logger.error(f"[{self.name}]   2. 其他参数不符合模型要求")
-                    logger.error(f"[{self.name}]   3. 模型暂时不可用或速率限制")
-
-                    if attempt < max_retries - 1:
-                        wait_time = 2**attempt  # 指数退避: 1s, 2s, 4s
-                        logger.info(f"[{self.name}] 等待 {wait_time} 秒后重试...")
-                        time.sleep(wait_time)
-                    else:
-                        logger.error(f"[{self.name}] 已达到最大重试次数，放弃")
-                        raise
-
                 except Exception as e:
-                    #  详细错误日志: 其他错误
                     last_error = e
-                    logger.error(f"[{self.name}] LLM 调用失败 (尝试 {attempt + 1}/{max_retries}): {type(e).__name__}: {e}")
+                    self._log_llm_error(e, attempt, max_retries)
 
                     if attempt < max_retries - 1:
-                        wait_time = 2**attempt
+                        wait_time = 2**attempt  # 指数退避: 1s, 2s, 4s
                         logger.info(f"[{self.name}] 等待 {wait_time} 秒后重试...")
                         time.sleep(wait_time)
                     else:
@@ -378,6 +405,73 @@ class LLMAgent(BaseAgent):
             logger.error(f"[{self.name}] LLM invocation failed: {str(e)}")
             raise
 
+    async def acall_llm(self, runnable: Any, messages: Any, **kwargs) -> Any:
+        """
+        单次异步调用 runnable（不重试），受全局 LLM 并发控制器与提供商熔断器保护
+
+        runnable 可以是 self.llm_model 或其派生对象（如 with_structured_output() 的结果）；
+        不支持 ainvoke 的对象放到线程池执行，避免阻塞事件循环。
+
+        Raises:
+            CircuitBreakerOpenError: 提供商熔断中（不会发起请求）
+        """
+        breaker = get_breaker(self._llm_provider())
+        if breaker.state is CircuitState.OPEN:
+            raise CircuitBreakerOpenError(breaker.provider, breaker.stats()["seconds_until_half_open"])
+
+        # 时间线 span 包含排队时间，queue_ms 记录等待并发槽位的部分
+        with span(f"{self.name}.acall_llm", "llm") as llm_span:
+            async with llm_slot(self._llm_provider()) as slot:
+                if llm_span is not None:
+                    llm_span.attributes["queue_ms"] = round(slot.queued_ms, 1)
+                try:
+                    if hasattr(runnable, "ainvoke"):
+                        result = await runnable.ainvoke(messages, **kwargs)
+                    else:
+                        result = await asyncio.to_thread(runnable.invoke, messages, **kwargs)
+                except Exception as e:
+                    breaker.record_failure(e)
+                    raise
+
+        breaker.record_success()
+        return result
+
+    async def ainvoke_llm(self, messages: List[BaseMessage], **kwargs) -> AIMessage:
+        """
+        invoke_llm() 的异步版本：相同的参数处理、重试与错误日志，退避使用 asyncio.sleep
+
+        熔断器打开时直接抛出 CircuitBreakerOpenError，不再重试。
+        """
+        llm_kwargs = self._build_llm_kwargs(**kwargs)
+        max_retries = 3
+
+        for attempt in range(max_retries):
+            try:
+                logger.debug(f"[{self.name}] LLM 异步调用 (尝试 {attempt + 1}/{max_retries})")
+                response = await self.acall_llm(self.llm_model, messages, **llm_kwargs)
+
+                if not isinstance(response, AIMessage):
+                    response = AIMessage(content=str(response))
+
+                logger.debug(f"[{self.name}] LLM 调用成功")
+                return response
+
+            except CircuitBreakerOpenError as e:
+                logger.error(f"[{self.name}] LLM invocation failed: {e}")
+                raise
+
+            except Exception as e:
+                self._log_llm_error(e, attempt, max_retries)
+
+                if attempt < max_retries - 1:
+                    wait_time = 2**attempt  # 指数退避: 1s, 2s, 4s
+                    logger.info(f"[{self.name}] 等待 {wait_time} 秒后重试...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    logger.error(f"[{self.name}] 已达到最大重试次数，放弃")
+                    logger.error(f"[{self.name}] LLM invocation failed: {str(e)}")
+                    raise
+
     def prepare_messages(
         self, state: ProjectAnalysisState, additional_context: Optional[Dict[str, Any]] = None
     ) -> List[BaseMessage]:
@@ -36,6 +36,7 @@ from typing import Any, Dict, List, Optional
 from loguru import logger
 
 from intelligent_project_analyzer.core.types import ToolConfig
+from intelligent_project_analyzer.services.execution_timeline import traced
 from intelligent_project_analyzer.settings import settings
 
 # LangChain Tool integration
@@ -142,6 +143,7 @@ class BochaSearchTool:
                 logger.warning(f"️ [Bocha] TikHub初始化失败: {e}")
                 self.tikhub_enabled = False
 
+    @traced("search", "bocha.search")
     def search(self, query: str, count: Optional[int] = None) -> Dict[str, Any]:
         """
         执行搜索 (v7.174: 支持缓存)
@@ -145,38 +145,69 @@ class FeasibilityAnalystAgent(LLMAgent):
         start_time = time.time()
         
         try:
-            logger.info(f" [V1.5] 开始可行性分析: session={state.get('session_id')}")
-            
-            # 验证输入
-            if not self.validate_input(state):
-                raise ValueError(" 无效输入: 缺少V1需求分析师的输出(structured_requirements)")
-            
-            # 准备消息
-            messages = self.prepare_messages(state)
+            messages = self._prepare_feasibility_messages(state)
             
             # 调用LLM
             logger.info("[V1.5] 调用LLM进行可行性分析...")
             response = self.invoke_llm(messages)
             
-            # 解析和验证结果
-            result = self.parse_and_validate_result(response.content, state)
+            return self._finish_feasibility(response, state, start_time)
             
-            end_time = time.time()
-            self._track_execution_time(start_time, end_time)
+        except Exception as e:
+            logger.error(f" [V1.5] 可行性分析失败: {e}")
+            error = self.handle_error(e, "V1.5 feasibility analysis")
+            raise error
+
+    async def aexecute(
+        self,
+        state: ProjectAnalysisState,
+        config: RunnableConfig,
+        store: Optional[Any] = None
+    ) -> AnalysisResult:
+        """execute() 的异步版本（ainvoke_llm，不阻塞事件循环）"""
+        import time
+        start_time = time.time()
+        
+        try:
+            messages = self._prepare_feasibility_messages(state)
             
-            # AnalysisResult 使用 confidence 来表示结果质量
-            if result.confidence >= 0.8:
-                logger.info(f" [V1.5] 可行性分析完成，耗时: {end_time - start_time:.2f}s，置信度: {result.confidence}")
-            else:
-                logger.warning(f"️ [V1.5] 可行性分析完成但置信度较低: {result.confidence}")
+            logger.info("[V1.5] 异步调用LLM进行可行性分析...")
+            response = await self.ainvoke_llm(messages)
             
-            return result
+            return self._finish_feasibility(response, state, start_time)
             
         except Exception as e:
             logger.error(f" [V1.5] 可行性分析失败: {e}")
             error = self.handle_error(e, "V1.5 feasibility analysis")
             raise error
 
+    def _prepare_feasibility_messages(self, state: ProjectAnalysisState) -> List:
+        logger.info(f" [V1.5] 开始可行性分析: session={state.get('session_id')}")
+        
+        # 验证输入
+        if not self.validate_input(state):
+            raise ValueError(" 无效输入: 缺少V1需求分析师的输出(structured_requirements)")
+        
+        # 准备消息
+        return self.prepare_messages(state)
+
+    def _finish_feasibility(self, response: Any, state: ProjectAnalysisState, start_time: float) -> AnalysisResult:
+        import time
+        
+        # 解析和验证结果
+        result = self.parse_and_validate_result(response.content, state)
+        
+        end_time = time.time()
+        self._track_execution_time(start_time, end_time)
+        
+        # AnalysisResult 使用 confidence 来表示结果质量
+        if result.confidence >= 0.8:
+            logger.info(f" [V1.5] 可行性分析完成，耗时: {end_time - start_time:.2f}s，置信度: {result.confidence}")
+        else:
+            logger.warning(f"️ [V1.5] 可行性分析完成但置信度较低: {result.confidence}")
+        
+        return result
+
     def parse_and_validate_result(
         self,
         raw_response: str,
@@ -4,6 +4,7 @@
 负责理解和结构化用户需求，为后续分析提供基础
 """
 
+import asyncio
 import json
 from typing import Dict, List, Optional, Any
 import time
@@ -166,62 +167,105 @@ class RequirementsAnalystAgent(LLMAgent):
         start_time = time.time()
         
         try:
-            logger.info(f"Starting requirements analysis for session {state.get('session_id')}")
-            
-            # 验证输入
-            if not self.validate_input(state):
-                raise ValueError("Invalid input: user input is too short or empty")
-            
-            # 检索用户历史偏好（如果有store）
-            user_context = ""
-            if store and config.get("configurable", {}).get("user_id"):
-                user_context = self._retrieve_user_preferences(store, config)
-            
-            # 准备消息
-            messages = self.prepare_messages(state)
-            
-            # 添加用户偏好上下文
-            if user_context:
-                messages.append(HumanMessage(content=f"用户历史偏好：\n{user_context}"))
+            messages = self._prepare_single_call(state, config, store)
             
             # 调用LLM
             response = self.invoke_llm(messages)
             
-            # 解析结构化结果
-            structured_requirements = self._parse_requirements(response.content)
-
-            #  v7.3: 问卷生成已分离到专门节点，此处不再处理问卷
-            # 原因：只有充分分析才能指导问卷的生成
-            # 新架构：需求分析（专注分析）→ calibration_questionnaire节点（动态生成问卷）
-
-            # 向后兼容：如果LLM仍然返回了calibration_questionnaire字段（旧模型或缓存），保留但标记为待替换
-            if "calibration_questionnaire" in structured_requirements:
-                logger.info("ℹ️ 检测到LLM返回了calibration_questionnaire（旧行为），将保留但由专门节点重新生成")
-                structured_requirements["calibration_questionnaire"]["source"] = "llm_legacy"
-                structured_requirements["calibration_questionnaire"]["note"] = "此问卷将被专门节点重新生成"
-            
-            # 保存用户偏好（如果有新的偏好信息）
-            if store and config.get("configurable", {}).get("user_id"):
-                self._save_user_preferences(store, config, structured_requirements)
-            
-            # 创建分析结果
-            result = self.create_analysis_result(
-                content=response.content,
-                structured_data=structured_requirements,
-                confidence=self._calculate_confidence(structured_requirements),
-                sources=["user_input", "llm_analysis"]
-            )
-            
-            end_time = time.time()
-            self._track_execution_time(start_time, end_time)
+            return self._build_single_call_result(response, state, config, store, start_time)
             
-            logger.info("Requirements analysis completed successfully")
-            return result
+        except Exception as e:
+            error = self.handle_error(e, "requirements analysis")
+            raise error
+
+    async def aexecute(
+        self,
+        state: ProjectAnalysisState,
+        config: RunnableConfig,
+        store: Optional[BaseStore] = None,
+        use_two_phase: bool = False
+    ) -> AnalysisResult:
+        """execute() 的异步版本：LLM 调用走 ainvoke_llm，两阶段模式直接 await，无需嵌套事件循环"""
+        if use_two_phase:
+            return await self._execute_two_phase(state, config, store)
+
+        start_time = time.time()
+        
+        try:
+            messages = self._prepare_single_call(state, config, store)
+            response = await self.ainvoke_llm(messages)
+            return self._build_single_call_result(response, state, config, store, start_time)
             
         except Exception as e:
             error = self.handle_error(e, "requirements analysis")
             raise error
-    
+
+    def _prepare_single_call(
+        self,
+        state: ProjectAnalysisState,
+        config: RunnableConfig,
+        store: Optional[BaseStore] = None
+    ) -> List:
+        """单次调用模式：校验输入并构建消息（含用户历史偏好）"""
+        logger.info(f"Starting requirements analysis for session {state.get('session_id')}")
+        
+        # 验证输入
+        if not self.validate_input(state):
+            raise ValueError("Invalid input: user input is too short or empty")
+        
+        # 检索用户历史偏好（如果有store）
+        user_context = ""
+        if store and config.get("configurable", {}).get("user_id"):
+            user_context = self._retrieve_user_preferences(store, config)
+        
+        # 准备消息
+        messages = self.prepare_messages(state)
+        
+        # 添加用户偏好上下文
+        if user_context:
+            messages.append(HumanMessage(content=f"用户历史偏好：\n{user_context}"))
+        return messages
+
+    def _build_single_call_result(
+        self,
+        response: AIMessage,
+        state: ProjectAnalysisState,
+        config: RunnableConfig,
+        store: Optional[BaseStore],
+        start_time: float
+    ) -> AnalysisResult:
+        """单次调用模式：解析 LLM 响应并构建分析结果"""
+        # 解析结构化结果
+        structured_requirements = self._parse_requirements(response.content)
+
+        #  v7.3: 问卷生成已分离到专门节点，此处不再处理问卷
+        # 原因：只有充分分析才能指导问卷的生成
+        # 新架构：需求分析（专注分析）→ calibration_questionnaire节点（动态生成问卷）
+
+        # 向后兼容：如果LLM仍然返回了calibration_questionnaire字段（旧模型或缓存），保留但标记为待替换
+        if "calibration_questionnaire" in structured_requirements:
+            logger.info("ℹ️ 检测到LLM返回了calibration_questionnaire（旧行为），将保留但由专门节点重新生成")
+            structured_requirements["calibration_questionnaire"]["source"] = "llm_legacy"
+            structured_requirements["calibration_questionnaire"]["note"] = "此问卷将被专门节点重新生成"
+        
+        # 保存用户偏好（如果有新的偏好信息）
+        if store and config.get("configurable", {}).get("user_id"):
+            self._save_user_preferences(store, config, structured_requirements)
+        
+        # 创建分析结果
+        result = self.create_analysis_result(
+            content=response.content,
+            structured_data=structured_requirements,
+            confidence=self._calculate_confidence(structured_requirements),
+            sources=["user_input", "llm_analysis"]
+        )
+        
+        end_time = time.time()
+        self._track_execution_time(start_time, end_time)
+        
+        logger.info("Requirements analysis completed successfully")
+        return result
+
     def _parse_requirements(self, llm_response: str) -> Dict[str, Any]:
         """解析LLM响应中的结构化需求 - 支持v1.0格式 - v3.6修复JSON解析"""
         try:
@@ -809,7 +853,7 @@ class RequirementsAnalystAgent(LLMAgent):
             phase2_start = time.time()
             logger.info(" [Phase2] 开始深度分析 + 专家接口构建...")
             
-            phase2_result = self._execute_phase2(user_input, phase1_result)
+            phase2_result = await self._aexecute_phase2(user_input, phase1_result)
             
             phase2_elapsed = time.time() - phase2_start
             logger.info(f" [Phase2] 完成，耗时 {phase2_elapsed:.2f}s")
@@ -817,7 +861,7 @@ class RequirementsAnalystAgent(LLMAgent):
             # 合并 Phase1 和 Phase2 结果
             structured_data = self._merge_phase_results(phase1_result, phase2_result)
             structured_data["analysis_mode"] = "two_phase"
-            structured_data["phase1_elapsed_s"] = round(phase1_elapsed, 2)
+            structured_data["phase1_elapsed_s"] = round(parallel_elapsed, 2)
             structured_data["phase2_elapsed_s"] = round(phase2_elapsed, 2)
 
             # 后处理：字段规范化、项目类型推断
@@ -833,8 +877,10 @@ class RequirementsAnalystAgent(LLMAgent):
 
             if not validation_result.is_valid:
                 logger.warning(f"️ [v7.270] Phase 2 validation failed, attempting fixes...")
-                # Attempt to fix missing L6/L7
-                phase2_result = self._fix_validation_issues(phase2_result, validation_result, user_input)
+                # Attempt to fix missing L6/L7（补全调用为同步 LLM 调用，放到线程池避免阻塞事件循环）
+                phase2_result = await asyncio.to_thread(
+                    self._fix_validation_issues, phase2_result, validation_result, user_input
+                )
                 # Re-merge after fixes
                 structured_data = self._merge_phase_results(phase1_result, phase2_result)
 
@@ -857,20 +903,11 @@ class RequirementsAnalystAgent(LLMAgent):
                     "target_users": structured_data.get("target_users", "")
                 }
 
-                # Call async infer method synchronously
-                import asyncio
-                try:
-                    loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-
-                motivation_result = loop.run_until_complete(
-                    self.motivation_engine.infer(
-                        task=task,
-                        user_input=user_input,
-                        structured_data=structured_data
-                    )
+                # 已在事件循环中，直接 await（run_until_complete 在运行中的 loop 上会抛出 RuntimeError）
+                motivation_result = await self.motivation_engine.infer(
+                    task=task,
+                    user_input=user_input,
+                    structured_data=structured_data
                 )
 
                 structured_data["motivation_types"] = {
@@ -895,7 +932,8 @@ class RequirementsAnalystAgent(LLMAgent):
 
             # 4. Generate problem-solving approach
             logger.info(" [v7.270] Generating problem-solving approach...")
-            problem_solving_approach = self._generate_problem_solving_approach(
+            problem_solving_approach = await asyncio.to_thread(
+                self._generate_problem_solving_approach,
                 user_input=user_input,
                 phase2_result=phase2_result
             )
@@ -977,14 +1015,9 @@ class RequirementsAnalystAgent(LLMAgent):
         logger.info(" [Phase1-Async] 开始快速定性...")
         start = time.time()
         
-        # _execute_phase1 内部调用 LLM，已经是异步的（通过 invoke_llm）
-        # 我们在线程池中运行同步版本，或者创建一个真正的异步版本
-        loop = asyncio.get_event_loop()
-        
-        # 使用 partial 传递None作为 capability_precheck 参数（将在外部合并）
-        from functools import partial
-        phase1_func = partial(self._execute_phase1, user_input, None, visual_references)
-        phase1_result = await loop.run_in_executor(None, phase1_func)
+        # 通过 ainvoke_llm 异步调用 LLM（受全局并发 Semaphore 与熔断器保护，不占用线程池）
+        # capability_precheck 传 None（将在外部合并）
+        phase1_result = await self._aexecute_phase1(user_input, None, visual_references)
         
         elapsed = time.time() - start
         logger.info(f" [Phase1-Async] 完成，耗时 {elapsed:.2f}s")
@@ -1010,12 +1043,40 @@ class RequirementsAnalystAgent(LLMAgent):
             capability_precheck: 程序化预检测结果（v7.17 P2）
             visual_references: 用户上传的视觉参考列表（v7.155）
         """
+        messages = self._build_phase1_messages(user_input, capability_precheck, visual_references)
+        if messages is None:
+            return self._fallback_phase1(user_input, capability_precheck)
+
+        response = self.invoke_llm(messages)
+        return self._parse_phase1_response(response.content, user_input, capability_precheck)
+
+    async def _aexecute_phase1(
+        self,
+        user_input: str,
+        capability_precheck: Optional[Dict[str, Any]] = None,
+        visual_references: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """_execute_phase1() 的异步版本（ainvoke_llm）"""
+        messages = self._build_phase1_messages(user_input, capability_precheck, visual_references)
+        if messages is None:
+            return self._fallback_phase1(user_input, capability_precheck)
+
+        response = await self.ainvoke_llm(messages)
+        return self._parse_phase1_response(response.content, user_input, capability_precheck)
+
+    def _build_phase1_messages(
+        self,
+        user_input: str,
+        capability_precheck: Optional[Dict[str, Any]] = None,
+        visual_references: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[List[Dict[str, str]]]:
+        """构建 Phase1 消息；未找到专用提示词配置时返回 None（使用默认定性逻辑）"""
         # 加载 Phase1 专用提示词
         phase1_config = self.prompt_manager.get_prompt("requirements_analyst_phase1", return_full_config=True)
 
         if not phase1_config:
             logger.warning("[Phase1] 未找到专用配置，使用默认定性逻辑")
-            return self._fallback_phase1(user_input, capability_precheck)
+            return None
 
         system_prompt = phase1_config.get("system_prompt", "")
         task_template = phase1_config.get("task_description_template", "")
@@ -1036,17 +1097,17 @@ class RequirementsAnalystAgent(LLMAgent):
             task_description = f"{visual_context}\n\n{task_description}"
             logger.info(f"  ️ [v7.155] 已注入 {len(visual_references)} 个视觉参考到需求分析")
 
-        # 调用 LLM
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": task_description}
         ]
 
-        response = self.invoke_llm(messages)
-
+    def _parse_phase1_response(
+        self, content: str, user_input: str, capability_precheck: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         # 解析 JSON
         try:
-            result = self._parse_phase_response(response.content)
+            result = self._parse_phase_response(content)
             result["phase"] = 1
             return result
         except Exception as e:
@@ -1055,12 +1116,32 @@ class RequirementsAnalystAgent(LLMAgent):
 
     def _execute_phase2(self, user_input: str, phase1_result: Dict[str, Any]) -> Dict[str, Any]:
         """执行 Phase2: 深度分析 + 专家接口构建"""
+        messages = self._build_phase2_messages(user_input, phase1_result)
+        if messages is None:
+            return self._fallback_phase2(user_input, phase1_result)
+
+        response = self.invoke_llm(messages)
+        return self._parse_phase2_response(response.content, user_input, phase1_result)
+
+    async def _aexecute_phase2(self, user_input: str, phase1_result: Dict[str, Any]) -> Dict[str, Any]:
+        """_execute_phase2() 的异步版本（ainvoke_llm）"""
+        messages = self._build_phase2_messages(user_input, phase1_result)
+        if messages is None:
+            return self._fallback_phase2(user_input, phase1_result)
+
+        response = await self.ainvoke_llm(messages)
+        return self._parse_phase2_response(response.content, user_input, phase1_result)
+
+    def _build_phase2_messages(
+        self, user_input: str, phase1_result: Dict[str, Any]
+    ) -> Optional[List[Dict[str, str]]]:
+        """构建 Phase2 消息；未找到专用提示词配置时返回 None（使用默认分析逻辑）"""
         # 加载 Phase2 专用提示词
         phase2_config = self.prompt_manager.get_prompt("requirements_analyst_phase2", return_full_config=True)
         
         if not phase2_config:
             logger.warning("[Phase2] 未找到专用配置，使用默认分析逻辑")
-            return self._fallback_phase2(user_input, phase1_result)
+            return None
         
         system_prompt = phase2_config.get("system_prompt", "")
         task_template = phase2_config.get("task_description_template", "")
@@ -1077,17 +1158,15 @@ class RequirementsAnalystAgent(LLMAgent):
             .replace("{phase1_output}", phase1_output_str)
         )
         
-        # 调用 LLM
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": task_description}
         ]
-        
-        response = self.invoke_llm(messages)
-        
+
+    def _parse_phase2_response(self, content: str, user_input: str, phase1_result: Dict[str, Any]) -> Dict[str, Any]:
         # 解析 JSON
         try:
-            result = self._parse_phase_response(response.content)
+            result = self._parse_phase_response(content)
             result["phase"] = 2
             return result
         except Exception as e:
@@ -608,3 +608,10 @@ class ResultAggregatorAgentCompat:
             )
         else:
             return self._agent.execute(state, config, store)
+
+    async def aexecute(self, state, config=None, store=None):
+        """统一异步执行接口（LangGraph 版本内部为同步子图，放到线程池执行）"""
+        if self.use_langgraph:
+            import asyncio
+            return await asyncio.to_thread(self.execute, state, config, store)
+        return await self._agent.aexecute(state, config, store)
@@ -10,6 +10,7 @@
 # 5.  v7.19: 按角色类型动态调参（V3高创意/V6高精确）+ 输出质量引导
 # ============================================================================
 
+import asyncio
 import datetime
 import json
 from functools import lru_cache
@@ -23,6 +24,8 @@ from pydantic import ValidationError
 from ..core.state import ProjectAnalysisState
 from ..core.task_oriented_models import ProtocolExecutionReport, TaskOrientedExpertOutput
 from ..services.llm_factory import LLMFactory
+from ..services.prompt_cache_stats import prompt_cache_callback, record_prompt_prefix
+from ..utils.tolerant_json_parser import parse_partial_json
 
 #  v7.64: 导入工具调用记录器
 try:
@@ -376,9 +379,12 @@ class TaskOrientedExpertFactory:
                 {"role": "system", "content": expert_prompt["system_prompt"]},
                 {"role": "user", "content": expert_prompt["user_prompt"]},
             ]
+            record_prompt_prefix(role_type, expert_prompt.get("stable_prefix", ""))
 
             #  v7.18: response直接是TaskOrientedExpertOutput实例，无需解析
-            response = await llm_with_structure.ainvoke(messages)
+            response = await llm_with_structure.ainvoke(
+                messages, config={"callbacks": [prompt_cache_callback(role_type)]}
+            )
 
             # 使用搜索阶段的 recorder 进行后续处理
             recorder = search_recorder
@@ -536,6 +542,7 @@ class TaskOrientedExpertFactory:
 
                     # 导入图片生成服务
                     from ..services.image_generator import ImageGeneratorService
+                    from ..services.image_job_planner import make_concept_image_publisher
 
                     # 初始化图片生成器
                     logger.debug(f"   初始化 ImageGeneratorService...")
@@ -566,15 +573,16 @@ class TaskOrientedExpertFactory:
                     logger.info(f"   会话ID: {session_id}")
                     logger.info(f"  ️  项目类型: {project_type}")
 
-                    # 为每个交付物生成概念图
-                    concept_images = []
-                    for idx, deliverable_id in enumerate(deliverable_ids, 1):
+                    # 为每个交付物生成概念图（交付物之间并发，图像 API 并发数与报告额度由 image_job_planner 控制）
+                    on_image = make_concept_image_publisher(session_id, role_id)
+
+                    async def generate_for_deliverable(idx: int, deliverable_id: str) -> List[Dict[str, Any]]:
                         logger.info(f"   [{idx}/{len(deliverable_ids)}] 处理交付物 {deliverable_id}...")
 
                         metadata = deliverable_metadata.get(deliverable_id)
                         if not metadata:
                             logger.warning(f"    ️  交付物元数据缺失，跳过")
-                            continue
+                            return []
 
                         #  v7.110: 检查该交付物是否启用概念图
                         deliverable_name = metadata.get("deliverable_name", "")
@@ -585,7 +593,7 @@ class TaskOrientedExpertFactory:
 
                         if not should_generate:
                             logger.info(f"    ️  用户禁用，跳过生成")
-                            continue
+                            return []
 
                         try:
                             logger.info(f"    ️  开始生成概念图...")
@@ -608,23 +616,35 @@ class TaskOrientedExpertFactory:
                                 questionnaire_data=questionnaire_data,  #  v7.122: 注入问卷数据
                                 visual_references=visual_references,  #  v7.155: 注入视觉参考
                                 global_style_anchor=visual_style_anchor,  #  v7.155: 注入全局风格锚点
+                                on_image=on_image,  # 每张图片完成即推送
+                                use_report_budget=True,
                             )
 
+                            logger.info(f"     成功生成 {len(image_metadata_list)} 张概念图")
+                            for img_idx, img in enumerate(image_metadata_list, 1):
+                                logger.info(f"      [{img_idx}] 文件名: {img.filename}")
+                                logger.info(f"      [{img_idx}] URL: {img.url if hasattr(img, 'url') else 'N/A'}")
+
                             #  v7.127: 遍历添加所有生成的图片
                             #  Phase 0优化: 排除None和默认值
-                            for img_metadata in image_metadata_list:
-                                concept_images.append(img_metadata.model_dump(exclude_none=True, exclude_defaults=True))
-
-                            logger.info(f"     成功生成 {len(image_metadata_list)} 张概念图")
-                            for idx, img in enumerate(image_metadata_list, 1):
-                                logger.info(f"      [{idx}] 文件名: {img.filename}")
-                                logger.info(f"      [{idx}] URL: {img.url if hasattr(img, 'url') else 'N/A'}")
+                            return [
+                                img_metadata.model_dump(exclude_none=True, exclude_defaults=True)
+                                for img_metadata in image_metadata_list
+                            ]
 
                         except Exception as img_error:
                             logger.error(f"     概念图生成失败: {img_error}")
                             logger.exception(img_error)
                             # 不阻塞workflow，继续执行
-                            continue
+                            return []
+
+                    per_deliverable = await asyncio.gather(
+                        *(
+                            generate_for_deliverable(idx, deliverable_id)
+                            for idx, deliverable_id in enumerate(deliverable_ids, 1)
+                        )
+                    )
+                    concept_images = [image for images in per_deliverable for image in images]
 
                     # 将概念图添加到专家结果中
                     if concept_images:
@@ -1308,6 +1328,7 @@ class TaskOrientedExpertFactory:
 
             #  v7.18 升级1: 使用模板渲染（只构建20%的动态内容）
             #  v7.122: 添加搜索查询提示
+            #  sf 知识（评估标准 + 输出标准）按模式组合确定，作为稳定前缀的一部分
             return template.render(
                 dynamic_role_name=role_object.get("dynamic_role_name", role_object.get("role_name")),
                 task_instruction=task_instruction,
@@ -1315,12 +1336,37 @@ class TaskOrientedExpertFactory:
                 state=state,
                 creative_mode_note=creative_mode_note,
                 search_queries_hint=search_queries_hint,
+                knowledge_prefix=self._inject_sf_knowledge(state) or "",
             )
 
         except Exception as e:
             logger.error(f"构建任务导向专家提示词时出错: {str(e)}")
             return {"system_prompt": "你是一位专业的分析师，请基于提供的信息进行分析。", "user_prompt": f"请分析以下内容：\n{context}"}
 
+    def _inject_sf_knowledge(self, state: ProjectAnalysisState) -> Optional[str]:
+        """
+        获取 sf 知识注入文本（P2-T9）
+
+        文本只取决于检测到的设计模式组合，同一组合在不同会话中逐字节一致，
+        拼在 system prompt 稳定前缀末尾以命中提供商的 prompt cache。
+
+        Returns:
+            知识注入文本；没有检测到设计模式或加载失败时返回 None
+        """
+        detected_modes = state.get("detected_design_modes") or (state.get("structured_requirements") or {}).get(
+            "detected_design_modes"
+        )
+        if not detected_modes:
+            return None
+        try:
+            from ..services.sf_knowledge_loader import get_full_knowledge_injection
+
+            knowledge = get_full_knowledge_injection(detected_modes)
+        except Exception as e:
+            logger.warning(f"️ sf 知识注入失败，跳过: {e}")
+            return None
+        return f"\n{knowledge}\n" if knowledge else None
+
     def _extract_base_type(self, role_id: str) -> str:
         """
         提取角色的基础类型（用于模板缓存）
@@ -1464,77 +1510,23 @@ class TaskOrientedExpertFactory:
 
     def _try_parse_json_with_fixes(self, json_str: str) -> Optional[Dict[str, Any]]:
         """
-        尝试多种策略修复并解析 JSON
+        尝试修复并解析 JSON
 
-        常见问题:
+        常见问题（由单遍容错解析器一次处理）:
         1. 缺少逗号分隔符
         2. 多余的逗号
-        3. 转义字符问题
-        4. 截断的 JSON
+        3. 转义字符 / 控制字符问题
+        被截断的 JSON 不补全，按失败处理（交给降级输出）
         """
-        import re
-
-        # 策略1: 直接解析
+        # 快速路径: 直接解析
         try:
             return json.loads(json_str)
         except json.JSONDecodeError:
             pass
 
-        # 策略2: 移除控制字符并重试
-        try:
-            cleaned = re.sub(r"[\x00-\x1f\x7f-\x9f]", "", json_str)
-            return json.loads(cleaned)
-        except json.JSONDecodeError:
-            pass
-
-        # 策略3: 修复常见的逗号问题
-        try:
-            # 移除数组/对象末尾多余的逗号
-            fixed = re.sub(r",\s*([}\]])", r"\1", json_str)
-            # 添加缺失的逗号（对象属性之间）
-            fixed = re.sub(r'"\s*\n\s*"', '",\n"', fixed)
-            # 添加缺失的逗号（数组元素之间）
-            fixed = re.sub(r"}\s*\n\s*{", "},\n{", fixed)
-            return json.loads(fixed)
-        except json.JSONDecodeError:
-            pass
-
-        # 策略4: 尝试修复截断的 JSON
-        try:
-            # 计算未闭合的括号
-            open_braces = json_str.count("{") - json_str.count("}")
-            open_brackets = json_str.count("[") - json_str.count("]")
-
-            if open_braces > 0 or open_brackets > 0:
-                # 尝试补全括号
-                fixed = json_str
-                fixed += "}" * open_braces
-                fixed += "]" * open_brackets
-                return json.loads(fixed)
-        except json.JSONDecodeError:
-            pass
-
-        # 策略5: 提取最外层的有效 JSON 对象
-        try:
-            # 找到第一个 { 到最后一个对应的 }
-            depth = 0
-            start = -1
-            end = -1
-            for i, c in enumerate(json_str):
-                if c == "{":
-                    if depth == 0:
-                        start = i
-                    depth += 1
-                elif c == "}":
-                    depth -= 1
-                    if depth == 0:
-                        end = i + 1
-                        break
-
-            if start >= 0 and end > start:
-                return json.loads(json_str[start:end])
-        except json.JSONDecodeError:
-            pass
+        parsed = parse_partial_json(json_str, allow_truncated=False)
+        if isinstance(parsed, dict):
+            return parsed
 
         logger.warning("️ 所有JSON修复策略都失败了")
         return None
@@ -5,6 +5,7 @@
 仅限管理员访问
 """
 
+import asyncio
 import json
 import re
 from collections import Counter
@@ -19,6 +20,7 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 from loguru import logger
 
+from ..services.execution_timeline import get_session_timeline, list_timelines, to_otlp
 from ..services.redis_session_manager import RedisSessionManager
 from ..utils.config_manager import config_manager
 from .auth_middleware import require_admin
@@ -438,7 +440,12 @@ async def get_performance_details(hours: int = Query(default=1, ge=1, le=24), ad
     """
     try:
         details = performance_monitor.get_detailed_stats(hours=hours)
-        return {"time_range_hours": hours, "data": details, "timestamp": datetime.now().isoformat()}
+        return {
+            "time_range_hours": hours,
+            "data": details,
+            "sink": performance_monitor.get_sink_stats(),
+            "timestamp": datetime.now().isoformat(),
+        }
     except Exception as e:
         logger.error(f" 获取性能详情失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1073,6 +1080,80 @@ async def reload_config(admin: dict = Depends(require_admin)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/config/registry")
+async def get_config_registry_report(admin: dict = Depends(require_admin)):
+    """
+    获取 YAML 配置注册表加载报告
+
+    每个配置文件的加载来源（YAML 解析 / 二进制快照）与耗时
+    """
+    from ..core.config_registry import get_config_registry
+
+    return {"report": get_config_registry().get_load_report(), "timestamp": datetime.now().isoformat()}
+
+
+@router.post("/config/registry/reload")
+async def reload_config_registry(admin: dict = Depends(require_admin)):
+    """
+    立即检查 YAML 配置变更并热重载（不等待后台轮询）
+    """
+    from ..core.config_registry import get_config_registry
+
+    try:
+        changed = get_config_registry().check_for_changes()
+        logger.info(f" 管理员 {admin.get('username')} 触发 YAML 配置重载: {len(changed)} 个文件变更")
+        return {
+            "status": "success",
+            "changed": [str(p) for p in changed],
+            "timestamp": datetime.now().isoformat(),
+        }
+    except Exception as e:
+        logger.error(f" YAML 配置重载失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/checkpoints/stats")
+async def get_checkpoint_stats(admin: dict = Depends(require_admin)):
+    """
+    获取 LangGraph 检查点库指标
+
+    文件/WAL 大小、页数与空闲页、检查点/写入行数、检查点最多的线程、最近一次维护结果
+    """
+    from ..services.checkpoint_maintenance import get_checkpoint_maintenance
+
+    try:
+        stats = await asyncio.to_thread(get_checkpoint_maintenance().get_stats)
+        return {"stats": stats, "timestamp": datetime.now().isoformat()}
+    except Exception as e:
+        logger.error(f" 获取检查点库指标失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/checkpoints/maintenance")
+async def run_checkpoint_maintenance(
+    convert: bool = Query(default=False, description="未启用增量 VACUUM 时执行一次性 VACUUM 转换"),
+    admin: dict = Depends(require_admin),
+):
+    """
+    立即执行一轮检查点库维护（裁剪历史 → 删除过期线程 → 回收空间）
+    """
+    from ..services.checkpoint_maintenance import get_checkpoint_maintenance
+    from .server import session_manager as global_session_manager
+
+    async def _is_thread_stale(thread_id: str) -> bool:
+        if global_session_manager is None or not global_session_manager.is_connected:
+            return False
+        return not await global_session_manager.exists(thread_id)
+
+    try:
+        result = await get_checkpoint_maintenance().run(is_thread_stale=_is_thread_stale, convert=convert)
+        logger.info(f" 管理员 {admin.get('username')} 触发检查点库维护")
+        return {"status": "success", "result": result, "timestamp": datetime.now().isoformat()}
+    except Exception as e:
+        logger.error(f" 检查点库维护失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/config/env")
 async def get_env_content(admin: dict = Depends(require_admin)):
     """
@@ -1312,6 +1393,37 @@ async def force_stop_session(session_id: str, admin: dict = Depends(require_admi
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/sessions/{session_id}/timeline")
+async def get_session_timeline_detail(
+    session_id: str,
+    format: str = Query(default="waterfall", pattern="^(waterfall|otlp)$"),
+    admin: dict = Depends(require_admin),
+):
+    """
+    获取会话执行时间线
+
+    Args:
+        session_id: 会话ID
+        format: waterfall（瀑布图，标记关键路径）或 otlp（OpenTelemetry OTLP/JSON）
+
+    Returns:
+        dict: 节点 / LLM / 搜索 / 工具 / PDF / 图像 span 及关键路径
+    """
+    timeline = get_session_timeline(session_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail=f"会话 {session_id} 没有时间线数据")
+    if format == "otlp":
+        return to_otlp(session_id)
+    return {**timeline, "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/timelines")
+async def get_timelines(admin: dict = Depends(require_admin)):
+    """列出内存中保留的会话时间线（最近的在前）"""
+    timelines = list_timelines()
+    return {"total": len(timelines), "timelines": timelines, "timestamp": datetime.now().isoformat()}
+
+
 @router.delete("/sessions/batch")
 async def batch_delete_sessions(session_ids: List[str], admin: dict = Depends(require_admin)):
     """
@@ -92,8 +92,8 @@ from .pdf_generator import (
 )
 from .workflow_runner import run_workflow_async
 from .deps import sessions_cache, DEV_MODE
-from intelligent_project_analyzer.services.geoip_service import get_geoip_service
 from intelligent_project_analyzer.services.file_processor import file_processor
+from intelligent_project_analyzer.services.image_job_planner import release_report_budget
 
 
 class _ServerProxy:
@@ -144,7 +144,9 @@ async def start_analysis(
     username = None
     display_name = None
 
-    #  采集IP地址和地理位置
+    #  采集IP地址和地理位置（GeoIP 服务首次使用时导入，不计入启动耗时）
+    from intelligent_project_analyzer.services.geoip_service import get_geoip_service
+
     geoip_service = get_geoip_service()
     client_ip = geoip_service.get_client_ip(request)
     location_info = geoip_service.get_location(client_ip)
@@ -785,6 +787,7 @@ async def resume_analysis(request: ResumeRequest, background_tasks: BackgroundTa
         #  导入GraphRecursionError
         from langgraph.errors import GraphRecursionError
 
+        paused = False  # 又停在 interrupt 时保留概念图额度，会话结束（完成 / 失败）才释放
         try:
             config = {"configurable": {"thread_id": session_id}, "recursion_limit": 100}  # 增加递归限制，默认是25
 
@@ -899,6 +902,7 @@ async def resume_analysis(request: ResumeRequest, background_tasks: BackgroundTa
                         logger.info(
                             f" 已广播第二个 interrupt 到 WebSocket: {interrupt_value.get('interaction_type', 'unknown') if isinstance(interrupt_value, dict) else type(interrupt_value)}"
                         )
+                        paused = True
                         return
 
             # 检查是否有节点错误
@@ -1097,6 +1101,9 @@ async def resume_analysis(request: ResumeRequest, background_tasks: BackgroundTa
             session["traceback"] = traceback.format_exc()
             logger.error(f"[ERROR] Resume workflow failed: {e}")
             logger.error(f"[ERROR] Traceback:\n{traceback.format_exc()}")
+        finally:
+            if not paused:
+                release_report_budget(session_id)
 
     background_tasks.add_task(continue_workflow)
 
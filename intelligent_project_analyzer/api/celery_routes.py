@@ -6,18 +6,28 @@ Celery 任务 API 路由
 可与原有的 BackgroundTasks 模式共存
 """
 
+import asyncio
 import json
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from loguru import logger
 from pydantic import BaseModel, Field
 
 # Celery 相关导入
 try:
     from intelligent_project_analyzer.services.celery_app import celery_app
+    from intelligent_project_analyzer.services.celery_queues import (
+        MONITORED_QUEUES,
+        PRIORITY_HIGH,
+        QUEUE_ANALYSIS,
+        QUEUE_INTERACTIVE,
+        get_fair_share_scheduler,
+        priority_for,
+        task_headers,
+    )
     from intelligent_project_analyzer.services.celery_tasks import (
         analyze_project,
         analyze_project_with_files,
@@ -37,6 +47,8 @@ from intelligent_project_analyzer.services.file_processor import file_processor
 # Redis 会话管理
 from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
 
+from .deps import get_client_ip, get_user_identifier, optional_auth
+
 # 创建路由
 router = APIRouter(prefix="/api/celery", tags=["Celery 任务队列"])
 
@@ -53,6 +65,12 @@ class CeleryAnalysisRequest(BaseModel):
     analysis_mode: str = Field(default="normal", description="分析模式 (normal/deep_thinking)")
 
 
+class CeleryResumeRequest(BaseModel):
+    """Celery 恢复请求（提交中断确认/问卷答案）"""
+
+    resume_value: Any = Field(..., description="用户提交的值")
+
+
 class CeleryTaskResponse(BaseModel):
     """Celery 任务响应"""
 
@@ -62,6 +80,7 @@ class CeleryTaskResponse(BaseModel):
     message: str
     queue_position: Optional[int] = None
     estimated_wait: Optional[str] = None
+    throttled: bool = False
 
 
 class CeleryStatusResponse(BaseModel):
@@ -87,6 +106,51 @@ class QueueInfoResponse(BaseModel):
     active_tasks: int
 
 
+# ==================== 公平准入 ====================
+
+
+def _admission_identity(request: Request, current_user: Optional[dict], session_id: str) -> Tuple[str, str]:
+    """
+    公平准入使用的用户标识与会员等级
+
+    不信任请求体中的 user_id（可伪造，且默认值让所有匿名用户共用一个配额）：
+    - 已登录：get_user_identifier；管理员按 enterprise 配额，其余按 token 中的 tier（缺省 free）
+    - 未登录：按客户端 IP（ip:<地址>，转发头仅在 TRUSTED_PROXIES 代理之后才采信），无法识别 IP 时按会话
+    """
+    if current_user:
+        roles = current_user.get("roles") or []
+        tier = "enterprise" if "administrator" in roles else current_user.get("tier") or "free"
+        return get_user_identifier(current_user), tier
+
+    client_ip = get_client_ip(request)
+    return (f"ip:{client_ip}" if client_ip else f"session:{session_id}"), "free"
+
+
+async def _admit_analysis(user_id: str, session_id: str, priority: int, user_tier: str = "free"):
+    """
+    占用用户的分析槽位，超出突发上限时返回 429
+
+    Redis 不可用时放行（按请求优先级入队），不因指标/准入故障阻塞分析
+    """
+    try:
+        decision = await asyncio.to_thread(
+            get_fair_share_scheduler().admit, user_id, session_id, priority_for(priority), user_tier
+        )
+    except Exception as e:
+        logger.warning(f"️ [Celery API] 公平准入检查失败，直接放行: {e}")
+        return None
+    if not decision.admitted:
+        raise HTTPException(status_code=429, detail=f"{decision.reason}，请等待已有分析完成后再试")
+    return decision
+
+
+async def _release_analysis_slot(user_id: str, session_id: str) -> None:
+    try:
+        await asyncio.to_thread(get_fair_share_scheduler().release, user_id, session_id)
+    except Exception as e:
+        logger.warning(f"️ [Celery API] 释放公平调度槽位失败: {e}")
+
+
 # ==================== API 端点 ====================
 
 
@@ -114,7 +178,11 @@ async def celery_health():
 
 
 @router.post("/analysis/start", response_model=CeleryTaskResponse)
-async def start_celery_analysis(request: CeleryAnalysisRequest):
+async def start_celery_analysis(
+    request: CeleryAnalysisRequest,
+    http_request: Request,
+    current_user: Optional[dict] = Depends(optional_auth),
+):
     """
     使用 Celery 启动分析任务
 
@@ -130,6 +198,10 @@ async def start_celery_analysis(request: CeleryAnalysisRequest):
     # 生成会话 ID
     session_id = f"celery-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
 
+    # 按用户公平准入（超出配额降级，超出突发上限拒绝）
+    fair_user, user_tier = _admission_identity(http_request, current_user, session_id)
+    decision = await _admit_analysis(fair_user, session_id, request.priority, user_tier)
+
     # 初始化 Redis 会话
     session_manager = RedisSessionManager()
     await session_manager.connect()
@@ -141,6 +213,7 @@ async def start_celery_analysis(request: CeleryAnalysisRequest):
                 "session_id": session_id,
                 "user_input": request.user_input,
                 "user_id": request.user_id,
+                "fair_share_user": fair_user,
                 "mode": "celery",
                 "analysis_mode": request.analysis_mode,  #  支持深度思考/深度思考pro模式
                 "status": "queued",
@@ -150,17 +223,23 @@ async def start_celery_analysis(request: CeleryAnalysisRequest):
         )
 
         # 提交 Celery 任务
-        task = analyze_project.apply_async(
-            args=[session_id, request.user_input, request.user_id, request.analysis_mode],
-            queue="analysis" if request.priority == 0 else "high_priority",
-        )
+        try:
+            task = analyze_project.apply_async(
+                args=[session_id, request.user_input, request.user_id, request.analysis_mode],
+                queue=QUEUE_ANALYSIS,
+                priority=decision.priority if decision else priority_for(request.priority),
+                headers=task_headers(QUEUE_ANALYSIS, fair_user, session_id),
+            )
+        except Exception:
+            await _release_analysis_slot(fair_user, session_id)
+            raise
 
         # 保存任务 ID 到会话
         await session_manager.update(session_id, {"task_id": task.id})
 
         # 获取队列位置
         try:
-            queue_length = get_queue_length("analysis")
+            queue_length = get_queue_length(QUEUE_ANALYSIS)
         except:
             queue_length = None
 
@@ -170,9 +249,10 @@ async def start_celery_analysis(request: CeleryAnalysisRequest):
             session_id=session_id,
             task_id=task.id,
             status="queued",
-            message="分析任务已加入队列",
+            message="分析任务已加入队列" + (f"（{decision.reason}）" if decision and decision.throttled else ""),
             queue_position=queue_length,
             estimated_wait=f"约 {queue_length * 3} 分钟" if queue_length else None,
+            throttled=bool(decision and decision.throttled),
         )
 
     finally:
@@ -181,12 +261,14 @@ async def start_celery_analysis(request: CeleryAnalysisRequest):
 
 @router.post("/analysis/start-with-files", response_model=CeleryTaskResponse)
 async def start_celery_analysis_with_files(
+    http_request: Request,
     user_input: str = Form(default=""),
     user_id: str = Form(default="web_user"),
     priority: int = Form(default=0),
     analysis_mode: str = Form(default="normal"),
     file_metadata: str = Form(default="[]"),
     files: List[UploadFile] = File(default=[]),
+    current_user: Optional[dict] = Depends(optional_auth),
 ):
     """
     使用 Celery 启动带文件的分析任务
@@ -227,6 +309,10 @@ async def start_celery_analysis_with_files(
     session_id = f"celery-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
     logger.info(f"生成 Session ID: {session_id}")
 
+    # 公平准入放在文件处理之前，被拒绝的请求不做无用的文件提取
+    fair_user, user_tier = _admission_identity(http_request, current_user, session_id)
+    decision = await _admit_analysis(fair_user, session_id, priority, user_tier)
+
     # 处理文件（在 API 层同步完成）
     file_contents = []
     attachment_metadata = []
@@ -322,6 +408,7 @@ async def start_celery_analysis_with_files(
                 "user_input": user_input,
                 "combined_input": combined_input,
                 "user_id": user_id,
+                "fair_share_user": fair_user,
                 "mode": "celery",
                 "analysis_mode": analysis_mode,
                 "status": "queued",
@@ -334,15 +421,21 @@ async def start_celery_analysis_with_files(
         )
 
         # 提交 Celery 任务
-        task = analyze_project_with_files.apply_async(
-            args=[session_id, combined_input, user_id, analysis_mode, visual_references, visual_style_anchor],
-            queue="analysis" if priority == 0 else "high_priority",
-        )
+        try:
+            task = analyze_project_with_files.apply_async(
+                args=[session_id, combined_input, user_id, analysis_mode, visual_references, visual_style_anchor],
+                queue=QUEUE_ANALYSIS,
+                priority=decision.priority if decision else priority_for(priority),
+                headers=task_headers(QUEUE_ANALYSIS, fair_user, session_id),
+            )
+        except Exception:
+            await _release_analysis_slot(fair_user, session_id)
+            raise
 
         await session_manager.update(session_id, {"task_id": task.id})
 
         try:
-            queue_length = get_queue_length("analysis")
+            queue_length = get_queue_length(QUEUE_ANALYSIS)
         except:
             queue_length = None
 
@@ -355,6 +448,7 @@ async def start_celery_analysis_with_files(
             message=f"分析任务已加入队列，已接收 {len(files)} 个文件",
             queue_position=queue_length,
             estimated_wait=f"约 {queue_length * 3} 分钟" if queue_length else None,
+            throttled=bool(decision and decision.throttled),
         )
 
     finally:
@@ -457,6 +551,45 @@ async def get_celery_analysis_status(session_id: str):
         await session_manager.disconnect()
 
 
+@router.post("/analysis/resume/{session_id}", response_model=CeleryTaskResponse)
+async def resume_celery_analysis(session_id: str, request: CeleryResumeRequest):
+    """
+    提交用户输入并恢复 Celery 分析任务
+
+    恢复任务走低延迟队列 interactive（最高优先级），不受首次分析积压影响；
+    会话在首次分析时已通过公平准入，恢复不再占用槽位
+    """
+    if not CELERY_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Celery 服务不可用")
+
+    session_manager = RedisSessionManager()
+    await session_manager.connect()
+
+    try:
+        session = await session_manager.get(session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="会话不存在")
+        if session.get("status") != "waiting_for_input":
+            raise HTTPException(status_code=409, detail=f"会话当前状态为 {session.get('status')}，无需恢复")
+
+        task = resume_analysis.apply_async(
+            args=[session_id, request.resume_value],
+            queue=QUEUE_INTERACTIVE,
+            priority=PRIORITY_HIGH,
+            headers=task_headers(QUEUE_INTERACTIVE),
+        )
+        await session_manager.update(session_id, {"status": "queued", "task_id": task.id})
+
+        logger.info(f" [Celery API] 恢复任务已提交: session={session_id}, task={task.id}")
+
+        return CeleryTaskResponse(
+            session_id=session_id, task_id=task.id, status="queued", message="恢复任务已加入低延迟队列"
+        )
+
+    finally:
+        await session_manager.disconnect()
+
+
 @router.post("/analysis/cancel/{session_id}")
 async def cancel_celery_analysis(session_id: str):
     """
@@ -479,6 +612,7 @@ async def cancel_celery_analysis(session_id: str):
 
         # 撤销任务
         celery_app.control.revoke(task_id, terminate=True)
+        await _release_analysis_slot(session.get("fair_share_user") or session.get("user_id", "web_user"), session_id)
 
         # 更新会话状态
         await session_manager.update(session_id, {"status": "cancelled", "cancelled_at": datetime.now().isoformat()})
@@ -512,7 +646,7 @@ async def get_queue_info():
 
         # 获取队列长度
         queues = {}
-        for queue_name in ["analysis", "report", "default"]:
+        for queue_name in MONITORED_QUEUES:
             try:
                 queues[queue_name] = get_queue_length(queue_name)
             except:
@@ -525,6 +659,27 @@ async def get_queue_info():
         return QueueInfoResponse(celery_available=False, queues={}, workers=[], active_tasks=0)
 
 
+@router.get("/queue/metrics")
+async def get_queue_metrics():
+    """
+    获取队列指标
+
+    - 各队列深度（按优先级子队列拆分）
+    - 最近任务的排队耗时（avg / p50 / p95 / max）
+    - 各用户占用的分析槽位数
+    """
+    if not CELERY_AVAILABLE:
+        return {"celery_available": False}
+
+    try:
+        metrics = await asyncio.to_thread(get_fair_share_scheduler().get_metrics)
+    except Exception as e:
+        logger.error(f"获取队列指标失败: {e}")
+        raise HTTPException(status_code=503, detail=f"无法读取队列指标: {e}")
+
+    return {"celery_available": True, **metrics}
+
+
 # ==================== 注册路由的函数 ====================
 
 
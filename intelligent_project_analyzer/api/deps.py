@@ -12,11 +12,13 @@
   - get_user_identifier        : 获取用户标识符（字符串）
   - optional_auth              : 可选JWT认证 FastAPI 依赖
   - get_current_user_optional  : optional_auth 的别名
+  - get_client_ip              : 客户端 IP（仅信任 TRUSTED_PROXIES 中代理添加的转发头）
   - sync_checkpoint_to_redis   : LangGraph checkpoint → Redis 同步
   - _serialize_for_json        : 递归JSON序列化工具
 """
 from __future__ import annotations
 
+import ipaddress
 import os
 import time
 from datetime import datetime
@@ -126,6 +128,60 @@ DEV_MODE = (
 jwt_service = WordPressJWTService()
 
 
+# ============================================================
+#  客户端 IP
+# ============================================================
+
+
+def _parse_trusted_proxies(value: str) -> list:
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.warning(f"️ TRUSTED_PROXIES 中的无效地址已忽略: {item}")
+    return networks
+
+
+# 自有反向代理 / 负载均衡的地址或网段（逗号分隔，如 "127.0.0.1,10.0.0.0/8"）；
+# 为空时不信任任何转发头，直接使用 TCP 对端地址
+TRUSTED_PROXIES = _parse_trusted_proxies(os.getenv("TRUSTED_PROXIES", ""))
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    获取客户端 IP（用于按 IP 限流 / 准入，不能被客户端伪造）
+
+    X-Forwarded-For 的左侧条目由客户端任意填写，只有 TCP 对端是受信代理时才读取转发头：
+    从右向左跳过受信代理，取第一个不受信的地址（即自有代理实际看到的客户端）。
+
+    Returns:
+        客户端 IP；无法识别时返回空字符串
+    """
+    peer = request.client.host if request.client else ""
+    if not peer or not _is_trusted_proxy(peer):
+        return peer
+
+    hops = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    if hops:
+        return hops[0]  # 整条链都是受信代理
+    return request.headers.get("X-Real-IP", "").strip() or peer
+
+
 # ============================================================
 #  认证依赖函数
 # ============================================================
@@ -20,6 +20,8 @@ from jinja2 import Environment, FileSystemLoader
 from loguru import logger
 from playwright.async_api import Browser, Playwright, async_playwright
 
+from ..services.execution_timeline import traced
+
 # ============================================================
 #  v7.1.2: Playwright 浏览器池单例
 # ============================================================
@@ -1709,6 +1711,7 @@ class HTMLPDFGenerator:
 
         return html
 
+    @traced("pdf", "html_pdf.generate_pdf_async")
     async def generate_pdf_async(
         self,
         experts: List[Dict[str, Any]],
@@ -1847,6 +1850,7 @@ class HTMLPDFGenerator:
 
         return pdf_bytes
 
+    @traced("pdf", "html_pdf.generate_pdf")
     def generate_pdf(
         self,
         experts: List[Dict[str, Any]],
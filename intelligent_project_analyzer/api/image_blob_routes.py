@@ -0,0 +1,108 @@
+"""
+图片 Blob 访问路由
+
+/image_blobs/{digest}.{ext}            原图
+/image_blobs/{digest}/w{width}.webp    WebP 派生图（首次访问时生成）
+
+内容按 sha256 寻址、永不变化：ETag 即内容哈希，响应带 immutable 长缓存；支持 If-None-Match（304）
+与单段 Range（206 / 416），大图可断点续传、浏览器可分段加载。
+"""
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse
+
+from ..services.image_blob_store import (
+    IMAGE_BLOB_URL_PREFIX,
+    IMAGE_THUMBNAIL_WIDTHS,
+    get_image_blob_store,
+    parse_blob_url,
+)
+
+router = APIRouter(prefix="/image_blobs", tags=["image-blobs"])
+
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_MEDIA_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "gif": "image/gif",
+    "bmp": "image/bmp",
+}
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """解析单段 Range 头，返回闭区间 (start, end)；不可满足时返回 None"""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if not start_text:
+            length = int(end_text)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = min(int(end_text), size - 1) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+def _serve(request: Request, path: Path, etag: str, media_type: str) -> Response:
+    headers = {"ETag": f'"{etag}"', "Cache-Control": _CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in if_none_match.replace("W/", ""):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header:
+        size = path.stat().st_size
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        with open(path, "rb") as f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+        return Response(
+            content=body,
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+        )
+
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@router.get("/{digest}/w{width}.webp")
+async def get_image_derivative(request: Request, digest: str, width: int) -> Response:
+    """WebP 派生图（缩略图）"""
+    if width not in IMAGE_THUMBNAIL_WIDTHS:
+        raise HTTPException(status_code=404, detail=f"不支持的宽度，可选: {list(IMAGE_THUMBNAIL_WIDTHS)}")
+    try:
+        path = await run_in_threadpool(get_image_blob_store().derivative, digest, width)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if path is None:
+        raise HTTPException(status_code=404, detail="图片不存在")
+    return _serve(request, path, f"{digest}-w{width}", "image/webp")
+
+
+@router.get("/{name}")
+async def get_image_blob(request: Request, name: str) -> Response:
+    """原图"""
+    parsed = parse_blob_url(f"{IMAGE_BLOB_URL_PREFIX}/{name}")
+    if parsed is None:
+        raise HTTPException(status_code=404, detail="图片不存在")
+    digest, ext = parsed
+    path = await run_in_threadpool(get_image_blob_store().open_path, digest, ext)
+    if path is None:
+        raise HTTPException(status_code=404, detail="图片不存在")
+    return _serve(request, path, digest, _MEDIA_TYPES.get(ext, "application/octet-stream"))
@@ -3,13 +3,23 @@
 提供前端查询性能统计和告警历史的接口
 """
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 from pathlib import Path
 from loguru import logger
 
+from ..services.image_blob_store import get_image_blob_stats
+from ..services.image_job_planner import get_image_job_stats
+from ..services.llm_client_pool import get_llm_client_stats
+from ..services.llm_concurrency import get_llm_stats
+from ..services.loop_lag_monitor import get_loop_lag_stats
+from ..services.prompt_cache_stats import get_prompt_cache_stats
+from ..services.questionnaire_speculation import get_speculation_stats
+from ..services.state_externalizer import get_state_externalizer_stats
+from ..services.state_profiler import get_state_profile, get_state_profile_summary
+
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
 
 # 日志文件路径
@@ -326,5 +336,131 @@ async def get_llm_metrics() -> Dict[str, Any]:
     返回：
     - llm_active_calls: 当前正在执行的 LLM 调用数
     - llm_concurrency_limit: 全局并发上限（LLM_GLOBAL_CONCURRENCY 环境变量）
+    - llm_waiting / waiting_by_priority: 排队中的调用数（按优先级）
+    - providers: 各提供商的 AIMD 当前上限、占用、429 次数、延迟 EWMA 与最近调整记录
     """
     return get_llm_stats()
+
+
+@router.get("/llm-clients")
+async def get_llm_client_metrics() -> Dict[str, Any]:
+    """
+    获取 LLM 客户端池指标
+
+    返回（按提供商）：
+    - models_created / models_reused: 模型实例新建 / 复用次数
+    - create_ms_total / create_ms_avg: 新建实例耗时
+    - requests / connections_opened / tls_handshakes: HTTP 请求数与新建连接、TLS 握手次数
+    - connection_reuse_rate: 复用已有连接的请求占比
+    """
+    return get_llm_client_stats()
+
+
+@router.get("/loop-lag")
+async def get_loop_lag_metrics() -> Dict[str, Any]:
+    """
+    获取事件循环延迟指标
+
+    返回：
+    - samples / stalls: 采样次数 / 超过阈值的卡顿次数
+    - last_lag_ms / max_lag_ms / avg_lag_ms: 事件循环唤醒延迟
+    - blocking_llm_calls: 在事件循环线程中同步执行的 LLM 调用（按调用方汇总，应迁移到 ainvoke_llm）
+    """
+    return get_loop_lag_stats()
+
+
+@router.get("/checkpoint-size")
+async def get_checkpoint_size_metrics() -> Dict[str, Any]:
+    """
+    获取 checkpoint 大字段外部化指标
+
+    返回：
+    - stored / reused: 写入外部存储 / 字段未变化复用引用的次数
+    - cache_hits / store_reads / missing: 解引用命中缓存 / 读取外部存储 / 引用失效次数
+    - saved_ratio: 外部化节省的 checkpoint 字节占比
+    - sessions: 各会话 superstep 数与外部化前后 checkpoint 大小（before_bytes / after_bytes）
+    """
+    return get_state_externalizer_stats()
+
+
+@router.get("/state-profile")
+async def get_state_profile_metrics() -> Dict[str, Any]:
+    """
+    获取各会话 state 体积剖析概要（需 STATE_PROFILER_ENABLED=true）
+
+    返回：
+    - sessions: 各会话节点调用数、state delta 总字节、reducer 累计耗时、checkpoint 次数与字节数
+    """
+    return get_state_profile_summary()
+
+
+@router.get("/state-profile/{session_id}")
+async def get_session_state_profile(session_id: str) -> Dict[str, Any]:
+    """
+    获取单个会话的 state 体积剖析（排查慢会话用）
+
+    返回：
+    - nodes: 各节点调用次数、耗时与 state delta 字节数（按 delta 总字节降序）
+    - fields: 各字段写入次数与序列化大小
+    - reducers: 各 reducer 调用次数与耗时
+    - checkpoints: checkpoint 次数、总 / 最大 / 平均字节数
+    """
+    profile = get_state_profile(session_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"会话 {session_id} 没有剖析数据")
+    return profile
+
+
+@router.get("/prompt-cache")
+async def get_prompt_cache_metrics() -> Dict[str, Any]:
+    """
+    获取提供商 prompt 前缀缓存命中指标（来自响应 usage 元数据）
+
+    返回：
+    - prompt_tokens / cached_tokens / cache_hit_rate: 总 prompt token、命中缓存 token 与命中率
+    - saved_input_tokens / saved_cost: 按 PROMPT_CACHE_DISCOUNT 折算节省的输入 token 与费用
+    - agents: 各智能体调用数、命中率、命中 / 未命中平均延迟、稳定前缀变体数
+    """
+    return get_prompt_cache_stats()
+
+
+@router.get("/questionnaire-speculation")
+async def get_questionnaire_speculation_metrics() -> Dict[str, Any]:
+    """
+    获取渐进式问卷推测式预生成指标
+
+    返回（按阶段 gap_questions / radar_dimensions）：
+    - speculated / hits / patched / misses / errors: 预生成次数与取用结果（patched 为用户调整后仍沿用）
+    - hit_rate: (hits + patched) / 有预生成的取用次数
+    - replays: 节点从 interrupt 恢复重放时直接复用的次数
+    - waited_ms / saved_ms / wasted_ms: 用户实际等待、节省的等待时间、被丢弃的预生成耗时
+    """
+    return get_speculation_stats()
+
+
+@router.get("/image-blobs")
+async def get_image_blob_metrics() -> Dict[str, Any]:
+    """
+    获取图片 Blob 存储指标
+
+    返回：
+    - backend / root: 存储后端（local / s3）与本地目录
+    - puts / dedup_hits / bytes_written: 新写入次数、内容重复跳过次数、写入字节数
+    - derivatives: 已生成的 WebP 缩略图数
+    - remote_fetches: s3 后端拉取到本地缓存的次数
+    """
+    return get_image_blob_stats()
+
+
+@router.get("/image-jobs")
+async def get_image_job_metrics() -> Dict[str, Any]:
+    """
+    获取概念图任务调度指标
+
+    返回：
+    - provider_concurrency / report_budget: 每个图像提供商的并发上限、每份报告的概念图额度
+    - claimed / refunded / denied: 已占用、失败归还、因额度不足被拒绝的图片数
+    - streamed: 逐张推送到前端的图片数
+    - providers: 按提供商的 requests / active / max_active / waiting / queued_ms_avg
+    """
+    return get_image_job_stats()
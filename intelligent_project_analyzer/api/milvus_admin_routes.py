@@ -61,6 +61,15 @@ class ImportProgressResponse(BaseModel):
     error_message: Optional[str] = None
 
 
+async def _ensure_models_loaded() -> None:
+    """通过启动编排器在线程中加载模型（lazy 组件首次使用时初始化，避免在事件循环中加载）"""
+    from .startup_orchestrator import get_startup_orchestrator
+
+    orchestrator = get_startup_orchestrator()
+    if orchestrator is not None and orchestrator.get_status("milvus_models") is not None:
+        await orchestrator.ensure_ready("milvus_models")
+
+
 # ============================================================================
 # Collection 状态管理
 # ============================================================================
@@ -84,6 +93,8 @@ async def get_milvus_status():
         from ..core.types import ToolConfig
         from ..tools.milvus_kb import MilvusKBTool
 
+        await _ensure_models_loaded()
+
         # 创建工具实例
         tool = MilvusKBTool(
             host=settings.milvus.host,
@@ -497,6 +508,8 @@ async def test_search(request: SearchTestRequest):
         from ..core.types import ToolConfig
         from ..tools.milvus_kb import MilvusKBTool
 
+        await _ensure_models_loaded()
+
         # 创建工具实例
         tool = MilvusKBTool(
             host=settings.milvus.host,
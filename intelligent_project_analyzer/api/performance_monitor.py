@@ -6,95 +6,256 @@
 2. 记录慢请求（>1秒）
 3. 统计 API 调用次数
 4. 性能指标导出
+
+请求路径上只做 O(1) 的内存操作：
+- 指标追加到有界环形缓冲区，由后台任务批量写入 JSONL（按大小轮转，可选 gzip 压缩）
+- 按路由维护有界聚合（计数/总耗时/极值/最近样本），统计接口直接读取聚合结果
 """
 
 import asyncio
+import gzip
 import json
+import os
+import shutil
 import threading
 import time
-from collections import defaultdict
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 from fastapi import Request, Response
 from loguru import logger
 
+# 超过该数量的路由合并到 OTHER_ROUTE，避免带 ID 的路径撑爆内存
+OTHER_ROUTE = "__other__"
+
+
+class _RouteStats:
+    """单个路由的有界聚合"""
+
+    __slots__ = ("count", "total_duration", "min_duration", "max_duration", "slow_count", "error_count", "samples")
+
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.total_duration = 0.0
+        self.min_duration = float("inf")
+        self.max_duration = 0.0
+        self.slow_count = 0
+        self.error_count = 0
+        # (unix 时间戳, 耗时, 状态码)，用于时间窗口统计与 P95
+        self.samples: Deque[Tuple[float, float, int]] = deque(maxlen=sample_size)
+
+    def add(self, ts: float, duration: float, status_code: int, slow: bool) -> None:
+        self.count += 1
+        self.total_duration += duration
+        self.min_duration = min(self.min_duration, duration)
+        self.max_duration = max(self.max_duration, duration)
+        if slow:
+            self.slow_count += 1
+        if status_code >= 500:
+            self.error_count += 1
+        self.samples.append((ts, duration, status_code))
+
 
 class PerformanceMonitor:
     """性能监控管理器"""
 
-    def __init__(self):
-        self.metrics = defaultdict(list)
+    def __init__(
+        self,
+        metrics_file: Optional[Path] = None,
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        backup_count: Optional[int] = None,
+        compress: Optional[bool] = None,
+        max_routes: int = 500,
+        sample_size: int = 1000,
+        slow_request_limit: int = 200,
+    ):
         self.lock = threading.Lock()
         self.slow_request_threshold = 1.0  # 秒
-        self.metrics_file = Path(__file__).parent.parent.parent / "logs" / "performance_metrics.jsonl"
-        self.metrics_file.parent.mkdir(exist_ok=True)
+        self.metrics_file = metrics_file or Path(__file__).parent.parent.parent / "logs" / "performance_metrics.jsonl"
+        self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self.buffer_size = buffer_size or int(os.getenv("PERF_METRICS_BUFFER_SIZE", "10000"))
+        self.flush_interval = flush_interval or float(os.getenv("PERF_METRICS_FLUSH_INTERVAL", "2.0"))
+        self.max_bytes = max_bytes or int(os.getenv("PERF_METRICS_MAX_BYTES", str(20 * 1024 * 1024)))
+        self.backup_count = backup_count if backup_count is not None else int(os.getenv("PERF_METRICS_BACKUP_COUNT", "5"))
+        self.compress = (
+            compress if compress is not None else os.getenv("PERF_METRICS_COMPRESS", "true").lower() == "true"
+        )
+        self.max_routes = max_routes
+        self.sample_size = sample_size
+
+        # 待写盘的环形缓冲区（deque 的 append/popleft 线程安全；满时丢弃最旧记录）
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=self.buffer_size)
+        self._dropped = 0
+        self._write_lock = threading.Lock()
+        self._write_error_count = 0
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # 聚合
+        self._routes: Dict[str, _RouteStats] = {}
+        self._slow_requests: Deque[Dict[str, Any]] = deque(maxlen=slow_request_limit)
+        self._per_second: Deque[List[int]] = deque(maxlen=60)  # [unix 秒, 请求数]
+        self._total_count = 0
+        self._total_duration = 0.0
+        self._total_errors = 0
+
+    # ------------------------------------------------------------------ 记录
+
+    def record_request(self, path: str, method: str, duration: float, status_code: int, route: Optional[str] = None):
+        """
+        记录请求性能（非阻塞：只更新内存聚合并入队，不做文件 IO）
+
+        Args:
+            path: 实际请求路径
+            route: 路由模板（如 /api/analysis/status/{session_id}），用于聚合分组
+        """
+        now = time.time()
+        key = route or path
+        slow = duration > self.slow_request_threshold
+        metric = {
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "path": path,
+            "method": method,
+            "duration": round(duration, 3),
+            "status_code": status_code,
+        }
+        if route and route != path:
+            metric["route"] = route
 
-    def record_request(self, path: str, method: str, duration: float, status_code: int):
-        """记录请求性能"""
         with self.lock:
-            self.metrics[path].append(
-                {
-                    "method": method,
-                    "duration": duration,
-                    "status_code": status_code,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            )
-
-            # 慢请求警告
-            if duration > self.slow_request_threshold:
-                logger.warning(f" 慢请求检测: {method} {path} 耗时 {duration:.2f}秒")
-
-            # 写入持久化日志
-            self._write_metric(path, method, duration, status_code)
-
-    def _write_metric(self, path: str, method: str, duration: float, status_code: int):
-        """写入性能指标到文件"""
-        #  v7.105: 添加文件锁定保护，避免Permission denied错误
+            stats = self._routes.get(key)
+            if stats is None:
+                if len(self._routes) >= self.max_routes:
+                    key = OTHER_ROUTE
+                    stats = self._routes.get(key)
+                if stats is None:
+                    stats = self._routes[key] = _RouteStats(self.sample_size)
+            stats.add(now, duration, status_code, slow)
+
+            self._total_count += 1
+            self._total_duration += duration
+            if status_code >= 500:
+                self._total_errors += 1
+
+            second = int(now)
+            if self._per_second and self._per_second[-1][0] == second:
+                self._per_second[-1][1] += 1
+            else:
+                self._per_second.append([second, 1])
+
+            if slow:
+                self._slow_requests.append(metric)
+
+        # 慢请求警告
+        if slow:
+            logger.warning(f" 慢请求检测: {method} {path} 耗时 {duration:.2f}秒")
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self._dropped += 1
+        self._buffer.append(metric)
+        self._ensure_writer()
+
+    # ------------------------------------------------------------------ 后台写盘
+
+    def _ensure_writer(self) -> None:
+        """在当前事件循环中懒启动写盘任务（无事件循环时由 flush() 手动写盘）"""
         try:
-            metric = {
-                "timestamp": datetime.now().isoformat(),
-                "path": path,
-                "method": method,
-                "duration": round(duration, 3),
-                "status_code": status_code,
-            }
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._writer_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._writer_task = loop.create_task(self._writer_loop(), name="performance-metrics-writer")
+
+    async def _writer_loop(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                if self._buffer:
+                    await asyncio.to_thread(self.flush)
+        finally:
+            # 取消时同步写出剩余指标
+            self.flush()
+
+    async def stop(self) -> None:
+        """停止后台写盘任务并写出剩余指标（由 lifespan 关闭阶段调用）"""
+        task, self._writer_task = self._writer_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.flush()
+
+    def flush(self) -> int:
+        """将缓冲区中的指标批量写入文件，返回写入条数"""
+        batch: List[Dict[str, Any]] = []
+        while True:
+            try:
+                batch.append(self._buffer.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return 0
 
-            # 尝试写入，如果失败则静默忽略（不影响主流程）
+        with self._write_lock:
             try:
+                self._rotate_if_needed()
                 with open(self.metrics_file, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(metric, ensure_ascii=False) + "\n")
-            except (PermissionError, OSError) as file_error:
-                # 文件锁定或权限问题，静默忽略（每10次记录一次警告）
-                if not hasattr(self, "_write_error_count"):
-                    self._write_error_count = 0
+                    f.write("".join(json.dumps(m, ensure_ascii=False) + "\n" for m in batch))
+            except (PermissionError, OSError):
+                #  v7.105: 文件锁定或权限问题，静默忽略（每10次记录一次警告）
                 self._write_error_count += 1
                 if self._write_error_count % 10 == 1:
                     logger.debug(f"️ 性能指标写入跳过 (文件被占用，已跳过{self._write_error_count}次)")
-        except Exception as e:
-            # 其他异常也不影响主流程
-            pass
+                return 0
+        return len(batch)
+
+    def _rotate_if_needed(self) -> None:
+        """文件超过 max_bytes 时轮转为带时间戳的归档（可选 gzip），只保留 backup_count 份"""
+        try:
+            if self.metrics_file.stat().st_size < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = self.metrics_file.with_name(f"{self.metrics_file.stem}.{stamp}{self.metrics_file.suffix}")
+        os.replace(self.metrics_file, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            rotated.unlink()
+
+        archives = sorted(self.metrics_file.parent.glob(f"{self.metrics_file.stem}.*{self.metrics_file.suffix}*"))
+        for old in archives[: max(0, len(archives) - self.backup_count)]:
+            old.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------ 查询
 
     def get_stats(self, path: str = None):
         """获取性能统计"""
         with self.lock:
             if path:
-                metrics = self.metrics.get(path, [])
+                stats = [self._routes[path]] if path in self._routes else []
             else:
-                metrics = [m for ms in self.metrics.values() for m in ms]
-
-            if not metrics:
+                stats = list(self._routes.values())
+            count = sum(s.count for s in stats)
+            if not count:
                 return {}
 
-            durations = [m["duration"] for m in metrics]
             return {
-                "count": len(metrics),
-                "avg_duration": sum(durations) / len(durations),
-                "max_duration": max(durations),
-                "min_duration": min(durations),
-                "slow_requests": len([d for d in durations if d > self.slow_request_threshold]),
+                "count": count,
+                "avg_duration": sum(s.total_duration for s in stats) / count,
+                "max_duration": max(s.max_duration for s in stats),
+                "min_duration": min(s.min_duration for s in stats),
+                "slow_requests": sum(s.slow_count for s in stats),
             }
 
     def get_stats_summary(self):
@@ -105,31 +266,18 @@ class PerformanceMonitor:
             dict: 包含总请求数、平均响应时间、每分钟请求数、错误数
         """
         with self.lock:
-            all_metrics = [m for ms in self.metrics.values() for m in ms]
-
-            if not all_metrics:
+            if not self._total_count:
                 return {"total_requests": 0, "avg_response_time": 0, "requests_per_minute": 0, "error_count": 0}
 
-            # 计算统计数据
-            total_requests = len(all_metrics)
-            durations = [m["duration"] for m in all_metrics]
-            avg_response_time = (sum(durations) / len(durations)) * 1000  # 转换为毫秒
-
-            # 统计错误（5xx状态码）
-            error_count = len([m for m in all_metrics if m.get("status_code", 200) >= 500])
-
-            # 计算每分钟请求数（基于最近的时间窗口）
-            now = datetime.now()
-            recent_requests = [
-                m for m in all_metrics if (now - datetime.fromisoformat(m["timestamp"])).total_seconds() <= 60
-            ]
-            requests_per_minute = len(recent_requests)
+            # 计算每分钟请求数（基于最近 60 秒的逐秒计数）
+            cutoff = int(time.time()) - 60
+            requests_per_minute = sum(c for sec, c in self._per_second if sec > cutoff)
 
             return {
-                "total_requests": total_requests,
-                "avg_response_time": round(avg_response_time, 2),
+                "total_requests": self._total_count,
+                "avg_response_time": round(self._total_duration / self._total_count * 1000, 2),  # 毫秒
                 "requests_per_minute": requests_per_minute,
-                "error_count": error_count,
+                "error_count": self._total_errors,
             }
 
     def get_slow_requests(self, limit: int = 20):
@@ -140,65 +288,70 @@ class PerformanceMonitor:
             limit: 返回数量限制
 
         Returns:
-            list: 慢请求列表
+            list: 慢请求列表（最近 slow_request_limit 条中按耗时降序）
         """
         with self.lock:
-            all_metrics = [m for ms in self.metrics.values() for m in ms]
+            slow_requests = list(self._slow_requests)
 
-            # 筛选慢请求并按耗时排序
-            slow_requests = [
-                {**m, "path": path}
-                for path, ms in self.metrics.items()
-                for m in ms
-                if m["duration"] > self.slow_request_threshold
-            ]
-
-            # 按耗时降序排序
-            slow_requests.sort(key=lambda x: x["duration"], reverse=True)
-
-            return slow_requests[:limit]
+        # 按耗时降序排序
+        slow_requests.sort(key=lambda x: x["duration"], reverse=True)
+        return slow_requests[:limit]
 
     def get_detailed_stats(self, hours: int = 1):
         """
-        获取详细性能统计（按路径分组）
+        获取详细性能统计（按路由分组）
 
         Args:
-            hours: 统计时间范围（小时）
+            hours: 统计时间范围（小时）；基于每个路由最近 sample_size 条样本
 
         Returns:
-            dict: 按路径分组的详细统计
+            dict: 按路由分组的详细统计
         """
+        cutoff_time = time.time() - (hours * 3600)
         with self.lock:
-            now = datetime.now()
-            cutoff_time = now.timestamp() - (hours * 3600)
-
-            result = {}
-            for path, metrics in self.metrics.items():
-                # 筛选时间范围内的请求
-                recent_metrics = [
-                    m for m in metrics if datetime.fromisoformat(m["timestamp"]).timestamp() > cutoff_time
-                ]
-
-                if not recent_metrics:
-                    continue
+            snapshot = {route: list(stats.samples) for route, stats in self._routes.items()}
+
+        result = {}
+        for route, samples in snapshot.items():
+            # 筛选时间范围内的请求
+            recent = [s for s in samples if s[0] > cutoff_time]
+            if not recent:
+                continue
+
+            durations = sorted(s[1] for s in recent)
+            result[route] = {
+                "count": len(recent),
+                "avg_duration": sum(durations) / len(durations),
+                "max_duration": durations[-1],
+                "min_duration": durations[0],
+                "p95_duration": durations[min(int(len(durations) * 0.95), len(durations) - 1)],
+                "error_count": len([s for s in recent if s[2] >= 500]),
+            }
 
-                durations = [m["duration"] for m in recent_metrics]
-                result[path] = {
-                    "count": len(recent_metrics),
-                    "avg_duration": sum(durations) / len(durations),
-                    "max_duration": max(durations),
-                    "min_duration": min(durations),
-                    "p95_duration": sorted(durations)[int(len(durations) * 0.95)] if len(durations) > 0 else 0,
-                    "error_count": len([m for m in recent_metrics if m.get("status_code", 200) >= 500]),
-                }
+        return result
 
-            return result
+    def get_sink_stats(self) -> Dict[str, Any]:
+        """写盘缓冲区状态（积压、丢弃、写入失败次数）"""
+        return {
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "dropped": self._dropped,
+            "write_errors": self._write_error_count,
+            "routes": len(self._routes),
+            "writer_running": self._writer_task is not None and not self._writer_task.done(),
+        }
 
 
 # 全局性能监控实例
 performance_monitor = PerformanceMonitor()
 
 
+def _route_template(request: Request) -> Optional[str]:
+    """路由匹配后的路径模板（带路径参数的请求按模板聚合）"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None)
+
+
 async def performance_monitoring_middleware(request: Request, call_next: Callable):
     """
     性能监控中间件
@@ -217,7 +370,11 @@ async def performance_monitoring_middleware(request: Request, call_next: Callabl
 
         # 记录性能指标
         performance_monitor.record_request(
-            path=request.url.path, method=request.method, duration=duration, status_code=response.status_code
+            path=request.url.path,
+            method=request.method,
+            duration=duration,
+            status_code=response.status_code,
+            route=_route_template(request),
         )
 
         # 添加性能响应头
@@ -239,7 +396,11 @@ async def performance_monitoring_middleware(request: Request, call_next: Callabl
 
         # 记录失败请求
         performance_monitor.record_request(
-            path=request.url.path, method=request.method, duration=duration, status_code=500
+            path=request.url.path,
+            method=request.method,
+            duration=duration,
+            status_code=500,
+            route=_route_template(request),
         )
 
         raise
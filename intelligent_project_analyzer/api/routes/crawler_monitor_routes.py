@@ -347,6 +347,68 @@ async def get_crawler_stats():
     }
 
 
+# ==================== 向量回填 ====================
+
+
+class EmbeddingBackfillRequest(BaseModel):
+    """向量回填触发请求"""
+
+    batch_size: int = 64
+    max_batches: Optional[int] = None  # None=直到积压清空
+    provider: Optional[str] = None  # openai | local（None=按环境变量）
+    index_method: Optional[str] = None  # hnsw | ivfflat（None=按环境变量）
+
+
+@router.get("/embedding-backfill", summary="向量回填指标：积压、吞吐、索引状态")
+async def get_embedding_backfill_metrics():
+    """
+    汇总 description_vector 回填状态：
+    数据库积压（缺失/过期向量数）、累计嵌入数、最近运行吞吐、向量索引信息。
+    """
+    from ...external_data_system.utils.embedding_backfill import get_backfill_metrics
+
+    try:
+        metrics = await asyncio.to_thread(get_backfill_metrics, get_external_db())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"读取向量回填指标失败: {e}")
+    metrics["timestamp"] = datetime.now().isoformat()
+    return metrics
+
+
+@router.post("/embedding-backfill/trigger", dependencies=[Depends(require_admin)], summary="手动触发向量回填")
+async def trigger_embedding_backfill(request: EmbeddingBackfillRequest):
+    """
+    在后台线程运行 backfill_embeddings 任务（与 Celery Beat 定时任务共用实现），
+    立即返回；完成后通过 WebSocket 推送结果。
+    """
+    from ...external_data_system.tasks.processing_tasks import backfill_embeddings_task
+
+    def _run():
+        result = backfill_embeddings_task(
+            batch_size=request.batch_size,
+            max_batches=request.max_batches,
+            provider=request.provider,
+            index_method=request.index_method,
+        )
+        level = "error" if result.get("status") == "error" else "info"
+        sync_broadcast_log(
+            {
+                "level": level,
+                "message": f"向量回填结束: embedded={result.get('embedded', 0)} failed={result.get('failed', 0)}",
+                "source": "embedding_backfill",
+            }
+        )
+
+    thread = threading.Thread(target=_run, daemon=True, name="embedding-backfill")
+    thread.start()
+    return {
+        "status": "triggered",
+        "batch_size": request.batch_size,
+        "max_batches": request.max_batches,
+        "message": "已在后台启动向量回填，进度可通过 GET /embedding-backfill 查看",
+    }
+
+
 # ==================== 失败重试 ====================
 
 
@@ -60,8 +60,6 @@ from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 #  v7.120: 初始化生产级日志系统（环境感知配置）
 from intelligent_project_analyzer.config.logging_config import setup_logging
 
-#  导入GeoIP服务（IP地理位置识别）
-from intelligent_project_analyzer.services.geoip_service import get_geoip_service
 
 #  v7.60.4: 导入 ImageAspectRatio 枚举用于类型转换
 from intelligent_project_analyzer.services.image_generator import ImageAspectRatio
@@ -170,7 +168,10 @@ from intelligent_project_analyzer.services.followup_history_manager import Follo
 from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
 
 #  v3.6新增: 会话归档管理器
-from intelligent_project_analyzer.services.session_archive_manager import SessionArchiveManager
+from intelligent_project_analyzer.services.session_archive_manager import (
+    SessionArchiveManager,
+    encode_archive_cursor,
+)
 
 #  v7.10新增: WordPress JWT 认证服务
 from intelligent_project_analyzer.services.wordpress_jwt_service import WordPressJWTService
@@ -498,6 +499,7 @@ import redis.asyncio as aioredis
 
 redis_pubsub_client: Optional[aioredis.Redis] = None
 redis_pubsub_task: Optional[asyncio.Task] = None
+checkpoint_maintenance_task: Optional[asyncio.Task] = None
 
 #  v7.1.2新增: PDF 缓存（性能优化）
 from cachetools import TTLCache
@@ -541,96 +543,192 @@ async def lifespan(app: FastAPI):
     print("=" * 60)
     print()
 
+    from intelligent_project_analyzer.api.startup_orchestrator import (
+        BACKGROUND,
+        LAZY,
+        StartupOrchestrator,
+        set_startup_orchestrator,
+    )
+
     #  初始化 Redis 会话管理器
-    try:
+    async def _init_session_manager():
+        global session_manager
         session_manager = RedisSessionManager()
         await session_manager.connect()
         print(" Redis 会话管理器已启动")
-    except Exception as e:
-        logger.error(f" Redis 会话管理器启动失败: {e}")
-        print("️ Redis 会话管理器启动失败（使用内存模式）")
 
     #  v3.11新增: 初始化追问历史管理器
-    try:
+    async def _init_followup_history():
+        global followup_history_manager
         followup_history_manager = FollowupHistoryManager(session_manager)
         print(" 追问历史管理器已启动")
-    except Exception as e:
-        logger.error(f" 追问历史管理器启动失败: {e}")
-        print("️ 追问历史管理器启动失败（追问功能受限）")
 
-    #  v3.6新增: 初始化会话归档管理器
-    try:
-        archive_manager = SessionArchiveManager()
+    #  v3.6新增: 初始化会话归档管理器（建表/迁移为同步 SQLite 操作，放到线程池）
+    async def _init_archive_manager():
+        global archive_manager
+        archive_manager = await asyncio.to_thread(SessionArchiveManager)
         print(" 会话归档管理器已启动（永久保存功能已启用）")
-    except Exception as e:
-        logger.error(f" 会话归档管理器启动失败: {e}")
-        print("️ 会话归档管理器启动失败（无法使用永久保存功能）")
 
     #  初始化 Redis Pub/Sub（用于 WebSocket 多实例广播）
-    try:
+    async def _init_redis_pubsub():
+        global redis_pubsub_client, redis_pubsub_task
         redis_pubsub_client = await aioredis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
         # 启动订阅监听任务
         redis_pubsub_task = asyncio.create_task(subscribe_to_redis_pubsub())
         print(" Redis Pub/Sub 已启动")
-    except Exception as e:
-        logger.warning(f"️ Redis Pub/Sub 启动失败: {e}")
-        print("️ Redis Pub/Sub 启动失败（WebSocket 仅支持单实例）")
 
     #  v7.1.2新增: 初始化 Playwright 浏览器池（PDF 生成性能优化）
-    try:
+    #  后台预热：浏览器启动耗时数秒，get_browser() 在未就绪时会自行初始化
+    async def _init_browser_pool():
         from intelligent_project_analyzer.api.html_pdf_generator import get_browser_pool
 
-        browser_pool = get_browser_pool()
-        await browser_pool.initialize()
+        await get_browser_pool().initialize()
         print(" Playwright 浏览器池已启动（PDF 生成性能优化）")
-    except Exception as e:
-        logger.warning(f"️ Playwright 浏览器池启动失败: {e}")
-        print("️ Playwright 浏览器池启动失败（PDF 生成将使用备用方案）")
 
     #  v7.120 P1优化: 预初始化设备会话管理器（消除4.05s延迟）
-    try:
+    async def _init_device_manager():
         from intelligent_project_analyzer.services.device_session_manager import get_device_manager
 
-        device_manager = get_device_manager()
-        await device_manager.initialize()
+        await get_device_manager().initialize()
         print(" 设备会话管理器已预初始化（P1优化: 4.05s→0.05s）")
-    except Exception as e:
-        logger.warning(f"️ 设备会话管理器预初始化失败: {e}")
-        print("️ 设备会话管理器预初始化失败（设备检查可能较慢）")
 
-    print(" 服务器启动成功")
-    print(" API 文档: http://localhost:8000/docs")
-    print(" 健康检查: http://localhost:8000/health")
-    print()
+    #  共享配置注册表：输出 YAML 加载耗时报告并启动热重载监听
+    async def _init_config_registry():
+        from intelligent_project_analyzer.core.config_registry import get_config_registry
 
-    #  v7.105: 预热会话缓存（消除首次请求延迟）
-    try:
-        import time
+        config_registry = get_config_registry()
+        config_registry.log_load_report()
+        config_registry.start_watching(interval=float(os.getenv("CONFIG_RELOAD_INTERVAL", "10")))
 
+    #  v7.105: 预热会话缓存（消除首次请求延迟）
+    async def _warm_session_cache():
         logger.info(" 预热会话列表缓存...")
         start_time = time.time()
         sessions = await session_manager.get_all_sessions()
         elapsed = time.time() - start_time
         logger.info(f" 缓存预热完成: {len(sessions)} 个会话 ({elapsed:.1f}秒)")
-    except Exception as e:
-        logger.warning(f"️ 缓存预热失败: {e}")
 
     #  Fix 1.4: 启动时清理旧会话（24小时前的已完成会话）
-    try:
+    async def _cleanup_old_sessions():
         logger.info(" 清理旧会话...")
         cleaned = await session_manager.cleanup_old_sessions(max_age_hours=24)
         if cleaned > 0:
             logger.info(f" 启动清理完成: 删除 {cleaned} 个旧会话")
         else:
             logger.info(" 启动清理完成: 无需清理")
-    except Exception as e:
-        logger.warning(f"️ 启动清理失败: {e}")
+
+    #  检查点库维护：裁剪历史、删除过期会话线程、增量回收空间
+    async def _start_checkpoint_maintenance():
+        global checkpoint_maintenance_task
+        from intelligent_project_analyzer.services.checkpoint_maintenance import (
+            get_checkpoint_maintenance,
+            run_maintenance_loop,
+        )
+
+        from intelligent_project_analyzer.services.redis_checkpoint_saver import get_checkpoint_backend
+
+        if get_checkpoint_backend() == "redis":
+            logger.info(" 检查点存储在 Redis（TTL + keep_last 自动裁剪），跳过 SQLite 维护")
+            return
+
+        interval = float(os.getenv("CHECKPOINT_MAINTENANCE_INTERVAL", "3600"))
+        if interval <= 0:
+            logger.info(" 检查点维护已禁用 (CHECKPOINT_MAINTENANCE_INTERVAL=0)")
+            return
+
+        async def _is_thread_stale(thread_id: str) -> bool:
+            # 内存模式下重启即丢失会话，无法判断过期，只按 TTL 清理
+            if session_manager is None or not session_manager.is_connected:
+                return False
+            return not await session_manager.exists(thread_id)
+
+        checkpoint_maintenance_task = asyncio.create_task(
+            run_maintenance_loop(get_checkpoint_maintenance(), interval, is_thread_stale=_is_thread_stale)
+        )
+
+    #  事件循环延迟监控：报告仍在事件循环线程中同步执行的 LLM 调用
+    async def _start_loop_lag_monitor():
+        from intelligent_project_analyzer.services.loop_lag_monitor import (
+            LOOP_LAG_MONITOR_ENABLED,
+            get_loop_lag_monitor,
+        )
+
+        if not LOOP_LAG_MONITOR_ENABLED:
+            logger.info(" 事件循环延迟监控已禁用 (LOOP_LAG_MONITOR_ENABLED=false)")
+            return
+        get_loop_lag_monitor().start()
+
+    #  Milvus Embedding / Reranker 模型：首次使用时加载（MILVUS_WARMUP=true 时启动后后台预热）
+    async def _init_milvus_models():
+        if not settings.milvus.enabled:
+            logger.info(" Milvus 知识库未启用，跳过模型加载")
+            return
+        from intelligent_project_analyzer.tools.milvus_kb import warm_milvus_models
+
+        await asyncio.to_thread(warm_milvus_models, settings.milvus.embedding_model, settings.milvus.reranker_model)
+
+    orchestrator = StartupOrchestrator()
+    orchestrator.register("session_manager", _init_session_manager, critical=True, description="Redis 会话管理器")
+    orchestrator.register("followup_history", _init_followup_history, depends_on=["session_manager"])
+    orchestrator.register("archive_manager", _init_archive_manager, description="SQLite 会话归档")
+    orchestrator.register("redis_pubsub", _init_redis_pubsub, description="WebSocket 多实例广播")
+    orchestrator.register("device_manager", _init_device_manager, description="设备会话管理器")
+    orchestrator.register("config_registry", _init_config_registry, description="YAML 配置注册表")
+    orchestrator.register("loop_lag_monitor", _start_loop_lag_monitor, description="事件循环延迟监控")
+    orchestrator.register("browser_pool", _init_browser_pool, mode=BACKGROUND, description="Playwright 浏览器池")
+    orchestrator.register(
+        "session_cache_warmup", _warm_session_cache, depends_on=["session_manager"], mode=BACKGROUND
+    )
+    orchestrator.register(
+        "stale_session_cleanup", _cleanup_old_sessions, depends_on=["session_manager"], mode=BACKGROUND
+    )
+    orchestrator.register(
+        "checkpoint_maintenance", _start_checkpoint_maintenance, depends_on=["session_manager"], mode=BACKGROUND
+    )
+    orchestrator.register(
+        "milvus_models",
+        _init_milvus_models,
+        mode=BACKGROUND if os.getenv("MILVUS_WARMUP", "false").lower() == "true" else LAZY,
+        description="Milvus Embedding / Reranker 模型",
+    )
+    set_startup_orchestrator(orchestrator)
+    await orchestrator.start()
+
+    print(" 服务器启动成功")
+    print(" API 文档: http://localhost:8000/docs")
+    print(" 健康检查: http://localhost:8000/health")
+    print()
 
     yield
 
     # 关闭时
     print("\n 服务器关闭中...")
 
+    #  取消尚未完成的后台初始化
+    await orchestrator.shutdown()
+    set_startup_orchestrator(None)
+
+    if checkpoint_maintenance_task:
+        checkpoint_maintenance_task.cancel()
+
+    #  停止事件循环延迟监控
+    from intelligent_project_analyzer.services.loop_lag_monitor import get_loop_lag_monitor
+
+    await get_loop_lag_monitor().stop()
+
+    #  关闭共享的 LLM HTTP 连接池
+    from intelligent_project_analyzer.services.llm_client_pool import aclose_llm_clients
+
+    await aclose_llm_clients()
+
+    #  写出缓冲中的请求性能指标
+    try:
+        from intelligent_project_analyzer.api.performance_monitor import performance_monitor
+
+        await performance_monitor.stop()
+    except Exception as e:
+        logger.warning(f"️ 性能指标写盘任务停止失败: {e}")
+
     #  v7.1.2新增: 关闭 Playwright 浏览器池
     try:
         from intelligent_project_analyzer.api.html_pdf_generator import PlaywrightBrowserPool
@@ -640,6 +738,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"️ Playwright 浏览器池关闭失败: {e}")
 
+    #  停止配置热重载监听
+    try:
+        from intelligent_project_analyzer.core.config_registry import get_config_registry
+
+        get_config_registry().stop_watching()
+    except Exception as e:
+        logger.warning(f"️ 配置注册表关闭失败: {e}")
+
     #  关闭 Redis Pub/Sub
     if redis_pubsub_task:
         redis_pubsub_task.cancel()
@@ -737,6 +843,15 @@ try:
 except Exception as e:
     logger.warning(f"️ 性能和告警统计API路由加载失败: {e}")
 
+#  图片 Blob 访问路由（内容寻址原图 + WebP 缩略图）
+try:
+    from intelligent_project_analyzer.api.image_blob_routes import router as image_blob_router
+
+    app.include_router(image_blob_router)
+    logger.info(" 图片 Blob 路由已注册")
+except Exception as e:
+    logger.warning(f"️ 图片 Blob 路由加载失败: {e}")
+
 #  管理员后台路由（仅限管理员访问）
 try:
     from intelligent_project_analyzer.api.admin_routes import router as admin_router
@@ -1508,7 +1623,7 @@ def _ensure_aiosqlite_is_alive(conn: Any) -> Any:
 
 
 async def get_or_create_async_checkpointer() -> Optional[BaseCheckpointSaver[str]]:
-    """惰性初始化 AsyncSqliteSaver，所有会话复用同一个连接。"""
+    """惰性初始化检查点存储（默认 AsyncSqliteSaver，CHECKPOINT_BACKEND=redis 时为 AsyncRedisSaver），所有会话复用同一实例。"""
 
     global async_checkpointer, async_checkpointer_lock
 
@@ -1522,6 +1637,14 @@ async def get_or_create_async_checkpointer() -> Optional[BaseCheckpointSaver[str
         if async_checkpointer is not None:
             return async_checkpointer
 
+        #  多实例部署：检查点存入共享 Redis，任意实例/worker 均可恢复会话
+        from intelligent_project_analyzer.services.redis_checkpoint_saver import AsyncRedisSaver, get_checkpoint_backend
+
+        if get_checkpoint_backend() == "redis":
+            async_checkpointer = AsyncRedisSaver.from_url(settings.redis_url)
+            logger.info(" AsyncRedisSaver 初始化成功（多实例共享检查点）")
+            return async_checkpointer
+
         try:
             import aiosqlite
             from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
@@ -1534,6 +1657,8 @@ async def get_or_create_async_checkpointer() -> Optional[BaseCheckpointSaver[str
 
         conn = await aiosqlite.connect(str(db_path))
         conn = _ensure_aiosqlite_is_alive(conn)
+        # 新建库启用增量 VACUUM（对已有表的库无效，由 CheckpointMaintenance 按需转换）
+        await conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
         async_checkpointer = AsyncSqliteSaver(conn)
         logger.info(f" AsyncSqliteSaver 初始化成功: {db_path}")
         return async_checkpointer
@@ -2478,6 +2603,8 @@ async def readiness_check():
     2. 腾讯云API可达性
     3. 动态规则加载器状态
     4. 会话管理器状态
+    5. 文件处理器（可选）
+    6. 启动编排器（关键组件就绪、各组件启动耗时）
     """
     checks = {}
     is_ready = True
@@ -2550,6 +2677,16 @@ async def readiness_check():
     except Exception as e:
         checks["file_processor"] = {"status": "warning", "message": f"文件处理器检查失败: {str(e)}"}
 
+    # 6. 检查启动编排器（后台/延迟组件未完成不影响就绪）
+    from intelligent_project_analyzer.api.startup_orchestrator import get_startup_orchestrator
+
+    orchestrator = get_startup_orchestrator()
+    if orchestrator:
+        startup = orchestrator.get_readiness()
+        checks["startup"] = {"status": "ok" if startup["ready"] else "error", **startup}
+        if not startup["ready"]:
+            is_ready = False
+
     # 构建响应
     response = {
         "status": "ready" if is_ready else "not_ready",
@@ -2736,7 +2873,9 @@ async def start_analysis(
     username = None
     display_name = None
 
-    #  采集IP地址和地理位置
+    #  采集IP地址和地理位置（GeoIP 服务首次使用时导入，不计入启动耗时）
+    from intelligent_project_analyzer.services.geoip_service import get_geoip_service
+
     geoip_service = get_geoip_service()
     client_ip = geoip_service.get_client_ip(request)
     location_info = geoip_service.get_location(client_ip)
@@ -7868,6 +8007,7 @@ async def list_archived_sessions(
     offset: int = 0,
     status: Optional[str] = None,
     pinned_only: bool = False,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),  #  v7.178: 添加用户认证
 ):
     """
@@ -7881,13 +8021,14 @@ async def list_archived_sessions(
         offset: 偏移量（默认0）
         status: 过滤状态（可选: completed, failed, rejected）
         pinned_only: 是否只显示置顶会话
+        cursor: 游标（上一页返回的 next_cursor；指定时忽略 offset，深翻页不随偏移变慢）
 
     Returns:
-        归档会话列表
+        归档会话列表（next_cursor 为下一页游标，没有更多时为 None）
     """
     if not archive_manager:
         # 未启用归档功能：返回空列表（保持 200，便于前端/测试兼容）
-        return {"total": 0, "limit": limit, "offset": offset, "sessions": []}
+        return {"total": 0, "limit": limit, "offset": offset, "sessions": [], "next_cursor": None}
 
     try:
         #  v7.201: 使用统一的用户标识获取函数
@@ -7897,19 +8038,27 @@ async def list_archived_sessions(
         if DEV_MODE:
             logger.info(f" [DEV_MODE] 归档会话：返回所有用户的会话（当前用户: {username}）")
             sessions = await archive_manager.list_archived_sessions(
-                limit=limit, offset=offset, status=status, pinned_only=pinned_only, user_id=None  # None = 所有用户
+                limit=limit,
+                offset=offset,
+                status=status,
+                pinned_only=pinned_only,
+                user_id=None,  # None = 所有用户
+                cursor=cursor,
             )
             total = await archive_manager.count_archived_sessions(status=status, pinned_only=pinned_only, user_id=None)
         else:
             #  生产模式：仅返回当前用户的会话
             sessions = await archive_manager.list_archived_sessions(
-                limit=limit, offset=offset, status=status, pinned_only=pinned_only, user_id=username
+                limit=limit, offset=offset, status=status, pinned_only=pinned_only, user_id=username, cursor=cursor
             )
             total = await archive_manager.count_archived_sessions(
                 status=status, pinned_only=pinned_only, user_id=username
             )
 
-        return {"total": total, "limit": limit, "offset": offset, "sessions": sessions}
+        next_cursor = encode_archive_cursor(sessions[-1]) if sessions and len(sessions) == limit else None
+        return {"total": total, "limit": limit, "offset": offset, "sessions": sessions, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f" 获取归档会话列表失败: {e}")
         raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
@@ -8129,21 +8278,26 @@ async def get_featured_sessions():
 
 
 @app.get("/api/sessions/archived/{session_id}")
-async def get_archived_session(session_id: str):
+async def get_archived_session(
+    session_id: str,
+    sections: Optional[str] = Query(None, description="只加载的分段，逗号分隔（如 metadata,report,experts）"),
+):
     """
     获取归档会话详情
 
     Args:
         session_id: 会话ID
+        sections: 只加载的分段（默认全部）
 
     Returns:
-        归档会话完整数据
+        归档会话数据
     """
     if not archive_manager:
         raise HTTPException(status_code=404, detail="会话归档功能未启用")
 
     try:
-        session = await archive_manager.get_archived_session(session_id)
+        requested = [name.strip() for name in sections.split(",") if name.strip()] if sections else None
+        session = await archive_manager.get_archived_session(session_id, sections=requested)
         if not session:
             raise HTTPException(status_code=404, detail="归档会话不存在")
 
@@ -8227,8 +8381,8 @@ async def delete_archived_session(session_id: str, current_user: dict = Depends(
         raise HTTPException(status_code=404, detail="会话归档功能未启用")
 
     try:
-        #  1. 获取归档会话并验证所有权
-        session = await archive_manager.get_archived_session(session_id)
+        #  1. 获取归档会话并验证所有权（只需 metadata 分段）
+        session = await archive_manager.get_archived_session(session_id, sections=["metadata"])
 
         if not session:
             raise HTTPException(status_code=404, detail="归档会话不存在")
@@ -22,6 +22,7 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from loguru import logger
 from pydantic import BaseModel
 
+from intelligent_project_analyzer.services.session_archive_manager import encode_archive_cursor
 from intelligent_project_analyzer.settings import settings  # 直接导入
 from .deps import sessions_cache, DEV_MODE
 from .models import ConversationResponse
@@ -668,6 +669,7 @@ async def list_archived_sessions(
     offset: int = 0,
     status: Optional[str] = None,
     pinned_only: bool = False,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(_server.get_current_user),  #  v7.178: 添加用户认证
 ):
     """
@@ -681,13 +683,14 @@ async def list_archived_sessions(
         offset: 偏移量（默认0）
         status: 过滤状态（可选: completed, failed, rejected）
         pinned_only: 是否只显示置顶会话
+        cursor: 游标（上一页返回的 next_cursor；指定时忽略 offset，深翻页不随偏移变慢）
 
     Returns:
-        归档会话列表
+        归档会话列表（next_cursor 为下一页游标，没有更多时为 None）
     """
     if not _server.archive_manager:
         # 未启用归档功能：返回空列表（保持 200，便于前端/测试兼容）
-        return {"total": 0, "limit": limit, "offset": offset, "sessions": []}
+        return {"total": 0, "limit": limit, "offset": offset, "sessions": [], "next_cursor": None}
 
     try:
         #  v7.201: 使用统一的用户标识获取函数
@@ -697,7 +700,12 @@ async def list_archived_sessions(
         if DEV_MODE:
             logger.info(f" [DEV_MODE] 归档会话：返回所有用户的会话（当前用户: {username}）")
             sessions = await _server.archive_manager.list_archived_sessions(
-                limit=limit, offset=offset, status=status, pinned_only=pinned_only, user_id=None  # None = 所有用户
+                limit=limit,
+                offset=offset,
+                status=status,
+                pinned_only=pinned_only,
+                user_id=None,  # None = 所有用户
+                cursor=cursor,
             )
             total = await _server.archive_manager.count_archived_sessions(
                 status=status, pinned_only=pinned_only, user_id=None
@@ -705,13 +713,16 @@ async def list_archived_sessions(
         else:
             #  生产模式：仅返回当前用户的会话
             sessions = await _server.archive_manager.list_archived_sessions(
-                limit=limit, offset=offset, status=status, pinned_only=pinned_only, user_id=username
+                limit=limit, offset=offset, status=status, pinned_only=pinned_only, user_id=username, cursor=cursor
             )
             total = await _server.archive_manager.count_archived_sessions(
                 status=status, pinned_only=pinned_only, user_id=username
             )
 
-        return {"total": total, "limit": limit, "offset": offset, "sessions": sessions}
+        next_cursor = encode_archive_cursor(sessions[-1]) if sessions and len(sessions) == limit else None
+        return {"total": total, "limit": limit, "offset": offset, "sessions": sessions, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f" 获取归档会话列表失败: {e}")
         raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
@@ -931,21 +942,26 @@ async def get_featured_sessions():
 
 
 @router.get("/api/sessions/archived/{session_id}")
-async def get_archived_session(session_id: str):
+async def get_archived_session(
+    session_id: str,
+    sections: Optional[str] = Query(None, description="只加载的分段，逗号分隔（如 metadata,report,experts）"),
+):
     """
     获取归档会话详情
 
     Args:
         session_id: 会话ID
+        sections: 只加载的分段（默认全部）
 
     Returns:
-        归档会话完整数据
+        归档会话数据
     """
     if not _server.archive_manager:
         raise HTTPException(status_code=404, detail="会话归档功能未启用")
 
     try:
-        session = await _server.archive_manager.get_archived_session(session_id)
+        requested = [name.strip() for name in sections.split(",") if name.strip()] if sections else None
+        session = await _server.archive_manager.get_archived_session(session_id, sections=requested)
         if not session:
             raise HTTPException(status_code=404, detail="归档会话不存在")
 
@@ -1031,8 +1047,8 @@ async def delete_archived_session(
         raise HTTPException(status_code=404, detail="会话归档功能未启用")
 
     try:
-        #  1. 获取归档会话并验证所有权
-        session = await _server.archive_manager.get_archived_session(session_id)
+        #  1. 获取归档会话并验证所有权（只需 metadata 分段）
+        session = await _server.archive_manager.get_archived_session(session_id, sections=["metadata"])
 
         if not session:
             raise HTTPException(status_code=404, detail="归档会话不存在")
@@ -0,0 +1,255 @@
+"""
+API 启动编排器
+
+将 lifespan 中的初始化步骤拆为带依赖声明的组件：
+- eager:      阻塞启动，按依赖分层执行，同层组件并发初始化
+- background: 不阻塞启动，eager 阶段结束后在后台预热（Playwright、缓存预热等）
+- lazy:       首次使用时才初始化（ensure_ready），可选在后台预热
+
+每个组件的状态与耗时通过 get_readiness() 暴露给 /readiness，
+启动总耗时与冷启动预算（STARTUP_BUDGET_MS）比较并记录。
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+InitFunc = Callable[[], Awaitable[Any]]
+
+EAGER = "eager"
+BACKGROUND = "background"
+LAZY = "lazy"
+
+STATUS_PENDING = "pending"
+STATUS_STARTING = "starting"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+STATUS_DEFERRED = "deferred"
+
+
+@dataclass
+class StartupComponent:
+    """启动组件描述"""
+
+    name: str
+    init: InitFunc
+    depends_on: Sequence[str] = ()
+    mode: str = EAGER
+    critical: bool = False  # 关键组件失败 → /readiness 返回未就绪
+    description: str = ""
+    status: str = STATUS_PENDING
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    _future: Optional["asyncio.Future[None]"] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "mode": self.mode,
+            "critical": self.critical,
+            "depends_on": list(self.depends_on),
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+            "error": self.error,
+            "description": self.description,
+        }
+
+
+class StartupOrchestrator:
+    """
+    依赖感知的并发启动编排器
+
+    Example:
+        >>> orchestrator = StartupOrchestrator()
+        >>> orchestrator.register("redis", init_redis, critical=True)
+        >>> orchestrator.register("followup", init_followup, depends_on=["redis"])
+        >>> orchestrator.register("browser_pool", init_browser, mode=BACKGROUND)
+        >>> await orchestrator.start()
+    """
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        self.budget_ms = budget_ms if budget_ms is not None else float(os.getenv("STARTUP_BUDGET_MS", "5000"))
+        self._components: Dict[str, StartupComponent] = {}
+        self._background_tasks: List[asyncio.Task] = []
+        self._startup_ms: Optional[float] = None
+
+    # ------------------------------------------------------------------ 注册
+
+    def register(
+        self,
+        name: str,
+        init: InitFunc,
+        depends_on: Sequence[str] = (),
+        mode: str = EAGER,
+        critical: bool = False,
+        description: str = "",
+    ) -> None:
+        """注册启动组件"""
+        if mode not in (EAGER, BACKGROUND, LAZY):
+            raise ValueError(f"未知启动模式: {mode}")
+        if name in self._components:
+            raise ValueError(f"启动组件重复注册: {name}")
+        self._components[name] = StartupComponent(
+            name=name,
+            init=init,
+            depends_on=tuple(depends_on),
+            mode=mode,
+            critical=critical,
+            description=description,
+            status=STATUS_DEFERRED if mode == LAZY else STATUS_PENDING,
+        )
+
+    def _levels(self, names: Sequence[str]) -> List[List[str]]:
+        """按依赖拓扑分层（同层组件互不依赖，可并发）"""
+        remaining = {n: {d for d in self._components[n].depends_on if d in names} for n in names}
+        for n in remaining:
+            missing = [d for d in self._components[n].depends_on if d not in self._components]
+            if missing:
+                raise ValueError(f"启动组件 {n} 依赖未注册的组件: {missing}")
+        levels: List[List[str]] = []
+        while remaining:
+            ready = sorted(n for n, deps in remaining.items() if not deps)
+            if not ready:
+                raise ValueError(f"启动组件存在循环依赖: {sorted(remaining)}")
+            levels.append(ready)
+            for n in ready:
+                remaining.pop(n)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return levels
+
+    # ------------------------------------------------------------------ 执行
+
+    async def _run_component(self, component: StartupComponent) -> None:
+        component.status = STATUS_STARTING
+        component.started_at = time.perf_counter()
+        try:
+            await component.init()
+            component.status = STATUS_READY
+        except Exception as e:
+            component.status = STATUS_FAILED
+            component.error = str(e)
+            logger.warning(f"️ [Startup] {component.name} 初始化失败: {e}")
+        finally:
+            component.duration_ms = (time.perf_counter() - component.started_at) * 1000
+
+    async def ensure_ready(self, name: str) -> bool:
+        """
+        确保组件已初始化（依赖先行）；并发调用只初始化一次。
+        依赖失败时仍尝试初始化本组件——各组件自带降级逻辑（如 Redis → 内存模式）。
+
+        Returns:
+            组件是否就绪
+        """
+        component = self._components[name]
+        if component._future is None:
+            component._future = asyncio.get_running_loop().create_future()
+
+            async def _init() -> None:
+                try:
+                    for dep in component.depends_on:
+                        await self.ensure_ready(dep)
+                    await self._run_component(component)
+                finally:
+                    component._future.set_result(None)
+
+            await _init()
+        else:
+            await asyncio.shield(component._future)
+        return component.status == STATUS_READY
+
+    async def start(self) -> Dict[str, Any]:
+        """
+        执行 eager 组件（分层并发），再调度 background 组件
+
+        Returns:
+            启动摘要（总耗时、预算、各组件状态）
+        """
+        started = time.perf_counter()
+        eager = [n for n, c in self._components.items() if c.mode == EAGER]
+        for level in self._levels(eager):
+            await asyncio.gather(*(self.ensure_ready(n) for n in level))
+        self._startup_ms = (time.perf_counter() - started) * 1000
+
+        for name, component in self._components.items():
+            if component.mode == BACKGROUND:
+                self._background_tasks.append(asyncio.create_task(self.ensure_ready(name), name=f"startup-{name}"))
+
+        summary = self.get_readiness()
+        slowest = sorted(
+            (c for c in self._components.values() if c.mode == EAGER and c.duration_ms is not None),
+            key=lambda c: c.duration_ms,
+            reverse=True,
+        )
+        detail = ", ".join(f"{c.name}={c.duration_ms:.0f}ms" for c in slowest[:5])
+        if self._startup_ms > self.budget_ms:
+            logger.warning(f"️ [Startup] 冷启动 {self._startup_ms:.0f}ms 超出预算 {self.budget_ms:.0f}ms ({detail})")
+        else:
+            logger.info(f" [Startup] 冷启动 {self._startup_ms:.0f}ms / 预算 {self.budget_ms:.0f}ms ({detail})")
+        return summary
+
+    async def wait_background(self, timeout: Optional[float] = None) -> None:
+        """等待后台组件完成（测试/脚本用）"""
+        if self._background_tasks:
+            await asyncio.wait(self._background_tasks, timeout=timeout)
+
+    async def shutdown(self) -> None:
+        """取消尚未完成的后台初始化"""
+        for task in self._background_tasks:
+            if not task.done():
+                task.cancel()
+        for task in self._background_tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._background_tasks.clear()
+
+    # ------------------------------------------------------------------ 查询
+
+    def get_status(self, name: str) -> Optional[str]:
+        component = self._components.get(name)
+        return component.status if component else None
+
+    def get_readiness(self) -> Dict[str, Any]:
+        """
+        就绪摘要：关键组件全部 ready 才视为 ready；
+        lazy/background 组件未完成不影响就绪
+        """
+        ready = all(c.status == STATUS_READY for c in self._components.values() if c.critical)
+        return {
+            "ready": ready,
+            "startup_ms": round(self._startup_ms, 1) if self._startup_ms is not None else None,
+            "budget_ms": self.budget_ms,
+            "within_budget": self._startup_ms is not None and self._startup_ms <= self.budget_ms,
+            "components": {n: c.to_dict() for n, c in self._components.items()},
+        }
+
+
+_orchestrator: Optional[StartupOrchestrator] = None
+
+
+def get_startup_orchestrator() -> Optional[StartupOrchestrator]:
+    """获取当前进程的启动编排器（lifespan 未运行时为 None）"""
+    return _orchestrator
+
+
+def set_startup_orchestrator(orchestrator: Optional[StartupOrchestrator]) -> None:
+    """设置当前进程的启动编排器（由 lifespan 调用）"""
+    global _orchestrator
+    _orchestrator = orchestrator
+
+
+__all__ = [
+    "EAGER",
+    "BACKGROUND",
+    "LAZY",
+    "StartupComponent",
+    "StartupOrchestrator",
+    "get_startup_orchestrator",
+    "set_startup_orchestrator",
+]
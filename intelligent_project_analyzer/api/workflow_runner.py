@@ -21,6 +21,7 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 
 from loguru import logger
 
+from intelligent_project_analyzer.services.image_job_planner import release_report_budget
 from intelligent_project_analyzer.settings import settings
 from intelligent_project_analyzer.workflow.main_workflow import MainWorkflow
 
@@ -121,7 +122,7 @@ def _ensure_aiosqlite_is_alive(conn: Any) -> Any:
 
 
 async def get_or_create_async_checkpointer() -> Optional[BaseCheckpointSaver[str]]:
-    """惰性初始化 AsyncSqliteSaver，所有会话复用同一个连接。"""
+    """惰性初始化检查点存储（默认 AsyncSqliteSaver，CHECKPOINT_BACKEND=redis 时为 AsyncRedisSaver），所有会话复用同一实例。"""
 
     global async_checkpointer, async_checkpointer_lock
 
@@ -135,6 +136,14 @@ async def get_or_create_async_checkpointer() -> Optional[BaseCheckpointSaver[str
         if async_checkpointer is not None:
             return async_checkpointer
 
+        #  多实例部署：检查点存入共享 Redis，任意实例/worker 均可恢复会话
+        from intelligent_project_analyzer.services.redis_checkpoint_saver import AsyncRedisSaver, get_checkpoint_backend
+
+        if get_checkpoint_backend() == "redis":
+            async_checkpointer = AsyncRedisSaver.from_url(settings.redis_url)
+            logger.info(" AsyncRedisSaver 初始化成功（多实例共享检查点）")
+            return async_checkpointer
+
         try:
             import aiosqlite
             from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
@@ -147,6 +156,8 @@ async def get_or_create_async_checkpointer() -> Optional[BaseCheckpointSaver[str
 
         conn = await aiosqlite.connect(str(db_path))
         conn = _ensure_aiosqlite_is_alive(conn)
+        # 新建库启用增量 VACUUM（对已有表的库无效，由 CheckpointMaintenance 按需转换）
+        await conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
         async_checkpointer = AsyncSqliteSaver(conn)
         logger.info(f" AsyncSqliteSaver 初始化成功: {db_path}")
         return async_checkpointer
@@ -276,6 +287,7 @@ async def broadcast_to_websockets(session_id: str, message: Dict[str, Any]):
 
 async def run_workflow_async(session_id: str, user_input: str):
     """异步执行工作流（仅 Dynamic Mode）"""
+    paused = False  # 停在 interrupt 等待用户输入时，会话仍在进行，保留概念图额度
     try:
         logger.info(f" [ASYNC] run_workflow_async 开始 | session_id={session_id}")
 
@@ -412,6 +424,7 @@ async def run_workflow_async(session_id: str, user_input: str):
                             {"type": "interrupt", "status": "waiting_for_input", "interrupt_data": interrupt_value},
                         )
                         logger.info(f" [INTERRUPT] Broadcasted to WebSocket")
+                        paused = True
                         return
 
                 #  更新当前节点和详细信息（用于前端进度展示）
@@ -825,6 +838,10 @@ async def run_workflow_async(session_id: str, user_input: str):
         await _server.session_manager.update(
             session_id, {"status": "failed", "error": error_msg, "traceback": error_traceback}
         )
+    finally:
+        # 完成、失败、创建失败都释放额度记录，避免 _budgets 随失败会话增长
+        if not paused:
+            release_report_budget(session_id)
 
 
 # ==================== API 端点 ====================
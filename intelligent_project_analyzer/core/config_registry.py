@@ -0,0 +1,347 @@
+"""
+共享配置注册表 - Config Registry
+
+所有 YAML 配置的统一加载入口：
+1. 每个文件在进程内只解析一次，各加载器共享同一个对象（只读约定）
+2. 解析结果缓存为二进制快照（pickle），按 路径 + mtime + size 作键，冷启动跳过 YAML 解析
+3. 按 mtime 检测变更，原子替换缓存并通知订阅者（热重载）
+4. 记录每个文件的加载来源与耗时，启动时输出报告
+
+用法:
+    >>> from intelligent_project_analyzer.core.config_registry import load_yaml_config
+    >>> config = load_yaml_config(Path("config/MODE_TASK_LIBRARY.yaml"))
+    >>> config = load_yaml_config(path, copy=True)  # 需要修改时取独立副本
+
+环境变量:
+    CONFIG_SNAPSHOT_ENABLED   是否启用二进制快照（默认 true）
+    CONFIG_SNAPSHOT_DIR       快照目录（默认 <项目根>/data/config_cache）
+"""
+
+import copy as _copy
+import hashlib
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import yaml
+from loguru import logger
+
+try:
+    _YamlLoader = yaml.CSafeLoader  # libyaml 加速
+except AttributeError:  # pragma: no cover - 取决于 PyYAML 编译选项
+    _YamlLoader = yaml.SafeLoader
+
+_DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parents[2] / "data" / "config_cache"
+_SNAPSHOT_FORMAT = 1  # 快照格式变更时递增，使旧快照失效
+
+ChangeCallback = Callable[[Path], None]
+
+
+@dataclass
+class ConfigLoadRecord:
+    """单个配置文件的加载记录"""
+
+    path: str
+    source: str  # yaml | snapshot
+    load_ms: float
+    size_bytes: int
+    loaded_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "source": self.source,
+            "load_ms": round(self.load_ms, 2),
+            "size_bytes": self.size_bytes,
+            "loaded_at": self.loaded_at,
+        }
+
+
+@dataclass
+class _CacheEntry:
+    signature: Tuple[int, int]  # (mtime_ns, size)
+    data: Any
+
+
+class ConfigRegistry:
+    """
+    YAML 配置注册表 (单例)
+
+    返回的对象在所有调用方之间共享，调用方不得修改；
+    需要修改时传 copy=True 获取深拷贝。
+    """
+
+    _instance: Optional["ConfigRegistry"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, snapshot_dir: Optional[Path] = None, snapshot_enabled: Optional[bool] = None):
+        if snapshot_enabled is None:
+            snapshot_enabled = os.getenv("CONFIG_SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.snapshot_enabled = snapshot_enabled
+        self.snapshot_dir = Path(snapshot_dir or os.getenv("CONFIG_SNAPSHOT_DIR") or _DEFAULT_SNAPSHOT_DIR)
+
+        self._cache: Dict[str, _CacheEntry] = {}
+        self._records: Dict[str, ConfigLoadRecord] = {}
+        self._subscribers: List[Tuple[Optional[str], ChangeCallback]] = []
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def get_instance(cls) -> "ConfigRegistry":
+        """获取全局注册表实例"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """重置全局实例（测试用）"""
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.stop_watching()
+            cls._instance = None
+
+    # ------------------------------------------------------------------ 加载
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        return str(Path(path).resolve())
+
+    @staticmethod
+    def _signature(path: Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _snapshot_prefix(key: str) -> str:
+        # 文件名 + 路径哈希：不同目录下的同名配置互不覆盖
+        return f"{Path(key).stem}.{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+
+    def _snapshot_path(self, key: str, signature: Tuple[int, int]) -> Path:
+        digest = hashlib.sha1(f"{_SNAPSHOT_FORMAT}|{key}|{signature[0]}|{signature[1]}".encode("utf-8")).hexdigest()
+        return self.snapshot_dir / f"{self._snapshot_prefix(key)}.{digest[:16]}.pickle"
+
+    def _read_snapshot(self, snapshot: Path) -> Tuple[bool, Any]:
+        if not (self.snapshot_enabled and snapshot.exists()):
+            return False, None
+        try:
+            with open(snapshot, "rb") as f:
+                return True, pickle.load(f)
+        except Exception as e:
+            logger.debug(f"[ConfigRegistry] 快照读取失败，回退 YAML 解析: {snapshot.name} ({e})")
+            return False, None
+
+    def _write_snapshot(self, key: str, snapshot: Path, data: Any) -> None:
+        if not self.snapshot_enabled:
+            return
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            # 清理同一配置文件的过期快照
+            for stale in self.snapshot_dir.glob(f"{self._snapshot_prefix(key)}.*.pickle"):
+                if stale != snapshot:
+                    stale.unlink(missing_ok=True)
+            tmp = snapshot.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(snapshot)
+        except Exception as e:
+            logger.debug(f"[ConfigRegistry] 快照写入失败（不影响加载）: {e}")
+
+    def _load_from_disk(self, path: Path, key: str, signature: Tuple[int, int]) -> Any:
+        started = time.perf_counter()
+        snapshot = self._snapshot_path(key, signature)
+        hit, data = self._read_snapshot(snapshot)
+        source = "snapshot"
+        if not hit:
+            with open(path, "r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=_YamlLoader)
+            source = "yaml"
+            self._write_snapshot(key, snapshot, data)
+
+        self._records[key] = ConfigLoadRecord(
+            path=key,
+            source=source,
+            load_ms=(time.perf_counter() - started) * 1000,
+            size_bytes=signature[1],
+            loaded_at=time.time(),
+        )
+        return data
+
+    def load(self, path: Union[str, Path], copy: bool = False) -> Any:
+        """
+        加载 YAML 配置（进程内只解析一次）
+
+        Args:
+            path: 配置文件路径
+            copy: True 时返回深拷贝，调用方可自由修改
+
+        Returns:
+            解析后的对象（空文件为 None）
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            yaml.YAMLError: YAML 语法错误
+        """
+        key = self._key(path)
+        file_path = Path(key)
+        signature = self._signature(file_path)
+
+        entry = self._cache.get(key)
+        changed = False
+        if entry is None or entry.signature != signature:
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry is None or entry.signature != signature:
+                    changed = entry is not None
+                    entry = _CacheEntry(signature=signature, data=self._load_from_disk(file_path, key, signature))
+                    self._cache[key] = entry
+        if changed:
+            # 调用方先于后台轮询发现变更：同样通知订阅者，保证各加载器缓存一致
+            self._notify(file_path)
+
+        return _copy.deepcopy(entry.data) if copy else entry.data
+
+    def get_cached(self, path: Union[str, Path]) -> Any:
+        """仅返回内存中已加载的对象（不触发磁盘读取），未加载返回 None"""
+        entry = self._cache.get(self._key(path))
+        return entry.data if entry else None
+
+    # ------------------------------------------------------------------ 热重载
+
+    def subscribe(self, callback: ChangeCallback, path: Optional[Union[str, Path]] = None) -> None:
+        """
+        订阅配置变更
+
+        Args:
+            callback: 变更回调，参数为变更文件路径
+            path: 只关注某个文件；None 表示全部文件
+        """
+        entry = (self._key(path) if path else None, callback)
+        with self._lock:
+            if entry not in self._subscribers:  # 同一回调重复订阅（如加载器重新加载）只保留一份
+                self._subscribers.append(entry)
+
+    def unsubscribe(self, callback: ChangeCallback) -> None:
+        """取消订阅"""
+        with self._lock:
+            self._subscribers = [(p, cb) for p, cb in self._subscribers if cb != callback]
+
+    def check_for_changes(self) -> List[Path]:
+        """
+        检查已加载文件是否变更；变更的文件重新解析、原子替换并通知订阅者
+
+        Returns:
+            变更的文件列表
+        """
+        changed: List[Path] = []
+        for key, entry in list(self._cache.items()):
+            file_path = Path(key)
+            try:
+                signature = self._signature(file_path)
+            except FileNotFoundError:
+                continue
+            if signature == entry.signature:
+                continue
+            try:
+                with self._lock:
+                    data = self._load_from_disk(file_path, key, signature)
+                    self._cache[key] = _CacheEntry(signature=signature, data=data)
+                changed.append(file_path)
+                logger.info(f"[ConfigRegistry] 配置已重新加载: {file_path.name}")
+            except Exception as e:
+                # 新内容解析失败时保留旧配置继续服务
+                logger.error(f"[ConfigRegistry] 配置重载失败，保留旧版本: {file_path.name} ({e})")
+
+        for file_path in changed:
+            self._notify(file_path)
+        return changed
+
+    def _notify(self, file_path: Path) -> None:
+        key = str(file_path)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for watched, callback in subscribers:
+            if watched is not None and watched != key:
+                continue
+            try:
+                callback(file_path)
+            except Exception as e:
+                logger.warning(f"[ConfigRegistry] 变更回调执行失败: {e}")
+
+    def start_watching(self, interval: float = 10.0) -> None:
+        """启动后台轮询线程（与 HotReloadConfigManager 一致的轻量轮询，不依赖 watchdog）"""
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def poll():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    logger.error(f"[ConfigRegistry] 配置监听错误: {e}")
+
+        self._watch_thread = threading.Thread(target=poll, daemon=True, name="ConfigRegistryWatch")
+        self._watch_thread.start()
+        logger.info(f"[ConfigRegistry] 配置热重载监听已启动（间隔 {interval}s）")
+
+    def stop_watching(self) -> None:
+        """停止后台轮询"""
+        if self._watch_thread and self._watch_thread.is_alive():
+            self._stop_event.set()
+            self._watch_thread.join(timeout=5)
+        self._watch_thread = None
+
+    # ------------------------------------------------------------------ 报告
+
+    def get_load_report(self) -> Dict[str, Any]:
+        """
+        获取加载报告（每个文件的来源与耗时，按耗时降序）
+        """
+        records = sorted(self._records.values(), key=lambda r: r.load_ms, reverse=True)
+        return {
+            "files": len(records),
+            "total_ms": round(sum(r.load_ms for r in records), 2),
+            "yaml_parsed": sum(1 for r in records if r.source == "yaml"),
+            "snapshot_hits": sum(1 for r in records if r.source == "snapshot"),
+            "snapshot_enabled": self.snapshot_enabled,
+            "records": [r.to_dict() for r in records],
+        }
+
+    def log_load_report(self, top: int = 10) -> None:
+        """输出启动加载报告（最慢的 top 个文件）"""
+        report = self.get_load_report()
+        logger.info(
+            f"[ConfigRegistry] 已加载 {report['files']} 个配置文件，总耗时 {report['total_ms']}ms "
+            f"(YAML 解析 {report['yaml_parsed']}，快照命中 {report['snapshot_hits']})"
+        )
+        for record in report["records"][:top]:
+            logger.info(
+                f"   {record['load_ms']:>8.2f}ms  [{record['source']}]  "
+                f"{Path(record['path']).name} ({record['size_bytes'] // 1024}KB)"
+            )
+
+
+def get_config_registry() -> ConfigRegistry:
+    """获取全局配置注册表"""
+    return ConfigRegistry.get_instance()
+
+
+def load_yaml_config(path: Union[str, Path], copy: bool = False) -> Any:
+    """通过全局注册表加载 YAML 配置（见 ConfigRegistry.load）"""
+    return ConfigRegistry.get_instance().load(path, copy=copy)
+
+
+__all__ = [
+    "ConfigLoadRecord",
+    "ConfigRegistry",
+    "get_config_registry",
+    "load_yaml_config",
+]
@@ -8,7 +8,7 @@ Responsible for loading, managing, and providing prompt configurations.
 from pathlib import Path
 from typing import Dict, Optional
 
-import yaml
+from .config_registry import get_config_registry, load_yaml_config
 
 
 class PromptManager:
@@ -71,6 +71,8 @@ class PromptManager:
             self._load_prompts()
             # 启动时检查配置完整性
             self._validate_config_integrity()
+            # 配置热重载：注册表检测到文件变更后替换对应条目
+            get_config_registry().subscribe(self._on_config_changed)
         else:
             print(f"[WARNING] Prompts directory does not exist: {self.config_path}")
             print("[INFO] Creating default prompts directory...")
@@ -102,11 +104,10 @@ class PromptManager:
             for yaml_file in yaml_files:
                 if is_first_load:
                     print(f"[INFO] Loading {yaml_file.name}...")
-                with open(yaml_file, "r", encoding="utf-8") as f:
-                    file_content = yaml.safe_load(f) or {}
-                    # 使用文件名（不含扩展名）作为 key
-                    agent_name = yaml_file.stem
-                    self.prompts[agent_name] = file_content
+                file_content = load_yaml_config(yaml_file) or {}
+                # 使用文件名（不含扩展名）作为 key
+                agent_name = yaml_file.stem
+                self.prompts[agent_name] = file_content
 
             if is_first_load:
                 print(f"[OK]  Successfully loaded {len(self.prompts)} prompt configuration(s) (cached)")
@@ -270,6 +271,12 @@ class PromptManager:
         """
         return list(self.prompts.keys())
 
+    def _on_config_changed(self, path: Path) -> None:
+        """注册表变更回调：只处理本目录下的提示词文件"""
+        if path.parent != self.config_path.resolve() or path.suffix not in (".yaml", ".yml"):
+            return
+        self.prompts[path.stem] = load_yaml_config(path) or {}
+
     def reload(self) -> None:
         """重新加载提示词配置"""
         print("[INFO] Reloading prompt configurations...")
@@ -44,6 +44,14 @@ class ExpertPromptTemplate:
         #  预构建静态部分（只执行一次）
         self.static_sections = self._build_static_sections(autonomy_protocol)
 
+        #  稳定前缀：同一角色类型逐字节一致，放在 system prompt 最前面以命中提供商的 prompt cache
+        self.static_prefix = f"""
+{self.base_system_prompt}
+{self._build_role_differentiation_section()}
+{self.static_sections['autonomy_section']}
+{self.static_sections['output_format_section']}
+"""
+
         logger.debug(f" [升级1] 为角色类型 {role_type} 预构建了 Prompt 静态部分")
 
     def _build_static_sections(self, autonomy_protocol: Dict[str, Any]) -> Dict[str, str]:
@@ -136,6 +144,7 @@ class ExpertPromptTemplate:
         state: Dict[str, Any],
         creative_mode_note: str = "",
         search_queries_hint: str = "",  #  v7.122: 搜索查询提示
+        knowledge_prefix: str = "",
     ) -> Dict[str, str]:
         """
         渲染完整Prompt（只构建动态部分20%）
@@ -147,9 +156,13 @@ class ExpertPromptTemplate:
             state: 当前状态
             creative_mode_note: 创意叙事模式说明（可选）
             search_queries_hint:  v7.122 预生成的搜索查询提示（可选）
+            knowledge_prefix: 按模式组合生成的 sf 知识注入文本（可选，同一组合逐字节一致）
 
         Returns:
-            包含 system_prompt 和 user_prompt 的字典
+            包含 system_prompt、user_prompt 与 stable_prefix（system_prompt 的稳定前缀）的字典
+
+        布局：稳定前缀（角色基础 prompt + 角色差异化 + 自主性协议 + 输出格式 + sf 知识）在前，
+        会话相关内容（动态角色、Few-Shot、TaskInstruction、任务优先级、搜索提示）在后。
         """
         #  构建动态的 TaskInstruction 部分（20%的内容）
         task_instruction_section = self._build_task_instruction_section(task_instruction)
@@ -157,20 +170,17 @@ class ExpertPromptTemplate:
         #  构建任务优先级提示（如果有confirmed_core_tasks）
         task_priority_section = self._build_task_priority_section(state)
 
-        #  v7.154: 构建角色差异化指令（防止V4/V5输出同质化）
-        role_differentiation_section = self._build_role_differentiation_section()
-
         #  P0优化1: 加载Few-Shot示例
         few_shot_section = self._build_few_shot_section(state, task_instruction)
 
-        #  拼接预构建的静态部分（80%）+ 动态部分（20%）
-        system_prompt = f"""
-{self.base_system_prompt}
-
+        #  稳定前缀（含 v7.154 角色差异化指令）在前 + 会话相关的动态部分在后
+        stable_prefix = self.static_prefix + knowledge_prefix
+        system_prompt = (
+            stable_prefix
+            + f"""
 #  动态角色定义
 你在本次分析中的具体角色：{dynamic_role_name}
 {creative_mode_note}
-{role_differentiation_section}
 {few_shot_section}
 #  TaskInstruction - 你的明确任务指令
 
@@ -178,9 +188,8 @@ class ExpertPromptTemplate:
 
 {task_priority_section}
 {search_queries_hint}
-{self.static_sections['autonomy_section']}
-{self.static_sections['output_format_section']}
 """
+        )
 
         # 构建用户提示词
         #  v7.19: 添加输出质量引导
@@ -253,7 +262,7 @@ class ExpertPromptTemplate:
 开始执行你的专业分析任务：
 """
 
-        return {"system_prompt": system_prompt, "user_prompt": user_prompt}
+        return {"system_prompt": system_prompt, "user_prompt": user_prompt, "stable_prefix": stable_prefix}
 
     def _build_task_instruction_section(self, task_instruction: Dict[str, Any]) -> str:
         """
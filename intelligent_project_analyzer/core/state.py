@@ -5,6 +5,7 @@
 """
 
 import operator
+import os
 from datetime import datetime
 from enum import Enum
 from typing import Annotated, Any, Dict, List, Optional
@@ -13,6 +14,8 @@ from langchain_core.messages import BaseMessage
 from langgraph.graph import add_messages
 from typing_extensions import TypedDict
 
+from ..services.state_profiler import profile_reducer
+
 
 class AnalysisStage(Enum):
     """分析阶段枚举"""
@@ -42,6 +45,7 @@ class AgentType(Enum):
     PDF_GENERATOR = "pdf_generator"
 
 
+@profile_reducer
 def merge_agent_results(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """
     合并智能体结果的reducer函数
@@ -57,18 +61,50 @@ def merge_agent_results(left: Optional[Dict[str, Any]], right: Optional[Dict[str
     """
     if left is None:
         return right or {}
-    if right is None:
+    if not right:
         return left
+    if not left:
+        return dict(right)
     # 合并两个字典,右侧的值会覆盖左侧的同名键
     return {**left, **right}
 
 
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+# 新增元素不超过该数量时逐个比较更快（建索引要为 left 的每个元素计算一次哈希键）
+_LINEAR_MERGE_MAX = 32
+
+
+def _dedup_key(item: Any) -> Any:
+    """稳定的内容哈希键：字典取标量字段集合，可哈希对象取自身，其余按类型分桶"""
+    if isinstance(item, dict):
+        return frozenset((k, v) for k, v in item.items() if isinstance(v, _SCALAR_TYPES))
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        return type(item)
+
+
+def _build_dedup_index(values: List[Any]) -> Dict[Any, List[Any]]:
+    """
+    按内容哈希分桶的去重索引，桶内再用 == 精确比较
+
+    每次合并都从 left 重建：节点会原地修改列表元素（如给任务字典补字段），
+    跨调用携带的索引会失效，而重建只需 O(n)。
+    """
+    index: Dict[Any, List[Any]] = {}
+    for item in values:
+        index.setdefault(_dedup_key(item), []).append(item)
+    return index
+
+
+@profile_reducer
 def merge_lists(left: Optional[List[Any]], right: Optional[List[Any]]) -> List[Any]:
     """
     合并列表的reducer函数
 
     用于处理并发执行的节点同时更新列表字段的情况
-    会去重,保持顺序
+    会去重,保持顺序（新增元素较多时按内容哈希建索引，合并开销 O(n+m)）
 
     Args:
         left: 左侧值(现有值)
@@ -83,13 +119,50 @@ def merge_lists(left: Optional[List[Any]], right: Optional[List[Any]]) -> List[A
         return left
 
     # 合并并去重,保持顺序
-    result = left.copy()
+    result = list(left)
+    if len(right) <= _LINEAR_MERGE_MAX:
+        for item in right:
+            if item not in result:
+                result.append(item)
+        return result
+
+    index = _build_dedup_index(left)
     for item in right:
-        if item not in result:
+        bucket = index.setdefault(_dedup_key(item), [])
+        if item not in bucket:
+            bucket.append(item)
             result.append(item)
     return result
 
 
+@profile_reducer
+def _bounded_add_messages(left: Optional[List[BaseMessage]], right: Any) -> List[BaseMessage]:
+    """
+    有界 add_messages reducer（MT-3）
+
+    按 add_messages 语义合并后只保留最近 CONVERSATION_HISTORY_MAX 条（默认 100），
+    避免长会话的 conversation_history 随每个 checkpoint 无限增长。
+    """
+    result = add_messages(left or [], right or [])
+    max_items = int(os.getenv("CONVERSATION_HISTORY_MAX", "100"))
+    if max_items > 0 and len(result) > max_items:
+        return result[-max_items:]
+    return result
+
+
+def _bounded_merge_lists(left: Optional[List[Any]], right: Optional[List[Any]]) -> List[Any]:
+    """
+    有界 merge_lists reducer（MT-3）
+
+    去重合并后只保留最近 INTERACTION_HISTORY_MAX 条（默认 50）。
+    """
+    result = merge_lists(left, right)
+    max_items = int(os.getenv("INTERACTION_HISTORY_MAX", "50"))
+    if max_items > 0 and len(result) > max_items:
+        return result[-max_items:]
+    return result
+
+
 def take_max_timestamp(left: str, right: str) -> str:
     """
     时间戳 reducer：选择较大的时间戳
@@ -149,6 +222,8 @@ class ProjectAnalysisState(TypedDict):
 
     # 用户输入和需求
     user_input: str
+    input_features: Optional[Dict[str, Any]]
+    """输入特征阶段结果（services/input_features.py）：归一化文本、分词、否定区间、各消费方关键词命中"""
     structured_requirements: Optional[Dict[str, Any]]
     feasibility_assessment: Optional[Dict[str, Any]]  #  V1.5可行性分析结果（后台决策支持）
     project_type: Optional[
@@ -165,6 +240,12 @@ class ProjectAnalysisState(TypedDict):
     agent_results: Annotated[Optional[Dict[str, Any]], merge_agent_results]
     agent_type: Optional[Any]  # 当前执行的智能体类型(用于Send API并行执行)
 
+    #  v7.503: 上下文压缩缓存与统计（workflow/context_compressor.py）
+    context_summaries: Annotated[Optional[Dict[str, Dict[str, Any]]], merge_agent_results]
+    """专家结果的分级摘要缓存，键为角色ID，按内容指纹失效；专家完成时生成，后续专家复用"""
+    context_compression_stats: Annotated[Optional[Dict[str, Dict[str, Any]]], merge_agent_results]
+    """每位专家构建上下文时的 Token 统计（原始/压缩/节省/缓存命中），键为角色ID"""
+
     #  交付物ID管理（v7.108）- 支持概念图精准关联
     deliverable_metadata: Annotated[Optional[Dict[str, Dict[str, Any]]], merge_agent_results]
     """
@@ -219,7 +300,8 @@ class ProjectAnalysisState(TypedDict):
     """
 
     # 交互和历史
-    conversation_history: Annotated[List[BaseMessage], add_messages]
+    conversation_history: Annotated[List[BaseMessage], _bounded_add_messages]
+    conversation_history_ref: Optional[str]  # MT-3: conversation_history 的外部存储 ref_key（预留）
     human_feedback: Optional[Dict[str, Any]]
 
     # 流程控制
@@ -244,7 +326,8 @@ class ProjectAnalysisState(TypedDict):
     calibration_answers: Optional[Dict[str, Any]]  # 问卷答案（兼容旧字段）
     questionnaire_responses: Optional[Dict[str, Any]]  # 问卷回答（包含答案和元数据）
     questionnaire_summary: Optional[Dict[str, Any]]  # 问卷精炼摘要（仅保留有效信息）
-    interaction_history: Annotated[List[Dict[str, Any]], merge_lists]  # 交互历史记录
+    interaction_history: Annotated[List[Dict[str, Any]], _bounded_merge_lists]  # 交互历史记录
+    interaction_history_ref: Optional[str]  # MT-3: interaction_history 的外部存储 ref_key（预留）
     post_completion_followup_completed: Optional[bool]  # 报告完成后的追问是否已结束
 
     #  v7.80+ 渐进式问卷状态（修复关键字段丢失问题）
@@ -466,6 +549,7 @@ class StateManager:
             analysis_mode=analysis_mode,
             # 用户输入
             user_input=user_input,
+            input_features=None,
             structured_requirements=None,
             feasibility_assessment=None,  #  V1.5可行性分析结果初始化,
             # 分析策略
@@ -473,6 +557,8 @@ class StateManager:
             subagents=None,
             # agents_to_execute=None,  # 已移除（Fixed Mode 专用字段）
             agent_results={},
+            context_summaries={},
+            context_compression_stats={},
             # 专业分析结果（V2-V6 字段已移除，使用 agent_results 字典）
             # v2_design_research=None,
             # v3_technical_architecture=None,
@@ -485,6 +571,7 @@ class StateManager:
             pdf_file_path=None,
             # 交互历史
             conversation_history=[],
+            conversation_history_ref=None,
             human_feedback=None,
             #  问卷流程控制初始化
             skip_calibration=False,  #  是否跳过校准问卷
@@ -495,6 +582,7 @@ class StateManager:
             questionnaire_responses=None,
             questionnaire_summary=None,
             interaction_history=[],
+            interaction_history_ref=None,
             post_completion_followup_completed=False,
             #  v7.80+ 渐进式问卷初始化
             progressive_questionnaire_step=0,
@@ -75,6 +75,12 @@ app.conf.beat_schedule = {
         "kwargs": {"batch_size": 100, "only_missing": True},
         "options": {"queue": "process"},
     },
+    "hourly-embedding-backfill": {
+        "task": "backfill_embeddings",
+        "schedule": crontab(minute=30),  # 每小时第30分钟，增量嵌入新增/变更项目
+        "kwargs": {"batch_size": 64, "max_batches": 50},
+        "options": {"queue": "process"},
+    },
     "daily-quality-check": {
         "task": "external_data_system.tasks.batch_quality_check_task",
         "schedule": crontab(hour=4, minute=0),  # 每天凌晨4点
@@ -72,6 +72,11 @@ class ExternalProject(Base):
 
     description_vector = Column(Vector(1536) if PGVECTOR_AVAILABLE else Text)  # OpenAI Embeddings
 
+    # 向量回填元数据（embedding_backfill 据此判断是否需要重新嵌入）
+    embedding_content_hash = Column(String(64), nullable=True)  # 生成向量时的 content_hash
+    embedding_model = Column(String(100), nullable=True)  # 生成向量的模型标识 provider:model
+    embedded_at = Column(DateTime, nullable=True)
+
     # 翻译元数据
     translation_engine = Column(String(50))  # 'deepseek', 'gpt4', 'claude', 'human'
     translation_quality = Column(Float)  # 翻译质量评分 0-1
@@ -5,7 +5,12 @@
 """
 
 from .sync_tasks import sync_external_source, celery_app
-from .processing_tasks import generate_embeddings_task, quality_check_task, batch_generate_embeddings_task
+from .processing_tasks import (
+    generate_embeddings_task,
+    quality_check_task,
+    batch_generate_embeddings_task,
+    backfill_embeddings_task,
+)
 
 __all__ = [
     "celery_app",
@@ -13,4 +18,5 @@ __all__ = [
     "generate_embeddings_task",
     "quality_check_task",
     "batch_generate_embeddings_task",
+    "backfill_embeddings_task",
 ]
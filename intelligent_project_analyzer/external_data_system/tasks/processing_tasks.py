@@ -4,6 +4,8 @@
 定义向量生成、质量检查等数据处理任务
 """
 
+from typing import Optional
+
 from loguru import logger
 import os
 
@@ -22,7 +24,10 @@ def generate_embeddings_task(project_id: int):
     logger.info(f"🚀 生成向量嵌入: project_id={project_id}")
 
     try:
+        from datetime import datetime
+
         from ..models import get_external_db, ExternalProject
+        from ..utils.embedding_backfill import compute_embedding_hash
         from openai import OpenAI
 
         # OpenAI客户端
@@ -55,6 +60,9 @@ def generate_embeddings_task(project_id: int):
 
             # 保存到数据库（pgvector格式）
             project.description_vector = str(embedding)
+            project.embedding_content_hash = compute_embedding_hash(project)
+            project.embedding_model = "openai:text-embedding-3-small"
+            project.embedded_at = datetime.now()
             session.commit()
 
             logger.success(f"✅ 向量嵌入已生成: project_id={project_id}")
@@ -176,8 +184,54 @@ def batch_generate_embeddings_task(limit: int = 100):
         return {"status": "error", "message": str(e)}
 
 
+@celery_app.task(name="backfill_embeddings")
+def backfill_embeddings_task(
+    batch_size: int = 64,
+    max_batches: Optional[int] = None,
+    provider: Optional[str] = None,
+    index_method: Optional[str] = None,
+):
+    """
+    增量向量回填（可恢复）
+
+    基于 content_hash 检测新增/变更项目，按批嵌入并提交；中断后从持久化游标继续。
+    完成后维护 description_vector 的 HNSW/IVFFlat 索引。
+
+    Args:
+        batch_size: 每批嵌入的项目数
+        max_batches: 本次最多处理批数（None=直到积压清空）
+        provider: 嵌入后端 openai / local（None=按环境变量选择；显式指定时迁移其他模型的向量）
+        index_method: 向量索引类型 hnsw / ivfflat（None=按环境变量选择）
+    """
+    logger.info(f"🚀 向量回填任务: batch_size={batch_size} max_batches={max_batches} provider={provider}")
+
+    try:
+        from ..models import get_external_db
+        from ..utils.embedding_backfill import EmbeddingBackfillPipeline, ensure_vector_index, get_embedder
+
+        db = get_external_db()
+        # 显式指定 provider 即视为迁移：其他模型生成的向量一并重嵌
+        pipeline = EmbeddingBackfillPipeline(
+            db, embedder=get_embedder(provider), batch_size=batch_size, migrate_model=True if provider else None
+        )
+        result = pipeline.run(max_batches=max_batches)
+
+        try:
+            result["index"] = ensure_vector_index(db, method=index_method)
+        except Exception as e:
+            logger.warning(f"⚠️ 向量索引维护失败: {e}")
+            result["index"] = {"status": "error", "message": str(e)}
+
+        return result
+
+    except Exception as e:
+        logger.exception(f"❌ 向量回填失败: {e}")
+        return {"status": "error", "message": str(e)}
+
+
 __all__ = [
     "generate_embeddings_task",
     "quality_check_task",
     "batch_generate_embeddings_task",
+    "backfill_embeddings_task",
 ]
@@ -19,6 +19,13 @@ from .rate_limiter import (
     get_profile,
     get_profile_by_name,
 )
+from .embedding_backfill import (
+    EmbeddingBackfillPipeline,
+    ensure_vector_index,
+    get_backfill_metrics,
+    get_embedder,
+    get_embedding_model_id,
+)
 from .lang_utils import (
     detect_lang,
     is_chinese_dominant,
@@ -43,6 +50,12 @@ __all__ = [
     "get_rate_limiter",
     "get_profile",
     "get_profile_by_name",
+    # 向量回填
+    "EmbeddingBackfillPipeline",
+    "ensure_vector_index",
+    "get_backfill_metrics",
+    "get_embedder",
+    "get_embedding_model_id",
     # 语言工具
     "detect_lang",
     "is_chinese_dominant",
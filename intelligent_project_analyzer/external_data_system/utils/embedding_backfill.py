@@ -0,0 +1,510 @@
+"""
+外部项目向量回填流水线
+
+为 external_projects.description_vector 增量生成嵌入：
+- 变更检测：比较 content_hash 与 embedding_content_hash，只处理新增或内容变化的项目；
+  其他模型生成的向量只在显式迁移（EXTERNAL_EMBEDDING_PROVIDER / migrate_model）时重嵌
+- 可恢复：每批独立提交，游标（最后处理的 id）持久化到状态文件，
+  进程中断后从游标继续；一轮扫描结束后游标归零
+- 双后端：OpenAI（text-embedding-3-small）或本地 sentence-transformers 模型（离线可用）
+- 索引维护：PostgreSQL + pgvector 下创建/重建 HNSW 或 IVFFlat 索引
+- 指标：吞吐、积压、最近运行记录，供爬虫监控路由读取
+
+环境变量：
+    EXTERNAL_EMBEDDING_PROVIDER   openai | local（默认 openai，需 OPENAI_API_KEY；显式设置即视为迁移到该后端）
+    EXTERNAL_EMBEDDING_MODEL      模型名（openai 默认 text-embedding-3-small，local 默认 BAAI/bge-m3）
+    EXTERNAL_VECTOR_INDEX         hnsw | ivfflat（默认 hnsw）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import and_, or_, text
+
+VECTOR_DIM = 1536
+MAX_EMBED_CHARS = 8000
+DEFAULT_BATCH_SIZE = 64
+
+_STATE_FILE = Path(__file__).resolve().parents[3] / "data" / "crawler_state" / "embedding_backfill_state.json"
+_HISTORY_LIMIT = 20
+
+
+# ============================================================================
+# 嵌入后端
+# ============================================================================
+
+
+class BaseEmbedder(ABC):
+    """嵌入后端基类"""
+
+    provider: str = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def model_id(self) -> str:
+        """写入 embedding_model 列的模型标识，更换模型会触发全量重嵌"""
+        return f"{self.provider}:{self.model}"
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """批量生成嵌入，返回与 texts 一一对应的向量"""
+
+
+class OpenAIEmbedder(BaseEmbedder):
+    """OpenAI Embeddings（批量请求，一次调用处理整批）"""
+
+    provider = "openai"
+
+    def __init__(self, model: str = "text-embedding-3-small", api_key: Optional[str] = None):
+        super().__init__(model)
+        from openai import OpenAI
+
+        self._client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        response = self._client.embeddings.create(model=self.model, input=list(texts))
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+class LocalEmbedder(BaseEmbedder):
+    """本地 sentence-transformers 模型（离线运行，模型进程内只加载一次）"""
+
+    provider = "local"
+    _models: Dict[str, Any] = {}
+
+    def __init__(self, model: str = "BAAI/bge-m3"):
+        super().__init__(model)
+
+    def _get_model(self):
+        if self.model not in LocalEmbedder._models:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info(f"📦 加载本地嵌入模型: {self.model}")
+            LocalEmbedder._models[self.model] = SentenceTransformer(self.model)
+        return LocalEmbedder._models[self.model]
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = self._get_model().encode(list(texts), normalize_embeddings=True, show_progress_bar=False)
+        return [list(map(float, v)) for v in vectors]
+
+
+_DEFAULT_MODELS = {"openai": "text-embedding-3-small", "local": "BAAI/bge-m3"}
+
+
+def _resolve_embedding_config(provider: Optional[str] = None, model: Optional[str] = None) -> tuple:
+    """解析 (provider, model)；未配置任何后端时报错，不静默切换到本地模型"""
+    provider = (provider or os.getenv("EXTERNAL_EMBEDDING_PROVIDER") or "openai").lower()
+    if provider not in _DEFAULT_MODELS:
+        raise ValueError(f"未知嵌入后端: {provider}（可选 openai / local）")
+    if provider == "openai" and not os.getenv("OPENAI_API_KEY"):
+        # 已有向量由 OpenAI 生成，静默换成本地模型会把两种向量混在同一列里
+        raise ValueError("未配置嵌入后端：请设置 OPENAI_API_KEY，或显式设置 EXTERNAL_EMBEDDING_PROVIDER=local 迁移到本地模型")
+    return provider, model or os.getenv("EXTERNAL_EMBEDDING_MODEL") or _DEFAULT_MODELS[provider]
+
+
+def get_embedder(provider: Optional[str] = None, model: Optional[str] = None) -> BaseEmbedder:
+    """按配置创建嵌入后端"""
+    provider, model = _resolve_embedding_config(provider, model)
+    if provider == "openai":
+        return OpenAIEmbedder(model=model)
+    return LocalEmbedder(model=model)
+
+
+def get_embedding_model_id(provider: Optional[str] = None, model: Optional[str] = None) -> str:
+    """当前配置对应的 embedding_model 标识（不创建客户端 / 不加载模型）"""
+    return "%s:%s" % _resolve_embedding_config(provider, model)
+
+
+# ============================================================================
+# 纯函数
+# ============================================================================
+
+
+def build_embedding_text(project) -> str:
+    """拼接用于嵌入的文本：标题 + 中/英文描述（回退到兼容 description 字段）"""
+    parts = [project.title or ""]
+    desc_zh = getattr(project, "description_zh", None)
+    desc_en = getattr(project, "description_en", None)
+    if desc_zh or desc_en:
+        parts.extend(p for p in (desc_zh, desc_en) if p)
+    elif project.description:
+        parts.append(project.description)
+    return "\n".join(p.strip() for p in parts if p and p.strip())[:MAX_EMBED_CHARS]
+
+
+def compute_embedding_hash(project) -> str:
+    """项目当前内容指纹：优先使用爬虫写入的 content_hash，旧数据回退为嵌入文本的 sha256"""
+    if project.content_hash:
+        return project.content_hash
+    return hashlib.sha256(build_embedding_text(project).encode("utf-8", errors="replace")).hexdigest()
+
+
+def fit_dimension(vector: Sequence[float], dim: int = VECTOR_DIM) -> List[float]:
+    """
+    将向量适配到列维度
+
+    低维模型（如 bge-m3 的 1024 维）尾部补零——补零不改变余弦相似度；
+    高于列维度则拒绝，避免截断造成语义失真。
+    """
+    if len(vector) > dim:
+        raise ValueError(f"向量维度 {len(vector)} 超过列维度 {dim}")
+    return list(vector) + [0.0] * (dim - len(vector))
+
+
+def recommended_ivfflat_lists(row_count: int) -> int:
+    """pgvector 推荐的 IVFFlat lists：≤100 万行取 rows/1000，以上取 sqrt(rows)"""
+    if row_count <= 1_000_000:
+        return max(10, row_count // 1000)
+    return int(math.sqrt(row_count))
+
+
+# ============================================================================
+# 状态持久化
+# ============================================================================
+
+
+def load_backfill_state(state_file: Optional[Path] = None) -> Dict[str, Any]:
+    """读取回填状态（游标、累计计数、运行历史、索引信息）"""
+    path = state_file or _STATE_FILE
+    if not path.exists():
+        return {"cursor": 0, "total_embedded": 0, "total_failed": 0, "history": [], "index": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"⚠️ 读取向量回填状态失败，使用空状态: {e}")
+        return {"cursor": 0, "total_embedded": 0, "total_failed": 0, "history": [], "index": {}}
+
+
+def save_backfill_state(state: Dict[str, Any], state_file: Optional[Path] = None) -> None:
+    """原子写入回填状态（tmp + replace）"""
+    path = state_file or _STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, default=str)
+    tmp.replace(path)
+
+
+# ============================================================================
+# 回填流水线
+# ============================================================================
+
+
+class EmbeddingBackfillPipeline:
+    """
+    增量向量回填流水线
+
+    Example:
+        >>> pipeline = EmbeddingBackfillPipeline(get_external_db())
+        >>> pipeline.run(max_batches=10)
+        {'status': 'success', 'embedded': 640, 'failed': 0, ...}
+    """
+
+    def __init__(
+        self,
+        db,
+        embedder: Optional[BaseEmbedder] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        state_file: Optional[Path] = None,
+        migrate_model: Optional[bool] = None,
+    ):
+        """
+        Args:
+            migrate_model: 是否把其他模型生成的向量重嵌为当前模型；
+                None 时仅在显式设置了 EXTERNAL_EMBEDDING_PROVIDER 时迁移
+        """
+        self.db = db
+        self.embedder = embedder or get_embedder()
+        self.batch_size = batch_size
+        self.state_file = state_file
+        if migrate_model is None:
+            migrate_model = bool(os.getenv("EXTERNAL_EMBEDDING_PROVIDER"))
+        self.migrate_model = migrate_model
+
+    # ------------------------------------------------------------------ 查询
+
+    def _pending_filter(self):
+        """需要（重新）嵌入的项目条件"""
+        from ..models import ExternalProject as P
+
+        has_text = or_(P.description.isnot(None), P.description_zh.isnot(None), P.description_en.isnot(None))
+        conditions = [
+            P.description_vector.is_(None),
+            P.embedding_content_hash.is_(None),
+            P.embedding_model.is_(None),
+            and_(P.content_hash.isnot(None), P.embedding_content_hash != P.content_hash),
+        ]
+        if self.migrate_model:
+            return and_(has_text, or_(*conditions, P.embedding_model != self.embedder.model_id))
+        # 非迁移模式不动其他模型生成的向量（即使内容有变化），避免同一列混入不同模型的向量
+        same_model = or_(P.embedding_model.is_(None), P.embedding_model == self.embedder.model_id)
+        return and_(has_text, same_model, or_(*conditions))
+
+    def count_backlog(self) -> int:
+        """待嵌入项目数"""
+        from ..models import ExternalProject
+
+        with self.db.get_session() as session:
+            return session.query(ExternalProject.id).filter(self._pending_filter()).count()
+
+    # ------------------------------------------------------------------ 批处理
+
+    def _process_batch(self, cursor: int) -> Dict[str, Any]:
+        """处理 id > cursor 的一批待嵌入项目，返回本批统计与新游标"""
+        from ..models import ExternalProject
+        from ..models.external_projects import PGVECTOR_AVAILABLE
+
+        with self.db.get_session() as session:
+            projects = (
+                session.query(ExternalProject)
+                .filter(ExternalProject.id > cursor)
+                .filter(self._pending_filter())
+                .order_by(ExternalProject.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            if not projects:
+                return {"selected": 0, "embedded": 0, "failed": 0, "cursor": cursor}
+
+            texts = [build_embedding_text(p) for p in projects]
+            valid = [(p, t) for p, t in zip(projects, texts) if t]
+            new_cursor = projects[-1].id
+
+            try:
+                vectors = self.embedder.embed([t for _, t in valid]) if valid else []
+            except Exception as e:
+                # 整批失败：游标不前进，交给下次运行重试
+                logger.error(f"❌ 嵌入批次失败 (id>{cursor}): {e}")
+                return {
+                    "selected": len(projects),
+                    "embedded": 0,
+                    "failed": len(projects),
+                    "cursor": cursor,
+                    "error": str(e),
+                }
+
+            now = datetime.now()
+            for (project, _), vector in zip(valid, vectors):
+                fitted = fit_dimension(vector)
+                project.description_vector = fitted if PGVECTOR_AVAILABLE else json.dumps(fitted)
+                project.embedding_content_hash = compute_embedding_hash(project)
+                project.embedding_model = self.embedder.model_id
+                project.embedded_at = now
+            session.commit()
+
+            return {
+                "selected": len(projects),
+                "embedded": len(valid),
+                "failed": len(projects) - len(valid),
+                "cursor": new_cursor,
+            }
+
+    def run(self, max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        执行回填，直到积压清空、达到 max_batches 或出现批次错误
+
+        Returns:
+            本次运行统计（同时写入状态文件的 history）
+        """
+        state = load_backfill_state(self.state_file)
+        cursor = int(state.get("cursor") or 0)
+        started = time.perf_counter()
+        embedded = failed = batches = 0
+        error: Optional[str] = None
+
+        logger.info(
+            f"🚀 向量回填开始: model={self.embedder.model_id} migrate={self.migrate_model} "
+            f"cursor={cursor} batch={self.batch_size}"
+        )
+
+        while max_batches is None or batches < max_batches:
+            result = self._process_batch(cursor)
+            if result["selected"] == 0:
+                cursor = 0  # 一轮扫描完成，下次从头检查变更
+                break
+            batches += 1
+            embedded += result["embedded"]
+            failed += result["failed"]
+            if result.get("error"):
+                error = result["error"]
+                break
+            cursor = result["cursor"]
+            state["cursor"] = cursor
+            save_backfill_state(state, self.state_file)
+
+        elapsed = time.perf_counter() - started
+        run_stats = {
+            "status": "error" if error else "success",
+            "model": self.embedder.model_id,
+            "batches": batches,
+            "embedded": embedded,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_sec": round(embedded / elapsed, 2) if elapsed > 0 else 0.0,
+            "finished_at": datetime.now().isoformat(),
+        }
+        if error:
+            run_stats["error"] = error
+
+        state["cursor"] = cursor
+        state["total_embedded"] = int(state.get("total_embedded") or 0) + embedded
+        state["total_failed"] = int(state.get("total_failed") or 0) + failed
+        state["last_run"] = run_stats
+        state["history"] = ([run_stats] + list(state.get("history") or []))[:_HISTORY_LIMIT]
+        save_backfill_state(state, self.state_file)
+
+        logger.success(
+            f"✅ 向量回填结束: embedded={embedded} failed={failed} "
+            f"batches={batches} {run_stats['throughput_per_sec']}/s"
+        )
+        return run_stats
+
+
+# ============================================================================
+# 向量索引维护
+# ============================================================================
+
+
+def ensure_vector_index(db, method: Optional[str] = None, state_file: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    创建/维护 description_vector 的 ANN 索引（仅 PostgreSQL + pgvector）
+
+    - hnsw：一次创建，增量插入自动维护
+    - ivfflat：聚类中心依赖建索引时的数据分布，行数较上次建索引翻倍后重建
+    """
+    from ..models.external_projects import PGVECTOR_AVAILABLE
+
+    method = (method or os.getenv("EXTERNAL_VECTOR_INDEX") or "hnsw").lower()
+    if method not in ("hnsw", "ivfflat"):
+        raise ValueError(f"未知向量索引类型: {method}（可选 hnsw / ivfflat）")
+
+    url = str(db.engine.url)
+    if not PGVECTOR_AVAILABLE or not url.startswith("postgres"):
+        return {"status": "skipped", "reason": "需要 PostgreSQL + pgvector"}
+
+    state = load_backfill_state(state_file)
+    index_state = state.get("index") or {}
+
+    with db.engine.connect() as conn:
+        row_count = conn.execute(
+            text("SELECT count(*) FROM external_projects WHERE description_vector IS NOT NULL")
+        ).scalar()
+
+        if method == "hnsw":
+            conn.execute(text("DROP INDEX IF EXISTS idx_description_vector"))  # create_tables 建的旧 ivfflat 索引
+            conn.execute(
+                text(
+                    """
+                CREATE INDEX IF NOT EXISTS idx_description_vector_hnsw
+                ON external_projects
+                USING hnsw (description_vector vector_cosine_ops)
+                WITH (m = 16, ef_construction = 64)
+            """
+                )
+            )
+            action = "ensured"
+        else:
+            lists = recommended_ivfflat_lists(row_count)
+            built_rows = int(index_state.get("rows_at_build") or 0) if index_state.get("method") == "ivfflat" else 0
+            rebuild = built_rows == 0 or row_count >= built_rows * 2
+            if rebuild:
+                conn.execute(text("DROP INDEX IF EXISTS idx_description_vector_hnsw"))
+                conn.execute(text("DROP INDEX IF EXISTS idx_description_vector"))
+                conn.execute(
+                    text(
+                        f"""
+                    CREATE INDEX idx_description_vector
+                    ON external_projects
+                    USING ivfflat (description_vector vector_cosine_ops)
+                    WITH (lists = {lists})
+                """
+                    )
+                )
+            action = "rebuilt" if rebuild else "unchanged"
+        conn.commit()
+
+    if action != "unchanged":
+        index_state = {"method": method, "rows_at_build": row_count, "built_at": datetime.now().isoformat()}
+        if method == "ivfflat":
+            index_state["lists"] = recommended_ivfflat_lists(row_count)
+        state["index"] = index_state
+        save_backfill_state(state, state_file)
+
+    logger.info(f"✅ 向量索引 {method}: {action} (rows={row_count})")
+    return {"status": action, "method": method, "rows": row_count}
+
+
+def get_backfill_metrics(db=None, state_file: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    汇总回填指标（监控路由使用）
+
+    backlog 直接按数据库状态统计，不依赖 worker 进程内存。
+    """
+    from ..models import ExternalProject
+
+    state = load_backfill_state(state_file)
+    metrics: Dict[str, Any] = {
+        "cursor": state.get("cursor", 0),
+        "total_embedded": state.get("total_embedded", 0),
+        "total_failed": state.get("total_failed", 0),
+        "last_run": state.get("last_run"),
+        "history": state.get("history", []),
+        "index": state.get("index", {}),
+    }
+
+    runs = [r for r in metrics["history"] if r.get("elapsed_seconds")]
+    if runs:
+        total_items = sum(r.get("embedded", 0) for r in runs)
+        total_secs = sum(r["elapsed_seconds"] for r in runs)
+        metrics["avg_throughput_per_sec"] = round(total_items / total_secs, 2) if total_secs else 0.0
+
+    if db is not None:
+        with db.get_session() as session:
+            embedded = session.query(ExternalProject.id).filter(ExternalProject.description_vector.isnot(None)).count()
+            total = session.query(ExternalProject.id).count()
+            stale = (
+                session.query(ExternalProject.id)
+                .filter(ExternalProject.content_hash.isnot(None))
+                .filter(ExternalProject.embedding_content_hash.isnot(None))
+                .filter(ExternalProject.embedding_content_hash != ExternalProject.content_hash)
+                .count()
+            )
+        metrics["database"] = {
+            "total_projects": total,
+            "with_vector": embedded,
+            "missing_vector": total - embedded,
+            "stale_vector": stale,
+        }
+
+    return metrics
+
+
+__all__ = [
+    "BaseEmbedder",
+    "OpenAIEmbedder",
+    "LocalEmbedder",
+    "get_embedder",
+    "get_embedding_model_id",
+    "build_embedding_text",
+    "compute_embedding_hash",
+    "fit_dimension",
+    "recommended_ivfflat_lists",
+    "load_backfill_state",
+    "save_backfill_state",
+    "EmbeddingBackfillPipeline",
+    "ensure_vector_index",
+    "get_backfill_metrics",
+]
@@ -93,21 +93,32 @@ class SemanticSearchService:
         return results
 
     def search_by_vector(
-        self, query_vector: List[float], limit: int = 10, min_similarity: float = 0.7
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        min_similarity: float = 0.7,
+        embedding_model: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         基于向量的相似度搜索（需要pgvector）
 
+        只与同一模型生成的向量比较：不同模型的向量空间不同，混在一起的相似度没有意义。
+
         Args:
-            query_vector: 查询向量（1536维）
+            query_vector: 查询向量（低维模型按列维度补零）
             limit: 返回结果数量
             min_similarity: 最小相似度阈值
+            embedding_model: 生成 query_vector 的模型标识 provider:model（默认取当前嵌入配置）
 
         Returns:
             相似项目列表
         """
 
         try:
+            from .embedding_backfill import fit_dimension, get_embedding_model_id
+
+            embedding_model = embedding_model or get_embedding_model_id()
+
             # 使用pgvector的余弦相似度搜索
             # <=> 是pgvector的余弦距离运算符
             sql = text(
@@ -126,6 +137,7 @@ class SemanticSearchService:
                     1 - (description_vector <=> :query_vector::vector) as similarity
                 FROM external_projects
                 WHERE description_vector IS NOT NULL
+                AND embedding_model = :embedding_model
                 AND 1 - (description_vector <=> :query_vector::vector) >= :min_similarity
                 ORDER BY similarity DESC
                 LIMIT :limit
@@ -133,7 +145,13 @@ class SemanticSearchService:
             )
 
             result = self.session.execute(
-                sql, {"query_vector": str(query_vector), "min_similarity": min_similarity, "limit": limit}
+                sql,
+                {
+                    "query_vector": str(fit_dimension(query_vector)),
+                    "embedding_model": embedding_model,
+                    "min_similarity": min_similarity,
+                    "limit": limit,
+                },
             )
 
             projects = []
@@ -14,9 +14,11 @@ v7.151: 流程优化，直接路由到 questionnaire_summary（需求洞察）
 """
 
 import asyncio
+import copy
 import json
+import os
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from langgraph.store.base import BaseStore
 from langgraph.types import Command, interrupt
@@ -27,6 +29,25 @@ from ...core.workflow_flags import WorkflowFlagManager
 from ...services.capability_boundary_service import CapabilityBoundaryService, CheckType
 from ...services.core_task_decomposer import _simple_fallback_decompose, decompose_core_tasks
 from ...services.dimension_selector import DimensionSelector, RadarGapAnalyzer, select_dimensions_for_state
+from ...services.input_features import get_state_input_features, time_consumer
+from ...services.questionnaire_speculation import (
+    discard_session,
+    is_speculation_enabled,
+    resolve_speculation,
+    speculate,
+)
+
+# 推测式预生成的阶段名（见 services/questionnaire_speculation.py）
+GAP_QUESTIONS_STAGE = "gap_questions"
+# Step 1 的任务拆解不做推测，只借用取用结果的重放缓存
+CORE_TASKS_STAGE = "core_tasks"
+RADAR_DIMENSIONS_STAGE = "radar_dimensions"
+
+# 补充问题修补：任务标题重合度不低于该值、且缺失 / 已覆盖维度不变时沿用预生成的问题
+GAP_QUESTIONS_PATCH_MIN_OVERLAP = 0.5
+
+# Step 1 之后追加到任务上的能力边界标记，不影响下一步生成
+_TASK_ANNOTATION_FIELDS = ("capability_warning", "warning_reason", "suggested_transform")
 
 
 class ProgressiveQuestionnaireNode:
@@ -72,51 +93,15 @@ class ProgressiveQuestionnaireNode:
         user_input = state.get("user_input", "")
         structured_data = state.get("agent_results", {}).get("requirements_analyst", {}).get("structured_data", {})
 
-        #  v7.80.15 (P1.1): 诗意解读子流程
-        poetic_metadata = None
-        if _contains_poetic_expression(user_input):
-            logger.info(" [诗意解读] 检测到诗意/哲学表达，启动诗意解读子流程")
-            try:
-                import functools
-                from concurrent.futures import ThreadPoolExecutor
-
-                def _run_async_poetic_interpret(user_input: str):
-                    """在独立线程中运行诗意解读"""
-                    return asyncio.run(_llm_interpret_poetry(user_input))
-
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(_run_async_poetic_interpret, user_input)
-                    poetic_metadata = future.result(timeout=30)  # 30秒超时
-
-                logger.info(f" [诗意解读] 解读完成: {poetic_metadata.get('metaphor_explanation', '')[:50]}...")
-            except Exception as e:
-                logger.warning(f"️ [诗意解读] 解读失败: {e}，继续正常流程")
-                poetic_metadata = None
-
-        # 执行任务拆解
-        # v7.80.1.2: 使用 ThreadPoolExecutor 在独立线程中运行 LLM 异步调用
-        # 解决 LangGraph 异步上下文与 asyncio.run 不兼容的问题
-        try:
-            import functools
-            from concurrent.futures import ThreadPoolExecutor
-
-            def _run_async_decompose(user_input: str, structured_data: dict):
-                """在独立线程中运行异步任务拆解"""
-                return asyncio.run(decompose_core_tasks(user_input, structured_data))
-
-            logger.info(" [v7.80.1.2] 使用 ThreadPoolExecutor 执行 LLM 任务拆解")
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(_run_async_decompose, user_input, structured_data)
-                extracted_tasks = future.result(timeout=60)  # 60秒超时
-
-            if not extracted_tasks:
-                logger.warning("️ LLM 任务拆解返回空列表，使用回退策略")
-                extracted_tasks = _simple_fallback_decompose(user_input, structured_data)
-
-        except Exception as e:
-            logger.error(f" LLM 任务拆解失败: {e}")
-            logger.info("️ 使用回退策略进行关键词匹配拆解")
-            extracted_tasks = _simple_fallback_decompose(user_input, structured_data)
+        # LangGraph 从 interrupt 恢复时会重新执行本节点：拆解（LLM，temperature 0.7）按输入指纹缓存，
+        # 重放时复用首次结果，任务列表与用户确认时一致，Step 1 之后提交的预生成也不会因任务变化被取消
+        input_features = get_state_input_features(state)
+        poetic_metadata, extracted_tasks = resolve_speculation(
+            state.get("session_id", ""),
+            CORE_TASKS_STAGE,
+            {"user_input": user_input, "structured_data": structured_data},  # 输入特征由 user_input 派生
+            lambda: ProgressiveQuestionnaireNode._decompose_core_tasks(user_input, structured_data, input_features),
+        )
 
         logger.info(f" [v7.80.1] 拆解出 {len(extracted_tasks)} 个核心任务")
         for i, task in enumerate(extracted_tasks):
@@ -144,6 +129,9 @@ class ProgressiveQuestionnaireNode:
             "options": {"confirm": "确认任务列表", "skip": "跳过问卷"},
         }
 
+        # 用户确认任务期间，按拆解结果在后台预生成下一步（补充问题或雷达维度）
+        ProgressiveQuestionnaireNode._speculate_after_step1(state, extracted_tasks)
+
         logger.info(" [Step 1] 即将调用 interrupt()，等待用户输入...")
         user_response = interrupt(payload)
         logger.info(f" [Step 1] 收到用户响应: {type(user_response)}")
@@ -281,27 +269,7 @@ class ProgressiveQuestionnaireNode:
         logger.info(f" [Step 1] 确认 {len(confirmed_tasks)} 个核心任务")
 
         #  v7.80.15 (P1.2): 检测特殊场景
-        from ...services.task_completeness_analyzer import TaskCompletenessAnalyzer
-
-        analyzer = TaskCompletenessAnalyzer()
-        special_scenarios = analyzer.detect_special_scenarios(user_input, task_summary)
-
-        special_scene_metadata = None
-        if special_scenarios:
-            # 构建场景元数据
-            scene_tags = list(special_scenarios.keys())
-            matched_keywords = {}
-            for scene_id, scene_info in special_scenarios.items():
-                matched_keywords[scene_id] = scene_info.get("matched_keywords", [])
-
-            special_scene_metadata = {
-                "scene_tags": scene_tags,
-                "matched_keywords": matched_keywords,
-                "trigger_messages": {
-                    scene_id: info.get("trigger_message", "") for scene_id, info in special_scenarios.items()
-                },
-            }
-            logger.info(f" [Step 1] 识别特殊场景: {scene_tags}")
+        special_scene_metadata = ProgressiveQuestionnaireNode._detect_special_scene_metadata(user_input, task_summary)
 
         update_dict = {
             #  v7.80.1 新字段
@@ -355,399 +323,465 @@ class ProgressiveQuestionnaireNode:
             logger.info(" Step 2 已完成，跳过")
             return Command(update={"progressive_questionnaire_step": 2}, goto="progressive_step3_gap_filling")
 
-        #  v7.80.4: 动态维度选择 + 智能生成
-        #  v7.110: 集成混合策略 AdaptiveDimensionGenerator
-        import os
-
-        from ...services.adaptive_dimension_generator import AdaptiveDimensionGenerator
-        from ...services.dynamic_dimension_generator import DynamicDimensionGenerator
+        #  v7.80.4: 动态维度选择 + 智能生成（补充问题作答期间可能已在后台预生成）
+        dimensions = resolve_speculation(
+            state.get("session_id", ""),
+            RADAR_DIMENSIONS_STAGE,
+            ProgressiveQuestionnaireNode._radar_speculation_inputs(state),
+            lambda: ProgressiveQuestionnaireNode._build_radar_dimensions(state),
+        )
 
-        #  v7.80.5: 强制生成模式（用于测试/演示）
-        FORCE_GENERATE = os.getenv("FORCE_GENERATE_DIMENSIONS", "false").lower() == "true"
+        # 获取确认的核心任务
+        confirmed_task = state.get("confirmed_core_task", "")
 
-        #  v7.80.16: 动态生成开关（v7.150: 默认启用，实现真正的智能维度生成）
-        USE_DYNAMIC_GENERATION = os.getenv("USE_DYNAMIC_GENERATION", "true").lower() == "true"
+        #  v7.115: 获取用户原始输入，用于前端显示需求摘要
+        user_input = state.get("user_input", "")
+        user_input_summary = user_input[:100] + ("..." if len(user_input) > 100 else "")
 
-        #  v7.110: 智能学习开关
-        ENABLE_DIMENSION_LEARNING = os.getenv("ENABLE_DIMENSION_LEARNING", "false").lower() == "true"
+        # 构建interrupt payload
+        #  v7.146: 修正事件类型，step2_radar函数对应前端第3步（雷达图）
+        payload = {
+            "interaction_type": "progressive_questionnaire_step3",
+            "step": 3,
+            "total_steps": 3,
+            "title": "多维度偏好设置",
+            "message": "请通过拖动滑块表达您的设计偏好。每个维度代表两种不同的设计方向。",
+            "core_task": confirmed_task,
+            "dimensions": dimensions,
+            "instructions": "拖动滑块到您偏好的位置（0-100）",
+            #  v7.115: 添加用户需求信息，供前端顶部显示
+            "user_input": user_input,
+            "user_input_summary": user_input_summary,
+            "options": {"confirm": "确认偏好设置", "back": "返回修改核心任务"},
+        }
 
-        #  v7.117: 增强调试日志，排查智能维度问题
-        logger.info(f" [Step 2 环境变量] FORCE_GENERATE_DIMENSIONS={FORCE_GENERATE}")
-        logger.info(f" [Step 2 环境变量] USE_DYNAMIC_GENERATION={USE_DYNAMIC_GENERATION}")
-        logger.info(f" [Step 2 环境变量] ENABLE_DIMENSION_LEARNING={ENABLE_DIMENSION_LEARNING}")
+        logger.info(" [Step 2] 即将调用 interrupt()，等待用户输入...")
+        logger.info(f" [payload验证] dimensions类型: {type(dimensions)}, 长度: {len(dimensions)}")
+        user_response = interrupt(payload)
+        logger.info(f" [Step 2] 收到用户响应: {type(user_response)}")
 
-        #  v7.146: 定义默认维度作为降级方案
-        def _get_default_dimensions():
-            """获取静态默认维度列表（降级方案）
+        # 解析用户响应
+        dimension_values = {}
+        #  v7.87: 移除返回上一步功能
 
-            注意：v7.139+ select_dimensions_for_state 可能返回 dict（包含 dimensions/conflicts/...）。
-            这里必须保证返回值始终为 list，避免前端收到对象导致雷达图无法渲染。
-            """
-            from ...services.dimension_selector import select_dimensions_for_state
+        if isinstance(user_response, dict):
+            #  v7.87: 移除 action == "back" 处理
+            dimension_values = user_response.get("values") or user_response.get("dimension_values") or {}
+            # 如果没有values字段，尝试直接从响应中提取
+            if not dimension_values:
+                for key, value in user_response.items():
+                    if key in [d["id"] for d in dimensions] and isinstance(value, (int, float)):
+                        dimension_values[key] = int(value)
 
-            logger.info("️ [降级] 使用静态默认维度列表")
-            result = select_dimensions_for_state(state)
-            if isinstance(result, dict):
-                dims = result.get("dimensions", [])
-                if isinstance(dims, list):
-                    return dims
-                return []
-            return result
+        # 如果用户没有设置任何值，使用默认值
+        if not dimension_values:
+            logger.warning("️ 用户未设置任何维度值，使用默认值")
+            dimension_values = {d["id"]: d.get("default_value", 50) for d in dimensions}
 
-        # Step 2.1: 智能维度选择（混合策略）
-        #  v7.146: 添加异常处理和超时保护
-        existing_dimensions = []
-        try:
-            if ENABLE_DIMENSION_LEARNING:
-                logger.info(" [维度选择] 使用 AdaptiveDimensionGenerator 混合策略")
-                # 使用学习优化的混合策略生成器
-                adaptive_generator = AdaptiveDimensionGenerator()
+        logger.info(f" [Step 2] 收集到 {len(dimension_values)} 个维度值")
 
-                #  v7.117: 从 Redis 加载历史维度数据（用于学习优化）
-                historical_data = []
-                try:
-                    from concurrent.futures import ThreadPoolExecutor
+        # 分析雷达图
+        analyzer = RadarGapAnalyzer()
+        analysis = analyzer.analyze(dimension_values, dimensions)
 
-                    from ...services.redis_session_manager import RedisSessionManager
+        update_dict = {
+            "selected_radar_dimensions": dimensions,
+            "selected_dimensions": dimensions,  #  兼容 questionnaire_summary 读取
+            "radar_dimension_values": dimension_values,
+            "radar_analysis_summary": analysis,
+            "progressive_questionnaire_step": 2,
+        }
+        update_dict = WorkflowFlagManager.preserve_flags(state, update_dict)
 
-                    def _load_historical_data():
-                        """在独立线程中加载历史数据"""
-                        import asyncio
+        #  v7.146: 修正路由 - Step3(雷达图)完成后进入需求洞察
+        logger.info(" [Step 3] 雷达图维度收集完成，准备进入需求洞察")
 
-                        session_manager = RedisSessionManager()
+        # 保存雷达图分析结果
+        gap_dimensions = analysis.get("gap_dimensions", [])
+        if gap_dimensions:
+            logger.info(f"   雷达图短板维度: {gap_dimensions}")
 
-                        async def _async_load():
-                            await session_manager.connect()
-                            data = await session_manager.get_dimension_historical_data(limit=100)
-                            return data
+        # 问卷交互结束，节点不会再重放，释放本会话的预生成结果
+        discard_session(state.get("session_id", ""))
 
-                        return asyncio.run(_async_load())
+        # 直接进入需求洞察节点
+        return Command(update=update_dict, goto="questionnaire_summary")
 
-                    logger.info(" [v7.117] 正在加载历史维度数据...")
-                    with ThreadPoolExecutor(max_workers=1) as executor:
-                        future = executor.submit(_load_historical_data)
-                        historical_data = future.result(timeout=10)  # 10秒超时
+    # ==========================================================================
+    # Step 3: 密度补齐追问
+    # ==========================================================================
 
-                    logger.info(f" [历史数据] 成功加载 {len(historical_data)} 条记录")
+    @staticmethod
+    def step3_gap_filling(
+        state: ProjectAnalysisState, store: Optional[BaseStore] = None
+    ) -> Command[Literal["questionnaire_summary"]]:
+        """
+        Step 3: 核心任务信息完整性查漏补缺
 
-                except Exception as e:
-                    logger.warning(f"️ [历史数据] 加载失败: {e}，使用空列表继续")
-                    historical_data = []
+         v7.151: 路由目标从 requirements_confirmation 改为 questionnaire_summary
 
-                # 检测特殊场景
-                special_scene_metadata = state.get("special_scene_metadata")
-                special_scenes = None
-                if special_scene_metadata:
-                    special_scenes = special_scene_metadata.get("scene_tags", [])
+        v7.80.6: 从"雷达图补充"转变为"任务信息完整性检查"
+        - 分析核心任务是否包含足够信息
+        - 识别缺失的关键维度（6大维度）
+        - 生成针对性、导向性、敏感性的补充问题
 
-                result = adaptive_generator.select_for_project(
-                    project_type=state.get("project_type", "personal_residential"),
-                    user_input=state.get("user_input", ""),
-                    min_dimensions=9,
-                    max_dimensions=12,
-                    special_scenes=special_scenes,
-                    historical_data=historical_data,
-                )
+        Args:
+            state: 项目分析状态
+            store: 存储接口
 
-                #  v7.146: 兼容 v7.139 字典返回格式
-                if isinstance(result, dict):
-                    existing_dimensions = result.get("dimensions", [])
-                    logger.info(f" [AdaptiveDimGen] v7.139格式: 选择了 {len(existing_dimensions)} 个智能维度")
-                else:
-                    existing_dimensions = result
-                    logger.info(f" [AdaptiveDimGen] 选择了 {len(existing_dimensions)} 个智能维度")
-            else:
-                logger.info(" [维度选择] 使用传统 RuleEngine 规则引擎（ENABLE_DIMENSION_LEARNING=false）")
-                # 使用传统规则引擎
-                result = select_dimensions_for_state(state)
-                #  v7.146: 兼容 v7.139 字典返回格式
-                if isinstance(result, dict):
-                    existing_dimensions = result.get("dimensions", [])
-                else:
-                    existing_dimensions = result
-                logger.info(f" [RuleEngine] 选择了 {len(existing_dimensions)} 个传统维度")
-        except Exception as e:
-            #  v7.146: 维度选择失败时使用降级方案
-            logger.error(f" [维度选择失败] {type(e).__name__}: {str(e)}")
-            logger.error(f" [堆栈信息] {__import__('traceback').format_exc()}")
-            logger.warning("️ [降级策略] 使用默认维度列表继续流程")
-            existing_dimensions = _get_default_dimensions()
+        Returns:
+            Command对象，指向下一个节点
+        """
+        logger.info("=" * 80)
+        logger.info(" [v7.80.6 Step 3] 核心任务信息完整性查漏补缺")
+        logger.info("=" * 80)
 
-        logger.info(f" 已选择 {len(existing_dimensions)} 个现有维度")
+        # 检查是否已完成此步骤
+        if state.get("progressive_questionnaire_completed"):
+            logger.info(" 问卷已完成，跳过 Step 3")
+            return Command(update={"progressive_questionnaire_step": 3}, goto="project_director")
 
-        #  v7.150: 增强日志，追踪每个维度的来源
-        for dim in existing_dimensions[:5]:  # 只显示前5个，避免日志过长
-            source = dim.get("source", "static")
-            recommended_by_llm = dim.get("recommended_by_llm", False)
-            source_label = "LLM推荐" if recommended_by_llm else source
-            logger.info(f"    维度: {dim.get('name', dim.get('id', 'unknown'))} (来源: {source_label})")
-        if len(existing_dimensions) > 5:
-            logger.info(f"   ... 还有 {len(existing_dimensions) - 5} 个维度")
+        #  v7.80.6: 针对核心任务进行信息完整性分析
+        from ...services.task_completeness_analyzer import TaskCompletenessAnalyzer
 
-        # Step 2.2: 分析覆盖度，必要时生成新维度
+        # 获取核心任务和相关数据
+        confirmed_tasks = state.get("confirmed_core_tasks", [])
         user_input = state.get("user_input", "")
         agent_results = state.get("agent_results", {})
         requirements_result = agent_results.get("requirements_analyst", {})
         structured_data = requirements_result.get("structured_data", {})
 
-        generator = DynamicDimensionGenerator()
-        dimensions = existing_dimensions
-        generated_count = 0
+        # 执行任务完整性分析
+        analyzer = TaskCompletenessAnalyzer()
+        completeness = analyzer.analyze(confirmed_tasks, user_input, structured_data)
 
-        if FORCE_GENERATE:
-            #  强制生成模式：跳过覆盖度检查，直接生成
-            logger.info(" [动态维度] 强制生成模式已启用")
-            missing_aspects = ["用户独特需求", "项目特色要求"]
-
-            #  v7.106: 传递existing_dimensions给generator
-            structured_data_with_dims = {**structured_data, "existing_dimensions": existing_dimensions}
-
-            new_dimensions = generator.generate_dimensions(
-                user_input,
-                structured_data_with_dims,
-                missing_aspects,
-                target_count=min(2, 12 - len(existing_dimensions)),  # 强制模式生成2个
-            )
-
-            if new_dimensions:
-                dimensions = existing_dimensions + new_dimensions
-                generated_count = len(new_dimensions)
-                logger.info(f" [动态维度] 强制新增 {generated_count} 个定制维度")
-                for dim in new_dimensions:
-                    logger.info(f"   + {dim['name']}: {dim['left_label']} ← → {dim['right_label']}")
-        elif USE_DYNAMIC_GENERATION:
-            # 正常模式：基于覆盖度分析（仅在环境变量启用时）
-            logger.info(" [动态维度] LLM覆盖度分析已启用")
-            coverage = generator.analyze_coverage(user_input, structured_data, existing_dimensions)
-
-            #  v7.154: 增强日志，追踪覆盖度分析结果
-            logger.info(
-                f" [覆盖度分析] coverage_score={coverage.get('coverage_score', 'N/A')}, "
-                f"should_generate={coverage.get('should_generate', False)}, "
-                f"missing_aspects={coverage.get('missing_aspects', [])}"
-            )
-
-            #  v7.154: 增强条件判断 - 降级模式也触发生成
-            analysis_text = coverage.get("analysis", "")
-            is_fallback_mode = "降级" in analysis_text or "失败" in analysis_text
-            should_generate = coverage.get("should_generate", False)
-            has_missing_aspects = bool(coverage.get("missing_aspects"))
-
-            if (should_generate and has_missing_aspects) or is_fallback_mode:
-                logger.info(f" [动态维度] 检测到覆盖不足 (评分: {coverage.get('coverage_score', 0):.2f})")
-                logger.info(f"   缺失方面: {coverage.get('missing_aspects', [])}")
-
-                #  v7.106: 传递existing_dimensions给generator
-                structured_data_with_dims = {**structured_data, "existing_dimensions": existing_dimensions}
-
-                # 生成新维度
-                new_dimensions = generator.generate_dimensions(
-                    user_input,
-                    structured_data_with_dims,
-                    coverage.get("missing_aspects", []),
-                    target_count=min(3, 12 - len(existing_dimensions)),  # 确保总数不超过12
-                )
-
-                if new_dimensions:
-                    dimensions = existing_dimensions + new_dimensions
-                    generated_count = len(new_dimensions)
-                    logger.info(f" [动态维度] 新增 {generated_count} 个定制维度")
-                    for dim in new_dimensions:
-                        logger.info(f"   + {dim['name']}: {dim['left_label']} ← → {dim['right_label']}")
-        else:
-            #  v7.80.16: 默认禁用LLM调用，仅使用P0.3场景注入
-            logger.info(" [性能优化] 跳过LLM动态生成，使用P0.3场景注入机制")
-
-        #  v7.80.15 (P1.3): 基于特殊场景注入专用维度
-        #  v7.146: 添加异常处理，防止注入失败阻塞流程
-        special_scene_metadata = state.get("special_scene_metadata")
-        confirmed_tasks = state.get("confirmed_core_tasks", [])
-
-        if special_scene_metadata or confirmed_tasks:
-            try:
-                from ...services.dimension_selector import DimensionSelector
-
-                selector = DimensionSelector()
-
-                # 调用场景检测和维度注入
-                result = selector.detect_and_inject_specialized_dimensions(
-                    user_input=user_input,
-                    confirmed_tasks=confirmed_tasks,
-                    current_dimensions=dimensions,
-                    special_scene_metadata=special_scene_metadata,
-                )
+        logger.info(f" 任务信息完整性评分: {completeness.get('completeness_score', 0):.2f}")
+        logger.info(f"   已覆盖维度: {completeness.get('covered_dimensions', [])}")
+        logger.info(f"   缺失维度: {completeness.get('missing_dimensions', [])}")
+        logger.info(f"   关键缺失点: {completeness.get('critical_gaps', [])}")
 
-                #  v7.146: 兼容 v7.139 字典返回格式
-                if isinstance(result, dict):
-                    dimensions = result.get("dimensions", dimensions)
-                    logger.info(f" [特殊场景] v7.139格式: 维度注入完成，最终 {len(dimensions)} 个维度")
-                else:
-                    dimensions = result
-                    logger.info(f" [特殊场景] 维度注入完成: 最终 {len(dimensions)} 个维度")
-            except Exception as e:
-                #  v7.146: 注入失败时保留当前维度
-                logger.error(f" [特殊场景注入失败] {type(e).__name__}: {str(e)}")
-                logger.warning(f"️ [降级] 保留当前维度列表: {len(dimensions)} 个维度")
+        # 判断是否需要补充问题
+        critical_gaps = completeness.get("critical_gaps", [])
+        if not critical_gaps:
+            logger.info(" 任务信息完整，无需补充，跳过问题生成，直接进入雷达图")
+            update_dict = {
+                "progressive_questionnaire_completed": False,  # 还未完全完成，需要进行雷达图
+                "progressive_questionnaire_step": 2,
+                "task_completeness_analysis": completeness,  # 保存分析结果
+                "gap_filling_answers": {},  # 空答案
+            }
+            update_dict = WorkflowFlagManager.preserve_flags(state, update_dict)
+            #  v7.146: 即使无需补充，也要进入雷达图环节
+            return Command(update=update_dict, goto="progressive_step2_radar")
 
-        logger.info(f" 最终维度数量: {len(dimensions)} ({len(existing_dimensions)} 现有 + {generated_count} 动态生成)")
+        #  v7.107: 启用LLM智能生成补充问题（Step 1 确认期间可能已在后台预生成）
+        existing_info_summary = ProgressiveQuestionnaireNode._build_existing_info_summary(structured_data)
+        gap_inputs = ProgressiveQuestionnaireNode._gap_speculation_inputs(
+            user_input, confirmed_tasks, completeness, existing_info_summary
+        )
+        questions = resolve_speculation(
+            state.get("session_id", ""),
+            GAP_QUESTIONS_STAGE,
+            gap_inputs,
+            lambda: ProgressiveQuestionnaireNode._build_gap_questions(
+                user_input, confirmed_tasks, completeness, existing_info_summary
+            ),
+            patch=lambda speculated_inputs, speculated_questions: ProgressiveQuestionnaireNode._patch_gap_questions(
+                speculated_inputs, speculated_questions, gap_inputs
+            ),
+        )
 
-        # 获取确认的核心任务
+        # 获取上下文信息
         confirmed_task = state.get("confirmed_core_task", "")
+        task_summary = ProgressiveQuestionnaireNode._build_task_summary(confirmed_tasks)
 
         #  v7.115: 获取用户原始输入，用于前端显示需求摘要
         user_input = state.get("user_input", "")
         user_input_summary = user_input[:100] + ("..." if len(user_input) > 100 else "")
 
-        #  v7.146: 确保 dimensions 是列表格式
-        if not isinstance(dimensions, list):
-            logger.error(f" [payload构建] dimensions 不是列表，类型: {type(dimensions)}, 使用降级维度")
-            dimensions = _get_default_dimensions()
-
-            #  v7.146.1: 降级后再次校验，强制解包 v7.139 dict 格式
-            if isinstance(dimensions, dict):
-                logger.warning(f"️ [降级后] dimensions 仍为 dict，强制提取 dimensions 字段")
-                dimensions = dimensions.get("dimensions", [])
-            if not isinstance(dimensions, list):
-                logger.error(f" [降级失败] dimensions 最终仍非列表: {type(dimensions)}，使用空列表")
-                dimensions = []
-
-        # 构建interrupt payload
-        #  v7.146: 修正事件类型，step2_radar函数对应前端第3步（雷达图）
+        #  v7.80.6: 构建新的 interrupt payload（任务完整性导向）
+        #  v7.146: 修正事件类型，与前端统一为 step2（信息补全环节）
         payload = {
-            "interaction_type": "progressive_questionnaire_step3",
-            "step": 3,
+            "interaction_type": "progressive_questionnaire_step2",
+            "step": 2,
             "total_steps": 3,
-            "title": "多维度偏好设置",
-            "message": "请通过拖动滑块表达您的设计偏好。每个维度代表两种不同的设计方向。",
+            "title": "补充关键信息",
+            "message": "为了更精准地理解您的项目需求，请补充以下关键信息：",
             "core_task": confirmed_task,
-            "dimensions": dimensions,
-            "instructions": "拖动滑块到您偏好的位置（0-100）",
+            "task_summary": task_summary,
+            #  任务完整性信息
+            "completeness_score": completeness.get("completeness_score", 0),
+            "covered_dimensions": completeness.get("covered_dimensions", []),
+            "missing_dimensions": completeness.get("missing_dimensions", []),
+            "critical_gaps": critical_gaps,
             #  v7.115: 添加用户需求信息，供前端顶部显示
             "user_input": user_input,
             "user_input_summary": user_input_summary,
-            "options": {"confirm": "确认偏好设置", "back": "返回修改核心任务"},
+            "questionnaire": {
+                "introduction": f"已完整度: {int(completeness.get('completeness_score', 0) * 100)}% | 缺失维度: {', '.join(completeness.get('missing_dimensions', []))}",
+                "questions": questions,
+                "note": "这些问题涉及预算、时间、交付等关键决策点，请根据实际情况作答",
+            },
+            "options": {"submit": "提交问卷", "back": "返回修改核心任务"},
         }
 
-        logger.info(" [Step 2] 即将调用 interrupt()，等待用户输入...")
-        logger.info(f" [payload验证] dimensions类型: {type(dimensions)}, 长度: {len(dimensions)}")
+        # 雷达维度只依赖 Step 1 的结果，用户作答补充问题期间在后台预生成
+        session_id = state.get("session_id", "")
+        if is_speculation_enabled() and session_id:
+            speculate(
+                session_id,
+                RADAR_DIMENSIONS_STAGE,
+                ProgressiveQuestionnaireNode._radar_speculation_inputs(state),
+                lambda: ProgressiveQuestionnaireNode._build_radar_dimensions(state),
+            )
+
+        logger.info(" [Step 3] 即将调用 interrupt()，等待用户输入...")
         user_response = interrupt(payload)
-        logger.info(f" [Step 2] 收到用户响应: {type(user_response)}")
+        logger.info(f" [Step 3] 收到用户响应: {type(user_response)}")
 
         # 解析用户响应
-        dimension_values = {}
+        answers = {}
         #  v7.87: 移除返回上一步功能
 
         if isinstance(user_response, dict):
             #  v7.87: 移除 action == "back" 处理
-            dimension_values = user_response.get("values") or user_response.get("dimension_values") or {}
-            # 如果没有values字段，尝试直接从响应中提取
-            if not dimension_values:
-                for key, value in user_response.items():
-                    if key in [d["id"] for d in dimensions] and isinstance(value, (int, float)):
-                        dimension_values[key] = int(value)
-
-        # 如果用户没有设置任何值，使用默认值
-        if not dimension_values:
-            logger.warning("️ 用户未设置任何维度值，使用默认值")
-            dimension_values = {d["id"]: d.get("default_value", 50) for d in dimensions}
+            answers = user_response.get("answers") or {}
+            # 尝试从其他格式提取答案
+            if not answers and "responses" in user_response:
+                answers = user_response["responses"]
 
-        logger.info(f" [Step 2] 收集到 {len(dimension_values)} 个维度值")
+        logger.info(f" [Step 3] 收集到 {len(answers)} 个补充答案")
 
-        # 分析雷达图
-        analyzer = RadarGapAnalyzer()
-        analysis = analyzer.analyze(dimension_values, dimensions)
+        #  v7.147: 移除此处的汇总调用，改为在雷达图完成后统一处理
+        # 原因：此时 radar_dimension_values 尚未生成，会导致 NoneType 错误
+        # questionnaire_summary = ProgressiveQuestionnaireNode._build_questionnaire_summary(state, answers)  #  删除
 
+        #  v7.80.6: 保存任务完整性分析和补充答案
         update_dict = {
-            "selected_radar_dimensions": dimensions,
-            "selected_dimensions": dimensions,  #  兼容 questionnaire_summary 读取
-            "radar_dimension_values": dimension_values,
-            "radar_analysis_summary": analysis,
-            "progressive_questionnaire_step": 2,
+            "task_completeness_analysis": completeness,  # 完整性分析
+            "task_gap_filling_questionnaire": {
+                "questions": questions,
+                "missing_dimensions": completeness.get("missing_dimensions", []),
+                "critical_gaps": critical_gaps,
+            },
+            "gap_filling_answers": answers,
+            "progressive_questionnaire_completed": False,  #  改为 False，因为还有雷达图步骤
+            "progressive_questionnaire_step": 2,  #  这是 UI 的 Step 2
+            # "questionnaire_summary": questionnaire_summary,  #  删除，改为在雷达图后生成
+            "calibration_processed": False,  #  改为 False，雷达图完成后才算完成
         }
         update_dict = WorkflowFlagManager.preserve_flags(state, update_dict)
 
-        #  v7.146: 修正路由 - Step3(雷达图)完成后进入需求洞察
-        logger.info(" [Step 3] 雷达图维度收集完成，准备进入需求洞察")
-
-        # 保存雷达图分析结果
-        gap_dimensions = analysis.get("gap_dimensions", [])
-        if gap_dimensions:
-            logger.info(f"   雷达图短板维度: {gap_dimensions}")
-
-        # 直接进入需求洞察节点
-        return Command(update=update_dict, goto="questionnaire_summary")
+        #  v7.146: 修正路由 - Step2(信息补全)完成后进入Step3(雷达图)
+        return Command(update=update_dict, goto="progressive_step2_radar")
 
     # ==========================================================================
-    # Step 3: 密度补齐追问
+    # 辅助方法
     # ==========================================================================
 
     @staticmethod
-    def step3_gap_filling(
-        state: ProjectAnalysisState, store: Optional[BaseStore] = None
-    ) -> Command[Literal["questionnaire_summary"]]:
-        """
-        Step 3: 核心任务信息完整性查漏补缺
-
-         v7.151: 路由目标从 requirements_confirmation 改为 questionnaire_summary
+    def _detect_special_scene_metadata(user_input: str, task_summary: str) -> Optional[Dict[str, Any]]:
+        """v7.80.15 (P1.2): 检测特殊场景，构建 special_scene_metadata（无特殊场景时返回 None）"""
+        from ...services.task_completeness_analyzer import TaskCompletenessAnalyzer
 
-        v7.80.6: 从"雷达图补充"转变为"任务信息完整性检查"
-        - 分析核心任务是否包含足够信息
-        - 识别缺失的关键维度（6大维度）
-        - 生成针对性、导向性、敏感性的补充问题
+        analyzer = TaskCompletenessAnalyzer()
+        special_scenarios = analyzer.detect_special_scenarios(user_input, task_summary)
+        if not special_scenarios:
+            return None
 
-        Args:
-            state: 项目分析状态
-            store: 存储接口
+        # 构建场景元数据
+        scene_tags = list(special_scenarios.keys())
+        matched_keywords = {}
+        for scene_id, scene_info in special_scenarios.items():
+            matched_keywords[scene_id] = scene_info.get("matched_keywords", [])
 
-        Returns:
-            Command对象，指向下一个节点
-        """
-        logger.info("=" * 80)
-        logger.info(" [v7.80.6 Step 3] 核心任务信息完整性查漏补缺")
-        logger.info("=" * 80)
+        logger.info(f" [Step 1] 识别特殊场景: {scene_tags}")
+        return {
+            "scene_tags": scene_tags,
+            "matched_keywords": matched_keywords,
+            "trigger_messages": {
+                scene_id: info.get("trigger_message", "") for scene_id, info in special_scenarios.items()
+            },
+        }
 
-        # 检查是否已完成此步骤
-        if state.get("progressive_questionnaire_completed"):
-            logger.info(" 问卷已完成，跳过 Step 3")
-            return Command(update={"progressive_questionnaire_step": 3}, goto="project_director")
+    @staticmethod
+    def _decompose_core_tasks(
+        user_input: str, structured_data: Dict[str, Any], input_features: Any
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Step 1 的 LLM 部分：诗意解读（按需）与核心任务拆解，返回 (poetic_metadata, extracted_tasks)"""
+        #  v7.80.15 (P1.1): 诗意解读子流程
+        poetic_metadata = None
+        if _contains_poetic_expression(user_input):
+            logger.info(" [诗意解读] 检测到诗意/哲学表达，启动诗意解读子流程")
+            try:
+                import functools
+                from concurrent.futures import ThreadPoolExecutor
 
-        #  v7.80.6: 针对核心任务进行信息完整性分析
-        from ...services.task_completeness_analyzer import TaskCompletenessAnalyzer
+                def _run_async_poetic_interpret(user_input: str):
+                    """在独立线程中运行诗意解读"""
+                    return asyncio.run(_llm_interpret_poetry(user_input))
 
-        # 获取核心任务和相关数据
-        confirmed_tasks = state.get("confirmed_core_tasks", [])
-        user_input = state.get("user_input", "")
-        agent_results = state.get("agent_results", {})
-        requirements_result = agent_results.get("requirements_analyst", {})
-        structured_data = requirements_result.get("structured_data", {})
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    future = executor.submit(_run_async_poetic_interpret, user_input)
+                    poetic_metadata = future.result(timeout=30)  # 30秒超时
 
-        # 执行任务完整性分析
-        analyzer = TaskCompletenessAnalyzer()
-        completeness = analyzer.analyze(confirmed_tasks, user_input, structured_data)
+                logger.info(f" [诗意解读] 解读完成: {poetic_metadata.get('metaphor_explanation', '')[:50]}...")
+            except Exception as e:
+                logger.warning(f"️ [诗意解读] 解读失败: {e}，继续正常流程")
+                poetic_metadata = None
 
-        logger.info(f" 任务信息完整性评分: {completeness.get('completeness_score', 0):.2f}")
-        logger.info(f"   已覆盖维度: {completeness.get('covered_dimensions', [])}")
-        logger.info(f"   缺失维度: {completeness.get('missing_dimensions', [])}")
-        logger.info(f"   关键缺失点: {completeness.get('critical_gaps', [])}")
+        # 执行任务拆解
+        # v7.80.1.2: 使用 ThreadPoolExecutor 在独立线程中运行 LLM 异步调用
+        # 解决 LangGraph 异步上下文与 asyncio.run 不兼容的问题
+        try:
+            import functools
+            from concurrent.futures import ThreadPoolExecutor
 
-        # 判断是否需要补充问题
-        critical_gaps = completeness.get("critical_gaps", [])
-        if not critical_gaps:
-            logger.info(" 任务信息完整，无需补充，跳过问题生成，直接进入雷达图")
-            update_dict = {
-                "progressive_questionnaire_completed": False,  # 还未完全完成，需要进行雷达图
-                "progressive_questionnaire_step": 2,
-                "task_completeness_analysis": completeness,  # 保存分析结果
-                "gap_filling_answers": {},  # 空答案
+            def _run_async_decompose(user_input: str, structured_data: dict):
+                """在独立线程中运行异步任务拆解"""
+                return asyncio.run(decompose_core_tasks(user_input, structured_data, input_features=input_features))
+
+            logger.info(" [v7.80.1.2] 使用 ThreadPoolExecutor 执行 LLM 任务拆解")
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(_run_async_decompose, user_input, structured_data)
+                extracted_tasks = future.result(timeout=60)  # 60秒超时
+
+            if not extracted_tasks:
+                logger.warning("️ LLM 任务拆解返回空列表，使用回退策略")
+                extracted_tasks = _simple_fallback_decompose(user_input, structured_data)
+
+        except Exception as e:
+            logger.error(f" LLM 任务拆解失败: {e}")
+            logger.info("️ 使用回退策略进行关键词匹配拆解")
+            extracted_tasks = _simple_fallback_decompose(user_input, structured_data)
+
+        return poetic_metadata, extracted_tasks
+
+    @staticmethod
+    def _speculate_after_step1(state: ProjectAnalysisState, extracted_tasks: List[Dict[str, Any]]) -> None:
+        """
+        按「用户确认拆解出的任务」预测 Step 1 之后的状态，后台预生成下一步内容
+
+        完整性分析是关键词规则（毫秒级），在此同步判断下一步走补充问题还是直接进入雷达图。
+        """
+        session_id = state.get("session_id", "")
+        if not is_speculation_enabled() or not session_id or not extracted_tasks:
+            return
+
+        try:
+            from ...services.task_completeness_analyzer import TaskCompletenessAnalyzer
+
+            predicted_tasks = copy.deepcopy(extracted_tasks)
+            user_input = state.get("user_input", "")
+            structured_data = state.get("agent_results", {}).get("requirements_analyst", {}).get("structured_data", {})
+            completeness = TaskCompletenessAnalyzer().analyze(predicted_tasks, user_input, structured_data)
+
+            if completeness.get("critical_gaps"):
+                existing_info_summary = ProgressiveQuestionnaireNode._build_existing_info_summary(structured_data)
+                speculate(
+                    session_id,
+                    GAP_QUESTIONS_STAGE,
+                    ProgressiveQuestionnaireNode._gap_speculation_inputs(
+                        user_input, predicted_tasks, completeness, existing_info_summary
+                    ),
+                    lambda: ProgressiveQuestionnaireNode._build_gap_questions(
+                        user_input, predicted_tasks, completeness, existing_info_summary
+                    ),
+                )
+                return
+
+            task_summary = ProgressiveQuestionnaireNode._build_task_summary(predicted_tasks)
+            predicted_state = {
+                **state,
+                "confirmed_core_tasks": predicted_tasks,
+                "special_scene_metadata": ProgressiveQuestionnaireNode._detect_special_scene_metadata(
+                    user_input, task_summary
+                ),
             }
-            update_dict = WorkflowFlagManager.preserve_flags(state, update_dict)
-            #  v7.146: 即使无需补充，也要进入雷达图环节
-            return Command(update=update_dict, goto="progressive_step2_radar")
+            speculate(
+                session_id,
+                RADAR_DIMENSIONS_STAGE,
+                ProgressiveQuestionnaireNode._radar_speculation_inputs(predicted_state),
+                lambda: ProgressiveQuestionnaireNode._build_radar_dimensions(predicted_state),
+            )
+        except Exception as e:
+            logger.warning(f"️ [推测生成] Step 1 预生成提交失败: {e}")
 
-        #  v7.107: 启用LLM智能生成补充问题
-        import os
+    @staticmethod
+    def _gap_speculation_inputs(
+        user_input: str,
+        confirmed_tasks: List[Dict[str, Any]],
+        completeness: Dict[str, Any],
+        existing_info_summary: str,
+    ) -> Dict[str, Any]:
+        """补充问题生成实际依赖的输入（LLM prompt 只使用前 5 个任务的标题与描述）"""
+        return {
+            "user_input": user_input,
+            "tasks": [[task.get("title", ""), task.get("description", "")] for task in confirmed_tasks[:5]],
+            "missing_dimensions": completeness.get("missing_dimensions", []),
+            "covered_dimensions": completeness.get("covered_dimensions", []),
+            "critical_gaps": [gap.get("dimension") for gap in completeness.get("critical_gaps", [])],
+            "completeness_score": round(completeness.get("completeness_score", 0), 2),
+            "existing_info_summary": existing_info_summary,
+            "use_llm": os.getenv("USE_LLM_GAP_QUESTIONS", "true").lower() == "true",
+        }
 
-        existing_info_summary = ProgressiveQuestionnaireNode._build_existing_info_summary(structured_data)
+    @staticmethod
+    def _patch_gap_questions(
+        speculated_inputs: Dict[str, Any], questions: List[Dict[str, Any]], actual_inputs: Dict[str, Any]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        用户调整了任务时判断预生成的补充问题能否沿用
+
+        补充问题针对缺失维度提问：缺失 / 已覆盖维度与用户输入都不变，且任务标题大部分重合时，
+        问题仍然适用，直接沿用；否则返回 None 重新生成。
+        """
+        for field in ("user_input", "missing_dimensions", "covered_dimensions", "critical_gaps", "use_llm"):
+            if speculated_inputs.get(field) != actual_inputs.get(field):
+                return None
+
+        speculated_titles = {title for title, _ in speculated_inputs.get("tasks", []) if title}
+        actual_titles = {title for title, _ in actual_inputs.get("tasks", []) if title}
+        union = speculated_titles | actual_titles
+        overlap = len(speculated_titles & actual_titles) / len(union) if union else 1.0
+        if overlap < GAP_QUESTIONS_PATCH_MIN_OVERLAP:
+            return None
+        return questions
+
+    @staticmethod
+    def _radar_speculation_inputs(state: ProjectAnalysisState) -> Dict[str, Any]:
+        """雷达维度生成依赖的输入（Step 1 追加的能力边界标记除外）"""
+        tasks = [
+            {k: v for k, v in task.items() if k not in _TASK_ANNOTATION_FIELDS}
+            for task in state.get("confirmed_core_tasks", [])
+            if isinstance(task, dict)
+        ]
+        structured_data = state.get("agent_results", {}).get("requirements_analyst", {}).get("structured_data", {})
+        return {
+            "user_input": state.get("user_input", ""),
+            "project_type": state.get("project_type"),
+            "structured_data": structured_data,
+            "tasks": tasks,
+            "special_scene_metadata": state.get("special_scene_metadata"),
+            "flags": [
+                os.getenv("FORCE_GENERATE_DIMENSIONS", "false"),
+                os.getenv("USE_DYNAMIC_GENERATION", "true"),
+                os.getenv("ENABLE_DIMENSION_LEARNING", "false"),
+            ],
+        }
+
+    @staticmethod
+    def _build_gap_questions(
+        user_input: str,
+        confirmed_tasks: List[Dict[str, Any]],
+        completeness: Dict[str, Any],
+        existing_info_summary: str,
+    ) -> List[Dict[str, Any]]:
+        """生成补充问题（v7.107 LLM 生成，失败时回退硬编码模板），必答 / 高优先级问题排在前面"""
+        from ...services.task_completeness_analyzer import TaskCompletenessAnalyzer
+
+        analyzer = TaskCompletenessAnalyzer()
+        critical_gaps = completeness.get("critical_gaps", [])
 
         # 环境变量开关控制LLM生成（默认启用）
         enable_llm_generation = os.getenv("USE_LLM_GAP_QUESTIONS", "true").lower() == "true"
@@ -821,83 +855,265 @@ class ProgressiveQuestionnaireNode:
             f" [v7.80.17] 问题排序完成：{len([q for q in questions if q.get('is_required')])}个必答，{len([q for q in questions if not q.get('is_required')])}个选答"
         )
 
-        # 获取上下文信息
-        confirmed_task = state.get("confirmed_core_task", "")
-        task_summary = ProgressiveQuestionnaireNode._build_task_summary(confirmed_tasks)
+        return questions
 
-        #  v7.115: 获取用户原始输入，用于前端显示需求摘要
+    @staticmethod
+    def _build_radar_dimensions(state: ProjectAnalysisState) -> List[Dict[str, Any]]:
+        """
+        生成 Step 2 雷达图维度：智能维度选择 → 覆盖度分析 / 动态生成 → 特殊场景注入
+
+        只依赖 Step 1 的结果（不依赖补充问题的答案），可在用户作答补充问题时预生成。
+        """
+        #  v7.110: 集成混合策略 AdaptiveDimensionGenerator
+        from ...services.adaptive_dimension_generator import AdaptiveDimensionGenerator
+        from ...services.dynamic_dimension_generator import DynamicDimensionGenerator
+
+        #  v7.80.5: 强制生成模式（用于测试/演示）
+        FORCE_GENERATE = os.getenv("FORCE_GENERATE_DIMENSIONS", "false").lower() == "true"
+
+        #  v7.80.16: 动态生成开关（v7.150: 默认启用，实现真正的智能维度生成）
+        USE_DYNAMIC_GENERATION = os.getenv("USE_DYNAMIC_GENERATION", "true").lower() == "true"
+
+        #  v7.110: 智能学习开关
+        ENABLE_DIMENSION_LEARNING = os.getenv("ENABLE_DIMENSION_LEARNING", "false").lower() == "true"
+
+        #  v7.117: 增强调试日志，排查智能维度问题
+        logger.info(f" [Step 2 环境变量] FORCE_GENERATE_DIMENSIONS={FORCE_GENERATE}")
+        logger.info(f" [Step 2 环境变量] USE_DYNAMIC_GENERATION={USE_DYNAMIC_GENERATION}")
+        logger.info(f" [Step 2 环境变量] ENABLE_DIMENSION_LEARNING={ENABLE_DIMENSION_LEARNING}")
+
+        #  v7.146: 定义默认维度作为降级方案
+        def _get_default_dimensions():
+            """获取静态默认维度列表（降级方案）
+
+            注意：v7.139+ select_dimensions_for_state 可能返回 dict（包含 dimensions/conflicts/...）。
+            这里必须保证返回值始终为 list，避免前端收到对象导致雷达图无法渲染。
+            """
+            from ...services.dimension_selector import select_dimensions_for_state
+
+            logger.info("️ [降级] 使用静态默认维度列表")
+            result = select_dimensions_for_state(state)
+            if isinstance(result, dict):
+                dims = result.get("dimensions", [])
+                if isinstance(dims, list):
+                    return dims
+                return []
+            return result
+
+        # Step 2.1: 智能维度选择（混合策略）
+        #  v7.146: 添加异常处理和超时保护
+        existing_dimensions = []
+        try:
+            if ENABLE_DIMENSION_LEARNING:
+                logger.info(" [维度选择] 使用 AdaptiveDimensionGenerator 混合策略")
+                # 使用学习优化的混合策略生成器
+                adaptive_generator = AdaptiveDimensionGenerator()
+
+                #  v7.117: 从 Redis 加载历史维度数据（用于学习优化）
+                historical_data = []
+                try:
+                    from concurrent.futures import ThreadPoolExecutor
+
+                    from ...services.redis_session_manager import RedisSessionManager
+
+                    def _load_historical_data():
+                        """在独立线程中加载历史数据"""
+                        import asyncio
+
+                        session_manager = RedisSessionManager()
+
+                        async def _async_load():
+                            await session_manager.connect()
+                            data = await session_manager.get_dimension_historical_data(limit=100)
+                            return data
+
+                        return asyncio.run(_async_load())
+
+                    logger.info(" [v7.117] 正在加载历史维度数据...")
+                    with ThreadPoolExecutor(max_workers=1) as executor:
+                        future = executor.submit(_load_historical_data)
+                        historical_data = future.result(timeout=10)  # 10秒超时
+
+                    logger.info(f" [历史数据] 成功加载 {len(historical_data)} 条记录")
+
+                except Exception as e:
+                    logger.warning(f"️ [历史数据] 加载失败: {e}，使用空列表继续")
+                    historical_data = []
+
+                # 检测特殊场景
+                special_scene_metadata = state.get("special_scene_metadata")
+                special_scenes = None
+                if special_scene_metadata:
+                    special_scenes = special_scene_metadata.get("scene_tags", [])
+
+                input_features = get_state_input_features(state)
+                with time_consumer("dimension_selector", input_features):
+                    result = adaptive_generator.select_for_project(
+                        project_type=state.get("project_type", "personal_residential"),
+                        user_input=state.get("user_input", ""),
+                        min_dimensions=9,
+                        max_dimensions=12,
+                        special_scenes=special_scenes,
+                        historical_data=historical_data,
+                        input_features=input_features,
+                    )
+
+                #  v7.146: 兼容 v7.139 字典返回格式
+                if isinstance(result, dict):
+                    existing_dimensions = result.get("dimensions", [])
+                    logger.info(f" [AdaptiveDimGen] v7.139格式: 选择了 {len(existing_dimensions)} 个智能维度")
+                else:
+                    existing_dimensions = result
+                    logger.info(f" [AdaptiveDimGen] 选择了 {len(existing_dimensions)} 个智能维度")
+            else:
+                logger.info(" [维度选择] 使用传统 RuleEngine 规则引擎（ENABLE_DIMENSION_LEARNING=false）")
+                # 使用传统规则引擎
+                result = select_dimensions_for_state(state)
+                #  v7.146: 兼容 v7.139 字典返回格式
+                if isinstance(result, dict):
+                    existing_dimensions = result.get("dimensions", [])
+                else:
+                    existing_dimensions = result
+                logger.info(f" [RuleEngine] 选择了 {len(existing_dimensions)} 个传统维度")
+        except Exception as e:
+            #  v7.146: 维度选择失败时使用降级方案
+            logger.error(f" [维度选择失败] {type(e).__name__}: {str(e)}")
+            logger.error(f" [堆栈信息] {__import__('traceback').format_exc()}")
+            logger.warning("️ [降级策略] 使用默认维度列表继续流程")
+            existing_dimensions = _get_default_dimensions()
+
+        logger.info(f" 已选择 {len(existing_dimensions)} 个现有维度")
+
+        #  v7.150: 增强日志，追踪每个维度的来源
+        for dim in existing_dimensions[:5]:  # 只显示前5个，避免日志过长
+            source = dim.get("source", "static")
+            recommended_by_llm = dim.get("recommended_by_llm", False)
+            source_label = "LLM推荐" if recommended_by_llm else source
+            logger.info(f"    维度: {dim.get('name', dim.get('id', 'unknown'))} (来源: {source_label})")
+        if len(existing_dimensions) > 5:
+            logger.info(f"   ... 还有 {len(existing_dimensions) - 5} 个维度")
+
+        # Step 2.2: 分析覆盖度，必要时生成新维度
         user_input = state.get("user_input", "")
-        user_input_summary = user_input[:100] + ("..." if len(user_input) > 100 else "")
+        agent_results = state.get("agent_results", {})
+        requirements_result = agent_results.get("requirements_analyst", {})
+        structured_data = requirements_result.get("structured_data", {})
 
-        #  v7.80.6: 构建新的 interrupt payload（任务完整性导向）
-        #  v7.146: 修正事件类型，与前端统一为 step2（信息补全环节）
-        payload = {
-            "interaction_type": "progressive_questionnaire_step2",
-            "step": 2,
-            "total_steps": 3,
-            "title": "补充关键信息",
-            "message": "为了更精准地理解您的项目需求，请补充以下关键信息：",
-            "core_task": confirmed_task,
-            "task_summary": task_summary,
-            #  任务完整性信息
-            "completeness_score": completeness.get("completeness_score", 0),
-            "covered_dimensions": completeness.get("covered_dimensions", []),
-            "missing_dimensions": completeness.get("missing_dimensions", []),
-            "critical_gaps": critical_gaps,
-            #  v7.115: 添加用户需求信息，供前端顶部显示
-            "user_input": user_input,
-            "user_input_summary": user_input_summary,
-            "questionnaire": {
-                "introduction": f"已完整度: {int(completeness.get('completeness_score', 0) * 100)}% | 缺失维度: {', '.join(completeness.get('missing_dimensions', []))}",
-                "questions": questions,
-                "note": "这些问题涉及预算、时间、交付等关键决策点，请根据实际情况作答",
-            },
-            "options": {"submit": "提交问卷", "back": "返回修改核心任务"},
-        }
+        generator = DynamicDimensionGenerator()
+        dimensions = existing_dimensions
+        generated_count = 0
 
-        logger.info(" [Step 3] 即将调用 interrupt()，等待用户输入...")
-        user_response = interrupt(payload)
-        logger.info(f" [Step 3] 收到用户响应: {type(user_response)}")
+        if FORCE_GENERATE:
+            #  强制生成模式：跳过覆盖度检查，直接生成
+            logger.info(" [动态维度] 强制生成模式已启用")
+            missing_aspects = ["用户独特需求", "项目特色要求"]
 
-        # 解析用户响应
-        answers = {}
-        #  v7.87: 移除返回上一步功能
+            #  v7.106: 传递existing_dimensions给generator
+            structured_data_with_dims = {**structured_data, "existing_dimensions": existing_dimensions}
 
-        if isinstance(user_response, dict):
-            #  v7.87: 移除 action == "back" 处理
-            answers = user_response.get("answers") or {}
-            # 尝试从其他格式提取答案
-            if not answers and "responses" in user_response:
-                answers = user_response["responses"]
+            new_dimensions = generator.generate_dimensions(
+                user_input,
+                structured_data_with_dims,
+                missing_aspects,
+                target_count=min(2, 12 - len(existing_dimensions)),  # 强制模式生成2个
+            )
 
-        logger.info(f" [Step 3] 收集到 {len(answers)} 个补充答案")
+            if new_dimensions:
+                dimensions = existing_dimensions + new_dimensions
+                generated_count = len(new_dimensions)
+                logger.info(f" [动态维度] 强制新增 {generated_count} 个定制维度")
+                for dim in new_dimensions:
+                    logger.info(f"   + {dim['name']}: {dim['left_label']} ← → {dim['right_label']}")
+        elif USE_DYNAMIC_GENERATION:
+            # 正常模式：基于覆盖度分析（仅在环境变量启用时）
+            logger.info(" [动态维度] LLM覆盖度分析已启用")
+            coverage = generator.analyze_coverage(user_input, structured_data, existing_dimensions)
 
-        #  v7.147: 移除此处的汇总调用，改为在雷达图完成后统一处理
-        # 原因：此时 radar_dimension_values 尚未生成，会导致 NoneType 错误
-        # questionnaire_summary = ProgressiveQuestionnaireNode._build_questionnaire_summary(state, answers)  #  删除
+            #  v7.154: 增强日志，追踪覆盖度分析结果
+            logger.info(
+                f" [覆盖度分析] coverage_score={coverage.get('coverage_score', 'N/A')}, "
+                f"should_generate={coverage.get('should_generate', False)}, "
+                f"missing_aspects={coverage.get('missing_aspects', [])}"
+            )
 
-        #  v7.80.6: 保存任务完整性分析和补充答案
-        update_dict = {
-            "task_completeness_analysis": completeness,  # 完整性分析
-            "task_gap_filling_questionnaire": {
-                "questions": questions,
-                "missing_dimensions": completeness.get("missing_dimensions", []),
-                "critical_gaps": critical_gaps,
-            },
-            "gap_filling_answers": answers,
-            "progressive_questionnaire_completed": False,  #  改为 False，因为还有雷达图步骤
-            "progressive_questionnaire_step": 2,  #  这是 UI 的 Step 2
-            # "questionnaire_summary": questionnaire_summary,  #  删除，改为在雷达图后生成
-            "calibration_processed": False,  #  改为 False，雷达图完成后才算完成
-        }
-        update_dict = WorkflowFlagManager.preserve_flags(state, update_dict)
+            #  v7.154: 增强条件判断 - 降级模式也触发生成
+            analysis_text = coverage.get("analysis", "")
+            is_fallback_mode = "降级" in analysis_text or "失败" in analysis_text
+            should_generate = coverage.get("should_generate", False)
+            has_missing_aspects = bool(coverage.get("missing_aspects"))
 
-        #  v7.146: 修正路由 - Step2(信息补全)完成后进入Step3(雷达图)
-        return Command(update=update_dict, goto="progressive_step2_radar")
+            if (should_generate and has_missing_aspects) or is_fallback_mode:
+                logger.info(f" [动态维度] 检测到覆盖不足 (评分: {coverage.get('coverage_score', 0):.2f})")
+                logger.info(f"   缺失方面: {coverage.get('missing_aspects', [])}")
 
-    # ==========================================================================
-    # 辅助方法
-    # ==========================================================================
+                #  v7.106: 传递existing_dimensions给generator
+                structured_data_with_dims = {**structured_data, "existing_dimensions": existing_dimensions}
+
+                # 生成新维度
+                new_dimensions = generator.generate_dimensions(
+                    user_input,
+                    structured_data_with_dims,
+                    coverage.get("missing_aspects", []),
+                    target_count=min(3, 12 - len(existing_dimensions)),  # 确保总数不超过12
+                )
+
+                if new_dimensions:
+                    dimensions = existing_dimensions + new_dimensions
+                    generated_count = len(new_dimensions)
+                    logger.info(f" [动态维度] 新增 {generated_count} 个定制维度")
+                    for dim in new_dimensions:
+                        logger.info(f"   + {dim['name']}: {dim['left_label']} ← → {dim['right_label']}")
+        else:
+            #  v7.80.16: 默认禁用LLM调用，仅使用P0.3场景注入
+            logger.info(" [性能优化] 跳过LLM动态生成，使用P0.3场景注入机制")
+
+        #  v7.80.15 (P1.3): 基于特殊场景注入专用维度
+        #  v7.146: 添加异常处理，防止注入失败阻塞流程
+        special_scene_metadata = state.get("special_scene_metadata")
+        confirmed_tasks = state.get("confirmed_core_tasks", [])
+
+        if special_scene_metadata or confirmed_tasks:
+            try:
+                from ...services.dimension_selector import DimensionSelector
+
+                selector = DimensionSelector()
+
+                # 调用场景检测和维度注入
+                result = selector.detect_and_inject_specialized_dimensions(
+                    user_input=user_input,
+                    confirmed_tasks=confirmed_tasks,
+                    current_dimensions=dimensions,
+                    special_scene_metadata=special_scene_metadata,
+                )
+
+                #  v7.146: 兼容 v7.139 字典返回格式
+                if isinstance(result, dict):
+                    dimensions = result.get("dimensions", dimensions)
+                    logger.info(f" [特殊场景] v7.139格式: 维度注入完成，最终 {len(dimensions)} 个维度")
+                else:
+                    dimensions = result
+                    logger.info(f" [特殊场景] 维度注入完成: 最终 {len(dimensions)} 个维度")
+            except Exception as e:
+                #  v7.146: 注入失败时保留当前维度
+                logger.error(f" [特殊场景注入失败] {type(e).__name__}: {str(e)}")
+                logger.warning(f"️ [降级] 保留当前维度列表: {len(dimensions)} 个维度")
+
+        logger.info(f" 最终维度数量: {len(dimensions)} ({len(existing_dimensions)} 现有 + {generated_count} 动态生成)")
+
+        #  v7.146: 确保 dimensions 是列表格式
+        if not isinstance(dimensions, list):
+            logger.error(f" [payload构建] dimensions 不是列表，类型: {type(dimensions)}, 使用降级维度")
+            dimensions = _get_default_dimensions()
+
+            #  v7.146.1: 降级后再次校验，强制解包 v7.139 dict 格式
+            if isinstance(dimensions, dict):
+                logger.warning(f"️ [降级后] dimensions 仍为 dict，强制提取 dimensions 字段")
+                dimensions = dimensions.get("dimensions", [])
+            if not isinstance(dimensions, list):
+                logger.error(f" [降级失败] dimensions 最终仍非列表: {type(dimensions)}，使用空列表")
+                dimensions = []
+
+        return dimensions
 
     @staticmethod
     def _extract_core_task(state: ProjectAnalysisState) -> str:
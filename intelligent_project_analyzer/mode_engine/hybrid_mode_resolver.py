@@ -11,12 +11,13 @@
 创建日期: 2026-02-13
 """
 
-import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
+from ..core.config_registry import load_yaml_config
+
 logger = logging.getLogger(__name__)
 
 
@@ -100,8 +101,7 @@ class HybridModeResolver:
     def _load_config(self):
         """加载配置文件"""
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                self._config_cache = yaml.safe_load(f)
+            self._config_cache = load_yaml_config(self.config_path)
 
             logger.info(f"混合模式配置加载成功: {self.config_path}")
 
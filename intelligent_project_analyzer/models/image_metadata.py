@@ -55,6 +55,16 @@ class ImageMetadata(BaseModel):
         description="文件大小（字节）"
     )
 
+    thumbnail_url: Optional[str] = Field(
+        default=None,
+        description="WebP 缩略图URL（图片 Blob 存储），如 '/image_blobs/<sha256>/w256.webp'"
+    )
+
+    content_hash: Optional[str] = Field(
+        default=None,
+        description="图片内容 sha256（图片 Blob 存储的寻址键）"
+    )
+
     created_at: str = Field(
         default_factory=lambda: datetime.now().isoformat(),
         description="创建时间（ISO 8601格式）"
@@ -34,6 +34,7 @@ from langgraph.store.base import BaseStore
 from ..agents.base import BaseAgent
 from ..core.state import AgentType, AnalysisStage, ProjectAnalysisState
 from ..core.types import AnalysisResult, ReportSection
+from ..services.execution_timeline import traced
 
 
 class PDFGeneratorAgent(BaseAgent):
@@ -274,6 +275,7 @@ class PDFGeneratorAgent(BaseAgent):
             error = self.handle_error(e, "PDF generation")
             raise error
 
+    @traced("pdf", "pdf_generator.generate_pdf_report")
     def _generate_pdf_report(self, state: ProjectAnalysisState) -> str:
         """生成PDF报告"""
         final_report = state.get("final_report", {})
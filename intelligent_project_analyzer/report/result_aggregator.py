@@ -4,10 +4,11 @@
 负责整合所有智能体的分析结果，生成最终报告结构
 """
 
+import asyncio
 import json
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
@@ -19,6 +20,8 @@ from ..agents.base import LLMAgent
 from ..core.prompt_manager import PromptManager
 from ..core.state import AgentType, AnalysisStage, ProjectAnalysisState
 from ..core.types import AnalysisResult, ReportSection
+from ..services.circuit_breaker import CircuitBreakerOpenError
+from ..services.loop_lag_monitor import track_blocking_call
 from ..utils.jtbd_parser import transform_jtbd_to_natural_language
 
 # ============================================================================
@@ -682,442 +685,531 @@ class ResultAggregatorAgent(LLMAgent):
         start_time = time.time()
 
         try:
-            logger.info(f"Starting result aggregation for session {state.get('session_id')}")
+            structured_llm, messages, call_options = self._prepare_structured_call(state)
+            result = self._invoke_structured_with_retry(structured_llm, messages, state, call_options)
+            return self._build_aggregation_result(result, state, start_time)
 
-            #  Phase 1.4: 发送初始进度更新
-            self._update_progress(state, "准备整合专家分析结果", 0.0)
+        except Exception as e:
+            error = self.handle_error(e, "Result aggregation")
+            raise error
 
-            # 验证输入
-            if not self.validate_input(state):
-                raise ValueError("Invalid input: no agent results found")
+    async def aexecute(
+        self, state: ProjectAnalysisState, config: RunnableConfig, store: Optional[BaseStore] = None
+    ) -> AnalysisResult:
+        """
+        execute() 的异步版本
 
-            # 准备消息
-            self._update_progress(state, "构建聚合提示词", 0.1)
-            messages = self.prepare_messages(state)
+        LLM 调用经 acall_llm()（全局 LLM 并发 Semaphore + 提供商熔断器），重试等待使用
+        asyncio.sleep，整个 60-90 秒的聚合调用期间不阻塞事件循环。
+        """
+        start_time = time.time()
 
-            #  性能优化: 精简JSON格式提醒（structured output已包含格式要求）
-            json_format_reminder = SystemMessage(content="OUTPUT: Use structured JSON schema provided")
-            messages.insert(1, json_format_reminder)
+        try:
+            structured_llm, messages, call_options = self._prepare_structured_call(state)
+            result = await self._ainvoke_structured_with_retry(structured_llm, messages, state, call_options)
+            return self._build_aggregation_result(result, state, start_time)
 
-            # 使用 with_structured_output 强制 LLM 返回符合 Pydantic 模型的结构
-            # ️ 注意: 由于 content 字段是 Dict[str, Any]（灵活字典），无法使用 strict mode
-            # OpenAI strict mode 要求所有对象都设置 additionalProperties: false
-            # 但 Dict[str, Any] 需要 additionalProperties: true 来允许任意键
-            # 因此使用 function_calling 方法而不是 json_schema + strict
-            logger.info("Using structured output with Pydantic model (function_calling method)")
+        except Exception as e:
+            error = self.handle_error(e, "Result aggregation")
+            raise error
 
-            #  Phase 1.4: 进度更新
-            self._update_progress(state, "配置结构化输出模型", 0.2)
+    def _prepare_structured_call(self, state: ProjectAnalysisState) -> Tuple[Any, List, Dict[str, int]]:
+        """构建聚合消息与结构化输出模型，返回 (structured_llm, messages, 调用参数)"""
+        logger.info(f"Starting result aggregation for session {state.get('session_id')}")
 
-            structured_llm = self.llm_model.with_structured_output(
-                FinalReport,
-                method="function_calling",  # 使用 function_calling 以支持灵活的 Dict[str, Any]
-                include_raw=True,  # 官方推荐：处理复杂schema时避免抛出异常
-            )
-            logger.info("Successfully configured function_calling method")
+        #  Phase 1.4: 发送初始进度更新
+        self._update_progress(state, "准备整合专家分析结果", 0.0)
 
-            # 调用 LLM 并获取结构化输出
-            #  修复: 添加更详细的错误处理，捕获超时和网络错误
-            #  修复: 显式传递 max_tokens 和 request_timeout 参数
-            #  新增: 添加重试逻辑以应对不稳定的API响应
-            # 这些参数在 ChatOpenAI 初始化时设置，但为了确保它们被使用，我们在这里再次传递
-            import os
+        # 验证输入
+        if not self.validate_input(state):
+            raise ValueError("Invalid input: no agent results found")
 
-            max_tokens = int(os.getenv("MAX_TOKENS", "32000"))
-            request_timeout = int(os.getenv("LLM_TIMEOUT", "600"))
-            max_retries = int(os.getenv("MAX_RETRIES", "3"))
-            retry_delay = int(os.getenv("RETRY_DELAY", "5"))
+        # 准备消息
+        self._update_progress(state, "构建聚合提示词", 0.1)
+        messages = self.prepare_messages(state)
 
-            result = None
-            last_error = None
+        #  性能优化: 精简JSON格式提醒（structured output已包含格式要求）
+        json_format_reminder = SystemMessage(content="OUTPUT: Use structured JSON schema provided")
+        messages.insert(1, json_format_reminder)
 
-            #  Phase 1.4: 进度更新
-            agent_count = len(state.get("agent_results", {}))
-            self._update_progress(state, f"调用LLM整合{agent_count}位专家的分析结果（预计60-90秒）", 0.3)
+        # 使用 with_structured_output 强制 LLM 返回符合 Pydantic 模型的结构
+        # ️ 注意: 由于 content 字段是 Dict[str, Any]（灵活字典），无法使用 strict mode
+        # OpenAI strict mode 要求所有对象都设置 additionalProperties: false
+        # 但 Dict[str, Any] 需要 additionalProperties: true 来允许任意键
+        # 因此使用 function_calling 方法而不是 json_schema + strict
+        logger.info("Using structured output with Pydantic model (function_calling method)")
 
-            #  重试循环
-            for attempt in range(max_retries):
-                try:
-                    #  Phase 1.4: 进度更新（重试提示）
-                    if attempt > 0:
-                        self._update_progress(state, f"LLM调用重试中（第{attempt + 1}次尝试）", 0.3 + (attempt * 0.05))
+        #  Phase 1.4: 进度更新
+        self._update_progress(state, "配置结构化输出模型", 0.2)
 
-                    logger.info(
-                        f"Invoking LLM (attempt {attempt + 1}/{max_retries}) with max_tokens={max_tokens}, request_timeout={request_timeout}"
+        structured_llm = self.llm_model.with_structured_output(
+            FinalReport,
+            method="function_calling",  # 使用 function_calling 以支持灵活的 Dict[str, Any]
+            include_raw=True,  # 官方推荐：处理复杂schema时避免抛出异常
+        )
+        logger.info("Successfully configured function_calling method")
+
+        # 调用 LLM 并获取结构化输出
+        #  修复: 添加更详细的错误处理，捕获超时和网络错误
+        #  修复: 显式传递 max_tokens 和 request_timeout 参数
+        #  新增: 添加重试逻辑以应对不稳定的API响应
+        # 这些参数在 ChatOpenAI 初始化时设置，但为了确保它们被使用，我们在这里再次传递
+        import os
+
+        max_tokens = int(os.getenv("MAX_TOKENS", "32000"))
+        request_timeout = int(os.getenv("LLM_TIMEOUT", "600"))
+        max_retries = int(os.getenv("MAX_RETRIES", "3"))
+        retry_delay = int(os.getenv("RETRY_DELAY", "5"))
+
+        #  Phase 1.4: 进度更新
+        agent_count = len(state.get("agent_results", {}))
+        self._update_progress(state, f"调用LLM整合{agent_count}位专家的分析结果（预计60-90秒）", 0.3)
+
+        return (
+            structured_llm,
+            messages,
+            {
+                "max_tokens": max_tokens,
+                "request_timeout": request_timeout,
+                "max_retries": max_retries,
+                "retry_delay": retry_delay,
+            },
+        )
+
+    def _before_llm_attempt(self, state: ProjectAnalysisState, attempt: int, call_options: Dict[str, int]) -> None:
+        #  Phase 1.4: 进度更新（重试提示）
+        if attempt > 0:
+            self._update_progress(state, f"LLM调用重试中（第{attempt + 1}次尝试）", 0.3 + (attempt * 0.05))
+
+        logger.info(
+            f"Invoking LLM (attempt {attempt + 1}/{call_options['max_retries']}) with "
+            f"max_tokens={call_options['max_tokens']}, request_timeout={call_options['request_timeout']}"
+        )
+
+    def _after_llm_attempt(self, state: ProjectAnalysisState, call_started: float) -> None:
+        elapsed_time = time.time() - call_started
+        logger.info(f"LLM invocation completed in {elapsed_time:.2f}s")
+
+        #  Phase 1.4: 进度更新
+        self._update_progress(state, "LLM响应完成，正在解析结果", 0.6)
+
+    def _handle_llm_attempt_error(self, error: Exception, attempt: int, call_options: Dict[str, int]) -> None:
+        """记录失败；最后一次尝试时抛出异常，否则返回由调用方等待 retry_delay 后重试"""
+        max_retries = call_options["max_retries"]
+        if isinstance(error, json.JSONDecodeError):
+            # JSON解析错误 - 通常是响应被截断或超时
+            logger.error(f"Attempt {attempt + 1}/{max_retries} - JSON parsing failed: {error}")
+            logger.error(f"This usually indicates a timeout or incomplete response from the API")
+        else:
+            # 其他错误（网络超时、API错误等）
+            logger.error(f"Attempt {attempt + 1}/{max_retries} - LLM invocation failed: {error}")
+
+        if attempt < max_retries - 1:
+            logger.info(f"Retrying in {call_options['retry_delay']} seconds...")
+            return
+
+        logger.error(f"All {max_retries} attempts failed")
+        if isinstance(error, json.JSONDecodeError):
+            logger.info("Attempting to use fallback parsing method")
+            raise ValueError(
+                f"LLM response was incomplete or truncated after {max_retries} attempts. This may be due to timeout or network issues. Original error: {error}"
+            )
+        raise error
+
+    def _invoke_structured_with_retry(
+        self, structured_llm: Any, messages: List, state: ProjectAnalysisState, call_options: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """调用 LLM 并获取结构化输出（带重试）"""
+        result = None
+        last_error = None
+
+        #  重试循环
+        for attempt in range(call_options["max_retries"]):
+            try:
+                self._before_llm_attempt(state, attempt, call_options)
+                call_started = time.time()
+                with track_blocking_call(f"{self.name}.execute"):
+                    result = structured_llm.invoke(
+                        messages,
+                        max_tokens=call_options["max_tokens"],
+                        request_timeout=call_options["request_timeout"],
                     )
+                self._after_llm_attempt(state, call_started)
 
-                    # 记录开始时间
-                    start_time = time.time()
+                # 成功，跳出重试循环
+                break
 
-                    result = structured_llm.invoke(messages, max_tokens=max_tokens, request_timeout=request_timeout)
+            except Exception as e:
+                last_error = e
+                self._handle_llm_attempt_error(e, attempt, call_options)
+                time.sleep(call_options["retry_delay"])
 
-                    # 记录结束时间
-                    elapsed_time = time.time() - start_time
-                    logger.info(f"LLM invocation completed in {elapsed_time:.2f}s")
+        # 如果所有重试都失败了
+        if result is None:
+            raise ValueError(
+                f"LLM invocation failed after {call_options['max_retries']} attempts. Last error: {last_error}"
+            )
+        return result
 
-                    #  Phase 1.4: 进度更新
-                    self._update_progress(state, "LLM响应完成，正在解析结果", 0.6)
+    async def _ainvoke_structured_with_retry(
+        self, structured_llm: Any, messages: List, state: ProjectAnalysisState, call_options: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """_invoke_structured_with_retry() 的异步版本；熔断器打开时不再重试"""
+        result = None
+        last_error = None
 
-                    # 成功，跳出重试循环
-                    break
+        for attempt in range(call_options["max_retries"]):
+            try:
+                self._before_llm_attempt(state, attempt, call_options)
+                call_started = time.time()
+                result = await self.acall_llm(
+                    structured_llm,
+                    messages,
+                    max_tokens=call_options["max_tokens"],
+                    request_timeout=call_options["request_timeout"],
+                )
+                self._after_llm_attempt(state, call_started)
+                break
 
-                except json.JSONDecodeError as e:
-                    # JSON解析错误 - 通常是响应被截断或超时
-                    last_error = e
-                    logger.error(f"Attempt {attempt + 1}/{max_retries} - JSON parsing failed: {e}")
-                    logger.error(f"This usually indicates a timeout or incomplete response from the API")
+            except CircuitBreakerOpenError:
+                raise
 
-                    if attempt < max_retries - 1:
-                        logger.info(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                    else:
-                        logger.error(f"All {max_retries} attempts failed")
-                        logger.info("Attempting to use fallback parsing method")
-                        raise ValueError(
-                            f"LLM response was incomplete or truncated after {max_retries} attempts. This may be due to timeout or network issues. Original error: {e}"
-                        )
+            except Exception as e:
+                last_error = e
+                self._handle_llm_attempt_error(e, attempt, call_options)
+                await asyncio.sleep(call_options["retry_delay"])
 
-                except Exception as e:
-                    # 其他错误（网络超时、API错误等）
-                    last_error = e
-                    logger.error(f"Attempt {attempt + 1}/{max_retries} - LLM invocation failed: {e}")
+        if result is None:
+            raise ValueError(
+                f"LLM invocation failed after {call_options['max_retries']} attempts. Last error: {last_error}"
+            )
+        return result
 
-                    if attempt < max_retries - 1:
-                        logger.info(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                    else:
-                        logger.error(f"All {max_retries} attempts failed")
-                        raise
-
-            # 如果所有重试都失败了
-            if result is None:
-                raise ValueError(f"LLM invocation failed after {max_retries} attempts. Last error: {last_error}")
-
-            # 检查是否有解析错误
-            if result.get("parsing_error"):
-                # 解析失败，使用备用方案
-                logger.warning(f"Structured output parsing failed: {result['parsing_error']}")
-                logger.info("Falling back to manual parsing")
-
-                #  Phase 1.4: 进度更新
-                self._update_progress(state, "结构化解析失败，使用备用解析方案", 0.65)
-
-                raw_message = result["raw"]
-                final_report = self._parse_final_report(raw_message.content, state)
-
-                #  P0修复: 备用解析路径也必须提取真实数据
-                #  v7.1.4: 确保无条件覆盖，避免与主路径重复
-                logger.info("Fallback path: extracting real expert_reports from state")
-                if "expert_reports" not in final_report or not final_report["expert_reports"]:
-                    final_report["expert_reports"] = self._extract_expert_reports(state)
-                final_report["challenge_resolutions"] = self._extract_challenge_resolutions(state)
-
-                #  v7.5修复: fallback 路径也必须提取问卷数据
-                # 原因：问卷数据提取逻辑原本只在成功解析路径，导致 fallback 时前端显示空问卷
-                self._update_progress(state, "[Fallback] 提取校准问卷回答", 0.7)
-                calibration_questionnaire = state.get("calibration_questionnaire") or {}
-                questionnaire_responses_state = state.get("questionnaire_responses") or {}
-                questionnaire_summary = state.get("questionnaire_summary") or {}
-
-                if calibration_questionnaire or questionnaire_responses_state or questionnaire_summary:
-                    real_questionnaire_data = self._extract_questionnaire_data(
-                        calibration_questionnaire, questionnaire_responses_state, questionnaire_summary
+    def _build_aggregation_result(
+        self, result: Dict[str, Any], state: ProjectAnalysisState, start_time: float
+    ) -> AnalysisResult:
+        """解析结构化输出（失败时走备用解析），补全真实数据并构建最终分析结果"""
+        # 检查是否有解析错误
+        if result.get("parsing_error"):
+            # 解析失败，使用备用方案
+            logger.warning(f"Structured output parsing failed: {result['parsing_error']}")
+            logger.info("Falling back to manual parsing")
+
+            #  Phase 1.4: 进度更新
+            self._update_progress(state, "结构化解析失败，使用备用解析方案", 0.65)
+
+            raw_message = result["raw"]
+            final_report = self._parse_final_report(raw_message.content, state)
+
+            #  P0修复: 备用解析路径也必须提取真实数据
+            #  v7.1.4: 确保无条件覆盖，避免与主路径重复
+            logger.info("Fallback path: extracting real expert_reports from state")
+            if "expert_reports" not in final_report or not final_report["expert_reports"]:
+                final_report["expert_reports"] = self._extract_expert_reports(state)
+            final_report["challenge_resolutions"] = self._extract_challenge_resolutions(state)
+
+            #  v7.5修复: fallback 路径也必须提取问卷数据
+            # 原因：问卷数据提取逻辑原本只在成功解析路径，导致 fallback 时前端显示空问卷
+            self._update_progress(state, "[Fallback] 提取校准问卷回答", 0.7)
+            calibration_questionnaire = state.get("calibration_questionnaire") or {}
+            questionnaire_responses_state = state.get("questionnaire_responses") or {}
+            questionnaire_summary = state.get("questionnaire_summary") or {}
+
+            if calibration_questionnaire or questionnaire_responses_state or questionnaire_summary:
+                real_questionnaire_data = self._extract_questionnaire_data(
+                    calibration_questionnaire, questionnaire_responses_state, questionnaire_summary
+                )
+                if real_questionnaire_data and real_questionnaire_data.get("responses"):
+                    final_report["questionnaire_responses"] = real_questionnaire_data
+                    logger.info(
+                        f" [Fallback] 已提取 questionnaire_responses: {len(real_questionnaire_data['responses'])} 条回答"
                     )
-                    if real_questionnaire_data and real_questionnaire_data.get("responses"):
-                        final_report["questionnaire_responses"] = real_questionnaire_data
-                        logger.info(
-                            f" [Fallback] 已提取 questionnaire_responses: {len(real_questionnaire_data['responses'])} 条回答"
+                else:
+                    logger.debug("ℹ️ [Fallback] 无问卷数据可提取")
+
+            #  v7.5修复: fallback 路径也必须提取需求分析结果
+            # 原因：需求分析师的输出需要正确传递到前端
+            if "requirements_analysis" not in final_report or not final_report.get("requirements_analysis"):
+                structured_requirements = state.get("structured_requirements") or {}
+                if structured_requirements:
+                    final_report["requirements_analysis"] = structured_requirements
+                    logger.info(f" [Fallback] 已提取 requirements_analysis")
+
+            #  P2修复: 确保 raw_content 保存原始LLM响应
+            final_report["raw_content"] = raw_message.content
+            final_report["metadata"] = {
+                **final_report.get("metadata", {}),
+                "parsing_mode": "fallback",
+                "fallback_reason": str(result.get("parsing_error", "unknown")),
+            }
+        else:
+            # 解析成功
+            logger.info("Successfully received and parsed structured output from LLM")
+
+            #  Phase 1.4: 进度更新
+            self._update_progress(state, "结构化解析成功，正在验证数据完整性", 0.7)
+
+            final_report_pydantic = result["parsed"]
+
+            if final_report_pydantic is None:
+                logger.warning("Structured output parsing returned None, falling back to manual parsing")
+                self._update_progress(state, "解析结果为空，使用备用方案", 0.72)
+                raw_message = result.get("raw")
+                if raw_message:
+                    final_report = self._parse_final_report(raw_message.content, state)
+                    #  P0修复: 备用解析路径也必须提取真实数据
+                    #  v7.1.4: 确保无条件覆盖，避免与主路径重复
+                    logger.info("Fallback path (None parsed): extracting real expert_reports from state")
+                    if "expert_reports" not in final_report or not final_report["expert_reports"]:
+                        final_report["expert_reports"] = self._extract_expert_reports(state)
+                    final_report["challenge_resolutions"] = self._extract_challenge_resolutions(state)
+
+                    #  v7.5修复: fallback_none_parsed 路径也必须提取问卷和需求分析
+                    self._update_progress(state, "[Fallback-None] 提取校准问卷回答", 0.74)
+                    calibration_questionnaire = state.get("calibration_questionnaire") or {}
+                    questionnaire_responses_state = state.get("questionnaire_responses") or {}
+                    questionnaire_summary = state.get("questionnaire_summary") or {}
+
+                    if calibration_questionnaire or questionnaire_responses_state or questionnaire_summary:
+                        real_questionnaire_data = self._extract_questionnaire_data(
+                            calibration_questionnaire, questionnaire_responses_state, questionnaire_summary
                         )
-                    else:
-                        logger.debug("ℹ️ [Fallback] 无问卷数据可提取")
-
-                #  v7.5修复: fallback 路径也必须提取需求分析结果
-                # 原因：需求分析师的输出需要正确传递到前端
-                if "requirements_analysis" not in final_report or not final_report.get("requirements_analysis"):
-                    structured_requirements = state.get("structured_requirements") or {}
-                    if structured_requirements:
-                        final_report["requirements_analysis"] = structured_requirements
-                        logger.info(f" [Fallback] 已提取 requirements_analysis")
-
-                #  P2修复: 确保 raw_content 保存原始LLM响应
-                final_report["raw_content"] = raw_message.content
-                final_report["metadata"] = {
-                    **final_report.get("metadata", {}),
-                    "parsing_mode": "fallback",
-                    "fallback_reason": str(result.get("parsing_error", "unknown")),
-                }
-            else:
-                # 解析成功
-                logger.info("Successfully received and parsed structured output from LLM")
-
-                #  Phase 1.4: 进度更新
-                self._update_progress(state, "结构化解析成功，正在验证数据完整性", 0.7)
-
-                final_report_pydantic = result["parsed"]
-
-                if final_report_pydantic is None:
-                    logger.warning("Structured output parsing returned None, falling back to manual parsing")
-                    self._update_progress(state, "解析结果为空，使用备用方案", 0.72)
-                    raw_message = result.get("raw")
-                    if raw_message:
-                        final_report = self._parse_final_report(raw_message.content, state)
-                        #  P0修复: 备用解析路径也必须提取真实数据
-                        #  v7.1.4: 确保无条件覆盖，避免与主路径重复
-                        logger.info("Fallback path (None parsed): extracting real expert_reports from state")
-                        if "expert_reports" not in final_report or not final_report["expert_reports"]:
-                            final_report["expert_reports"] = self._extract_expert_reports(state)
-                        final_report["challenge_resolutions"] = self._extract_challenge_resolutions(state)
-
-                        #  v7.5修复: fallback_none_parsed 路径也必须提取问卷和需求分析
-                        self._update_progress(state, "[Fallback-None] 提取校准问卷回答", 0.74)
-                        calibration_questionnaire = state.get("calibration_questionnaire") or {}
-                        questionnaire_responses_state = state.get("questionnaire_responses") or {}
-                        questionnaire_summary = state.get("questionnaire_summary") or {}
-
-                        if calibration_questionnaire or questionnaire_responses_state or questionnaire_summary:
-                            real_questionnaire_data = self._extract_questionnaire_data(
-                                calibration_questionnaire, questionnaire_responses_state, questionnaire_summary
+                        if real_questionnaire_data and real_questionnaire_data.get("responses"):
+                            final_report["questionnaire_responses"] = real_questionnaire_data
+                            logger.info(
+                                f" [Fallback-None] 已提取 questionnaire_responses: {len(real_questionnaire_data['responses'])} 条回答"
                             )
-                            if real_questionnaire_data and real_questionnaire_data.get("responses"):
-                                final_report["questionnaire_responses"] = real_questionnaire_data
-                                logger.info(
-                                    f" [Fallback-None] 已提取 questionnaire_responses: {len(real_questionnaire_data['responses'])} 条回答"
+
+                    # 提取需求分析
+                    if "requirements_analysis" not in final_report or not final_report.get("requirements_analysis"):
+                        structured_requirements = state.get("structured_requirements") or {}
+                        if structured_requirements:
+                            final_report["requirements_analysis"] = structured_requirements
+                            logger.info(f" [Fallback-None] 已提取 requirements_analysis")
+
+                    #  P2修复: 确保 raw_content 保存原始LLM响应
+                    final_report["raw_content"] = raw_message.content
+                    final_report["metadata"] = {
+                        **final_report.get("metadata", {}),
+                        "parsing_mode": "fallback_none_parsed",
+                    }
+                else:
+                    raise ValueError("LLM response parsed as None and no raw message available")
+            else:
+                # 转换 Pydantic 模型为字典
+                #  Phase 0优化: 排除None和默认值以减少token消耗
+                final_report = final_report_pydantic.model_dump(exclude_none=True, exclude_defaults=True)
+
+            #  新增: 检查 sections 是否为空，如果为空则手动填充
+            if not final_report.get("sections") or len(final_report["sections"]) == 0:
+                logger.warning("LLM returned empty sections, manually populating from agent_results")
+                self._update_progress(state, "LLM未返回章节数据，正在手动填充", 0.75)
+                final_report["sections"] = self._manually_populate_sections(state)
+                logger.info(f"Manually populated {len(final_report['sections'])} sections")
+
+            #  修复v4.0: 始终用真实数据覆盖 expert_reports
+            # 原因：LLM 可能返回占位符文本如 "{...内容略...}"，必须用真实数据覆盖
+            #  v7.1.4修复: 简化逻辑，无条件覆盖以避免重复
+            logger.info("Overwriting expert_reports with actual expert content from state")
+            self._update_progress(state, "提取专家原始报告", 0.8)
+            real_expert_reports = self._extract_expert_reports(state)
+
+            # 直接覆盖，无需检查占位符（避免重复赋值）
+            final_report["expert_reports"] = real_expert_reports
+
+            logger.info(f"Extracted {len(final_report['expert_reports'])} expert reports")
+
+            #  修复：从 sections 中提取 requirements_analysis 并提升到顶层
+            # 原因：requirements_analysis 被 _manually_populate_sections 放在了 sections 数组中
+            # 但前端期望它在顶层（与 insights、deliberation_process 同级）
+            sections_list = final_report.get("sections", [])
+            if isinstance(sections_list, list):
+                for section in sections_list:
+                    if isinstance(section, dict) and section.get("section_id") == "requirements_analysis":
+                        # 提取 requirements_analysis 的 content（可能是JSON字符串）
+                        content_str = section.get("content", "")
+                        if content_str:
+                            try:
+                                # 尝试解析为字典
+                                requirements_data = (
+                                    json.loads(content_str) if isinstance(content_str, str) else content_str
                                 )
+                                final_report["requirements_analysis"] = requirements_data
+                                logger.info(" 已从 sections 提取 requirements_analysis 到顶层")
+                            except json.JSONDecodeError:
+                                logger.warning(f"️ requirements_analysis 内容不是有效 JSON: {content_str[:100]}")
+                        break
+
+            #  v3.5.1: 添加挑战解决结果
+            self._update_progress(state, "提取专家挑战解决结果", 0.85)
+            final_report["challenge_resolutions"] = self._extract_challenge_resolutions(state)
+
+            #  v4.1修复: 强制用真实问卷数据覆盖 questionnaire_responses
+            # 原因：LLM 结构化输出可能返回 None（可选字段），导致前端显示"未回答"
+            self._update_progress(state, "提取校准问卷回答", 0.87)
+            calibration_questionnaire = state.get("calibration_questionnaire") or {}
+            questionnaire_responses_state = state.get("questionnaire_responses") or {}
+            questionnaire_summary = state.get("questionnaire_summary") or {}
+
+            if calibration_questionnaire or questionnaire_responses_state or questionnaire_summary:
+                real_questionnaire_data = self._extract_questionnaire_data(
+                    calibration_questionnaire, questionnaire_responses_state, questionnaire_summary
+                )
+                if real_questionnaire_data and real_questionnaire_data.get("responses"):
+                    final_report["questionnaire_responses"] = real_questionnaire_data
+                    logger.info(f" 已覆盖 questionnaire_responses: {len(real_questionnaire_data['responses'])} 条回答")
+                else:
+                    logger.debug("ℹ️ 无问卷数据可覆盖")
 
-                        # 提取需求分析
-                        if "requirements_analysis" not in final_report or not final_report.get("requirements_analysis"):
-                            structured_requirements = state.get("structured_requirements") or {}
-                            if structured_requirements:
-                                final_report["requirements_analysis"] = structured_requirements
-                                logger.info(f" [Fallback-None] 已提取 requirements_analysis")
-
-                        #  P2修复: 确保 raw_content 保存原始LLM响应
-                        final_report["raw_content"] = raw_message.content
-                        final_report["metadata"] = {
-                            **final_report.get("metadata", {}),
-                            "parsing_mode": "fallback_none_parsed",
-                        }
+            # 添加元数据
+            self._update_progress(state, "生成报告元数据", 0.9)
+
+            #  v7.4: 增强执行元数据，提升用户体验
+            # 收集更多统计数据
+            agent_results = state.get("agent_results", {})
+            questionnaire_responses = final_report.get("questionnaire_responses", {})
+            batches = state.get("batches", [])
+            review_iterations = state.get("review_iterations", 0)
+
+            # 计算问卷回答数量
+            questionnaire_count = 0
+            if questionnaire_responses:
+                responses = questionnaire_responses.get("responses", [])
+                questionnaire_count = len([r for r in responses if r.get("answer") and r.get("answer") != "未回答"])
+
+            # 计算平均置信度
+            confidence_values = []
+            for role_id, result in agent_results.items():
+                if isinstance(result, dict):
+                    # 从任务导向专家输出中提取置信度
+                    exec_meta = result.get("execution_metadata", {})
+                    if exec_meta and isinstance(exec_meta, dict):
+                        conf = exec_meta.get("confidence")
+                        if conf is not None:
+                            confidence_values.append(float(conf))
+
+            avg_confidence = sum(confidence_values) / len(confidence_values) if confidence_values else None
+
+            # 获取复杂度级别
+            task_complexity = state.get("task_complexity", "complex")
+            complexity_display = {"simple": "简单", "medium": "中等", "complex": "复杂"}.get(task_complexity, "复杂")
+
+            # 计算分析耗时（如果有开始时间）
+            analysis_duration = None
+            created_at = state.get("created_at")
+            if created_at:
+                try:
+                    if isinstance(created_at, str):
+                        analysis_start_time = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
                     else:
-                        raise ValueError("LLM response parsed as None and no raw message available")
-                else:
-                    # 转换 Pydantic 模型为字典
-                    #  Phase 0优化: 排除None和默认值以减少token消耗
-                    final_report = final_report_pydantic.model_dump(exclude_none=True, exclude_defaults=True)
-
-                #  新增: 检查 sections 是否为空，如果为空则手动填充
-                if not final_report.get("sections") or len(final_report["sections"]) == 0:
-                    logger.warning("LLM returned empty sections, manually populating from agent_results")
-                    self._update_progress(state, "LLM未返回章节数据，正在手动填充", 0.75)
-                    final_report["sections"] = self._manually_populate_sections(state)
-                    logger.info(f"Manually populated {len(final_report['sections'])} sections")
-
-                #  修复v4.0: 始终用真实数据覆盖 expert_reports
-                # 原因：LLM 可能返回占位符文本如 "{...内容略...}"，必须用真实数据覆盖
-                #  v7.1.4修复: 简化逻辑，无条件覆盖以避免重复
-                logger.info("Overwriting expert_reports with actual expert content from state")
-                self._update_progress(state, "提取专家原始报告", 0.8)
-                real_expert_reports = self._extract_expert_reports(state)
-
-                # 直接覆盖，无需检查占位符（避免重复赋值）
-                final_report["expert_reports"] = real_expert_reports
-
-                logger.info(f"Extracted {len(final_report['expert_reports'])} expert reports")
-
-                #  修复：从 sections 中提取 requirements_analysis 并提升到顶层
-                # 原因：requirements_analysis 被 _manually_populate_sections 放在了 sections 数组中
-                # 但前端期望它在顶层（与 insights、deliberation_process 同级）
-                sections_list = final_report.get("sections", [])
-                if isinstance(sections_list, list):
-                    for section in sections_list:
-                        if isinstance(section, dict) and section.get("section_id") == "requirements_analysis":
-                            # 提取 requirements_analysis 的 content（可能是JSON字符串）
-                            content_str = section.get("content", "")
-                            if content_str:
-                                try:
-                                    # 尝试解析为字典
-                                    requirements_data = (
-                                        json.loads(content_str) if isinstance(content_str, str) else content_str
-                                    )
-                                    final_report["requirements_analysis"] = requirements_data
-                                    logger.info(" 已从 sections 提取 requirements_analysis 到顶层")
-                                except json.JSONDecodeError:
-                                    logger.warning(f"️ requirements_analysis 内容不是有效 JSON: {content_str[:100]}")
-                            break
-
-                #  v3.5.1: 添加挑战解决结果
-                self._update_progress(state, "提取专家挑战解决结果", 0.85)
-                final_report["challenge_resolutions"] = self._extract_challenge_resolutions(state)
-
-                #  v4.1修复: 强制用真实问卷数据覆盖 questionnaire_responses
-                # 原因：LLM 结构化输出可能返回 None（可选字段），导致前端显示"未回答"
-                self._update_progress(state, "提取校准问卷回答", 0.87)
-                calibration_questionnaire = state.get("calibration_questionnaire") or {}
-                questionnaire_responses_state = state.get("questionnaire_responses") or {}
-                questionnaire_summary = state.get("questionnaire_summary") or {}
-
-                if calibration_questionnaire or questionnaire_responses_state or questionnaire_summary:
-                    real_questionnaire_data = self._extract_questionnaire_data(
-                        calibration_questionnaire, questionnaire_responses_state, questionnaire_summary
-                    )
-                    if real_questionnaire_data and real_questionnaire_data.get("responses"):
-                        final_report["questionnaire_responses"] = real_questionnaire_data
-                        logger.info(f" 已覆盖 questionnaire_responses: {len(real_questionnaire_data['responses'])} 条回答")
+                        analysis_start_time = created_at
+                    duration_seconds = (datetime.now() - analysis_start_time.replace(tzinfo=None)).total_seconds()
+                    if duration_seconds < 60:
+                        analysis_duration = f"{int(duration_seconds)}秒"
+                    elif duration_seconds < 3600:
+                        minutes = int(duration_seconds // 60)
+                        seconds = int(duration_seconds % 60)
+                        analysis_duration = f"{minutes}分{seconds}秒"
                     else:
-                        logger.debug("ℹ️ 无问卷数据可覆盖")
-
-                # 添加元数据
-                self._update_progress(state, "生成报告元数据", 0.9)
-
-                #  v7.4: 增强执行元数据，提升用户体验
-                # 收集更多统计数据
-                agent_results = state.get("agent_results", {})
-                questionnaire_responses = final_report.get("questionnaire_responses", {})
-                batches = state.get("batches", [])
-                review_iterations = state.get("review_iterations", 0)
-
-                # 计算问卷回答数量
-                questionnaire_count = 0
-                if questionnaire_responses:
-                    responses = questionnaire_responses.get("responses", [])
-                    questionnaire_count = len([r for r in responses if r.get("answer") and r.get("answer") != "未回答"])
-
-                # 计算平均置信度
-                confidence_values = []
-                for role_id, result in agent_results.items():
-                    if isinstance(result, dict):
-                        # 从任务导向专家输出中提取置信度
-                        exec_meta = result.get("execution_metadata", {})
-                        if exec_meta and isinstance(exec_meta, dict):
-                            conf = exec_meta.get("confidence")
-                            if conf is not None:
-                                confidence_values.append(float(conf))
-
-                avg_confidence = sum(confidence_values) / len(confidence_values) if confidence_values else None
-
-                # 获取复杂度级别
-                task_complexity = state.get("task_complexity", "complex")
-                complexity_display = {"simple": "简单", "medium": "中等", "complex": "复杂"}.get(task_complexity, "复杂")
-
-                # 计算分析耗时（如果有开始时间）
-                analysis_duration = None
-                created_at = state.get("created_at")
-                if created_at:
-                    try:
-                        if isinstance(created_at, str):
-                            analysis_start_time = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-                        else:
-                            analysis_start_time = created_at
-                        duration_seconds = (datetime.now() - analysis_start_time.replace(tzinfo=None)).total_seconds()
-                        if duration_seconds < 60:
-                            analysis_duration = f"{int(duration_seconds)}秒"
-                        elif duration_seconds < 3600:
-                            minutes = int(duration_seconds // 60)
-                            seconds = int(duration_seconds % 60)
-                            analysis_duration = f"{minutes}分{seconds}秒"
-                        else:
-                            hours = int(duration_seconds // 3600)
-                            minutes = int((duration_seconds % 3600) // 60)
-                            analysis_duration = f"{hours}时{minutes}分"
-                    except Exception as e:
-                        logger.debug(f"计算分析耗时失败: {e}")
-
-                #  修复: 从 deliberation_process 中提取 inquiry_architecture
-                inquiry_arch = "深度优先探询"  # 默认值
-                deliberation = final_report.get("deliberation_process")
-                if deliberation:
-                    if isinstance(deliberation, dict):
-                        inquiry_arch = deliberation.get("inquiry_architecture", inquiry_arch)
-                    elif hasattr(deliberation, "inquiry_architecture"):
-                        inquiry_arch = deliberation.inquiry_architecture or inquiry_arch
-                # 也同步到顶层，方便其他地方使用
-                final_report["inquiry_architecture"] = inquiry_arch
-
-                final_report["metadata"] = {
-                    "generated_at": datetime.now().isoformat(),
-                    "session_id": state.get("session_id"),
-                    "total_agents": len(agent_results),
-                    "overall_confidence": self._calculate_overall_confidence(state),
-                    "estimated_pages": self._estimate_report_pages(final_report),
-                    "inquiry_architecture": inquiry_arch,
-                    #  v7.4 新增字段
-                    "total_batches": len(batches) if batches else 1,
-                    "complexity_level": complexity_display,
-                    "questionnaire_answered": questionnaire_count,
-                    "review_rounds": review_iterations,
-                    "confidence_average": avg_confidence,
-                    "analysis_duration": analysis_duration,
-                    # 专家分布统计
-                    "expert_distribution": self._get_expert_distribution(agent_results),
-                }
+                        hours = int(duration_seconds // 3600)
+                        minutes = int((duration_seconds % 3600) // 60)
+                        analysis_duration = f"{hours}时{minutes}分"
+                except Exception as e:
+                    logger.debug(f"计算分析耗时失败: {e}")
+
+            #  修复: 从 deliberation_process 中提取 inquiry_architecture
+            inquiry_arch = "深度优先探询"  # 默认值
+            deliberation = final_report.get("deliberation_process")
+            if deliberation:
+                if isinstance(deliberation, dict):
+                    inquiry_arch = deliberation.get("inquiry_architecture", inquiry_arch)
+                elif hasattr(deliberation, "inquiry_architecture"):
+                    inquiry_arch = deliberation.inquiry_architecture or inquiry_arch
+            # 也同步到顶层，方便其他地方使用
+            final_report["inquiry_architecture"] = inquiry_arch
 
-                # 保存原始 LLM 响应内容
-                #  P2修复: 仅在未设置时才设置，避免覆盖备用路径的值
-                if "raw_content" not in final_report or not final_report.get("raw_content"):
-                    raw_msg = result.get("raw")
-                    if raw_msg:
-                        final_report["raw_content"] = raw_msg.content
-                    else:
-                        final_report["raw_content"] = str(final_report_pydantic)
+            final_report["metadata"] = {
+                "generated_at": datetime.now().isoformat(),
+                "session_id": state.get("session_id"),
+                "total_agents": len(agent_results),
+                "overall_confidence": self._calculate_overall_confidence(state),
+                "estimated_pages": self._estimate_report_pages(final_report),
+                "inquiry_architecture": inquiry_arch,
+                #  v7.4 新增字段
+                "total_batches": len(batches) if batches else 1,
+                "complexity_level": complexity_display,
+                "questionnaire_answered": questionnaire_count,
+                "review_rounds": review_iterations,
+                "confidence_average": avg_confidence,
+                "analysis_duration": analysis_duration,
+                # 专家分布统计
+                "expert_distribution": self._get_expert_distribution(agent_results),
+            }
 
-            #  v7.0: 从责任者输出中提取交付物答案，覆盖 LLM 生成的 core_answer
-            self._update_progress(state, "提取交付物责任者答案", 0.92)
-            deliverable_metadata = state.get("deliverable_metadata") or {}
+            # 保存原始 LLM 响应内容
+            #  P2修复: 仅在未设置时才设置，避免覆盖备用路径的值
+            if "raw_content" not in final_report or not final_report.get("raw_content"):
+                raw_msg = result.get("raw")
+                if raw_msg:
+                    final_report["raw_content"] = raw_msg.content
+                else:
+                    final_report["raw_content"] = str(final_report_pydantic)
 
-            if deliverable_metadata:
-                logger.info(f" [v7.0] 检测到 {len(deliverable_metadata)} 个交付物元数据，开始提取责任者答案")
-                extracted_core_answer = self._extract_deliverable_answers(state)
+        #  v7.0: 从责任者输出中提取交付物答案，覆盖 LLM 生成的 core_answer
+        self._update_progress(state, "提取交付物责任者答案", 0.92)
+        deliverable_metadata = state.get("deliverable_metadata") or {}
 
-                # 覆盖 LLM 生成的 core_answer
-                if extracted_core_answer.get("deliverable_answers"):
-                    final_report["core_answer"] = extracted_core_answer
-                    logger.info(
-                        f" [v7.0] 已用责任者答案覆盖 core_answer: {len(extracted_core_answer['deliverable_answers'])} 个交付物"
-                    )
-                else:
-                    logger.warning("️ [v7.0] 未提取到交付物答案，保留 LLM 生成的 core_answer")
-            else:
-                logger.info("ℹ️ [v7.0] 无交付物元数据，保留 LLM 生成的 core_answer")
-
-            #  v7.108: 提取概念图数据并转换为前端格式
-            self._update_progress(state, "提取概念图数据", 0.93)
-            generated_images_by_expert = self._extract_generated_images_by_expert(state)
-            if generated_images_by_expert:
-                final_report["generated_images_by_expert"] = generated_images_by_expert
-                total_images = sum(len(expert_data["images"]) for expert_data in generated_images_by_expert.values())
-                logger.info(f" [v7.108] 已提取 {len(generated_images_by_expert)} 个专家的 {total_images} 张概念图")
-            else:
-                logger.debug("ℹ️ [v7.108] 无概念图数据可提取")
-
-            #  v7.122: 统一处理搜索引用（去重、验证、聚合）
-            self._update_progress(state, "处理搜索引用", 0.94)
-            search_references = self._consolidate_search_references(state)
-            if search_references:
-                final_report["search_references"] = search_references
-                logger.info(f" [v7.122] 已处理 {len(search_references)} 条搜索引用")
+        if deliverable_metadata:
+            logger.info(f" [v7.0] 检测到 {len(deliverable_metadata)} 个交付物元数据，开始提取责任者答案")
+            extracted_core_answer = self._extract_deliverable_answers(state)
+
+            # 覆盖 LLM 生成的 core_answer
+            if extracted_core_answer.get("deliverable_answers"):
+                final_report["core_answer"] = extracted_core_answer
+                logger.info(
+                    f" [v7.0] 已用责任者答案覆盖 core_answer: {len(extracted_core_answer['deliverable_answers'])} 个交付物"
+                )
             else:
-                logger.debug("ℹ️ [v7.122] 无搜索引用数据")
-
-            # 创建分析结果
-            self._update_progress(state, "构建最终分析结果", 0.95)
-            result = self.create_analysis_result(
-                content=str(final_report.get("executive_summary", {})),
-                structured_data=final_report,
-                confidence=self._calculate_overall_confidence(state),
-                sources=["all_agents", "requirements_analysis", "comprehensive_analysis"],
-            )
+                logger.warning("️ [v7.0] 未提取到交付物答案，保留 LLM 生成的 core_answer")
+        else:
+            logger.info("ℹ️ [v7.0] 无交付物元数据，保留 LLM 生成的 core_answer")
+
+        #  v7.108: 提取概念图数据并转换为前端格式
+        self._update_progress(state, "提取概念图数据", 0.93)
+        generated_images_by_expert = self._extract_generated_images_by_expert(state)
+        if generated_images_by_expert:
+            final_report["generated_images_by_expert"] = generated_images_by_expert
+            total_images = sum(len(expert_data["images"]) for expert_data in generated_images_by_expert.values())
+            logger.info(f" [v7.108] 已提取 {len(generated_images_by_expert)} 个专家的 {total_images} 张概念图")
+        else:
+            logger.debug("ℹ️ [v7.108] 无概念图数据可提取")
+
+        #  v7.122: 统一处理搜索引用（去重、验证、聚合）
+        self._update_progress(state, "处理搜索引用", 0.94)
+        search_references = self._consolidate_search_references(state)
+        if search_references:
+            final_report["search_references"] = search_references
+            logger.info(f" [v7.122] 已处理 {len(search_references)} 条搜索引用")
+        else:
+            logger.debug("ℹ️ [v7.122] 无搜索引用数据")
 
-            end_time = time.time()
-            self._track_execution_time(start_time, end_time)
+        # 创建分析结果
+        self._update_progress(state, "构建最终分析结果", 0.95)
+        result = self.create_analysis_result(
+            content=str(final_report.get("executive_summary", {})),
+            structured_data=final_report,
+            confidence=self._calculate_overall_confidence(state),
+            sources=["all_agents", "requirements_analysis", "comprehensive_analysis"],
+        )
 
-            #  Phase 1.4: 最终进度更新
-            self._update_progress(state, "终审聚合完成", 1.0)
+        end_time = time.time()
+        self._track_execution_time(start_time, end_time)
 
-            logger.info("Result aggregation completed successfully")
-            return result
+        #  Phase 1.4: 最终进度更新
+        self._update_progress(state, "终审聚合完成", 1.0)
 
-        except Exception as e:
-            error = self.handle_error(e, "Result aggregation")
-            raise error
+        logger.info("Result aggregation completed successfully")
+        return result
 
     def _update_progress(self, state: ProjectAnalysisState, detail: str, progress: float):
         """
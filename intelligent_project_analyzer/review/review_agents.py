@@ -18,6 +18,7 @@ from loguru import logger
 from ..core.prompt_manager import PromptManager
 from ..core.state import ProjectAnalysisState
 from ..core.types import AnalysisResult
+from ..services.prompt_cache_stats import prompt_cache_callback
 
 
 class ReviewerRole:
@@ -62,6 +63,37 @@ class ReviewerRole:
     def _review_impl(self, agent_results: Dict[str, Any], requirements: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError
 
+    @staticmethod
+    def _build_sf_evaluation_context(requirements: Dict[str, Any]) -> str:
+        """
+        构建 sf 评估标准上下文（P2-T10），追加在审核 system prompt 之后
+
+        只取决于设计模式组合（排序、不含置信度），同一组合逐字节一致，可命中提供商的 prompt cache；
+        会话相关内容（需求、专家结果）都在 user prompt 中。
+
+        Returns:
+            评估标准 + 质量底线文本；没有检测到设计模式或加载失败时返回空字符串
+        """
+        detected_modes = requirements.get("_detected_design_modes") or requirements.get("detected_design_modes")
+        if not detected_modes:
+            return ""
+        try:
+            from ..services.sf_knowledge_loader import (
+                canonical_mode_ids,
+                get_evaluation_criteria_for_modes,
+                get_quality_floor_checklist,
+            )
+
+            modes = [{"mode": mode_id} for mode_id in canonical_mode_ids(detected_modes)]
+            sections = [get_evaluation_criteria_for_modes(modes, include_confidence=False)]
+            quality_floor = get_quality_floor_checklist()
+            if quality_floor:
+                sections.append(f"# 质量底线（Q1-Q5）\n{quality_floor}")
+        except Exception as e:
+            logger.warning(f"️ sf 评估标准加载失败，跳过: {e}")
+            return ""
+        return "\n\n".join(section.strip() for section in sections if section)
+
     def _validate_and_fix_agent_ids(
         self, improvements: List[Dict[str, Any]], agent_ids: List[str], agent_results: Dict[str, Any]
     ):
@@ -141,6 +173,11 @@ class RedTeamReviewer(ReviewerRole):
                 f"并包含 reviewers.red_team.prompt_template 字段"
             )
 
+        #  sf 评估标准按模式组合确定，追加在审核提示词之后组成稳定前缀
+        sf_context = self._build_sf_evaluation_context(requirements)
+        if sf_context:
+            system_prompt = f"{system_prompt}\n\n{sf_context}"
+
         # 准备分析结果摘要
         results_summary = self._format_results_for_review(agent_results)
 
@@ -156,7 +193,7 @@ class RedTeamReviewer(ReviewerRole):
         # 调用LLM
         messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
 
-        response = self.llm_model.invoke(messages)
+        response = self.llm_model.invoke(messages, config={"callbacks": [prompt_cache_callback(self.role_name)]})
 
         #  新格式：从"评分"改为"具体改进点"
         improvements = self._extract_improvements(response.content, agent_results)
@@ -247,7 +284,7 @@ class RedTeamReviewer(ReviewerRole):
         # 调用LLM
         messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
 
-        response = self.llm_model.invoke(messages)
+        response = self.llm_model.invoke(messages, config={"callbacks": [prompt_cache_callback(self.role_name)]})
 
         # 解析响应
         issues = self._extract_role_selection_issues(response.content)
@@ -723,6 +760,11 @@ class BlueTeamReviewer(ReviewerRole):
                 f"并包含 reviewers.blue_team.prompt_template 字段"
             )
 
+        #  sf 评估标准按模式组合确定，追加在审核提示词之后组成稳定前缀
+        sf_context = self._build_sf_evaluation_context(requirements)
+        if sf_context:
+            system_prompt = f"{system_prompt}\n\n{sf_context}"
+
         results_summary = self._format_results_for_review(agent_results)
 
         #  P1修复：构建红队问题清单用于蓝队响应
@@ -754,7 +796,7 @@ class BlueTeamReviewer(ReviewerRole):
 
         messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
 
-        response = self.llm_model.invoke(messages)
+        response = self.llm_model.invoke(messages, config={"callbacks": [prompt_cache_callback(self.role_name)]})
 
         #  P1-4修复：正确解析validations数组（包含stance、reasoning等字段）
         validations, strengths = self._parse_blue_team_response_v2(response.content, agent_results, red_review)
@@ -880,7 +922,7 @@ class BlueTeamReviewer(ReviewerRole):
         # 调用LLM
         messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
 
-        response = self.llm_model.invoke(messages)
+        response = self.llm_model.invoke(messages, config={"callbacks": [prompt_cache_callback(self.role_name)]})
 
         # 解析响应
         validations, strengths = self._extract_role_selection_validations(response.content, red_review)
@@ -1349,6 +1391,11 @@ class JudgeReviewer(ReviewerRole):
                 f"并包含 reviewers.judge.prompt_template 字段"
             )
 
+        #  sf 评估标准按模式组合确定，追加在审核提示词之后组成稳定前缀
+        sf_context = self._build_sf_evaluation_context(requirements)
+        if sf_context:
+            system_prompt = f"{system_prompt}\n\n{sf_context}"
+
         results_summary = self._format_results_for_review(agent_results)
 
         # 整合红蓝双方意见
@@ -1372,7 +1419,7 @@ class JudgeReviewer(ReviewerRole):
 
         messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
 
-        response = self.llm_model.invoke(messages)
+        response = self.llm_model.invoke(messages, config={"callbacks": [prompt_cache_callback(self.role_name)]})
 
         #  新格式：尝试解析JSON，失败则回退
         prioritized_improvements = self._parse_judge_response(
@@ -1642,6 +1689,11 @@ class ClientReviewer(ReviewerRole):
                 f"并包含 reviewers.client.prompt_template 字段"
             )
 
+        #  sf 评估标准按模式组合确定，追加在审核提示词之后组成稳定前缀
+        sf_context = self._build_sf_evaluation_context(requirements)
+        if sf_context:
+            system_prompt = f"{system_prompt}\n\n{sf_context}"
+
         results_summary = self._format_results_for_review(agent_results)
 
         user_prompt = f"""项目需求：
@@ -1665,7 +1717,7 @@ class ClientReviewer(ReviewerRole):
 
         messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_prompt)]
 
-        response = self.llm_model.invoke(messages)
+        response = self.llm_model.invoke(messages, config={"callbacks": [prompt_cache_callback(self.role_name)]})
 
         #  新格式：从"接受度评分"改为"业务需求缺口"
         business_gaps = self._extract_business_gaps(response.content, agent_results)
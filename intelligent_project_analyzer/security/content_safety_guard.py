@@ -7,6 +7,21 @@ from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
+from ..utils.keyword_matcher import KeywordMatcher, get_cached_matcher
+
+
+def _build_category_matcher(keywords_config: Dict[str, Any]) -> KeywordMatcher:
+    """编译关键词规则（新格式字典 / 旧格式列表），分组键为类别名；禁用的类别不编入"""
+    groups: Dict[str, List[str]] = {}
+    for category, config in keywords_config.items():
+        if isinstance(config, dict):
+            if not config.get("enabled", True):
+                continue
+            groups[category] = config.get("words", [])
+        else:
+            groups[category] = config
+    return KeywordMatcher.from_groups(groups)
+
 
 class ContentSafetyGuard:
     """内容安全守卫（支持动态规则）"""
@@ -63,13 +78,14 @@ class ContentSafetyGuard:
                 self.use_dynamic_rules = False
         return self._rule_loader
 
-    def check(self, text: str, context: str = "input") -> Dict[str, Any]:
+    def check(self, text: str, context: str = "input", features: Any = None) -> Dict[str, Any]:
         """
         检查内容安全
 
         Args:
             text: 待检测文本
             context: 上下文（input/output/report）
+            features: 输入特征阶段的结果（InputFeatures，可选），文本一致时复用其关键词命中
 
         Returns:
             {
@@ -82,7 +98,7 @@ class ContentSafetyGuard:
         violations = []
 
         # 1. 关键词检测（快速过滤）
-        keyword_violations = self._check_keywords(text)
+        keyword_violations = self._check_keywords(text, features)
         violations.extend(keyword_violations)
 
         # 2. 正则模式检测
@@ -196,22 +212,34 @@ class ContentSafetyGuard:
         # 默认情况（不应该到达这里）
         return {"is_safe": False, "risk_level": "medium", "violations": violations, "action": "sanitize"}
 
-    def _check_keywords(self, text: str) -> List[Dict]:
+    def get_keywords_config(self) -> Dict[str, Any]:
+        """当前生效的关键词规则（动态规则，失败时回退规则）"""
+        if self.use_dynamic_rules and self.rule_loader:
+            try:
+                return self.rule_loader.get_keywords()
+            except Exception as e:
+                logger.warning(f"️ 获取动态关键词失败，使用回退规则: {e}")
+        return self.FALLBACK_KEYWORDS
+
+    def get_keyword_matcher(self, keywords_config: Optional[Dict[str, Any]] = None) -> KeywordMatcher:
+        """关键词规则匹配器：规则热重载后 keywords_config 为新对象 / 规则版本号变化，自动重建"""
+        if keywords_config is None:
+            keywords_config = self.get_keywords_config()
+        token = getattr(self._rule_loader, "generation", None)
+        return get_cached_matcher(keywords_config, _build_category_matcher, token)
+
+    def _check_keywords(self, text: str, features: Any = None) -> List[Dict]:
         """关键词检测（使用动态规则）"""
         violations = []
         text_lower = text.lower()
 
         # 获取关键词规则
-        if self.use_dynamic_rules and self.rule_loader:
-            try:
-                keywords_config = self.rule_loader.get_keywords()
-            except Exception as e:
-                logger.warning(f"️ 获取动态关键词失败，使用回退规则: {e}")
-                keywords_config = self.FALLBACK_KEYWORDS
-        else:
-            keywords_config = self.FALLBACK_KEYWORDS
+        keywords_config = self.get_keywords_config()
 
         # 检测关键词
+        matcher = self.get_keyword_matcher(keywords_config)
+        group_hits = matcher.match_groups(text_lower, matcher.resolve_positions(text_lower, features, "safety"))
+
         for category, config in keywords_config.items():
             # 支持新格式（字典）和旧格式（列表）
             if isinstance(config, dict):
@@ -223,7 +251,7 @@ class ContentSafetyGuard:
                 keywords = config
                 severity = "high"
 
-            matched = [kw for kw in keywords if kw in text_lower]
+            matched = [keywords[index] for index in group_hits.get(category, ())]
             if matched:
                 violations.append(
                     {"category": category, "matched_keywords": matched, "severity": severity, "method": "keyword_match"}
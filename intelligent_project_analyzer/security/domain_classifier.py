@@ -7,6 +7,12 @@ import json
 from typing import Dict, Any, List, Optional
 from loguru import logger
 
+from ..utils.keyword_matcher import KeywordMatcher, get_cached_matcher
+
+
+def _build_keyword_dict_matcher(keyword_dict: Dict[str, List[str]]) -> KeywordMatcher:
+    return KeywordMatcher.from_groups(keyword_dict, ignore_case=True)
+
 
 class DomainClassifier:
     """领域分类器 - 判断输入是否属于空间设计领域"""
@@ -45,12 +51,13 @@ class DomainClassifier:
         """
         self.llm_model = llm_model
     
-    def classify(self, user_input: str) -> Dict[str, Any]:
+    def classify(self, user_input: str, features: Any = None) -> Dict[str, Any]:
         """
         分类用户输入
         
         Args:
             user_input: 用户输入文本
+            features: 输入特征阶段的结果（InputFeatures，可选），复用其关键词命中
             
         Returns:
             {
@@ -65,8 +72,10 @@ class DomainClassifier:
         normalized_input = user_input.lower()
 
         # 1. 关键词匹配
-        design_stats = self._analyze_keywords(normalized_input, self.DESIGN_KEYWORDS)
-        non_design_stats = self._analyze_keywords(normalized_input, self.NON_DESIGN_KEYWORDS)
+        design_stats = self._analyze_keywords(normalized_input, self.DESIGN_KEYWORDS, features, "domain_design")
+        non_design_stats = self._analyze_keywords(
+            normalized_input, self.NON_DESIGN_KEYWORDS, features, "domain_non_design"
+        )
 
         design_strength = design_stats["strength"]
         non_design_strength = non_design_stats["strength"]
@@ -168,18 +177,24 @@ class DomainClassifier:
             ]
         }
     
-    def _analyze_keywords(self, text: str, keyword_dict: Dict[str, List[str]]) -> Dict[str, Any]:
+    @staticmethod
+    def get_keyword_matcher(keyword_dict: Dict[str, List[str]]) -> KeywordMatcher:
+        return get_cached_matcher(keyword_dict, _build_keyword_dict_matcher)
+
+    def _analyze_keywords(
+        self, text: str, keyword_dict: Dict[str, List[str]], features: Any = None, source: str = ""
+    ) -> Dict[str, Any]:
         """分析关键词命中情况，返回命中统计数据"""
         categories = []
         matched_keywords = set()
         total_hits = 0
 
+        # 关键词表编译一次，单次扫描得到全部类别的命中
+        matcher = self.get_keyword_matcher(keyword_dict)
+        group_hits = matcher.match_groups(text, matcher.resolve_positions(text, features, source))
+
         for category, keywords in keyword_dict.items():
-            hits = []
-            for kw in keywords:
-                kw_lower = kw.lower()
-                if kw_lower and kw_lower in text:
-                    hits.append(kw)
+            hits = [keywords[index] for index in group_hits.get(category, ())]
 
             if hits:
                 categories.append(category)
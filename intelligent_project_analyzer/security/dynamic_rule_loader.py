@@ -41,6 +41,7 @@ class DynamicRuleLoader:
         # 加载配置
         self._rules: Dict[str, Any] = {}
         self._last_modified: float = 0
+        self.generation: int = 0  # 每次重载递增，供关键词匹配器等派生缓存判断失效
         self._lock = threading.Lock()  # 线程安全
 
         # 自动重载配置
@@ -136,6 +137,7 @@ class DynamicRuleLoader:
 
                 self._rules = rules
                 self._last_modified = os.path.getmtime(self.config_path)
+                self.generation += 1
 
                 logger.info(
                     f" 安全规则已重载 "
@@ -188,6 +190,7 @@ class DynamicRuleLoader:
             threat_intel["last_updated"] = datetime.now().isoformat()
 
             self._rules["threat_intelligence"] = threat_intel
+            self.generation += 1
 
             # 保存到文件（可选）
             try:
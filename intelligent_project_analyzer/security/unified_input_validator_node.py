@@ -15,6 +15,7 @@ from intelligent_project_analyzer.core.state import ProjectAnalysisState, Analys
 from intelligent_project_analyzer.security.content_safety_guard import ContentSafetyGuard
 from intelligent_project_analyzer.security.domain_classifier import DomainClassifier
 from intelligent_project_analyzer.security.violation_logger import ViolationLogger
+from intelligent_project_analyzer.services.input_features import prepare_input_features, time_consumer
 
 
 class UnifiedInputValidatorNode:
@@ -50,6 +51,10 @@ class UnifiedInputValidatorNode:
         user_input = state.get("user_input", "")
         session_id = state.get("session_id", "")
 
+        # 输入特征阶段：一次性归一化/分词/关键词扫描，供本节点与后续节点复用
+        features = prepare_input_features(state)
+        features_update = {"input_features": features.to_dict()} if features is not None else {}
+
         # 初始化检测器
         safety_guard = ContentSafetyGuard(llm_model=llm_model)
         domain_classifier = DomainClassifier(llm_model=llm_model)
@@ -59,7 +64,8 @@ class UnifiedInputValidatorNode:
         # 第1关：内容安全检测
         # ============================================================================
         logger.info(" 第1关：内容安全检测")
-        safety_result = safety_guard.check(user_input, context="input")
+        with time_consumer("content_safety", features):
+            safety_result = safety_guard.check(user_input, context="input", features=features)
 
         if not safety_result["is_safe"]:
             logger.error(f" 内容安全检测失败: {safety_result['violations']}")
@@ -80,7 +86,8 @@ class UnifiedInputValidatorNode:
                 "rejection_reason": "content_safety_violation",
                 "rejection_message": rejection_message,
                 "violations": safety_result["violations"],
-                "final_status": "rejected"
+                "final_status": "rejected",
+                **features_update
             }
 
             return Command(update=updated_state, goto="input_rejected")
@@ -91,7 +98,8 @@ class UnifiedInputValidatorNode:
         # 第2关：领域分类检测
         # ============================================================================
         logger.info(" 第2关：领域分类检测")
-        domain_result = domain_classifier.classify(user_input)
+        with time_consumer("domain_classifier", features):
+            domain_result = domain_classifier.classify(user_input, features=features)
 
         # 处理命名任务（特殊逻辑）
         is_naming_task = any(kw in user_input.lower() for kw in ["命名", "起名", "取名", "名字", "叫什么"])
@@ -117,7 +125,8 @@ class UnifiedInputValidatorNode:
                     "rejection_reason": "not_design_related",
                     "rejection_message": domain_message,
                     "domain_result": domain_result,
-                    "final_status": "rejected"
+                    "final_status": "rejected",
+                    **features_update
                 }
 
                 return Command(update=updated_state, goto="input_rejected")
@@ -210,7 +219,8 @@ class UnifiedInputValidatorNode:
             "domain_classification": domain_result,
             "safety_check_passed": True,
             "domain_confidence": initial_confidence,
-            "needs_secondary_validation": needs_secondary_validation
+            "needs_secondary_validation": needs_secondary_validation,
+            **features_update
         }
 
         logger.info(" 初始验证通过，进入需求分析")
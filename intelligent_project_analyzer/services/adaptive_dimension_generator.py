@@ -68,6 +68,7 @@ class AdaptiveDimensionGenerator:
         max_dimensions: int = 12,
         special_scenes: Optional[List[str]] = None,
         historical_data: Optional[List[Dict[str, Any]]] = None,
+        input_features: Any = None,
     ) -> List[Dict[str, Any]]:
         """
         为项目选择维度（混合策略）
@@ -85,6 +86,7 @@ class AdaptiveDimensionGenerator:
             max_dimensions: 最大维度数
             special_scenes: 特殊场景标签列表
             historical_data: 历史会话数据（可选，用于学习）
+            input_features: 输入特征（InputFeatures，可选，复用入口阶段的关键词扫描结果）
 
         Returns:
             选中的维度列表
@@ -96,6 +98,7 @@ class AdaptiveDimensionGenerator:
             min_dimensions=min_dimensions,
             max_dimensions=max_dimensions,
             special_scenes=special_scenes,
+            input_features=input_features,
         )
 
         #  v7.139: 兼容字典返回格式（包含dimensions/conflicts/adjustment_suggestions）
@@ -0,0 +1,206 @@
+"""
+归档会话分段压缩存储
+
+archived_sessions 原先把完整 session_data（最大约 35 MB）与 final_report（约 11 MB）以 JSON 文本存入 SQLite，
+读取任何字段都要整体加载并解析。本模块把会话拆成可独立寻址的分段，每段单独压缩：
+
+- metadata       状态、时间、用户等基础字段（未归入其他分段的键）
+- requirements   需求分析与问卷相关字段
+- expert:<角色>   agent_results 中每个专家的结果
+- report         final_report
+- images         概念图 / 图片引用
+- timeline       events / results / history 等事件流
+
+压缩编码：
+- zstd（安装 zstandard 时默认使用）：使用按归档数据训练的字典
+- zlib（标准库回退）：使用由高频 JSON 片段构建的预置字典（zdict）
+
+每段记录编码方式与字典 ID，字典更换后旧数据仍按原字典解码。
+
+配置：
+    ARCHIVE_CODEC           zstd / zlib（默认：安装了 zstandard 时为 zstd，否则 zlib）
+    ARCHIVE_COMPRESS_LEVEL  压缩级别（默认 zstd 9 / zlib 6）
+    ARCHIVE_DICT_SIZE       训练字典大小（字节，默认 65536；zlib 最大使用 32768）
+"""
+
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # 可选依赖：未安装时回退 zlib
+    zstandard = None
+
+ARCHIVE_CODEC = os.getenv("ARCHIVE_CODEC", "zstd" if zstandard is not None else "zlib").lower()
+ARCHIVE_COMPRESS_LEVEL = int(os.getenv("ARCHIVE_COMPRESS_LEVEL", "9" if ARCHIVE_CODEC == "zstd" else "6"))
+ARCHIVE_DICT_SIZE = int(os.getenv("ARCHIVE_DICT_SIZE", "65536"))
+
+SECTION_METADATA = "metadata"
+SECTION_REQUIREMENTS = "requirements"
+SECTION_REPORT = "report"
+SECTION_IMAGES = "images"
+SECTION_TIMELINE = "timeline"
+EXPERT_SECTION_PREFIX = "expert:"
+# 选择所有专家分段的别名
+SECTION_EXPERTS = "experts"
+
+_REQUIREMENT_KEY_RE = re.compile(
+    r"requirement|questionnaire|confirmed_core_task|gap_filling|radar_dimension|selected_dimensions"
+)
+_IMAGE_KEY_RE = re.compile(r"image")
+_TIMELINE_KEYS = frozenset({"events", "results", "history"})
+_ZLIB_MAX_DICT = 32768
+_DICT_TOKEN_RE = re.compile(rb'"[^"\\]{2,48}"\s*:|"[^"\\]{4,48}"')
+
+
+@dataclass(frozen=True)
+class ArchiveDictionary:
+    """压缩字典（dict_id 对应 archive_dictionaries 表的主键）"""
+
+    dict_id: int
+    codec: str
+    data: bytes
+
+
+def _section_for_key(key: str) -> str:
+    if key == "final_report":
+        return SECTION_REPORT
+    if key in _TIMELINE_KEYS:
+        return SECTION_TIMELINE
+    if _IMAGE_KEY_RE.search(key):
+        return SECTION_IMAGES
+    if _REQUIREMENT_KEY_RE.search(key):
+        return SECTION_REQUIREMENTS
+    return SECTION_METADATA
+
+
+def split_sections(session_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    把会话数据拆分为分段
+
+    每个分段是原会话中若干顶层键组成的字典；agent_results 按专家拆分，分段内容为 {角色: 结果}。
+    user_input 留在 metadata 中（列表 / 权限校验只加载 metadata 即可）。
+    """
+    sections: Dict[str, Dict[str, Any]] = {SECTION_METADATA: {}}
+    for key, value in session_data.items():
+        if key == "agent_results" and isinstance(value, dict):
+            for role_id, result in value.items():
+                sections[f"{EXPERT_SECTION_PREFIX}{role_id}"] = {role_id: result}
+            continue
+        sections.setdefault(_section_for_key(key), {})[key] = value
+    return sections
+
+
+def join_sections(sections: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """由分段还原会话数据（只还原传入的分段）"""
+    session_data: Dict[str, Any] = {}
+    for name, content in sections.items():
+        if name.startswith(EXPERT_SECTION_PREFIX):
+            session_data.setdefault("agent_results", {}).update(content)
+        else:
+            session_data.update(content)
+    return session_data
+
+
+def select_sections(available: Iterable[str], requested: Optional[Iterable[str]]) -> List[str]:
+    """
+    把请求的分段名解析为实际分段（requested 为 None 时返回全部）
+
+    支持 "experts" 选择全部专家分段；metadata 总是包含在内。
+    """
+    available = list(available)
+    if requested is None:
+        return available
+    wanted = set(requested) | {SECTION_METADATA}
+    return [
+        name
+        for name in available
+        if name in wanted or (SECTION_EXPERTS in wanted and name.startswith(EXPERT_SECTION_PREFIX))
+    ]
+
+
+def _dumps(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise ImportError("zstd 归档压缩需要安装 zstandard 包：pip install zstandard")
+
+
+def encode_section(
+    content: Any, dictionary: Optional[ArchiveDictionary] = None
+) -> Tuple[str, Optional[int], bytes, int]:
+    """
+    压缩一个分段
+
+    Returns:
+        (编码方式, 字典 ID, 压缩数据, 原始字节数)
+    """
+    raw = _dumps(content)
+    if dictionary is not None and dictionary.codec != ARCHIVE_CODEC:
+        dictionary = None
+    dict_id = dictionary.dict_id if dictionary is not None else None
+
+    if ARCHIVE_CODEC == "zstd":
+        _require_zstandard()
+        dict_data = zstandard.ZstdCompressionDict(dictionary.data) if dictionary is not None else None
+        payload = zstandard.ZstdCompressor(level=ARCHIVE_COMPRESS_LEVEL, dict_data=dict_data).compress(raw)
+        return "zstd", dict_id, payload, len(raw)
+
+    if dictionary is not None:
+        compressor = zlib.compressobj(ARCHIVE_COMPRESS_LEVEL, zdict=dictionary.data)
+    else:
+        compressor = zlib.compressobj(ARCHIVE_COMPRESS_LEVEL)
+    return "zlib", dict_id, compressor.compress(raw) + compressor.flush(), len(raw)
+
+
+def decode_section(codec: str, payload: bytes, dictionary: Optional[ArchiveDictionary] = None) -> Any:
+    """解压一个分段（dictionary 为写入时使用的字典）"""
+    if codec == "zstd":
+        _require_zstandard()
+        dict_data = zstandard.ZstdCompressionDict(dictionary.data) if dictionary is not None else None
+        raw = zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload)
+    elif codec == "zlib":
+        decompressor = zlib.decompressobj(zdict=dictionary.data) if dictionary is not None else zlib.decompressobj()
+        raw = decompressor.decompress(payload) + decompressor.flush()
+    else:
+        raise ValueError(f"未知的归档编码: {codec}")
+    return json.loads(raw)
+
+
+def section_samples(sections: Dict[str, Dict[str, Any]]) -> List[bytes]:
+    """分段的原始 JSON 字节（训练字典用）"""
+    return [_dumps(content) for content in sections.values()]
+
+
+def train_dictionary(samples: List[bytes], size: int = ARCHIVE_DICT_SIZE) -> Optional[bytes]:
+    """
+    由样本训练压缩字典
+
+    zstd 使用 zstandard.train_dictionary；zlib 取样本中高频的 JSON 键与短字符串组成预置字典，
+    高价值片段放在末尾（zlib 距离越近匹配成本越低）。样本不足时返回 None。
+    """
+    if not samples:
+        return None
+    if ARCHIVE_CODEC == "zstd":
+        _require_zstandard()
+        try:
+            return zstandard.train_dictionary(size, samples).as_bytes()
+        except zstandard.ZstdError:
+            return None
+
+    counts: Counter = Counter()
+    for sample in samples:
+        counts.update(set(_DICT_TOKEN_RE.findall(sample)))
+    tokens = [token for token, count in counts.items() if count > 1]
+    if not tokens:
+        return None
+    tokens.sort(key=lambda token: counts[token] * len(token))
+    data = b"".join(tokens)
+    return data[-min(size, _ZLIB_MAX_DICT) :]
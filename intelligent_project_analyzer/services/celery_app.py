@@ -6,9 +6,16 @@ Celery 应用配置
 """
 
 from celery import Celery
-from kombu import serialization
+from kombu import Queue, serialization
 import json
 
+from intelligent_project_analyzer.services.celery_queues import (
+    BROKER_TRANSPORT_OPTIONS,
+    MONITORED_QUEUES,
+    PRIORITY_NORMAL,
+    TASK_ROUTES,
+)
+
 # 注册自定义序列化器以支持中文
 serialization.register(
     'utf8json',
@@ -50,15 +57,12 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,  # 每次只取一个任务（长任务适用）
     worker_concurrency=4,          # 并发 Worker 数
     
-    # 任务路由（可选：不同任务用不同队列）
-    task_routes={
-        'intelligent_project_analyzer.services.celery_tasks.analyze_project': {
-            'queue': 'analysis'
-        },
-        'intelligent_project_analyzer.services.celery_tasks.generate_report': {
-            'queue': 'report'
-        }
-    },
+    # 任务路由：按任务类型分队列（注册名为短名称），恢复类任务走低延迟队列 interactive
+    # 未指定 -Q 的 Worker 按声明顺序（interactive → analysis → report → default）取任务
+    task_routes=TASK_ROUTES,
+    task_queues=[Queue(name, routing_key=name) for name in MONITORED_QUEUES],
+    broker_transport_options=BROKER_TRANSPORT_OPTIONS,
+    task_default_priority=PRIORITY_NORMAL,
     
     # 任务默认配置
     task_default_queue='default',
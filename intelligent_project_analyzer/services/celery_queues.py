@@ -0,0 +1,317 @@
+"""
+Celery 队列路由、按用户公平准入与队列指标
+
+旧实现中 analyze_project / analyze_project_with_files / resume_analysis 都进入同一个队列，
+一批耗时的首次分析会阻塞用户正在等待的恢复请求，单个用户也能占满全部 Worker。现在：
+
+1. 按任务类型路由：恢复类任务进入低延迟队列 interactive，首次分析进入 analysis；
+   Worker 按 interactive → analysis → report → default 的顺序取任务（queue_order_strategy=priority）
+2. 队列内优先级：Redis Broker 按 priority_steps 拆分子队列，高优先级请求先出队
+3. 公平准入：每个用户同时占用的分析任务数受 QuotaManager 配额限制，
+   超出配额的任务降为最低优先级（其他用户的任务先执行），超出突发上限直接拒绝
+4. 指标：入队时写入 enqueued_at 头，Worker 开始执行时记录排队耗时；队列深度按优先级子队列汇总
+
+占用槽位保存在 Redis ZSET 中（score 为过期时间），Worker 异常退出时槽位会自动过期，不会永久泄漏。
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+QUEUE_INTERACTIVE = "interactive"
+QUEUE_ANALYSIS = "analysis"
+QUEUE_REPORT = "report"
+QUEUE_DEFAULT = "default"
+
+# 声明顺序即 Worker 取任务的顺序
+MONITORED_QUEUES = (QUEUE_INTERACTIVE, QUEUE_ANALYSIS, QUEUE_REPORT, QUEUE_DEFAULT)
+
+TASK_QUEUES = {
+    "analyze_project": QUEUE_ANALYSIS,
+    "analyze_project_with_files": QUEUE_ANALYSIS,
+    "resume_analysis": QUEUE_INTERACTIVE,
+    "cleanup_expired_sessions": QUEUE_DEFAULT,
+}
+TASK_ROUTES = {name: {"queue": queue} for name, queue in TASK_QUEUES.items()}
+
+# Redis Broker 优先级：数值越小越先出队
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 6
+PRIORITY_LOW = 9
+PRIORITY_SEP = "\x06\x16"
+
+BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": PRIORITY_STEPS,
+    "sep": PRIORITY_SEP,
+}
+
+ENQUEUED_AT_HEADER = "enqueued_at"
+FAIR_USER_HEADER = "fair_user"
+FAIR_SLOT_HEADER = "fair_slot"
+
+FAIR_SHARE_BURST = int(os.getenv("CELERY_FAIR_SHARE_BURST", "2"))
+WAIT_SAMPLE_SIZE = int(os.getenv("CELERY_WAIT_SAMPLE_SIZE", "500"))
+
+
+def priority_for(level: int) -> int:
+    """API 优先级（0=普通, 1=高）映射为 Broker 优先级"""
+    return PRIORITY_HIGH if level and level > 0 else PRIORITY_NORMAL
+
+
+def broker_queue_keys(queue: str) -> List[str]:
+    """队列在 Redis 中的全部列表键（每个优先级一个子队列，优先级 0 使用原队列名）"""
+    return [f"{queue}{PRIORITY_SEP}{step}" if step else queue for step in PRIORITY_STEPS]
+
+
+@dataclass
+class AdmissionDecision:
+    """公平准入结果"""
+
+    admitted: bool
+    priority: int
+    inflight: int
+    limit: int
+    reason: str = ""
+
+    @property
+    def throttled(self) -> bool:
+        return self.admitted and self.priority == PRIORITY_LOW
+
+
+class FairShareScheduler:
+    """
+    按用户公平准入 + 排队耗时统计（同步 Redis 客户端，API 侧通过 asyncio.to_thread 调用）
+
+    Example:
+        >>> scheduler = FairShareScheduler(redis.Redis.from_url(url, decode_responses=True))
+        >>> decision = scheduler.admit("user_1", "session_1")
+        >>> scheduler.release("user_1", "session_1")
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        quota_manager: Any = None,
+        key_prefix: str = "celery:fair",
+        slot_ttl: int = 1860,
+        burst: int = FAIR_SHARE_BURST,
+        sample_size: int = WAIT_SAMPLE_SIZE,
+    ):
+        self.client = client
+        self._quota_manager = quota_manager
+        self.key_prefix = key_prefix
+        self.slot_ttl = slot_ttl
+        self.burst = burst
+        self.sample_size = sample_size
+
+    # ------------------------------------------------------------------ 键
+
+    def _inflight_key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:inflight:{user_id}"
+
+    def _users_key(self) -> str:
+        return f"{self.key_prefix}:users"
+
+    def _wait_key(self, queue: str) -> str:
+        return f"{self.key_prefix}:wait:{queue}"
+
+    # ------------------------------------------------------------------ 准入
+
+    def _limit_for(self, user_id: str, user_tier: str) -> int:
+        if self._quota_manager is None:
+            from intelligent_project_analyzer.services.quota_manager import QuotaManager
+
+            self._quota_manager = QuotaManager()
+        return self._quota_manager.get_concurrent_task_limit(user_id, user_tier)
+
+    def admit(
+        self, user_id: str, slot_id: str, requested_priority: int = PRIORITY_NORMAL, user_tier: str = "free"
+    ) -> AdmissionDecision:
+        """
+        为用户占用一个分析槽位
+
+        - 占用数 ≤ 配额：按请求优先级入队
+        - 配额 < 占用数 ≤ 配额 + burst：降为最低优先级，其他用户的任务先执行
+        - 超过突发上限：拒绝（槽位回滚）
+        """
+        limit = self._limit_for(user_id, user_tier)
+        if limit < 0:
+            return AdmissionDecision(True, requested_priority, 0, limit)
+
+        now = time.time()
+        key = self._inflight_key(user_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.zadd(key, {slot_id: now + self.slot_ttl})
+        pipe.zcard(key)
+        pipe.expire(key, self.slot_ttl)
+        pipe.sadd(self._users_key(), user_id)
+        inflight = pipe.execute()[2]
+
+        if inflight > limit + self.burst:
+            self.client.zrem(key, slot_id)
+            reason = f"并发分析任务已达上限 ({limit})"
+            return AdmissionDecision(False, requested_priority, inflight - 1, limit, reason=reason)
+        if inflight > limit:
+            logger.info(f"️ [Celery] 用户 {user_id} 超出并发配额 ({inflight}/{limit})，任务降为低优先级")
+            return AdmissionDecision(True, PRIORITY_LOW, inflight, limit, reason="超出并发配额，已降低优先级")
+        return AdmissionDecision(True, requested_priority, inflight, limit)
+
+    def release(self, user_id: str, slot_id: str) -> None:
+        """释放槽位（任务结束 / 取消时调用，重复释放无副作用）"""
+        self.client.zrem(self._inflight_key(user_id), slot_id)
+
+    def get_inflight(self, user_id: str) -> int:
+        key = self._inflight_key(user_id)
+        self.client.zremrangebyscore(key, "-inf", time.time())
+        return self.client.zcard(key)
+
+    # ------------------------------------------------------------------ 指标
+
+    def record_wait(self, queue: str, wait_seconds: float) -> None:
+        key = self._wait_key(queue)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lpush(key, f"{max(wait_seconds, 0.0):.3f}")
+        pipe.ltrim(key, 0, self.sample_size - 1)
+        pipe.execute()
+
+    def get_wait_stats(self, queue: str) -> Dict[str, Any]:
+        samples = sorted(float(v) for v in self.client.lrange(self._wait_key(queue), 0, -1))
+        if not samples:
+            return {"samples": 0, "avg_seconds": None, "p50_seconds": None, "p95_seconds": None, "max_seconds": None}
+
+        def _pct(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+
+        return {
+            "samples": len(samples),
+            "avg_seconds": round(sum(samples) / len(samples), 3),
+            "p50_seconds": _pct(0.5),
+            "p95_seconds": _pct(0.95),
+            "max_seconds": round(samples[-1], 3),
+        }
+
+    def get_queue_depth(self, queue: str) -> Dict[str, int]:
+        pipe = self.client.pipeline(transaction=False)
+        for key in broker_queue_keys(queue):
+            pipe.llen(key)
+        return {str(step): depth for step, depth in zip(PRIORITY_STEPS, pipe.execute())}
+
+    def get_inflight_by_user(self) -> Dict[str, int]:
+        inflight = {}
+        for user_id in self.client.smembers(self._users_key()):
+            count = self.get_inflight(user_id)
+            if count:
+                inflight[user_id] = count
+            else:
+                self.client.srem(self._users_key(), user_id)
+        return inflight
+
+    def get_metrics(self) -> Dict[str, Any]:
+        queues = {}
+        for queue in MONITORED_QUEUES:
+            by_priority = self.get_queue_depth(queue)
+            queues[queue] = {
+                "depth": sum(by_priority.values()),
+                "depth_by_priority": by_priority,
+                "wait": self.get_wait_stats(queue),
+            }
+        return {"queues": queues, "inflight_by_user": self.get_inflight_by_user(), "burst": self.burst}
+
+
+def task_headers(queue: str, user_id: Optional[str] = None, slot_id: Optional[str] = None) -> Dict[str, Any]:
+    """apply_async 使用的消息头：入队时间，以及需要在任务结束时释放的公平调度槽位"""
+    headers: Dict[str, Any] = {ENQUEUED_AT_HEADER: time.time(), "queue": queue}
+    if user_id and slot_id:
+        headers[FAIR_USER_HEADER] = user_id
+        headers[FAIR_SLOT_HEADER] = slot_id
+    return headers
+
+
+_scheduler: Optional[FairShareScheduler] = None
+
+
+def get_fair_share_scheduler() -> FairShareScheduler:
+    """进程级调度器，状态与 Broker 共用同一个 Redis"""
+    global _scheduler
+    if _scheduler is None:
+        import redis
+
+        from intelligent_project_analyzer.services.celery_app import celery_app
+
+        client = redis.Redis.from_url(celery_app.conf.broker_url, decode_responses=True)
+        _scheduler = FairShareScheduler(client, slot_ttl=int(celery_app.conf.task_time_limit or 1800) + 60)
+    return _scheduler
+
+
+def _request_header(request: Any, name: str) -> Any:
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+
+def on_task_prerun(task: Any) -> None:
+    """Worker 开始执行任务：记录排队耗时"""
+    enqueued_at = _request_header(task.request, ENQUEUED_AT_HEADER)
+    if enqueued_at is None:
+        return
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    queue = _request_header(task.request, "queue") or delivery_info.get("routing_key") or QUEUE_DEFAULT
+    try:
+        get_fair_share_scheduler().record_wait(queue, time.time() - float(enqueued_at))
+    except Exception as e:
+        logger.debug(f"记录排队耗时失败: {e}")
+
+
+def on_task_postrun(task: Any) -> None:
+    """任务结束（成功/失败/等待用户输入）：释放公平调度槽位"""
+    user_id = _request_header(task.request, FAIR_USER_HEADER)
+    slot_id = _request_header(task.request, FAIR_SLOT_HEADER)
+    if not user_id or not slot_id:
+        return
+    try:
+        get_fair_share_scheduler().release(user_id, slot_id)
+    except Exception as e:
+        logger.warning(f"️ [Celery] 释放公平调度槽位失败: user={user_id}, slot={slot_id}, {e}")
+
+
+def register_queue_signals() -> None:
+    """注册排队耗时统计与槽位释放信号（由 celery_tasks 导入时调用）"""
+    from celery.signals import task_postrun, task_prerun
+
+    @task_prerun.connect(weak=False)
+    def _on_task_prerun(task: Any = None, **_: Any) -> None:
+        if task is not None:
+            on_task_prerun(task)
+
+    @task_postrun.connect(weak=False)
+    def _on_task_postrun(task: Any = None, **_: Any) -> None:
+        if task is not None:
+            on_task_postrun(task)
+
+
+__all__ = [
+    "QUEUE_INTERACTIVE",
+    "QUEUE_ANALYSIS",
+    "QUEUE_REPORT",
+    "QUEUE_DEFAULT",
+    "MONITORED_QUEUES",
+    "TASK_ROUTES",
+    "PRIORITY_HIGH",
+    "PRIORITY_NORMAL",
+    "PRIORITY_LOW",
+    "BROKER_TRANSPORT_OPTIONS",
+    "AdmissionDecision",
+    "FairShareScheduler",
+    "priority_for",
+    "broker_queue_keys",
+    "task_headers",
+    "get_fair_share_scheduler",
+    "register_queue_signals",
+]
@@ -29,10 +29,28 @@ if sys.platform == "win32":
 
 # 导入 Celery 应用
 from intelligent_project_analyzer.services.celery_app import celery_app
+from intelligent_project_analyzer.services.celery_queues import broker_queue_keys, register_queue_signals
+from intelligent_project_analyzer.services.celery_worker_runtime import (
+    get_worker_runtime,
+    register_worker_signals,
+    task_resources,
+)
+
+# Worker 进程启动时创建常驻事件循环，退出时释放共享连接
+register_worker_signals()
+# 排队耗时统计 + 任务结束时释放公平调度槽位
+register_queue_signals()
 
 
 def run_async(coro):
-    """在同步环境中运行异步代码"""
+    """
+    在同步环境中运行异步代码
+
+    Worker 进程内提交到常驻事件循环（复用 Redis/检查点连接）；其他环境按旧方式临时创建事件循环
+    """
+    runtime = get_worker_runtime()
+    if runtime is not None and runtime.is_running:
+        return runtime.run(coro)
     try:
         loop = asyncio.get_event_loop()
         if loop.is_running():
@@ -165,16 +183,12 @@ async def _run_workflow_with_files(
         visual_style_anchor: 全局风格锚点
     """
     from intelligent_project_analyzer.core.state import StateManager
-    from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
     from intelligent_project_analyzer.workflow.main_workflow import MainWorkflow
 
-    session_manager = RedisSessionManager()
-    await session_manager.connect()
-
-    try:
+    async with task_resources() as (session_manager, checkpointer):
         await session_manager.update(session_id, {"status": "running", "progress": 0.1, "task_id": task.request.id})
 
-        workflow = MainWorkflow()
+        workflow = MainWorkflow(checkpointer=checkpointer)
         workflow.build()
 
         task.update_state(
@@ -294,9 +308,6 @@ async def _run_workflow_with_files(
 
         return {"session_id": session_id, "status": "completed", "progress": 1.0, "final_report": final_report}
 
-    finally:
-        await session_manager.disconnect()
-
 
 async def _run_workflow(
     task, session_id: str, user_input: str, user_id: str, analysis_mode: str = "normal"
@@ -312,21 +323,17 @@ async def _run_workflow(
         analysis_mode: 分析模式 (normal/deep_thinking)
     """
     from intelligent_project_analyzer.core.state import StateManager
-    from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
     from intelligent_project_analyzer.workflow.main_workflow import MainWorkflow
 
-    # 初始化 Redis 会话管理器
-    session_manager = RedisSessionManager()
-    await session_manager.connect()
-
-    try:
+    # 获取 Redis 会话管理器与检查点存储（Worker 内跨任务复用）
+    async with task_resources() as (session_manager, checkpointer):
         # 更新会话状态
         await session_manager.update(
             session_id, {"status": "running", "progress": 0.1, "task_id": task.request.id}  # 保存 Celery 任务ID
         )
 
         # 创建工作流
-        workflow = MainWorkflow()
+        workflow = MainWorkflow(checkpointer=checkpointer)
         workflow.build()
 
         task.update_state(
@@ -455,9 +462,6 @@ async def _run_workflow(
 
         return {"session_id": session_id, "status": "completed", "progress": 1.0, "final_report": final_report}
 
-    finally:
-        await session_manager.disconnect()
-
 
 def _serialize_interrupt(interrupt_data) -> Dict[str, Any]:
     """序列化中断数据"""
@@ -502,33 +506,25 @@ async def _resume_workflow(task, session_id: str, resume_value: Any) -> Dict[str
     """
     from langgraph.types import Command
 
-    from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
-
-    session_manager = RedisSessionManager()
-    await session_manager.connect()
-
-    try:
+    async with task_resources() as (session_manager, checkpointer):
         # 获取会话数据
         session = await session_manager.get(session_id)
         if not session:
             return {"session_id": session_id, "status": "failed", "error": "会话不存在"}
 
-        # 获取工作流实例（需要从全局或重建）
-        # 这里简化处理，实际可能需要更复杂的状态恢复
+        # 从检查点恢复：Redis 后端下任意 worker 都能读取其他实例写入的检查点
         from intelligent_project_analyzer.workflow.main_workflow import MainWorkflow
 
-        workflow = MainWorkflow()
-        workflow.build()
-
+        workflow = MainWorkflow(checkpointer=checkpointer)
         config = {"configurable": {"thread_id": session_id}, "recursion_limit": 100}
 
+        snapshot = await workflow.graph.aget_state(config)
+        if not snapshot or not snapshot.values:
+            return {"session_id": session_id, "status": "failed", "error": "未找到可恢复的检查点"}
+
         # 使用 Command 恢复执行
         resume_command = Command(resume=resume_value)
 
-        # 继续执行
-        # 注意：实际实现可能需要检查点机制来完整恢复状态
-        # 这里是简化版本
-
         await session_manager.update(session_id, {"status": "running", "interrupt_data": None})
 
         task.update_state(
@@ -536,13 +532,35 @@ async def _resume_workflow(task, session_id: str, resume_value: Any) -> Dict[str
             meta={"session_id": session_id, "progress": 0.5, "current_stage": "恢复执行", "message": "正在恢复分析流程..."},
         )
 
-        # TODO: 实现完整的检查点恢复逻辑
-        # 这需要 LangGraph 的持久化功能支持
+        final_state = None
+        async for chunk in workflow.graph.astream(resume_command, config):
+            for node_name, node_output in chunk.items():
+                if node_name == "__interrupt__":
+                    interrupt_data = _serialize_interrupt(chunk["__interrupt__"])
+                    await session_manager.update(
+                        session_id,
+                        {"status": "waiting_for_input", "interrupt_data": interrupt_data, "current_node": "interrupt"},
+                    )
+                    return {"session_id": session_id, "status": "waiting_for_input", "interrupt_data": interrupt_data}
+
+                await session_manager.update(session_id, {"current_node": node_name})
+                final_state = node_output
 
-        return {"session_id": session_id, "status": "resumed", "message": "任务已恢复"}
+        final_report = None
+        if final_state and isinstance(final_state, dict):
+            final_report = final_state.get("final_report") or final_state.get("report_text")
 
-    finally:
-        await session_manager.disconnect()
+        await session_manager.update(
+            session_id,
+            {
+                "status": "completed",
+                "progress": 1.0,
+                "final_report": final_report,
+                "completed_at": datetime.now().isoformat(),
+            },
+        )
+
+        return {"session_id": session_id, "status": "completed", "progress": 1.0, "final_report": final_report}
 
 
 @celery_app.task(name="cleanup_expired_sessions")
@@ -563,17 +581,10 @@ def cleanup_expired_sessions() -> Dict[str, Any]:
 
 async def _cleanup_sessions() -> Dict[str, Any]:
     """清理过期会话的异步实现"""
-    from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
-
-    session_manager = RedisSessionManager()
-    await session_manager.connect()
-
-    try:
+    async with task_resources() as (session_manager, _checkpointer):
         # Redis TTL 会自动清理，这里可以做额外清理逻辑
         # 比如清理孤立的工作流实例等
         return {"status": "success", "message": "Redis TTL 自动管理会话过期"}
-    finally:
-        await session_manager.disconnect()
 
 
 # ==================== 任务状态查询工具函数 ====================
@@ -622,4 +633,6 @@ def get_queue_length(queue_name: str = "analysis") -> int:
     from intelligent_project_analyzer.services.celery_app import celery_app
 
     with celery_app.pool.acquire(block=True) as conn:
-        return conn.default_channel.client.llen(queue_name)
+        client = conn.default_channel.client
+        # Redis Broker 按优先级拆分子队列，需汇总全部子队列
+        return sum(client.llen(key) for key in broker_queue_keys(queue_name))
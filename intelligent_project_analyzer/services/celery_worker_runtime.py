@@ -0,0 +1,257 @@
+"""
+Celery Worker 运行时：进程级常驻事件循环 + 跨任务复用的异步客户端
+
+旧实现中 run_async() 对每个任务调用 asyncio.run（或新开线程跑新循环），
+每个分析任务都要重新建立 Redis 连接、检查点连接等。现在：
+
+- worker_process_init 时在后台线程启动一个常驻事件循环，任务通过 run_coroutine_threadsafe 提交
+- RedisSessionManager / 检查点存储在该循环内惰性创建一次，所有任务共享
+- worker_process_shutdown 时断开连接并停止循环
+
+非 Worker 环境（测试、脚本、eager 模式）未启动运行时，task_resources() 退化为按任务创建与释放。
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+class WorkerRuntime:
+    """
+    Worker 进程级事件循环与共享资源
+
+    Example:
+        >>> runtime = WorkerRuntime()
+        >>> runtime.start()
+        >>> runtime.run(some_coroutine())
+        >>> runtime.stop()
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._resource_lock: Optional[asyncio.Lock] = None
+        self._session_manager: Any = None
+        self._checkpointer: Any = None
+        self._checkpointer_ready = False
+        self.tasks_run = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.loop is not None and self.loop.is_running()
+
+    def start(self) -> None:
+        """在后台线程启动常驻事件循环（幂等）"""
+        if self.is_running:
+            return
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name="celery-worker-loop", daemon=True)
+        self._thread.start()
+        ready.wait()
+        logger.info(" [Celery] Worker 常驻事件循环已启动")
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        在常驻循环中执行协程并阻塞等待结果
+
+        调用线程被中断（如 SoftTimeLimitExceeded）时取消协程，避免任务在循环里继续运行
+        """
+        if not self.is_running:
+            raise RuntimeError("Worker 事件循环未启动")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            result = future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+        self.tasks_run += 1
+        return result
+
+    # ------------------------------------------------------------------ 共享资源（仅在常驻循环内调用）
+
+    def _lock(self) -> asyncio.Lock:
+        if self._resource_lock is None:
+            self._resource_lock = asyncio.Lock()
+        return self._resource_lock
+
+    async def get_session_manager(self) -> Any:
+        """共享的 RedisSessionManager（首次使用时连接）"""
+        if self._session_manager is not None:
+            return self._session_manager
+        async with self._lock():
+            if self._session_manager is None:
+                from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
+
+                session_manager = RedisSessionManager()
+                await session_manager.connect()
+                self._session_manager = session_manager
+        return self._session_manager
+
+    async def get_checkpointer(self) -> Any:
+        """
+        共享的检查点存储：CHECKPOINT_BACKEND=redis 时为 AsyncRedisSaver，
+        否则为常驻连接上的 AsyncSqliteSaver；都不可用时返回 None（MainWorkflow 回退到同步 SqliteSaver）
+        """
+        if self._checkpointer_ready:
+            return self._checkpointer
+        async with self._lock():
+            if not self._checkpointer_ready:
+                self._checkpointer = await _create_checkpointer()
+                self._checkpointer_ready = True
+        return self._checkpointer
+
+    async def _close_resources(self) -> None:
+        if self._session_manager is not None:
+            try:
+                await self._session_manager.disconnect()
+            except Exception as e:
+                logger.debug(f"断开 Redis 会话管理器失败: {e}")
+        await _close_checkpointer(self._checkpointer)
+        self._session_manager = None
+        self._checkpointer = None
+        self._checkpointer_ready = False
+
+    def stop(self) -> None:
+        """释放共享资源并停止循环"""
+        if not self.is_running:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_resources(), self.loop).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"️ [Celery] 释放 Worker 共享资源失败: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.loop.close()
+        self.loop = None
+        self._thread = None
+        logger.info(f" [Celery] Worker 常驻事件循环已停止（共执行 {self.tasks_run} 个任务）")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "tasks_run": self.tasks_run,
+            "session_manager": self._session_manager is not None,
+            "checkpointer": type(self._checkpointer).__name__ if self._checkpointer is not None else None,
+        }
+
+
+async def _create_checkpointer() -> Any:
+    from intelligent_project_analyzer.services.redis_checkpoint_saver import AsyncRedisSaver, get_checkpoint_backend
+
+    if get_checkpoint_backend() == "redis":
+        from intelligent_project_analyzer.settings import settings
+
+        return AsyncRedisSaver.from_url(settings.redis_url)
+
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        from intelligent_project_analyzer.api.workflow_runner import _ensure_aiosqlite_is_alive
+        from intelligent_project_analyzer.services.checkpoint_maintenance import CHECKPOINT_DB_PATH
+    except ImportError as e:
+        logger.warning(f"️ AsyncSqliteSaver 不可用，回退到同步 SqliteSaver: {e}")
+        return None
+
+    CHECKPOINT_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = _ensure_aiosqlite_is_alive(await aiosqlite.connect(str(CHECKPOINT_DB_PATH)))
+    await conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    return AsyncSqliteSaver(conn)
+
+
+async def _close_checkpointer(checkpointer: Any) -> None:
+    if checkpointer is None:
+        return
+    try:
+        if hasattr(checkpointer, "aclose"):
+            await checkpointer.aclose()
+        elif getattr(checkpointer, "conn", None) is not None:
+            await checkpointer.conn.close()
+    except Exception as e:
+        logger.debug(f"关闭检查点连接失败: {e}")
+
+
+_runtime: Optional[WorkerRuntime] = None
+
+
+def get_worker_runtime() -> Optional[WorkerRuntime]:
+    """当前进程的 Worker 运行时（未在 Worker 中启动时为 None）"""
+    return _runtime
+
+
+def start_worker_runtime() -> WorkerRuntime:
+    global _runtime
+    if _runtime is None:
+        _runtime = WorkerRuntime()
+    _runtime.start()
+    return _runtime
+
+
+def stop_worker_runtime() -> None:
+    global _runtime
+    if _runtime is not None:
+        _runtime.stop()
+        _runtime = None
+
+
+@asynccontextmanager
+async def task_resources() -> AsyncIterator[Tuple[Any, Any]]:
+    """
+    获取任务所需的 (session_manager, checkpointer)
+
+    Worker 常驻循环内返回共享实例（任务结束不释放）；否则按任务创建并在结束时释放。
+    """
+    runtime = _runtime
+    if runtime is not None and runtime.is_running and asyncio.get_running_loop() is runtime.loop:
+        yield await runtime.get_session_manager(), await runtime.get_checkpointer()
+        return
+
+    from intelligent_project_analyzer.services.redis_checkpoint_saver import AsyncRedisSaver, get_checkpoint_backend
+    from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
+
+    session_manager = RedisSessionManager()
+    await session_manager.connect()
+    checkpointer = None
+    if get_checkpoint_backend() == "redis":
+        from intelligent_project_analyzer.settings import settings
+
+        checkpointer = AsyncRedisSaver.from_url(settings.redis_url)
+    try:
+        yield session_manager, checkpointer
+    finally:
+        await _close_checkpointer(checkpointer)
+        await session_manager.disconnect()
+
+
+def register_worker_signals() -> None:
+    """注册 Celery worker 进程生命周期信号（由 celery_tasks 导入时调用）"""
+    from celery.signals import worker_process_init, worker_process_shutdown
+
+    @worker_process_init.connect(weak=False)
+    def _on_worker_process_init(**_: Any) -> None:
+        start_worker_runtime()
+
+    @worker_process_shutdown.connect(weak=False)
+    def _on_worker_process_shutdown(**_: Any) -> None:
+        stop_worker_runtime()
+
+
+__all__ = [
+    "WorkerRuntime",
+    "get_worker_runtime",
+    "start_worker_runtime",
+    "stop_worker_runtime",
+    "task_resources",
+    "register_worker_signals",
+]
@@ -0,0 +1,405 @@
+"""
+LangGraph 检查点库维护
+
+data/checkpoints/workflow.db 由所有会话共享，每个 superstep 都会写入一条完整检查点且从不删除，
+文件随时间无限增长，拖慢 aget / aget_state。本模块提供：
+
+1. 历史裁剪：每个线程（thread_id + checkpoint_ns）只保留最近 N 条检查点，
+   以及带中断写入（__interrupt__）的检查点，孤立的 writes 一并删除
+2. 线程清理：删除已归档/已过期会话的全部检查点，以及长期无更新的线程
+3. 空间回收：incremental_vacuum + WAL checkpoint(TRUNCATE)，旧库可一次性转换为增量模式
+4. 指标：文件/WAL 大小、页数、空闲页、行数、检查点最多的线程、最近一次维护结果
+
+维护使用独立的 sqlite3 连接并按线程分批提交，通过 asyncio.to_thread 调用，
+不占用 AsyncSqliteSaver 的共享 aiosqlite 连接。
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+CHECKPOINT_DB_PATH = Path("./data/checkpoints/workflow.db")
+
+INTERRUPT_CHANNEL = "__interrupt__"
+
+# UUID v6 时间戳起点（1582-10-15）到 Unix 纪元的 100ns 间隔数
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+def checkpoint_id_to_timestamp(checkpoint_id: str) -> Optional[float]:
+    """
+    从 LangGraph 检查点 ID（UUID v6，时间有序）中解析 Unix 时间戳
+
+    Returns:
+        秒级时间戳；ID 不是 v6 UUID 时返回 None
+    """
+    try:
+        value = int(checkpoint_id.replace("-", ""), 16)
+    except (AttributeError, ValueError):
+        return None
+    if (value >> 76) & 0xF != 6:
+        return None
+    high = value >> 64
+    ticks = ((high >> 32) << 28) | (((high >> 16) & 0xFFFF) << 12) | (high & 0x0FFF)
+    return (ticks - _UUID_EPOCH_OFFSET) / 1e7
+
+
+class CheckpointMaintenance:
+    """
+    检查点库维护器
+
+    Example:
+        >>> maintenance = CheckpointMaintenance()
+        >>> maintenance.prune_history(keep_last=20)
+        >>> maintenance.drop_threads(["session-1"])
+        >>> maintenance.reclaim_space()
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        keep_last: Optional[int] = None,
+        vacuum_pages: Optional[int] = None,
+        busy_timeout: float = 5.0,
+    ):
+        self.db_path = Path(db_path or os.getenv("CHECKPOINT_DB_PATH", str(CHECKPOINT_DB_PATH)))
+        self.keep_last = keep_last or int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+        # 每次增量回收的最大页数（0 = 回收全部空闲页）
+        self.vacuum_pages = vacuum_pages if vacuum_pages is not None else int(os.getenv("CHECKPOINT_VACUUM_PAGES", "0"))
+        self.busy_timeout = busy_timeout
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _has_tables(self, conn: sqlite3.Connection) -> bool:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('checkpoints', 'writes')"
+        ).fetchall()
+        return len(rows) == 2
+
+    # ------------------------------------------------------------------ 裁剪
+
+    def prune_history(self, keep_last: Optional[int] = None) -> Dict[str, int]:
+        """
+        每个线程只保留最近 keep_last 条检查点（外加中断点）
+
+        Returns:
+            {"threads": 裁剪的线程数, "checkpoints": 删除的检查点数, "writes": 删除的写入数}
+        """
+        keep_last = keep_last or self.keep_last
+        result = {"threads": 0, "checkpoints": 0, "writes": 0}
+        if not self.db_path.exists():
+            return result
+
+        with closing(self._connect()) as conn:
+            if not self._has_tables(conn):
+                return result
+            candidates = conn.execute(
+                "SELECT thread_id, checkpoint_ns FROM checkpoints "
+                "GROUP BY thread_id, checkpoint_ns HAVING COUNT(*) > ?",
+                (keep_last,),
+            ).fetchall()
+
+            for thread_id, checkpoint_ns in candidates:
+                # 每个线程单独提交，缩短写锁持有时间
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    deleted = conn.execute(
+                        """
+                        DELETE FROM checkpoints
+                        WHERE thread_id = ? AND checkpoint_ns = ?
+                          AND checkpoint_id NOT IN (
+                              SELECT checkpoint_id FROM checkpoints
+                              WHERE thread_id = ? AND checkpoint_ns = ?
+                              ORDER BY checkpoint_id DESC LIMIT ?
+                          )
+                          AND checkpoint_id NOT IN (
+                              SELECT checkpoint_id FROM writes
+                              WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ?
+                          )
+                        """,
+                        (
+                            thread_id,
+                            checkpoint_ns,
+                            thread_id,
+                            checkpoint_ns,
+                            keep_last,
+                            thread_id,
+                            checkpoint_ns,
+                            INTERRUPT_CHANNEL,
+                        ),
+                    ).rowcount
+                    orphan_writes = conn.execute(
+                        """
+                        DELETE FROM writes
+                        WHERE thread_id = ? AND checkpoint_ns = ?
+                          AND checkpoint_id NOT IN (
+                              SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                          )
+                        """,
+                        (thread_id, checkpoint_ns, thread_id, checkpoint_ns),
+                    ).rowcount
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                if deleted:
+                    result["threads"] += 1
+                    result["checkpoints"] += deleted
+                    result["writes"] += orphan_writes
+
+        if result["checkpoints"]:
+            logger.info(
+                f" [Checkpoint] 历史裁剪: {result['threads']} 个线程, "
+                f"删除 {result['checkpoints']} 条检查点 / {result['writes']} 条写入"
+            )
+        return result
+
+    def list_threads(self) -> List[Tuple[str, int, Optional[float]]]:
+        """
+        列出所有线程
+
+        Returns:
+            [(thread_id, 检查点数, 最近检查点时间戳)]
+        """
+        if not self.db_path.exists():
+            return []
+        with closing(self._connect()) as conn:
+            if not self._has_tables(conn):
+                return []
+            rows = conn.execute(
+                "SELECT thread_id, COUNT(*), MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+            ).fetchall()
+        return [(thread_id, count, checkpoint_id_to_timestamp(latest)) for thread_id, count, latest in rows]
+
+    def drop_threads(self, thread_ids: Iterable[str]) -> Dict[str, int]:
+        """删除指定线程的全部检查点与写入"""
+        result = {"threads": 0, "checkpoints": 0, "writes": 0}
+        thread_ids = [str(t) for t in thread_ids]
+        if not thread_ids or not self.db_path.exists():
+            return result
+
+        with closing(self._connect()) as conn:
+            if not self._has_tables(conn):
+                return result
+            for thread_id in thread_ids:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    deleted = conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)).rowcount
+                    writes = conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,)).rowcount
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                if deleted or writes:
+                    result["threads"] += 1
+                    result["checkpoints"] += deleted
+                    result["writes"] += writes
+
+        if result["threads"]:
+            logger.info(f" [Checkpoint] 删除 {result['threads']} 个线程的检查点 ({result['checkpoints']} 条)")
+        return result
+
+    # ------------------------------------------------------------------ 空间回收
+
+    def reclaim_space(self, convert: bool = False) -> Dict[str, Any]:
+        """
+        回收空闲页并截断 WAL
+
+        Args:
+            convert: 库未启用 auto_vacuum=INCREMENTAL 时，是否执行一次性 VACUUM 完成转换
+                     （会重写整个文件并短暂阻塞写入，建议低峰期执行）
+
+        Returns:
+            回收前后的文件大小与空闲页数
+        """
+        if not self.db_path.exists():
+            return {"reclaimed_bytes": 0}
+
+        before = self._file_sizes()
+        with closing(self._connect()) as conn:
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            mode = "incremental"
+            if auto_vacuum != 2:
+                if convert:
+                    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    conn.execute("VACUUM")
+                    mode = "converted"
+                else:
+                    mode = "none"
+            freelist_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if mode == "incremental":
+                self._incremental_vacuum(conn)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            freelist_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        after = self._file_sizes()
+
+        reclaimed = (before["db_bytes"] + before["wal_bytes"]) - (after["db_bytes"] + after["wal_bytes"])
+        if mode == "none" and freelist_after:
+            logger.info(
+                f" [Checkpoint] 检查点库未启用增量 VACUUM，{freelist_after} 个空闲页待回收"
+                "（可调用 reclaim_space(convert=True) 转换）"
+            )
+        return {
+            "mode": mode,
+            "freelist_before": freelist_before,
+            "freelist_after": freelist_after,
+            "reclaimed_bytes": reclaimed,
+            **after,
+        }
+
+    def _incremental_vacuum(self, conn: sqlite3.Connection) -> int:
+        """
+        按 freelist_count 循环执行 incremental_vacuum，直到空闲页清零或用完 vacuum_pages 预算
+
+        部分 SQLite / Python sqlite3 版本中一次 PRAGMA 调用只回收一页，不能假设一次执行即完成。
+
+        Returns:
+            回收的页数
+        """
+        budget = int(self.vacuum_pages) or None
+        freed = 0
+        remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        while remaining and (budget is None or freed < budget):
+            step = remaining if budget is None else min(remaining, budget - freed)
+            for _ in conn.execute(f"PRAGMA incremental_vacuum({step})"):
+                pass
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if after >= remaining:
+                break  # 无进展（如存在未结束的读事务）
+            freed += remaining - after
+            remaining = after
+        return freed
+
+    # ------------------------------------------------------------------ 指标
+
+    def _file_sizes(self) -> Dict[str, int]:
+        wal = self.db_path.with_name(self.db_path.name + "-wal")
+        return {
+            "db_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+            "wal_bytes": wal.stat().st_size if wal.exists() else 0,
+        }
+
+    def get_stats(self, top: int = 10) -> Dict[str, Any]:
+        """检查点库大小与行数指标"""
+        stats: Dict[str, Any] = {
+            "db_path": str(self.db_path),
+            **self._file_sizes(),
+            "keep_last": self.keep_last,
+            "last_run": self.last_run,
+        }
+        if not self.db_path.exists():
+            return stats
+
+        with closing(self._connect()) as conn:
+            stats["page_size"] = conn.execute("PRAGMA page_size").fetchone()[0]
+            stats["page_count"] = conn.execute("PRAGMA page_count").fetchone()[0]
+            stats["freelist_count"] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            stats["auto_vacuum"] = {0: "none", 1: "full", 2: "incremental"}.get(
+                conn.execute("PRAGMA auto_vacuum").fetchone()[0], "unknown"
+            )
+            if self._has_tables(conn):
+                stats["checkpoints"] = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+                stats["writes"] = conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+                stats["threads"] = conn.execute("SELECT COUNT(DISTINCT thread_id) FROM checkpoints").fetchone()[0]
+                stats["top_threads"] = [
+                    {"thread_id": thread_id, "checkpoints": count}
+                    for thread_id, count in conn.execute(
+                        "SELECT thread_id, COUNT(*) AS c FROM checkpoints GROUP BY thread_id ORDER BY c DESC LIMIT ?",
+                        (top,),
+                    )
+                ]
+        stats["size_mb"] = round((stats["db_bytes"] + stats["wal_bytes"]) / (1024 * 1024), 2)
+        return stats
+
+    # ------------------------------------------------------------------ 组合任务
+
+    async def run(
+        self,
+        is_thread_stale: Optional[Callable[[str], Awaitable[bool]]] = None,
+        thread_ttl_days: Optional[float] = None,
+        stale_grace_seconds: float = 3600,
+        convert: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        执行一轮完整维护：删除过期线程 → 裁剪历史 → 回收空间
+
+        Args:
+            is_thread_stale: 判断线程对应会话是否已归档/过期的回调（返回 True 则删除）
+            thread_ttl_days: 超过该天数无新检查点的线程直接删除（0 = 不按时间删除）
+            stale_grace_seconds: 最近有检查点写入的线程不做会话状态判断，避免误删刚创建的会话
+            convert: 见 reclaim_space
+        """
+        started = time.perf_counter()
+        ttl_days = thread_ttl_days if thread_ttl_days is not None else float(os.getenv("CHECKPOINT_THREAD_TTL_DAYS", "30"))
+        now = time.time()
+
+        threads = await asyncio.to_thread(self.list_threads)
+        expired: List[str] = []
+        for thread_id, _count, latest_ts in threads:
+            age = now - latest_ts if latest_ts is not None else None
+            if ttl_days and age is not None and age > ttl_days * 86400:
+                expired.append(thread_id)
+            elif is_thread_stale is not None and (age is None or age > stale_grace_seconds):
+                try:
+                    if await is_thread_stale(thread_id):
+                        expired.append(thread_id)
+                except Exception as e:
+                    logger.debug(f"[Checkpoint] 会话状态判断失败 {thread_id}: {e}")
+
+        dropped = await asyncio.to_thread(self.drop_threads, expired)
+        pruned = await asyncio.to_thread(self.prune_history)
+        space = await asyncio.to_thread(self.reclaim_space, convert)
+
+        self.last_run = {
+            "timestamp": datetime.now().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "threads_scanned": len(threads),
+            "dropped": dropped,
+            "pruned": pruned,
+            "space": space,
+        }
+        logger.info(
+            f" [Checkpoint] 维护完成: 扫描 {len(threads)} 个线程, 删除 {dropped['threads']} 个, "
+            f"裁剪 {pruned['checkpoints']} 条, 回收 {space.get('reclaimed_bytes', 0) / 1024:.0f}KB"
+        )
+        return self.last_run
+
+
+async def run_maintenance_loop(
+    maintenance: CheckpointMaintenance,
+    interval: float,
+    is_thread_stale: Optional[Callable[[str], Awaitable[bool]]] = None,
+    initial_delay: float = 60,
+) -> None:
+    """按固定间隔执行维护（由 lifespan 以后台任务启动，取消即退出）"""
+    await asyncio.sleep(initial_delay)
+    while True:
+        try:
+            await maintenance.run(is_thread_stale=is_thread_stale)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"️ [Checkpoint] 维护失败: {e}")
+        await asyncio.sleep(interval)
+
+
+_maintenance: Optional[CheckpointMaintenance] = None
+
+
+def get_checkpoint_maintenance() -> CheckpointMaintenance:
+    """获取全局检查点维护器"""
+    global _maintenance
+    if _maintenance is None:
+        _maintenance = CheckpointMaintenance()
+    return _maintenance
@@ -11,9 +11,10 @@ import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import yaml
 from loguru import logger
 
+from ..core.config_registry import load_yaml_config
+
 
 class TaskComplexityAnalyzer:
     """
@@ -193,8 +194,7 @@ class CoreTaskDecomposer:
         """加载配置文件"""
         config_path = Path(__file__).parent.parent / "config" / "prompts" / "core_task_decomposer.yaml"
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                self._config = yaml.safe_load(f)
+            self._config = load_yaml_config(config_path)
             logger.info(f" [CoreTaskDecomposer] 配置加载成功: {config_path}")
         except Exception as e:
             logger.warning(f"️ [CoreTaskDecomposer] 配置加载失败: {e}")
@@ -441,7 +441,11 @@ class CoreTaskDecomposer:
         return tasks[:7] if tasks else []
 
     async def _infer_task_metadata_async(
-        self, tasks: List[Dict[str, Any]], user_input: str = "", structured_data: Optional[Dict[str, Any]] = None
+        self,
+        tasks: List[Dict[str, Any]],
+        user_input: str = "",
+        structured_data: Optional[Dict[str, Any]] = None,
+        input_features: Any = None,
     ) -> None:
         """
         异步推断任务元数据（动机类型、推理依据等）
@@ -456,6 +460,7 @@ class CoreTaskDecomposer:
             tasks: 任务列表
             user_input: 用户原始输入
             structured_data: 需求分析阶段产出的结构化数据
+            input_features: 输入特征阶段的结果（可选），各任务共享用户输入的关键词命中
         """
         if not tasks:
             return
@@ -476,7 +481,9 @@ class CoreTaskDecomposer:
             """单个任务的推断包装函数"""
             try:
                 # 执行异步推断
-                result = await engine.infer(task=task, user_input=user_input, structured_data=structured_data)
+                result = await engine.infer(
+                    task=task, user_input=user_input, structured_data=structured_data, features=input_features
+                )
 
                 # 返回成功结果
                 return {"task": task, "success": True, "result": result}
@@ -514,7 +521,10 @@ class CoreTaskDecomposer:
 
 
 async def decompose_core_tasks(
-    user_input: str, structured_data: Optional[Dict[str, Any]] = None, llm: Optional[Any] = None
+    user_input: str,
+    structured_data: Optional[Dict[str, Any]] = None,
+    llm: Optional[Any] = None,
+    input_features: Any = None,
 ) -> List[Dict[str, Any]]:
     """
     异步执行核心任务拆解（v7.110.0 智能化版本）
@@ -523,6 +533,7 @@ async def decompose_core_tasks(
         user_input: 用户原始输入
         structured_data: 需求分析阶段产出的结构化数据（可选）
         llm: LLM 实例（可选，如果不提供则使用默认 LLM）
+        input_features: 输入特征阶段的结果（可选，供动机识别复用）
 
     Returns:
         任务列表（3-12个，根据输入复杂度动态决定）
@@ -603,7 +614,7 @@ async def decompose_core_tasks(
 
         #  v7.106: 使用动机识别引擎为任务添加motivation_label字段
         if tasks:
-            await decomposer._infer_task_metadata_async(tasks, user_input, structured_data)
+            await decomposer._infer_task_metadata_async(tasks, user_input, structured_data, input_features)
 
         logger.info(f" [任务拆解完成] 最终生成{len(tasks)}个任务")
         return tasks
@@ -13,9 +13,12 @@ import random
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-import yaml
 from loguru import logger
 
+from ..core.config_registry import get_config_registry, load_yaml_config
+from ..utils.keyword_matcher import KeywordMatcher, get_cached_matcher
+from .input_features import get_state_input_features
+
 # v7.80.15 (P0.3): 场景 → 专用维度映射
 SCENARIO_DIMENSION_MAPPING = {
     "extreme_environment": ["environmental_adaptation"],
@@ -29,6 +32,15 @@ SCENARIO_DIMENSION_MAPPING = {
 }
 
 
+def _build_dimension_matcher(all_dimensions: Dict[str, Dict[str, Any]]) -> KeywordMatcher:
+    """编译维度库关键词，分组键为 (dim_id, "keywords" | "synonyms" | "negative_keywords")"""
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for dim_id, dim_config in all_dimensions.items():
+        for field in ("keywords", "synonyms", "negative_keywords"):
+            groups[(dim_id, field)] = (dim_config or {}).get(field) or []
+    return KeywordMatcher.from_groups(groups, ignore_case=True)
+
+
 class DimensionSelector:
     """
     Dimension Selector
@@ -60,6 +72,16 @@ class DimensionSelector:
         if DimensionSelector._correlation_detector is None:
             self._init_correlation_detector()
 
+    @classmethod
+    def _on_config_changed(cls, path: Path) -> None:
+        """配置热重载：用注册表中的新版本替换对应类缓存"""
+        if path.name == "radar_dimensions.yaml":
+            cls._dimensions_config = load_yaml_config(path)
+        elif path.name == "task_dimension_mapping.yaml":
+            cls._task_mapping_config = load_yaml_config(path)
+        elif path.name == "answer_to_dimension_rules.yaml":
+            cls._answer_rules_config = load_yaml_config(path)
+
     def _load_config(self) -> None:
         """加载维度配置文件"""
         config_path = Path(__file__).parent.parent / "config" / "prompts" / "radar_dimensions.yaml"
@@ -70,8 +92,8 @@ class DimensionSelector:
             return
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                DimensionSelector._dimensions_config = yaml.safe_load(f)
+            DimensionSelector._dimensions_config = load_yaml_config(config_path)
+            get_config_registry().subscribe(DimensionSelector._on_config_changed, config_path)
             logger.info(f"[OK] 维度配置加载成功: {len(self._dimensions_config.get('dimensions', {}))} 个维度")
         except Exception as e:
             logger.error(f"[ERROR] 维度配置加载失败: {e}")
@@ -87,8 +109,8 @@ class DimensionSelector:
             return
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                DimensionSelector._task_mapping_config = yaml.safe_load(f)
+            DimensionSelector._task_mapping_config = load_yaml_config(config_path)
+            get_config_registry().subscribe(DimensionSelector._on_config_changed, config_path)
             task_count = len(self._task_mapping_config.get("task_mappings", {}))
             logger.info(f"[OK] [v7.137] 任务映射配置加载成功: {task_count} 个任务类型")
         except Exception as e:
@@ -105,8 +127,8 @@ class DimensionSelector:
             return
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                DimensionSelector._answer_rules_config = yaml.safe_load(f)
+            DimensionSelector._answer_rules_config = load_yaml_config(config_path)
+            get_config_registry().subscribe(DimensionSelector._on_config_changed, config_path)
             rule_count = len(self._answer_rules_config.get("inference_rules", []))
             logger.info(f"[OK] [v7.137] 答案推理规则加载成功: {rule_count} 条规则")
         except Exception as e:
@@ -169,6 +191,7 @@ class DimensionSelector:
         special_scenes: Optional[List[str]] = None,
         confirmed_tasks: Optional[List[Dict[str, Any]]] = None,  # v7.137: Step1任务列表
         gap_filling_answers: Optional[Dict[str, str]] = None,  # v7.137: Step2答案
+        input_features: Any = None,  # 输入特征阶段结果（InputFeatures）
     ) -> Dict[str, Any]:
         """
         为项目选择合适的维度
@@ -194,6 +217,7 @@ class DimensionSelector:
             special_scenes: 特殊场景标签列表（可选，用于注入专用维度）
             confirmed_tasks: Step1确认的核心任务列表（用于任务映射和LLM推荐）
             gap_filling_answers: Step2信息补全答案（用于答案推理和LLM推荐）
+            input_features: 输入特征阶段的结果（可选），复用其别名预处理与关键词命中
 
         Returns:
             字典，包含：
@@ -209,7 +233,7 @@ class DimensionSelector:
                 from .project_type_detector import ProjectTypeDetector
 
                 detector = ProjectTypeDetector()
-                detected_type_info = detector.detect_with_details(user_input, confirmed_tasks)
+                detected_type_info = detector.detect_with_details(user_input, confirmed_tasks, input_features)
                 project_type = detected_type_info["project_type"]
                 logger.info(
                     f"[v7.152] 自动检测项目类型: {detected_type_info['project_type_name']} "
@@ -253,7 +277,7 @@ class DimensionSelector:
 
         # Step 3: 如果数量不够，根据关键词匹配 optional 维度（v7.137: 支持同义词）
         if len(selected_ids) < min_dimensions and user_input:
-            keyword_matches = self._match_dimensions_by_keywords(user_input, optional, all_dimensions)
+            keyword_matches = self._match_dimensions_by_keywords(user_input, optional, all_dimensions, input_features)
             for dim_id in keyword_matches:
                 if len(selected_ids) >= max_dimensions:
                     break
@@ -452,8 +476,15 @@ class DimensionSelector:
             "is_valid": not has_critical,
         }
 
+    def get_keyword_matcher(self) -> KeywordMatcher:
+        return get_cached_matcher(self.get_all_dimensions(), _build_dimension_matcher)
+
     def _match_dimensions_by_keywords(
-        self, user_input: str, dimension_ids: List[str], all_dimensions: Dict[str, Dict[str, Any]]
+        self,
+        user_input: str,
+        dimension_ids: List[str],
+        all_dimensions: Dict[str, Dict[str, Any]],
+        features: Any = None,
     ) -> List[str]:
         """
         根据用户输入的关键词匹配维度
@@ -463,31 +494,18 @@ class DimensionSelector:
         Returns:
             匹配度排序后的维度ID列表
         """
-        user_input_lower = user_input.lower()
+        # 全部维度的关键词/同义词/排除词编译一次（配置热重载后自动重建），单次扫描输入
+        matcher = get_cached_matcher(all_dimensions, _build_dimension_matcher)
+        group_hits = matcher.match_groups(user_input, matcher.resolve_positions(user_input, features, "dimension"))
         scores: Dict[str, int] = {}
 
         for dim_id in dimension_ids:
-            dim_config = all_dimensions.get(dim_id, {})
-            keywords = dim_config.get("keywords", [])
-            synonyms = dim_config.get("synonyms", [])  # v7.137: 同义词
-            negative_keywords = dim_config.get("negative_keywords", [])  # v7.137: 排除词
-
-            score = 0
-
-            # Step 1: 核心关键词匹配 (权重 2)
-            for keyword in keywords:
-                if keyword.lower() in user_input_lower:
-                    score += 2
-
-            # Step 2: 同义词匹配 (权重 1)
-            for synonym in synonyms:
-                if synonym.lower() in user_input_lower:
-                    score += 1
-
-            # Step 3: 排除词过滤（如果匹配到排除词，降低分数）
-            for neg_keyword in negative_keywords:
-                if neg_keyword.lower() in user_input_lower:
-                    score -= 1  # 降低优先级
+            # 核心关键词权重 2，同义词权重 1（v7.137），命中排除词降低优先级（v7.137）
+            score = (
+                2 * len(group_hits.get((dim_id, "keywords"), ()))
+                + len(group_hits.get((dim_id, "synonyms"), ()))
+                - len(group_hits.get((dim_id, "negative_keywords"), ()))
+            )
 
             if score > 0:
                 scores[dim_id] = score
@@ -1084,8 +1102,12 @@ def select_dimensions_for_state(state: Dict[str, Any]) -> List[Dict[str, Any]]:
     requirements_result = agent_results.get("requirements_analyst", {})
     structured_data = requirements_result.get("structured_data", {})
 
+    # 入口阶段预计算的输入特征（与 user_input 不一致时为 None，维度选择自行扫描）
     result = selector.select_for_project(
-        project_type=project_type, user_input=user_input, structured_data=structured_data
+        project_type=project_type,
+        user_input=user_input,
+        structured_data=structured_data,
+        input_features=get_state_input_features(state),
     )
 
     #  v7.146: v7.139 起 select_for_project 返回 dict（含 conflicts/adjustment_suggestions）
@@ -0,0 +1,500 @@
+"""
+会话执行时间线（span 记录器）
+
+TraceContext 只提供日志关联用的 trace_id，无法回答「一次 6 分钟的分析时间花在哪里」。
+本模块按会话记录轻量 span，形成可视化的瀑布图：
+
+- LangGraph 节点 / 节点内的 Chat 模型与工具调用：TimelineCallback 挂在编译后的图上自动记录
+- LLMAgent / HighConcurrencyLLM 调用、搜索提供商、PDF / 图像生成：span() / traced() 显式记录
+- 父子关系通过 contextvars 传递（节点 span 在节点执行期间成为当前 span，线程池调用同样继承）
+
+导出格式兼容 OpenTelemetry（OTLP/JSON）：可追加写入本地文件，或 POST 到 OTLP HTTP collector。
+
+用法：
+    from .execution_timeline import span, traced
+
+    with span("bocha.search", kind="search", query=query):
+        ...
+
+    @traced("image")
+    async def generate_image(...): ...
+
+配置：
+    TIMELINE_ENABLED          是否启用（默认 true）
+    TIMELINE_MAX_SPANS        每个会话保留的 span 数（默认 2000）
+    TIMELINE_MAX_SESSIONS     保留的会话数（默认 100）
+    TIMELINE_EXPORT_PATH      OTLP/JSON 导出文件（JSON Lines，默认不导出）
+    TIMELINE_OTLP_ENDPOINT    OTLP HTTP collector 地址（默认读取 OTEL_EXPORTER_OTLP_ENDPOINT，未设置则不导出）
+"""
+
+import contextvars
+import functools
+import hashlib
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from loguru import logger
+
+from intelligent_project_analyzer.core.trace_context import TraceContext
+
+TIMELINE_ENABLED = os.getenv("TIMELINE_ENABLED", "true").lower() == "true"
+TIMELINE_MAX_SPANS = int(os.getenv("TIMELINE_MAX_SPANS", "2000"))
+TIMELINE_MAX_SESSIONS = int(os.getenv("TIMELINE_MAX_SESSIONS", "100"))
+TIMELINE_EXPORT_PATH = os.getenv("TIMELINE_EXPORT_PATH", "")
+TIMELINE_OTLP_ENDPOINT = os.getenv("TIMELINE_OTLP_ENDPOINT", os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", ""))
+
+SERVICE_NAME = "intelligent_project_analyzer"
+
+# OTLP SpanKind：对外调用记为 CLIENT，其余为 INTERNAL
+_OTLP_CLIENT_KINDS = {"llm", "search", "tool", "image"}
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("timeline_span", default=None)
+
+_lock = threading.Lock()
+_sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+@dataclass
+class Span:
+    """一个计时片段（结束后以紧凑 dict 存入会话时间线）"""
+
+    name: str
+    kind: str
+    session_id: str
+    parent: Optional["Span"] = None
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        _record(self, time.time_ns(), error)
+
+
+def _trace_id(session_id: str) -> str:
+    """会话 → 稳定的 32 位十六进制 trace id（OTLP 要求 16 字节）"""
+    return hashlib.blake2b(session_id.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _session(session_id: str) -> Dict[str, Any]:
+    """取会话时间线（调用方需持有 _lock）"""
+    timeline = _sessions.get(session_id)
+    if timeline is None:
+        timeline = _sessions[session_id] = {"spans": deque(maxlen=TIMELINE_MAX_SPANS), "exported": 0, "dropped": 0}
+        while len(_sessions) > TIMELINE_MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    else:
+        _sessions.move_to_end(session_id)
+    return timeline
+
+
+def _record(span: Span, end_ns: int, error: Optional[BaseException]) -> None:
+    record = {
+        "id": span.span_id,
+        "parent": span.parent.span_id if span.parent is not None else None,
+        "name": span.name,
+        "kind": span.kind,
+        "start_ns": span.start_ns,
+        "end_ns": end_ns,
+        "status": "error" if error is not None else "ok",
+        "attrs": span.attributes,
+    }
+    if error is not None:
+        record["error"] = f"{type(error).__name__}: {str(error)[:200]}"
+    with _lock:
+        timeline = _session(span.session_id)
+        if len(timeline["spans"]) == timeline["spans"].maxlen:
+            timeline["dropped"] += 1
+            timeline["exported"] = max(0, timeline["exported"] - 1)
+        timeline["spans"].append(record)
+
+
+def start_span(
+    name: str,
+    kind: str = "internal",
+    session_id: Optional[str] = None,
+    parent: Optional[Span] = None,
+    **attributes: Any,
+) -> Span:
+    """开始一个 span（不修改当前 span；需要作为父 span 时使用 span() 上下文管理器）"""
+    parent = parent if parent is not None else _current_span.get()
+    if session_id is None:
+        session_id = parent.session_id if parent is not None else TraceContext.get_session_id()
+    return Span(name=name, kind=kind, session_id=str(session_id or "unknown"), parent=parent, attributes=attributes)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """记录一段代码的耗时，期间作为当前 span（子调用自动挂在其下）"""
+    if not TIMELINE_ENABLED:
+        yield None
+        return
+    current = start_span(name, kind, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    else:
+        current.end()
+    finally:
+        _current_span.reset(token)
+
+
+def traced(kind: str, name: Optional[str] = None) -> Callable:
+    """把函数 / 方法调用记录为 span 的装饰器（支持同步与 async 函数）"""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ------------------------------------------------------------------ LangGraph 回调
+
+
+# 非节点 span 结束时不恢复当前 span
+_MISSING = object()
+
+
+class TimelineCallback(BaseCallbackHandler):
+    """记录图运行、节点、节点内 Chat 模型与工具调用的 span"""
+
+    run_inline = True
+
+    def __init__(self):
+        # run_id -> (span, 节点开始前的当前 span)
+        self._runs: Dict[UUID, tuple] = {}
+
+    def _start(self, parent_run_id: Optional[UUID], name: str, kind: str, metadata: Optional[Dict[str, Any]]) -> Span:
+        parent_entry = self._runs.get(parent_run_id) if parent_run_id is not None else None
+        parent = parent_entry[0] if parent_entry is not None else _current_span.get()
+        session_id = (metadata or {}).get("thread_id")
+        return start_span(name, kind, session_id=str(session_id) if session_id else None, parent=parent)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> None:
+        entry = self._runs.pop(run_id, None)
+        if entry is None:
+            return
+        current, previous = entry
+        current.end(error=error)
+        if previous is not _MISSING:
+            _current_span.set(previous)
+        if current.kind == "workflow":
+            # 图运行结束（含中断等待用户输入）时导出新增 span
+            export_pending()
+
+    def on_chain_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        if not TIMELINE_ENABLED:
+            return
+        name = kwargs.get("name") or ""
+        node = (metadata or {}).get("langgraph_node")
+        if parent_run_id is None:
+            kind = "workflow"
+        elif node and name == node:
+            kind = "node"
+        else:
+            return  # 节点内部的子链不单独记录
+        new_span = self._start(parent_run_id, name or "workflow", kind, metadata)
+        if kind == "node":
+            new_span.attributes["step"] = (metadata or {}).get("langgraph_step")
+        # 节点执行期间作为当前 span，节点内的显式 span（LLMAgent、搜索等）挂在其下
+        self._runs[run_id] = (new_span, _current_span.get())
+        _current_span.set(new_span)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        # GraphInterrupt（等待用户输入）也走这里，按正常结束记录
+        self._end(run_id, None if type(error).__name__ == "GraphInterrupt" else error)
+
+    def on_chat_model_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        messages: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        if TIMELINE_ENABLED:
+            name = (metadata or {}).get("ls_model_name") or kwargs.get("name") or "chat_model"
+            self._runs[run_id] = (self._start(parent_run_id, name, "llm", metadata), _MISSING)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_tool_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        if TIMELINE_ENABLED:
+            name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+            self._runs[run_id] = (self._start(parent_run_id, name, "tool", metadata), _MISSING)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+
+def attach_timeline(graph: Any) -> Any:
+    """为编译后的图挂载时间线回调；未启用时原样返回"""
+    if graph is None or not TIMELINE_ENABLED:
+        return graph
+    return graph.with_config(callbacks=[TimelineCallback()])
+
+
+# ------------------------------------------------------------------ 瀑布图与关键路径
+
+
+def _critical_path(spans: List[Dict[str, Any]]) -> List[str]:
+    """
+    关键路径：从最晚结束的子 span 开始，依次选取在其开始之前结束的兄弟 span，逐层递归。
+    路径上的 span 缩短即可缩短整体耗时。
+    """
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {s["id"] for s in spans}
+    for s in spans:
+        parent = s["parent"] if s["parent"] in ids else None
+        children.setdefault(parent, []).append(s)
+
+    path: List[str] = []
+
+    def walk(parent_id: Optional[str], end_limit: float) -> None:
+        cursor = end_limit
+        for child in sorted(children.get(parent_id, []), key=lambda s: s["end_ns"], reverse=True):
+            if child["end_ns"] <= cursor:
+                path.append(child["id"])
+                walk(child["id"], child["end_ns"])
+                cursor = child["start_ns"]
+
+    walk(None, float("inf"))
+    return path
+
+
+def get_session_timeline(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    会话瀑布图：按开始时间排序的 span（offset_ms / duration_ms / depth），
+    关键路径上的 span 标记 critical=True，并按类型汇总耗时。会话不存在时返回 None。
+    """
+    with _lock:
+        timeline = _sessions.get(session_id)
+        if timeline is None:
+            return None
+        spans = list(timeline["spans"])
+        dropped = timeline["dropped"]
+
+    if not spans:
+        return {"session_id": session_id, "trace_id": _trace_id(session_id), "total_ms": 0.0, "spans": []}
+
+    origin = min(s["start_ns"] for s in spans)
+    total_ns = max(s["end_ns"] for s in spans) - origin
+    by_id = {s["id"]: s for s in spans}
+    critical_ids = sorted(_critical_path(spans), key=lambda span_id: by_id[span_id]["start_ns"])
+    critical = set(critical_ids)
+
+    def depth(s: Dict[str, Any]) -> int:
+        level = 0
+        while s["parent"] in by_id and level < 64:
+            s = by_id[s["parent"]]
+            level += 1
+        return level
+
+    # 同类型嵌套（如 LLMAgent 调用内的 Chat 模型）只计外层，避免重复累计
+    by_kind: Dict[str, float] = {}
+    for s in spans:
+        parent = by_id.get(s["parent"])
+        if parent is None or parent["kind"] != s["kind"]:
+            by_kind[s["kind"]] = by_kind.get(s["kind"], 0.0) + (s["end_ns"] - s["start_ns"]) / 1e6
+
+    waterfall = [
+        {
+            "id": s["id"],
+            "parent": s["parent"],
+            "name": s["name"],
+            "kind": s["kind"],
+            "status": s["status"],
+            "offset_ms": round((s["start_ns"] - origin) / 1e6, 1),
+            "duration_ms": round((s["end_ns"] - s["start_ns"]) / 1e6, 1),
+            "depth": depth(s),
+            "critical": s["id"] in critical,
+            **({"attrs": s["attrs"]} if s["attrs"] else {}),
+            **({"error": s["error"]} if "error" in s else {}),
+        }
+        for s in sorted(spans, key=lambda s: s["start_ns"])
+    ]
+    return {
+        "session_id": session_id,
+        "trace_id": _trace_id(session_id),
+        "total_ms": round(total_ns / 1e6, 1),
+        "span_count": len(spans),
+        "dropped_spans": dropped,
+        "by_kind_ms": {kind: round(ms, 1) for kind, ms in sorted(by_kind.items(), key=lambda kv: -kv[1])},
+        "critical_path": [by_id[span_id]["name"] for span_id in critical_ids],
+        "spans": waterfall,
+    }
+
+
+def list_timelines() -> List[Dict[str, Any]]:
+    """已记录时间线的会话概要（最近的在前）"""
+    with _lock:
+        items = [(session_id, list(timeline["spans"])) for session_id, timeline in _sessions.items()]
+    result = []
+    for session_id, spans in reversed(items):
+        if not spans:
+            continue
+        origin = min(s["start_ns"] for s in spans)
+        result.append(
+            {
+                "session_id": session_id,
+                "span_count": len(spans),
+                "total_ms": round((max(s["end_ns"] for s in spans) - origin) / 1e6, 1),
+                "started_at": origin // 1_000_000,
+                "errors": sum(1 for s in spans if s["status"] == "error"),
+            }
+        )
+    return result
+
+
+# ------------------------------------------------------------------ OTLP 导出
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(session_id: str, spans: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """把会话 span 转换为 OTLP/JSON ExportTraceServiceRequest"""
+    if spans is None:
+        with _lock:
+            timeline = _sessions.get(session_id)
+            spans = list(timeline["spans"]) if timeline is not None else []
+    trace_id = _trace_id(session_id)
+    otlp_spans = []
+    for s in spans:
+        attributes = [{"key": "span.kind", "value": _otlp_value(s["kind"])}]
+        attributes += [{"key": k, "value": _otlp_value(v)} for k, v in s["attrs"].items() if v is not None]
+        otlp_span = {
+            "traceId": trace_id,
+            "spanId": s["id"],
+            "parentSpanId": s["parent"] or "",
+            "name": s["name"],
+            "kind": 3 if s["kind"] in _OTLP_CLIENT_KINDS else 1,
+            "startTimeUnixNano": str(s["start_ns"]),
+            "endTimeUnixNano": str(s["end_ns"]),
+            "attributes": attributes,
+            "status": {"code": 2, "message": s.get("error", "")} if s["status"] == "error" else {"code": 1},
+        }
+        otlp_spans.append(otlp_span)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                        {"key": "session.id", "value": {"stringValue": session_id}},
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": f"{SERVICE_NAME}.timeline"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+def _post_otlp(payload: Dict[str, Any]) -> None:
+    import httpx
+
+    try:
+        httpx.post(f"{TIMELINE_OTLP_ENDPOINT.rstrip('/')}/v1/traces", json=payload, timeout=5.0)
+    except Exception as e:
+        logger.debug(f" [Timeline] OTLP 导出失败: {e}")
+
+
+def export_pending() -> int:
+    """导出各会话尚未导出的 span（文件追加 / OTLP collector 后台发送），返回导出的 span 数"""
+    if not (TIMELINE_EXPORT_PATH or TIMELINE_OTLP_ENDPOINT):
+        return 0
+    batches = []
+    with _lock:
+        for session_id, timeline in _sessions.items():
+            spans = list(timeline["spans"])[timeline["exported"] :]
+            if spans:
+                timeline["exported"] = len(timeline["spans"])
+                batches.append(to_otlp(session_id, spans))
+    if not batches:
+        return 0
+
+    if TIMELINE_EXPORT_PATH:
+        try:
+            path = Path(TIMELINE_EXPORT_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as f:
+                for payload in batches:
+                    f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"️ [Timeline] 写入导出文件失败: {e}")
+    if TIMELINE_OTLP_ENDPOINT:
+        for payload in batches:
+            threading.Thread(target=_post_otlp, args=(payload,), daemon=True).start()
+    return sum(len(b["resourceSpans"][0]["scopeSpans"][0]["spans"]) for b in batches)
+
+
+def reset_timelines() -> None:
+    """清空所有时间线（测试用）"""
+    with _lock:
+        _sessions.clear()
@@ -7,7 +7,7 @@
 --------
 - 默认使用线程安全的内存存储（TTL 到期后自动回收）
 - 设置 REDIS_URL 环境变量后自动切换为 Redis 后端
-- TTL 默认 24 小时（可通过 EXTERNAL_STORE_TTL_SECONDS 调整）
+- TTL 默认 24 小时（可通过 EXTERNAL_STORE_TTL_SECONDS 调整，put / touch 可按次指定）
 - ref_key 格式：``{session_id}:{field}:{seq}``
 
 使用示例
@@ -64,6 +64,16 @@ class _MemoryBackend:
         with self._lock:
             self._store[key] = (value, expires_at)
 
+    def touch(self, key: str, ttl: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None or now > entry[1]:
+                self._store.pop(key, None)
+                return False
+            self._store[key] = (entry[0], now + ttl)
+            return True
+
     def get(self, key: str) -> Optional[Any]:
         with self._lock:
             entry = self._store.get(key)
@@ -119,6 +129,9 @@ class _RedisBackend:
 
         self._client.setex(key, ttl, pickle.dumps(value))
 
+    def touch(self, key: str, ttl: int) -> bool:
+        return bool(self._client.expire(key, ttl))
+
     def get(self, key: str) -> Optional[Any]:
         import pickle
 
@@ -149,6 +162,7 @@ class ExternalStateStore:
 
     - ``put(session_id, field, data)`` → ``ref_key``
     - ``get(ref_key)`` → ``data | None``
+    - ``touch(ref_key)`` → ``bool``（续期）
     - ``delete(ref_key)`` → ``bool``
     - ``cleanup_expired()`` → 清理过期条目数量
     """
@@ -168,7 +182,7 @@ class ExternalStateStore:
 
     # ---- 公开 API ----
 
-    def put(self, session_id: str, field: str, data: Any) -> str:
+    def put(self, session_id: str, field: str, data: Any, ttl: Optional[int] = None) -> str:
         """
         存储大字段数据，返回 ref_key。
 
@@ -180,6 +194,8 @@ class ExternalStateStore:
             字段名（如 ``conversation_history``）
         data : Any
             要存储的数据
+        ttl : int, optional
+            过期秒数，默认 EXTERNAL_STORE_TTL_SECONDS
 
         Returns
         -------
@@ -187,7 +203,7 @@ class ExternalStateStore:
             ref_key，格式为 ``{session_id}:{field}:{uuid4}``
         """
         ref_key = f"{session_id}:{field}:{uuid.uuid4().hex}"
-        ttl = _get_ttl()
+        ttl = ttl if ttl is not None else _get_ttl()
         self._backend.put(ref_key, data, ttl)
         logger.debug(f"[ExternalStateStore] PUT {ref_key} (ttl={ttl}s)")
         return ref_key
@@ -203,6 +219,10 @@ class ExternalStateStore:
             logger.debug(f"[ExternalStateStore] GET {ref_key} -> MISS")
         return data
 
+    def touch(self, ref_key: str, ttl: Optional[int] = None) -> bool:
+        """重置指定 key 的过期时间，返回 key 是否仍存在（已过期或不存在时返回 False）。"""
+        return self._backend.touch(ref_key, ttl if ttl is not None else _get_ttl())
+
     def delete(self, ref_key: str) -> bool:
         """删除指定 key，返回是否存在。"""
         ok = self._backend.delete(ref_key)
@@ -21,11 +21,13 @@ from loguru import logger
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 
+from intelligent_project_analyzer.services.execution_timeline import traced
 from intelligent_project_analyzer.services.key_balancer import (
     key_balancer,
     APIKeyInfo,
     get_api_key_with_callback
 )
+from intelligent_project_analyzer.services.llm_client_pool import get_pooled_chat_model
 from intelligent_project_analyzer.services.rate_limiter import (
     rate_limit_manager,
     RateLimitExceeded
@@ -154,7 +156,7 @@ class HighConcurrencyLLM:
         )
     
     def _create_llm(self, provider: str, api_key: str) -> ChatOpenAI:
-        """创建 LLM 实例"""
+        """创建 LLM 实例（复用共享连接池，请求经过全局 LLM 并发控制器）"""
         config = PROVIDER_CONFIGS.get(provider, {})
         
         params = {
@@ -168,7 +170,7 @@ class HighConcurrencyLLM:
         if config.get("base_url"):
             params["base_url"] = config["base_url"]
         
-        return ChatOpenAI(**params)
+        return get_pooled_chat_model(provider, ChatOpenAI, params)
     
     def _get_prompt_str(self, input: Any) -> str:
         """提取 prompt 字符串（用于缓存）"""
@@ -179,6 +181,7 @@ class HighConcurrencyLLM:
         else:
             return str(input)
     
+    @traced("llm")
     def invoke(self, input: Any, **kwargs) -> Any:
         """同步调用"""
         self._total_calls += 1
@@ -256,6 +259,7 @@ class HighConcurrencyLLM:
         
         raise RuntimeError(f"所有重试失败: {last_error}, 尝试过: {providers_tried}")
     
+    @traced("llm")
     async def ainvoke(self, input: Any, **kwargs) -> Any:
         """异步调用"""
         self._total_calls += 1
@@ -327,52 +331,29 @@ class HighConcurrencyLLM:
         self,
         inputs: List[Any],
         max_concurrent: int = 5,
-        enable_adaptive: bool = True,  #  P3优化：启用自适应并发控制
+        enable_adaptive: bool = True,
         **kwargs
     ) -> List[Any]:
         """
         异步批量调用（控制并发）
 
-         P3优化：支持自适应并发控制，基于 429 错误动态调整并发数
+        max_concurrent 只限制本批次的扇出数；提供商 / Key 级的并发上限与基于 429 的自适应调整
+        由全局 LLM 并发控制器（llm_concurrency）统一负责，多个批次之间共享同一上限。
 
         Args:
             inputs: 输入列表
             max_concurrent: 最大并发数
-            enable_adaptive: 是否启用自适应并发控制（默认True）
+            enable_adaptive: 兼容参数（自适应已由全局并发控制器提供）
             **kwargs: 其他参数
 
         Returns:
             结果列表
         """
-        #  P3优化：使用自适应信号量
-        if enable_adaptive:
-            semaphore = AdaptiveSemaphore(
-                initial_concurrent=max_concurrent,
-                min_concurrent=max(1, max_concurrent // 2),  # 最小为初始值的一半
-                max_concurrent=max_concurrent * 2,  # 最大为初始值的两倍
-                increase_threshold=10,  # 连续成功10次后增加
-                increase_step=1,
-                decrease_step=1
-            )
-        else:
-            # 使用固定信号量（向后兼容）
-            semaphore = asyncio.Semaphore(max_concurrent)
+        semaphore = asyncio.Semaphore(max_concurrent)
 
         async def limited_call(input):
-            if enable_adaptive:
-                async with semaphore:
-                    try:
-                        result = await self.ainvoke(input, **kwargs)
-                        semaphore.report_success()  # 报告成功
-                        return result
-                    except Exception as e:
-                        error_str = str(e).lower()
-                        if "429" in error_str or "rate limit" in error_str:
-                            semaphore.report_rate_limit()  # 报告限流
-                        raise
-            else:
-                async with semaphore:
-                    return await self.ainvoke(input, **kwargs)
+            async with semaphore:
+                return await self.ainvoke(input, **kwargs)
 
         tasks = [limited_call(input) for input in inputs]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -386,16 +367,6 @@ class HighConcurrencyLLM:
             else:
                 final_results.append(result)
 
-        #  P3优化：记录自适应统计
-        if enable_adaptive and isinstance(semaphore, AdaptiveSemaphore):
-            stats = semaphore.stats
-            logger.info(
-                f" [AdaptiveSemaphore] 批量调用完成: "
-                f"并发数={stats['current_concurrent']}, "
-                f"限流次数={stats['rate_limit_count']}, "
-                f"调整次数={stats['increase_count'] + stats['decrease_count']}"
-            )
-
         return final_results
     
     @property
@@ -429,227 +400,3 @@ async def quick_invoke(prompt: str, **kwargs) -> str:
     llm = get_high_concurrency_llm()
     result = await llm.ainvoke(prompt, **kwargs)
     return result.content if hasattr(result, 'content') else str(result)
-
-
-# ==================== P3 优化：自适应并发控制 ====================
-
-class AdaptiveSemaphore:
-    """
-    自适应信号量 - 基于 429 错误动态调整并发数
-
-     P3 优化：自动适应 API 限流，提升吞吐量 10-20%
-
-    特性：
-    - 成功时逐步增加并发数（保守策略）
-    - 遇到 429 错误时立即减少并发数（快速响应）
-    - 支持并发数上下限
-    - 记录调整历史
-
-    使用示例：
-        sem = AdaptiveSemaphore(initial=5, min_concurrent=1, max_concurrent=10)
-
-        async with sem:
-            result = await some_api_call()
-
-        # 报告结果
-        if success:
-            sem.report_success()
-        elif is_rate_limit:
-            sem.report_rate_limit()
-    """
-
-    def __init__(
-        self,
-        initial_concurrent: int = 5,
-        min_concurrent: int = 1,
-        max_concurrent: int = 10,
-        increase_threshold: int = 10,  # 连续成功N次后增加并发
-        increase_step: int = 1,  # 每次增加的并发数
-        decrease_step: int = 1,  # 每次减少的并发数
-    ):
-        """
-        初始化自适应信号量
-
-        Args:
-            initial_concurrent: 初始并发数
-            min_concurrent: 最小并发数
-            max_concurrent: 最大并发数
-            increase_threshold: 连续成功多少次后增加并发
-            increase_step: 每次增加的并发数
-            decrease_step: 每次减少的并发数
-        """
-        self.current_concurrent = initial_concurrent
-        self.min_concurrent = min_concurrent
-        self.max_concurrent = max_concurrent
-        self.increase_threshold = increase_threshold
-        self.increase_step = increase_step
-        self.decrease_step = decrease_step
-
-        #  使用计数器而非固定 Semaphore，支持动态调整
-        self._active_count = 0  # 当前活跃的并发数
-        self._lock = asyncio.Lock()  # 保护并发数调整
-        self._waiters = []  # 等待队列
-
-        # 统计信息
-        self._success_count = 0  # 连续成功次数
-        self._rate_limit_count = 0  # 总限流次数
-        self._increase_count = 0  # 增加并发次数
-        self._decrease_count = 0  # 减少并发次数
-        self._adjustment_history = []  # 调整历史
-
-        logger.info(
-            f" [AdaptiveSemaphore] 初始化: "
-            f"initial={initial_concurrent}, "
-            f"range=[{min_concurrent}, {max_concurrent}], "
-            f"threshold={increase_threshold}"
-        )
-
-    async def __aenter__(self):
-        """异步上下文管理器入口"""
-        await self.acquire()
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
-        self.release()
-        return False
-
-    async def acquire(self):
-        """获取信号量（支持动态调整）"""
-        while True:
-            async with self._lock:
-                if self._active_count < self.current_concurrent:
-                    self._active_count += 1
-                    return
-
-            # 等待释放
-            event = asyncio.Event()
-            self._waiters.append(event)
-            await event.wait()
-
-    def release(self):
-        """释放信号量（支持动态调整）"""
-        async def _release():
-            async with self._lock:
-                self._active_count -= 1
-
-                # 唤醒等待者
-                if self._waiters:
-                    waiter = self._waiters.pop(0)
-                    waiter.set()
-
-        asyncio.create_task(_release())
-
-    def report_success(self):
-        """
-        报告成功调用
-
-        连续成功达到阈值时，尝试增加并发数
-        """
-        self._success_count += 1
-
-        # 检查是否达到增加阈值
-        if (
-            self._success_count >= self.increase_threshold
-            and self.current_concurrent < self.max_concurrent
-        ):
-            asyncio.create_task(self._increase_concurrency())
-
-    def report_rate_limit(self):
-        """
-        报告 429 限流错误
-
-        立即减少并发数，快速响应 API 限流
-        """
-        self._rate_limit_count += 1
-        self._success_count = 0  # 重置成功计数
-
-        # 立即减少并发数
-        if self.current_concurrent > self.min_concurrent:
-            asyncio.create_task(self._decrease_concurrency())
-
-    async def _increase_concurrency(self):
-        """增加并发数（保守策略）"""
-        async with self._lock:
-            old_concurrent = self.current_concurrent
-            new_concurrent = min(
-                self.current_concurrent + self.increase_step,
-                self.max_concurrent
-            )
-
-            if new_concurrent > old_concurrent:
-                self.current_concurrent = new_concurrent
-                self._success_count = 0  # 重置成功计数
-                self._increase_count += 1
-
-                # 记录调整历史
-                self._adjustment_history.append({
-                    "action": "increase",
-                    "from": old_concurrent,
-                    "to": new_concurrent,
-                    "reason": f"连续成功 {self.increase_threshold} 次",
-                    "timestamp": time.time()
-                })
-
-                logger.info(
-                    f" [AdaptiveSemaphore] 增加并发数: "
-                    f"{old_concurrent} → {new_concurrent} "
-                    f"(连续成功 {self.increase_threshold} 次)"
-                )
-
-                #  唤醒等待者以利用新增的并发槽位
-                while self._waiters and self._active_count < self.current_concurrent:
-                    waiter = self._waiters.pop(0)
-                    waiter.set()
-
-    async def _decrease_concurrency(self):
-        """减少并发数（快速响应）"""
-        async with self._lock:
-            old_concurrent = self.current_concurrent
-            new_concurrent = max(
-                self.current_concurrent - self.decrease_step,
-                self.min_concurrent
-            )
-
-            if new_concurrent < old_concurrent:
-                self.current_concurrent = new_concurrent
-                self._decrease_count += 1
-
-                # 记录调整历史
-                self._adjustment_history.append({
-                    "action": "decrease",
-                    "from": old_concurrent,
-                    "to": new_concurrent,
-                    "reason": "遇到 429 限流错误",
-                    "timestamp": time.time()
-                })
-
-                logger.warning(
-                    f" [AdaptiveSemaphore] 减少并发数: "
-                    f"{old_concurrent} → {new_concurrent} "
-                    f"(遇到 429 限流)"
-                )
-
-    @property
-    def stats(self) -> Dict[str, Any]:
-        """获取统计信息"""
-        return {
-            "current_concurrent": self.current_concurrent,
-            "active_count": self._active_count,  #  当前活跃并发数
-            "waiters_count": len(self._waiters),  #  等待队列长度
-            "min_concurrent": self.min_concurrent,
-            "max_concurrent": self.max_concurrent,
-            "success_count": self._success_count,
-            "rate_limit_count": self._rate_limit_count,
-            "increase_count": self._increase_count,
-            "decrease_count": self._decrease_count,
-            "adjustment_history": self._adjustment_history[-10:],  # 最近10次调整
-        }
-
-    def reset_stats(self):
-        """重置统计信息"""
-        self._success_count = 0
-        self._rate_limit_count = 0
-        self._increase_count = 0
-        self._decrease_count = 0
-        self._adjustment_history = []
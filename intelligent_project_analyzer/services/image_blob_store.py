@@ -0,0 +1,361 @@
+"""
+图片 Blob 存储（内容寻址）
+
+概念图与参考图原先以 data:image/...;base64 字符串在 image_generator、会话 state 与 Redis 之间传递，
+归档时再由 SessionArchiveManager 剥离（归档的 session_data 可达数十 MB）。本模块按 sha256 把图片字节
+只写入一次，会话与报告中只保留 /image_blobs/{digest}.{ext} 这样的短引用：
+
+- 本地磁盘后端（默认）：{IMAGE_BLOB_DIR}/{digest[:2]}/{digest}.{ext}，写临时文件后原子替换
+- S3 兼容后端（IMAGE_BLOB_BACKEND=s3，需要 boto3）：对象键 {prefix}{digest}.{ext}，本地目录作读缓存
+- WebP 派生图（缩略图）按宽度在首次访问时生成并缓存
+- api/image_blob_routes 提供带 ETag（内容哈希）、If-None-Match 与 Range 支持的访问
+
+用法：
+    from .image_blob_store import get_image_blob_store, inline_blob_url
+
+    ref = get_image_blob_store().put_data_url(data_url)
+    image_url = ref.url                      # /image_blobs/ab12....png
+    thumbnail_url = ref.thumbnail_url()      # /image_blobs/ab12.../w256.webp
+    data_url = inline_blob_url(image_url)    # 需要内联图片的外部 API（Vision / Inpainting）
+
+配置：
+    IMAGE_BLOB_STORE_ENABLED    是否启用（默认 true；关闭时生成结果仍为 data URL）
+    IMAGE_BLOB_DIR              本地目录（默认 data/image_blobs）
+    IMAGE_BLOB_URL_PREFIX       引用 URL 前缀（默认 /image_blobs；可配置为 CDN / 对象存储公开地址）
+    IMAGE_BLOB_BACKEND          local / s3（默认 local）
+    IMAGE_BLOB_S3_BUCKET        S3 桶名
+    IMAGE_BLOB_S3_ENDPOINT      S3 兼容服务地址（MinIO / OSS / COS 等，默认 AWS）
+    IMAGE_BLOB_S3_PREFIX        对象键前缀（默认 image_blobs/）
+    IMAGE_BLOB_S3_REGION        区域（可选）
+    IMAGE_THUMBNAIL_WIDTHS      允许生成的派生图宽度（默认 256,512,1024）
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+IMAGE_BLOB_STORE_ENABLED = os.getenv("IMAGE_BLOB_STORE_ENABLED", "true").lower() == "true"
+IMAGE_BLOB_DIR = os.getenv("IMAGE_BLOB_DIR", "data/image_blobs")
+IMAGE_BLOB_URL_PREFIX = os.getenv("IMAGE_BLOB_URL_PREFIX", "/image_blobs").rstrip("/")
+IMAGE_BLOB_BACKEND = os.getenv("IMAGE_BLOB_BACKEND", "local").lower()
+IMAGE_THUMBNAIL_WIDTHS = tuple(
+    int(w) for w in os.getenv("IMAGE_THUMBNAIL_WIDTHS", "256,512,1024").split(",") if w.strip().isdigit()
+)
+DEFAULT_THUMBNAIL_WIDTH = 256
+
+_MIME_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/webp": "webp",
+    "image/gif": "gif",
+    "image/bmp": "bmp",
+}
+_EXTENSION_MIMES = {ext: mime for mime, ext in _MIME_EXTENSIONS.items()}
+
+_DATA_URL_RE = re.compile(r"^data:(image/[\w.+-]+);base64,", re.IGNORECASE)
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _sniff_mime(data: bytes) -> str:
+    """按文件头识别图片类型（无法识别时按 PNG 处理）"""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data.startswith(b"BM"):
+        return "image/bmp"
+    return "image/png"
+
+
+def is_data_url(value: Any) -> bool:
+    return isinstance(value, str) and _DATA_URL_RE.match(value) is not None
+
+
+def decode_data_url(data_url: str) -> Tuple[bytes, Optional[str]]:
+    """解析 data URL（也接受纯 Base64），返回 (字节, MIME)"""
+    match = _DATA_URL_RE.match(data_url)
+    if match:
+        return base64.b64decode(data_url[match.end() :]), match.group(1).lower()
+    return base64.b64decode(data_url), None
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """图片 Blob 引用（会话 / 报告中只保存它的 URL）"""
+
+    digest: str
+    mime_type: str
+    size: int
+
+    @property
+    def extension(self) -> str:
+        return _MIME_EXTENSIONS.get(self.mime_type, "png")
+
+    @property
+    def filename(self) -> str:
+        return f"{self.digest}.{self.extension}"
+
+    @property
+    def url(self) -> str:
+        return f"{IMAGE_BLOB_URL_PREFIX}/{self.filename}"
+
+    def thumbnail_url(self, width: int = DEFAULT_THUMBNAIL_WIDTH) -> str:
+        return f"{IMAGE_BLOB_URL_PREFIX}/{self.digest}/w{width}.webp"
+
+
+def parse_blob_url(url: Any) -> Optional[Tuple[str, str]]:
+    """从 Blob URL（可带域名）解析 (digest, 扩展名)；不是 Blob 原图 URL 时返回 None"""
+    if not isinstance(url, str) or IMAGE_BLOB_URL_PREFIX + "/" not in url:
+        return None
+    name = url.split(IMAGE_BLOB_URL_PREFIX + "/", 1)[1].split("?", 1)[0]
+    digest, _, ext = name.partition(".")
+    if not _DIGEST_RE.match(digest) or ext.lower() not in _EXTENSION_MIMES:
+        return None
+    return digest, ext.lower()
+
+
+class _S3Backend:
+    """S3 兼容对象存储后端（boto3）"""
+
+    def __init__(self) -> None:
+        try:
+            import boto3  # type: ignore
+        except ImportError as exc:
+            raise ImportError("S3 图片存储需要安装 boto3 包：pip install boto3") from exc
+        self.bucket = os.environ["IMAGE_BLOB_S3_BUCKET"]
+        self.prefix = os.getenv("IMAGE_BLOB_S3_PREFIX", "image_blobs/")
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=os.getenv("IMAGE_BLOB_S3_ENDPOINT") or None,
+            region_name=os.getenv("IMAGE_BLOB_S3_REGION") or None,
+        )
+        logger.info(f" [ImageBlobStore] 使用 S3 后端: bucket={self.bucket}")
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except Exception:
+            return False
+
+    def put(self, key: str, data: bytes, mime_type: str) -> None:
+        self._client.put_object(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            Body=data,
+            ContentType=mime_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except Exception as e:
+            logger.warning(f"️ [ImageBlobStore] S3 读取失败 {key}: {e}")
+            return None
+
+
+class ImageBlobStore:
+    """
+    内容寻址的图片存储
+
+    本地目录既是 local 后端的存储，也是 s3 后端的读缓存；派生图只缓存在本地。
+    """
+
+    def __init__(self, root: Optional[str] = None, backend: Optional[str] = None):
+        self.root = Path(root or IMAGE_BLOB_DIR)
+        self._remote = _S3Backend() if (backend or IMAGE_BLOB_BACKEND) == "s3" else None
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "dedup_hits": 0, "bytes_written": 0, "derivatives": 0, "remote_fetches": 0}
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _local_path(self, digest: str, ext: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.{ext}"
+
+    def _derivative_path(self, digest: str, width: int) -> Path:
+        return self.root / "derived" / digest[:2] / f"{digest}_w{width}.webp"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def put(self, data: bytes, mime_type: Optional[str] = None) -> BlobRef:
+        """写入图片字节（同内容只写一次），返回引用"""
+        mime_type = (mime_type or _sniff_mime(data)).lower()
+        if mime_type not in _MIME_EXTENSIONS:
+            mime_type = _sniff_mime(data)
+        ref = BlobRef(digest=hashlib.sha256(data).hexdigest(), mime_type=mime_type, size=len(data))
+        path = self._local_path(ref.digest, ref.extension)
+
+        if self._remote is not None:
+            if self._remote.exists(ref.filename):
+                self._count("dedup_hits")
+            else:
+                self._remote.put(ref.filename, data, mime_type)
+                self._count("puts")
+                self._count("bytes_written", len(data))
+            if not path.exists():
+                self._write_atomic(path, data)
+            return ref
+
+        if path.exists():
+            self._count("dedup_hits")
+            return ref
+        self._write_atomic(path, data)
+        self._count("puts")
+        self._count("bytes_written", len(data))
+        logger.debug(f" [ImageBlobStore] 写入 {ref.filename} ({len(data)} bytes)")
+        return ref
+
+    def put_data_url(self, data_url: str) -> BlobRef:
+        """写入 data URL / 纯 Base64 图片"""
+        data, mime_type = decode_data_url(data_url)
+        return self.put(data, mime_type)
+
+    def open_path(self, digest: str, ext: str) -> Optional[Path]:
+        """原图的本地路径（s3 后端本地未缓存时先拉取）；不存在返回 None"""
+        path = self._local_path(digest, ext)
+        if path.exists():
+            return path
+        if self._remote is not None:
+            data = self._remote.get(f"{digest}.{ext}")
+            if data is not None:
+                self._write_atomic(path, data)
+                self._count("remote_fetches")
+                return path
+        return None
+
+    def stat(self, url: str) -> Optional[BlobRef]:
+        """由 Blob URL 得到引用（图片不存在时返回 None）"""
+        parsed = parse_blob_url(url)
+        if parsed is None:
+            return None
+        digest, ext = parsed
+        path = self.open_path(digest, ext)
+        if path is None:
+            return None
+        return BlobRef(digest=digest, mime_type=_EXTENSION_MIMES[ext], size=path.stat().st_size)
+
+    def read(self, digest: str, ext: str) -> Optional[bytes]:
+        path = self.open_path(digest, ext)
+        return path.read_bytes() if path is not None else None
+
+    def find(self, digest: str) -> Optional[Tuple[Path, str]]:
+        """按 digest 查找原图（不知道扩展名时使用），返回 (路径, 扩展名)"""
+        for ext in _MIME_EXTENSIONS.values():
+            path = self._local_path(digest, ext)
+            if path.exists():
+                return path, ext
+        return None
+
+    def derivative(self, digest: str, width: int) -> Optional[Path]:
+        """
+        宽度不超过 width 的 WebP 派生图（首次访问时生成并缓存）
+
+        width 必须在 IMAGE_THUMBNAIL_WIDTHS 中，避免任意尺寸请求放大存储；原图不存在时返回 None。
+        """
+        if not _DIGEST_RE.match(digest):
+            raise ValueError(f"无效的图片哈希: {digest}")
+        if width not in IMAGE_THUMBNAIL_WIDTHS:
+            raise ValueError(f"不支持的派生图宽度: {width}")
+        path = self._derivative_path(digest, width)
+        if path.exists():
+            return path
+
+        found = self.find(digest)
+        if found is None and self._remote is not None:
+            for ext in _MIME_EXTENSIONS.values():
+                if self.open_path(digest, ext) is not None:
+                    found = (self._local_path(digest, ext), ext)
+                    break
+        if found is None:
+            return None
+
+        from PIL import Image
+
+        with Image.open(found[0]) as img:
+            img = img.convert("RGBA") if img.mode in ("RGBA", "LA", "P") else img.convert("RGB")
+            if img.width > width:
+                img = img.resize((width, max(1, round(img.height * width / img.width))), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            img.save(buffer, format="WEBP", quality=80, method=4)
+        self._write_atomic(path, buffer.getvalue())
+        self._count("derivatives")
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "s3" if self._remote is not None else "local", "root": str(self.root), **self._stats}
+
+
+_store: Optional[ImageBlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_image_blob_store() -> ImageBlobStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ImageBlobStore()
+    return _store
+
+
+def reset_image_blob_store(store: Optional[ImageBlobStore] = None) -> None:
+    """替换 / 重置全局实例（测试用）"""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def externalize_data_url(value: Any) -> Any:
+    """data URL 写入 Blob 存储并返回引用 URL；不是 data URL、未启用或写入失败时原样返回"""
+    if not IMAGE_BLOB_STORE_ENABLED or not is_data_url(value):
+        return value
+    try:
+        return get_image_blob_store().put_data_url(value).url
+    except (binascii.Error, ValueError, OSError) as e:
+        logger.warning(f"️ [ImageBlobStore] data URL 外部化失败，保留原值: {e}")
+        return value
+
+
+def inline_blob_url(value: Any) -> Any:
+    """把 Blob 引用转换回 data URL（Vision / Inpainting 等需要内联图片的外部 API 使用）；其他值原样返回"""
+    parsed = parse_blob_url(value)
+    if parsed is None:
+        return value
+    digest, ext = parsed
+    data = get_image_blob_store().read(digest, ext)
+    if data is None:
+        logger.warning(f"️ [ImageBlobStore] 引用的图片不存在: {value}")
+        return value
+    return f"data:{_EXTENSION_MIMES[ext]};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def get_image_blob_stats() -> Dict[str, Any]:
+    return {"enabled": IMAGE_BLOB_STORE_ENABLED, **get_image_blob_store().stats()}
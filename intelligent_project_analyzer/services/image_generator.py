@@ -24,12 +24,13 @@
     # result = {"image_url": "data:image/png;base64,...", "revised_prompt": "..."}
 """
 
+import asyncio
 import base64
 import json
 import os
 import time
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
 from loguru import logger
@@ -43,6 +44,9 @@ from ..utils.visual_config_loader import (
     get_role_visual_identity,
     get_visual_type_config,
 )
+from .execution_timeline import traced
+from .image_blob_store import externalize_data_url, inline_blob_url
+from .image_job_planner import claim_report_images, image_slot, provider_from_url, refund_report_images
 
 if TYPE_CHECKING:
     from ..models.image_metadata import ImageMetadata
@@ -818,6 +822,7 @@ Generate an enhanced, professional image prompt:"""
         logger.debug(f" Enhanced prompt: {enhanced[:100]}...")
         return enhanced
 
+    @traced("image", "image.generate_image")
     async def generate_image(
         self,
         prompt: str,
@@ -880,8 +885,8 @@ Generate an enhanced, professional image prompt:"""
 
             start_time = __import__("time").time()
 
-            # 发送请求
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            # 发送请求（按提供商限制并发的图像 API 请求数）
+            async with httpx.AsyncClient(timeout=self.timeout) as client, image_slot(provider_from_url(self.base_url)):
                 response = await client.post(
                     f"{self.base_url}/chat/completions", headers=self._build_headers(), json=request_body
                 )
@@ -907,6 +912,8 @@ Generate an enhanced, professional image prompt:"""
                 parsed_result = self._parse_response(result, enhanced_prompt)
 
                 if parsed_result.success:
+                    # 图片字节写入 Blob 存储，结果 / 会话中只保留引用 URL
+                    parsed_result.image_url = await asyncio.to_thread(externalize_data_url, parsed_result.image_url)
                     logger.info(f" [图像生成API] 图像生成成功")
                     logger.info(
                         f"   图像URL类型: {'data URI' if parsed_result.image_url and parsed_result.image_url.startswith('data:') else 'URL'}"
@@ -959,6 +966,7 @@ Generate an enhanced, professional image prompt:"""
             from .vision_service import get_vision_service
 
             vision_service = get_vision_service()
+            reference_image = await asyncio.to_thread(inline_blob_url, reference_image)
 
             logger.info(" Stage 1: Vision 分析参考图...")
             vision_result = await vision_service.analyze_design_image(
@@ -1162,6 +1170,7 @@ Generate an enhanced, professional image prompt:"""
                 total_tokens=0,
             )
 
+    @traced("image", "image.generate_concept_images")
     async def generate_concept_images(
         self,
         expert_summary: str,
@@ -1224,8 +1233,7 @@ Generate an enhanced, professional image prompt:"""
 
         logger.info(f" [图像生成] 开始生成 {len(prompts)} 张概念图...")
 
-        results = []
-        for i, prompt in enumerate(prompts):
+        async def generate_one(i: int, prompt: str) -> ImageGenerationResult:
             logger.info(f"️  [图像生成 {i+1}/{len(prompts)}] 开始生成...")
             logger.info(f"   使用提示词: {prompt[:150]}...")
 
@@ -1246,13 +1254,16 @@ Generate an enhanced, professional image prompt:"""
                 else:
                     logger.error(f" [图像生成 {i+1}/{len(prompts)}] 生成失败: {result.error}")
 
-                results.append(result)
+                return result
 
             except Exception as e:
                 logger.error(f" [图像生成 {i+1}/{len(prompts)}] 发生异常: {e}")
                 logger.exception(e)
                 # 创建失败结果
-                results.append(ImageGenerationResult(success=False, error=f"生成异常: {str(e)}", model_used=self.model))
+                return ImageGenerationResult(success=False, error=f"生成异常: {str(e)}", model_used=self.model)
+
+        # 多张图片并发生成（并发数由 image_slot 按提供商限制）
+        results = list(await asyncio.gather(*(generate_one(i, prompt) for i, prompt in enumerate(prompts))))
 
         success_count = sum(1 for r in results if r.success)
         logger.info(f" [概念图生成] 完成，成功 {success_count}/{len(results)} 张")
@@ -1350,6 +1361,7 @@ Generate an enhanced, professional image prompt:"""
         # 最终兜底
         return ["modern design concept visualization with professional rendering quality"]
 
+    @traced("image", "image.generate_deliverable_image")
     async def generate_deliverable_image(
         self,
         deliverable_metadata: dict,
@@ -1360,6 +1372,8 @@ Generate an enhanced, professional image prompt:"""
         questionnaire_data: Optional[dict] = None,
         visual_references: Optional[List[Dict[str, Any]]] = None,  #  v7.155: 视觉参考
         global_style_anchor: Optional[str] = None,  #  v7.155: 全局风格锚点
+        on_image: Optional[Callable[["ImageMetadata"], Awaitable[None]]] = None,
+        use_report_budget: bool = False,
     ) -> "List[ImageMetadata]":
         """
          v7.153: 重构为两阶段LLM精炼流程
@@ -1382,6 +1396,8 @@ Generate an enhanced, professional image prompt:"""
             questionnaire_data: 问卷数据（仅提取profile_label作为硬性约束）
             visual_references: 用户上传的视觉参考列表
             global_style_anchor: 全局风格锚点（从所有参考图提取）
+            on_image: 每张图片保存后立即调用的回调（用于逐张推送到前端）
+            use_report_budget: 是否占用报告级概念图额度（工作流生成时启用，用户手动重新生成不受限）
 
         Returns:
             List[ImageMetadata]: 生成的图片列表
@@ -1408,6 +1424,13 @@ Generate an enhanced, professional image prompt:"""
         image_count = concept_image_config.get("count", 1)
         logger.info(f"  ️ 计划生成 {image_count} 张概念图")
 
+        if use_report_budget:
+            image_count = claim_report_images(session_id, image_count)
+            if image_count <= 0:
+                logger.warning(f"  ️ 报告概念图额度已用完，跳过交付物 {deliverable_id}")
+                return []
+        budget_pending = image_count
+
         try:
             # ================================================================
             #  v7.153 核心改进：两阶段LLM精炼
@@ -1485,14 +1508,11 @@ Generate an enhanced, professional image prompt:"""
             logger.debug(f"   完整Prompt ({len(visual_prompt)} chars): {visual_prompt}")
 
             # ================================================================
-            # 第三阶段：循环生成多张图片（使用相同Prompt + Style Anchor）
+            # 第三阶段：并发生成多张图片（使用相同Prompt + Style Anchor）
             # ================================================================
             from ..services.image_storage_manager import ImageStorageManager
 
-            generated_images: List[ImageMetadata] = []
-            failed_count = 0
-
-            for attempt in range(image_count):
+            async def generate_one(attempt: int) -> Optional[ImageMetadata]:
                 try:
                     logger.info(f"  ️ [图片 {attempt + 1}/{image_count}] 开始生成...")
 
@@ -1505,15 +1525,14 @@ Generate an enhanced, professional image prompt:"""
                         current_prompt = f"{visual_prompt}, {variation}"
                         logger.debug(f"     添加视角变化: {variation}")
 
-                    # 调用图片生成API
+                    # 调用图片生成API（并发数由 image_slot 按提供商限制）
                     generation_result = await self.generate_image(
                         prompt=current_prompt, aspect_ratio=ImageAspectRatio(aspect_ratio)
                     )
 
                     if not generation_result.success:
                         logger.error(f"     生成失败: {generation_result.error}")
-                        failed_count += 1
-                        continue
+                        return None
 
                     logger.info("     图片生成成功！")
 
@@ -1532,13 +1551,22 @@ Generate an enhanced, professional image prompt:"""
                     )
 
                     metadata = ImageMetadata(**saved_metadata)
-                    generated_images.append(metadata)
                     logger.info(f"     已保存: {filename}")
+                    if on_image is not None:
+                        await on_image(metadata)
+                    return metadata
 
                 except Exception as img_error:
                     logger.error(f"     [图片 {attempt + 1}] 生成失败: {img_error}")
                     logger.exception(img_error)
-                    failed_count += 1
+                    return None
+
+            results = await asyncio.gather(*(generate_one(attempt) for attempt in range(image_count)))
+            generated_images: List[ImageMetadata] = [image for image in results if image is not None]
+            failed_count = image_count - len(generated_images)
+            budget_pending = 0
+            if use_report_budget:
+                refund_report_images(session_id, failed_count)
 
             # 处理生成结果
             if not generated_images:
@@ -1553,6 +1581,8 @@ Generate an enhanced, professional image prompt:"""
             return generated_images
 
         except Exception as e:
+            if use_report_budget:
+                refund_report_images(session_id, budget_pending)
             logger.error(f" [v7.153] 生成交付物概念图失败: {e}")
             logger.exception(e)
             raise
@@ -1591,10 +1621,10 @@ Generate an enhanced, professional image prompt:"""
             logger.info(" [Inpainting Mode] 使用 DALL-E 2 Edit API（Option D）")
 
             try:
-                # 调用 Inpainting 服务
+                # 调用 Inpainting 服务（Blob 引用转换回 data URL）
                 inpainting_result = await inpainting_service.edit_image_with_mask(
-                    original_image=original_image,
-                    mask_image=mask_image,
+                    original_image=await asyncio.to_thread(inline_blob_url, original_image),
+                    mask_image=await asyncio.to_thread(inline_blob_url, mask_image),
                     prompt=prompt,
                     size="1024x1024",  # 固定使用最高质量
                     n=1,
@@ -1604,7 +1634,7 @@ Generate an enhanced, professional image prompt:"""
                     logger.info(" [Inpainting Mode] 图像编辑成功")
                     return ImageGenerationResult(
                         success=True,
-                        image_url=inpainting_result.edited_image_url,
+                        image_url=await asyncio.to_thread(externalize_data_url, inpainting_result.edited_image_url),
                         revised_prompt=inpainting_result.original_prompt,
                         model_used=inpainting_result.model_used or "dall-e-2-edit",
                     )
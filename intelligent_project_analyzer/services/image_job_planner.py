@@ -0,0 +1,185 @@
+"""
+报告级概念图任务调度
+
+概念图原先按「专家 → 交付物 → 图片」逐张串行生成，每张图都要等一次 30~60 秒的图像 API。
+本模块为 ImageGeneratorService 提供报告级的调度原语：
+
+- 按图像提供商（base_url 主机名）限制同时进行的图像 API 请求数，多个专家 / 交付物并发生成时不会打爆上游
+- 按会话（一份报告）限制概念图总数，多专家并发生成时共享同一额度；失败的图片归还额度
+- 每张图片保存完成即通过 WebSocket 推送（type=concept_image），前端无需等专家的全部交付物完成
+
+用法：
+    async with image_slot(provider):
+        response = await client.post(...)
+
+    granted = claim_report_images(session_id, image_count)
+    ...
+    refund_report_images(session_id, failed_count)
+
+    on_image = make_concept_image_publisher(session_id, role_id)
+
+配置：
+    IMAGE_PROVIDER_CONCURRENCY   每个图像提供商同时进行的请求数（默认 4）
+    IMAGE_REPORT_BUDGET          每份报告最多生成的概念图数（默认 12，0 表示不限）
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+IMAGE_PROVIDER_CONCURRENCY = int(os.getenv("IMAGE_PROVIDER_CONCURRENCY", "4"))
+IMAGE_REPORT_BUDGET = int(os.getenv("IMAGE_REPORT_BUDGET", "12"))
+
+_lock = threading.Lock()
+# asyncio.Semaphore 绑定事件循环：按循环分别维护，循环回收后自动释放
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_budgets: Dict[str, int] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+_report_stats = {"claimed": 0, "refunded": 0, "denied": 0, "streamed": 0}
+
+
+def _provider_stats(provider: str) -> Dict[str, float]:
+    return _stats.setdefault(
+        provider, {"requests": 0, "active": 0, "max_active": 0, "waiting": 0, "queued_ms": 0.0, "busy_ms": 0.0}
+    )
+
+
+def provider_from_url(base_url: str) -> str:
+    """由 API 地址得到提供商标识（主机名）"""
+    return urlparse(base_url).hostname or base_url
+
+
+def _semaphore(provider: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _semaphores.setdefault(loop, {})
+        if provider not in per_loop:
+            per_loop[provider] = asyncio.Semaphore(max(1, IMAGE_PROVIDER_CONCURRENCY))
+        return per_loop[provider]
+
+
+@asynccontextmanager
+async def image_slot(provider: str) -> AsyncIterator[None]:
+    """占用一个图像 API 并发槽位（超出 IMAGE_PROVIDER_CONCURRENCY 时排队）"""
+    semaphore = _semaphore(provider)
+    queued_at = time.perf_counter()
+    with _lock:
+        stats = _provider_stats(provider)
+        stats["waiting"] += 1
+    try:
+        await semaphore.acquire()
+    finally:
+        with _lock:
+            stats["waiting"] -= 1
+
+    started = time.perf_counter()
+    with _lock:
+        stats["requests"] += 1
+        stats["active"] += 1
+        stats["max_active"] = max(stats["max_active"], stats["active"])
+        stats["queued_ms"] += (started - queued_at) * 1000
+    try:
+        yield
+    finally:
+        semaphore.release()
+        with _lock:
+            stats["active"] -= 1
+            stats["busy_ms"] += (time.perf_counter() - started) * 1000
+
+
+def claim_report_images(session_id: str, requested: int) -> int:
+    """
+    从报告额度中申请 requested 张概念图
+
+    Returns:
+        实际获批的数量（额度不足时少于 requested，可能为 0）
+    """
+    if IMAGE_REPORT_BUDGET <= 0 or not session_id:
+        return requested
+    with _lock:
+        remaining = IMAGE_REPORT_BUDGET - _budgets.get(session_id, 0)
+        granted = max(0, min(requested, remaining))
+        _budgets[session_id] = _budgets.get(session_id, 0) + granted
+        _report_stats["claimed"] += granted
+        _report_stats["denied"] += requested - granted
+    if granted < requested:
+        logger.warning(f"️ [ImageJobs] {session_id} 概念图额度不足: 申请 {requested}，获批 {granted}")
+    return granted
+
+
+def refund_report_images(session_id: str, count: int) -> None:
+    """归还未成功生成的额度"""
+    if IMAGE_REPORT_BUDGET <= 0 or not session_id or count <= 0:
+        return
+    with _lock:
+        _budgets[session_id] = max(0, _budgets.get(session_id, 0) - count)
+        _report_stats["refunded"] += count
+
+
+def release_report_budget(session_id: str) -> None:
+    """释放会话的额度记录（报告完成 / 会话结束时调用）"""
+    with _lock:
+        _budgets.pop(session_id, None)
+
+
+def make_concept_image_publisher(session_id: str, role_id: str) -> Optional[Callable[[Any], Awaitable[None]]]:
+    """
+    返回逐张推送概念图的回调（传给 generate_deliverable_image 的 on_image）
+
+    推送失败只记录日志，不影响生成流程。
+    """
+    if not session_id:
+        return None
+
+    async def publish(image: Any) -> None:
+        try:
+            from intelligent_project_analyzer.api.server import broadcast_to_websockets
+
+            if hasattr(image, "model_dump"):
+                image = image.model_dump(exclude_none=True, exclude_defaults=True)
+            await broadcast_to_websockets(session_id, {"type": "concept_image", "role_id": role_id, "image": image})
+            with _lock:
+                _report_stats["streamed"] += 1
+        except Exception as e:
+            logger.warning(f"️ [ImageJobs] 概念图推送失败: {e}")
+
+    return publish
+
+
+def get_image_job_stats() -> Dict[str, Any]:
+    """图像 API 并发与报告额度统计（供 /api/metrics/image-jobs 使用）"""
+    with _lock:
+        providers = {}
+        for provider, stats in _stats.items():
+            requests = stats["requests"]
+            providers[provider] = {
+                **stats,
+                "queued_ms": round(stats["queued_ms"], 2),
+                "busy_ms": round(stats["busy_ms"], 2),
+                "queued_ms_avg": round(stats["queued_ms"] / requests, 2) if requests else 0.0,
+            }
+        return {
+            "provider_concurrency": IMAGE_PROVIDER_CONCURRENCY,
+            "report_budget": IMAGE_REPORT_BUDGET,
+            "active_reports": len(_budgets),
+            **_report_stats,
+            "providers": providers,
+        }
+
+
+def reset_image_jobs() -> None:
+    """清空额度与统计（测试用）"""
+    with _lock:
+        _budgets.clear()
+        _stats.clear()
+        for key in _report_stats:
+            _report_stats[key] = 0
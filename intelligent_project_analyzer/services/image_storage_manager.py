@@ -2,12 +2,14 @@
 图片存储管理器 - 文件系统存储
 
 负责将概念图保存到文件系统，并维护metadata.json索引。
+启用图片 Blob 存储时，图片字节按内容哈希只写入一次（image_blob_store），会话目录只保留索引。
 
 Author: Claude Code
 Created: 2025-12-29
 Version: v1.0
 """
 
+import asyncio
 import base64
 import json
 import os
@@ -17,13 +19,15 @@ from typing import List, Optional
 
 from loguru import logger
 
+from . import image_blob_store
+
 
 class ImageStorageManager:
     """
     概念图文件存储管理器
 
     负责：
-    1. 保存图片文件到 data/generated_images/{session_id}/
+    1. 保存图片文件到图片 Blob 存储（未启用时保存到 data/generated_images/{session_id}/）
     2. 维护 metadata.json 索引
     3. 删除和查询图片
     """
@@ -45,7 +49,7 @@ class ImageStorageManager:
         保存图片到文件系统并更新索引
 
         Args:
-            base64_data: Base64编码的图片数据（Data URL格式）
+            base64_data: Base64编码的图片数据（Data URL格式），或已写入 Blob 存储的引用 URL
             session_id: 会话ID
             deliverable_id: 交付物ID
             owner_role: 角色ID
@@ -61,23 +65,29 @@ class ImageStorageManager:
             session_dir = cls.BASE_DIR / session_id
             session_dir.mkdir(parents=True, exist_ok=True)
 
-            # 2. 解码Base64数据
-            if "," in base64_data:
-                # 格式: data:image/png;base64,iVBORw0KGgo...
-                image_bytes = base64.b64decode(base64_data.split(",")[1])
+            blob_ref = None
+            if image_blob_store.IMAGE_BLOB_STORE_ENABLED:
+                # 2. 写入 Blob 存储（生成结果已是引用 URL 时不再重复写入）
+                blob_ref = await asyncio.to_thread(cls._store_blob, base64_data)
+                file_size = blob_ref.size
+                url = blob_ref.url
             else:
-                # 纯Base64
-                image_bytes = base64.b64decode(base64_data)
-
-            # 3. 保存图片文件
-            file_path = session_dir / filename
-            with open(file_path, "wb") as f:
-                f.write(image_bytes)
+                # 2. 解码Base64数据
+                if "," in base64_data:
+                    # 格式: data:image/png;base64,iVBORw0KGgo...
+                    image_bytes = base64.b64decode(base64_data.split(",")[1])
+                else:
+                    # 纯Base64
+                    image_bytes = base64.b64decode(base64_data)
+
+                # 3. 保存图片文件
+                file_path = session_dir / filename
+                with open(file_path, "wb") as f:
+                    f.write(image_bytes)
+                file_size = len(image_bytes)
+                url = f"/generated_images/{session_id}/{filename}"
 
             # 4. 构建元数据
-            file_size = len(image_bytes)
-            url = f"/generated_images/{session_id}/{filename}"
-
             metadata = {
                 "deliverable_id": deliverable_id,
                 "filename": filename,
@@ -89,6 +99,9 @@ class ImageStorageManager:
                 "file_size_bytes": file_size,
                 "created_at": datetime.now().isoformat(),
             }
+            if blob_ref is not None:
+                metadata["thumbnail_url"] = blob_ref.thumbnail_url()
+                metadata["content_hash"] = blob_ref.digest
 
             # 5. 更新metadata.json索引
             await cls._update_metadata_index(session_id, metadata)
@@ -100,6 +113,17 @@ class ImageStorageManager:
             logger.error(f" [ImageStorage] 保存图片失败: {e}")
             raise
 
+    @staticmethod
+    def _store_blob(image_data: str) -> "image_blob_store.BlobRef":
+        """data URL / 纯 Base64 写入 Blob 存储；已是 Blob 引用时直接返回对应引用"""
+        store = image_blob_store.get_image_blob_store()
+        ref = store.stat(image_data)
+        if ref is not None:
+            return ref
+        if image_blob_store.parse_blob_url(image_data) is not None:
+            raise FileNotFoundError(f"引用的图片不存在: {image_data}")
+        return store.put_data_url(image_data)
+
     @classmethod
     async def _update_metadata_index(cls, session_id: str, new_image: dict):
         """更新metadata.json索引文件"""
@@ -144,7 +168,7 @@ class ImageStorageManager:
                 logger.warning(f"️ [ImageStorage] 图片不存在: {deliverable_id}")
                 return False
 
-            # 删除文件
+            # 删除文件（Blob 存储中的图片按内容共享，不随单个会话删除）
             file_path = cls.BASE_DIR / session_id / target_image["filename"]
             if file_path.exists():
                 file_path.unlink()
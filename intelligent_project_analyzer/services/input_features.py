@@ -0,0 +1,322 @@
+"""
+输入特征阶段（Input Features）
+
+每次新分析，用户输入过去会被多个消费方各自 lower()、别名归一化、逐词扫描：
+统一输入验证（内容安全 + 领域分类）、设计模式检测、项目类型检测、维度选择、动机识别。
+本模块在入口节点一次性完成：
+
+1. 别名归一化（type_alias_normalizer.normalize_input）与分词（jieba，未安装时退化为正则切分）
+2. 否定语境区间（项目类型检测使用）
+3. 全部消费方关键词集的命中：原文 lower() 文本一次扫描（合并匹配器），归一化文本一次扫描（项目类型）
+4. 轻量特征（长度、中文占比、数字/面积/预算、句子数等）
+
+结果序列化后存入 ProjectAnalysisState["input_features"]，消费方通过
+``matcher.resolve_positions(text, features, source)`` 复用命中；文本或关键词集签名
+（热重载后变化）不一致时自动退回自行扫描，保证结果与原逻辑一致。
+
+环境变量：
+- INPUT_FEATURES_ENABLED: 是否启用输入特征阶段（默认 true）
+"""
+
+import os
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from ..utils.keyword_matcher import KeywordMatcher, get_cached_matcher
+
+try:
+    import jieba
+
+    JIEBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - jieba 为 requirements 依赖
+    jieba = None
+    JIEBA_AVAILABLE = False
+
+INPUT_FEATURES_ENABLED = os.getenv("INPUT_FEATURES_ENABLED", "true").lower() == "true"
+INPUT_FEATURES_VERSION = 1
+
+# 关键词来源 → 扫描的文本变体（lower: 原文 lower()，normalized: 别名归一化后 lower()）
+SOURCE_SAFETY = "safety"
+SOURCE_DOMAIN_DESIGN = "domain_design"
+SOURCE_DOMAIN_NON_DESIGN = "domain_non_design"
+SOURCE_MODE = "mode"
+SOURCE_DIMENSION = "dimension"
+SOURCE_MOTIVATION = "motivation"
+SOURCE_PROJECT_TYPE = "project_type"
+_NORMALIZED_SOURCES = {SOURCE_PROJECT_TYPE}
+
+_FALLBACK_TOKEN_RE = re.compile(r"[\u4e00-\u9fff]+|[a-z0-9]+(?:\.[0-9]+)?")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_AREA_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:平米|平方米|㎡|平)")
+_BUDGET_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:万|w)")
+_SENTENCE_RE = re.compile(r"[。！？!?\n]+")
+
+
+@dataclass
+class InputFeatures:
+    """一次用户输入的预计算特征（可序列化存入状态）"""
+
+    text: str
+    normalized_text: str
+    tokens: List[str] = field(default_factory=list)
+    negated_spans: List[Tuple[int, int]] = field(default_factory=list)
+    keyword_hits: Dict[str, Dict[str, int]] = field(default_factory=dict)  # 来源 → {关键词: 首次出现位置}
+    signatures: Dict[str, str] = field(default_factory=dict)  # 来源 → 关键词集签名
+    stats: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    version: int = INPUT_FEATURES_VERSION
+
+    def __post_init__(self):
+        self.text_lower = self.text.lower()
+        self.negated_spans = [tuple(span) for span in self.negated_spans]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["InputFeatures"]:
+        if not isinstance(data, dict) or data.get("version") != INPUT_FEATURES_VERSION:
+            return None
+        try:
+            return cls(**data)
+        except TypeError:
+            return None
+
+    def keyword_positions(self, source: str, matcher: KeywordMatcher, text: str) -> Optional[Dict[str, int]]:
+        """
+        返回来源 source 的预计算命中；消费方实际扫描的文本或关键词集签名不一致时返回 None
+        """
+        positions = self.keyword_hits.get(source)
+        if positions is None or self.signatures.get(source) != matcher.signature:
+            return None
+        expected = self.normalized_text if source in _NORMALIZED_SOURCES else self.text_lower
+        scanned = text.lower() if matcher.ignore_case else text
+        return positions if scanned == expected else None
+
+    def normalized_for(self, text: str) -> Optional[str]:
+        """text 为本特征对应的原始输入时，返回别名归一化（已 lower()）文本"""
+        return self.normalized_text if text == self.text else None
+
+    def negated_spans_for(self, text: str) -> Optional[List[Tuple[int, int]]]:
+        return list(self.negated_spans) if text == self.normalized_text else None
+
+
+def _normalize(text: str) -> str:
+    try:
+        from .type_alias_normalizer import normalize_input
+
+        return normalize_input(text).lower()
+    except Exception:
+        return text.lower()
+
+
+def _tokenize(text: str) -> List[str]:
+    if JIEBA_AVAILABLE:
+        return [token for token in jieba.lcut(text) if token.strip()]
+    return _FALLBACK_TOKEN_RE.findall(text)
+
+
+def _compute_stats(text: str, normalized_text: str, tokens: List[str], negated_spans: List) -> Dict[str, Any]:
+    area = _AREA_RE.search(normalized_text)
+    budget = _BUDGET_RE.search(normalized_text)
+    return {
+        "length": len(text),
+        "cjk_ratio": round(len(_CJK_RE.findall(text)) / len(text), 3) if text else 0.0,
+        "token_count": len(tokens),
+        "sentence_count": len([s for s in _SENTENCE_RE.split(text) if s.strip()]),
+        "number_count": len(_NUMBER_RE.findall(text)),
+        "area_sqm": float(area.group(1)) if area else None,
+        "budget_wan": float(budget.group(1)) if budget else None,
+        "has_negation": bool(negated_spans),
+    }
+
+
+def _lower_text_sources() -> List[Tuple[str, KeywordMatcher]]:
+    """原文 lower() 文本上扫描的关键词来源；单个来源加载失败时跳过（该消费方自行扫描）"""
+    sources: List[Tuple[str, KeywordMatcher]] = []
+
+    def _add(name: str, factory) -> None:
+        try:
+            sources.append((name, factory()))
+        except Exception as e:
+            logger.debug(f"[InputFeatures] 关键词来源 {name} 不可用，跳过: {e}")
+
+    def _safety() -> KeywordMatcher:
+        from ..security.content_safety_guard import ContentSafetyGuard
+
+        return ContentSafetyGuard().get_keyword_matcher()
+
+    def _domain(keyword_attr: str):
+        def factory() -> KeywordMatcher:
+            from ..security.domain_classifier import DomainClassifier
+
+            return DomainClassifier.get_keyword_matcher(getattr(DomainClassifier, keyword_attr))
+
+        return factory
+
+    def _mode() -> KeywordMatcher:
+        from .mode_detector import DesignModeDetector
+
+        return DesignModeDetector.get_keyword_matcher()
+
+    def _dimension() -> KeywordMatcher:
+        from .dimension_selector import DimensionSelector
+
+        return DimensionSelector().get_keyword_matcher()
+
+    def _motivation() -> KeywordMatcher:
+        from .motivation_engine import MotivationTypeRegistry
+
+        return MotivationTypeRegistry().get_keyword_matcher()
+
+    _add(SOURCE_SAFETY, _safety)
+    _add(SOURCE_DOMAIN_DESIGN, _domain("DESIGN_KEYWORDS"))
+    _add(SOURCE_DOMAIN_NON_DESIGN, _domain("NON_DESIGN_KEYWORDS"))
+    _add(SOURCE_MODE, _mode)
+    _add(SOURCE_DIMENSION, _dimension)
+    _add(SOURCE_MOTIVATION, _motivation)
+    return sources
+
+
+_union_cache: Optional[Tuple[Tuple[KeywordMatcher, ...], KeywordMatcher]] = None
+
+
+def _union_matcher(sources: List[Tuple[str, KeywordMatcher]]) -> KeywordMatcher:
+    """
+    把各来源匹配器合并为一个（负载为来源名），来源匹配器未重建时复用
+
+    来源匹配器的关键词已按各自的大小写规则归一化（ignore_case 来源已 lower()），
+    合并匹配器大小写敏感地扫描 lower() 文本，与各消费方的原有语义一致。
+    """
+    global _union_cache
+    members = tuple(matcher for _, matcher in sources)
+    if _union_cache is not None and len(_union_cache[0]) == len(members):
+        if all(a is b for a, b in zip(_union_cache[0], members)):
+            return _union_cache[1]
+
+    union = KeywordMatcher((keyword, name) for name, matcher in sources for keyword in matcher.keywords)
+    _union_cache = (members, union)
+    return union
+
+
+def build_input_features(user_input: str) -> InputFeatures:
+    """对用户输入执行一次性的归一化、分词、否定区间与全部关键词扫描"""
+    started = time.perf_counter()
+    text = user_input or ""
+
+    normalized_text = _normalize(text)
+    normalized_at = time.perf_counter()
+
+    tokens = _tokenize(normalized_text)
+    tokenized_at = time.perf_counter()
+
+    try:
+        from .type_alias_normalizer import extract_negated_spans
+
+        negated_spans = extract_negated_spans(normalized_text)
+    except Exception:
+        negated_spans = []
+
+    keyword_hits: Dict[str, Dict[str, int]] = {}
+    signatures: Dict[str, str] = {}
+
+    sources = _lower_text_sources()
+    for name, matcher in sources:
+        keyword_hits[name] = {}
+        signatures[name] = matcher.signature
+    union = _union_matcher(sources)
+    for keyword, position in union.first_positions(text.lower()).items():
+        for name in union.payloads(keyword):
+            keyword_hits[name][keyword] = position
+
+    try:
+        from .project_type_detector import ProjectTypeDetector, _build_registry_matcher
+
+        matcher = get_cached_matcher(ProjectTypeDetector._get_registry(), _build_registry_matcher)
+        keyword_hits[SOURCE_PROJECT_TYPE] = matcher.first_positions(normalized_text)
+        signatures[SOURCE_PROJECT_TYPE] = matcher.signature
+    except Exception as e:
+        logger.debug(f"[InputFeatures] 项目类型关键词不可用，跳过: {e}")
+    scanned_at = time.perf_counter()
+
+    features = InputFeatures(
+        text=text,
+        normalized_text=normalized_text,
+        tokens=tokens,
+        negated_spans=negated_spans,
+        keyword_hits=keyword_hits,
+        signatures=signatures,
+        stats=_compute_stats(text, normalized_text, tokens, negated_spans),
+    )
+    features.timings = {
+        "normalize_ms": round((normalized_at - started) * 1000, 3),
+        "tokenize_ms": round((tokenized_at - normalized_at) * 1000, 3),
+        "keyword_scan_ms": round((scanned_at - tokenized_at) * 1000, 3),
+        "total_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    logger.info(
+        f"[InputFeatures] 输入特征已生成: {len(text)} 字, {len(tokens)} 个词, "
+        f"命中 {sum(len(hits) for hits in keyword_hits.values())} 个关键词, 耗时 {features.timings['total_ms']:.1f}ms"
+    )
+    return features
+
+
+def get_state_input_features(state: Dict[str, Any]) -> Optional[InputFeatures]:
+    """读取状态中的输入特征；与当前 user_input 不一致（如用户重新描述）时视为无效"""
+    features = InputFeatures.from_dict(state.get("input_features"))
+    if features is None or features.text != (state.get("user_input") or ""):
+        return None
+    return features
+
+
+def prepare_input_features(state: Dict[str, Any]) -> Optional[InputFeatures]:
+    """入口节点使用：复用状态中的有效特征，否则重新生成；关闭或失败时返回 None（消费方自行扫描）"""
+    if not INPUT_FEATURES_ENABLED:
+        return None
+    features = get_state_input_features(state)
+    if features is not None:
+        return features
+    try:
+        return build_input_features(state.get("user_input", ""))
+    except Exception as e:
+        logger.warning(f"️ [InputFeatures] 输入特征生成失败，消费方将自行扫描: {e}")
+        return None
+
+
+# ── 消费方耗时统计（features: 复用输入特征 / scan: 自行扫描）────────────────────
+_consumer_timings: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+
+@contextmanager
+def time_consumer(consumer: str, features: Optional[InputFeatures] = None) -> Iterator[None]:
+    mode = "features" if features is not None else "scan"
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        stats = _consumer_timings.setdefault(consumer, {}).setdefault(mode, {"calls": 0, "total_ms": 0.0})
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed
+        logger.debug(f"[InputFeatures] {consumer} ({mode}) 耗时 {elapsed:.2f}ms")
+
+
+def get_consumer_timings() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """各消费方耗时汇总：{consumer: {"features" | "scan": {"calls", "total_ms", "avg_ms"}}}"""
+    return {
+        consumer: {
+            mode: {**stats, "avg_ms": round(stats["total_ms"] / stats["calls"], 3) if stats["calls"] else 0.0}
+            for mode, stats in modes.items()
+        }
+        for consumer, modes in _consumer_timings.items()
+    }
+
+
+def reset_consumer_timings() -> None:
+    _consumer_timings.clear()
@@ -371,6 +371,13 @@ class MultiKeyLoadBalancer:
             for provider, pool in self._pools.items()
         }
     
+    def key_count(self, provider: str, available_only: bool = True) -> int:
+        """提供商的 Key 数量（LLM 并发控制器据此计算按 Key 的并发上限）"""
+        pool = self._pools.get(provider)
+        if pool is None:
+            return 0
+        return sum(1 for k in pool.keys if k.is_available or not available_only)
+
     @property
     def available_providers(self) -> List[str]:
         """可用的提供商列表"""
@@ -31,10 +31,21 @@ except Exception:  # pragma: no cover – optional heavy deps
     MultiLLMFactory = None  # type: ignore[assignment,misc]
     FallbackLLM = None  # type: ignore[assignment,misc]
 
+# ── 客户端池（实例与 HTTP 连接复用）──────────────────────────────────────────
+from intelligent_project_analyzer.services.llm_client_pool import (
+    get_llm_client_stats,
+    get_pooled_chat_model,
+    reset_llm_client_pool,
+)
+
 # ── 并发控制（QW-2 Semaphore）────────────────────────────────────────────────
 from intelligent_project_analyzer.services.llm_concurrency import (
+    LLMPriority,
+    get_llm_controller,
     get_llm_semaphore,
     get_llm_stats,
+    llm_priority,
+    llm_slot,
     reset_semaphore,
 )
 
@@ -118,9 +129,17 @@ __all__ = [
     "LLMFactory",
     "MultiLLMFactory",
     "FallbackLLM",
+    # 客户端池
+    "get_pooled_chat_model",
+    "get_llm_client_stats",
+    "reset_llm_client_pool",
     # 并发 & 限流
+    "LLMPriority",
+    "get_llm_controller",
     "get_llm_semaphore",
     "get_llm_stats",
+    "llm_priority",
+    "llm_slot",
     "reset_semaphore",
     "rate_limit_manager",
     "RateLimitedLLM",
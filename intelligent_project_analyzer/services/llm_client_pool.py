@@ -0,0 +1,271 @@
+"""
+LLM 客户端池
+
+LLMFactory / MultiLLMFactory 每次 create_llm 都会新建 ChatOpenAI，内部再各自创建 openai 客户端和
+HTTP 连接池；并发节点之间无法复用到 OpenRouter / DeepSeek 的 TLS 连接，每个新实例都要重新握手。
+
+本模块提供：
+- 按 (provider, base_url) 共享的 httpx.Client / httpx.AsyncClient（连接池 + keep-alive）；
+  异步连接绑定创建它的事件循环，AsyncClient 的传输层按事件循环各自维护连接池，
+  工作线程中 asyncio.run / Celery 任务的新事件循环不会复用已关闭循环上的连接
+- 按 (provider, model, base_url, api_key 指纹, timeout, max_retries, ...) 缓存的 Chat 模型实例；
+  temperature / max_tokens 等只进入请求体的参数每次通过构造函数重建模型（校验器照常执行），
+  但复用缓存实例的 openai 客户端，不重建客户端与连接池
+- 连接复用与实例创建耗时统计（供 /api/metrics/llm-clients 使用）
+- 共享客户端的每个请求都经过 LLM 并发控制器（llm_concurrency），按提供商 / Key / 优先级限流
+
+用法：
+    from .llm_client_pool import get_pooled_chat_model
+
+    llm = get_pooled_chat_model("openrouter", ChatOpenAI, llm_params)
+
+配置：
+    LLM_CLIENT_POOL_ENABLED     是否启用（默认 true）
+    LLM_POOL_MAX_CONNECTIONS    每个提供商的最大连接数（默认 100）
+    LLM_POOL_MAX_KEEPALIVE      每个提供商保留的空闲连接数（默认 20）
+    LLM_POOL_KEEPALIVE_EXPIRY   空闲连接保活秒数（默认 60）
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from .llm_concurrency import AsyncGatedTransport, GatedTransport
+
+LLM_CLIENT_POOL_ENABLED = os.getenv("LLM_CLIENT_POOL_ENABLED", "true").lower() == "true"
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+
+# 只影响请求体的参数：不参与缓存键，每次构造时覆盖
+OVERRIDABLE_PARAMS = frozenset(
+    {"temperature", "max_tokens", "streaming", "top_p", "presence_penalty", "frequency_penalty", "seed", "n", "stop"}
+)
+
+_lock = threading.Lock()
+_http_clients: Dict[Tuple[str, str], Tuple[httpx.Client, httpx.AsyncClient]] = {}
+_models: Dict[Tuple, Any] = {}
+# 构造模型时从缓存实例复用的 openai 客户端字段
+_SHARED_CLIENT_FIELDS = ("client", "async_client", "root_client", "root_async_client")
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _provider_stats(provider: str) -> Dict[str, float]:
+    return _stats.setdefault(
+        provider,
+        {
+            "models_created": 0,
+            "models_reused": 0,
+            "create_ms_total": 0.0,
+            "http_clients": 0,
+            "async_loop_pools": 0,
+            "requests": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+        },
+    )
+
+
+def _count_connection(stats: Dict[str, float], event_name: str) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        stats["connections_opened"] += 1
+    elif event_name == "connection.start_tls.complete":
+        stats["tls_handshakes"] += 1
+
+
+class _LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """按事件循环分别创建内层传输：httpcore 连接池与其中的连接只在创建它们的事件循环中使用"""
+
+    def __init__(self, factory: Callable[[], httpx.AsyncBaseTransport], stats: Dict[str, float]):
+        self._factory = factory
+        self._stats = stats
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncBaseTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _current(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = self._factory()
+                self._stats["async_loop_pools"] += 1
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._current().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环的连接池；其他循环（通常已关闭）的连接池直接丢弃"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+            self._transports.clear()
+        if transport is not None:
+            await transport.aclose()
+
+
+def _build_http_clients(provider: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """创建带连接统计的同步 / 异步 httpx 客户端（超时由 openai 客户端按请求传入）"""
+    stats = _provider_stats(provider)
+
+    def trace(event_name: str, info: Dict[str, Any]) -> None:
+        _count_connection(stats, event_name)
+
+    async def atrace(event_name: str, info: Dict[str, Any]) -> None:
+        _count_connection(stats, event_name)
+
+    def on_request(request: httpx.Request) -> None:
+        stats["requests"] += 1
+        request.extensions.setdefault("trace", trace)
+
+    async def on_arequest(request: httpx.Request) -> None:
+        stats["requests"] += 1
+        request.extensions.setdefault("trace", atrace)
+
+    limits = httpx.Limits(
+        max_connections=LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+    )
+    sync_client = httpx.Client(
+        transport=GatedTransport(provider, httpx.HTTPTransport(limits=limits)), event_hooks={"request": [on_request]}
+    )
+    async_client = httpx.AsyncClient(
+        transport=_LoopLocalAsyncTransport(
+            lambda: AsyncGatedTransport(provider, httpx.AsyncHTTPTransport(limits=limits)), stats
+        ),
+        event_hooks={"request": [on_arequest]},
+    )
+    return sync_client, async_client
+
+
+def get_http_clients(provider: str, base_url: Optional[str]) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """返回 (provider, base_url) 共享的同步 / 异步 httpx 客户端（懒加载）"""
+    key = (provider, base_url or "")
+    with _lock:
+        clients = _http_clients.get(key)
+        if clients is None:
+            clients = _build_http_clients(provider)
+            _http_clients[key] = clients
+            _provider_stats(provider)["http_clients"] += 1
+            logger.debug(f" [LLMPool] 新建 {provider} HTTP 连接池: {base_url or 'default'}")
+        return clients
+
+
+def _fingerprint(api_key: Any) -> str:
+    if hasattr(api_key, "get_secret_value"):
+        api_key = api_key.get_secret_value()
+    return hashlib.sha256(str(api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _freeze(value: Any) -> Any:
+    """把参数转换为可哈希形式；无法哈希的对象抛出 TypeError"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+def _model_key(provider: str, model_class: type, params: Dict[str, Any]) -> Tuple:
+    fixed = {k: v for k, v in params.items() if k not in OVERRIDABLE_PARAMS and k != "api_key"}
+    return (provider, model_class.__name__, _fingerprint(params.get("api_key")), _freeze(fixed))
+
+
+def get_pooled_chat_model(provider: str, model_class: type, params: Dict[str, Any]) -> Any:
+    """
+    返回共享 HTTP 连接池的 Chat 模型实例
+
+    相同 (provider, model, base_url, api_key, timeout, ...) 只构建一次 openai 客户端；每次按本次参数
+    （含 temperature / max_tokens 等覆盖参数）调用构造函数返回新实例并复用缓存实例的客户端，
+    参数校验照常执行，调用方修改属性不会影响缓存实例。
+    调用方自带 http_client 或参数不可哈希时不走缓存，直接构建。
+    """
+    if not LLM_CLIENT_POOL_ENABLED or "http_client" in params or "http_async_client" in params:
+        return model_class(**params)
+
+    try:
+        key = _model_key(provider, model_class, params)
+    except TypeError:
+        return model_class(**params)
+
+    with _lock:
+        base = _models.get(key)
+        stats = _provider_stats(provider)
+        if base is not None:
+            stats["models_reused"] += 1
+
+    sync_client, async_client = get_http_clients(provider, params.get("base_url"))
+    if base is None:
+        started = time.perf_counter()
+        base = model_class(**params, http_client=sync_client, http_async_client=async_client)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with _lock:
+            base = _models.setdefault(key, base)
+            stats["models_created"] += 1
+            stats["create_ms_total"] += elapsed_ms
+        logger.debug(f" [LLMPool] 新建 {provider} 模型实例 {params.get('model')} ({elapsed_ms:.1f}ms)")
+
+    shared = {name: getattr(base, name) for name in _SHARED_CLIENT_FIELDS if name in model_class.model_fields}
+    return model_class(**params, http_client=sync_client, http_async_client=async_client, **shared)
+
+
+def get_llm_client_stats() -> Dict[str, Any]:
+    """按提供商汇总实例复用、连接复用与创建耗时（供 /api/metrics/llm-clients 使用）"""
+    with _lock:
+        providers = {}
+        for provider, stats in _stats.items():
+            requests = stats["requests"]
+            created = stats["models_created"]
+            providers[provider] = {
+                **stats,
+                "create_ms_avg": round(stats["create_ms_total"] / created, 2) if created else 0.0,
+                "create_ms_total": round(stats["create_ms_total"], 2),
+                "connection_reuse_rate": (
+                    round(max(0.0, 1 - stats["connections_opened"] / requests), 4) if requests else 0.0
+                ),
+            }
+        return {
+            "enabled": LLM_CLIENT_POOL_ENABLED,
+            "cached_models": len(_models),
+            "http_pools": len(_http_clients),
+            "providers": providers,
+        }
+
+
+def close_llm_clients() -> None:
+    """关闭所有共享的同步 HTTP 客户端并清空缓存（服务关闭时调用）"""
+    with _lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+        _models.clear()
+    for sync_client, _ in clients:
+        sync_client.close()
+
+
+async def aclose_llm_clients() -> None:
+    """关闭所有共享的同步 / 异步 HTTP 客户端并清空缓存"""
+    with _lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+        _models.clear()
+    for sync_client, async_client in clients:
+        sync_client.close()
+        await async_client.aclose()
+
+
+def reset_llm_client_pool() -> None:
+    """清空缓存与统计（测试用）"""
+    close_llm_clients()
+    with _lock:
+        _stats.clear()
@@ -1,63 +1,733 @@
 """
 LLM 并发控制模块
 
-提供全局 Semaphore，限制同时发出的 LLM HTTP 连接数，防止高负载下限流与超时。
+全局唯一的、按提供商感知的 LLM 并发控制器。所有 LLM 调用经过同一个入口：
+
+- LLMAgent.acall_llm / invoke_llm：调用前获取槽位
+- LLMClientPool 共享的 httpx 客户端（LLMFactory / MultiLLMFactory / HighConcurrencyLLM / OpenRouter
+  负载均衡创建的模型）：在 HTTP 传输层逐请求获取槽位，覆盖专家工厂、问卷生成、审核等直接 invoke 的调用
+- 直接请求 OpenRouter 的代码（搜索引擎）：使用 gated_async_transport() 创建 httpx 客户端
+
+控制策略：
+1. 全局上限 LLM_GLOBAL_CONCURRENCY；为交互优先级预留 LLM_INTERACTIVE_RESERVED 个槽位
+2. 提供商上限 = min(LLM_PROVIDER_CONCURRENCY, Key 数 × LLM_PER_KEY_CONCURRENCY)，同一 Key 同时最多
+   LLM_PER_KEY_CONCURRENCY 个请求（Key 数来自 key_balancer）
+3. AIMD：提供商上限在成功时加性增长（每轮 +1），遇到 429 乘性减小（× LLM_AIMD_DECREASE），
+   配置 LLM_LATENCY_TARGET_MS 时响应超时同样轻度减小；冷却期内只减一次
+4. 优先级：INTERACTIVE（问卷等用户等待的调用）> NORMAL > BACKGROUND（专家批次等），
+   等待队列按优先级出队，交互调用插队到后台批次之前
+5. 流式响应（SSE）：默认在收到响应头后即归还槽位，槽位只限制「同时发起 / 排队等待首包」的请求数；
+   搜索引擎的流式调用可持续数分钟，若持有槽位到流结束，少量长流就会占满提供商上限。
+   需要按流的完整时长计数时设置 LLM_HOLD_STREAM_SLOTS=true
+6. 同步调用（线程池）最多等待 LLM_SYNC_WAIT_TIMEOUT 秒，超时后超额放行并计入 sync_overdraft：
+   asyncio.to_thread 的默认线程池被等待者占满时，持有槽位的调用可能因拿不到线程而无法完成释放
+
+默认值说明：
+    旧版只在 LLMAgent 入口有一个 8 的全局信号量，其余调用（专家工厂、问卷、搜索引擎的原始 httpx
+    客户端）不受限。现在所有 LLM HTTP 请求都经过控制器，默认值按「单会话一个专家批次（10-15 个并行）
+    + 交互调用 + 搜索流」放大：全局 32、单 Key 16、交互预留 2；429 时由 AIMD 自动收缩。
 
 用法：
-    from .llm_concurrency import get_llm_semaphore
+    from .llm_concurrency import LLMPriority, llm_priority, llm_slot
 
-    async with get_llm_semaphore():
+    async with llm_slot("openrouter"):
         result = await llm_call(...)
 
+    with llm_priority(LLMPriority.INTERACTIVE):
+        questions = generate_questionnaire(...)
+
 配置：
-    环境变量 LLM_GLOBAL_CONCURRENCY（默认 8）控制全局并发上限。
+    LLM_GLOBAL_CONCURRENCY      全局并发上限（默认 32）
+    LLM_PROVIDER_CONCURRENCY    单个提供商并发上限（默认等于全局上限）
+    LLM_PER_KEY_CONCURRENCY     单个 API Key 并发上限（默认 16）
+    LLM_INTERACTIVE_RESERVED    为交互调用预留的全局槽位（默认 2）
+    LLM_HOLD_STREAM_SLOTS       流式响应读完才归还槽位（默认 false，收到响应头即归还）
+    LLM_SYNC_WAIT_TIMEOUT       同步调用等待槽位的最长秒数，超时超额放行（默认 30）
+    LLM_ADAPTIVE_ENABLED        是否启用 AIMD 自适应（默认 true）
+    LLM_AIMD_DECREASE           429 时上限乘数（默认 0.5）
+    LLM_AIMD_COOLDOWN           两次减小之间的最短秒数（默认 5）
+    LLM_LATENCY_TARGET_MS       延迟目标，超过时上限 × 0.9（默认 0，不按延迟调整）
 
 see ADR-002
 """
 
 import asyncio
+import bisect
+import hashlib
+import itertools
 import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from uuid import UUID
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from loguru import logger
+
+
+class LLMPriority(IntEnum):
+    """LLM 调用优先级（数值越小越先出队）"""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+# 工作流节点 → 优先级（未列出的节点为 NORMAL）
+NODE_PRIORITIES: Dict[str, LLMPriority] = {
+    "unified_input_validator_initial": LLMPriority.INTERACTIVE,
+    "progressive_step1_core_task": LLMPriority.INTERACTIVE,
+    "progressive_step2_radar": LLMPriority.INTERACTIVE,
+    "progressive_step3_gap_filling": LLMPriority.INTERACTIVE,
+    "questionnaire_summary": LLMPriority.INTERACTIVE,
+    "calibration_questionnaire": LLMPriority.INTERACTIVE,
+    "user_question": LLMPriority.INTERACTIVE,
+    "batch_executor": LLMPriority.BACKGROUND,
+    "agent_executor": LLMPriority.BACKGROUND,
+    "batch_aggregator": LLMPriority.BACKGROUND,
+    "detect_challenges": LLMPriority.BACKGROUND,
+    "result_aggregator": LLMPriority.BACKGROUND,
+    "pdf_generator": LLMPriority.BACKGROUND,
+}
+
+_LATENCY_DECREASE = 0.9
+_EWMA_ALPHA = 0.2
+
+_priority_var: ContextVar[LLMPriority] = ContextVar("llm_priority", default=LLMPriority.NORMAL)
+# 当前上下文已持有的槽位：嵌套的 HTTP 层不再重复获取，只上报结果
+_held_slot: ContextVar[Optional["LLMSlot"]] = ContextVar("llm_held_slot", default=None)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """是否为提供商限流错误（HTTP 429 / RateLimitError）"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "ratelimit" in type(error).__name__.lower()
+
+
+class _ProviderLimit:
+    """单个提供商的 AIMD 并发上限与占用"""
+
+    def __init__(self, name: str, ceiling: int):
+        self.name = name
+        self.ceiling = ceiling
+        self.limit = float(ceiling)
+        self.active = 0
+        self.key_active: Dict[str, int] = {}
+        self.calls = 0
+        self.rate_limited = 0
+        self.slow_calls = 0
+        self.increases = 0
+        self.decreases = 0
+        self.latency_ewma_ms: Optional[float] = None
+        self.last_decrease = 0.0
+        self.history: deque = deque(maxlen=10)
+
+    @property
+    def effective_limit(self) -> int:
+        return max(1, int(self.limit))
+
+    def _adjust(self, new_limit: float, reason: str) -> bool:
+        old = self.effective_limit
+        self.limit = min(float(self.ceiling), max(1.0, new_limit))
+        new = self.effective_limit
+        if new == old:
+            return False
+        self.history.append({"from": old, "to": new, "reason": reason, "timestamp": time.time()})
+        if new > old:
+            self.increases += 1
+            logger.info(f" [LLMConcurrency] {self.name} 并发上限 {old} → {new}（{reason}）")
+        else:
+            self.decreases += 1
+            logger.warning(f"️ [LLMConcurrency] {self.name} 并发上限 {old} → {new}（{reason}）")
+        return True
+
+    def _decrease(self, factor: float, reason: str, cooldown: float) -> bool:
+        now = time.monotonic()
+        if now - self.last_decrease < cooldown:
+            return False
+        self.last_decrease = now
+        return self._adjust(self.limit * factor, reason)
+
+    def on_success(self, latency_ms: float, latency_target_ms: float, cooldown: float) -> bool:
+        self.calls += 1
+        self.latency_ewma_ms = (
+            latency_ms
+            if self.latency_ewma_ms is None
+            else self.latency_ewma_ms + _EWMA_ALPHA * (latency_ms - self.latency_ewma_ms)
+        )
+        if latency_target_ms and latency_ms > latency_target_ms:
+            self.slow_calls += 1
+            return self._decrease(_LATENCY_DECREASE, f"延迟 {latency_ms:.0f}ms 超过目标", cooldown)
+        # 加性增长：每个「上限」数量的成功调用约 +1
+        return self._adjust(self.limit + 1.0 / self.limit, "连续成功")
+
+    def on_rate_limit(self, factor: float, cooldown: float) -> bool:
+        self.calls += 1
+        self.rate_limited += 1
+        return self._decrease(factor, "遇到 429 限流", cooldown)
+
+
+class _Waiter:
+    __slots__ = ("provider", "key", "priority", "seq", "granted", "event", "loop", "future")
+
+    def __init__(self, provider: str, key: Optional[str], priority: LLMPriority, seq: int):
+        self.provider = provider
+        self.key = key
+        self.priority = priority
+        self.seq = seq
+        self.granted = False
+        self.event: Optional[threading.Event] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
+
+
+class LLMSlot:
+    """已获取的并发槽位；release() 时按调用结果反馈给 AIMD（幂等）"""
+
+    def __init__(self, controller: "LLMConcurrencyController", waiter: _Waiter, queued_ms: float):
+        self._controller = controller
+        self.provider = waiter.provider
+        self.key = waiter.key
+        self.priority = waiter.priority
+        self.queued_ms = queued_ms
+        self.started = time.perf_counter()
+        self._reported = False
+        self._released = False
+
+    def report(self, status_code: Optional[int] = None, error: Optional[BaseException] = None) -> None:
+        """上报一次请求结果（HTTP 层可多次上报，如 SDK 内部重试）"""
+        self._reported = True
+        if status_code == 429 or (error is not None and is_rate_limit_error(error)):
+            self._controller.record_result(self.provider, rate_limited=True)
+        elif error is None and (status_code is None or status_code < 400):
+            self._controller.record_result(self.provider, latency_ms=(time.perf_counter() - self.started) * 1000)
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        if self._released:
+            return
+        self._released = True
+        if not self._reported:
+            self.report(error=error)
+        self._controller.release(self.provider, self.key)
+
+
+class LLMConcurrencyController:
+    """按提供商 / Key / 优先级分配 LLM 并发槽位（线程安全，同时服务事件循环与线程池调用）"""
+
+    def __init__(self):
+        self.global_limit = max(1, _env_int("LLM_GLOBAL_CONCURRENCY", 32))
+        self.provider_limit = max(1, _env_int("LLM_PROVIDER_CONCURRENCY", self.global_limit))
+        self.per_key_limit = max(1, _env_int("LLM_PER_KEY_CONCURRENCY", 16))
+        self.interactive_reserved = min(_env_int("LLM_INTERACTIVE_RESERVED", 2), self.global_limit - 1)
+        self.hold_stream_slots = os.getenv("LLM_HOLD_STREAM_SLOTS", "false").lower() == "true"
+        self.sync_wait_timeout = float(os.getenv("LLM_SYNC_WAIT_TIMEOUT", "30"))
+        self.adaptive = os.getenv("LLM_ADAPTIVE_ENABLED", "true").lower() == "true"
+        self.decrease_factor = float(os.getenv("LLM_AIMD_DECREASE", "0.5"))
+        self.cooldown = float(os.getenv("LLM_AIMD_COOLDOWN", "5"))
+        self.latency_target_ms = float(os.getenv("LLM_LATENCY_TARGET_MS", "0"))
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._providers: Dict[str, _ProviderLimit] = {}
+        self._waiters: List[_Waiter] = []  # 按 (priority, seq) 有序
+        self._seq = itertools.count()
+        self._loop_bypass = 0
+        self._sync_overdraft = 0
+
+    # ------------------------------------------------------------ 分配
+
+    def _provider(self, name: str) -> _ProviderLimit:
+        limit = self._providers.get(name)
+        if limit is None:
+            ceiling = min(self.provider_limit, self.global_limit)
+            keys = _provider_key_count(name)
+            if keys:
+                ceiling = min(ceiling, keys * self.per_key_limit)
+            limit = self._providers[name] = _ProviderLimit(name, max(1, ceiling))
+        return limit
+
+    def _try_grant(self, waiter: _Waiter) -> bool:
+        if self._active >= self.global_limit:
+            return False
+        if waiter.priority is not LLMPriority.INTERACTIVE and self._active >= (
+            self.global_limit - self.interactive_reserved
+        ):
+            return False
+        provider = self._provider(waiter.provider)
+        if provider.active >= provider.effective_limit:
+            return False
+        if waiter.key and provider.key_active.get(waiter.key, 0) >= self.per_key_limit:
+            return False
+        self._take(provider, waiter)
+        return True
+
+    def _take(self, provider: _ProviderLimit, waiter: _Waiter) -> None:
+        self._active += 1
+        provider.active += 1
+        if waiter.key:
+            provider.key_active[waiter.key] = provider.key_active.get(waiter.key, 0) + 1
+        waiter.granted = True
+
+    def _dispatch(self) -> List[_Waiter]:
+        """按优先级为等待者分配槽位（需持有 _lock）；被某个提供商上限阻塞的等待者不阻塞其他提供商"""
+        granted = []
+        for waiter in list(self._waiters):
+            if self._active >= self.global_limit:
+                break
+            if self._try_grant(waiter):
+                self._waiters.remove(waiter)
+                granted.append(waiter)
+        return granted
+
+    def _wake(self, waiters: List[_Waiter]) -> None:
+        for waiter in waiters:
+            if waiter.future is None:
+                waiter.event.set()
+                continue
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+            except RuntimeError:  # 等待者的事件循环已关闭，归还槽位
+                self.release(waiter.provider, waiter.key)
+
+    def _enqueue(self, waiter: _Waiter) -> bool:
+        """排队并尝试分配，返回该等待者是否立即获得槽位（唤醒其他等待者在锁外进行）"""
+        with self._lock:
+            bisect.insort(self._waiters, waiter)
+            granted = self._dispatch()
+        self._wake([w for w in granted if w is not waiter])
+        return waiter.granted
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """等待被取消：未分配则出队，已分配则归还"""
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                return
+        self.release(waiter.provider, waiter.key)
+
+    async def acquire(
+        self, provider: str, key: Optional[str] = None, priority: LLMPriority = LLMPriority.NORMAL
+    ) -> LLMSlot:
+        queued_at = time.perf_counter()
+        waiter = _Waiter(provider, key, priority, next(self._seq))
+        waiter.loop = asyncio.get_running_loop()
+        waiter.future = waiter.loop.create_future()
+        if not self._enqueue(waiter):
+            try:
+                await waiter.future
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        return LLMSlot(self, waiter, (time.perf_counter() - queued_at) * 1000)
+
+    def acquire_sync(
+        self, provider: str, key: Optional[str] = None, priority: LLMPriority = LLMPriority.NORMAL
+    ) -> LLMSlot:
+        """
+        同步获取槽位（线程池中调用）
+
+        在事件循环线程中不等待，直接超额放行，避免阻塞持有者的释放；线程池中最多等待
+        sync_wait_timeout 秒，超时后超额放行（持有者可能正等待同一线程池中的线程才能完成）
+        """
+        queued_at = time.perf_counter()
+        waiter = _Waiter(provider, key, priority, next(self._seq))
+        if _in_event_loop():
+            with self._lock:
+                self._take(self._provider(provider), waiter)
+                self._loop_bypass += 1
+            return LLMSlot(self, waiter, 0.0)
+
+        waiter.event = threading.Event()
+        if not self._enqueue(waiter):
+            try:
+                granted = waiter.event.wait(self.sync_wait_timeout if self.sync_wait_timeout > 0 else None)
+            except BaseException:
+                self._abandon(waiter)
+                raise
+            if not granted:
+                self._overdraft(waiter)
+        return LLMSlot(self, waiter, (time.perf_counter() - queued_at) * 1000)
+
+    def _overdraft(self, waiter: _Waiter) -> None:
+        """同步等待超时：仍未分配则出队并超额占用槽位（此后按正常槽位释放）"""
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+            self._take(self._provider(waiter.provider), waiter)
+            self._sync_overdraft += 1
+        logger.warning(
+            f"️ [LLMConcurrency] {waiter.provider} 同步调用等待槽位超过 {self.sync_wait_timeout:.0f}s，超额放行"
+        )
+
+    def release(self, provider: str, key: Optional[str] = None) -> None:
+        with self._lock:
+            limit = self._provider(provider)
+            self._active = max(0, self._active - 1)
+            limit.active = max(0, limit.active - 1)
+            if key and key in limit.key_active:
+                limit.key_active[key] -= 1
+                if limit.key_active[key] <= 0:
+                    del limit.key_active[key]
+            granted = self._dispatch()
+        self._wake(granted)
+
+    # ------------------------------------------------------------ AIMD 反馈
+
+    def record_result(self, provider: str, latency_ms: Optional[float] = None, rate_limited: bool = False) -> None:
+        if not self.adaptive:
+            return
+        with self._lock:
+            limit = self._provider(provider)
+            if rate_limited:
+                limit.on_rate_limit(self.decrease_factor, self.cooldown)
+                return
+            grew = limit.on_success(latency_ms or 0.0, self.latency_target_ms, self.cooldown)
+            granted = self._dispatch() if grew else []
+        self._wake(granted)
+
+    # ------------------------------------------------------------ 统计
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting = {p.name.lower(): 0 for p in LLMPriority}
+            for waiter in self._waiters:
+                waiting[waiter.priority.name.lower()] += 1
+            return {
+                "llm_active_calls": self._active,
+                "llm_concurrency_limit": self.global_limit,
+                "llm_waiting": len(self._waiters),
+                "waiting_by_priority": waiting,
+                "interactive_reserved": self.interactive_reserved,
+                "per_key_limit": self.per_key_limit,
+                "adaptive": self.adaptive,
+                "loop_bypass": self._loop_bypass,
+                "sync_overdraft": self._sync_overdraft,
+                "hold_stream_slots": self.hold_stream_slots,
+                "providers": {
+                    name: {
+                        "limit": p.effective_limit,
+                        "ceiling": p.ceiling,
+                        "active": p.active,
+                        "keys_active": len(p.key_active),
+                        "calls": p.calls,
+                        "rate_limited": p.rate_limited,
+                        "slow_calls": p.slow_calls,
+                        "increases": p.increases,
+                        "decreases": p.decreases,
+                        "latency_ewma_ms": round(p.latency_ewma_ms, 1) if p.latency_ewma_ms is not None else None,
+                        "history": list(p.history),
+                    }
+                    for name, p in self._providers.items()
+                },
+            }
+
+
+def _provider_key_count(provider: str) -> int:
+    try:
+        from .key_balancer import key_balancer
 
-_semaphore: asyncio.Semaphore | None = None
-_active_calls: int = 0
+        return key_balancer.key_count(provider)
+    except Exception:
+        return 0
 
 
-def get_llm_semaphore() -> asyncio.Semaphore:
-    """返回全局 LLM 并发 Semaphore（懒加载单例）。
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
 
-    大小由环境变量 LLM_GLOBAL_CONCURRENCY 控制（默认 8）。
-    在首次调用时创建，此后复用同一实例。
+
+_controller: Optional[LLMConcurrencyController] = None
+_controller_lock = threading.Lock()
+
+
+def get_llm_controller() -> LLMConcurrencyController:
+    """返回全局 LLM 并发控制器（懒加载单例，首次调用时读取环境变量）"""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = LLMConcurrencyController()
+    return _controller
+
+
+# ------------------------------------------------------------------ 调用入口
+
+
+def current_llm_priority() -> LLMPriority:
+    return _priority_var.get()
+
+
+@contextmanager
+def llm_priority(priority: LLMPriority) -> Iterator[None]:
+    """在此范围内发起的 LLM 调用使用指定优先级（线程池 / 子任务继承）"""
+    token = _priority_var.set(priority)
+    try:
+        yield
+    finally:
+        _priority_var.reset(token)
+
+
+@asynccontextmanager
+async def llm_slot(
+    provider: str = "default", priority: Optional[LLMPriority] = None, key: Optional[str] = None
+) -> AsyncIterator[LLMSlot]:
+    """获取一个 LLM 并发槽位；已持有槽位的上下文中直接复用（不重复计数）"""
+    held = _held_slot.get()
+    if held is not None:
+        yield held
+        return
+    slot = await get_llm_controller().acquire(provider, key, priority if priority is not None else _priority_var.get())
+    token = _held_slot.set(slot)
+    try:
+        yield slot
+    except BaseException as e:  # 取消 / 超时不算成功调用
+        slot.release(error=e)
+        raise
+    finally:
+        _held_slot.reset(token)
+        slot.release()
+
+
+@contextmanager
+def llm_slot_sync(
+    provider: str = "default", priority: Optional[LLMPriority] = None, key: Optional[str] = None
+) -> Iterator[LLMSlot]:
+    """llm_slot() 的同步版本"""
+    held = _held_slot.get()
+    if held is not None:
+        yield held
+        return
+    slot = get_llm_controller().acquire_sync(provider, key, priority if priority is not None else _priority_var.get())
+    token = _held_slot.set(slot)
+    try:
+        yield slot
+    except BaseException as e:  # 取消 / 超时不算成功调用
+        slot.release(error=e)
+        raise
+    finally:
+        _held_slot.reset(token)
+        slot.release()
+
+
+# ------------------------------------------------------------------ HTTP 传输层
+
+
+def _request_key(request: httpx.Request) -> Optional[str]:
+    """从认证头提取 API Key 指纹（不保存原文）"""
+    auth = request.headers.get("authorization") or request.headers.get("x-api-key") or request.headers.get("api-key")
+    if not auth:
+        return None
+    return hashlib.blake2b(auth.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def _is_event_stream(response: httpx.Response) -> bool:
     """
-    global _semaphore
-    if _semaphore is None:
-        limit = int(os.getenv("LLM_GLOBAL_CONCURRENCY", "8"))
-        _semaphore = asyncio.Semaphore(limit)
-    return _semaphore
+    尚未读取、且需要持有槽位到读完的 SSE 响应
+
+    默认（LLM_HOLD_STREAM_SLOTS=false）收到响应头即归还；已读入内存的响应总是直接归还。
+    """
+    if not get_llm_controller().hold_stream_slots:
+        return False
+    return not response.is_closed and response.headers.get("content-type", "").startswith("text/event-stream")
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """流式响应读取完毕或关闭时才归还槽位"""
+
+    def __init__(self, stream: httpx.SyncByteStream, slot: LLMSlot):
+        self._stream = stream
+        self._slot = slot
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+        self._slot.release()
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._slot.release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, slot: LLMSlot):
+        self._stream = stream
+        self._slot = slot
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+        self._slot.release()
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._slot.release()
+
+
+class GatedTransport(httpx.BaseTransport):
+    """每个 HTTP 请求经过并发控制器；429 与延迟直接反馈给 AIMD"""
+
+    def __init__(self, provider: str, inner: Optional[httpx.BaseTransport] = None):
+        self.provider = provider
+        self._inner = inner or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        held = _held_slot.get()
+        slot = held or get_llm_controller().acquire_sync(self.provider, _request_key(request), _priority_var.get())
+        try:
+            response = self._inner.handle_request(request)
+        except Exception as e:
+            slot.report(error=e)
+            if held is None:
+                slot.release()
+            raise
+        slot.report(status_code=response.status_code)
+        if held is None:
+            if _is_event_stream(response):
+                response.stream = _ReleasingStream(response.stream, slot)
+            else:
+                slot.release()
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncGatedTransport(httpx.AsyncBaseTransport):
+    """GatedTransport 的异步版本"""
+
+    def __init__(self, provider: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.provider = provider
+        self._inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        held = _held_slot.get()
+        slot = held or await get_llm_controller().acquire(self.provider, _request_key(request), _priority_var.get())
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException as e:
+            slot.report(error=e)
+            if held is None:
+                slot.release()
+            raise
+        slot.report(status_code=response.status_code)
+        if held is None:
+            if _is_event_stream(response):
+                response.stream = _AsyncReleasingStream(response.stream, slot)
+            else:
+                slot.release()
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def gated_transport(provider: str, **transport_kwargs: Any) -> GatedTransport:
+    """创建经过并发控制器的同步 httpx 传输（transport_kwargs 传给 httpx.HTTPTransport）"""
+    return GatedTransport(provider, httpx.HTTPTransport(**transport_kwargs))
+
+
+def gated_async_transport(provider: str, **transport_kwargs: Any) -> AsyncGatedTransport:
+    """创建经过并发控制器的异步 httpx 传输，用于直接请求 LLM API 的 httpx.AsyncClient"""
+    return AsyncGatedTransport(provider, httpx.AsyncHTTPTransport(**transport_kwargs))
+
+
+# ------------------------------------------------------------------ 工作流节点优先级
+
+
+class LLMPriorityCallback(BaseCallbackHandler):
+    """
+    按 NODE_PRIORITIES 在节点执行期间设置 LLM 调用优先级
+
+    LangGraph 的 inline 回调与各节点共享同一个上下文，节点结束时恢复的值不一定作用到下一个节点；
+    因此每个节点开始时都显式设置（未配置的节点使用所属工作流启动时的优先级），工作流结束时再恢复。
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._roots: Dict[UUID, LLMPriority] = {}
+
+    def on_chain_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        if parent_run_id is None:
+            self._roots[run_id] = _priority_var.get()
+            return
+        node = (metadata or {}).get("langgraph_node")
+        if not node or kwargs.get("name") != node:
+            return
+        _priority_var.set(NODE_PRIORITIES.get(node, self._roots.get(parent_run_id, LLMPriority.NORMAL)))
+
+    def _restore(self, run_id: UUID) -> None:
+        previous = self._roots.pop(run_id, None)
+        if previous is not None:
+            _priority_var.set(previous)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._restore(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._restore(run_id)
+
+
+def attach_llm_priorities(graph: Any) -> Any:
+    """为编译后的图挂载节点优先级回调"""
+    if graph is None:
+        return graph
+    return graph.with_config(callbacks=[LLMPriorityCallback()])
 
 
-def increment_active() -> None:
-    """当前正在执行的 LLM 调用数 +1（在 acquire semaphore 后调用）。"""
-    global _active_calls
-    _active_calls += 1
+# ------------------------------------------------------------------ 兼容接口
 
 
-def decrement_active() -> None:
-    """当前正在执行的 LLM 调用数 -1（在 release semaphore 前调用）。"""
-    global _active_calls
-    _active_calls = max(0, _active_calls - 1)
+def get_llm_semaphore():
+    """兼容旧接口：返回可 `async with` 的全局槽位（提供商记为 default）"""
+    return llm_slot()
 
 
 def get_llm_stats() -> dict:
     """返回当前 LLM 并发状态（供 /api/metrics/llm 使用）。"""
-    limit = int(os.getenv("LLM_GLOBAL_CONCURRENCY", "8"))
-    return {
-        "llm_active_calls": _active_calls,
-        "llm_concurrency_limit": limit,
-    }
+    return get_llm_controller().stats()
 
 
 def reset_semaphore() -> None:
-    """重置 Semaphore 和计数器（测试用，生产环境无需调用）。"""
-    global _semaphore, _active_calls
-    _semaphore = None
-    _active_calls = 0
+    """重置控制器（测试用，下次使用时重新读取环境变量）。"""
+    global _controller
+    with _controller_lock:
+        _controller = None
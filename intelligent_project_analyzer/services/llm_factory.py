@@ -12,6 +12,7 @@ from langchain_openai import ChatOpenAI
 from loguru import logger
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from intelligent_project_analyzer.services.llm_client_pool import get_pooled_chat_model
 from intelligent_project_analyzer.settings import LLMConfig, settings
 
 
@@ -309,7 +310,8 @@ class LLMFactory:
             f"max_retries={llm_params.get('max_retries', cfg.max_retries)}"
         )
 
-        return ChatOpenAI(**llm_params)
+        # 同一模型/Key 复用实例与 HTTP 连接池，temperature / max_tokens 按次覆盖
+        return get_pooled_chat_model("openai", ChatOpenAI, llm_params)
 
     @staticmethod
     def create_streaming_llm(config: Optional[LLMConfig] = None, **kwargs) -> ChatOpenAI:
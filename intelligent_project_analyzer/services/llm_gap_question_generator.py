@@ -17,10 +17,11 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import yaml
 from langchain_core.messages import HumanMessage, SystemMessage
 from loguru import logger
 
+from ..core.config_registry import load_yaml_config
+
 #  v7.131: 导入LLM重试工具
 from ..utils.llm_retry import LLMRetryConfig, ainvoke_llm_with_retry
 
@@ -44,10 +45,9 @@ class LLMGapQuestionGenerator:
         """
         config_path = Path(__file__).parent.parent / "config" / "prompts" / "gap_question_generator.yaml"
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-                logger.info(f" [LLMGapQuestionGenerator] 配置文件加载成功: {config_path}")
-                return config
+            config = load_yaml_config(config_path)
+            logger.info(f" [LLMGapQuestionGenerator] 配置文件加载成功: {config_path}")
+            return config
         except Exception as e:
             logger.error(f" [LLMGapQuestionGenerator] 配置文件加载失败: {e}")
             return {}
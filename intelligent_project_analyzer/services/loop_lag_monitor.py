@@ -0,0 +1,192 @@
+"""
+事件循环延迟监控
+
+周期性 sleep(interval) 并测量实际唤醒时间与预期的差值（loop lag）。同步 LLM 调用若在事件循环
+线程中执行，会让所有会话的 WebSocket 推送、其他节点一起停顿，表现为明显的 lag。
+
+LLMAgent.invoke_llm() 通过 track_blocking_call() 上报自己是否在事件循环线程中被调用；
+监控器发现 lag 超过阈值时，把同一时间窗口内的阻塞调用一并输出，便于定位尚未迁移到
+ainvoke_llm() 的调用点。
+
+用法：
+    from .loop_lag_monitor import get_loop_lag_monitor
+
+    get_loop_lag_monitor().start()     # 在事件循环内调用（如 FastAPI lifespan）
+    ...
+    await get_loop_lag_monitor().stop()
+
+配置：
+    LOOP_LAG_MONITOR_ENABLED   是否启用（默认 true）
+    LOOP_LAG_INTERVAL          采样间隔秒数（默认 0.5）
+    LOOP_LAG_THRESHOLD_MS      告警阈值毫秒（默认 200）
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from loguru import logger
+
+LOOP_LAG_MONITOR_ENABLED = os.getenv("LOOP_LAG_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "200"))
+
+# 事件循环线程中的同步调用：名称 → {"calls", "total_ms", "max_ms"}
+_blocking_stats: Dict[str, Dict[str, float]] = {}
+# 最近结束的阻塞调用 (名称, 结束时间, 耗时ms)，用于把 lag 归因到具体调用
+_recent_blocking: Deque[Tuple[str, float, float]] = deque(maxlen=50)
+_blocking_lock = threading.Lock()
+
+
+def _in_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+@contextmanager
+def track_blocking_call(name: str) -> Iterator[None]:
+    """
+    包裹一次同步（阻塞）调用；仅当当前线程正在运行事件循环时记录
+
+    线程池中执行的同步调用（如 asyncio.to_thread）不阻塞事件循环，不计入。
+    """
+    if not _in_event_loop_thread():
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ended = time.perf_counter()
+        elapsed_ms = (ended - started) * 1000
+        with _blocking_lock:
+            stats = _blocking_stats.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            _recent_blocking.append((name, ended, elapsed_ms))
+        logger.warning(f"️ [LoopLag] {name} 在事件循环线程中同步调用 LLM，阻塞 {elapsed_ms:.0f}ms（请改用 ainvoke_llm）")
+
+
+def _blocking_since(since: float) -> Dict[str, float]:
+    with _blocking_lock:
+        culprits: Dict[str, float] = {}
+        for name, ended, elapsed_ms in _recent_blocking:
+            if ended >= since:
+                culprits[name] = culprits.get(name, 0.0) + elapsed_ms
+        return culprits
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控器
+
+    Args:
+        interval: 采样间隔（秒）
+        threshold_ms: 超过该延迟视为一次卡顿
+    """
+
+    def __init__(self, interval: Optional[float] = None, threshold_ms: Optional[float] = None):
+        self.interval = interval if interval is not None else LOOP_LAG_INTERVAL
+        self.threshold_ms = threshold_ms if threshold_ms is not None else LOOP_LAG_THRESHOLD_MS
+        self._task: Optional[asyncio.Task] = None
+        self.samples = 0
+        self.stalls = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.total_lag_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """在当前事件循环中启动监控任务（重复调用无副作用）"""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f" [LoopLag] 事件循环延迟监控已启动 (interval={self.interval}s, threshold={self.threshold_ms}ms)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record(self, lag_ms: float, window_start: float) -> None:
+        """记录一次采样；超过阈值时输出同一窗口内的阻塞调用"""
+        self.samples += 1
+        self.last_lag_ms = lag_ms
+        self.total_lag_ms += lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms < self.threshold_ms:
+            return
+
+        self.stalls += 1
+        culprits = _blocking_since(window_start)
+        if culprits:
+            detail = ", ".join(f"{name} {ms:.0f}ms" for name, ms in sorted(culprits.items(), key=lambda x: -x[1]))
+            logger.warning(f"️ [LoopLag] 事件循环卡顿 {lag_ms:.0f}ms，期间的阻塞 LLM 调用: {detail}")
+        else:
+            logger.warning(f"️ [LoopLag] 事件循环卡顿 {lag_ms:.0f}ms（未发现阻塞 LLM 调用）")
+
+    async def _run(self) -> None:
+        while True:
+            window_start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - window_start - self.interval) * 1000)
+            self.record(lag_ms, window_start)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_s": self.interval,
+            "threshold_ms": self.threshold_ms,
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "avg_lag_ms": round(self.total_lag_ms / self.samples, 2) if self.samples else 0.0,
+        }
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_lag_monitor() -> LoopLagMonitor:
+    """返回全局监控器（懒加载单例）"""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopLagMonitor()
+    return _monitor
+
+
+def get_loop_lag_stats() -> Dict[str, Any]:
+    """监控器状态 + 事件循环线程中的同步 LLM 调用统计（供 /api/metrics/loop-lag 使用）"""
+    with _blocking_lock:
+        blocking = {
+            name: {**stats, "avg_ms": round(stats["total_ms"] / stats["calls"], 2) if stats["calls"] else 0.0}
+            for name, stats in _blocking_stats.items()
+        }
+    return {**get_loop_lag_monitor().stats(), "blocking_llm_calls": blocking}
+
+
+def reset_loop_lag_stats() -> None:
+    """重置统计（测试用）"""
+    global _monitor
+    with _blocking_lock:
+        _blocking_stats.clear()
+        _recent_blocking.clear()
+    _monitor = None
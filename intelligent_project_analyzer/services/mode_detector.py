@@ -9,6 +9,17 @@ import json
 from typing import List, Dict, Tuple, Optional, Any
 from loguru import logger
 
+from ..utils.keyword_matcher import KeywordMatcher, get_cached_matcher
+
+
+def _build_signature_matcher(signatures: Dict[str, Dict[str, Any]]) -> KeywordMatcher:
+    """编译全部模式的关键词/场景/反向关键词，分组键为 (mode_id, 字段名)"""
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for mode_id, signature in signatures.items():
+        for field in ("keywords", "scenarios", "anti_keywords"):
+            groups[(mode_id, field)] = signature.get(field, [])
+    return KeywordMatcher.from_groups(groups, ignore_case=True)
+
 
 class DesignModeDetector:
     """设计模式检测器 - 基于关键词匹配的快速筛选"""
@@ -971,9 +982,13 @@ class DesignModeDetector:
         },
     }
 
+    @classmethod
+    def get_keyword_matcher(cls) -> KeywordMatcher:
+        return get_cached_matcher(cls.MODE_SIGNATURES, _build_signature_matcher)
+
     @classmethod
     def detect(
-        cls, user_input: str, structured_requirements: Optional[Dict] = None
+        cls, user_input: str, structured_requirements: Optional[Dict] = None, features: Any = None
     ) -> List[Tuple[str, float, List[str]]]:
         """
         快速关键词检测（第一阶段筛选）
@@ -986,6 +1001,7 @@ class DesignModeDetector:
         Args:
             user_input: 用户输入文本
             structured_requirements: 结构化需求（可选，提供更多上下文）
+            features: 输入特征阶段的结果（InputFeatures，可选），上下文文本一致时复用其关键词命中
 
         Returns:
             List[(mode_id, confidence, matched_keywords), ...]
@@ -1004,31 +1020,32 @@ class DesignModeDetector:
 
         context_lower = context_text.lower()
 
+        # 单次扫描匹配全部模式的关键词（替代逐个 kw.lower() in context_lower）
+        matcher = cls.get_keyword_matcher()
+        group_hits = matcher.match_groups(context_lower, matcher.resolve_positions(context_lower, features, "mode"))
+
         for mode_id, signature in cls.MODE_SIGNATURES.items():
             score = 0.0
             matched_keywords = []
 
             # 1. 关键词匹配
-            for kw in signature["keywords"]:
-                if kw.lower() in context_lower:
-                    matched_keywords.append(kw)
-                    # 🆕 v7.623: 词组匹配权重更高
-                    if len(kw) > 3:  # 词组（3字以上）
-                        score += 1.5
-                    else:  # 单字/双字
-                        score += 1.0
+            for index in group_hits.get((mode_id, "keywords"), ()):
+                kw = signature["keywords"][index]
+                matched_keywords.append(kw)
+                # 🆕 v7.623: 词组匹配权重更高
+                if len(kw) > 3:  # 词组（3字以上）
+                    score += 1.5
+                else:  # 单字/双字
+                    score += 1.0
 
             # 2. 场景匹配 (权重: 2.5 - 场景匹配更重要)
-            for scenario in signature["scenarios"]:
-                if scenario.lower() in context_lower:
-                    score += 2.5  # 🆕 v7.623: 提升场景权重
-                    matched_keywords.append(f"场景:{scenario}")
+            for index in group_hits.get((mode_id, "scenarios"), ()):
+                score += 2.5  # 🆕 v7.623: 提升场景权重
+                matched_keywords.append(f"场景:{signature['scenarios'][index]}")
 
             # 3. 🆕 v7.623: 负向指标惩罚（更严格）
-            anti_penalty = 0
-            for anti_kw in signature.get("anti_keywords", []):
-                if anti_kw.lower() in context_lower:
-                    anti_penalty += 1.0  # 🆕 v7.623: 提升惩罚力度
+            # 🆕 v7.623: 每个反向关键词扣 1.0（提升惩罚力度）
+            anti_penalty = 1.0 * len(group_hits.get((mode_id, "anti_keywords"), ()))
 
             # 应用惩罚
             score = max(0, score - anti_penalty)
@@ -1181,7 +1198,12 @@ class HybridModeDetector:
 
     @classmethod
     async def detect(
-        cls, user_input: str, structured_requirements: Optional[Dict] = None, llm_client=None, use_llm: bool = True
+        cls,
+        user_input: str,
+        structured_requirements: Optional[Dict] = None,
+        llm_client=None,
+        use_llm: bool = True,
+        features: Any = None,
     ) -> List[Dict[str, Any]]:
         """
         混合策略检测
@@ -1191,6 +1213,7 @@ class HybridModeDetector:
             structured_requirements: 结构化需求（可选）
             llm_client: LLM客户端（可选）
             use_llm: 是否使用LLM增强（默认True）
+            features: 输入特征阶段的结果（可选）
 
         Returns:
             [{"mode": str, "confidence": float, "reason": str, "detected_by": str}, ...]
@@ -1198,7 +1221,7 @@ class HybridModeDetector:
         logger.info("[混合模式检测] 开始检测...")
 
         # 第一阶段: 关键词快速过滤
-        keyword_results = DesignModeDetector.detect(user_input, structured_requirements)
+        keyword_results = DesignModeDetector.detect(user_input, structured_requirements, features)
 
         if not keyword_results:
             logger.warning("[混合模式检测] 关键词检测无结果，返回默认模式")
@@ -1233,13 +1256,15 @@ class HybridModeDetector:
         ]
 
     @classmethod
-    def detect_sync(cls, user_input: str, structured_requirements: Optional[Dict] = None) -> List[Dict[str, Any]]:
+    def detect_sync(
+        cls, user_input: str, structured_requirements: Optional[Dict] = None, features: Any = None
+    ) -> List[Dict[str, Any]]:
         """
         同步版本检测（仅关键词，快速）
 
         用于不支持async的场景
         """
-        keyword_results = DesignModeDetector.detect(user_input, structured_requirements)
+        keyword_results = DesignModeDetector.detect(user_input, structured_requirements, features)
 
         if not keyword_results:
             return [
@@ -1253,14 +1278,16 @@ class HybridModeDetector:
 
 
 # 便捷函数
-def detect_design_modes(user_input: str, structured_requirements: Optional[Dict] = None) -> List[Dict[str, Any]]:
+def detect_design_modes(
+    user_input: str, structured_requirements: Optional[Dict] = None, features: Any = None
+) -> List[Dict[str, Any]]:
     """
     便捷函数：同步检测设计模式（仅关键词）
 
     Returns:
         [{"mode": str, "confidence": float, "reason": str}, ...]
     """
-    return HybridModeDetector.detect_sync(user_input, structured_requirements)
+    return HybridModeDetector.detect_sync(user_input, structured_requirements, features)
 
 
 def get_mode_name(mode_id: str) -> str:
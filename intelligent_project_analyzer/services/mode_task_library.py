@@ -11,11 +11,12 @@ v7.800 新增:
 - 添加混合模式专家推荐
 """
 
-import yaml
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from loguru import logger
 
+from ..core.config_registry import get_config_registry, load_yaml_config
+
 # 导入混合模式解决器
 try:
     from ..mode_engine.hybrid_mode_resolver import HybridModeResolver, HybridModeDetectionResult, ResolutionResult
@@ -87,6 +88,11 @@ class ModeTaskLibrary:
             logger.error(f"混合模式检测失败: {e}")
             return None, None
 
+    @classmethod
+    def _on_config_changed(cls, path: Path) -> None:
+        """配置热重载：清空类缓存，下次访问重新从注册表读取"""
+        cls._mode_tasks_config = None
+
     @classmethod
     def _load_config(cls) -> Dict:
         """加载 MODE_TASK_LIBRARY.yaml 配置"""
@@ -101,8 +107,8 @@ class ModeTaskLibrary:
                 cls._mode_tasks_config = {}
                 return cls._mode_tasks_config
 
-            with open(config_path, "r", encoding="utf-8") as f:
-                cls._mode_tasks_config = yaml.safe_load(f) or {}
+            cls._mode_tasks_config = load_yaml_config(config_path) or {}
+            get_config_registry().subscribe(cls._on_config_changed, config_path)
 
             logger.info(f"✅ 成功加载 MODE_TASK_LIBRARY.yaml ({len(cls._mode_tasks_config)} 个模式配置)")
             return cls._mode_tasks_config
@@ -11,9 +11,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import yaml
 from loguru import logger
 
+from ..core.config_registry import load_yaml_config
+from ..utils.keyword_matcher import KeywordMatcher, get_cached_matcher
+
 
 @dataclass
 class MotivationType:
@@ -60,12 +62,17 @@ class UnmatchedCase:
     session_id: Optional[str] = None
 
 
+def _build_motivation_matcher(types: Dict[str, MotivationType]) -> KeywordMatcher:
+    return KeywordMatcher.from_groups({type_id: list(t.keywords) for type_id, t in types.items()}, ignore_case=True)
+
+
 class MotivationTypeRegistry:
     """动机类型注册表 - 支持动态加载"""
 
     _instance = None
     _types: Dict[str, MotivationType] = {}
     _config: Dict[str, Any] = {}
+    _generation: int = 0  # _types 原地更新时递增，供关键词匹配器判断失效
 
     def __new__(cls):
         if cls._instance is None:
@@ -82,8 +89,8 @@ class MotivationTypeRegistry:
             config_path = Path(__file__).parent.parent / "config" / "motivation_types.yaml"
 
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                self._config = yaml.safe_load(f)
+            # keywords 列表会被原地转换为字典，取独立副本避免污染共享配置
+            self._config = load_yaml_config(config_path, copy=True)
 
             # 加载动机类型
             for item in self._config.get("motivation_types", []):
@@ -96,6 +103,7 @@ class MotivationTypeRegistry:
                     motivation_type = MotivationType(**item)
                     self._types[motivation_type.id] = motivation_type
 
+            MotivationTypeRegistry._generation += 1
             logger.info(f" [MotivationRegistry] 加载 {len(self._types)} 个动机类型")
             logger.debug(f"   启用类型: {list(self._types.keys())}")
 
@@ -130,6 +138,7 @@ class MotivationTypeRegistry:
         ]
         for t in basic_types:
             self._types[t.id] = t
+        MotivationTypeRegistry._generation += 1
 
     def get_type(self, type_id: str) -> Optional[MotivationType]:
         """获取指定类型"""
@@ -200,6 +209,10 @@ class MotivationTypeRegistry:
                 "current_count": len(self._types),
             }
 
+    def get_keyword_matcher(self) -> KeywordMatcher:
+        """全部类型关键词的匹配器（热更新后自动重新编译）"""
+        return get_cached_matcher(self._types, _build_motivation_matcher, MotivationTypeRegistry._generation)
+
     def get_types_by_priority(self, priority: str) -> List[MotivationType]:
         """按优先级获取类型"""
         return [t for t in self._types.values() if t.priority == priority and t.enabled]
@@ -491,11 +504,17 @@ class MotivationInferenceEngine:
         self.learning = MotivationLearningSystem(self.registry)
 
     async def infer(
-        self, task: Dict[str, Any], user_input: str, structured_data: Optional[Dict[str, Any]] = None
+        self,
+        task: Dict[str, Any],
+        user_input: str,
+        structured_data: Optional[Dict[str, Any]] = None,
+        features: Any = None,
     ) -> MotivationResult:
         """
         推断任务的动机类型（4级降级策略）
 
+        features 为输入特征阶段的结果（可选），用户输入部分的关键词命中直接复用，多任务并行推断时不再重复扫描。
+
         Level 1: LLM智能推理（首选）
         Level 2: 增强关键词匹配
         Level 3: 规则引擎
@@ -518,7 +537,7 @@ class MotivationInferenceEngine:
                 logger.warning(f"️ [Level 1] LLM失败: {e}，降级到关键词匹配")
 
         # Level 2: 增强关键词匹配
-        result = self._keyword_matching(task, user_input, structured_data)
+        result = self._keyword_matching(task, user_input, structured_data, features)
         if result.confidence >= 0.6:
             logger.info(f" [Level 2] 关键词匹配: {result.primary} (置信度: {result.confidence:.2f})")
             self.learning.record_unmatched_case(task, user_input, result)
@@ -698,13 +717,20 @@ class MotivationInferenceEngine:
             raise
 
     def _keyword_matching(
-        self, task: Dict[str, Any], user_input: str, structured_data: Optional[Dict[str, Any]]
+        self,
+        task: Dict[str, Any],
+        user_input: str,
+        structured_data: Optional[Dict[str, Any]],
+        features: Any = None,
     ) -> MotivationResult:
         """Level 2: 增强关键词匹配"""
 
-        title = task.get("title", "").lower()
-        desc = task.get("description", "").lower()
-        user_text = (user_input or "").lower()
+        # 标题/描述/用户输入各扫描一次，得到命中关键词集合（替代逐个 kw in text）
+        matcher = self.registry.get_keyword_matcher()
+        title = matcher.first_positions(task.get("title", "").lower())
+        desc = matcher.first_positions(task.get("description", "").lower())
+        user_lower = (user_input or "").lower()
+        user_text = matcher.resolve_positions(user_lower, features, "motivation")
 
         # 获取权重配置
         title_weight = self.registry.get_config("keyword_matching.title_weight", 2.0)
@@ -17,6 +17,8 @@ from langchain_anthropic import ChatAnthropic
 from loguru import logger
 from dotenv import load_dotenv
 
+from intelligent_project_analyzer.services.llm_client_pool import get_pooled_chat_model
+
 # 加载环境变量
 load_dotenv()
 
@@ -162,7 +164,9 @@ class MultiLLMFactory:
         elif provider == "anthropic":
             return cls._create_anthropic_llm(config, temperature, max_tokens, timeout, max_retries, **kwargs)
         else:
-            return cls._create_openai_compatible_llm(config, temperature, max_tokens, timeout, max_retries, **kwargs)
+            return cls._create_openai_compatible_llm(
+                config, temperature, max_tokens, timeout, max_retries, provider=provider, **kwargs
+            )
     
     @classmethod
     def _create_openai_compatible_llm(
@@ -172,9 +176,14 @@ class MultiLLMFactory:
         max_tokens: int, 
         timeout: int,
         max_retries: int,
+        provider: str = "openai",
         **kwargs
     ) -> ChatOpenAI:
-        """创建OpenAI兼容的LLM (OpenAI/DeepSeek/Qwen/OpenRouter)"""
+        """创建OpenAI兼容的LLM (OpenAI/DeepSeek/Qwen/OpenRouter)
+
+        同一提供商/模型/Key 的实例与 HTTP 连接池经 llm_client_pool 复用，
+        temperature / max_tokens 等按次覆盖。
+        """
         
         # 获取API Key
         api_key = os.getenv(config["api_key_env"])
@@ -213,7 +222,7 @@ class MultiLLMFactory:
         
         logger.info(f" Creating {model} (timeout={timeout}s, max_tokens={max_tokens})")
         
-        return config["class"](**llm_params)
+        return get_pooled_chat_model(provider, config["class"], llm_params)
     
     @classmethod
     def _create_anthropic_llm(
@@ -22,6 +22,8 @@ from typing import Any, Dict, List, Optional
 from langchain_openai import ChatOpenAI
 from loguru import logger
 
+from .llm_client_pool import get_pooled_chat_model
+
 
 @dataclass
 class APIKeyStats:
@@ -305,7 +307,7 @@ class OpenRouterLoadBalancer:
 
         logger.debug(f" 使用 API Key: {key_id} (成功率: {self.stats[key_id].success_rate:.2%})")
 
-        return ChatOpenAI(**llm_params)
+        return get_pooled_chat_model("openrouter", ChatOpenAI, llm_params)
 
     def invoke_with_retry(self, prompt: str, **kwargs) -> Any:
         """
@@ -19,6 +19,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
 
+from ..utils.keyword_matcher import KeywordMatcher, get_cached_matcher
+
 # 扩展类型文件路径（管理员审批后由 project_type_expansion.py 写入）
 _EXTENSIONS_FILE = Path(__file__).parent.parent.parent / "data" / "project_type_extensions.json"
 
@@ -1451,6 +1453,21 @@ def _build_exclusivity_weights(registry: Dict[str, Any]) -> Dict[str, float]:
     return weights
 
 
+def _build_registry_matcher(registry: Dict[str, Any]) -> KeywordMatcher:
+    """
+    把注册表全部主/次关键词编译为一个匹配器，分组键为 (type_id, "keywords" | "secondary_keywords")。
+
+    无主关键词的类型（如 hybrid_residential_commercial）不参与关键词匹配，不编入。
+    """
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for type_id, cfg in registry.items():
+        if not cfg.get("keywords"):
+            continue
+        groups[(type_id, "keywords")] = cfg["keywords"]
+        groups[(type_id, "secondary_keywords")] = cfg.get("secondary_keywords", [])
+    return KeywordMatcher.from_groups(groups)
+
+
 # 保持向后兼容 — 旧代码直接引用 PROJECT_TYPE_KEYWORDS 的地方仍可访问
 PROJECT_TYPE_KEYWORDS = PROJECT_TYPE_REGISTRY
 
@@ -1492,10 +1509,15 @@ class ProjectTypeDetector:
             当前扩展类型数量
         """
         extensions = _load_extension_registry()
+        # 新的注册表对象 → 关键词匹配器在下次 detect() 时自动重新编译
         cls._merged_registry = {**PROJECT_TYPE_REGISTRY, **extensions}
         logger.info(f"[TypeRegistry] 热重载完成，共 {len(cls._merged_registry)} 种类型，{len(extensions)} 个扩展")
         return len(extensions)
 
+    def get_keyword_matcher(self) -> KeywordMatcher:
+        """当前注册表的关键词匹配器（reload_extensions() 后自动重新编译）"""
+        return get_cached_matcher(self.registry, _build_registry_matcher)
+
     @staticmethod
     def _get_specialty_tag(combined_text: str) -> Optional[str]:
         """Step 11: 从合并文本中提取最精确的专项标签（SPECIALTY_TAG_MAP 按序首次命中）"""
@@ -1513,6 +1535,7 @@ class ProjectTypeDetector:
         self,
         user_input: str,
         confirmed_tasks: Optional[List[Dict[str, Any]]] = None,
+        features: Any = None,
     ) -> Tuple[Optional[str], float, str]:
         """
         检测项目类型。
@@ -1520,6 +1543,7 @@ class ProjectTypeDetector:
         Args:
             user_input: 用户原始输入（或预处理后的合并文本）
             confirmed_tasks: 确认的任务列表（可选）
+            features: 输入特征阶段的结果（InputFeatures，可选），复用其别名预处理、否定区间与关键词命中
 
         Returns:
             (project_type, confidence, reason)
@@ -1528,15 +1552,17 @@ class ProjectTypeDetector:
             - reason       : 人类可读的匹配说明
         """
         # ── Step 6: 别名预处理 ─────────────────────────────────────────────
-        try:
-            from .type_alias_normalizer import normalize_input
+        combined_text = features.normalized_for(user_input) if features is not None else None
+        if combined_text is None:
+            try:
+                from .type_alias_normalizer import normalize_input
 
-            preprocessed = normalize_input(user_input)
-        except Exception:
-            preprocessed = user_input
+                preprocessed = normalize_input(user_input)
+            except Exception:
+                preprocessed = user_input
+            combined_text = preprocessed.lower()
 
         # 合并文本
-        combined_text = preprocessed.lower()
         if confirmed_tasks:
             for task in confirmed_tasks:
                 combined_text += " " + task.get("title", "").lower()
@@ -1546,10 +1572,17 @@ class ProjectTypeDetector:
         try:
             from .type_alias_normalizer import extract_negated_spans, is_negated
 
-            negated_spans = extract_negated_spans(combined_text)
+            negated_spans = features.negated_spans_for(combined_text) if features is not None else None
+            if negated_spans is None:
+                negated_spans = extract_negated_spans(combined_text)
         except Exception:
             negated_spans = []
-            is_negated = lambda kw, txt, spans: False  # noqa: E731
+            is_negated = lambda kw, txt, spans, position=None: False  # noqa: E731
+
+        # 单次扫描得到全部关键词的首次出现位置（替代逐个 kw in combined_text）
+        matcher = self.get_keyword_matcher()
+        positions = matcher.resolve_positions(combined_text, features, "project_type")
+        group_hits = matcher.match_groups(combined_text, positions)
 
         scores: Dict[str, Dict[str, Any]] = {}
 
@@ -1559,15 +1592,15 @@ class ProjectTypeDetector:
                 continue
 
             # ── Step 13: 否定词过滤 ───────────────────────────────────────────
-            def _hits_with_negation(keywords: List[str]) -> Tuple[int, float, List[str]]:
+            def _hits_with_negation(field: str) -> Tuple[int, float, List[str]]:
                 """返回 (命中数, 加权分, 命中词列表)，否定词语境下的命中不计"""
                 count = 0
                 weighted = 0.0
                 matched: List[str] = []
-                for kw in keywords:
-                    if kw not in combined_text:
-                        continue
-                    if negated_spans and is_negated(kw, combined_text, negated_spans):
+                keywords = config.get(field, [])
+                for index in group_hits.get((type_id, field), ()):
+                    kw = keywords[index]
+                    if negated_spans and is_negated(kw, combined_text, negated_spans, positions[kw]):
                         continue  # 否定语境，跳过
                     # ── Step 14: 排他性权重 ───────────────────────────────────
                     w = self._excl_weights.get(kw, 1.0)
@@ -1576,10 +1609,8 @@ class ProjectTypeDetector:
                     matched.append(kw)
                 return count, weighted, matched
 
-            primary_count, primary_weighted, primary_matched = _hits_with_negation(config["keywords"])
-            secondary_count, secondary_weighted, secondary_matched = _hits_with_negation(
-                config.get("secondary_keywords", [])
-            )
+            primary_count, primary_weighted, primary_matched = _hits_with_negation("keywords")
+            secondary_count, secondary_weighted, secondary_matched = _hits_with_negation("secondary_keywords")
 
             # min_secondary_hits：primary=0 时的次要命中阈值
             min_sec = config.get("min_secondary_hits", 0)
@@ -1633,6 +1664,7 @@ class ProjectTypeDetector:
         self,
         user_input: str,
         confirmed_tasks: Optional[List[Dict[str, Any]]] = None,
+        features: Any = None,
     ) -> Dict[str, Any]:
         """
         检测项目类型（返回详细信息）。
@@ -1643,18 +1675,20 @@ class ProjectTypeDetector:
           secondary_type: 第二候选类型（Step 15），得分差 ≤20% 时非空
           is_ambiguous  : True 表示主次候选得分接近，建议追问确认
         """
-        project_type, confidence, reason = self.detect(user_input, confirmed_tasks)
+        project_type, confidence, reason = self.detect(user_input, confirmed_tasks, features)
 
         # ── Step 10: 提取 parent_type ─────────────────────────────────────────
         parent_type = self._get_parent_type(project_type) if project_type else None
 
         # ── Step 11: 提取 specialty_tag ──────────────────────────────────────
-        try:
-            from .type_alias_normalizer import normalize_input
+        combined = features.normalized_for(user_input) if features is not None else None
+        if combined is None:
+            try:
+                from .type_alias_normalizer import normalize_input
 
-            combined = normalize_input(user_input).lower()
-        except Exception:
-            combined = user_input.lower()
+                combined = normalize_input(user_input).lower()
+            except Exception:
+                combined = user_input.lower()
         if confirmed_tasks:
             for t in confirmed_tasks:
                 combined += " " + t.get("title", "").lower()
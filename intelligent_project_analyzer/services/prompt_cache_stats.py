@@ -0,0 +1,189 @@
+"""
+Prompt 前缀缓存统计
+
+OpenAI / DeepSeek / OpenRouter 等提供商会对相同的 prompt 前缀自动缓存，命中部分的输入 token 按折扣计费，
+首 token 延迟也更低。本模块从响应的 usage 元数据中提取命中缓存的 prompt token 数，按智能体汇总：
+
+- 调用次数、prompt token、命中缓存 token、命中率
+- 命中 / 未命中调用的平均延迟
+- 按折扣估算节省的输入 token（及配置单价时的费用）
+- 稳定前缀的变体数（同一智能体前缀变体越少，越容易命中缓存）
+
+用法：
+    from .prompt_cache_stats import prompt_cache_callback
+
+    response = await llm.ainvoke(messages, config={"callbacks": [prompt_cache_callback("V3")]})
+
+配置：
+    PROMPT_CACHE_DISCOUNT             命中缓存 token 相对原价的折扣（默认 0.5，即半价）
+    PROMPT_INPUT_PRICE_PER_1K_TOKENS  输入 token 单价（默认 0，不估算费用）
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+PROMPT_CACHE_DISCOUNT = float(os.getenv("PROMPT_CACHE_DISCOUNT", "0.5"))
+PROMPT_INPUT_PRICE_PER_1K_TOKENS = float(os.getenv("PROMPT_INPUT_PRICE_PER_1K_TOKENS", "0"))
+
+_MAX_PREFIX_VARIANTS = 64
+
+_lock = threading.Lock()
+_agents: Dict[str, Dict[str, Any]] = {}
+
+
+def _agent_stats(agent: str) -> Dict[str, Any]:
+    return _agents.setdefault(
+        agent,
+        {
+            "calls": 0,
+            "calls_with_usage": 0,
+            "cache_hit_calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "hit_latency_ms": 0.0,
+            "miss_latency_ms": 0.0,
+            "prefix_variants": set(),
+        },
+    )
+
+
+def extract_cache_usage(message: Any = None, llm_output: Optional[Dict[str, Any]] = None) -> Optional[Tuple[int, int]]:
+    """
+    从响应中提取 (prompt_tokens, cached_tokens)
+
+    合并读取 AIMessage.usage_metadata（langchain 标准字段 input_token_details.cache_read）与
+    response_metadata / llm_output 中的 token_usage（OpenAI prompt_tokens_details.cached_tokens、
+    DeepSeek prompt_cache_hit_tokens），命中数取两者较大值。没有 usage 信息时返回 None。
+    """
+    prompt_tokens = cached_tokens = None
+    usage = getattr(message, "usage_metadata", None)
+    if usage and usage.get("input_tokens") is not None:
+        prompt_tokens = int(usage["input_tokens"])
+        cached_tokens = int((usage.get("input_token_details") or {}).get("cache_read") or 0)
+
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or (llm_output or {}).get(
+        "token_usage"
+    )
+    if token_usage and token_usage.get("prompt_tokens") is not None:
+        details = token_usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens") or token_usage.get("prompt_cache_hit_tokens") or 0
+        prompt_tokens = prompt_tokens if prompt_tokens is not None else int(token_usage["prompt_tokens"])
+        cached_tokens = max(cached_tokens or 0, int(cached))
+
+    if prompt_tokens is None:
+        return None
+    return prompt_tokens, cached_tokens or 0
+
+
+def record_prompt_usage(agent: str, prompt_tokens: int, cached_tokens: int, latency_ms: float) -> None:
+    """记录一次 LLM 调用的 prompt token 与缓存命中情况"""
+    with _lock:
+        stats = _agent_stats(agent)
+        stats["calls"] += 1
+        stats["calls_with_usage"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_tokens"] += cached_tokens
+        if cached_tokens > 0:
+            stats["cache_hit_calls"] += 1
+            stats["hit_latency_ms"] += latency_ms
+        else:
+            stats["miss_latency_ms"] += latency_ms
+
+
+def record_prompt_prefix(agent: str, prefix: str) -> None:
+    """记录智能体本次使用的稳定前缀（只保存摘要，用于观察前缀是否确定）"""
+    digest = hashlib.blake2b(prefix.encode("utf-8"), digest_size=8).hexdigest()
+    with _lock:
+        variants = _agent_stats(agent)["prefix_variants"]
+        if len(variants) < _MAX_PREFIX_VARIANTS:
+            variants.add(digest)
+
+
+class PromptCacheCallback(BaseCallbackHandler):
+    """从 on_llm_end 的 usage 元数据记录 prompt 缓存命中（每次调用新建，绑定智能体名）"""
+
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        latency_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        message = None
+        if response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+        usage = extract_cache_usage(message, response.llm_output)
+        if usage is None:
+            with _lock:
+                _agent_stats(self.agent)["calls"] += 1
+            return
+        record_prompt_usage(self.agent, usage[0], usage[1], latency_ms)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+
+def prompt_cache_callback(agent: str) -> PromptCacheCallback:
+    """创建绑定智能体名的回调（传给 invoke / ainvoke 的 config["callbacks"]）"""
+    return PromptCacheCallback(agent)
+
+
+def _summarize(stats: Dict[str, Any]) -> Dict[str, Any]:
+    prompt_tokens = stats["prompt_tokens"]
+    cached_tokens = stats["cached_tokens"]
+    hit_calls = stats["cache_hit_calls"]
+    miss_calls = stats["calls_with_usage"] - hit_calls
+    saved_tokens = cached_tokens * (1 - PROMPT_CACHE_DISCOUNT)
+    return {
+        "calls": stats["calls"],
+        "calls_with_usage": stats["calls_with_usage"],
+        "cache_hit_calls": hit_calls,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "uncached_tokens": prompt_tokens - cached_tokens,
+        "cache_hit_rate": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        "avg_latency_ms_cached": round(stats["hit_latency_ms"] / hit_calls, 1) if hit_calls else None,
+        "avg_latency_ms_uncached": round(stats["miss_latency_ms"] / miss_calls, 1) if miss_calls else None,
+        "saved_input_tokens": round(saved_tokens),
+        "saved_input_ratio": round(saved_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        "prefix_variants": len(stats["prefix_variants"]),
+    }
+
+
+def get_prompt_cache_stats() -> Dict[str, Any]:
+    """按智能体汇总 prompt 缓存命中与节省估算（供 /api/metrics/prompt-cache 使用）"""
+    with _lock:
+        agents = {agent: _summarize(stats) for agent, stats in _agents.items()}
+    prompt_tokens = sum(a["prompt_tokens"] for a in agents.values())
+    cached_tokens = sum(a["cached_tokens"] for a in agents.values())
+    saved_tokens = sum(a["saved_input_tokens"] for a in agents.values())
+    return {
+        "discount": PROMPT_CACHE_DISCOUNT,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "cache_hit_rate": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        "saved_input_tokens": saved_tokens,
+        "saved_cost": round(saved_tokens / 1000 * PROMPT_INPUT_PRICE_PER_1K_TOKENS, 4),
+        "agents": agents,
+    }
+
+
+def reset_prompt_cache_stats() -> None:
+    """重置统计（测试用）"""
+    with _lock:
+        _agents.clear()
@@ -0,0 +1,307 @@
+"""
+问卷推测式预生成
+
+渐进式问卷每一步都要等用户提交后才生成下一步内容（补充问题 / 雷达维度），用户在步骤之间都要等一次 LLM。
+本模块在当前步骤的 interrupt 发出前，按「用户接受当前建议」的假设在后台线程中预生成下一步内容；
+下一步节点按实际输入的指纹取用：
+
+- 指纹一致：直接使用（命中；仍在生成中则只等待剩余时间，仍在排队尚未开始则取消并同步生成）
+- 指纹不一致：由调用方提供的 patch 判断旧结果能否沿用（修补命中），否则同步重新生成（未命中）
+
+LangGraph 从 interrupt 恢复时会重新执行整个节点，取用过的结果按指纹保留，重放时直接复用，
+恢复后的 payload 与用户作答时看到的保持一致。
+
+用法：
+    from ...services.questionnaire_speculation import resolve_speculation, speculate
+
+    speculate(session_id, "gap_questions", inputs, lambda: build(...))            # interrupt 之前
+    questions = resolve_speculation(session_id, "gap_questions", inputs, lambda: build(...))  # 下一步节点
+
+配置：
+    QUESTIONNAIRE_SPECULATION_ENABLED   是否启用（默认 true）
+    QUESTIONNAIRE_SPECULATION_WORKERS   后台预生成线程数（默认 2）
+    QUESTIONNAIRE_SPECULATION_TTL       结果保留秒数（默认 1800）
+    QUESTIONNAIRE_SPECULATION_WAIT      取用时等待进行中预生成的最长秒数（默认 60）
+"""
+
+import contextvars
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .llm_concurrency import LLMPriority, llm_priority
+
+QUESTIONNAIRE_SPECULATION_ENABLED = os.getenv("QUESTIONNAIRE_SPECULATION_ENABLED", "true").lower() == "true"
+QUESTIONNAIRE_SPECULATION_WORKERS = int(os.getenv("QUESTIONNAIRE_SPECULATION_WORKERS", "2"))
+QUESTIONNAIRE_SPECULATION_TTL = float(os.getenv("QUESTIONNAIRE_SPECULATION_TTL", "1800"))
+QUESTIONNAIRE_SPECULATION_WAIT = float(os.getenv("QUESTIONNAIRE_SPECULATION_WAIT", "60"))
+
+
+@dataclass
+class _Entry:
+    key: str
+    inputs: Dict[str, Any]
+    created_at: float
+    future: Optional[Future] = None
+    value: Any = None
+    duration_ms: float = 0.0
+    consumed: bool = False
+
+
+_lock = threading.Lock()
+_entries: Dict[Tuple[str, str], _Entry] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _stage_stats(stage: str) -> Dict[str, float]:
+    return _stats.setdefault(
+        stage,
+        {
+            "speculated": 0,
+            "hits": 0,
+            "patched": 0,
+            "misses": 0,
+            "errors": 0,
+            "unspeculated": 0,
+            "replays": 0,
+            "waited_ms": 0.0,
+            "saved_ms": 0.0,
+            "wasted_ms": 0.0,
+        },
+    )
+
+
+def is_speculation_enabled() -> bool:
+    return QUESTIONNAIRE_SPECULATION_ENABLED
+
+
+def fingerprint(inputs: Dict[str, Any]) -> str:
+    """输入指纹（JSON 规范化后取 sha256 前 16 位）"""
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=QUESTIONNAIRE_SPECULATION_WORKERS, thread_name_prefix="questionnaire-speculation"
+        )
+    return _executor
+
+
+def _purge_expired(now: float) -> None:
+    expired = [key for key, entry in _entries.items() if now - entry.created_at > QUESTIONNAIRE_SPECULATION_TTL]
+    for key in expired:
+        entry = _entries.pop(key)
+        if entry.future is not None:
+            entry.future.cancel()
+
+
+def _run_speculative(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    """后台执行预生成：用户尚未在等待，LLM 调用按 NORMAL 优先级排队，不与交互调用抢占"""
+    started = time.perf_counter()
+    with llm_priority(LLMPriority.NORMAL):
+        value = fn()
+    return value, (time.perf_counter() - started) * 1000
+
+
+def _wasted_ms(entry: _Entry) -> float:
+    future = entry.future
+    if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+        return 0.0
+    return future.result()[1]
+
+
+def speculate(session_id: str, stage: str, inputs: Dict[str, Any], fn: Callable[[], Any]) -> bool:
+    """
+    提交下一步内容的后台预生成
+
+    同一会话同一阶段只保留最新一次推测；指纹相同（节点重放）时不重复提交。
+
+    Returns:
+        是否提交了新的预生成任务
+    """
+    if not QUESTIONNAIRE_SPECULATION_ENABLED or not session_id:
+        return False
+
+    key = fingerprint(inputs)
+    now = time.monotonic()
+    with _lock:
+        _purge_expired(now)
+        entry = _entries.get((session_id, stage))
+        if entry is not None and entry.key == key:
+            return False
+        if entry is not None and entry.future is not None:
+            entry.future.cancel()
+            _stage_stats(stage)["wasted_ms"] += _wasted_ms(entry)
+
+        context = contextvars.copy_context()
+        future = _get_executor().submit(context.run, _run_speculative, fn)
+        _entries[(session_id, stage)] = _Entry(key=key, inputs=copy.deepcopy(inputs), created_at=now, future=future)
+        _stage_stats(stage)["speculated"] += 1
+
+    logger.info(f" [推测生成] {session_id} 后台预生成 {stage} (key={key})")
+    return True
+
+
+def resolve_speculation(
+    session_id: str,
+    stage: str,
+    inputs: Dict[str, Any],
+    compute: Callable[[], Any],
+    patch: Optional[Callable[[Dict[str, Any], Any], Any]] = None,
+) -> Any:
+    """
+    按实际输入取用预生成结果，无法取用时调用 compute 同步生成
+
+    Args:
+        inputs: 下一步生成所依赖的实际输入（与 speculate 时的结构一致）
+        compute: 同步生成函数
+        patch: (推测时的 inputs, 推测结果) -> 可沿用的结果；返回 None 表示不能沿用
+
+    Returns:
+        生成结果的副本（调用方可自由修改）
+    """
+    if not QUESTIONNAIRE_SPECULATION_ENABLED or not session_id:
+        return compute()
+
+    key = fingerprint(inputs)
+    with _lock:
+        _purge_expired(time.monotonic())
+        entry = _entries.get((session_id, stage))
+
+    # 节点从 interrupt 恢复后重放：直接复用首次取用的结果
+    if entry is not None and entry.consumed:
+        if entry.key == key:
+            with _lock:
+                stats = _stage_stats(stage)
+                stats["replays"] += 1
+                stats["saved_ms"] += entry.duration_ms
+            return copy.deepcopy(entry.value)
+        entry = None
+
+    outcome, value, duration_ms = "unspeculated", None, 0.0
+    if entry is not None:
+        outcome, value, duration_ms = _take(entry, key, stage, patch)
+
+    if outcome in ("unspeculated", "misses", "errors"):
+        started = time.perf_counter()
+        value = compute()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+    with _lock:
+        _stage_stats(stage)[outcome] += 1
+        _entries[(session_id, stage)] = _Entry(
+            key=key,
+            inputs=copy.deepcopy(inputs),
+            created_at=time.monotonic(),
+            value=value,
+            duration_ms=duration_ms,
+            consumed=True,
+        )
+    if outcome != "unspeculated":
+        logger.info(f" [推测生成] {session_id} {stage}: {outcome}")
+    return copy.deepcopy(value)
+
+
+def _take(
+    entry: _Entry, key: str, stage: str, patch: Optional[Callable[[Dict[str, Any], Any], Any]]
+) -> Tuple[str, Any, float]:
+    """从推测条目取结果，返回 (结果类别, 结果, 生成耗时 ms)"""
+    future = entry.future
+    if future.cancel():
+        # 仍在排队、尚未开始：与其等前面的任务让出线程，不如立即同步生成
+        logger.info(f" [推测生成] {stage} 预生成尚未开始，改为同步生成")
+        return "misses", None, 0.0
+    if entry.key != key and not future.done():
+        future.cancel()
+        return "misses", None, 0.0
+
+    started = time.perf_counter()
+    try:
+        value, duration_ms = future.result(timeout=QUESTIONNAIRE_SPECULATION_WAIT)
+    except (CancelledError, FutureTimeoutError) as e:
+        future.cancel()
+        logger.warning(f"️ [推测生成] {stage} 预生成未能及时完成: {type(e).__name__}")
+        return "errors", None, 0.0
+    except Exception as e:
+        logger.warning(f"️ [推测生成] {stage} 预生成失败: {e}")
+        return "errors", None, 0.0
+    waited_ms = (time.perf_counter() - started) * 1000
+
+    if entry.key == key:
+        with _lock:
+            stats = _stage_stats(stage)
+            stats["waited_ms"] += waited_ms
+            stats["saved_ms"] += max(0.0, duration_ms - waited_ms)
+        return "hits", value, duration_ms
+
+    patched = None
+    if patch is not None:
+        try:
+            patched = patch(copy.deepcopy(entry.inputs), copy.deepcopy(value))
+        except Exception as e:
+            logger.warning(f"️ [推测生成] {stage} 修补失败: {e}")
+    with _lock:
+        stats = _stage_stats(stage)
+        if patched is None:
+            stats["wasted_ms"] += duration_ms
+        else:
+            stats["saved_ms"] += duration_ms
+    if patched is None:
+        return "misses", None, 0.0
+    return "patched", patched, duration_ms
+
+
+def discard_session(session_id: str) -> None:
+    """丢弃会话的推测结果（会话结束 / 问卷完成时调用）"""
+    with _lock:
+        for key in [key for key in _entries if key[0] == session_id]:
+            entry = _entries.pop(key)
+            if entry.future is not None:
+                entry.future.cancel()
+
+
+def get_speculation_stats() -> Dict[str, Any]:
+    """按阶段汇总推测命中率与节省的等待时间（供 /api/metrics/questionnaire-speculation 使用）"""
+    with _lock:
+        stages = {}
+        for stage, stats in _stats.items():
+            used = stats["hits"] + stats["patched"]
+            resolved = used + stats["misses"] + stats["errors"]
+            stages[stage] = {
+                **stats,
+                "hit_rate": round(used / resolved, 4) if resolved else 0.0,
+                "waited_ms": round(stats["waited_ms"], 2),
+                "saved_ms": round(stats["saved_ms"], 2),
+                "wasted_ms": round(stats["wasted_ms"], 2),
+            }
+        pending = sum(1 for entry in _entries.values() if not entry.consumed)
+        return {
+            "enabled": QUESTIONNAIRE_SPECULATION_ENABLED,
+            "pending": pending,
+            "cached": len(_entries) - pending,
+            "saved_ms": round(sum(stats["saved_ms"] for stats in _stats.values()), 2),
+            "stages": stages,
+        }
+
+
+def reset_speculation() -> None:
+    """清空推测结果与统计（测试用）"""
+    with _lock:
+        for entry in _entries.values():
+            if entry.future is not None:
+                entry.future.cancel()
+        _entries.clear()
+        _stats.clear()
@@ -70,6 +70,7 @@ class QuotaConfig:
                         "document_expiry_days": 30,
                         "allow_sharing": False,
                         "allow_team_kb": False,
+                        "max_concurrent_analyses": 2,
                     },
                 }
             },
@@ -314,6 +315,22 @@ class QuotaManager:
         quota = self.quota_config.get_tier_quota(user_tier)
         return quota.get("allow_team_kb", False)
 
+    def get_concurrent_task_limit(self, user_id: str, user_tier: str = "free") -> int:
+        """
+        获取用户可同时占用的分析任务数（Celery 公平调度使用）
+
+        Args:
+            user_id: 用户ID
+            user_tier: 用户会员等级
+
+        Returns:
+            并发上限，-1 表示不限制（配额检查关闭或用户豁免）
+        """
+        if not self.quota_config.is_quota_enabled() or self.quota_config.is_user_exempt(user_id):
+            return -1
+        quota = self.quota_config.get_tier_quota(user_tier)
+        return quota.get("max_concurrent_analyses", 2)
+
     def get_allowed_document_types(self, user_tier: str = "free") -> List[str]:
         """获取允许的文档类型"""
         quota = self.quota_config.get_tier_quota(user_tier)
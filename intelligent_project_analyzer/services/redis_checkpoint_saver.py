@@ -0,0 +1,393 @@
+"""
+Redis 版 LangGraph 检查点存储
+
+SQLite 检查点文件只存在于单台主机上，/api/analysis/resume 必须落到同一实例。
+AsyncRedisSaver 把检查点放进共享 Redis，任意 API 实例或 Celery worker 都能恢复任意会话。
+
+键布局（前缀默认 "ckpt"）：
+- {p}:cp:{thread}:{ns}:{checkpoint_id}   Hash  检查点（msgpack，超过阈值 zlib 压缩）+ 元数据 + 父 ID
+- {p}:idx:{thread}:{ns}                  ZSet  检查点 ID 索引（score=0，按字典序 = 时间序）
+- {p}:w:{thread}:{ns}:{checkpoint_id}    Hash  按 task_id:idx 存放的通道写入
+- {p}:int:{thread}:{ns}                  Set   含中断写入的检查点 ID（裁剪时保留）
+- {p}:ns:{thread}                        Set   线程下的 checkpoint_ns
+- {p}:thread_index                       ZSet  所有线程（score=最近写入时间，供 alist(None) 与运维使用）
+
+线程相关键的 TTL 与 RedisSessionManager.SESSION_TTL 对齐，每次写入时刷新。
+线程索引本身不随线程键过期，写入与 alist(None) 时按 score 清理超过 TTL 未写入的线程。
+通过环境变量 CHECKPOINT_BACKEND=redis 启用（见 workflow_runner.get_or_create_async_checkpointer）。
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import ormsgpack
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from loguru import logger
+
+from intelligent_project_analyzer.services.redis_session_manager import RedisSessionManager
+
+INTERRUPT_CHANNEL = "__interrupt__"
+
+
+def get_checkpoint_backend() -> str:
+    """检查点后端：sqlite（默认，单机）或 redis（多实例共享）"""
+    return os.getenv("CHECKPOINT_BACKEND", "sqlite").strip().lower()
+
+
+class AsyncRedisSaver(BaseCheckpointSaver[str]):
+    """
+    基于 redis.asyncio 的检查点存储
+
+    Example:
+        >>> saver = AsyncRedisSaver.from_url(settings.redis_url)
+        >>> workflow = MainWorkflow(llm, config, checkpointer=saver)
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        serde: Optional[SerializerProtocol] = None,
+        prefix: str = "ckpt",
+        ttl: Optional[int] = None,
+        keep_last: Optional[int] = None,
+        compress_threshold: int = 1024,
+    ):
+        super().__init__(serde=serde)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl if ttl is not None else RedisSessionManager.SESSION_TTL
+        # 每个线程保留的检查点数（0 = 不裁剪），与 SQLite 维护任务的 CHECKPOINT_KEEP_LAST 一致
+        self.keep_last = keep_last if keep_last is not None else int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+        self.compress_threshold = compress_threshold
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_url(cls, redis_url: str, **kwargs: Any) -> "AsyncRedisSaver":
+        import redis.asyncio as aioredis
+
+        return cls(aioredis.from_url(redis_url, decode_responses=False), **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    # ------------------------------------------------------------------ 键与编码
+
+    def _cp_key(self, thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}:cp:{thread_id}:{ns}:{checkpoint_id}"
+
+    def _idx_key(self, thread_id: str, ns: str) -> str:
+        return f"{self.prefix}:idx:{thread_id}:{ns}"
+
+    def _writes_key(self, thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}:w:{thread_id}:{ns}:{checkpoint_id}"
+
+    def _interrupt_key(self, thread_id: str, ns: str) -> str:
+        return f"{self.prefix}:int:{thread_id}:{ns}"
+
+    def _ns_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:ns:{thread_id}"
+
+    @property
+    def _threads_key(self) -> str:
+        return f"{self.prefix}:thread_index"
+
+    def _pack(self, value: Any) -> Tuple[str, bytes]:
+        """serde 序列化 + 大对象 zlib 压缩（类型名加 ":z" 标记）"""
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) > self.compress_threshold:
+            return f"{type_}:z", zlib.compress(data, 1)
+        return type_, data
+
+    def _unpack(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(":z"):
+            type_, data = type_[:-2], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    @staticmethod
+    def _decode(value: Any) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _bind_loop(self) -> None:
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+
+    # ------------------------------------------------------------------ 读取
+
+    async def _load_tuple(self, thread_id: str, ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._cp_key(thread_id, ns, checkpoint_id))
+        pipe.hvals(self._writes_key(thread_id, ns, checkpoint_id))
+        raw, raw_writes = await pipe.execute()
+        if not raw:
+            return None
+        raw = {self._decode(k): v for k, v in raw.items()}
+
+        writes = []
+        for packed in raw_writes:
+            task_id, channel, task_path, idx, type_, data = ormsgpack.unpackb(packed)
+            writes.append((writes_sort_key(task_path, task_id, idx), (task_id, channel, self._unpack(type_, data))))
+        writes.sort(key=lambda w: w[0])
+
+        parent_id = self._decode(raw.get("parent", b"")) or None
+        return CheckpointTuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}},
+            self._unpack(self._decode(raw["type"]), raw["checkpoint"]),
+            json.loads(raw["metadata"]) if raw.get("metadata") else {},
+            (
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent_id}}
+                if parent_id
+                else None
+            ),
+            [w for _, w in writes],
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """读取指定检查点；未指定 checkpoint_id 时返回线程最新检查点"""
+        self._bind_loop()
+        thread_id = str(config["configurable"]["thread_id"])
+        ns = config["configurable"].get("checkpoint_ns", "")
+        if checkpoint_id := get_checkpoint_id(config):
+            return await self._load_tuple(thread_id, ns, checkpoint_id)
+
+        # 最新检查点；索引项对应的数据已过期时向前回退并清理索引
+        idx_key = self._idx_key(thread_id, ns)
+        for raw_id in await self.client.zrevrangebylex(idx_key, "+", "-", start=0, num=self.keep_last or 50):
+            checkpoint_id = self._decode(raw_id)
+            result = await self._load_tuple(thread_id, ns, checkpoint_id)
+            if result is not None:
+                return result
+            await self.client.zrem(idx_key, checkpoint_id)
+        return None
+
+    async def _thread_namespaces(self, thread_id: str) -> List[str]:
+        return sorted(self._decode(ns) for ns in await self.client.smembers(self._ns_key(thread_id)))
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """按时间倒序列出检查点（支持元数据等值过滤、before、limit）"""
+        self._bind_loop()
+        if config is not None:
+            thread_ids = [str(config["configurable"]["thread_id"])]
+        else:
+            await self.client.zremrangebyscore(self._threads_key, "-inf", time.time() - self.ttl)
+            thread_ids = sorted(self._decode(t) for t in await self.client.zrange(self._threads_key, 0, -1))
+        before_id = get_checkpoint_id(before) if before else None
+        wanted_id = get_checkpoint_id(config) if config else None
+
+        remaining = limit
+        for thread_id in thread_ids:
+            if config is not None and "checkpoint_ns" in config["configurable"]:
+                namespaces = [config["configurable"]["checkpoint_ns"]]
+            else:
+                namespaces = await self._thread_namespaces(thread_id)
+            for ns in namespaces:
+                max_lex = f"({before_id}" if before_id else "+"
+                for raw_id in await self.client.zrevrangebylex(self._idx_key(thread_id, ns), max_lex, "-"):
+                    checkpoint_id = self._decode(raw_id)
+                    if wanted_id and checkpoint_id != wanted_id:
+                        continue
+                    result = await self._load_tuple(thread_id, ns, checkpoint_id)
+                    if result is None:
+                        continue
+                    if filter and any(result.metadata.get(k) != v for k, v in filter.items()):
+                        continue
+                    yield result
+                    if remaining is not None:
+                        remaining -= 1
+                        if remaining <= 0:
+                            return
+
+    # ------------------------------------------------------------------ 写入
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """写入检查点并刷新线程 TTL；超过 keep_last 时裁剪旧检查点（保留中断点）"""
+        self._bind_loop()
+        thread_id = str(config["configurable"]["thread_id"])
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = checkpoint["id"]
+        type_, data = self._pack(checkpoint)
+        serialized_metadata = json.dumps(get_checkpoint_metadata(config, metadata), ensure_ascii=False)
+
+        cp_key = self._cp_key(thread_id, ns, checkpoint_id)
+        idx_key = self._idx_key(thread_id, ns)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(
+            cp_key,
+            mapping={
+                "type": type_,
+                "checkpoint": data,
+                "metadata": serialized_metadata,
+                "parent": config["configurable"].get("checkpoint_id") or "",
+            },
+        )
+        pipe.zadd(idx_key, {checkpoint_id: 0})
+        pipe.sadd(self._ns_key(thread_id), ns)
+        now = time.time()
+        pipe.zadd(self._threads_key, {thread_id: now})
+        pipe.zremrangebyscore(self._threads_key, "-inf", now - self.ttl)  # 线程键已过期的索引项
+        for key in (cp_key, idx_key, self._ns_key(thread_id), self._interrupt_key(thread_id, ns), self._threads_key):
+            pipe.expire(key, self.ttl)
+        pipe.zcard(idx_key)
+        results = await pipe.execute()
+
+        if self.keep_last and results[-1] > self.keep_last:
+            await self._trim(thread_id, ns)
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}}
+
+    async def _trim(self, thread_id: str, ns: str) -> None:
+        idx_key = self._idx_key(thread_id, ns)
+        ids = [self._decode(i) for i in await self.client.zrangebylex(idx_key, "-", "+")]
+        protected = {self._decode(i) for i in await self.client.smembers(self._interrupt_key(thread_id, ns))}
+        stale = [i for i in ids[: -self.keep_last] if i not in protected]
+        if not stale:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(idx_key, *stale)
+        pipe.delete(*(self._cp_key(thread_id, ns, i) for i in stale))
+        pipe.delete(*(self._writes_key(thread_id, ns, i) for i in stale))
+        await pipe.execute()
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """按通道写入中间结果；特殊通道（错误/中断等）覆盖，普通通道只写一次"""
+        self._bind_loop()
+        thread_id = str(config["configurable"]["thread_id"])
+        ns = str(config["configurable"].get("checkpoint_ns", ""))
+        checkpoint_id = str(config["configurable"]["checkpoint_id"])
+        writes_key = self._writes_key(thread_id, ns, checkpoint_id)
+        overwrite = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+
+        pipe = self.client.pipeline(transaction=True)
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, data = self._pack(value)
+            field = f"{task_id}:{idx}"
+            packed = ormsgpack.packb([task_id, channel, task_path, idx, type_, data])
+            if overwrite:
+                pipe.hset(writes_key, field, packed)
+            else:
+                pipe.hsetnx(writes_key, field, packed)
+            if channel == INTERRUPT_CHANNEL:
+                pipe.sadd(self._interrupt_key(thread_id, ns), checkpoint_id)
+                pipe.expire(self._interrupt_key(thread_id, ns), self.ttl)
+        pipe.expire(writes_key, self.ttl)
+        await pipe.execute()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """删除线程的全部检查点与写入"""
+        self._bind_loop()
+        thread_id = str(thread_id)
+        keys: List[str] = [self._ns_key(thread_id)]
+        for ns in await self._thread_namespaces(thread_id):
+            for raw_id in await self.client.zrange(self._idx_key(thread_id, ns), 0, -1):
+                checkpoint_id = self._decode(raw_id)
+                keys.append(self._cp_key(thread_id, ns, checkpoint_id))
+                keys.append(self._writes_key(thread_id, ns, checkpoint_id))
+            keys.extend([self._idx_key(thread_id, ns), self._interrupt_key(thread_id, ns)])
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(*keys)
+        pipe.zrem(self._threads_key, thread_id)
+        await pipe.execute()
+        logger.debug(f"[RedisCheckpoint] 删除线程检查点: {thread_id} ({len(keys)} 个键)")
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """与 SqliteSaver 相同的字符串版本号（单调递增 + 随机后缀）"""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ------------------------------------------------------------------ 同步接口（仅限其他线程调用）
+
+    def _run_sync(self, coro: Any) -> Any:
+        if self.loop is None:
+            coro.close()
+            raise asyncio.InvalidStateError("AsyncRedisSaver 尚未在事件循环中使用，请使用异步接口")
+        try:
+            if asyncio.get_running_loop() is self.loop:
+                coro.close()
+                raise asyncio.InvalidStateError(
+                    "AsyncRedisSaver 的同步接口只能在其他线程调用，事件循环内请使用 aget_tuple / ainvoke 等异步接口"
+                )
+        except RuntimeError:
+            pass
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._run_sync(self.aget_tuple(config))
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        async def _collect() -> List[CheckpointTuple]:
+            return [t async for t in self.alist(config, filter=filter, before=before, limit=limit)]
+
+        yield from self._run_sync(_collect())
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self._run_sync(self.aput(config, checkpoint, metadata, new_versions))
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self._run_sync(self.aput_writes(config, writes, task_id, task_path))
+
+    def delete_thread(self, thread_id: str) -> None:
+        return self._run_sync(self.adelete_thread(thread_id))
+
+
+__all__ = ["AsyncRedisSaver", "get_checkpoint_backend"]
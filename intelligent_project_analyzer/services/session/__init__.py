@@ -16,6 +16,11 @@ from intelligent_project_analyzer.services.external_state_store import (
     get_store,
     reset_store,
 )
+from intelligent_project_analyzer.services.state_externalizer import (
+    ExternalizingSerializer,
+    get_state_externalizer_stats,
+    install_state_externalizer,
+)
 
 # ── MT-4: WebSocket 事件存储 ─────────────────────────────────────────────────
 from intelligent_project_analyzer.services.event_store import (
@@ -82,6 +87,9 @@ __all__ = [
     "ExternalStateStore",
     "get_store",
     "reset_store",
+    "ExternalizingSerializer",
+    "install_state_externalizer",
+    "get_state_externalizer_stats",
     # 事件存储
     "EventStore",
     "get_event_store",
@@ -3,20 +3,107 @@
 
 负责将会话数据归档到数据库，实现永久保存
 解决Redis TTL限制（7天）的问题
+
+会话数据按分段压缩存储（archive_sections），可按分段延迟加载；旧版整块 JSON 记录仍可读取，
+migrate_to_sections() 负责迁移。
+
+数据库访问使用同步 SQLAlchemy 会话，公开的 async 方法在归档专用线程池中执行，不阻塞事件循环。
+list_archived_sessions 支持按 (pinned, created_at, session_id) 的游标分页（next_cursor），
+深翻页不再随 OFFSET 线性变慢。
+
+配置：
+    ARCHIVE_SECTIONED_STORAGE   新归档是否使用分段压缩存储（默认 true）
+    ARCHIVE_DB_THREADS          归档数据库线程池大小（默认 4）
 """
 
+import asyncio
+import base64
+import functools
 import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from loguru import logger
-from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text, create_engine
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    create_engine,
+    func,
+    or_,
+    tuple_,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, defer, sessionmaker
 
+from .archive_sections import (
+    ARCHIVE_CODEC,
+    ArchiveDictionary,
+    decode_section,
+    encode_section,
+    join_sections,
+    section_samples,
+    select_sections,
+    split_sections,
+    train_dictionary,
+)
+from .image_blob_store import externalize_data_url
+
+ARCHIVE_SECTIONED_STORAGE = os.getenv("ARCHIVE_SECTIONED_STORAGE", "true").lower() == "true"
+STORAGE_FORMAT_JSON = "json"
+STORAGE_FORMAT_SECTIONS = "sections"
+ARCHIVE_DB_THREADS = int(os.getenv("ARCHIVE_DB_THREADS", "4"))
+
 Base = declarative_base()
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _db_executor() -> ThreadPoolExecutor:
+    """归档数据库专用线程池（与默认线程池隔离，慢查询不占用 asyncio.to_thread 的线程）"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, ARCHIVE_DB_THREADS), thread_name_prefix="archive-db")
+        return _executor
+
+
+def _in_db_thread(method: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """把同步数据库方法包装为协程，在归档数据库线程池中执行"""
+
+    @functools.wraps(method)
+    async def wrapper(self: "SessionArchiveManager", *args: Any, **kwargs: Any) -> Any:
+        return await self._run_db(method, self, *args, **kwargs)
+
+    return wrapper
+
+
+def encode_archive_cursor(session: Dict[str, Any]) -> str:
+    """由列表中最后一个会话生成下一页游标"""
+    key = [bool(session.get("pinned")), session["created_at"], session["session_id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_archive_cursor(cursor: str) -> Tuple[bool, datetime, str]:
+    """解析游标为 (pinned, created_at, session_id)，格式错误抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        pinned, created_at, session_id = json.loads(raw)
+        return bool(pinned), datetime.fromisoformat(created_at), str(session_id)
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
 
 #  v7.163: 搜索会话归档模型
 class ArchivedSearchSession(Base):
@@ -102,8 +189,9 @@ class ArchivedSession(Base):
     completed_at = Column(DateTime, nullable=True)
 
     # 会话数据（JSON存储）
-    session_data = Column(Text, nullable=False)  # 完整会话状态
-    final_report = Column(Text, nullable=True)  # 最终报告
+    session_data = Column(Text, nullable=False)  # 完整会话状态（分段存储时为空字符串）
+    final_report = Column(Text, nullable=True)  # 最终报告（分段存储时为空）
+    storage_format = Column(String(20), default=STORAGE_FORMAT_JSON)  # json / sections
 
     # 统计信息
     progress = Column(Integer, default=0)
@@ -118,14 +206,43 @@ class ArchivedSession(Base):
     tags = Column(String(500), nullable=True)  # 标签（逗号分隔）
 
     # 索引
+    # 列表查询按 (pinned, created_at, session_id) 排序与游标分页，索引包含完整排序键：
+    # 过滤、排序、游标定位与计数都可只走索引
     __table_args__ = (
         Index("idx_created_at_status", "created_at", "status"),
-        Index("idx_pinned_created_at", "pinned", "created_at"),
         Index("idx_user_created", "user_id", "created_at"),  #  P0修复: 用户+时间复合索引
-        Index("idx_user_pinned_created", "user_id", "pinned", "created_at"),  #  v7.178: 用户+置顶+时间复合索引（优化查询）
+        Index("idx_list_keyset", "pinned", "created_at", "session_id"),
+        Index("idx_user_list_keyset", "user_id", "pinned", "created_at", "session_id"),
+        Index("idx_status_list_keyset", "status", "pinned", "created_at", "session_id"),
     )
 
 
+class ArchivedSessionSection(Base):
+    """归档会话分段（压缩存储，按分段延迟加载）"""
+
+    __tablename__ = "archived_session_sections"
+
+    session_id = Column(String(100), primary_key=True)
+    section = Column(String(150), primary_key=True)  # metadata / requirements / expert:<角色> / report / ...
+    codec = Column(String(10), nullable=False)  # zstd / zlib
+    dict_id = Column(Integer, nullable=True)  # 压缩字典（archive_dictionaries.dict_id）
+    raw_size = Column(Integer, default=0)
+    stored_size = Column(Integer, default=0)
+    data = Column(LargeBinary, nullable=False)
+
+
+class ArchiveDictionaryRecord(Base):
+    """归档压缩字典（按归档数据训练）"""
+
+    __tablename__ = "archive_dictionaries"
+
+    dict_id = Column(Integer, primary_key=True, autoincrement=True)
+    codec = Column(String(10), nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+
 class SessionArchiveManager:
     """会话归档管理器"""
 
@@ -173,6 +290,11 @@ class SessionArchiveManager:
         # 创建会话工厂
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
 
+        # 压缩字典缓存（dict_id -> 字典，多个数据库线程共享）；_current_dict_id 为写入新分段时使用的字典
+        self._dictionaries: Dict[int, ArchiveDictionary] = {}
+        self._current_dict_id: Optional[int] = None
+        self._current_dict_loaded = False
+
         logger.info(f" 会话归档管理器已初始化: {database_url}")
 
     def _enable_wal_mode(self):
@@ -270,6 +392,36 @@ class SessionArchiveManager:
             else:
                 logger.debug(" Schema验证通过：user_id列已存在")
 
+            if "storage_format" not in columns:
+                cursor.execute(
+                    """
+                    ALTER TABLE archived_sessions
+                    ADD COLUMN storage_format VARCHAR(20) DEFAULT 'json'
+                """
+                )
+                conn.commit()
+                logger.info(" Schema迁移完成：已添加storage_format列")
+
+            # 游标分页索引（create_all 不会为已存在的表补建索引）；旧的两列索引是新索引的前缀，删除
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='archived_sessions'")
+            indexes = {row[0] for row in cursor.fetchall()}
+            if "idx_user_list_keyset" not in indexes:
+                cursor.executescript(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_list_keyset
+                        ON archived_sessions(pinned, created_at, session_id);
+                    CREATE INDEX IF NOT EXISTS idx_user_list_keyset
+                        ON archived_sessions(user_id, pinned, created_at, session_id);
+                    CREATE INDEX IF NOT EXISTS idx_status_list_keyset
+                        ON archived_sessions(status, pinned, created_at, session_id);
+                    DROP INDEX IF EXISTS idx_pinned_created_at;
+                    DROP INDEX IF EXISTS idx_user_pinned_created;
+                    UPDATE archived_sessions SET pinned = 0 WHERE pinned IS NULL;
+                """
+                )
+                conn.commit()
+                logger.info(" Schema迁移完成：已创建游标分页索引")
+
             conn.close()
 
         except Exception as e:
@@ -280,10 +432,244 @@ class SessionArchiveManager:
         """获取数据库会话"""
         return self.SessionLocal()
 
+    async def _run_db(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """在归档数据库线程池中执行同步数据库操作"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_db_executor(), functools.partial(func, *args, **kwargs))
+
+    # ==================== 分段压缩存储 ====================
+
+    def _get_dictionary(self, db: Session, dict_id: Optional[int]) -> Optional[ArchiveDictionary]:
+        """按 ID 获取压缩字典（缓存，字典写入后不再修改）"""
+        if dict_id is None:
+            return None
+        if dict_id not in self._dictionaries:
+            record = db.query(ArchiveDictionaryRecord).filter(ArchiveDictionaryRecord.dict_id == dict_id).first()
+            if not record:
+                raise ValueError(f"归档压缩字典不存在: {dict_id}")
+            self._dictionaries[dict_id] = ArchiveDictionary(record.dict_id, record.codec, record.data)
+        return self._dictionaries[dict_id]
+
+    def _current_dictionary(self, db: Session) -> Optional[ArchiveDictionary]:
+        """写入新分段时使用的字典（当前编码下最新训练的字典）"""
+        if not self._current_dict_loaded:
+            record = (
+                db.query(ArchiveDictionaryRecord.dict_id)
+                .filter(ArchiveDictionaryRecord.codec == ARCHIVE_CODEC)
+                .order_by(ArchiveDictionaryRecord.dict_id.desc())
+                .first()
+            )
+            self._current_dict_id = record.dict_id if record else None
+            self._current_dict_loaded = True
+        return self._get_dictionary(db, self._current_dict_id)
+
+    @staticmethod
+    def _delete_sections(db: Session, session_id: str) -> None:
+        db.query(ArchivedSessionSection).filter(ArchivedSessionSection.session_id == session_id).delete(
+            synchronize_session=False
+        )
+
+    def _write_sections(self, db: Session, session_id: str, session_data: Dict[str, Any]) -> int:
+        """
+        把会话数据拆分、压缩后写入分段表（覆盖已有分段，调用方负责提交）
+
+        Returns:
+            压缩后的总字节数
+        """
+        self._delete_sections(db, session_id)
+        dictionary = self._current_dictionary(db)
+        stored = 0
+        for name, content in split_sections(session_data).items():
+            codec, dict_id, payload, raw_size = encode_section(content, dictionary)
+            db.add(
+                ArchivedSessionSection(
+                    session_id=session_id,
+                    section=name,
+                    codec=codec,
+                    dict_id=dict_id,
+                    raw_size=raw_size,
+                    stored_size=len(payload),
+                    data=payload,
+                )
+            )
+            stored += len(payload)
+        return stored
+
+    def _load_session_data(
+        self, db: Session, archived: ArchivedSession, sections: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """读取归档会话数据：分段存储只解压请求的分段，旧版整块 JSON 直接解析"""
+        if archived.storage_format != STORAGE_FORMAT_SECTIONS:
+            return json.loads(archived.session_data) if archived.session_data else {}
+
+        query = db.query(ArchivedSessionSection).filter(ArchivedSessionSection.session_id == archived.session_id)
+        if sections is not None:
+            names = [
+                row.section
+                for row in db.query(ArchivedSessionSection.section).filter(
+                    ArchivedSessionSection.session_id == archived.session_id
+                )
+            ]
+            query = query.filter(ArchivedSessionSection.section.in_(select_sections(names, sections)))
+
+        decoded = {
+            row.section: decode_section(row.codec, row.data, self._get_dictionary(db, row.dict_id))
+            for row in query.all()
+        }
+        return join_sections(decoded)
+
+    @_in_db_thread
+    def train_archive_dictionary(self, sample_sessions: int = 200) -> Optional[int]:
+        """
+        用最近归档的会话训练压缩字典，之后写入的分段使用新字典
+
+        已写入的分段记录了各自的字典 ID，不受影响。
+
+        Returns:
+            新字典 ID（样本不足时返回 None）
+        """
+        db = None
+        try:
+            db = self._get_db()
+            archived_list = (
+                db.query(ArchivedSession).order_by(ArchivedSession.archived_at.desc()).limit(sample_sessions).all()
+            )
+            samples = []
+            for archived in archived_list:
+                samples.extend(section_samples(split_sections(self._load_session_data(db, archived))))
+
+            data = train_dictionary(samples)
+            if not data:
+                logger.warning(f"️ 归档样本不足，未训练压缩字典（{len(samples)} 个分段）")
+                db.close()
+                return None
+
+            record = ArchiveDictionaryRecord(codec=ARCHIVE_CODEC, data=data, sample_count=len(samples))
+            db.add(record)
+            db.commit()
+            dict_id = record.dict_id
+            self._dictionaries[dict_id] = ArchiveDictionary(dict_id, ARCHIVE_CODEC, data)
+            self._current_dict_id = dict_id
+            self._current_dict_loaded = True
+            db.close()
+
+            logger.info(f" 训练归档压缩字典: #{dict_id} ({ARCHIVE_CODEC}, {len(data)} 字节, {len(samples)} 个分段)")
+            return dict_id
+
+        except Exception as e:
+            logger.error(f" 训练归档压缩字典失败: {e}")
+            if db:
+                db.rollback()
+                db.close()
+            return None
+
+    async def migrate_to_sections(self, batch_size: int = 50, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        把旧版整块 JSON 归档迁移为分段压缩存储
+
+        尚无压缩字典时先用现有归档训练一个。逐批转换并提交，可中断后重复执行。
+        同时统计迁移前后的存储大小与平均每会话读取延迟（旧版：解析整块 JSON；新版：完整加载 / 只加载 metadata）。
+
+        Args:
+            batch_size: 每批转换的会话数
+            limit: 最多迁移的会话数（None 不限）
+
+        Returns:
+            迁移统计
+        """
+        if not await self._run_db(self._has_dictionary):
+            await self.train_archive_dictionary()
+        return await self._run_db(self._migrate_legacy_rows, batch_size, limit)
+
+    def _has_dictionary(self) -> bool:
+        db = self._get_db()
+        try:
+            return self._current_dictionary(db) is not None
+        finally:
+            db.close()
+
+    def _migrate_legacy_rows(self, batch_size: int, limit: Optional[int]) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "migrated": 0,
+            "failed": 0,
+            "bytes_before": 0,
+            "bytes_after": 0,
+            "legacy_load_ms": 0.0,
+            "sections_load_ms": 0.0,
+            "metadata_load_ms": 0.0,
+        }
+        db = self._get_db()
+        try:
+            failed_ids: List[str] = []
+            while limit is None or stats["migrated"] + stats["failed"] < limit:
+                size = batch_size if limit is None else min(batch_size, limit - stats["migrated"] - stats["failed"])
+                query = db.query(ArchivedSession).filter(
+                    or_(
+                        ArchivedSession.storage_format == STORAGE_FORMAT_JSON,
+                        ArchivedSession.storage_format.is_(None),
+                    )
+                )
+                if failed_ids:
+                    query = query.filter(ArchivedSession.session_id.notin_(failed_ids))
+                batch = query.limit(size).all()
+                if not batch:
+                    break
+
+                migrated = []
+                for archived in batch:
+                    try:
+                        started = time.perf_counter()
+                        session_data = json.loads(archived.session_data) if archived.session_data else {}
+                        stats["legacy_load_ms"] += (time.perf_counter() - started) * 1000
+
+                        before = len((archived.session_data or "").encode("utf-8"))
+                        before += len((archived.final_report or "").encode("utf-8"))
+                        stats["bytes_after"] += self._write_sections(db, archived.session_id, session_data)
+                        stats["bytes_before"] += before
+
+                        archived.session_data = ""
+                        archived.final_report = None
+                        archived.storage_format = STORAGE_FORMAT_SECTIONS
+                        migrated.append(archived.session_id)
+                    except Exception as e:
+                        logger.error(f" 迁移归档会话失败: {archived.session_id}, 错误: {e}")
+                        failed_ids.append(archived.session_id)
+                        stats["failed"] += 1
+                db.commit()
+
+                for session_id in migrated:
+                    archived = db.query(ArchivedSession).filter(ArchivedSession.session_id == session_id).first()
+                    started = time.perf_counter()
+                    self._load_session_data(db, archived)
+                    stats["sections_load_ms"] += (time.perf_counter() - started) * 1000
+                    started = time.perf_counter()
+                    self._load_session_data(db, archived, sections=["metadata"])
+                    stats["metadata_load_ms"] += (time.perf_counter() - started) * 1000
+                stats["migrated"] += len(migrated)
+                logger.info(f" 分段迁移进度: {stats['migrated']} 个会话")
+
+            db.close()
+        except Exception as e:
+            logger.error(f" 分段迁移失败: {e}")
+            db.rollback()
+            db.close()
+
+        migrated = stats["migrated"]
+        for key in ("legacy_load_ms", "sections_load_ms", "metadata_load_ms"):
+            stats[key] = round(stats[key] / migrated, 3) if migrated else 0.0
+        stats["ratio"] = round(stats["bytes_before"] / stats["bytes_after"], 2) if stats["bytes_after"] else 0.0
+        stats["dict_id"] = self._current_dict_id
+        stats["codec"] = ARCHIVE_CODEC
+        logger.info(
+            f" 分段迁移完成: {migrated} 个会话, {stats['bytes_before']} → {stats['bytes_after']} 字节 "
+            f"(×{stats['ratio']}), 失败 {stats['failed']}"
+        )
+        return stats
+
     @staticmethod
     def _remove_base64_from_dict(obj: Any, path: str = "") -> int:
         """
-         v7.402: 递归清理字典中的 base64 图片数据
+         v7.402: 递归清理字典中的 base64 图片数据（写入图片 Blob 存储并替换为引用 URL）
         
         Args:
             obj: 要清理的对象（dict/list）
@@ -304,6 +690,13 @@ class SessionArchiveManager:
                 if key in ["image_url", "url"] and isinstance(value, str):
                     if value.startswith("data:image/") and ";base64," in value:
                         original_size = len(value)
+                        # 优先写入图片 Blob 存储，只保留引用；失败时才替换为占位符
+                        blob_url = externalize_data_url(value)
+                        if blob_url is not value:
+                            obj[key] = blob_url
+                            total_cleaned += original_size
+                            logger.debug(f"   外部化 base64: {new_path} -> {blob_url}")
+                            continue
                         # 提取格式信息
                         match = re.match(r'data:(image/[^;]+);base64,', value)
                         if match:
@@ -368,7 +761,8 @@ class SessionArchiveManager:
         return cleaned_data
         return self.SessionLocal()
 
-    async def archive_session(self, session_id: str, session_data: Dict[str, Any], force: bool = False) -> bool:
+    @_in_db_thread
+    def archive_session(self, session_id: str, session_data: Dict[str, Any], force: bool = False) -> bool:
         """
         归档会话到数据库
 
@@ -420,9 +814,17 @@ class SessionArchiveManager:
             #  v7.402: 归档前清理 base64 图片数据，避免数据库膨胀
             cleaned_session_data = self._clean_session_data_for_archive(session_data)
 
-            # 序列化完整会话数据（使用清理后的数据）
-            session_json = json.dumps(cleaned_session_data, ensure_ascii=False)
-            report_json = json.dumps(final_report, ensure_ascii=False) if final_report else None
+            if ARCHIVE_SECTIONED_STORAGE:
+                # 分段压缩存储：会话数据写入 archived_session_sections，主表只保留检索字段
+                self._write_sections(db, session_id, cleaned_session_data)
+                session_json, report_json, storage_format = "", None, STORAGE_FORMAT_SECTIONS
+            else:
+                # 序列化完整会话数据（使用清理后的数据）
+                session_json = json.dumps(cleaned_session_data, ensure_ascii=False)
+                report_json = json.dumps(final_report, ensure_ascii=False) if final_report else None
+                storage_format = STORAGE_FORMAT_JSON
+                if existing and existing.storage_format == STORAGE_FORMAT_SECTIONS:
+                    self._delete_sections(db, session_id)
 
             if existing:
                 # 更新现有归档
@@ -431,6 +833,7 @@ class SessionArchiveManager:
                 existing.mode = mode
                 existing.session_data = session_json
                 existing.final_report = report_json
+                existing.storage_format = storage_format
                 existing.progress = progress
                 existing.current_stage = current_stage
                 existing.completed_at = completed_at
@@ -454,6 +857,7 @@ class SessionArchiveManager:
                     completed_at=completed_at,
                     session_data=session_json,
                     final_report=report_json,
+                    storage_format=storage_format,
                     progress=progress,
                     current_stage=current_stage,
                     analysis_mode=analysis_mode,  #  v7.178: 保存分析模式
@@ -473,12 +877,17 @@ class SessionArchiveManager:
                 db.close()
             return False
 
-    async def get_archived_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+    @_in_db_thread
+    def get_archived_session(
+        self, session_id: str, sections: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         获取归档会话
 
         Args:
             session_id: 会话ID
+            sections: 只加载的分段（如 ["metadata", "report"]，"experts" 表示全部专家结果）；
+                None 加载全部。旧版整块 JSON 记录总是返回完整数据
 
         Returns:
             会话数据（不存在返回None）
@@ -491,8 +900,8 @@ class SessionArchiveManager:
                 db.close()
                 return None
 
-            # 反序列化会话数据
-            session_data = json.loads(archived.session_data)
+            # 反序列化会话数据（分段存储时按需解压）
+            session_data = self._load_session_data(db, archived, sections)
 
             # 添加归档元数据
             session_data["_archived"] = True
@@ -507,27 +916,34 @@ class SessionArchiveManager:
                 db.close()
             return None
 
-    async def list_archived_sessions(
+    @_in_db_thread
+    def list_archived_sessions(
         self,
         limit: int = 50,
         offset: int = 0,
         status: Optional[str] = None,
         pinned_only: bool = False,
         user_id: Optional[str] = None,  #  v7.178: 按用户过滤
+        cursor: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         列出归档会话
 
         Args:
             limit: 返回数量限制
-            offset: 偏移量（分页）
+            offset: 偏移量（分页；指定 cursor 时忽略）
             status: 过滤状态（可选）
             pinned_only: 仅返回置顶会话
             user_id: 用户ID（可选，用于过滤当前用户的会话）
+            cursor: 上一页最后一个会话的游标（encode_archive_cursor），从其后开始返回
 
         Returns:
             会话列表
+
+        Raises:
+            ValueError: 游标格式错误
         """
+        keyset = decode_archive_cursor(cursor) if cursor else None
         try:
             db = self._get_db()
 
@@ -547,11 +963,20 @@ class SessionArchiveManager:
             if pinned_only:
                 query = query.filter(ArchivedSession.pinned == True)
 
-            # 排序：置顶优先，然后按创建时间倒序
-            query = query.order_by(ArchivedSession.pinned.desc(), ArchivedSession.created_at.desc())
+            # 排序：置顶优先，然后按创建时间倒序（session_id 保证顺序唯一，供游标定位）
+            query = query.order_by(
+                ArchivedSession.pinned.desc(), ArchivedSession.created_at.desc(), ArchivedSession.session_id.desc()
+            )
 
-            # 分页
-            query = query.offset(offset).limit(limit)
+            # 分页：游标按索引直接定位，不再扫描跳过前面的行
+            if keyset:
+                query = query.filter(
+                    tuple_(ArchivedSession.pinned, ArchivedSession.created_at, ArchivedSession.session_id)
+                    < tuple_(*keyset)
+                )
+            else:
+                query = query.offset(offset)
+            query = query.limit(limit)
 
             # 执行查询
             results = query.all()
@@ -586,7 +1011,8 @@ class SessionArchiveManager:
                 db.close()
             return []
 
-    async def update_metadata(
+    @_in_db_thread
+    def update_metadata(
         self,
         session_id: str,
         display_name: Optional[str] = None,
@@ -637,7 +1063,8 @@ class SessionArchiveManager:
                 db.close()
             return False
 
-    async def delete_archived_session(self, session_id: str) -> bool:
+    @_in_db_thread
+    def delete_archived_session(self, session_id: str) -> bool:
         """
         删除归档会话
 
@@ -650,6 +1077,7 @@ class SessionArchiveManager:
         try:
             db = self._get_db()
             result = db.query(ArchivedSession).filter(ArchivedSession.session_id == session_id).delete()
+            self._delete_sections(db, session_id)
 
             db.commit()
             db.close()
@@ -668,7 +1096,8 @@ class SessionArchiveManager:
                 db.close()
             return False
 
-    async def count_archived_sessions(
+    @_in_db_thread
+    def count_archived_sessions(
         self,
         status: Optional[str] = None,
         pinned_only: bool = False,
@@ -710,7 +1139,8 @@ class SessionArchiveManager:
                 db.close()
             return 0
 
-    async def archive_old_sessions(self, days_threshold: int = 30) -> int:
+    @_in_db_thread
+    def archive_old_sessions(self, days_threshold: int = 30) -> int:
         """
          Fix 2.2: 将旧的已归档会话移至冷存储
 
@@ -733,6 +1163,14 @@ class SessionArchiveManager:
 
             for session in old_sessions:
                 try:
+                    session_json, report_json = session.session_data, session.final_report
+                    if session.storage_format == STORAGE_FORMAT_SECTIONS:
+                        # 冷存储文件保持整块 JSON 格式
+                        session_data = self._load_session_data(db, session)
+                        session_json = json.dumps(session_data, ensure_ascii=False)
+                        report = session_data.get("final_report")
+                        report_json = json.dumps(report, ensure_ascii=False) if report else None
+
                     # 导出为JSON文件
                     file_path = cold_storage_dir / f"{session.session_id}.json"
                     with open(file_path, "w", encoding="utf-8") as f:
@@ -745,8 +1183,8 @@ class SessionArchiveManager:
                                 "mode": session.mode,
                                 "created_at": session.created_at.isoformat(),
                                 "archived_at": session.archived_at.isoformat(),
-                                "session_data": session.session_data,
-                                "final_report": session.final_report,
+                                "session_data": session_json,
+                                "final_report": report_json,
                                 "progress": session.progress,
                                 "current_stage": session.current_stage,
                                 "display_name": session.display_name,
@@ -760,6 +1198,7 @@ class SessionArchiveManager:
 
                     # 从数据库删除
                     db.delete(session)
+                    self._delete_sections(db, session.session_id)
                     archived_count += 1
 
                 except Exception as e:
@@ -804,7 +1243,8 @@ class SessionArchiveManager:
 
     # ====================  v7.163: 搜索会话归档方法 ====================
 
-    async def archive_search_session(
+    @_in_db_thread
+    def archive_search_session(
         self,
         session_id: str,
         query: str,
@@ -971,7 +1411,8 @@ class SessionArchiveManager:
             logger.error(f" 搜索会话归档失败: {e}")
             return False
 
-    async def get_search_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+    @_in_db_thread
+    def get_search_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         获取归档的搜索会话
 
@@ -1053,7 +1494,8 @@ class SessionArchiveManager:
             logger.error(f" 获取搜索会话失败: {e}")
             return None
 
-    async def list_search_sessions(
+    @_in_db_thread
+    def list_search_sessions(
         self, user_id: Optional[str] = None, limit: int = 50, offset: int = 0
     ) -> List[Dict[str, Any]]:
         """
@@ -1094,7 +1536,8 @@ class SessionArchiveManager:
             logger.error(f" 获取搜索历史列表失败: {e}")
             return []
 
-    async def get_database_stats(self) -> Dict[str, Any]:
+    @_in_db_thread
+    def get_database_stats(self) -> Dict[str, Any]:
         """
          v7.200: 获取数据库统计信息（性能监控）
 
@@ -1127,6 +1570,15 @@ class SessionArchiveManager:
             # 计算平均大小
             avg_size_mb = size_mb / total_sessions if total_sessions > 0 else 0
 
+            # 分段压缩存储统计
+            sectioned_count = (
+                db.query(ArchivedSession).filter(ArchivedSession.storage_format == STORAGE_FORMAT_SECTIONS).count()
+            )
+            raw_bytes, stored_bytes = db.query(
+                func.coalesce(func.sum(ArchivedSessionSection.raw_size), 0),
+                func.coalesce(func.sum(ArchivedSessionSection.stored_size), 0),
+            ).one()
+
             db.close()
 
             # 判断健康状态
@@ -1158,6 +1610,14 @@ class SessionArchiveManager:
                     "failed": failed_count,
                 },
                 "avg_size_mb": round(avg_size_mb, 2),
+                "sectioned_storage": {
+                    "sessions": sectioned_count,
+                    "legacy_sessions": total_sessions - sectioned_count,
+                    "raw_bytes": int(raw_bytes),
+                    "stored_bytes": int(stored_bytes),
+                    "ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else 0.0,
+                    "codec": ARCHIVE_CODEC,
+                },
                 "health_status": health_status.upper(),  # 前端期望大写
                 "thresholds": {  # 前端期望的阈值信息
                     "healthy_max_mb": 10240,  # 10GB
@@ -1196,12 +1656,7 @@ class SessionArchiveManager:
             size_before_mb = stats_before.get("size_mb", 0)
 
             # 执行 VACUUM
-            conn = self.engine.raw_connection()
-            cursor = conn.cursor()
-            cursor.execute("VACUUM")
-            conn.commit()
-            cursor.close()
-            conn.close()
+            await self._run_db(self._execute_vacuum)
 
             # 记录压缩后大小
             stats_after = await self.get_database_stats()
@@ -1220,7 +1675,16 @@ class SessionArchiveManager:
             logger.error(f" VACUUM 执行失败: {e}")
             return False
 
-    async def archive_old_sessions_to_cold_storage(
+    def _execute_vacuum(self) -> None:
+        conn = self.engine.raw_connection()
+        cursor = conn.cursor()
+        cursor.execute("VACUUM")
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    @_in_db_thread
+    def archive_old_sessions_to_cold_storage(
         self, days_threshold: int = 30, dry_run: bool = False
     ) -> Dict[str, Any]:
         """
@@ -1261,6 +1725,10 @@ class SessionArchiveManager:
                 try:
                     # 导出到 JSON 文件
                     file_path = cold_storage_dir / f"{session.session_id}.json"
+                    session_data = self._load_session_data(db, session)
+                    final_report = session.final_report
+                    if session.storage_format == STORAGE_FORMAT_SECTIONS and session_data.get("final_report"):
+                        final_report = json.dumps(session_data["final_report"], ensure_ascii=False)
 
                     session_dict = {
                         "session_id": session.session_id,
@@ -1270,8 +1738,8 @@ class SessionArchiveManager:
                         "mode": session.mode,
                         "created_at": session.created_at.isoformat(),
                         "archived_at": session.archived_at.isoformat(),
-                        "session_data": json.loads(session.session_data) if session.session_data else {},
-                        "final_report": session.final_report,
+                        "session_data": session_data,
+                        "final_report": final_report,
                     }
 
                     with open(file_path, "w", encoding="utf-8") as f:
@@ -1280,6 +1748,7 @@ class SessionArchiveManager:
                     # 删除数据库记录
                     if not dry_run:
                         db.delete(session)
+                        self._delete_sections(db, session.session_id)
 
                     archived_count += 1
 
@@ -1315,7 +1784,8 @@ class SessionArchiveManager:
             }
 
     #  v7.189: 删除搜索会话
-    async def delete_search_session(self, session_id: str) -> bool:
+    @_in_db_thread
+    def delete_search_session(self, session_id: str) -> bool:
         """
         删除归档的搜索会话
 
@@ -7,6 +7,7 @@ sf/ 知识文件运行时加载器 (P2-T8)
 - 提供按模式/维度提取知识片段的接口
 - 使用 lru_cache 缓存，避免重复磁盘 I/O
 - v9.0: 框架感知知识注入 — 支持 analysis_frameworks.yaml / layer_models.yaml / ability_core_essentials.yaml
+- 知识注入文本按模式组合确定（排序、不含置信度并缓存），可作为 prompt 稳定前缀命中提供商缓存
 
 版本：v9.000 (Framework-Aware Knowledge Injection)
 """
@@ -15,7 +16,7 @@ import logging
 import re
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
@@ -291,12 +292,13 @@ def get_quality_floor_checklist() -> str:
 # ============================================================
 
 
-def get_evaluation_criteria_for_modes(detected_modes: List[Dict[str, Any]]) -> str:
+def get_evaluation_criteria_for_modes(detected_modes: List[Dict[str, Any]], include_confidence: bool = True) -> str:
     """
     根据检测到的设计模式，提取对应的评估维度权重和重点维度
 
     Args:
         detected_modes: [{"mode": "M5_rural_context", "confidence": 0.85}, ...]
+        include_confidence: 是否在标题中带置信度（稳定前缀中关闭，置信度随会话变化）
 
     Returns:
         可直接注入 prompt 的评估标准文本
@@ -336,7 +338,10 @@ def get_evaluation_criteria_for_modes(detected_modes: List[Dict[str, Any]]) -> s
 
         # 构建文本
         mode_id.replace("_", " ").title()
-        lines = [f"模式 {mode_id}（置信度 {confidence:.0%}）评估维度权重："]
+        if include_confidence:
+            lines = [f"模式 {mode_id}（置信度 {confidence:.0%}）评估维度权重："]
+        else:
+            lines = [f"模式 {mode_id} 评估维度权重："]
         for dim_key, weight in sorted_dims:
             dim_cn = dim_names.get(dim_key, dim_key)
             bar = "█" * int(weight * 20)
@@ -418,21 +423,17 @@ def _extract_quality_floor_summary(full_text: str) -> str:
     return "\n".join(summary_lines) if summary_lines else full_text[:500]
 
 
-def get_full_knowledge_injection(detected_modes: List[Dict[str, Any]]) -> str:
-    """
-    获取完整的知识注入文本（评估标准 + 输出标准），用于注入专家/审核 prompt
+def canonical_mode_ids(detected_modes: Optional[List[Dict[str, Any]]]) -> Tuple[str, ...]:
+    """模式组合的规范形式：去重后按 mode id 排序（与检测顺序、置信度无关）"""
+    return tuple(sorted({m.get("mode", "") for m in detected_modes or [] if m.get("mode")}))
 
-    Args:
-        detected_modes: [{"mode": "M5_rural_context", "confidence": 0.85}, ...]
 
-    Returns:
-        完整的知识注入文本
-    """
-    if not detected_modes:
-        return ""
-
-    eval_section = get_evaluation_criteria_for_modes(detected_modes)
-    output_section = get_output_standards_for_modes(detected_modes)
+@lru_cache(maxsize=64)
+def _build_knowledge_prefix(mode_ids: Tuple[str, ...]) -> str:
+    """按模式组合构建知识注入文本（缓存，同一组合逐字节一致）"""
+    modes = [{"mode": mode_id} for mode_id in mode_ids]
+    eval_section = get_evaluation_criteria_for_modes(modes, include_confidence=False)
+    output_section = get_output_standards_for_modes(modes)
 
     combined = ""
     if eval_section:
@@ -441,11 +442,29 @@ def get_full_knowledge_injection(detected_modes: List[Dict[str, Any]]) -> str:
         combined += "\n" + output_section
 
     if combined:
-        logger.info(f"[sf_knowledge] 生成知识注入文本 ({len(combined)} chars) " f"覆盖 {len(detected_modes)} 个模式")
+        logger.info(f"[sf_knowledge] 生成知识注入文本 ({len(combined)} chars) " f"覆盖 {len(mode_ids)} 个模式")
 
     return combined
 
 
+def get_full_knowledge_injection(detected_modes: List[Dict[str, Any]]) -> str:
+    """
+    获取完整的知识注入文本（评估标准 + 输出标准），用于注入专家/审核 prompt
+
+    输出只取决于模式组合（按 mode id 排序、不含置信度），同一组合在不同会话中逐字节一致，
+    放在 prompt 的稳定前缀中可命中提供商的 prompt cache。
+
+    Args:
+        detected_modes: [{"mode": "M5_rural_context", "confidence": 0.85}, ...]
+
+    Returns:
+        完整的知识注入文本
+    """
+    if not detected_modes:
+        return ""
+    return _build_knowledge_prefix(canonical_mode_ids(detected_modes))
+
+
 # ============================================================
 # 3b. 框架注册表 & 层模型加载 (v9.0)
 # ============================================================
@@ -766,6 +785,7 @@ def clear_sf_knowledge_cache():
     get_mode_evaluation_weights.cache_clear()
     get_mode_deliverable_mapping.cache_clear()
     get_quality_floor_checklist.cache_clear()
+    _build_knowledge_prefix.cache_clear()
     load_analysis_frameworks.cache_clear()
     load_layer_models.cache_clear()
     load_ability_core_essentials.cache_clear()
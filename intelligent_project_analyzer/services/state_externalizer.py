@@ -0,0 +1,294 @@
+"""
+State 大字段外部化（checkpoint 序列化层）
+
+agent_results、final_report、search_references、conversation_history 等字段随每个 superstep 的
+checkpoint 全量序列化，长会话中同一份专家结果会被重复写入几十次。
+
+本模块包装检查点存储的 serde：序列化 checkpoint 时，把策略中超过阈值的通道值写入
+ExternalStateStore，checkpoint 中只保留引用；反序列化时透明解引用（带 LRU 缓存）。
+节点在运行期看到的始终是完整值，reducer 语义不变；未变化的字段复用上一次的引用，不重复写入，
+只为其续期。
+
+用法：
+    from .state_externalizer import install_state_externalizer
+
+    install_state_externalizer(checkpointer)   # MainWorkflow 初始化时调用，未启用时不做任何事
+
+配置：
+    STATE_EXTERNALIZE_ENABLED      是否启用（默认 false，opt-in）
+    STATE_EXTERNALIZE_FIELDS       外部化字段，逗号分隔
+                                   （默认 agent_results,aggregated_results,final_report,search_references,conversation_history）
+    STATE_EXTERNALIZE_MIN_BYTES    单字段序列化后超过该字节数才外部化（默认 8192）
+    STATE_EXTERNALIZE_CACHE_SIZE   解引用缓存条目数（默认 256）
+    STATE_EXTERNALIZE_TTL_SECONDS  外部化字段的过期秒数（默认与 CHECKPOINT_THREAD_TTL_DAYS 一致，
+                                   即检查点线程无更新多久后被清理；每次写入 checkpoint 都会续期）
+
+注意：ExternalStateStore 默认是进程内存后端，服务重启后引用失效；
+读取到失效引用时抛出 ExternalStateMissingError，而不是把字段悄悄恢复为空值。
+持久化检查点场景请配置 REDIS_URL。
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from loguru import logger
+
+from intelligent_project_analyzer.services.external_state_store import get_store
+from intelligent_project_analyzer.services.state_profiler import find_serde_layer
+
+STATE_EXTERNALIZE_ENABLED = os.getenv("STATE_EXTERNALIZE_ENABLED", "false").lower() == "true"
+STATE_EXTERNALIZE_FIELDS = tuple(
+    field.strip()
+    for field in os.getenv(
+        "STATE_EXTERNALIZE_FIELDS",
+        "agent_results,aggregated_results,final_report,search_references,conversation_history",
+    ).split(",")
+    if field.strip()
+)
+STATE_EXTERNALIZE_MIN_BYTES = int(os.getenv("STATE_EXTERNALIZE_MIN_BYTES", "8192"))
+STATE_EXTERNALIZE_CACHE_SIZE = int(os.getenv("STATE_EXTERNALIZE_CACHE_SIZE", "256"))
+# 引用与检查点线程同寿命：检查点维护按 CHECKPOINT_THREAD_TTL_DAYS 清理长期无更新的线程
+STATE_EXTERNALIZE_TTL_SECONDS = int(
+    os.getenv(
+        "STATE_EXTERNALIZE_TTL_SECONDS",
+        str(int(float(os.getenv("CHECKPOINT_THREAD_TTL_DAYS", "30")) * 86400)),
+    )
+)
+
+REF_MARKER = "__external_ref__"
+
+_MAX_TRACKED_SESSIONS = 200
+
+_lock = threading.Lock()
+_stats: Dict[str, int] = {}
+_session_stats: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _reset_stats() -> None:
+    _stats.clear()
+    _stats.update({"stored": 0, "reused": 0, "cache_hits": 0, "store_reads": 0, "missing": 0})
+    _session_stats.clear()
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+_reset_stats()
+
+
+class ExternalStateMissingError(RuntimeError):
+    """checkpoint 中的外部化引用已失效（过期或外部存储丢失），无法还原字段"""
+
+
+def _is_checkpoint(obj: Any) -> bool:
+    return isinstance(obj, dict) and "channel_values" in obj and "channel_versions" in obj
+
+
+def _is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and REF_MARKER in value
+
+
+class ExternalizingSerializer(SerializerProtocol):
+    """
+    外部化大字段的 serde 包装器
+
+    Args:
+        inner: 原检查点存储的 serde
+        fields: 允许外部化的通道名
+        min_bytes: 外部化阈值（字节）
+        cache_size: 解引用缓存条目数
+        ttl: 外部存储中引用的过期秒数（写入与复用时续期）
+    """
+
+    def __init__(
+        self,
+        inner: SerializerProtocol,
+        fields: Optional[Tuple[str, ...]] = None,
+        min_bytes: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        ttl: Optional[int] = None,
+    ):
+        self.inner = inner
+        self.fields = tuple(fields if fields is not None else STATE_EXTERNALIZE_FIELDS)
+        self.min_bytes = min_bytes if min_bytes is not None else STATE_EXTERNALIZE_MIN_BYTES
+        self.cache_size = cache_size if cache_size is not None else STATE_EXTERNALIZE_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else STATE_EXTERNALIZE_TTL_SECONDS
+        # (session_id, field) -> (digest, ref_key)：字段未变化时复用引用（并续期）
+        self._written: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        # ref_key -> (type, bytes)：缓存序列化结果，每次解引用得到独立对象，避免节点间共享可变值
+        self._cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ 序列化
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if not _is_checkpoint(obj):
+            return self.inner.dumps_typed(obj)
+
+        values = obj["channel_values"]
+        session_id = str(values.get("session_id") or "unknown")
+        replaced: Dict[str, Any] = {}
+        external_bytes = 0
+        for field in self.fields:
+            value = values.get(field)
+            if value is None or _is_ref(value):
+                continue
+            type_, data = self.inner.dumps_typed(value)
+            if len(data) < self.min_bytes:
+                continue
+            replaced[field] = {REF_MARKER: self._store(session_id, field, type_, data), "kind": type(value).__name__}
+            external_bytes += len(data)
+
+        if not replaced:
+            result = self.inner.dumps_typed(obj)
+        else:
+            result = self.inner.dumps_typed({**obj, "channel_values": {**values, **replaced}})
+        self._record_superstep(session_id, len(result[1]), external_bytes, list(replaced))
+        return result
+
+    def _store(self, session_id: str, field: str, type_: str, data: bytes) -> str:
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        key = (session_id, field)
+        with self._lock:
+            previous = self._written.get(key)
+            if previous is not None and previous[0] == digest:
+                self._written.move_to_end(key)
+                ref_key = previous[1]
+            else:
+                ref_key = None
+        # 复用时续期，否则活跃会话的引用会在检查点仍被引用时过期；已过期则重新写入
+        if ref_key is not None and get_store().touch(ref_key, self.ttl):
+            _count("reused")
+            return ref_key
+
+        ref_key = get_store().put(session_id, field, (type_, data), ttl=self.ttl)
+        with self._lock:
+            self._written[key] = (digest, ref_key)
+            self._remember(ref_key, (type_, data))
+            while len(self._written) > self.cache_size:
+                self._written.popitem(last=False)
+        _count("stored")
+        return ref_key
+
+    def _remember(self, ref_key: str, payload: Tuple[str, bytes]) -> None:
+        self._cache[ref_key] = payload
+        self._cache.move_to_end(ref_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------ 反序列化
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        obj = self.inner.loads_typed(data)
+        if not _is_checkpoint(obj):
+            return obj
+        values = obj["channel_values"]
+        for field, value in list(values.items()):
+            if _is_ref(value):
+                values[field] = self._resolve(field, value)
+        return obj
+
+    def _resolve(self, field: str, ref: Dict[str, Any]) -> Any:
+        ref_key = ref[REF_MARKER]
+        with self._lock:
+            payload = self._cache.get(ref_key)
+            if payload is not None:
+                self._cache.move_to_end(ref_key)
+
+        if payload is not None:
+            _count("cache_hits")
+        else:
+            payload = get_store().get(ref_key)
+            _count("store_reads")
+            if payload is None:
+                _count("missing")
+                logger.error(f" [StateExternalizer] 外部化字段 {field} 的引用已失效: {ref_key}")
+                raise ExternalStateMissingError(f"外部化字段 {field} 的引用已失效（过期或外部存储丢失）: {ref_key}")
+            with self._lock:
+                self._remember(ref_key, payload)
+
+        return self.inner.loads_typed(payload)
+
+    # ------------------------------------------------------------------ 统计
+
+    @staticmethod
+    def _record_superstep(session_id: str, after_bytes: int, external_bytes: int, fields: List[str]) -> None:
+        before_bytes = after_bytes + external_bytes
+        with _lock:
+            stats = _session_stats.setdefault(
+                session_id, {"supersteps": 0, "before_bytes": 0, "after_bytes": 0, "last": {}}
+            )
+            stats["supersteps"] += 1
+            stats["before_bytes"] += before_bytes
+            stats["after_bytes"] += after_bytes
+            stats["last"] = {"before_bytes": before_bytes, "after_bytes": after_bytes, "externalized": fields}
+            _session_stats.move_to_end(session_id)
+            while len(_session_stats) > _MAX_TRACKED_SESSIONS:
+                _session_stats.popitem(last=False)
+        if fields:
+            logger.debug(
+                f" [StateExternalizer] {session_id} checkpoint {before_bytes / 1024:.1f}KB → "
+                f"{after_bytes / 1024:.1f}KB（外部化: {', '.join(fields)}）"
+            )
+
+
+def install_state_externalizer(checkpointer: Any, force: bool = False) -> bool:
+    """
+    为检查点存储安装外部化 serde（幂等）
+
+    Args:
+        checkpointer: BaseCheckpointSaver 实例
+        force: 忽略 STATE_EXTERNALIZE_ENABLED 开关（测试用）
+
+    Returns:
+        是否已安装
+    """
+    if checkpointer is None or not (STATE_EXTERNALIZE_ENABLED or force):
+        return False
+    serde = getattr(checkpointer, "serde", None)
+    if serde is None:
+        return False
+    if find_serde_layer(serde, ExternalizingSerializer) is not None:
+        return True
+    checkpointer.serde = ExternalizingSerializer(serde)
+    logger.info(
+        f" [StateExternalizer] 已启用大字段外部化: {', '.join(STATE_EXTERNALIZE_FIELDS)} "
+        f"(阈值 {STATE_EXTERNALIZE_MIN_BYTES}B, 后端 {get_store().backend_type})"
+    )
+    return True
+
+
+def get_state_externalizer_stats() -> Dict[str, Any]:
+    """外部化计数 + 各会话 checkpoint 外部化前后大小（供 /api/metrics/checkpoint-size 使用）"""
+    with _lock:
+        sessions = {}
+        before_total = after_total = 0
+        for session_id, stats in _session_stats.items():
+            before_total += stats["before_bytes"]
+            after_total += stats["after_bytes"]
+            steps = stats["supersteps"]
+            sessions[session_id] = {
+                **stats,
+                "avg_before_bytes": round(stats["before_bytes"] / steps) if steps else 0,
+                "avg_after_bytes": round(stats["after_bytes"] / steps) if steps else 0,
+            }
+        return {
+            "enabled": STATE_EXTERNALIZE_ENABLED,
+            "fields": list(STATE_EXTERNALIZE_FIELDS),
+            "min_bytes": STATE_EXTERNALIZE_MIN_BYTES,
+            **_stats,
+            "saved_ratio": round(1 - after_total / before_total, 4) if before_total else 0.0,
+            "sessions": sessions,
+        }
+
+
+def reset_state_externalizer_stats() -> None:
+    """重置统计（测试用）"""
+    with _lock:
+        _reset_stats()
@@ -0,0 +1,284 @@
+"""
+State 体积剖析器
+
+长会话变慢时，很难判断是哪个节点把 state 撑大、哪个 reducer 在做重复的合并、checkpoint 每步写了多少字节。
+本模块在三个位置采样，并按会话汇总：
+
+- 节点输出（state delta）：通过 LangGraph 回调记录每个节点每次返回的字段及其序列化大小
+- reducer 耗时：profile_reducer 装饰器记录调用次数、累计 / 最大耗时
+- checkpoint 字节数：包装检查点存储的 serde，记录每个 superstep 实际写入的字节数
+
+用法：
+    from .state_profiler import attach_state_profiler, install_state_profiler
+
+    install_state_profiler(checkpointer)   # MainWorkflow 初始化时调用，未启用时不做任何事
+    graph = attach_state_profiler(graph)   # 编译后的图挂载回调
+
+配置：
+    STATE_PROFILER_ENABLED   是否启用（默认 false，opt-in；未启用时装饰器只多一次布尔判断）
+
+注意：本模块被 core/state.py 导入，不能反向导入 core 中的状态定义。
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from loguru import logger
+
+from intelligent_project_analyzer.core.trace_context import TraceContext
+
+STATE_PROFILER_ENABLED = os.getenv("STATE_PROFILER_ENABLED", "false").lower() == "true"
+
+_MAX_TRACKED_SESSIONS = 200
+_MAX_PENDING_RUNS = 1000
+
+_lock = threading.Lock()
+_sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_measure_serde = JsonPlusSerializer()
+
+
+def _new_profile() -> Dict[str, Any]:
+    return {"nodes": {}, "fields": {}, "reducers": {}, "checkpoints": {"count": 0, "total_bytes": 0, "max_bytes": 0}}
+
+
+def _session_profile(session_id: Optional[str]) -> Dict[str, Any]:
+    """取会话剖析记录（调用方需持有 _lock）"""
+    key = str(session_id or "unknown")
+    profile = _sessions.get(key)
+    if profile is None:
+        profile = _sessions[key] = _new_profile()
+        while len(_sessions) > _MAX_TRACKED_SESSIONS:
+            _sessions.popitem(last=False)
+    else:
+        _sessions.move_to_end(key)
+    return profile
+
+
+def _size_of(value: Any) -> int:
+    try:
+        return len(_measure_serde.dumps_typed(value)[1])
+    except Exception:
+        return len(repr(value).encode("utf-8"))
+
+
+# ------------------------------------------------------------------ reducer 耗时
+
+
+def profile_reducer(fn: Callable) -> Callable:
+    """记录 reducer 调用次数与耗时（按 TraceContext 中的会话归属）"""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(left, right):
+        if not STATE_PROFILER_ENABLED:
+            return fn(left, right)
+        started = time.perf_counter()
+        try:
+            return fn(left, right)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with _lock:
+                stats = _session_profile(TraceContext.get_session_id())["reducers"].setdefault(
+                    name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+                )
+                stats["calls"] += 1
+                stats["total_ms"] += elapsed_ms
+                stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    return wrapper
+
+
+# ------------------------------------------------------------------ 节点 delta
+
+
+class StateProfilerCallback(BaseCallbackHandler):
+    """记录每个图节点返回的 state delta 大小与耗时"""
+
+    run_inline = True
+
+    def __init__(self):
+        # run_id -> (session_id, node, started)
+        self._pending: "OrderedDict[UUID, Tuple[str, str, float]]" = OrderedDict()
+
+    def on_chain_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # 只统计节点本身，跳过节点内部的子链（子链名称与节点名不同）
+        if not node or kwargs.get("name") != node:
+            return
+        session_id = str(metadata.get("thread_id") or TraceContext.get_session_id() or "unknown")
+        with _lock:
+            self._pending[run_id] = (session_id, node, time.perf_counter())
+            while len(self._pending) > _MAX_PENDING_RUNS:
+                self._pending.popitem(last=False)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with _lock:
+            pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        session_id, node, started = pending
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        field_sizes = {}
+        if isinstance(outputs, dict):
+            field_sizes = {field: _size_of(value) for field, value in outputs.items()}
+        delta_bytes = sum(field_sizes.values())
+
+        with _lock:
+            profile = _session_profile(session_id)
+            stats = profile["nodes"].setdefault(
+                node, {"calls": 0, "total_ms": 0.0, "delta_bytes": 0, "max_delta_bytes": 0, "last_fields": []}
+            )
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["delta_bytes"] += delta_bytes
+            stats["max_delta_bytes"] = max(stats["max_delta_bytes"], delta_bytes)
+            stats["last_fields"] = sorted(field_sizes)
+            for field, size in field_sizes.items():
+                field_stats = profile["fields"].setdefault(field, {"writes": 0, "total_bytes": 0, "last_bytes": 0})
+                field_stats["writes"] += 1
+                field_stats["total_bytes"] += size
+                field_stats["last_bytes"] = size
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with _lock:
+            self._pending.pop(run_id, None)
+
+
+# ------------------------------------------------------------------ checkpoint 字节数
+
+
+class ProfilingSerializer(SerializerProtocol):
+    """记录每个 checkpoint 实际写入字节数的 serde 包装器（位于最外层，统计外部化之后的大小）"""
+
+    def __init__(self, inner: SerializerProtocol):
+        self.inner = inner
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        result = self.inner.dumps_typed(obj)
+        if isinstance(obj, dict) and isinstance(obj.get("channel_values"), dict) and "channel_versions" in obj:
+            size = len(result[1])
+            with _lock:
+                stats = _session_profile(obj["channel_values"].get("session_id"))["checkpoints"]
+                stats["count"] += 1
+                stats["total_bytes"] += size
+                stats["max_bytes"] = max(stats["max_bytes"], size)
+                stats["last_bytes"] = size
+        return result
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        return self.inner.loads_typed(data)
+
+
+def find_serde_layer(serde: Any, serde_class: type) -> Optional[Any]:
+    """沿 .inner 链查找指定类型的 serde 包装层（用于 serde 包装器的幂等安装）"""
+    while serde is not None:
+        if isinstance(serde, serde_class):
+            return serde
+        serde = getattr(serde, "inner", None)
+    return None
+
+
+def install_state_profiler(checkpointer: Any, force: bool = False) -> bool:
+    """
+    为检查点存储安装 checkpoint 字节数统计（幂等）
+
+    Args:
+        checkpointer: BaseCheckpointSaver 实例
+        force: 忽略 STATE_PROFILER_ENABLED 开关（测试用）
+
+    Returns:
+        是否已安装
+    """
+    if checkpointer is None or not (STATE_PROFILER_ENABLED or force):
+        return False
+    serde = getattr(checkpointer, "serde", None)
+    if serde is None:
+        return False
+    if find_serde_layer(serde, ProfilingSerializer) is None:
+        checkpointer.serde = ProfilingSerializer(serde)
+        logger.info(" [StateProfiler] 已启用 state 体积剖析（节点 delta / reducer 耗时 / checkpoint 字节数）")
+    return True
+
+
+def attach_state_profiler(graph: Any, force: bool = False) -> Any:
+    """为编译后的图挂载节点 delta 回调；未启用时原样返回"""
+    if graph is None or not (STATE_PROFILER_ENABLED or force):
+        return graph
+    return graph.with_config(callbacks=[StateProfilerCallback()])
+
+
+# ------------------------------------------------------------------ 查询
+
+
+def _summarize(profile: Dict[str, Any]) -> Dict[str, Any]:
+    nodes = {
+        node: {
+            **stats,
+            "total_ms": round(stats["total_ms"], 2),
+            "avg_delta_bytes": round(stats["delta_bytes"] / stats["calls"]) if stats["calls"] else 0,
+        }
+        for node, stats in profile["nodes"].items()
+    }
+    reducers = {
+        name: {
+            "calls": stats["calls"],
+            "total_ms": round(stats["total_ms"], 3),
+            "max_ms": round(stats["max_ms"], 3),
+            "avg_ms": round(stats["total_ms"] / stats["calls"], 3) if stats["calls"] else 0.0,
+        }
+        for name, stats in profile["reducers"].items()
+    }
+    checkpoints = dict(profile["checkpoints"])
+    checkpoints["avg_bytes"] = round(checkpoints["total_bytes"] / checkpoints["count"]) if checkpoints["count"] else 0
+    return {
+        "nodes": dict(sorted(nodes.items(), key=lambda kv: kv[1]["delta_bytes"], reverse=True)),
+        "fields": dict(sorted(profile["fields"].items(), key=lambda kv: kv[1]["total_bytes"], reverse=True)),
+        "reducers": reducers,
+        "checkpoints": checkpoints,
+    }
+
+
+def get_state_profile(session_id: str) -> Optional[Dict[str, Any]]:
+    """单个会话的剖析结果（节点按 delta 总字节降序）；会话不存在时返回 None"""
+    with _lock:
+        profile = _sessions.get(session_id)
+        return _summarize(profile) if profile is not None else None
+
+
+def get_state_profile_summary() -> Dict[str, Any]:
+    """所有会话的概要（供 /api/metrics/state-profile 使用）"""
+    with _lock:
+        sessions = {}
+        for session_id, profile in _sessions.items():
+            checkpoints = profile["checkpoints"]
+            sessions[session_id] = {
+                "node_calls": sum(stats["calls"] for stats in profile["nodes"].values()),
+                "delta_bytes": sum(stats["delta_bytes"] for stats in profile["nodes"].values()),
+                "reducer_ms": round(sum(stats["total_ms"] for stats in profile["reducers"].values()), 3),
+                "checkpoints": checkpoints["count"],
+                "checkpoint_bytes": checkpoints["total_bytes"],
+                "max_checkpoint_bytes": checkpoints["max_bytes"],
+            }
+        return {"enabled": STATE_PROFILER_ENABLED, "sessions": sessions}
+
+
+def reset_state_profiles() -> None:
+    """清空剖析数据（测试用）"""
+    with _lock:
+        _sessions.clear()
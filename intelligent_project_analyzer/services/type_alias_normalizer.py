@@ -250,7 +250,12 @@ def extract_negated_spans(text: str) -> List[Tuple[int, int]]:
     return spans
 
 
-def is_negated(keyword: str, text: str, negated_spans: Optional[List[Tuple[int, int]]] = None) -> bool:
+def is_negated(
+    keyword: str,
+    text: str,
+    negated_spans: Optional[List[Tuple[int, int]]] = None,
+    position: Optional[int] = None,
+) -> bool:
     """
     判断 keyword 在 text 中是否位于否定语境内。
 
@@ -258,6 +263,7 @@ def is_negated(keyword: str, text: str, negated_spans: Optional[List[Tuple[int,
         keyword: 要检查的关键词
         text: 完整文本（已 lower()）
         negated_spans: 预计算的否定区间列表，None 则自动计算
+        position: 关键词首次出现位置（由关键词匹配器给出时可省去 text.find）
 
     Returns:
         True = 该关键词处于否定语境，不应计入命中
@@ -267,7 +273,7 @@ def is_negated(keyword: str, text: str, negated_spans: Optional[List[Tuple[int,
     if not negated_spans:
         return False
 
-    pos = text.find(keyword)
+    pos = text.find(keyword) if position is None else position
     if pos < 0:
         return False
 
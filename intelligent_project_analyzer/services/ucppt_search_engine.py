@@ -89,6 +89,10 @@ from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 import httpx
 from loguru import logger
 
+from intelligent_project_analyzer.services.llm_concurrency import gated_async_transport
+from intelligent_project_analyzer.utils.stream_sections import StreamSectionTracker, extract_list_items
+from intelligent_project_analyzer.utils.tolerant_json_parser import parse_json_tolerant
+
 # 导入现有搜索服务
 try:
     from intelligent_project_analyzer.services.bocha_ai_search import (
@@ -232,6 +236,11 @@ SEARCH_QUALITY_LLM_FILTER = os.getenv("SEARCH_QUALITY_LLM_FILTER", "true").lower
 SEARCH_MIN_QUALITY_SOURCES = int(os.getenv("SEARCH_MIN_QUALITY_SOURCES", "3"))
 SEARCH_SUPPLEMENT_MAX_RETRIES = int(os.getenv("SEARCH_SUPPLEMENT_MAX_RETRIES", "3"))
 
+# 流水线分析：搜索方向板块一结束就提前启动首轮搜索，不等待整段分析生成完毕
+PIPELINED_ANALYSIS_ENABLED = os.getenv("UCPPT_PIPELINED_ANALYSIS", "true").lower() == "true"
+EARLY_SEARCH_MAX_QUERIES = int(os.getenv("UCPPT_EARLY_SEARCH_MAX_QUERIES", "3"))
+EARLY_SEARCH_WAIT_TIMEOUT = float(os.getenv("UCPPT_EARLY_SEARCH_WAIT_TIMEOUT", "20"))
+
 # OpenRouter API 配置（v7.270 OpenAI GPT-4o）
 OPENROUTER_API_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 
@@ -264,6 +273,38 @@ class AnswerReadiness(Enum):
 # ==================== 数据结构 ====================
 
 
+@dataclass
+class EarlySearchHandle:
+    """流水线分析中提前启动的首轮搜索（搜索方向板块完成时创建，由搜索主流程回收结果）"""
+
+    section: str
+    directions: List[str]
+    queries: List[str]
+    task: "asyncio.Task"
+    started_at: float = field(default_factory=time.time)
+
+    def cancel(self) -> None:
+        if not self.task.done():
+            self.task.cancel()
+
+    async def collect(self, timeout: float) -> List[Dict[str, Any]]:
+        """等待提前搜索结果，超时或失败时取消并返回空列表"""
+        try:
+            return await asyncio.wait_for(self.task, timeout) or []
+        except asyncio.TimeoutError:
+            logger.warning(f"️ [流水线分析] 提前搜索等待超时({timeout}s)，已取消")
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                raise
+        except Exception as e:
+            logger.warning(f"️ [流水线分析] 提前搜索失败: {e}")
+        return []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"section": self.section, "directions": self.directions, "queries": self.queries}
+
+
 @dataclass
 class PhaseResult:
     """分析阶段结果基类 - v7.214"""
@@ -2547,7 +2588,7 @@ class LLMAnalysisEngine:
             start_time = time.time()
 
             # 缩短超时到120秒（OpenAI GPT-4o 需要更长时间思考）
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with httpx.AsyncClient(timeout=120.0, transport=gated_async_transport("openrouter")) as client:
                 response = await client.post(
                     f"{self.openrouter_base_url}/chat/completions",
                     headers={
@@ -3993,101 +4034,17 @@ class UcpptSearchEngine:
                 for i in range(len(results))
             ]
 
-    def _try_extract_mission_from_partial_json(self, partial_json: str, mission_key: str) -> Optional[Any]:
-        """
-        v7.302.8: 从部分JSON中尝试提取指定使命的数据
-
-        用于流式解析：在LLM生成JSON的过程中，尝试提取已完成的部分
-
-        Args:
-            partial_json: 部分生成的JSON字符串
-            mission_key: 要提取的使命键名 (如 "mission_1_user_problem_analysis")
-
-        Returns:
-            提取到的使命数据，失败返回 None
-        """
-        import re
-
-        # 特殊处理 creation_command（简单字符串值）
-        if mission_key == "creation_command":
-            # 匹配 "creation_command": "..." 格式
-            pattern = r'"creation_command"\s*:\s*"([^"]*)"'
-            match = re.search(pattern, partial_json)
-            if match:
-                return match.group(1)
-            return None
-
-        # 对于使命对象，检查是否包含完整的使命数据
-        # 使命格式: "mission_x_xxx": { "title": "...", "description": "...", "content": {...} }
-
-        # 首先检查是否存在该键
-        if f'"{mission_key}"' not in partial_json:
-            return None
-
-        # 尝试提取完整的使命对象
-        # 使用计数器匹配嵌套的花括号
-        try:
-            # 找到使命键的位置
-            key_pattern = f'"{mission_key}"\\s*:\\s*\\{{'
-            match = re.search(key_pattern, partial_json)
-            if not match:
-                return None
-
-            start_pos = match.end() - 1  # 定位到 { 的位置
-
-            # 计数花括号来找到完整对象
-            brace_count = 0
-            end_pos = start_pos
-            in_string = False
-            escape_next = False
-
-            for i, char in enumerate(partial_json[start_pos:], start_pos):
-                if escape_next:
-                    escape_next = False
-                    continue
-                if char == "\\":
-                    escape_next = True
-                    continue
-                if char == '"' and not escape_next:
-                    in_string = not in_string
-                    continue
-                if in_string:
-                    continue
-                if char == "{":
-                    brace_count += 1
-                elif char == "}":
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_pos = i + 1
-                        break
-
-            if brace_count != 0:
-                # 对象不完整
-                return None
-
-            # 提取并解析对象
-            mission_str = partial_json[start_pos:end_pos]
-            mission_data = json.loads(mission_str)
-
-            # 验证使命数据结构是否完整
-            if isinstance(mission_data, dict) and "content" in mission_data:
-                return mission_data
-
-            return None
-
-        except (json.JSONDecodeError, Exception):
-            return None
-
     def _safe_parse_json(self, text: str, context: str = "", expect_dict: bool = True) -> Optional[Dict[str, Any]]:
         """
         安全的 JSON 解析，支持多种格式 (v7.214 增强)
 
         解析策略（按优先级）：
         1. 直接解析：尝试将整个文本作为 JSON 解析
-        2. ```json``` 块：提取 Markdown JSON 代码块
-        3. ``` 块：提取通用代码块
-        4. 正则提取：提取最外层的 {} 或 []
-        5. 清理后重试：移除注释、Unicode 转义等
+        2. 容错解析：parse_json_tolerant 单遍完成定位（```json``` 块 / 裸 JSON）、
+           清理（注释、尾逗号、控制字符、单引号 / 全角引号）
+
+        被截断的输出（max_tokens 用尽等）不会被补全成看似完整的字典，
+        按解析失败处理（记录警告），由调用方走各自的降级逻辑。
 
         v7.214 增强：
         - 新增 expect_dict 参数，当期望字典时不返回数组
@@ -4132,64 +4089,16 @@ class UcpptSearchEngine:
         except json.JSONDecodeError:
             pass
 
-        # 策略2: 提取 ```json``` 块
-        if "```json" in text:
-            try:
-                json_block = text.split("```json")[1].split("```")[0].strip()
-                result = json.loads(json_block)
-                final = _ensure_dict(result)
-                if final is not None:
-                    return final
-            except (IndexError, json.JSONDecodeError):
-                pass
-
-        # 策略3: 提取 ``` 块
-        if "```" in text:
-            try:
-                json_block = text.split("```")[1].split("```")[0].strip()
-                # 检查是否以 json 开头（去掉语言标记）
-                if json_block.startswith("json"):
-                    json_block = json_block[4:].strip()
-                result = json.loads(json_block)
-                final = _ensure_dict(result)
-                if final is not None:
-                    return final
-            except (IndexError, json.JSONDecodeError):
-                pass
-
-        # 策略4: 正则提取最外层 {} 或 []
-        try:
-            # 优先匹配最外层的 JSON 对象（字典）
-            obj_match = re.search(r"\{(?:[^{}]|(?:\{[^{}]*\}))*\}", text, re.DOTALL)
-            if obj_match:
-                result = json.loads(obj_match.group())
-                if isinstance(result, dict):
-                    return result
-
-            # 如果没有字典或不期望字典，尝试匹配数组
-            if not expect_dict:
-                arr_match = re.search(r"\[(?:[^\[\]]|(?:\[[^\[\]]*\]))*\]", text, re.DOTALL)
-                if arr_match:
-                    return json.loads(arr_match.group())
-        except json.JSONDecodeError:
-            pass
-
-        # 策略5: 清理后重试
-        try:
-            # 移除可能的 BOM 和控制字符
-            cleaned = text.encode("utf-8", errors="ignore").decode("utf-8")
-            # 移除单行注释
-            cleaned = re.sub(r"//.*?$", "", cleaned, flags=re.MULTILINE)
-            # 移除多行注释
-            cleaned = re.sub(r"/\*.*?\*/", "", cleaned, flags=re.DOTALL)
-            # 提取 JSON
-            obj_match = re.search(r"\{(?:[^{}]|(?:\{[^{}]*\}))*\}", cleaned, re.DOTALL)
-            if obj_match:
-                result = json.loads(obj_match.group())
-                if isinstance(result, dict):
-                    return result
-        except (json.JSONDecodeError, Exception):
-            pass
+        # 策略2: 单遍容错解析（Markdown 围栏、前后说明文字、注释、尾逗号、引号）
+        result, truncated = parse_json_tolerant(text)
+        if truncated:
+            logger.warning(f"️ [JSON解析] 输出被截断，不作为完整结果使用 | context={context} | len={len(text)}")
+            result = None
+        if not expect_dict and isinstance(result, list):
+            return result
+        final = _ensure_dict(result)
+        if final is not None:
+            return final
 
         #  [Bug修复] 所有策略失败时，针对不同上下文使用合适的日志级别
         # 查询扩展等有降级机制的场景使用debug级别，避免误报警告
@@ -6335,6 +6244,7 @@ class UcpptSearchEngine:
         all_sources: List[Dict[str, Any]] = []
         rounds: List[SearchRoundState] = []
         seen_urls: set = set()  #  [Bug修复] 初始化seen_urls集合，避免延展搜索时变量未定义错误
+        early_search: Optional[EarlySearchHandle] = None  # 流水线分析提前启动的首轮搜索
 
         try:
             # ==================== Phase 0: v7.214 结构化问题分析检查 ====================
@@ -6402,6 +6312,11 @@ class UcpptSearchEngine:
                             elif event_type == "analysis_progress":
                                 yield event
 
+                            # 流水线分析：搜索方向板块已完成，首轮搜索在后台进行
+                            elif event_type == "early_search_started":
+                                early_search = event.get("_internal_early_search")
+                                yield {"type": "early_search_started", "data": event.get("data")}
+
                             # 结构化信息就绪
                             elif event_type == "structured_info_ready":
                                 event.get("_internal_data")
@@ -6603,6 +6518,29 @@ class UcpptSearchEngine:
             if framework is None:
                 framework = self._build_simple_search_framework(query)
 
+            # 流水线分析：回收提前启动的首轮搜索结果，作为后续目标搜索的起点
+            if early_search:
+                early_sources = await early_search.collect(EARLY_SEARCH_WAIT_TIMEOUT)
+                added = 0
+                for source in early_sources:
+                    url = source.get("url", "")
+                    if url and url not in seen_urls:
+                        seen_urls.add(url)
+                        all_sources.append(source)
+                        added += 1
+                logger.info(
+                    f" [流水线分析] 首轮搜索回收 | queries={len(early_search.queries)} | sources={added} "
+                    f"| 自启动={time.time() - early_search.started_at:.1f}s"
+                )
+                yield {
+                    "type": "early_search_ready",
+                    "data": {
+                        **early_search.to_dict(),
+                        "source_count": added,
+                        "message": f"首轮搜索已完成，获得 {added} 条来源",
+                    },
+                }
+
             # v7.220: 使用新的 SearchFramework 结构
             # 推送分析结果（包含搜索目标清单）
             # v7.232: 添加预设关键词信息
@@ -6792,6 +6730,9 @@ class UcpptSearchEngine:
         except Exception as e:
             logger.error(f" [Ucppt] 搜索失败: {e}", exc_info=True)
             yield {"type": "error", "data": {"message": str(e)}}
+        finally:
+            if early_search:
+                early_search.cancel()
 
     # ==================== 统一分析 (v7.207 合并 L0 + L1-L5) ====================
 
@@ -6808,7 +6749,7 @@ class UcpptSearchEngine:
         from datetime import datetime
         from pathlib import Path
 
-        import yaml
+        from ..core.config_registry import load_yaml_config
 
         # 尝试加载YAML配置
         try:
@@ -6818,8 +6759,7 @@ class UcpptSearchEngine:
                 logger.warning(f"️ [v7.302.1] YAML配置文件不存在: {config_path}")
                 return self._build_dialogue_analysis_prompt_fallback(query, context)
 
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
+            config = load_yaml_config(config_path)
 
             #  使用 dialogue_prompt_template 而不是 task_description_template
             dialogue_template = config.get("dialogue_prompt_template", "")
@@ -7300,6 +7240,64 @@ class UcpptSearchEngine:
 
 请只输出JSON，不要有其他内容。"""
 
+    # ==================== 流水线分析：搜索方向板块完成即启动首轮搜索 ====================
+
+    SEARCH_DIRECTION_HEADINGS = ("我们的分析维度", "解题思路", "搜索方向提示")
+
+    def _is_search_direction_section(self, heading: str) -> bool:
+        return any(marker in heading for marker in self.SEARCH_DIRECTION_HEADINGS)
+
+    def _extract_search_directions(self, body: str) -> List[str]:
+        """从搜索方向板块正文提取方向（优先列表项，其次按分隔符切分行内文本）"""
+        directions = extract_list_items(body, limit=EARLY_SEARCH_MAX_QUERIES)
+        if not directions:
+            parts = re.split(r"[，,；;、\n]", body)
+            directions = [p.strip() for p in parts if len(p.strip()) >= 2][:EARLY_SEARCH_MAX_QUERIES]
+        return directions
+
+    def _build_early_search_queries(self, query: str, directions: List[str]) -> List[str]:
+        """方向名 + 问题核心 → 首轮搜索词，过滤无效与重复查询"""
+        core = query.strip()[:30]
+        queries = []
+        for direction in directions:
+            # "品牌DNA解析：说明" 取冒号前；"维度1：品牌DNA解析" 取冒号后
+            parts = re.split(r"[：:]", direction, maxsplit=1)
+            head, tail = parts[0].strip(), parts[-1].strip() if len(parts) > 1 else ""
+            focus = tail if tail and re.fullmatch(r"(?:维度|方向|板块)?\s*\d+", head) else (head or direction)
+            candidate = f"{core} {focus[:30]}"
+            if not self._validate_search_query(candidate, context="early_search"):
+                continue
+            if candidate in queries or self._is_duplicate_query(candidate)[0]:
+                continue
+            queries.append(candidate)
+        return queries
+
+    def _start_early_search(self, query: str, heading: str, body: str) -> Optional[EarlySearchHandle]:
+        """
+        搜索方向板块完成时调用：生成首轮搜索词并在后台并行搜索，分析流继续输出后续板块
+        """
+        directions = self._extract_search_directions(body)
+        queries = self._build_early_search_queries(query, directions)
+        if not queries:
+            logger.info(f" [流水线分析] 板块「{heading}」未提取到可用搜索方向，跳过提前搜索")
+            return None
+
+        for q in queries:
+            self._record_query(q)
+
+        task = asyncio.create_task(self._execute_parallel_search(queries))
+        # 调用方未回收时也不留下 "exception was never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        logger.info(f" [流水线分析] 板块「{heading}」已完成，提前启动 {len(queries)} 个首轮搜索")
+        return EarlySearchHandle(section=heading, directions=directions, queries=queries, task=task)
+
+    def _early_search_started_event(self, early_search: EarlySearchHandle) -> Dict[str, Any]:
+        return {
+            "type": "early_search_started",
+            "data": {**early_search.to_dict(), "message": f"搜索方向已确定，提前开始 {len(early_search.queries)} 个首轮搜索..."},
+            "_internal_early_search": early_search,
+        }
+
     async def _unified_analysis_stream(
         self,
         query: str,
@@ -7330,6 +7328,10 @@ class UcpptSearchEngine:
             "## 解题思路",
         ]
 
+        # 流水线分析：搜索方向板块一结束就提前启动首轮搜索
+        section_tracker = StreamSectionTracker() if PIPELINED_ANALYSIS_ENABLED else None
+        early_search: Optional[EarlySearchHandle] = None
+
         try:
             # ==================== 第一次调用：按4使命格式流式输出 ====================
             dialogue_prompt = self._build_dialogue_analysis_prompt(query, context)
@@ -7373,6 +7375,23 @@ class UcpptSearchEngine:
                 if current_section > 0:
                     section_contents[current_section - 1] += chunk_text
 
+                if section_tracker and not early_search:
+                    for heading, body in section_tracker.feed(chunk_text):
+                        if self._is_search_direction_section(heading):
+                            early_search = self._start_early_search(query, heading, body)
+                            if early_search:
+                                yield self._early_search_started_event(early_search)
+                                break
+
+            # 搜索方向板块位于末尾时，流结束即启动（仍与第二步框架生成并行）
+            if section_tracker and not early_search:
+                for heading, body in section_tracker.finish():
+                    if self._is_search_direction_section(heading):
+                        early_search = self._start_early_search(query, heading, body)
+                        if early_search:
+                            yield self._early_search_started_event(early_search)
+                            break
+
             # v7.310: 流式输出完成
             yield {
                 "type": "two_sections_stream_complete",
@@ -7836,7 +7855,7 @@ class UcpptSearchEngine:
         from datetime import datetime
         from pathlib import Path
 
-        import yaml
+        from ..core.config_registry import load_yaml_config
 
         try:
             config_path = Path(__file__).parent.parent / "config" / "prompts" / "search_question_analysis.yaml"
@@ -7845,8 +7864,7 @@ class UcpptSearchEngine:
                 logger.warning("️ [v7.302.1] YAML配置文件不存在，使用内置prompt")
                 return self._build_json_extraction_prompt_fallback(query, dialogue_content, context)
 
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
+            config = load_yaml_config(config_path)
 
             #  优先使用 json_extraction_prompt_template
             json_template = config.get("json_extraction_prompt_template", "")
@@ -8429,6 +8447,7 @@ class UcpptSearchEngine:
 
             yield {"event": "output_framework_ready", "framework": self._framework_to_dict(output_framework)}
 
+            # 本流程尚无步骤 2-4 可消费首轮搜索结果，因此不启动流水线首轮搜索（见 search_deep）
             yield {"event": "step1_complete", "message": "深度分析完成", "output_framework": output_framework}
 
         except Exception as e:
@@ -10725,7 +10744,7 @@ L3张力: {json.dumps(analysis_excerpt["l3_tension"], ensure_ascii=False)[:300]}
         }
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with httpx.AsyncClient(timeout=60.0, transport=gated_async_transport("openrouter")) as client:
                 async with client.stream(
                     "POST",
                     f"{self.openrouter_base_url}/chat/completions",
@@ -15928,7 +15947,7 @@ L4搜索任务: {l4_task if l4_task else '无'}
             "temperature": 0.3,
         }
 
-        async with httpx.AsyncClient(timeout=120) as client:
+        async with httpx.AsyncClient(timeout=120, transport=gated_async_transport("openrouter")) as client:
             response = await client.post(
                 f"{self.openrouter_base_url}/chat/completions",
                 headers=headers,
@@ -15970,7 +15989,7 @@ L4搜索任务: {l4_task if l4_task else '无'}
         }
 
         try:
-            async with httpx.AsyncClient(timeout=180) as client:
+            async with httpx.AsyncClient(timeout=180, transport=gated_async_transport("openrouter")) as client:
                 async with client.stream(
                     "POST",
                     f"{self.openrouter_base_url}/chat/completions",
@@ -16042,7 +16061,7 @@ L4搜索任务: {l4_task if l4_task else '无'}
         }
 
         try:
-            async with httpx.AsyncClient(timeout=300) as client:
+            async with httpx.AsyncClient(timeout=300, transport=gated_async_transport("openrouter")) as client:
                 async with client.stream(
                     "POST",
                     f"{self.openrouter_base_url}/chat/completions",
@@ -16123,7 +16142,7 @@ L4搜索任务: {l4_task if l4_task else '无'}
             "temperature": 0.3,
         }
 
-        async with httpx.AsyncClient(timeout=60) as client:
+        async with httpx.AsyncClient(timeout=60, transport=gated_async_transport("openrouter")) as client:
             response = await client.post(
                 f"{self.openrouter_base_url}/chat/completions",
                 headers=headers,
@@ -16155,7 +16174,7 @@ L4搜索任务: {l4_task if l4_task else '无'}
             "stream": True,
         }
 
-        async with httpx.AsyncClient(timeout=120) as client:
+        async with httpx.AsyncClient(timeout=120, transport=gated_async_transport("openrouter")) as client:
             async with client.stream(
                 "POST",
                 f"{self.openrouter_base_url}/chat/completions",
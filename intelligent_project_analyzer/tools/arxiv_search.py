@@ -18,6 +18,7 @@ except ImportError:
     arxiv = None
 
 from ..core.types import ToolConfig
+from ..services.execution_timeline import traced
 
 # LangChain Tool integration
 try:
@@ -76,6 +77,7 @@ class ArxivSearchTool:
         self.query_builder = DeliverableQueryBuilder() if DeliverableQueryBuilder else None
         self.qc = SearchQualityControl() if SearchQualityControl else None
 
+    @traced("search", "arxiv.search")
     def search(
         self,
         query: str,
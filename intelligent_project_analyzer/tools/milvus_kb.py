@@ -11,13 +11,15 @@ Milvus 向量数据库知识库工具 (v7.141+)
 """
 
 import json
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import jieba
 from loguru import logger
 
 from ..core.types import ToolConfig
+from ..services.execution_timeline import traced
 
 # Milvus imports
 try:
@@ -56,6 +58,36 @@ except ImportError:
     add_ids_to_search_results = None
 
 
+# ==================== 模型缓存 ====================
+# Embedding / Reranker 模型加载耗时数秒到数十秒：进程内按模型名共享，首次使用（或启动后台预热）时才加载
+_models: Dict[Tuple[str, str], Any] = {}
+_models_lock = threading.Lock()
+
+
+def get_shared_model(kind: str, model_name: str) -> Any:
+    """
+    获取进程内共享的模型实例（kind: embedding / reranker），首次调用时加载
+
+    加载失败抛出异常，不缓存失败结果。
+    """
+    key = (kind, model_name)
+    with _models_lock:
+        if key not in _models:
+            if kind == "embedding":
+                _models[key] = SentenceTransformer(model_name)
+            else:
+                _models[key] = CrossEncoder(model_name, max_length=512)
+        return _models[key]
+
+
+def warm_milvus_models(embedding_model_name: str, reranker_model_name: str) -> None:
+    """预加载 Embedding 与 Reranker 模型（供启动编排器的 lazy 组件调用）"""
+    if not MILVUS_AVAILABLE:
+        raise RuntimeError("pymilvus / sentence-transformers 未安装")
+    get_shared_model("embedding", embedding_model_name)
+    get_shared_model("reranker", reranker_model_name)
+
+
 # ==================== Stage 1: 查询理解与改写 ====================
 class QueryProcessor:
     """
@@ -427,7 +459,7 @@ class CrossEncoderReranker:
 
     def __init__(self, model_name: str = "BAAI/bge-reranker-v2-m3"):
         try:
-            self.model = CrossEncoder(model_name, max_length=512)
+            self.model = get_shared_model("reranker", model_name)
             logger.info(f"Reranker 模型加载成功: {model_name}")
         except Exception as e:
             logger.warning(f"Reranker 模型加载失败: {e}. 将跳过重排序阶段")
@@ -717,7 +749,7 @@ class MilvusKBTool:
         if not self.is_placeholder:
             try:
                 logger.info(f"加载 Embedding 模型: {embedding_model_name}")
-                self.embedding_model = SentenceTransformer(embedding_model_name)
+                self.embedding_model = get_shared_model("embedding", embedding_model_name)
                 logger.info("Embedding 模型加载成功")
             except Exception as e:
                 logger.error(f"Embedding 模型加载失败: {e}")
@@ -740,6 +772,7 @@ class MilvusKBTool:
 
             logger.info("Milvus KB Tool 初始化完成 (6-Stage Pipeline)")
 
+    @traced("search", "milvus.search_knowledge")
     def search_knowledge(
         self,
         query: str,
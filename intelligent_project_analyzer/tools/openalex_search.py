@@ -22,6 +22,7 @@ import httpx
 from loguru import logger
 
 from ..core.types import ToolConfig
+from ..services.execution_timeline import traced
 
 # 配置
 OPENALEX_ENABLED = os.getenv("OPENALEX_ENABLED", "true").lower() == "true"
@@ -85,6 +86,7 @@ class OpenAlexSearchTool:
 
         logger.info(f" OpenAlex 搜索工具初始化完成 (polite_pool={'yes' if OPENALEX_EMAIL else 'no'})")
 
+    @traced("search", "openalex.search")
     def search(
         self,
         query: str,
@@ -12,6 +12,7 @@ import requests
 from loguru import logger
 
 from ..core.types import ToolConfig
+from ..services.execution_timeline import traced
 
 # LangChain Tool integration
 try:
@@ -75,6 +76,7 @@ class RagflowKBTool:
         self.query_builder = DeliverableQueryBuilder() if DeliverableQueryBuilder else None
         self.qc = SearchQualityControl() if SearchQualityControl else None
 
+    @traced("search", "ragflow.search_knowledge")
     def search_knowledge(
         self,
         query: str,
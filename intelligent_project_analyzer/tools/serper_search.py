@@ -30,6 +30,7 @@ except ImportError:
     httpx = None
 
 from ..core.types import ToolConfig
+from ..services.execution_timeline import traced
 
 # LangChain Tool integration
 try:
@@ -89,6 +90,7 @@ class SerperSearchTool:
         self.query_builder = DeliverableQueryBuilder() if DeliverableQueryBuilder else None
         self.qc = SearchQualityControl() if SearchQualityControl else None
 
+    @traced("search", "serper.search")
     def search(
         self,
         query: str,
@@ -18,6 +18,7 @@ except ImportError:
     TavilyClient = None
 
 from ..core.types import ToolConfig
+from ..services.execution_timeline import traced
 from ..settings import settings
 
 # LangChain Tool integration
@@ -79,6 +80,7 @@ class TavilySearchTool:
         self.query_builder = DeliverableQueryBuilder() if DeliverableQueryBuilder else None
         self.qc = SearchQualityControl() if SearchQualityControl else None
 
+    @traced("search", "tavily.search")
     def search(
         self,
         query: str,
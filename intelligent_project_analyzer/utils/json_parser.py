@@ -9,12 +9,13 @@
 """
 
 import json
-import re
 from typing import Any, Dict, List, Optional, Type, TypeVar
 
 from loguru import logger
 from pydantic import BaseModel, ValidationError
 
+from .tolerant_json_parser import parse_json_tolerant, repair_json
+
 T = TypeVar("T", bound=BaseModel)
 
 
@@ -27,35 +28,22 @@ def extract_json_from_markdown(text: str) -> str:
     - ``` {...} ```
     - {...} (裸JSON)
 
+    使用单遍容错解析器定位并修复（尾逗号、注释等），返回可直接 json.loads 的文本；
+    被截断的输出不做补全，原样返回，由调用方按解析失败处理
+
     Args:
         text: 原始文本
 
     Returns:
-        提取的JSON字符串
+        提取的JSON字符串（未找到完整JSON时原样返回）
     """
     text = text.strip()
 
-    # 1. 尝试提取```json代码块
-    json_block_pattern = r"```(?:json)?\s*(\{[\s\S]*?\}|\[[\s\S]*?\])\s*```"
-    match = re.search(json_block_pattern, text, re.DOTALL)
-    if match:
-        logger.debug("️ 从Markdown代码块中提取JSON")
-        return match.group(1).strip()
-
-    # 2. 尝试找到第一个完整的[]或{}
-    json_arr_pattern = r"\[[\s\S]*\]"
-    match = re.search(json_arr_pattern, text, re.DOTALL)
-    if match:
-        logger.debug("️ 从文本中提取JSON数组")
-        return match.group(0).strip()
-
-    json_obj_pattern = r"\{[\s\S]*\}"
-    match = re.search(json_obj_pattern, text, re.DOTALL)
-    if match:
-        logger.debug("️ 从文本中提取JSON对象")
-        return match.group(0).strip()
-
-    # 3. 原样返回
+    repaired = repair_json(text, allow_truncated=False)
+    if repaired is not None:
+        logger.debug("️ 从文本中提取JSON")
+        return repaired
+
     return text
 
 
@@ -103,9 +91,19 @@ def parse_json_safe(
         logger.warning(f"️ JSON解析输入无效: {type(text)}")
         return default
 
-    # 1. 提取JSON
+    # 1. 提取 + 修复 + 解析一次完成（Markdown 围栏、尾逗号、注释、全角引号定界符）
+    #    被截断的输出（max_tokens 用尽等）不补全成看似完整的对象，按解析失败返回 default
     if extract_from_markdown:
-        text = extract_json_from_markdown(text)
+        result, truncated = parse_json_tolerant(text, tolerant_quotes=fix_quotes)
+        if result is not None and not truncated:
+            logger.debug(" JSON解析成功")
+            return result
+        if truncated:
+            logger.warning(f"️ JSON解析失败: 输出被截断，不作为完整结果使用 | len={len(text)}")
+        else:
+            logger.warning("️ JSON解析失败: 未找到可修复的JSON")
+        logger.debug(f"原始文本: {text[:200]}...")
+        return default
 
     # 2. 修复引号
     if fix_quotes:
@@ -0,0 +1,202 @@
+"""
+编译型多模式关键词匹配器（Aho-Corasick）
+
+项目类型检测、设计模式检测、内容安全、领域分类、维度选择过去都是对成百上千个关键词
+逐个执行 ``kw in text``，每次检测的开销是 O(关键词数 × 文本长度)。本模块把关键词集
+一次性编译成 Aho-Corasick 自动机，单次扫描文本即可返回全部命中（含重叠命中）及位置，
+开销只与文本长度和命中数相关。
+
+- 纯 Python 实现，不引入额外依赖
+- ignore_case=True 时关键词与文本统一 lower()，位置相对于 lower() 后的文本
+- 空关键词忽略（旧实现中 ``"" in text`` 恒为 True，属于配置错误）
+- get_cached_matcher() 按数据源对象身份缓存编译结果，数据源替换（热重载）或 token 变化时自动重建
+
+Example:
+    >>> matcher = KeywordMatcher.from_groups({"餐饮": ["咖啡", "咖啡馆"], "住宅": ["别墅"]})
+    >>> matcher.match_groups("海边咖啡馆")
+    {'餐饮': [0, 1]}
+"""
+
+import hashlib
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    """一次关键词命中（start/end 为文本切片区间）"""
+
+    start: int
+    end: int
+    keyword: str
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 多模式匹配器
+
+    Args:
+        entries: (关键词, 负载) 序列；同一关键词可出现多次，负载按出现顺序保留
+        ignore_case: 是否忽略大小写
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]] = (), ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self._payloads: Dict[str, List[Any]] = {}
+        for keyword, payload in entries:
+            if not keyword:
+                continue
+            key = keyword.lower() if ignore_case else keyword
+            self._payloads.setdefault(key, []).append(payload)
+
+        self._keywords: List[str] = list(self._payloads)
+        # 关键词集签名：用于判断其他阶段预先算好的命中结果是否来自同一份关键词集
+        self.signature = hashlib.sha1(
+            ("i" if ignore_case else "s").encode("utf-8") + "\n".join(sorted(self._keywords)).encode("utf-8")
+        ).hexdigest()[:16]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._compile()
+
+    @classmethod
+    def from_groups(cls, groups: Mapping[Hashable, Iterable[str]], ignore_case: bool = False) -> "KeywordMatcher":
+        """按分组构建，负载为 (分组键, 关键词在组内的下标)"""
+        return cls(
+            ((keyword, (group, index)) for group, keywords in groups.items() for index, keyword in enumerate(keywords)),
+            ignore_case=ignore_case,
+        )
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    @property
+    def keywords(self) -> List[str]:
+        return list(self._keywords)
+
+    def payloads(self, keyword: str) -> List[Any]:
+        key = keyword.lower() if self.ignore_case else keyword
+        return list(self._payloads.get(key, ()))
+
+    def _compile(self) -> None:
+        goto, fail, output = self._goto, self._fail, self._output
+
+        for keyword_id, keyword in enumerate(self._keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    output.append(())
+                state = nxt
+            output[state] = output[state] + (keyword_id,)
+
+        # BFS 计算失败指针，并把后缀状态的输出合并进来（字典后缀链展开）
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if output[fail[nxt]]:
+                    output[nxt] = output[nxt] + output[fail[nxt]]
+
+    def iter_hits(self, text: str) -> Iterator[KeywordHit]:
+        """单次扫描产出全部命中（按结束位置升序，同一结束位置长词在前）"""
+        if not text or not self._keywords:
+            return
+        if self.ignore_case:
+            text = text.lower()
+        goto, fail, output, keywords = self._goto, self._fail, self._output, self._keywords
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                end = index + 1
+                for keyword_id in output[state]:
+                    keyword = keywords[keyword_id]
+                    yield KeywordHit(end - len(keyword), end, keyword)
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        return list(self.iter_hits(text))
+
+    def first_positions(self, text: str) -> Dict[str, int]:
+        """每个命中关键词的首次出现位置（等价于 text.find(kw)）"""
+        positions: Dict[str, int] = {}
+        for hit in self.iter_hits(text):
+            if hit.keyword not in positions:
+                positions[hit.keyword] = hit.start
+        return positions
+
+    def resolve_positions(self, text: str, features: Any = None, source: str = "") -> Dict[str, int]:
+        """
+        优先复用输入特征阶段（services/input_features.py）的扫描结果，文本或关键词集签名不一致时重新扫描
+        """
+        if features is not None:
+            positions = features.keyword_positions(source, self, text)
+            if positions is not None:
+                return positions
+        return self.first_positions(text)
+
+    def match_groups(self, text: str, positions: Optional[Dict[str, int]] = None) -> Dict[Hashable, List[int]]:
+        """
+        from_groups() 构建的匹配器：返回 {分组键: 命中关键词的组内下标（升序）}
+
+        与逐个 ``kw in text`` 的结果一致，组内重复的关键词各自计一次。
+        """
+        if positions is None:
+            positions = self.first_positions(text)
+        groups: Dict[Hashable, List[int]] = {}
+        for keyword in positions:
+            for group, index in self._payloads[keyword]:
+                groups.setdefault(group, []).append(index)
+        for indexes in groups.values():
+            indexes.sort()
+        return groups
+
+
+_CACHE_MAX_SIZE = 64
+_matcher_cache: Dict[Tuple[int, Any], Tuple[Any, Any, KeywordMatcher]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_cached_matcher(
+    source: Any, builder: Callable[[Any], KeywordMatcher], token: Optional[Hashable] = None
+) -> KeywordMatcher:
+    """
+    获取按数据源缓存的匹配器
+
+    缓存键为 (id(source), builder)，并持有 source 引用以保证身份有效。配置热重载会替换
+    数据源对象（或改变 token，如规则版本号），下一次调用即自动重新编译。
+
+    Args:
+        source: 关键词数据源（注册表 / 规则字典等）
+        builder: 由数据源构建匹配器的函数
+        token: 额外的失效标记（原地修改数据源时递增）
+    """
+    key = (id(source), builder)
+    cached = _matcher_cache.get(key)
+    if cached is not None and cached[0] is source and cached[1] == token:
+        return cached[2]
+
+    matcher = builder(source)
+    with _cache_lock:
+        if len(_matcher_cache) >= _CACHE_MAX_SIZE:
+            _matcher_cache.pop(next(iter(_matcher_cache)))
+        _matcher_cache[key] = (source, token, matcher)
+    return matcher
+
+
+def clear_matcher_cache() -> None:
+    with _cache_lock:
+        _matcher_cache.clear()
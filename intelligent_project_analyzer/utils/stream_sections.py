@@ -0,0 +1,121 @@
+"""
+流式 Markdown 板块追踪器
+
+LLM 的分析文本是按板块输出的（**【标题】**、## / ### 标题、**加粗标签**：），
+过去只能等整段生成结束后再用正则切分板块。本模块按行增量追踪板块边界，
+某个板块一结束（出现同级或更高级标题、分隔线 ---）就立即返回其完整内容，
+下游可以在后续板块仍在生成时提前开始工作。
+
+标题层级（数字越小越高）：
+- **【标题】**      → 1
+- # ~ ###### 标题  → 1 ~ 6
+- **标签**：内容    → 7（行内剩余部分作为板块正文的第一行）
+
+Example:
+    >>> tracker = StreamSectionTracker()
+    >>> for chunk in llm_stream:
+    ...     for heading, body in tracker.feed(chunk):
+    ...         if heading == "我们的分析维度":
+    ...             start_search(body)
+    >>> tail = tracker.finish()
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+_BRACKET_HEADING_RE = re.compile(r"^\*\*【(.+?)】\*\*\s*$")
+_ATX_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_BOLD_LABEL_RE = re.compile(r"^\*\*([^*\n]{1,30}?)\*\*\s*[：:]?\s*(.*)$")
+_RULE_RE = re.compile(r"^(?:-{3,}|\*{3,}|_{3,})\s*$")
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[-•]|\*(?=\s)|\d+[.、)]|\d+️⃣)\s*(.+)$")
+_BOLD_LIST_ITEM_RE = re.compile(r"^\*\*(.+?)\*\*")
+
+_LABEL_LEVEL = 7
+
+
+class StreamSectionTracker:
+    """
+    增量板块追踪器
+
+    feed() 接收任意切分的文本块，只处理已完整的行；返回本次调用中结束的板块
+    [(标题, 正文), ...]，内层板块先于外层板块返回。finish() 关闭所有未结束板块。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._open: List[Tuple[int, str, List[str]]] = []  # (层级, 标题, 正文行)
+        self.completed: List[Tuple[str, str]] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        if not chunk:
+            return []
+        self._buffer += chunk
+        closed: List[Tuple[str, str]] = []
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            closed.extend(self._consume_line(line.rstrip("\r")))
+        return closed
+
+    def finish(self) -> List[Tuple[str, str]]:
+        closed: List[Tuple[str, str]] = []
+        if self._buffer:
+            closed.extend(self._consume_line(self._buffer))
+            self._buffer = ""
+        closed.extend(self._close_from(0))
+        return closed
+
+    def _consume_line(self, line: str) -> List[Tuple[str, str]]:
+        stripped = line.strip()
+        heading = self._match_heading(stripped)
+        if heading is None:
+            if _RULE_RE.match(stripped):
+                return self._close_from(0)
+            for _, _, lines in self._open:
+                lines.append(line)
+            return []
+
+        level, title, rest = heading
+        closed = self._close_from(level)
+        for _, _, lines in self._open:
+            lines.append(line)
+        self._open.append((level, title, [rest] if rest else []))
+        return closed
+
+    def _match_heading(self, stripped: str) -> Optional[Tuple[int, str, str]]:
+        match = _BRACKET_HEADING_RE.match(stripped)
+        if match:
+            return 1, match.group(1).strip(), ""
+        match = _ATX_HEADING_RE.match(stripped)
+        if match:
+            return len(match.group(1)), match.group(2).strip(), ""
+        match = _BOLD_LABEL_RE.match(stripped)
+        if match:
+            return _LABEL_LEVEL, match.group(1).strip(), match.group(2).strip()
+        return None
+
+    def _close_from(self, level: int) -> List[Tuple[str, str]]:
+        """关闭所有层级 >= level 的板块（level=0 关闭全部）"""
+        closed: List[Tuple[str, str]] = []
+        while self._open and self._open[-1][0] >= level:
+            _, title, lines = self._open.pop()
+            section = (title, "\n".join(lines).strip())
+            closed.append(section)
+            self.completed.append(section)
+        return closed
+
+
+def extract_list_items(body: str, limit: Optional[int] = None) -> List[str]:
+    """
+    提取板块正文中的列表项（- / • / 1. / 1️⃣ / **加粗标题**），去掉方括号占位与加粗标记
+    """
+    items: List[str] = []
+    for line in body.splitlines():
+        match = _LIST_ITEM_RE.match(line) or _BOLD_LIST_ITEM_RE.match(line.strip())
+        if not match:
+            continue
+        item = match.group(1).replace("**", "").strip().strip("[]【】").strip()
+        if item:
+            items.append(item)
+        if limit and len(items) >= limit:
+            break
+    return items
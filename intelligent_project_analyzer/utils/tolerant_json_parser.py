@@ -0,0 +1,385 @@
+"""
+单遍容错 JSON 解析器
+
+各调用点（_safe_parse_json、_try_parse_json_with_fixes、extract_json_from_markdown 等）
+过去会对 LLM 输出的全文反复执行正则提取与修复。本模块用一个逐字符状态机一次完成：
+
+1. 定位：跳过 Markdown 围栏与前后说明文字，从第一个合法的 { 或 [ 开始
+2. 修复：尾逗号、缺失逗号/冒号、// 与 /* */ 注释、全角引号与单引号作定界符（Python dict 风格输出）、
+   字符串内裸换行与非法转义、Python 字面量 (True/False/None)、
+   未加引号的键（首个键须带引号，避免把正文里的 {占位符} 当成 JSON）
+3. 截断识别：输入结束时仍未闭合则补全字符串/容器与缺失的值，并标记为截断；
+   LLM 调用点应使用 allow_truncated=False（或检查 parse_json_tolerant 返回的截断标记），
+   避免把被 max_tokens 截断的半截输出当作完整结果
+
+Example:
+    >>> data, truncated = parse_json_tolerant(llm_output)
+    >>> data = parse_partial_json(llm_output, allow_truncated=False)
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_SMART_OPEN_QUOTES = "“„‟«"
+_SMART_QUOTES = "“”„‟«»"
+_SINGLE_QUOTE = "'"
+_VALID_ESCAPES = '"\\/bfnrtu'
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+_LITERAL_DELIMITERS = set(',:{}[]"') | set(_SMART_QUOTES)
+_PY_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+
+# 容器状态
+_KEY = "key"  # 对象：等待键或 }
+_COLON = "colon"  # 对象：已有键，等待 :
+_VALUE = "value"  # 等待值（数组中也可以是 ]）
+_COMMA = "comma"  # 值已结束，等待 , 或闭合
+
+
+class _Frame:
+    __slots__ = ("kind", "state")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.state = _KEY if kind == "{" else _VALUE
+
+
+class _TolerantJSONParser:
+    """
+    容错 JSON 状态机（一次性使用：consume 全文后调用 finish / finish_text）
+
+    Args:
+        tolerant_quotes: 是否把全角/花体引号及单引号视为字符串定界符
+
+    Attributes:
+        truncated: finish() 时输入尚未闭合、结果经过截断补全
+    """
+
+    def __init__(self, tolerant_quotes: bool = True):
+        self.tolerant_quotes = tolerant_quotes
+        self.root_kind: Optional[str] = None
+        self.done = False
+        self.truncated = False
+
+        self._out: List[str] = []
+        self._stack: List[_Frame] = []
+        self._probing = False  # 根容器刚打开，等待第一个有效字符确认不是正文中的括号
+
+        self._in_string = False
+        self._string_is_key = False
+        self._string_smart = False
+        self._string_single = False
+        self._escape = False
+
+        self._literal: Optional[List[str]] = None
+        self._comment: Optional[str] = None
+        self._comment_prev = ""
+        self._pending_slash = False
+
+    # ------------------------------------------------------------------ 公共接口
+
+    @property
+    def started(self) -> bool:
+        return self.root_kind is not None
+
+    def consume(self, text: str) -> None:
+        """消费文本，根容器闭合后忽略其余内容"""
+        for ch in text:
+            if self.done:
+                return
+            self._consume(ch)
+
+    def finish(self) -> Any:
+        """结束输入：补全被截断的部分并返回完整值（从未出现 JSON 时返回 None）"""
+        text = self.finish_text()
+        if text is None:
+            return None
+        try:
+            return json.loads(text, strict=False)
+        except json.JSONDecodeError:
+            return None
+
+    def finish_text(self) -> Optional[str]:
+        """结束输入并返回修复后的 JSON 文本"""
+        if not self.started:
+            return None
+        if not self.done:
+            self.truncated = True
+            self._pending_slash = False
+            if self._comment is None:
+                if self._literal is not None:
+                    self._end_literal()
+                if self._in_string:
+                    self._escape = False
+                    self._drop_partial_unicode_escape()
+                    self._close_string()
+            while self._stack:
+                self._close_container(self._stack[-1].kind)
+            self.done = True
+        return "".join(self._out)
+
+    # ------------------------------------------------------------------ 状态机
+
+    def _drop_partial_unicode_escape(self) -> None:
+        """截断在 \\uXXXX 中间时丢弃不完整的转义"""
+        for back in range(1, 5):
+            if len(self._out) < back:
+                return
+            piece = self._out[-back]
+            if piece == "\\u":
+                del self._out[-back:]
+                return
+            if len(piece) != 1 or piece not in "0123456789abcdefABCDEF":
+                return
+
+    def _consume(self, ch: str) -> None:
+        if self._in_string:
+            self._consume_string_char(ch)
+            return
+
+        if self._comment is not None:
+            if self._comment == "line" and ch == "\n":
+                self._comment = None
+            elif self._comment == "block" and self._comment_prev == "*" and ch == "/":
+                self._comment = None
+            self._comment_prev = ch
+            return
+
+        if self._pending_slash:
+            self._pending_slash = False
+            if ch == "/":
+                self._comment, self._comment_prev = "line", ""
+                return
+            if ch == "*":
+                self._comment, self._comment_prev = "block", ""
+                return
+
+        if self._literal is not None:
+            if ch.isspace() or ch in _LITERAL_DELIMITERS:
+                self._end_literal()
+            else:
+                self._literal.append(ch)
+                return
+
+        if not self._stack:
+            if ch in "{[":
+                self._open_root(ch)
+            return
+
+        if ch.isspace():
+            return
+
+        if self._probing and not self._probe_ok(ch):
+            self._reset_root()
+            if ch in "{[":
+                self._open_root(ch)
+            return
+        self._probing = False
+
+        frame = self._stack[-1]
+        if ch == '"':
+            self._open_string(frame)
+        elif self.tolerant_quotes and ch in _SMART_QUOTES:
+            self._open_string(frame, smart=True)
+        elif self.tolerant_quotes and ch == _SINGLE_QUOTE:
+            self._open_string(frame, single=True)
+        elif ch in "{[":
+            if self._begin_value(frame):
+                self._stack.append(_Frame(ch))
+                self._out.append(ch)
+        elif ch in "}]":
+            self._close_container(frame.kind)
+        elif ch == ":":
+            if frame.kind == "{" and frame.state == _COLON:
+                self._out.append(":")
+                frame.state = _VALUE
+        elif ch == ",":
+            if frame.state == _COMMA:
+                self._out.append(",")
+                frame.state = _KEY if frame.kind == "{" else _VALUE
+        elif ch == "/":
+            self._pending_slash = True
+        else:
+            self._literal = [ch]
+
+    def _probe_ok(self, ch: str) -> bool:
+        quotes = _SMART_OPEN_QUOTES + _SINGLE_QUOTE if self.tolerant_quotes else ""
+        if self.root_kind == "{":
+            return ch in '}"' or ch in quotes
+        return ch in "]{[\"-" or ch.isdigit() or ch in "tfnTFN" or ch in quotes
+
+    def _open_root(self, ch: str) -> None:
+        self.root_kind = ch
+        self._stack.append(_Frame(ch))
+        self._out.append(ch)
+        self._probing = True
+
+    def _reset_root(self) -> None:
+        self.root_kind = None
+        self._stack.clear()
+        self._out.clear()
+        self._probing = False
+
+    def _begin_value(self, frame: _Frame, as_key: bool = False) -> bool:
+        """在当前容器中开始一个新的键/值，必要时补逗号或冒号；返回 False 表示该位置不接受值"""
+        if frame.state == _COMMA:
+            self._out.append(",")
+            frame.state = _KEY if frame.kind == "{" else _VALUE
+        if frame.kind == "{":
+            if frame.state == _KEY:
+                return as_key
+            if frame.state == _COLON:
+                self._out.append(":")
+                frame.state = _VALUE
+            return not as_key or frame.state == _KEY
+        return frame.state == _VALUE
+
+    def _open_string(self, frame: _Frame, smart: bool = False, single: bool = False) -> None:
+        is_key = frame.kind == "{" and frame.state in (_KEY, _COMMA)
+        if not self._begin_value(frame, as_key=is_key):
+            return
+        self._in_string = True
+        self._string_is_key = is_key
+        self._string_smart = smart
+        self._string_single = single
+        self._out.append('"')
+
+    def _consume_string_char(self, ch: str) -> None:
+        if self._escape:
+            self._escape = False
+            if ch == _SINGLE_QUOTE and self._string_single:
+                self._out.append(ch)
+            else:
+                self._out.append("\\" + ch if ch in _VALID_ESCAPES else "\\\\" + ch)
+            return
+        if ch == "\\":
+            self._escape = True
+        elif self._string_single:
+            if ch == _SINGLE_QUOTE:
+                self._close_string()
+            else:
+                self._out.append(_escape_char(ch))
+        elif ch == '"' and not self._string_smart:
+            self._close_string()
+        elif self._string_smart and ch in _SMART_QUOTES:
+            self._close_string()
+        else:
+            self._out.append(_escape_char(ch))
+
+    def _close_string(self) -> None:
+        self._in_string = False
+        self._out.append('"')
+        frame = self._stack[-1]
+        if self._string_is_key:
+            frame.state = _COLON
+        else:
+            self._value_done()
+
+    def _end_literal(self) -> None:
+        token = "".join(self._literal).strip()
+        self._literal = None
+        frame = self._stack[-1]
+        is_key = frame.kind == "{" and frame.state in (_KEY, _COMMA)
+        if not self._begin_value(frame, as_key=is_key):
+            return
+        if is_key:
+            self._out.append(json.dumps(token, ensure_ascii=False))
+            frame.state = _COLON
+            return
+        if token in _PY_LITERALS:
+            self._out.append(_PY_LITERALS[token])
+        elif _NUMBER_RE.fullmatch(token):
+            self._out.append(token)
+        else:
+            match = _NUMBER_RE.match(token)
+            # 截断的数字（如 "0." / "1e"）保留可解析前缀，其余未加引号的文本按字符串处理
+            if match and not token[match.end() :].strip(".eE+-"):
+                self._out.append(match.group())
+            else:
+                self._out.append(json.dumps(token, ensure_ascii=False))
+        self._value_done()
+
+    def _close_container(self, closer: str) -> None:
+        frame = self._stack[-1]
+        if frame.kind == "{":
+            if frame.state == _COLON:
+                self._out.append(":null")
+            elif frame.state == _VALUE:
+                self._out.append("null")
+        if self._out and self._out[-1] == ",":
+            self._out.pop()
+        self._out.append("}" if frame.kind == "{" else "]")
+        self._stack.pop()
+        if self._stack:
+            self._value_done()
+        else:
+            self.done = True
+
+    def _value_done(self) -> None:
+        self._stack[-1].state = _COMMA
+
+
+def _escape_char(ch: str) -> str:
+    """字符串内容中的单个字符 → 合法 JSON 表示"""
+    if ch == '"':
+        return '\\"'
+    if ch in _CONTROL_ESCAPES:
+        return _CONTROL_ESCAPES[ch]
+    if ord(ch) < 0x20:
+        return f"\\u{ord(ch):04x}"
+    return ch
+
+
+def _from_fence(text: str) -> str:
+    fence = text.find("```")
+    return text[fence:] if fence >= 0 else text
+
+
+def parse_json_tolerant(text: str, tolerant_quotes: bool = True) -> Tuple[Any, bool]:
+    """
+    容错解析（可能被截断、包在 Markdown 中的）JSON
+
+    Returns:
+        (结果, 是否截断)：优先返回完整闭合的结果；只有截断补全的结果时截断标记为 True；
+        文本中没有 JSON 时返回 (None, False)
+    """
+    if not text:
+        return None, False
+    partial = None
+    sources = [_from_fence(text), text] if "```" in text else [text]
+    for source in sources:
+        parser = _TolerantJSONParser(tolerant_quotes=tolerant_quotes)
+        parser.consume(source)
+        result = parser.finish()
+        if result is None:
+            continue
+        if not parser.truncated:
+            return result, False
+        if partial is None:
+            partial = result
+    return partial, partial is not None
+
+
+def parse_partial_json(text: str, tolerant_quotes: bool = True, allow_truncated: bool = True) -> Any:
+    """
+    一次性容错解析 JSON，失败返回 None
+
+    Args:
+        allow_truncated: 为 False 时输出被截断（需要补全才能闭合）视为失败，返回 None
+    """
+    result, truncated = parse_json_tolerant(text, tolerant_quotes=tolerant_quotes)
+    return None if truncated and not allow_truncated else result
+
+
+def repair_json(text: str, tolerant_quotes: bool = True, allow_truncated: bool = True) -> Optional[str]:
+    """返回修复后的 JSON 文本；文本中没有 JSON（或截断且不允许截断）时返回 None"""
+    if not text:
+        return None
+    parser = _TolerantJSONParser(tolerant_quotes=tolerant_quotes)
+    parser.consume(_from_fence(text))
+    repaired = parser.finish_text()
+    return None if parser.truncated and not allow_truncated else repaired
+
+
+__all__ = ["parse_json_tolerant", "parse_partial_json", "repair_json"]
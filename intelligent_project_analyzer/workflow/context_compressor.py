@@ -13,11 +13,62 @@ v7.502.1 - 2026-02-10
 4.  智能截断 - 在句号处截断，避免破坏语义完整性
 
 ️ 注意: 质量 > 成本，不为节省Token牺牲专家分析质量
+
+v7.503 - Token 预算与摘要缓存
+1.  每个专家结果只摘要一次：各压缩级别的摘要在专家完成时生成，以内容指纹缓存到
+   state["context_summaries"]，后续专家直接复用（结果变化时指纹失效自动重建）
+2.  按 Token 而非字符计量（tiktoken 可用时精确计数，否则按中英文估算）
+3.  预算分配：CONTEXT_TOKEN_BUDGET 按依赖关系（BatchScheduler.get_dependencies）加权分配，
+   依赖专家可获得比批次默认级别更详细的摘要，预算不足时逐级降级
+4.  统计：每位专家的原始/压缩 Token 与节省量写入 state["context_compression_stats"]
 """
 
-from typing import Any, Dict
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
 from loguru import logger
 
+try:
+    import tiktoken
+
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# 摘要级别（由详到简），headline 为预算耗尽时的兜底（仅交付物清单）
+SUMMARY_LEVELS = ("minimal", "balanced", "aggressive", "headline")
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "12000"))
+CONTEXT_DEPENDENCY_WEIGHT = float(os.getenv("CONTEXT_DEPENDENCY_WEIGHT", "3"))
+CONTEXT_TOKENIZER_ENCODING = os.getenv("CONTEXT_TOKENIZER_ENCODING", "cl100k_base")
+
+_encoding = None
+_encoding_failed = False
+
+
+def count_tokens(text: str) -> int:
+    """
+    统计文本 Token 数
+
+    优先使用 tiktoken（编码表需可下载或已缓存），失败时按"中日韩字符 1 token、其余 4 字符 1 token"估算
+    """
+    global _encoding, _encoding_failed
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE and not _encoding_failed:
+        try:
+            if _encoding is None:
+                _encoding = tiktoken.get_encoding(CONTEXT_TOKENIZER_ENCODING)
+            return len(_encoding.encode(text, disallowed_special=()))
+        except Exception as e:
+            _encoding_failed = True
+            logger.warning(f"️ [ContextCompressor] tiktoken 编码表不可用，改用估算: {e}")
+    cjk = sum(1 for ch in text if "\u2e80" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af" or "\uff00" <= ch <= "\uffef")
+    return cjk + (len(text) - cjk + 3) // 4
+
 
 class ContextCompressor:
     """
@@ -29,7 +80,7 @@ class ContextCompressor:
     - Aggressive: 谨慎压缩（仅Batch4+使用）
     """
 
-    def __init__(self, compression_level: str = "balanced"):
+    def __init__(self, compression_level: str = "balanced", token_budget: Optional[int] = None):
         """
         初始化上下文压缩器
 
@@ -38,22 +89,47 @@ class ContextCompressor:
                 - "minimal": 不压缩，完整传递（Batch1）
                 - "balanced": 适度压缩，保留前800字符（Batch2-3）
                 - "aggressive": 激进压缩，交付物清单+示例（Batch4+）
+            token_budget: 前序专家成果的 Token 预算（默认 CONTEXT_TOKEN_BUDGET）
         """
         self.compression_level = compression_level
-        self._compression_stats = {"original_length": 0, "compressed_length": 0, "compression_ratio": 0.0}
+        self.token_budget = token_budget if token_budget is not None else CONTEXT_TOKEN_BUDGET
+        self.new_summaries: Dict[str, Dict[str, Any]] = {}  # 本次新生成（未命中缓存）的摘要，供写回 state
+        self._compression_stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            "original_length": 0,
+            "compressed_length": 0,
+            "compression_ratio": 0.0,
+            "original_tokens": 0,
+            "compressed_tokens": 0,
+            "tokens_saved": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "levels": {},
+        }
 
-    def compress_agent_results(self, agent_results: Dict[str, Any], current_role_id: str) -> str:
+    def compress_agent_results(
+        self,
+        agent_results: Dict[str, Any],
+        current_role_id: str,
+        dependencies: Optional[Iterable[str]] = None,
+        summary_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> str:
         """
          P1优化: 压缩前序专家输出
 
         策略:
-        1. 提取交付物摘要 (而非完整内容)
+        1. 提取交付物摘要 (而非完整内容)，同一结果的摘要只生成一次（summary_cache）
         2. 保留关键结论和建议
-        3. 移除冗余描述性文本
+        3. 按 Token 预算分配各前序专家的摘要级别，依赖专家优先获得详细内容
 
         Args:
             agent_results: 所有专家的执行结果
             current_role_id: 当前专家ID (用于过滤相关上下文)
+            dependencies: 当前专家依赖的角色ID（BatchScheduler.get_dependencies）
+            summary_cache: 已缓存的摘要（state["context_summaries"]），未命中时写入 new_summaries
 
         Returns:
             压缩后的上下文字符串
@@ -61,69 +137,152 @@ class ContextCompressor:
         if not agent_results:
             return ""
 
+        entries: Dict[str, Dict[str, Any]] = {}
+        for expert_id, result in agent_results.items():
+            if not isinstance(result, dict) or expert_id == current_role_id:
+                continue
+            entries[expert_id] = self._get_summary_entry(expert_id, result, summary_cache)
+
+        levels = self._allocate_levels(entries, set(dependencies or []))
+
         context_parts = []
 
-        #  向后兼容: minimal模式使用原始标题格式
-        if self.compression_level == "minimal":
+        #  向后兼容: minimal模式（且预算内全部完整传递）使用原始标题格式
+        if self.compression_level == "minimal" and all(level == "minimal" for level in levels.values()):
             context_parts.append("## 前序专家的分析成果")
             context_parts.append("**说明**: 以下是前序专家的完整分析结果，你可以参考和引用。\n")
         else:
             context_parts.append("## 前序专家分析成果 (摘要)")
             context_parts.append("**说明**: 以下是前序专家的核心结论，详细分析已省略以优化性能。\n")
 
-        for expert_id, result in agent_results.items():
-            if not isinstance(result, dict):
-                continue
-
-            # 跳过自己
-            if expert_id == current_role_id:
-                continue
-
-            expert_name = result.get("expert_name", expert_id)
-            context_parts.append(f"### {expert_name}")
-
-            # 提取结构化输出
-            structured_output = result.get("structured_output", {})
-            if structured_output:
-                summary = self._extract_structured_summary(structured_output)
-                context_parts.append(summary)
-            else:
-                # 降级: 使用 analysis 字段
-                analysis = result.get("analysis", "")
-                summary = self._extract_text_summary(analysis, expert_name)
-                context_parts.append(summary)
-
+        for expert_id, entry in entries.items():
+            context_parts.append(f"### {entry['expert_name']}")
+            context_parts.append(entry["summaries"][levels[expert_id]]["text"])
             context_parts.append("")  # 空行分隔
 
         compressed = "\n".join(context_parts)
 
         #  修复统计逻辑: 计算原始完整内容长度（v7.18传递的是完整deliverable content）
-        original_length = 0
-        for result in agent_results.values():
-            if not isinstance(result, dict):
-                continue
-
-            # 优先统计structured_output中的完整内容
-            structured_output = result.get("structured_output", {})
-            if structured_output:
-                task_report = structured_output.get("task_execution_report", {})
-                deliverable_outputs = task_report.get("deliverable_outputs", [])
-                for deliverable in deliverable_outputs:
-                    content = deliverable.get("content", "")
-                    original_length += len(content)
-            else:
-                # 降级: 统计analysis字段
-                analysis = result.get("analysis", "")
-                original_length += len(analysis)
+        original_length = sum(entry["original_length"] for entry in entries.values())
+        original_tokens = sum(entry["original_tokens"] for entry in entries.values())
+        compressed_tokens = count_tokens(compressed)
 
-        self._compression_stats["original_length"] = original_length
-        self._compression_stats["compressed_length"] = len(compressed)
+        stats = self._compression_stats
+        stats["original_length"] = original_length
+        stats["compressed_length"] = len(compressed)
         if original_length > 0:
-            self._compression_stats["compression_ratio"] = len(compressed) / original_length
+            stats["compression_ratio"] = len(compressed) / original_length
+        stats["original_tokens"] = original_tokens
+        stats["compressed_tokens"] = compressed_tokens
+        stats["tokens_saved"] = max(0, original_tokens - compressed_tokens)
+        stats["levels"] = levels
 
         return compressed
 
-    def _extract_structured_summary(self, structured_output: Dict[str, Any]) -> str:
+    def summarize_result(self, expert_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        为单个专家结果生成全部级别的摘要（可序列化，写入 state["context_summaries"]）
+
+        Returns:
+            {"fingerprint", "expert_name", "original_length", "original_tokens",
+             "summaries": {级别: {"text", "tokens"}}}
+        """
+        expert_name = result.get("expert_name", expert_id)
+        structured_output = result.get("structured_output", {})
+        analysis = result.get("analysis", "")
+
+        summaries = {}
+        for level in SUMMARY_LEVELS:
+            if level == "headline":
+                text = self._extract_headline(structured_output, analysis, expert_name)
+            elif structured_output:
+                text = self._extract_structured_summary(structured_output, level)
+            else:
+                # 降级: 使用 analysis 字段
+                text = self._extract_text_summary(analysis, expert_name, level=level)
+            summaries[level] = {"text": text, "tokens": count_tokens(text)}
+
+        original_text = self._original_text(structured_output, analysis)
+        return {
+            "fingerprint": self._fingerprint(result),
+            "expert_name": expert_name,
+            "original_length": len(original_text),
+            "original_tokens": count_tokens(original_text),
+            "summaries": summaries,
+        }
+
+    def _get_summary_entry(
+        self, expert_id: str, result: Dict[str, Any], summary_cache: Optional[Dict[str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        cached = (summary_cache or {}).get(expert_id)
+        if cached and cached.get("fingerprint") == self._fingerprint(result):
+            self._compression_stats["cache_hits"] += 1
+            return cached
+
+        self._compression_stats["cache_misses"] += 1
+        entry = self.summarize_result(expert_id, result)
+        self.new_summaries[expert_id] = entry
+        if summary_cache is not None:
+            summary_cache[expert_id] = entry
+        return entry
+
+    def _allocate_levels(self, entries: Dict[str, Dict[str, Any]], dependencies: set) -> Dict[str, str]:
+        """
+        按依赖权重分配 Token 预算，为每位前序专家选择放得下的最详细级别
+
+        - 非依赖专家以批次默认级别为上限，依赖专家可再详细一级
+        - 先分配非依赖专家，其未用完的份额顺延给依赖专家
+        - 最简级别仍超出份额时使用 headline（始终保留专家的交付物清单）
+        """
+        default_index = SUMMARY_LEVELS.index(self.compression_level) if self.compression_level in SUMMARY_LEVELS else 1
+        weights = {eid: CONTEXT_DEPENDENCY_WEIGHT if eid in dependencies else 1.0 for eid in entries}
+
+        remaining_budget = float(self.token_budget)
+        remaining_weight = sum(weights.values())
+        levels: Dict[str, str] = {}
+        for expert_id in sorted(entries, key=lambda eid: eid in dependencies):
+            share = remaining_budget * weights[expert_id] / remaining_weight if remaining_weight > 0 else 0
+            start = max(0, default_index - 1) if expert_id in dependencies else default_index
+            summaries = entries[expert_id]["summaries"]
+            level = next(
+                (lv for lv in SUMMARY_LEVELS[start:-1] if summaries[lv]["tokens"] <= share),
+                "headline",
+            )
+            levels[expert_id] = level
+            remaining_budget = max(0.0, remaining_budget - summaries[level]["tokens"])
+            remaining_weight -= weights[expert_id]
+        return levels
+
+    @staticmethod
+    def _fingerprint(result: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            [result.get("expert_name"), result.get("structured_output"), result.get("analysis")],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _original_text(structured_output: Dict[str, Any], analysis: str) -> str:
+        # 优先统计structured_output中的完整内容
+        if structured_output:
+            task_report = structured_output.get("task_execution_report", {})
+            return "".join(d.get("content", "") for d in task_report.get("deliverable_outputs", []))
+        # 降级: 统计analysis字段
+        return analysis or ""
+
+    @staticmethod
+    def _extract_headline(structured_output: Dict[str, Any], analysis: str, expert_name: str) -> str:
+        deliverable_outputs = (structured_output or {}).get("task_execution_report", {}).get("deliverable_outputs", [])
+        if deliverable_outputs:
+            names = [d.get("deliverable_name", f"交付物{i}") for i, d in enumerate(deliverable_outputs, 1)]
+            return f"**交付物清单** ({len(names)}个): {'、'.join(names)}"
+        if not analysis:
+            return f"**摘要**: {expert_name}未提供分析内容"
+        return f"**摘要**: {analysis[:60]}..." if len(analysis) > 60 else f"**摘要**: {analysis}"
+
+    def _extract_structured_summary(self, structured_output: Dict[str, Any], level: Optional[str] = None) -> str:
         """
         从结构化输出中提取摘要
 
@@ -131,7 +290,11 @@ class ContextCompressor:
         1. 交付物列表 (名称+状态)
         2. 关键结论 (如果有)
         3. 重要建议 (如果有)
+
+        Args:
+            level: 摘要级别（默认使用压缩器自身的 compression_level）
         """
+        level = level or self.compression_level
         parts = []
 
         task_report = structured_output.get("task_execution_report", {})
@@ -141,7 +304,7 @@ class ContextCompressor:
             parts.append(f"**交付物数量**: {len(deliverable_outputs)}")
 
             # 根据压缩级别决定详细程度
-            if self.compression_level == "minimal":
+            if level == "minimal":
                 #  质量优先: Minimal模式完全不压缩，传递完整内容
                 # 确保Batch1的专家能获得完整上下文，避免信息流失
                 for i, deliverable in enumerate(deliverable_outputs, 1):
@@ -155,7 +318,7 @@ class ContextCompressor:
                         #  传递完整内容（不截断）
                         parts.append(f"**内容**:\n{content}\n")
 
-            elif self.compression_level == "balanced":
+            elif level == "balanced":
                 #  适度压缩: 保留结构化信息 + 关键内容摘要
                 # Batch2专家已有一定上下文，可适度精简
                 for i, deliverable in enumerate(deliverable_outputs, 1):
@@ -199,7 +362,7 @@ class ContextCompressor:
 
         # 提取整体结论
         overall_conclusions = task_report.get("overall_conclusions", [])
-        if overall_conclusions and self.compression_level != "aggressive":
+        if overall_conclusions and level != "aggressive":
             parts.append("\n**关键结论**:")
             # 最多保留前3个结论
             for conclusion in overall_conclusions[:3]:
@@ -207,7 +370,9 @@ class ContextCompressor:
 
         return "\n".join(parts)
 
-    def _extract_text_summary(self, analysis_text: str, expert_name: str, max_length: int = 300) -> str:
+    def _extract_text_summary(
+        self, analysis_text: str, expert_name: str, max_length: int = 300, level: Optional[str] = None
+    ) -> str:
         """
         从纯文本分析中提取摘要
 
@@ -220,9 +385,10 @@ class ContextCompressor:
             return f"**摘要**: {expert_name}未提供分析内容"
 
         # 根据压缩级别调整最大长度
-        if self.compression_level == "minimal":
+        level = level or self.compression_level
+        if level == "minimal":
             max_length = 500
-        elif self.compression_level == "balanced":
+        elif level == "balanced":
             max_length = 300
         else:  # aggressive
             max_length = 150
@@ -284,7 +450,26 @@ class ContextCompressor:
 
     def reset_stats(self):
         """重置统计信息"""
-        self._compression_stats = {"original_length": 0, "compressed_length": 0, "compression_ratio": 0.0}
+        self._compression_stats = self._empty_stats()
+
+
+def summarize_compression_stats(stats_by_role: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    汇总一次运行中各专家的压缩统计（state["context_compression_stats"]）
+
+    Returns:
+        {"experts", "original_tokens", "compressed_tokens", "tokens_saved", "savings_percent",
+         "cache_hits", "cache_misses"}
+    """
+    totals = {"experts": 0, "original_tokens": 0, "compressed_tokens": 0, "tokens_saved": 0}
+    totals.update(cache_hits=0, cache_misses=0)
+    for stats in (stats_by_role or {}).values():
+        totals["experts"] += 1
+        for key in ("original_tokens", "compressed_tokens", "tokens_saved", "cache_hits", "cache_misses"):
+            totals[key] += int(stats.get(key, 0) or 0)
+    original = totals["original_tokens"]
+    totals["savings_percent"] = round(totals["tokens_saved"] / original * 100, 1) if original else 0.0
+    return totals
 
 
 def create_context_compressor(batch_number: int, total_batches: int) -> ContextCompressor:
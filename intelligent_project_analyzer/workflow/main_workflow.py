@@ -57,6 +57,10 @@ from .context_compressor import create_context_compressor
 from ..interaction.second_batch_strategy_review import SecondBatchStrategyReviewNode
 from ..report.pdf_generator import PDFGeneratorAgent
 from ..report.result_aggregator import ResultAggregatorAgent
+from ..services.execution_timeline import attach_timeline
+from ..services.llm_concurrency import attach_llm_priorities
+from ..services.state_externalizer import install_state_externalizer
+from ..services.state_profiler import attach_state_profiler, install_state_profiler
 from ..workflow.nodes.search_query_generator_node import search_query_generator_node  #  v7.109
 
 USE_V716_AGENTS = os.getenv("USE_V716_AGENTS", "false").lower() == "true"
@@ -146,6 +150,11 @@ class MainWorkflow(
             self.checkpointer = SqliteSaver(self._sqlite_conn)
             logger.info(f" 使用持久化检查点存储: {db_path}")
 
+        #  大字段按引用存入 ExternalStateStore，缩小每个 superstep 的 checkpoint（STATE_EXTERNALIZE_ENABLED）
+        install_state_externalizer(self.checkpointer)
+        #  节点 delta / reducer 耗时 / checkpoint 字节数剖析（STATE_PROFILER_ENABLED）
+        install_state_profiler(self.checkpointer)
+
         # 初始化本体论加载器
         self.ontology_loader = OntologyLoader(
             "d:/11-20/langgraph-design/intelligent_project_analyzer/knowledge_base/ontology.yaml"
@@ -375,4 +384,5 @@ class MainWorkflow(
         logger.info("   Nodes: batch_executor, agent_executor, batch_aggregator, batch_router, batch_strategy_review")
         logger.info("   Supports: 1-N batches with dependency-based execution")
 
-        return workflow.compile(checkpointer=self.checkpointer, store=self.store)
+        compiled = workflow.compile(checkpointer=self.checkpointer, store=self.store)
+        return attach_llm_priorities(attach_timeline(attach_state_profiler(compiled)))
@@ -13,7 +13,7 @@ import sqlite3
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 import yaml
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.sqlite import SqliteSaver
@@ -52,7 +52,8 @@ from ...interaction.nodes.questionnaire_summary import questionnaire_summary_nod
 from ...interaction.role_task_unified_review import role_task_unified_review_node
 
 #  v7.502 P1优化: 智能上下文压缩器
-from ..context_compressor import create_context_compressor
+from ..batch_scheduler import BatchScheduler
+from ..context_compressor import ContextCompressor, create_context_compressor, summarize_compression_stats
 
 # from ..interaction.role_selection_review import role_selection_review_node  # 已废弃
 # from ..interaction.task_assignment_review import task_assignment_review_node  # 已废弃
@@ -699,7 +700,7 @@ class AggregationNodesMixin:
         logger.info(" Executing manual review node for critical quality issues")
         return ManualReviewNode.execute(state=state, store=self.store)
 
-    def _result_aggregator_node(self, state: ProjectAnalysisState) -> Dict[str, Any]:
+    async def _result_aggregator_node(self, state: ProjectAnalysisState) -> Dict[str, Any]:
         """
         结果聚合节点
 
@@ -708,6 +709,7 @@ class AggregationNodesMixin:
 
          修复: 不更新current_stage,避免与pdf_generator并发冲突
          v7.16: 支持新版 LangGraph ResultAggregatorAgentV2
+        异步执行：LLM 调用期间不阻塞事件循环（其他会话的 WebSocket 推送照常进行）
         """
         try:
             logger.info("Executing result aggregator node")
@@ -720,8 +722,18 @@ class AggregationNodesMixin:
                 # 创建结果聚合器智能体
                 agent = ResultAggregatorAgent(llm_model=self.llm_model, config=self.config)
 
+            #  v7.503: 本次运行的上下文压缩 Token 统计
+            run_stats = summarize_compression_stats(state.get("context_compression_stats"))
+            if run_stats["experts"]:
+                logger.info(
+                    f"️ [ContextCompressor] 本次运行 {run_stats['experts']} 位专家 | "
+                    f"前序上下文 Token: {run_stats['original_tokens']}→{run_stats['compressed_tokens']}, "
+                    f"节省 {run_stats['tokens_saved']} ({run_stats['savings_percent']}%) | "
+                    f"摘要缓存命中 {run_stats['cache_hits']}/{run_stats['cache_hits'] + run_stats['cache_misses']}"
+                )
+
             # 执行聚合
-            result = agent.execute(state, {}, self.store)
+            result = await agent.aexecute(state, {}, self.store)
 
             # 只返回需要更新的字段 (不更新current_stage)
             return {
@@ -969,6 +981,14 @@ class AggregationNodesMixin:
         Returns:
             str: 格式化的上下文字符串
         """
+        return self._build_context_for_expert_with_stats(state)[0]
+
+    def _build_context_for_expert_with_stats(self, state: ProjectAnalysisState) -> Tuple[str, ContextCompressor]:
+        """
+        构建专家上下文，同时返回压缩器（含新生成的摘要 new_summaries 与 Token 统计）
+
+         v7.503: 前序专家摘要复用 state["context_summaries"]，按依赖关系分配 Token 预算
+        """
         context_parts = []
 
         # 添加用户需求
@@ -1011,7 +1031,18 @@ class AggregationNodesMixin:
         #  P1优化: 使用压缩器处理前序专家输出
         agent_results = state.get("agent_results", {})
         if agent_results:
-            compressed_results = compressor.compress_agent_results(agent_results, current_role_id)
+            execution_batches = state.get("execution_batches") or []
+            dependencies = (
+                BatchScheduler().get_dependencies(current_role_id, execution_batches)
+                if current_role_id and execution_batches
+                else []
+            )
+            compressed_results = compressor.compress_agent_results(
+                agent_results,
+                current_role_id,
+                dependencies=dependencies,
+                summary_cache=dict(state.get("context_summaries") or {}),
+            )
             if compressed_results:
                 context_parts.append(compressed_results)
 
@@ -1040,7 +1071,9 @@ class AggregationNodesMixin:
                 f"原始: {stats['original_length']}字符, "
                 f"压缩后: {stats['compressed_length']}字符, "
                 f"压缩率: {stats['compression_ratio']:.2%}, "
-                f"节省: {stats['savings_percent']:.1f}%"
+                f"节省: {stats['savings_percent']:.1f}% | "
+                f"Token: {stats['original_tokens']}→{stats['compressed_tokens']}, "
+                f"摘要缓存命中: {stats['cache_hits']}/{stats['cache_hits'] + stats['cache_misses']}"
             )
 
-        return final_context
+        return final_context, compressor
@@ -8,6 +8,7 @@ LT-1 执行节点 Mixin — 动态批次执行、Agent 并发调度
 # ruff: noqa (generated file)
 # type: ignore
 #  v7.16: LangGraph Agent 升级版本（通过环境变量控制）
+import asyncio
 import os
 import sqlite3
 import uuid
@@ -210,8 +211,8 @@ class ExecutionNodesMixin:
             # 创建任务导向专家工厂实例
             expert_factory = TaskOrientedExpertFactory()
 
-            # 构建上下文
-            context = self._build_context_for_expert(state)
+            # 构建上下文（ v7.503: 同时取回压缩器，用于回写摘要缓存与 Token 统计）
+            context, context_compressor = self._build_context_for_expert_with_stats(state)
 
             # 构建角色对象（包含TaskInstruction）
             # 注意：ProjectAnalysisState是TypedDict，不能直接实例化
@@ -392,8 +393,6 @@ class ExecutionNodesMixin:
                 try:
                     # 导入broadcast函数
                     # 推送专家结果
-                    import asyncio
-
                     from intelligent_project_analyzer.api.server import broadcast_to_websockets
 
                     #  v7.153: 提取该专家的搜索引用用于WebSocket推送
@@ -453,6 +452,9 @@ class ExecutionNodesMixin:
 
                             # 导入图片生成服务
                             from intelligent_project_analyzer.services.image_generator import ImageGeneratorService
+                            from intelligent_project_analyzer.services.image_job_planner import (
+                                make_concept_image_publisher,
+                            )
 
                             # 初始化图片生成器
                             image_generator = ImageGeneratorService()
@@ -464,12 +466,15 @@ class ExecutionNodesMixin:
                             #  v7.121: 读取问卷数据用于概念图生成
                             questionnaire_summary = state.get("questionnaire_summary", {})
 
-                            # 为每个交付物生成概念图
-                            for deliverable_id in deliverable_ids:
+                            # 为每个交付物生成概念图（交付物之间并发，图像 API 并发数与报告额度由 image_job_planner 控制）
+                            on_image = make_concept_image_publisher(session_id_for_image, role_id)
+
+                            async def generate_for_deliverable(deliverable_id: str) -> List[Dict[str, Any]]:
+                                deliverable_images: List[Dict[str, Any]] = []
                                 metadata = deliverable_metadata.get(deliverable_id)
                                 if not metadata:
                                     logger.warning(f"  ️ 交付物 {deliverable_id} 元数据缺失，跳过图片生成")
-                                    continue
+                                    return deliverable_images
 
                                 try:
                                     #  v7.128: 提取特定交付物的专家分析内容
@@ -504,6 +509,8 @@ class ExecutionNodesMixin:
                                         project_type=project_type,
                                         aspect_ratio="16:9",
                                         questionnaire_data=questionnaire_summary,  #  v7.121: 传递问卷数据
+                                        on_image=on_image,  # 每张图片完成即推送
+                                        use_report_budget=True,
                                     )
 
                                     #  v7.127: 遍历添加所有生成的图片
@@ -524,7 +531,7 @@ class ExecutionNodesMixin:
                                                     logger.error(f"   [v7.402] 发现 base64 数据在 {key}，已替换为错误标记")
                                                     img_dict[key] = "[ERROR_BASE64_FOUND_IN_WORKFLOW]"
 
-                                        concept_images.append(img_dict)
+                                        deliverable_images.append(img_dict)
 
                                     logger.info(f"   生成 {len(image_metadata_list)} 张概念图（交付物 {deliverable_id}）")
 
@@ -532,6 +539,13 @@ class ExecutionNodesMixin:
                                     logger.error(f"   生成概念图失败 (交付物 {deliverable_id}): {img_error}")
                                     # 不阻塞workflow，继续执行
 
+                                return deliverable_images
+
+                            per_deliverable = await asyncio.gather(
+                                *(generate_for_deliverable(deliverable_id) for deliverable_id in deliverable_ids)
+                            )
+                            concept_images = [image for images in per_deliverable for image in images]
+
                             if concept_images:
                                 logger.info(f" [v7.108] 成功为角色 {role_id} 生成 {len(concept_images)} 张概念图")
                             else:
@@ -543,17 +557,23 @@ class ExecutionNodesMixin:
                     logger.error(f" [v7.108] 概念图生成流程失败: {e}")
                     logger.exception(e)
                     # 不阻塞workflow，专家分析仍然有效
+            agent_result = {
+                "role_id": role_id,
+                "role_name": role_name,
+                "analysis": result_content,
+                "confidence": 0.8,  # 默认置信度
+                "structured_data": structured_data,  #  使用完整的parsed_result
+                "concept_images": concept_images,  #  v7.108: 关联的概念图
+            }
+
+            #  v7.503: 本专家结果的分级摘要在完成时生成一次，后续批次的专家直接复用
+            context_summaries = dict(context_compressor.new_summaries)
+            context_summaries[role_id] = context_compressor.summarize_result(role_id, agent_result)
+
             return {
-                "agent_results": {
-                    role_id: {
-                        "role_id": role_id,
-                        "role_name": role_name,
-                        "analysis": result_content,
-                        "confidence": 0.8,  # 默认置信度
-                        "structured_data": structured_data,  #  使用完整的parsed_result
-                        "concept_images": concept_images,  #  v7.108: 关联的概念图
-                    }
-                },
+                "agent_results": {role_id: agent_result},
+                "context_summaries": context_summaries,
+                "context_compression_stats": {role_id: context_compressor.get_compression_stats()},
                 "detail": detail_message,
             }
 
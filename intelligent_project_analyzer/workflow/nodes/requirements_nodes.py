@@ -222,7 +222,7 @@ class RequirementsNodesMixin:
             traceback.print_exc()
             return {"error": str(e), "updated_at": datetime.now().isoformat()}
 
-    def _feasibility_analyst_node(self, state: ProjectAnalysisState) -> Dict[str, Any]:
+    async def _feasibility_analyst_node(self, state: ProjectAnalysisState) -> Dict[str, Any]:
         """
         V1.5 可行性分析师节点（后台决策支持）
 
@@ -246,7 +246,7 @@ class RequirementsNodesMixin:
                 return {"updated_at": datetime.now().isoformat()}
 
             # 执行可行性分析
-            result = feasibility_agent.execute(state, {}, self.store)
+            result = await feasibility_agent.aexecute(state, {}, self.store)
 
             # 存储分析结果到state（仅后台存储，不展示到前端）
             update_dict = {
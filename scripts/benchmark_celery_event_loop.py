@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Celery Worker 事件循环基准测试：每任务 asyncio.run vs 常驻事件循环 + 共享连接
+
+用法
+----
+::
+
+    python scripts/benchmark_celery_event_loop.py [--tasks 200]
+
+每个模拟任务执行一次检查点读取与一次 HTTP 客户端请求构造（不发网络请求）：
+
+- 旧方案：run_async → asyncio.run，每个任务新建事件循环、aiosqlite 连接 + AsyncSqliteSaver.setup()、httpx.AsyncClient
+- 新方案：WorkerRuntime 常驻事件循环，连接与客户端在首个任务创建后跨任务复用
+
+输出示例
+--------
+::
+
+    ===== Celery Worker 事件循环基准 (100 个任务) =====
+    每任务 asyncio.run   :  26.747 ms/任务
+    常驻事件循环 + 复用  :   0.463 ms/任务
+    ✅ 每任务开销降低 98.3%
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# ── 确保项目根目录在 sys.path ──────────────────────────────────────────────
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+import aiosqlite  # noqa: E402
+import httpx  # noqa: E402
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # noqa: E402
+
+from intelligent_project_analyzer.services.celery_worker_runtime import WorkerRuntime  # noqa: E402
+
+CONFIG = {"configurable": {"thread_id": "bench", "checkpoint_ns": ""}}
+
+
+async def _task_body(saver: AsyncSqliteSaver, client: httpx.AsyncClient) -> None:
+    await saver.aget_tuple(CONFIG)
+    client.build_request("GET", "/health")
+
+
+async def _legacy_task(db_path: Path) -> None:
+    """旧方案：每个任务自建全部资源"""
+    conn = await aiosqlite.connect(str(db_path))
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+    async with httpx.AsyncClient(base_url="http://localhost") as client:
+        await _task_body(saver, client)
+    await conn.close()
+
+
+class _Shared:
+    saver: AsyncSqliteSaver | None = None
+    client: httpx.AsyncClient | None = None
+
+
+async def _pooled_task(db_path: Path, shared: _Shared) -> None:
+    """新方案：首个任务创建资源，后续任务复用"""
+    if shared.saver is None:
+        shared.saver = AsyncSqliteSaver(await aiosqlite.connect(str(db_path)))
+        await shared.saver.setup()
+        shared.client = httpx.AsyncClient(base_url="http://localhost")
+    await _task_body(shared.saver, shared.client)
+
+
+def bench_legacy(db_path: Path, tasks: int) -> float:
+    started = time.perf_counter()
+    for _ in range(tasks):
+        asyncio.run(_legacy_task(db_path))
+    return (time.perf_counter() - started) / tasks * 1000
+
+
+def bench_runtime(db_path: Path, tasks: int) -> float:
+    runtime = WorkerRuntime()
+    runtime.start()
+    shared = _Shared()
+    try:
+        started = time.perf_counter()
+        for _ in range(tasks):
+            runtime.run(_pooled_task(db_path, shared))
+        elapsed = (time.perf_counter() - started) / tasks * 1000
+    finally:
+
+        async def _close() -> None:
+            if shared.client is not None:
+                await shared.client.aclose()
+            if shared.saver is not None:
+                await shared.saver.conn.close()
+
+        runtime.run(_close())
+        runtime.stop()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "workflow.db"
+        legacy_ms = bench_legacy(db_path, args.tasks)
+        runtime_ms = bench_runtime(db_path, args.tasks)
+
+    print(f"===== Celery Worker 事件循环基准 ({args.tasks} 个任务) =====")
+    print(f"每任务 asyncio.run   : {legacy_ms:7.3f} ms/任务")
+    print(f"常驻事件循环 + 复用  : {runtime_ms:7.3f} ms/任务")
+    saved = (1 - runtime_ms / legacy_ms) * 100 if legacy_ms else 0.0
+    print(f"{'✅' if saved > 0 else '⚠️'} 每任务开销降低 {saved:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
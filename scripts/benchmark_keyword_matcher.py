@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+关键词匹配基准测试：逐个 kw in text vs 编译型 Aho-Corasick 匹配器
+
+用法
+----
+::
+
+    python scripts/benchmark_keyword_matcher.py [--rounds 200] [--repeat 4]
+
+关键词集为项目类型注册表（主/次关键词）+ 设计模式签名（关键词/场景/反向关键词），
+与 ProjectTypeDetector.detect() / DesignModeDetector.detect() 的实际匹配负载一致；
+输入文本为若干真实风格需求描述，--repeat 控制文本长度（拼接次数）。
+
+输出示例
+--------
+::
+
+    ===== 关键词匹配基准 (1484 个关键词, 平均文本 154 字, 200 轮) =====
+    自动机编译（一次性）:   5.345 ms
+    逐个 kw in text     :   0.390 ms/次
+    编译匹配器单次扫描  :   0.076 ms/次
+    ✅ 单次匹配耗时降低 80.5%
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+# ── 确保项目根目录在 sys.path ──────────────────────────────────────────────
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from intelligent_project_analyzer.services.mode_detector import DesignModeDetector  # noqa: E402
+from intelligent_project_analyzer.services.project_type_detector import PROJECT_TYPE_REGISTRY  # noqa: E402
+from intelligent_project_analyzer.utils.keyword_matcher import KeywordMatcher  # noqa: E402
+
+TEXTS = [
+    "我想在杭州西湖边做一个200平米的精品咖啡馆，兼顾独立书店与小型展览功能，预算80万",
+    "乡村振兴背景下的民宿改造项目，保留老宅的夯土墙和木构架，同时引入现代的卫浴与厨房",
+    "不要做KTV，想要做亲子餐厅和儿童游乐区，家长可以在旁边休息办公",
+    "为三代同堂的家庭设计一套疗愈型住宅，老人需要无障碍设施，孩子需要独立的学习空间",
+    "城市更新片区里的老厂房改造为创意办公园区，希望保留工业遗存并植入商业配套",
+]
+
+
+def _keyword_groups() -> dict:
+    groups = {}
+    for type_id, cfg in PROJECT_TYPE_REGISTRY.items():
+        groups[(type_id, "keywords")] = cfg.get("keywords", [])
+        groups[(type_id, "secondary_keywords")] = cfg.get("secondary_keywords", [])
+    for mode_id, signature in DesignModeDetector.MODE_SIGNATURES.items():
+        for field in ("keywords", "scenarios", "anti_keywords"):
+            groups[(mode_id, field)] = [kw.lower() for kw in signature.get(field, [])]
+    return groups
+
+
+def bench_legacy(groups: dict, texts: list, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            for keywords in groups.values():
+                [i for i, kw in enumerate(keywords) if kw in text]
+    return (time.perf_counter() - started) / (rounds * len(texts)) * 1000
+
+
+def bench_matcher(matcher: KeywordMatcher, texts: list, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            matcher.match_groups(text)
+    return (time.perf_counter() - started) / (rounds * len(texts)) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=4)
+    args = parser.parse_args()
+
+    groups = _keyword_groups()
+    texts = [("，".join([text] * args.repeat)).lower() for text in TEXTS]
+
+    build_started = time.perf_counter()
+    matcher = KeywordMatcher.from_groups(groups)
+    build_ms = (time.perf_counter() - build_started) * 1000
+
+    # 结果一致性校验
+    for text in texts:
+        hits = matcher.match_groups(text)
+        for group, keywords in groups.items():
+            assert hits.get(group, []) == [i for i, kw in enumerate(keywords) if kw and kw in text], group
+
+    legacy_ms = bench_legacy(groups, texts, args.rounds)
+    matcher_ms = bench_matcher(matcher, texts, args.rounds)
+    avg_len = sum(len(t) for t in texts) // len(texts)
+
+    print(f"===== 关键词匹配基准 ({len(matcher)} 个关键词, 平均文本 {avg_len} 字, {args.rounds} 轮) =====")
+    print(f"自动机编译（一次性）: {build_ms:7.3f} ms")
+    print(f"逐个 kw in text     : {legacy_ms:7.3f} ms/次")
+    print(f"编译匹配器单次扫描  : {matcher_ms:7.3f} ms/次")
+    saved = (1 - matcher_ms / legacy_ms) * 100 if legacy_ms else 0.0
+    print(f"{'✅' if saved > 0 else '⚠️'} 单次匹配耗时降低 {saved:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+列表 reducer 基准测试：逐个 item not in result vs merge_lists（批量新增时走哈希索引）
+
+用法
+----
+::
+
+    python scripts/benchmark_state_reducers.py [--rounds 20]
+
+模拟一次工作流运行中 search_references / 交互历史等列表字段的累积合并：
+每个 superstep 由节点返回若干新元素（其中一个与上一步重复），reducer 把它们并入已有列表。
+每步新增不超过 32 个时 merge_lists 同样逐个比较，两者耗时持平；批量新增时哈希索引才有收益。
+
+输出示例
+--------
+::
+
+    ===== 列表 reducer 基准 (20 轮) =====
+    搜索引用 3条×100步   : 逐个比较   2.563 ms/轮 | merge_lists   2.533 ms/轮 | 降低 1.2%
+    搜索引用 10条×50步   : 逐个比较   6.888 ms/轮 | merge_lists   6.974 ms/轮 | 降低 -1.2%
+    字符串   5条×200步   : 逐个比较  11.872 ms/轮 | merge_lists  11.454 ms/轮 | 降低 3.5%
+    搜索引用 100条×10步  : 逐个比较  22.850 ms/轮 | merge_lists  20.388 ms/轮 | 降低 10.8%
+    字符串   100条×20步  : 逐个比较  33.790 ms/轮 | merge_lists  10.752 ms/轮 | 降低 68.2%
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+# ── 确保项目根目录在 sys.path ──────────────────────────────────────────────
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from intelligent_project_analyzer.core.state import merge_lists  # noqa: E402
+
+
+def legacy_merge_lists(left, right):
+    """优化前的实现：对已有列表逐个做相等比较，O(n·m)"""
+    if left is None:
+        return right or []
+    if right is None:
+        return left
+    result = left.copy()
+    for item in right:
+        if item not in result:
+            result.append(item)
+    return result
+
+
+def make_reference(i: int) -> dict:
+    return {
+        "id": f"tavily_{i:012x}",
+        "source_tool": "tavily",
+        "title": f"标题 {i}" * 3,
+        "url": f"https://example.com/{i}",
+        "snippet": "摘要内容" * 60,
+        "quality": 0.8,
+    }
+
+
+SCENARIOS = [
+    ("搜索引用 3条×100步  ", 3, 100, make_reference),
+    ("搜索引用 10条×50步  ", 10, 50, make_reference),
+    ("字符串   5条×200步  ", 5, 200, lambda i: f"agent_{i}"),
+    ("搜索引用 100条×10步 ", 100, 10, make_reference),
+    ("字符串   100条×20步 ", 100, 20, lambda i: f"agent_{i}"),
+]
+
+
+def bench(reducer, per_step: int, steps: int, make_item, rounds: int) -> tuple:
+    # 预先构造元素，只计 reducer 耗时
+    batches = [[make_item(step * per_step + j - 1) for j in range(per_step)] for step in range(steps)]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        merged = []
+        for batch in batches:
+            merged = reducer(merged, batch)
+    return (time.perf_counter() - started) / rounds * 1000, list(merged)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"===== 列表 reducer 基准 ({args.rounds} 轮) =====")
+    for label, per_step, steps, make_item in SCENARIOS:
+        legacy_ms, legacy_result = bench(legacy_merge_lists, per_step, steps, make_item, args.rounds)
+        indexed_ms, indexed_result = bench(merge_lists, per_step, steps, make_item, args.rounds)
+        assert legacy_result == indexed_result, label  # 结果一致性校验
+        saved = (1 - indexed_ms / legacy_ms) * 100 if legacy_ms else 0.0
+        print(f"{label} : 逐个比较 {legacy_ms:7.3f} ms/轮 | merge_lists {indexed_ms:7.3f} ms/轮 | 降低 {saved:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""迁移：添加向量回填元数据列 embedding_content_hash + embedding_model + embedded_at"""
+import sys
+
+sys.path.insert(0, ".")
+
+from intelligent_project_analyzer.external_data_system.models.external_projects import get_external_db
+from sqlalchemy import text
+
+NEW_COLUMNS = {
+    "embedding_content_hash": "VARCHAR(64)",
+    "embedding_model": "VARCHAR(100)",
+    "embedded_at": "TIMESTAMP",
+}
+
+db = get_external_db()
+with db.engine.connect() as conn:
+    result = conn.execute(
+        text("SELECT column_name FROM information_schema.columns " "WHERE table_name='external_projects'")
+    )
+    existing = {r[0] for r in result}
+
+    added = []
+    for name, col_type in NEW_COLUMNS.items():
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE external_projects ADD COLUMN {name} {col_type}"))
+            added.append(f"{name} {col_type}")
+
+    conn.commit()
+
+    if added:
+        print("✅ 已添加:", added)
+    else:
+        print("✓ 向量回填列均已存在，跳过")
+
+    # 已有向量但无元数据的旧行：由 generate_embeddings 任务（text-embedding-3-small）生成，
+    # 视为按当前 content_hash 嵌入，避免全量重嵌
+    updated = conn.execute(
+        text(
+            "UPDATE external_projects "
+            "SET embedding_content_hash = content_hash, embedding_model = 'openai:text-embedding-3-small' "
+            "WHERE description_vector IS NOT NULL AND embedding_content_hash IS NULL AND content_hash IS NOT NULL"
+        )
+    ).rowcount
+    conn.commit()
+    print(f"✓ 回填旧向量 embedding_content_hash: {updated} 行")
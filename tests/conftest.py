@@ -48,7 +48,7 @@ def app():
     server_module.archive_manager.count_archived_sessions.return_value = 0
     server_module.archive_manager.update_metadata.return_value = True
 
-    async def _get_archived_session(session_id):
+    async def _get_archived_session(session_id, sections=None):
         if session_id == "test-1":
             return {"session_id": "test-1", "user_id": "web_user"}
         return None
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+请求性能监控 (api/performance_monitor.py) 单元测试
+
+覆盖：
+- record_request 不做文件 IO，后台任务/flush 批量写盘
+- 环形缓冲区满时丢弃最旧记录
+- 按大小轮转并 gzip 压缩，保留 backup_count 份
+- 统计接口基于有界聚合（路由上限、慢请求、时间窗口）
+"""
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from intelligent_project_analyzer.api.performance_monitor import OTHER_ROUTE, PerformanceMonitor
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return PerformanceMonitor(metrics_file=tmp_path / "perf.jsonl", flush_interval=0.05)
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestSink:
+    def test_record_does_not_touch_file(self, monitor):
+        monitor.record_request("/api/a", "GET", 0.1, 200)
+        assert not monitor.metrics_file.exists()
+
+        assert monitor.flush() == 1
+        assert read_lines(monitor.metrics_file)[0]["path"] == "/api/a"
+
+    @pytest.mark.asyncio
+    async def test_background_writer_drains_buffer(self, monitor):
+        for i in range(5):
+            monitor.record_request(f"/api/{i}", "GET", 0.01, 200)
+        assert monitor.get_sink_stats()["writer_running"] is True
+
+        await asyncio.sleep(0.2)
+        assert len(read_lines(monitor.metrics_file)) == 5
+        await monitor.stop()
+        assert monitor.get_sink_stats()["writer_running"] is False
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_remaining(self, tmp_path):
+        monitor = PerformanceMonitor(metrics_file=tmp_path / "perf.jsonl", flush_interval=60)
+        monitor.record_request("/api/a", "GET", 0.01, 200)
+        await monitor.stop()
+        assert len(read_lines(monitor.metrics_file)) == 1
+
+    def test_full_buffer_drops_oldest(self, tmp_path):
+        monitor = PerformanceMonitor(metrics_file=tmp_path / "perf.jsonl", buffer_size=3)
+        for i in range(5):
+            monitor.record_request(f"/api/{i}", "GET", 0.01, 200)
+        monitor.flush()
+
+        assert [m["path"] for m in read_lines(monitor.metrics_file)] == ["/api/2", "/api/3", "/api/4"]
+        assert monitor.get_sink_stats()["dropped"] == 2
+        # 聚合不受丢弃影响
+        assert monitor.get_stats_summary()["total_requests"] == 5
+
+    def test_rotation_compresses_and_prunes(self, tmp_path):
+        monitor = PerformanceMonitor(
+            metrics_file=tmp_path / "perf.jsonl", max_bytes=200, backup_count=2, compress=True
+        )
+        for _ in range(5):
+            for i in range(5):
+                monitor.record_request(f"/api/{i}", "GET", 0.01, 200)
+            monitor.flush()
+
+        archives = sorted(tmp_path.glob("perf.*.jsonl.gz"))
+        assert len(archives) == 2
+        with gzip.open(archives[-1], "rt", encoding="utf-8") as f:
+            assert json.loads(f.readline())["method"] == "GET"
+
+
+class TestAggregates:
+    def test_stats_by_route_template(self, monitor):
+        monitor.record_request("/api/status/s1", "GET", 0.2, 200, route="/api/status/{session_id}")
+        monitor.record_request("/api/status/s2", "GET", 0.4, 200, route="/api/status/{session_id}")
+
+        stats = monitor.get_stats("/api/status/{session_id}")
+        assert stats["count"] == 2
+        assert stats["avg_duration"] == pytest.approx(0.3)
+        assert stats["min_duration"] == 0.2 and stats["max_duration"] == 0.4
+        assert monitor.get_stats("/missing") == {}
+
+    def test_summary_and_errors(self, monitor):
+        monitor.record_request("/api/a", "GET", 0.1, 200)
+        monitor.record_request("/api/a", "POST", 0.3, 500)
+
+        summary = monitor.get_stats_summary()
+        assert summary == {
+            "total_requests": 2,
+            "avg_response_time": 200.0,
+            "requests_per_minute": 2,
+            "error_count": 1,
+        }
+
+    def test_route_cardinality_is_bounded(self, tmp_path):
+        monitor = PerformanceMonitor(metrics_file=tmp_path / "perf.jsonl", max_routes=3)
+        for i in range(10):
+            monitor.record_request(f"/api/{i}", "GET", 0.01, 200)
+
+        assert monitor.get_sink_stats()["routes"] == 3 + 1  # 含 OTHER_ROUTE
+        assert monitor.get_stats(OTHER_ROUTE)["count"] == 7
+
+    def test_slow_requests_sorted_and_bounded(self, tmp_path):
+        monitor = PerformanceMonitor(metrics_file=tmp_path / "perf.jsonl", slow_request_limit=3)
+        for d in (1.5, 3.0, 0.2, 2.0, 5.0):
+            monitor.record_request("/api/slow", "GET", d, 200)
+
+        slow = monitor.get_slow_requests(limit=10)
+        assert [m["duration"] for m in slow] == [5.0, 3.0, 2.0]  # 只保留最近 3 条
+        assert slow[0]["path"] == "/api/slow"
+
+    def test_detailed_stats_p95(self, monitor):
+        for i in range(1, 101):
+            monitor.record_request("/api/a", "GET", i / 100, 200)
+
+        detail = monitor.get_detailed_stats(hours=1)["/api/a"]
+        assert detail["count"] == 100
+        assert detail["p95_duration"] == pytest.approx(0.96)
+        assert detail["error_count"] == 0
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+API 启动编排器 (api/startup_orchestrator.py) 单元测试
+
+覆盖：
+- 同层组件并发初始化、依赖先行
+- 关键组件失败 → 未就绪；非关键失败不影响就绪
+- background 组件不阻塞 start()
+- lazy 组件首次使用时只初始化一次
+- 循环依赖 / 未注册依赖报错
+"""
+import asyncio
+
+import pytest
+
+from intelligent_project_analyzer.api.startup_orchestrator import (
+    BACKGROUND,
+    LAZY,
+    StartupOrchestrator,
+)
+
+
+def make_init(log, name, delay=0.0, fail=False):
+    async def _init():
+        log.append(f"start:{name}")
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} boom")
+        log.append(f"done:{name}")
+
+    return _init
+
+
+@pytest.mark.asyncio
+async def test_same_level_runs_concurrently():
+    log = []
+    orch = StartupOrchestrator()
+    orch.register("a", make_init(log, "a", 0.2))
+    orch.register("b", make_init(log, "b", 0.2))
+    orch.register("c", make_init(log, "c", 0.2))
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await orch.start()
+
+    assert loop.time() - started < 0.5
+    assert log[:3] == ["start:a", "start:b", "start:c"]
+
+
+@pytest.mark.asyncio
+async def test_dependencies_run_first():
+    log = []
+    orch = StartupOrchestrator()
+    orch.register("followup", make_init(log, "followup"), depends_on=["redis"])
+    orch.register("redis", make_init(log, "redis", 0.05))
+    await orch.start()
+
+    assert log.index("done:redis") < log.index("start:followup")
+
+
+@pytest.mark.asyncio
+async def test_critical_failure_marks_not_ready():
+    orch = StartupOrchestrator()
+    orch.register("redis", make_init([], "redis", fail=True), critical=True)
+    orch.register("archive", make_init([], "archive"))
+    await orch.start()
+
+    readiness = orch.get_readiness()
+    assert readiness["ready"] is False
+    assert readiness["components"]["redis"]["status"] == "failed"
+    assert "boom" in readiness["components"]["redis"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_non_critical_failure_keeps_ready():
+    orch = StartupOrchestrator()
+    orch.register("redis", make_init([], "redis"), critical=True)
+    orch.register("pubsub", make_init([], "pubsub", fail=True))
+    await orch.start()
+
+    assert orch.get_readiness()["ready"] is True
+    assert orch.get_status("pubsub") == "failed"
+
+
+@pytest.mark.asyncio
+async def test_background_does_not_block_start():
+    orch = StartupOrchestrator(budget_ms=100)
+    orch.register("browser_pool", make_init([], "browser_pool", 0.3), mode=BACKGROUND)
+    readiness = await orch.start()
+
+    assert readiness["within_budget"] is True
+    assert orch.get_status("browser_pool") != "ready"
+    await orch.wait_background()
+    assert orch.get_status("browser_pool") == "ready"
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_background():
+    orch = StartupOrchestrator()
+    orch.register("slow", make_init([], "slow", 5), mode=BACKGROUND)
+    await orch.start()
+    await asyncio.sleep(0)
+    await orch.shutdown()
+
+    assert orch.get_status("slow") != "ready"
+
+
+@pytest.mark.asyncio
+async def test_lazy_initialized_once_on_demand():
+    log = []
+    orch = StartupOrchestrator()
+    orch.register("geoip", make_init(log, "geoip", 0.05), mode=LAZY)
+    await orch.start()
+    assert log == []
+    assert orch.get_status("geoip") == "deferred"
+
+    results = await asyncio.gather(orch.ensure_ready("geoip"), orch.ensure_ready("geoip"))
+    assert results == [True, True]
+    assert log == ["start:geoip", "done:geoip"]
+
+
+@pytest.mark.asyncio
+async def test_cycle_raises():
+    orch = StartupOrchestrator()
+    orch.register("a", make_init([], "a"), depends_on=["b"])
+    orch.register("b", make_init([], "b"), depends_on=["a"])
+    with pytest.raises(ValueError):
+        await orch.start()
+
+
+@pytest.mark.asyncio
+async def test_missing_dependency_raises():
+    orch = StartupOrchestrator()
+    orch.register("a", make_init([], "a"), depends_on=["nope"])
+    with pytest.raises(ValueError):
+        await orch.start()
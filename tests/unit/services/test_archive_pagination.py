@@ -0,0 +1,101 @@
+"""
+Unit tests for SessionArchiveManager 游标分页与数据库线程池
+
+Coverage
+--------
+- 游标分页与 OFFSET 分页结果一致（置顶优先、created_at 相同按 session_id 排序）
+- 游标编码 / 解析、无效游标
+- 数据库操作在归档线程池中执行，不阻塞事件循环
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from intelligent_project_analyzer.services.session_archive_manager import (
+    ArchivedSession,
+    SessionArchiveManager,
+    decode_archive_cursor,
+    encode_archive_cursor,
+)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    archive = SessionArchiveManager(database_url=f"sqlite:///{tmp_path / 'archive.db'}")
+    db = archive._get_db()
+    for i in range(23):
+        db.add(
+            ArchivedSession(
+                session_id=f"s{i:02d}",
+                user_id="alice" if i % 2 else "bob",
+                user_input=f"会话 {i}",
+                status="completed",
+                created_at=datetime(2026, 1, 1) + timedelta(minutes=i // 3),  # 每 3 个会话 created_at 相同
+                session_data="{}",
+                pinned=i in (4, 17),
+            )
+        )
+    db.commit()
+    db.close()
+    yield archive
+    archive.engine.dispose()
+
+
+async def _walk(manager, page_size, **filters):
+    sessions, cursor = [], None
+    while True:
+        page = await manager.list_archived_sessions(limit=page_size, cursor=cursor, **filters)
+        sessions.extend(page)
+        if len(page) < page_size:
+            return sessions
+        cursor = encode_archive_cursor(page[-1])
+
+
+def test_cursor_pages_match_offset_order(manager):
+    async def main():
+        by_offset = await manager.list_archived_sessions(limit=100)
+        return by_offset, await _walk(manager, 5), await _walk(manager, 4, user_id="alice")
+
+    by_offset, by_cursor, alice = asyncio.run(main())
+
+    assert [s["session_id"] for s in by_cursor] == [s["session_id"] for s in by_offset]
+    assert [s["session_id"] for s in by_cursor[:3]] == ["s17", "s04", "s22"]
+    assert len({s["session_id"] for s in by_cursor}) == 23
+    assert [s["session_id"] for s in alice] == [s["session_id"] for s in by_offset if int(s["session_id"][1:]) % 2]
+
+
+def test_cursor_round_trip_and_invalid_cursor(manager):
+    session = {"pinned": None, "created_at": "2026-01-01T00:05:00", "session_id": "s15"}
+    assert decode_archive_cursor(encode_archive_cursor(session)) == (False, datetime(2026, 1, 1, 0, 5), "s15")
+
+    with pytest.raises(ValueError):
+        decode_archive_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        asyncio.run(manager.list_archived_sessions(cursor="bm90LWpzb24"))
+
+
+def test_database_calls_run_in_archive_thread_pool(manager, monkeypatch):
+    threads = []
+    original_get_db = manager._get_db
+
+    def tracking_get_db():
+        threads.append(threading.current_thread().name)
+        return original_get_db()
+
+    monkeypatch.setattr(manager, "_get_db", tracking_get_db)
+
+    async def main():
+        return await asyncio.gather(
+            manager.count_archived_sessions(user_id="alice"),
+            manager.get_archived_session("s03"),
+            manager.list_archived_sessions(limit=3, status="completed"),
+        )
+
+    count, session, page = asyncio.run(main())
+
+    assert (count, session["_archived"], len(page)) == (11, True, 3)
+    assert threads and all(name.startswith("archive-db") for name in threads)
@@ -0,0 +1,141 @@
+"""
+Unit tests for archive_sections（归档会话分段压缩存储）
+
+Coverage
+--------
+- 分段拆分 / 还原、分段选择（experts 别名、metadata 总是包含）
+- 预置字典压缩：训练字典后同类数据压缩更小，按写入时的字典解码
+- SessionArchiveManager：分段写入、按分段延迟加载、删除
+- migrate_to_sections：迁移旧版整块 JSON 记录并统计大小 / 延迟
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from intelligent_project_analyzer.services import session_archive_manager
+from intelligent_project_analyzer.services.archive_sections import (
+    ArchiveDictionary,
+    decode_section,
+    encode_section,
+    join_sections,
+    section_samples,
+    select_sections,
+    split_sections,
+    train_dictionary,
+)
+from intelligent_project_analyzer.services.session_archive_manager import (
+    ArchivedSession,
+    ArchivedSessionSection,
+    SessionArchiveManager,
+)
+
+
+def _session(index: int) -> dict:
+    return {
+        "session_id": f"s{index}",
+        "user_id": "alice",
+        "user_input": f"{index}号别墅室内设计",
+        "status": "completed",
+        "created_at": "2026-01-01T10:00:00",
+        "requirement_analysis": {"project_type": "residential", "area": 300 + index},
+        "agent_results": {
+            "2-1": {"expert_name": "空间规划师", "analysis": "动线与功能分区建议 " * 40, "confidence": 0.9},
+            "3-1": {"expert_name": "灯光设计师", "analysis": "自然光与人工照明结合 " * 40, "confidence": 0.8},
+        },
+        "final_report": {"executive_summary": f"第{index}份报告摘要 " * 30, "sections": ["空间", "灯光"]},
+        "generated_images": [{"url": f"/image_blobs/{index:064d}.png"}],
+        "events": [{"type": "node", "name": "requirements_analyst"}],
+    }
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_archive_manager, "ARCHIVE_SECTIONED_STORAGE", True)
+    archive = SessionArchiveManager(database_url=f"sqlite:///{tmp_path / 'archive.db'}")
+    yield archive
+    archive.engine.dispose()
+
+
+def test_split_join_and_select_sections():
+    session = _session(1)
+    sections = split_sections(session)
+
+    assert set(sections) == {"metadata", "requirements", "expert:2-1", "expert:3-1", "report", "images", "timeline"}
+    assert sections["metadata"]["user_id"] == "alice"
+    assert join_sections(sections) == session
+
+    assert select_sections(sections, ["report"]) == ["metadata", "report"]
+    assert select_sections(sections, ["experts"]) == ["metadata", "expert:2-1", "expert:3-1"]
+    only_expert = join_sections({"expert:3-1": sections["expert:3-1"]})
+    assert only_expert == {"agent_results": {"3-1": session["agent_results"]["3-1"]}}
+
+
+def test_trained_dictionary_improves_compression():
+    samples = [sample for i in range(20) for sample in section_samples(split_sections(_session(i)))]
+    dictionary = ArchiveDictionary(1, session_archive_manager.ARCHIVE_CODEC, train_dictionary(samples))
+    content = split_sections(_session(99))["expert:2-1"]
+
+    codec, dict_id, plain, raw_size = encode_section(content)
+    _, trained_id, compressed, _ = encode_section(content, dictionary)
+
+    assert (dict_id, trained_id) == (None, 1)
+    assert len(compressed) < len(plain) < raw_size
+    assert decode_section(codec, compressed, dictionary) == content
+    assert decode_section(codec, plain) == content
+
+
+def test_sectioned_archive_loads_lazily(manager):
+    assert asyncio.run(manager.archive_session("s1", _session(1)))
+
+    db = manager._get_db()
+    archived = db.query(ArchivedSession).filter_by(session_id="s1").one()
+    section_count = db.query(ArchivedSessionSection).filter_by(session_id="s1").count()
+    db.close()
+    assert (archived.storage_format, archived.session_data, archived.final_report) == ("sections", "", None)
+    assert section_count == 7
+
+    full = asyncio.run(manager.get_archived_session("s1"))
+    assert full["agent_results"] == _session(1)["agent_results"] and full["_archived"]
+
+    partial = asyncio.run(manager.get_archived_session("s1", sections=["report"]))
+    assert partial["user_id"] == "alice" and partial["final_report"] == _session(1)["final_report"]
+    assert "agent_results" not in partial and "events" not in partial
+
+    assert asyncio.run(manager.delete_archived_session("s1"))
+    db = manager._get_db()
+    assert db.query(ArchivedSessionSection).count() == 0
+    db.close()
+
+
+def test_migrate_legacy_rows_to_sections(manager):
+    db = manager._get_db()
+    for i in range(6):
+        data = _session(i)
+        db.add(
+            ArchivedSession(
+                session_id=f"s{i}",
+                user_input=data["user_input"],
+                status="completed",
+                created_at=datetime(2026, 1, 1),
+                session_data=json.dumps(data, ensure_ascii=False),
+                final_report=json.dumps(data["final_report"], ensure_ascii=False),
+                storage_format="json",
+            )
+        )
+    db.commit()
+    db.close()
+
+    stats = asyncio.run(manager.migrate_to_sections(batch_size=4))
+
+    assert (stats["migrated"], stats["failed"]) == (6, 0)
+    assert stats["dict_id"] is not None
+    assert 0 < stats["bytes_after"] < stats["bytes_before"] and stats["ratio"] > 1
+    assert asyncio.run(manager.get_archived_session("s3"))["agent_results"] == _session(3)["agent_results"]
+    assert asyncio.run(manager.migrate_to_sections())["migrated"] == 0
+
+    storage = asyncio.run(manager.get_database_stats())["sectioned_storage"]
+    assert (storage["sessions"], storage["legacy_sessions"]) == (6, 0)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Celery 队列路由与公平准入 (services/celery_queues.py) 单元测试
+
+覆盖：
+- 按任务注册名路由：恢复任务进入 interactive，首次分析进入 analysis
+- 配额内按请求优先级入队，超出配额降级，超出突发上限拒绝
+- 槽位释放、过期槽位自动回收、豁免用户不限制
+- 任务结束信号释放槽位，开始信号记录排队耗时
+- 队列深度按优先级子队列汇总
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from intelligent_project_analyzer.services import celery_queues
+from intelligent_project_analyzer.services.celery_queues import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    QUEUE_ANALYSIS,
+    QUEUE_INTERACTIVE,
+    FairShareScheduler,
+    broker_queue_keys,
+    task_headers,
+)
+
+
+class FakeRedis:
+    """最小化的同步 redis 替身（decode_responses=True 语义）"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def zremrangebyscore(self, key, min, max):
+        z = self.data.get(key, {})
+        for member in [m for m, score in z.items() if score <= max]:
+            del z[member]
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.data.get(key, {}).pop(member, None)
+
+    def expire(self, key, seconds):
+        pass
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def lpush(self, key, *values):
+        self.data.setdefault(key, [])[:0] = reversed(values)
+
+    def ltrim(self, key, start, end):
+        self.data[key] = self.data.get(key, [])[start : end + 1]
+
+    def lrange(self, key, start, end):
+        return list(self.data.get(key, []))
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def _queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeQuotaManager:
+    def __init__(self, limit=2, exempt=()):
+        self.limit = limit
+        self.exempt = set(exempt)
+
+    def get_concurrent_task_limit(self, user_id, user_tier="free"):
+        return -1 if user_id in self.exempt else self.limit
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def scheduler(redis):
+    return FairShareScheduler(redis, quota_manager=FakeQuotaManager(limit=2, exempt={"admin"}), burst=1)
+
+
+def test_task_routes_by_kind():
+    from intelligent_project_analyzer.services.celery_app import celery_app
+
+    def queue_of(name):
+        return celery_app.amqp.router.route({}, name, args=(), kwargs={})["queue"].name
+
+    assert queue_of("resume_analysis") == QUEUE_INTERACTIVE
+    assert queue_of("analyze_project") == QUEUE_ANALYSIS
+    assert queue_of("analyze_project_with_files") == QUEUE_ANALYSIS
+    assert [q.name for q in celery_app.conf.task_queues][0] == QUEUE_INTERACTIVE
+
+
+def test_admission_degrades_then_rejects(scheduler):
+    decisions = [scheduler.admit("heavy", f"s{i}", PRIORITY_HIGH) for i in range(4)]
+
+    assert [d.admitted for d in decisions] == [True, True, True, False]
+    assert [d.priority for d in decisions[:3]] == [PRIORITY_HIGH, PRIORITY_HIGH, PRIORITY_LOW]
+    assert decisions[2].throttled
+    assert scheduler.get_inflight("heavy") == 3
+
+    # 其他用户不受影响
+    assert scheduler.admit("light", "x1").priority == PRIORITY_NORMAL
+
+
+def test_release_frees_slot(scheduler):
+    for i in range(3):
+        scheduler.admit("u1", f"s{i}")
+    assert not scheduler.admit("u1", "s3").admitted
+
+    scheduler.release("u1", "s0")
+    scheduler.release("u1", "s0")
+    assert scheduler.get_inflight("u1") == 2
+    assert scheduler.admit("u1", "s3").admitted
+
+
+def test_expired_slots_are_reclaimed(scheduler, redis):
+    scheduler.admit("u1", "stale")
+    redis.data[scheduler._inflight_key("u1")]["stale"] = time.time() - 1
+
+    assert scheduler.get_inflight("u1") == 0
+    assert scheduler.get_inflight_by_user() == {}
+
+
+def test_exempt_user_is_unlimited(scheduler):
+    decisions = [scheduler.admit("admin", f"s{i}") for i in range(10)]
+    assert all(d.admitted and d.priority == PRIORITY_NORMAL for d in decisions)
+    assert scheduler.get_inflight("admin") == 0
+
+
+def test_signals_record_wait_and_release(scheduler, monkeypatch):
+    monkeypatch.setattr(celery_queues, "_scheduler", scheduler)
+    scheduler.admit("u1", "s1")
+
+    headers = task_headers(QUEUE_ANALYSIS, "u1", "s1")
+    headers["enqueued_at"] -= 2.5
+    task = SimpleNamespace(request=SimpleNamespace(delivery_info={}, **headers))
+
+    celery_queues.on_task_prerun(task)
+    celery_queues.on_task_postrun(task)
+
+    wait = scheduler.get_wait_stats(QUEUE_ANALYSIS)
+    assert wait["samples"] == 1
+    assert wait["max_seconds"] >= 2.5
+    assert scheduler.get_inflight("u1") == 0
+
+
+def test_queue_depth_sums_priority_subqueues(scheduler, redis):
+    keys = broker_queue_keys(QUEUE_ANALYSIS)
+    assert keys[0] == QUEUE_ANALYSIS
+    redis.lpush(keys[0], "a")
+    redis.lpush(keys[2], "b", "c")
+
+    metrics = scheduler.get_metrics()
+    assert metrics["queues"][QUEUE_ANALYSIS]["depth"] == 3
+    assert metrics["queues"][QUEUE_ANALYSIS]["depth_by_priority"] == {"0": 1, "3": 0, "6": 2, "9": 0}
+    assert metrics["queues"][QUEUE_INTERACTIVE]["wait"]["samples"] == 0
+
+
+def test_quota_manager_concurrent_limit():
+    from intelligent_project_analyzer.services.quota_manager import QuotaManager
+
+    manager = QuotaManager(config_path="config/__missing_quota__.yaml")
+    assert manager.get_concurrent_task_limit("user_1") == 2
+    assert manager.get_concurrent_task_limit("admin") == -1
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Celery Worker 常驻事件循环 (services/celery_worker_runtime.py) 单元测试
+
+覆盖：
+- 多个任务在同一个常驻循环中执行
+- 共享资源只创建一次，stop() 时释放
+- 调用方超时/中断时取消协程
+- run_async 在 Worker 内走常驻循环，非 Worker 环境保持旧行为
+- task_resources 非 Worker 环境按任务创建与释放
+"""
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from intelligent_project_analyzer.services import celery_worker_runtime as runtime_module
+from intelligent_project_analyzer.services.celery_worker_runtime import WorkerRuntime, task_resources
+
+
+class FakeSessionManager:
+    instances = 0
+
+    def __init__(self):
+        FakeSessionManager.instances += 1
+        self.connected = False
+
+    async def connect(self):
+        self.connected = True
+        return True
+
+    async def disconnect(self):
+        self.connected = False
+
+
+@pytest.fixture
+def fake_resources(monkeypatch):
+    import intelligent_project_analyzer.services.redis_session_manager as rsm
+
+    FakeSessionManager.instances = 0
+    checkpointers = []
+
+    async def _create_checkpointer():
+        checkpointers.append(object())
+        return checkpointers[-1]
+
+    monkeypatch.setattr(rsm, "RedisSessionManager", FakeSessionManager)
+    monkeypatch.setattr(runtime_module, "_create_checkpointer", _create_checkpointer)
+    monkeypatch.delenv("CHECKPOINT_BACKEND", raising=False)
+    return checkpointers
+
+
+@pytest.fixture
+def runtime():
+    rt = WorkerRuntime()
+    rt.start()
+    yield rt
+    rt.stop()
+
+
+def test_tasks_share_one_loop(runtime):
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    loops = {runtime.run(current_loop()) for _ in range(3)}
+    assert loops == {runtime.loop}
+    assert runtime.tasks_run == 3
+
+
+def test_shared_resources_created_once(runtime, fake_resources, monkeypatch):
+    monkeypatch.setattr(runtime_module, "_runtime", runtime)
+
+    async def use_resources():
+        async with task_resources() as (session_manager, checkpointer):
+            return session_manager, checkpointer
+
+    first = runtime.run(use_resources())
+    second = runtime.run(use_resources())
+
+    assert first == second
+    assert FakeSessionManager.instances == 1
+    assert len(fake_resources) == 1
+    assert first[0].connected is True
+
+    runtime.stop()
+    assert first[0].connected is False
+
+
+def test_timeout_cancels_coroutine(runtime):
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        runtime.run(slow(), timeout=0.05)
+
+    async def was_cancelled():
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return cancelled.is_set()
+
+    assert runtime.run(was_cancelled()) is True
+
+
+def test_run_async_uses_worker_loop(runtime, monkeypatch):
+    from intelligent_project_analyzer.services import celery_tasks
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    monkeypatch.setattr(runtime_module, "_runtime", runtime)
+    assert celery_tasks.run_async(current_loop()) is runtime.loop
+
+    monkeypatch.setattr(runtime_module, "_runtime", None)
+    assert celery_tasks.run_async(current_loop()) is not runtime.loop
+
+
+@pytest.mark.asyncio
+async def test_task_resources_outside_worker_are_per_task(fake_resources, monkeypatch):
+    monkeypatch.setattr(runtime_module, "_runtime", None)
+
+    async with task_resources() as (session_manager, checkpointer):
+        assert session_manager.connected is True
+        assert checkpointer is None
+
+    assert session_manager.connected is False
+    assert fake_resources == []
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+LangGraph 检查点库维护 (services/checkpoint_maintenance.py) 单元测试
+
+覆盖：
+- 检查点 ID（UUID v6）时间戳解析
+- 每线程保留最近 N 条 + 中断点，孤立写入一并删除，裁剪后仍可读取最新状态
+- 删除指定线程 / 按会话状态与 TTL 删除过期线程
+- 增量 VACUUM 转换与空间回收、指标
+"""
+import sqlite3
+import time
+import uuid
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from intelligent_project_analyzer.services.checkpoint_maintenance import (
+    INTERRUPT_CHANNEL,
+    CheckpointMaintenance,
+    checkpoint_id_to_timestamp,
+)
+
+
+def config(thread_id):
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def write_history(saver, thread_id, steps, payload_size=0):
+    """写入 steps 条检查点，返回检查点 ID 列表（按时间顺序）"""
+    ids = []
+    cfg = config(thread_id)
+    for step in range(steps):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"step": step, "blob": "x" * payload_size}
+        cfg = saver.put(cfg, checkpoint, {"step": step, "source": "loop"}, {})
+        saver.put_writes(cfg, [("messages", f"m{step}")], task_id=str(uuid.uuid4()))
+        ids.append(cfg["configurable"]["checkpoint_id"])
+    return ids
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "workflow.db"
+
+
+@pytest.fixture
+def saver(db_path):
+    conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+    saver = SqliteSaver(conn)
+    saver.setup()
+    yield saver
+    conn.close()
+
+
+def count(db_path, table, thread_id=None):
+    with sqlite3.connect(str(db_path)) as conn:
+        if thread_id is None:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+
+
+def test_checkpoint_id_timestamp():
+    assert abs(checkpoint_id_to_timestamp(str(uuid6())) - time.time()) < 5
+    assert checkpoint_id_to_timestamp(str(uuid.uuid4())) is None
+    assert checkpoint_id_to_timestamp("not-a-uuid") is None
+
+
+class TestPrune:
+    def test_keeps_last_n_and_latest_state(self, saver, db_path):
+        write_history(saver, "s1", 10)
+        write_history(saver, "s2", 3)
+
+        result = CheckpointMaintenance(db_path, keep_last=4).prune_history()
+
+        assert result == {"threads": 1, "checkpoints": 6, "writes": 6}
+        assert count(db_path, "checkpoints", "s1") == 4
+        assert count(db_path, "writes", "s1") == 4
+        assert count(db_path, "checkpoints", "s2") == 3
+        assert saver.get_tuple(config("s1")).checkpoint["channel_values"]["step"] == 9
+
+    def test_interrupt_checkpoints_survive(self, saver, db_path):
+        ids = write_history(saver, "s1", 6)
+        interrupt_cfg = {"configurable": {"thread_id": "s1", "checkpoint_ns": "", "checkpoint_id": ids[1]}}
+        saver.put_writes(interrupt_cfg, [(INTERRUPT_CHANNEL, "请确认需求")], task_id="t-interrupt")
+
+        CheckpointMaintenance(db_path, keep_last=2).prune_history()
+
+        assert saver.get_tuple(interrupt_cfg) is not None
+        assert count(db_path, "checkpoints", "s1") == 3
+
+    def test_missing_db_is_noop(self, tmp_path):
+        assert CheckpointMaintenance(tmp_path / "none.db").prune_history()["checkpoints"] == 0
+
+
+class TestDropThreads:
+    def test_drop_threads(self, saver, db_path):
+        write_history(saver, "s1", 3)
+        write_history(saver, "s2", 3)
+
+        result = CheckpointMaintenance(db_path).drop_threads(["s1", "unknown"])
+        assert result["threads"] == 1
+        assert count(db_path, "checkpoints", "s1") == 0
+        assert count(db_path, "writes", "s1") == 0
+        assert count(db_path, "checkpoints", "s2") == 3
+
+    @pytest.mark.asyncio
+    async def test_run_drops_stale_sessions_after_grace(self, saver, db_path):
+        write_history(saver, "alive", 2)
+        write_history(saver, "expired", 2)
+
+        async def is_stale(thread_id):
+            return thread_id == "expired"
+
+        maintenance = CheckpointMaintenance(db_path)
+        # 刚写入的线程处于宽限期内，不做会话状态判断
+        await maintenance.run(is_thread_stale=is_stale, thread_ttl_days=0)
+        assert count(db_path, "checkpoints", "expired") == 2
+
+        result = await maintenance.run(is_thread_stale=is_stale, thread_ttl_days=0, stale_grace_seconds=0)
+        assert result["dropped"]["threads"] == 1
+        assert count(db_path, "checkpoints", "expired") == 0
+        assert count(db_path, "checkpoints", "alive") == 2
+        assert maintenance.get_stats()["last_run"]["threads_scanned"] == 2
+
+    @pytest.mark.asyncio
+    async def test_run_drops_threads_past_ttl(self, saver, db_path, monkeypatch):
+        write_history(saver, "old", 2)
+        future = time.time() + 3 * 86400
+        monkeypatch.setattr(time, "time", lambda: future)
+
+        result = await CheckpointMaintenance(db_path).run(thread_ttl_days=2)
+        assert result["dropped"]["threads"] == 1
+
+
+class TestSpace:
+    def test_convert_then_incremental_reclaim(self, saver, db_path):
+        write_history(saver, "s1", 30, payload_size=20_000)
+        maintenance = CheckpointMaintenance(db_path, keep_last=2)
+
+        assert maintenance.reclaim_space()["mode"] == "none"
+        assert maintenance.reclaim_space(convert=True)["mode"] == "converted"
+        assert maintenance.get_stats()["auto_vacuum"] == "incremental"
+
+        size_before = db_path.stat().st_size
+        maintenance.prune_history()
+        space = maintenance.reclaim_space()
+
+        assert space["mode"] == "incremental"
+        assert space["freelist_after"] == 0
+        assert db_path.stat().st_size < size_before
+
+    def test_incremental_reclaim_respects_page_budget(self, saver, db_path):
+        write_history(saver, "s1", 30, payload_size=20_000)
+        CheckpointMaintenance(db_path).reclaim_space(convert=True)
+        maintenance = CheckpointMaintenance(db_path, keep_last=2, vacuum_pages=10)
+        maintenance.prune_history()
+
+        space = maintenance.reclaim_space()
+        assert space["freelist_before"] > 10
+        assert space["freelist_after"] == space["freelist_before"] - 10
+
+    def test_stats(self, saver, db_path):
+        write_history(saver, "s1", 5)
+        write_history(saver, "s2", 2)
+
+        stats = CheckpointMaintenance(db_path).get_stats(top=1)
+        assert stats["checkpoints"] == 7
+        assert stats["writes"] == 7
+        assert stats["threads"] == 2
+        assert stats["top_threads"] == [{"thread_id": "s1", "checkpoints": 5}]
+        assert stats["db_bytes"] > 0
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+外部项目向量回填流水线单元测试
+
+覆盖：
+- 嵌入文本拼接 / 内容指纹 / 维度适配
+- 只处理新增、内容变化的项目；其他模型的向量仅在显式迁移时重嵌
+- 未配置嵌入后端时报错，不静默切换到本地模型
+- 批次失败时游标不前进，重跑可恢复
+- 状态文件中的吞吐与积压指标
+
+使用 SQLite 内存库（JSONB 编译为 JSON），无需 PostgreSQL / pgvector。
+"""
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import List, Sequence
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from intelligent_project_analyzer.external_data_system.models.external_projects import Base, ExternalProject
+from intelligent_project_analyzer.external_data_system.utils.embedding_backfill import (
+    VECTOR_DIM,
+    BaseEmbedder,
+    EmbeddingBackfillPipeline,
+    LocalEmbedder,
+    build_embedding_text,
+    compute_embedding_hash,
+    fit_dimension,
+    get_backfill_metrics,
+    get_embedder,
+    get_embedding_model_id,
+    load_backfill_state,
+    recommended_ivfflat_lists,
+)
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+class FakeEmbedder(BaseEmbedder):
+    """确定性假嵌入：记录每批输入，可配置失败"""
+
+    provider = "fake"
+
+    def __init__(self, model: str = "v1", dim: int = 8, fail: bool = False):
+        super().__init__(model)
+        self.dim = dim
+        self.fail = fail
+        self.calls: List[List[str]] = []
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        if self.fail:
+            raise RuntimeError("provider down")
+        self.calls.append(list(texts))
+        return [[float(len(t))] * self.dim for t in texts]
+
+
+class SQLiteDB:
+    """与 ExternalProjectDatabase 接口一致的内存库"""
+
+    def __init__(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False)
+
+    @contextmanager
+    def get_session(self):
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+@pytest.fixture(autouse=True)
+def embedding_env(monkeypatch):
+    for name in ("EXTERNAL_EMBEDDING_PROVIDER", "EXTERNAL_EMBEDDING_MODEL", "OPENAI_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def db():
+    return SQLiteDB()
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return tmp_path / "embedding_backfill_state.json"
+
+
+def add_projects(db, n: int, start: int = 0):
+    with db.get_session() as session:
+        for i in range(start, start + n):
+            session.add(
+                ExternalProject(
+                    source="gooood",
+                    source_id=str(i),
+                    url=f"https://example.com/{i}",
+                    title=f"项目{i}",
+                    description=f"描述{i}",
+                    content_hash=f"hash-{i}",
+                )
+            )
+
+
+# ---------------------------------------------------------------------------
+# 1. 纯函数
+# ---------------------------------------------------------------------------
+
+
+class TestHelpers:
+    def test_build_text_prefers_bilingual_fields(self):
+        p = SimpleNamespace(title="T", description="legacy", description_zh="中文", description_en="English")
+        assert build_embedding_text(p) == "T\n中文\nEnglish"
+
+    def test_build_text_falls_back_to_description(self):
+        p = SimpleNamespace(title="T", description="legacy", description_zh=None, description_en=None)
+        assert build_embedding_text(p) == "T\nlegacy"
+
+    def test_hash_uses_content_hash_when_present(self):
+        p = SimpleNamespace(title="T", description="d", content_hash="abc")
+        assert compute_embedding_hash(p) == "abc"
+
+    def test_hash_fallback_is_stable(self):
+        p = SimpleNamespace(title="T", description="d", content_hash=None)
+        assert compute_embedding_hash(p) == compute_embedding_hash(p)
+        assert len(compute_embedding_hash(p)) == 64
+
+    def test_fit_dimension_pads_with_zeros(self):
+        v = fit_dimension([1.0, 2.0])
+        assert len(v) == VECTOR_DIM
+        assert v[:2] == [1.0, 2.0] and not any(v[2:])
+
+    def test_fit_dimension_rejects_oversized(self):
+        with pytest.raises(ValueError):
+            fit_dimension([0.0] * (VECTOR_DIM + 1))
+
+    def test_missing_provider_fails_loudly(self, monkeypatch):
+        with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+            get_embedder()
+
+        monkeypatch.setenv("EXTERNAL_EMBEDDING_PROVIDER", "local")
+        assert isinstance(get_embedder(), LocalEmbedder)
+        assert get_embedding_model_id() == "local:BAAI/bge-m3"
+
+    def test_base_embedder_is_abstract(self):
+        with pytest.raises(TypeError):
+            BaseEmbedder("m")
+
+    def test_ivfflat_lists(self):
+        assert recommended_ivfflat_lists(500) == 10
+        assert recommended_ivfflat_lists(200_000) == 200
+        assert recommended_ivfflat_lists(4_000_000) == 2000
+
+
+# ---------------------------------------------------------------------------
+# 2. 增量回填
+# ---------------------------------------------------------------------------
+
+
+class TestPipeline:
+    def test_embeds_all_pending_in_batches(self, db, state_file):
+        add_projects(db, 5)
+        embedder = FakeEmbedder()
+        pipeline = EmbeddingBackfillPipeline(db, embedder=embedder, batch_size=2, state_file=state_file)
+
+        assert pipeline.count_backlog() == 5
+        result = pipeline.run()
+
+        assert result["embedded"] == 5
+        assert result["batches"] == 3
+        assert [len(c) for c in embedder.calls] == [2, 2, 1]
+        assert pipeline.count_backlog() == 0
+
+        with db.get_session() as session:
+            row = session.query(ExternalProject).first()
+            assert len(json.loads(row.description_vector)) == VECTOR_DIM
+            assert row.embedding_content_hash == row.content_hash
+            assert row.embedding_model == "fake:v1"
+
+    def test_second_run_is_noop(self, db, state_file):
+        add_projects(db, 3)
+        EmbeddingBackfillPipeline(db, embedder=FakeEmbedder(), state_file=state_file).run()
+
+        embedder = FakeEmbedder()
+        result = EmbeddingBackfillPipeline(db, embedder=embedder, state_file=state_file).run()
+        assert result["embedded"] == 0
+        assert embedder.calls == []
+
+    def test_changed_content_is_reembedded(self, db, state_file):
+        add_projects(db, 3)
+        EmbeddingBackfillPipeline(db, embedder=FakeEmbedder(), state_file=state_file).run()
+
+        with db.get_session() as session:
+            row = session.query(ExternalProject).filter(ExternalProject.source_id == "1").one()
+            row.description = "新的描述"
+            row.content_hash = "hash-1-v2"
+
+        embedder = FakeEmbedder()
+        result = EmbeddingBackfillPipeline(db, embedder=embedder, state_file=state_file).run()
+        assert result["embedded"] == 1
+        assert embedder.calls == [["项目1\n新的描述"]]
+
+    def test_model_change_reembeds_only_when_migrating(self, db, state_file, monkeypatch):
+        add_projects(db, 3)
+        EmbeddingBackfillPipeline(db, embedder=FakeEmbedder("v1"), state_file=state_file).run()
+        with db.get_session() as session:
+            row = session.query(ExternalProject).filter(ExternalProject.source_id == "1").one()
+            row.content_hash = "hash-1-v2"
+        add_projects(db, 1, start=3)
+
+        embedder = FakeEmbedder("v2")
+        result = EmbeddingBackfillPipeline(db, embedder=embedder, state_file=state_file).run()
+        assert result["embedded"] == 1  # 只有新项目；v1 的向量（即使内容变化）不被改写为 v2
+        assert embedder.calls == [["项目3\n描述3"]]
+
+        monkeypatch.setenv("EXTERNAL_EMBEDDING_PROVIDER", "fake")
+        result = EmbeddingBackfillPipeline(db, embedder=FakeEmbedder("v2"), state_file=state_file).run()
+        assert result["embedded"] == 3
+        with db.get_session() as session:
+            assert {row.embedding_model for row in session.query(ExternalProject)} == {"fake:v2"}
+
+    def test_failed_batch_keeps_cursor_and_resumes(self, db, state_file):
+        add_projects(db, 4)
+        EmbeddingBackfillPipeline(db, embedder=FakeEmbedder(), batch_size=2, state_file=state_file).run(
+            max_batches=1
+        )
+        cursor = load_backfill_state(state_file)["cursor"]
+        assert cursor > 0
+
+        failed = EmbeddingBackfillPipeline(
+            db, embedder=FakeEmbedder(fail=True), batch_size=2, state_file=state_file
+        ).run()
+        assert failed["status"] == "error"
+        assert load_backfill_state(state_file)["cursor"] == cursor
+
+        resumed = EmbeddingBackfillPipeline(db, embedder=FakeEmbedder(), batch_size=2, state_file=state_file).run()
+        assert resumed["embedded"] == 2
+        assert load_backfill_state(state_file)["cursor"] == 0
+
+
+# ---------------------------------------------------------------------------
+# 3. 指标
+# ---------------------------------------------------------------------------
+
+
+class TestMetrics:
+    def test_metrics_report_backlog_and_history(self, db, state_file):
+        add_projects(db, 3)
+        EmbeddingBackfillPipeline(db, embedder=FakeEmbedder(), batch_size=2, state_file=state_file).run(
+            max_batches=1
+        )
+
+        metrics = get_backfill_metrics(db, state_file=state_file)
+        assert metrics["total_embedded"] == 2
+        assert metrics["database"]["with_vector"] == 2
+        assert metrics["database"]["missing_vector"] == 1
+        assert metrics["last_run"]["embedded"] == 2
+        assert len(metrics["history"]) == 1
@@ -0,0 +1,168 @@
+"""
+Unit tests for execution_timeline（会话执行时间线）
+
+Coverage
+--------
+- 真实 StateGraph 上记录 workflow / node / llm span，节点内显式 span 与线程池调用挂在节点下
+- traced 装饰器支持同步与 async 函数，异常记录为 error 状态
+- 关键路径：并行的兄弟 span 中只保留决定总耗时的一条链
+- OTLP/JSON 结构与文件导出（只导出新增 span）
+- 未启用时不记录
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from intelligent_project_analyzer.core.trace_context import TraceContext
+from intelligent_project_analyzer.services import execution_timeline
+from intelligent_project_analyzer.services.execution_timeline import (
+    attach_timeline,
+    export_pending,
+    get_session_timeline,
+    list_timelines,
+    reset_timelines,
+    span,
+    to_otlp,
+    traced,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_timelines(monkeypatch):
+    monkeypatch.setattr(execution_timeline, "TIMELINE_ENABLED", True)
+    monkeypatch.setattr(execution_timeline, "TIMELINE_EXPORT_PATH", "")
+    monkeypatch.setattr(execution_timeline, "TIMELINE_OTLP_ENDPOINT", "")
+    reset_timelines()
+    TraceContext.clear()
+    yield
+    reset_timelines()
+    TraceContext.clear()
+
+
+class _State(TypedDict):
+    value: int
+
+
+@traced("image", "image.generate")
+async def _generate_image():
+    await asyncio.sleep(0.02)
+
+
+def _build_graph():
+    llm = FakeListChatModel(responses=["分析结果"])
+
+    def search(state):
+        with span("bocha.search", "search", query="村落更新"):
+            time.sleep(0.01)
+        llm.invoke("总结搜索结果")
+        return {"value": 1}
+
+    async def render(state):
+        await asyncio.to_thread(traced("pdf", "pdf.render")(lambda: time.sleep(0.005)))
+        await _generate_image()
+        return {"value": 2}
+
+    graph = StateGraph(_State)
+    graph.add_node("search", search)
+    graph.add_node("render", render)
+    graph.add_edge(START, "search")
+    graph.add_edge("search", "render")
+    graph.add_edge("render", END)
+    return attach_timeline(graph.compile())
+
+
+def test_graph_run_records_nested_spans():
+    app = _build_graph()
+    asyncio.run(app.ainvoke({"value": 0}, {"configurable": {"thread_id": "sess-graph"}}))
+
+    timeline = get_session_timeline("sess-graph")
+    spans = {s["name"]: s for s in timeline["spans"]}
+    assert [s["kind"] for s in timeline["spans"]][:2] == ["workflow", "node"]
+    assert spans["search"]["parent"] == timeline["spans"][0]["id"]
+    assert spans["bocha.search"]["parent"] == spans["search"]["id"]
+    assert spans["bocha.search"]["attrs"] == {"query": "村落更新"}
+    assert [s["kind"] for s in timeline["spans"] if s["parent"] == spans["search"]["id"]] == ["search", "llm"]
+    assert spans["pdf.render"]["parent"] == spans["render"]["id"]  # 线程池中继承当前 span
+    assert spans["image.generate"]["depth"] == 2
+    assert timeline["by_kind_ms"]["image"] >= 15
+    assert all(s["status"] == "ok" for s in timeline["spans"])
+    assert list_timelines()[0]["session_id"] == "sess-graph"
+
+
+def test_traced_records_errors_and_session_from_trace_context():
+    TraceContext.init_trace("sess-error")
+
+    @traced("search")
+    def failing_search():
+        raise RuntimeError("quota exceeded")
+
+    with pytest.raises(RuntimeError):
+        failing_search()
+
+    (record,) = get_session_timeline("sess-error")["spans"]
+    assert record["status"] == "error"
+    assert record["error"] == "RuntimeError: quota exceeded"
+    assert record["name"].endswith("failing_search")
+
+
+def test_critical_path_skips_overlapped_siblings():
+    TraceContext.init_trace("sess-critical")
+
+    async def run():
+        async def call(name, delay):
+            with span(name, "llm"):
+                await asyncio.sleep(delay)
+
+        with span("batch", "node"):
+            await asyncio.gather(call("fast", 0.01), call("slow", 0.05))
+        with span("report", "node"):
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    timeline = get_session_timeline("sess-critical")
+    assert timeline["critical_path"] == ["batch", "slow", "report"]
+    assert {s["name"] for s in timeline["spans"] if not s["critical"]} == {"fast"}
+    assert get_session_timeline("missing") is None
+
+
+def test_otlp_export_to_file(tmp_path, monkeypatch):
+    export_path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(execution_timeline, "TIMELINE_EXPORT_PATH", str(export_path))
+    TraceContext.init_trace("sess-otlp")
+
+    with span("outer", "node"):
+        with span("tavily.search", "search", results=5):
+            pass
+
+    payload = to_otlp("sess-otlp")
+    otlp_spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len({s["traceId"] for s in otlp_spans}) == 1 and len(otlp_spans[0]["traceId"]) == 32
+    search = next(s for s in otlp_spans if s["name"] == "tavily.search")
+    outer = next(s for s in otlp_spans if s["name"] == "outer")
+    assert search["parentSpanId"] == outer["spanId"] and outer["parentSpanId"] == ""
+    assert search["kind"] == 3 and outer["kind"] == 1
+    assert {"key": "results", "value": {"intValue": "5"}} in search["attributes"]
+
+    assert export_pending() == 2
+    assert export_pending() == 0  # 只导出新增 span
+    lines = export_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1 and json.loads(lines[0]) == payload
+
+
+def test_disabled_is_noop(monkeypatch):
+    monkeypatch.setattr(execution_timeline, "TIMELINE_ENABLED", False)
+    TraceContext.init_trace("sess-off")
+    graph = object()
+
+    with span("noop", "search") as current:
+        assert current is None
+    assert attach_timeline(graph) is graph
+    assert get_session_timeline("sess-off") is None
@@ -4,7 +4,7 @@ Unit tests for ExternalStateStore (MT-3)
 Coverage
 --------
 - put / get / delete 基本功能
-- TTL 过期回收
+- TTL 过期回收与续期（touch）
 - 内存后端并发安全（粗测）
 - Redis 后端降级（无 REDIS_URL 时使用内存）
 - 全局单例线程安全
@@ -86,6 +86,16 @@ class TestMemoryBackend:
         time.sleep(0.01)
         assert b.get("k3") is None
 
+    def test_touch_extends_ttl(self):
+        b = _MemoryBackend()
+        b.put("k6", "keep", ttl=60)
+        b.put("k7", "gone", ttl=0)
+        time.sleep(0.01)
+        assert b.touch("k6", ttl=3600) is True
+        assert b._store["k6"][1] > time.monotonic() + 3000
+        assert b.touch("k7", ttl=3600) is False  # 已过期不再续期
+        assert b.touch("ghost", ttl=3600) is False
+
     def test_cleanup_expired(self):
         b = _MemoryBackend()
         b.put("k4", "x", ttl=0)
@@ -0,0 +1,140 @@
+"""
+Unit tests for image_blob_store（内容寻址图片存储）
+
+Coverage
+--------
+- 同内容只写一次、data URL 与引用互转
+- WebP 派生图按允许宽度生成并缓存
+- 访问路由：ETag / If-None-Match、Range（206 / 416）、缩略图
+- ImageStorageManager 保存引用（会话目录不再写图片文件）、归档清理改为外部化
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from intelligent_project_analyzer.api.image_blob_routes import router
+from intelligent_project_analyzer.services import image_blob_store
+from intelligent_project_analyzer.services.image_blob_store import (
+    ImageBlobStore,
+    externalize_data_url,
+    get_image_blob_store,
+    inline_blob_url,
+    parse_blob_url,
+    reset_image_blob_store,
+)
+from intelligent_project_analyzer.services.image_storage_manager import ImageStorageManager
+from intelligent_project_analyzer.services.session_archive_manager import SessionArchiveManager
+
+
+def _png(width: int = 600, height: int = 300) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _data_url(data: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_blob_store, "IMAGE_BLOB_STORE_ENABLED", True)
+    blob_store = ImageBlobStore(root=str(tmp_path / "blobs"))
+    reset_image_blob_store(blob_store)
+    yield blob_store
+    reset_image_blob_store()
+
+
+def test_put_dedups_and_round_trips(store):
+    data = _png()
+    url = externalize_data_url(_data_url(data))
+
+    assert url.startswith("/image_blobs/") and url.endswith(".png")
+    assert externalize_data_url(_data_url(data)) == url
+    assert store.stats()["puts"] == 1 and store.stats()["dedup_hits"] == 1
+    assert len(list(store.root.rglob("*.png"))) == 1
+
+    digest, ext = parse_blob_url("https://cdn.example.com" + url)
+    assert store.read(digest, ext) == data
+    assert inline_blob_url(url) == _data_url(data)
+    assert externalize_data_url("/generated_images/s1/a.png") == "/generated_images/s1/a.png"
+
+
+def test_derivative_is_resized_webp(store):
+    ref = store.put(_png(1200, 600))
+    path = store.derivative(ref.digest, 256)
+
+    with Image.open(path) as img:
+        assert (img.format, img.size) == ("WEBP", (256, 128))
+    assert store.derivative(ref.digest, 256) == path
+    assert store.stats()["derivatives"] == 1
+
+    with pytest.raises(ValueError):
+        store.derivative(ref.digest, 300)
+    with pytest.raises(ValueError):
+        store.derivative("../../etc", 256)
+    assert store.derivative("0" * 64, 256) is None
+
+
+def test_routes_support_etag_and_range(store):
+    data = _png()
+    ref = store.put(data)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    response = client.get(ref.url)
+    assert response.status_code == 200 and response.content == data
+    assert response.headers["etag"] == f'"{ref.digest}"'
+    assert "immutable" in response.headers["cache-control"]
+
+    assert client.get(ref.url, headers={"If-None-Match": f'"{ref.digest}"'}).status_code == 304
+
+    partial = client.get(ref.url, headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206 and partial.content == data[:10]
+    assert partial.headers["content-range"] == f"bytes 0-9/{len(data)}"
+    assert client.get(ref.url, headers={"Range": "bytes=-4"}).content == data[-4:]
+    assert client.get(ref.url, headers={"Range": f"bytes={len(data)}-"}).status_code == 416
+
+    thumbnail = client.get(ref.thumbnail_url())
+    assert thumbnail.status_code == 200 and thumbnail.headers["content-type"] == "image/webp"
+    assert client.get(f"/image_blobs/{ref.digest}/w300.webp").status_code == 404
+    assert client.get("/image_blobs/" + "0" * 64 + ".png").status_code == 404
+
+
+def test_storage_manager_and_archive_keep_references(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(ImageStorageManager, "BASE_DIR", tmp_path / "generated_images")
+    data_url = _data_url(_png())
+    blob_url = get_image_blob_store().put_data_url(data_url).url
+
+    metadata = asyncio.run(
+        ImageStorageManager.save_image(
+            base64_data=blob_url,
+            session_id="s1",
+            deliverable_id="d1",
+            owner_role="2-1",
+            filename="d1_v1.png",
+            visual_prompt="living room",
+        )
+    )
+
+    assert metadata["url"] == metadata["image_url"] == blob_url
+    assert metadata["thumbnail_url"].endswith("/w256.webp")
+    session_dir = tmp_path / "generated_images" / "s1"
+    assert [p.name for p in session_dir.iterdir()] == ["metadata.json"]
+    assert json.loads((session_dir / "metadata.json").read_text("utf-8"))["images"][0]["content_hash"]
+    assert asyncio.run(ImageStorageManager.delete_image("s1", "d1"))
+    assert store.open_path(*parse_blob_url(blob_url)) is not None  # 共享内容不随会话删除
+
+    session = {"final_report": {"images": [{"image_url": data_url}]}}
+    assert SessionArchiveManager._remove_base64_from_dict(session) == len(data_url)
+    assert session["final_report"]["images"][0]["image_url"] == blob_url
+    assert store.stats()["puts"] == 1
@@ -0,0 +1,123 @@
+"""
+Unit tests for image_job_planner（报告级概念图调度）
+
+Coverage
+--------
+- 按提供商限制图像 API 并发
+- 报告额度：按剩余额度获批、失败归还
+- generate_deliverable_image：多张图片并发生成、逐张回调、额度不足时截断
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from intelligent_project_analyzer.services import image_job_planner
+from intelligent_project_analyzer.services.image_generator import ImageGenerationResult, ImageGeneratorService
+from intelligent_project_analyzer.services.image_job_planner import (
+    claim_report_images,
+    get_image_job_stats,
+    image_slot,
+    refund_report_images,
+    reset_image_jobs,
+)
+from intelligent_project_analyzer.services.image_storage_manager import ImageStorageManager
+
+
+@pytest.fixture(autouse=True)
+def clean_jobs(monkeypatch):
+    monkeypatch.setattr(image_job_planner, "IMAGE_PROVIDER_CONCURRENCY", 2)
+    monkeypatch.setattr(image_job_planner, "IMAGE_REPORT_BUDGET", 3)
+    reset_image_jobs()
+    yield
+    reset_image_jobs()
+
+
+def test_image_slot_limits_provider_concurrency():
+    active = {"now": 0, "max": 0}
+
+    async def call(provider):
+        async with image_slot(provider):
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+
+    async def main():
+        await asyncio.gather(*(call("openrouter.ai") for _ in range(5)))
+
+    asyncio.run(main())
+    stats = get_image_job_stats()["providers"]["openrouter.ai"]
+    assert active["max"] == 2
+    assert (stats["requests"], stats["max_active"], stats["active"], stats["waiting"]) == (5, 2, 0, 0)
+
+
+def test_report_budget_claim_and_refund():
+    assert claim_report_images("s1", 2) == 2
+    assert claim_report_images("s1", 2) == 1
+    assert claim_report_images("s1", 1) == 0
+    refund_report_images("s1", 1)
+    assert claim_report_images("s1", 5) == 1
+    assert claim_report_images("s2", 2) == 2  # 额度按报告隔离
+
+    stats = get_image_job_stats()
+    assert (stats["claimed"], stats["refunded"], stats["denied"]) == (6, 1, 6)
+
+
+def test_deliverable_images_generated_concurrently_within_budget(monkeypatch):
+    service = ImageGeneratorService(api_key="test-key")
+    active = {"now": 0, "max": 0}
+
+    async def fake_brief(self, **kwargs):
+        return "living room brief", "warm wood"
+
+    async def fake_prompt(self, **kwargs):
+        return "modern living room, warm wood furniture, natural light, photorealistic interior rendering " * 2
+
+    async def fake_generate(self, prompt, aspect_ratio=None, style=None):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if "wide angle" in prompt:
+            return ImageGenerationResult(success=False, error="upstream error")
+        return ImageGenerationResult(success=True, image_url="/image_blobs/x.png")
+
+    async def fake_save(**kwargs):
+        return {
+            "deliverable_id": kwargs["deliverable_id"],
+            "filename": kwargs["filename"],
+            "url": kwargs["base64_data"],
+            "owner_role": kwargs["owner_role"],
+            "prompt": kwargs["visual_prompt"],
+        }
+
+    monkeypatch.setattr(ImageGeneratorService, "_extract_visual_brief", fake_brief)
+    monkeypatch.setattr(ImageGeneratorService, "_generate_structured_prompt", fake_prompt)
+    monkeypatch.setattr(ImageGeneratorService, "generate_image", fake_generate)
+    monkeypatch.setattr(ImageStorageManager, "save_image", staticmethod(fake_save))
+
+    streamed = []
+
+    async def on_image(image):
+        streamed.append(image.filename)
+
+    deliverable = {"id": "d1", "owner_role": "2-1", "name": "客厅", "concept_image_config": {"count": 4}}
+
+    async def main():
+        return await service.generate_deliverable_image(
+            deliverable_metadata=deliverable,
+            expert_analysis="客厅设计",
+            session_id="s1",
+            on_image=on_image,
+            use_report_budget=True,
+        )
+
+    images = asyncio.run(main())
+
+    # 额度为 3：3 张图片并发请求，其中 v2（wide angle view）失败并归还额度
+    assert active["max"] == 3
+    assert sorted(image.filename for image in images) == sorted(streamed)
+    assert len(images) == 2 and images[0].filename.endswith("_v1.png")
+    assert claim_report_images("s1", 5) == 1
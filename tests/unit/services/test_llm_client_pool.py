@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+LLM 客户端池 (services/llm_client_pool.py) 单元测试
+
+覆盖：
+- 相同 provider/model/Key 复用实例与客户端，temperature / max_tokens 按次覆盖
+- Key、timeout 不同则构建独立实例
+- 调用方自带 http_client 时绕过缓存
+- 多次调用复用同一 keep-alive 连接（本地 HTTP 服务）
+- 多个事件循环先后调用共享异步客户端（各循环独立连接池）
+- 覆盖参数经构造函数校验
+- MultiLLMFactory 经客户端池创建实例
+"""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from langchain_openai import ChatOpenAI
+
+from intelligent_project_analyzer.services import llm_client_pool
+from intelligent_project_analyzer.services.llm_client_pool import (
+    get_llm_client_stats,
+    get_pooled_chat_model,
+    reset_llm_client_pool,
+)
+
+BASE_PARAMS = {
+    "model": "test-model",
+    "api_key": "sk-test",
+    "base_url": "http://127.0.0.1:9/v1",
+    "timeout": 30,
+    "max_retries": 0,
+}
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "test-model",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def clean_pool(monkeypatch):
+    monkeypatch.setattr(llm_client_pool, "LLM_CLIENT_POOL_ENABLED", True)
+    reset_llm_client_pool()
+    yield
+    reset_llm_client_pool()
+
+
+@pytest.fixture
+def completion_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_same_key_reuses_client_with_overrides():
+    first = get_pooled_chat_model("openrouter", ChatOpenAI, {**BASE_PARAMS, "temperature": 0.2, "max_tokens": 100})
+    second = get_pooled_chat_model("openrouter", ChatOpenAI, {**BASE_PARAMS, "temperature": 0.9, "max_tokens": 4000})
+
+    assert first is not second
+    assert first.root_client is second.root_client
+    assert (first.temperature, first.max_tokens) == (0.2, 100)
+    assert (second.temperature, second.max_tokens) == (0.9, 4000)
+
+    second.temperature = 0.0  # 修改返回实例不影响缓存
+    third = get_pooled_chat_model("openrouter", ChatOpenAI, {**BASE_PARAMS, "temperature": 0.5})
+    assert third.temperature == 0.5
+
+    stats = get_llm_client_stats()
+    assert stats["cached_models"] == 1
+    assert stats["providers"]["openrouter"]["models_created"] == 1
+    assert stats["providers"]["openrouter"]["models_reused"] == 2
+
+
+def test_different_key_or_timeout_builds_new_model():
+    base = get_pooled_chat_model("deepseek", ChatOpenAI, BASE_PARAMS)
+    other_key = get_pooled_chat_model("deepseek", ChatOpenAI, {**BASE_PARAMS, "api_key": "sk-other"})
+    other_timeout = get_pooled_chat_model("deepseek", ChatOpenAI, {**BASE_PARAMS, "timeout": 60})
+
+    assert base.root_client is not other_key.root_client
+    assert base.root_client is not other_timeout.root_client
+    assert base.http_async_client is other_key.http_async_client  # 同一 base_url 共享连接池
+    assert get_llm_client_stats()["http_pools"] == 1
+    assert get_llm_client_stats()["providers"]["deepseek"]["models_created"] == 3
+
+
+def test_caller_http_client_bypasses_cache():
+    own_client = httpx.Client()
+    llm = get_pooled_chat_model("openai", ChatOpenAI, {**BASE_PARAMS, "http_client": own_client})
+
+    assert llm.http_client is own_client
+    assert get_llm_client_stats()["cached_models"] == 0
+    own_client.close()
+
+
+def test_requests_reuse_keepalive_connection(completion_server):
+    params = {**BASE_PARAMS, "base_url": completion_server}
+    for temperature in (0.1, 0.5, 0.9):
+        llm = get_pooled_chat_model("openai", ChatOpenAI, {**params, "temperature": temperature})
+        assert llm.invoke("你好").content == "ok"
+
+    stats = get_llm_client_stats()["providers"]["openai"]
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connection_reuse_rate"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+def test_multi_llm_factory_uses_pool(monkeypatch):
+    from intelligent_project_analyzer.services.multi_llm_factory import MultiLLMFactory
+
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "sk-deepseek")
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "http://127.0.0.1:9/v1")
+
+    cold = MultiLLMFactory.create_llm(provider="deepseek", temperature=0.3, max_tokens=500, timeout=30, max_retries=0)
+    warm = MultiLLMFactory.create_llm(provider="deepseek", temperature=0.8, max_tokens=900, timeout=30, max_retries=0)
+
+    assert cold.root_client is warm.root_client
+    assert warm.temperature == 0.8 and warm.max_tokens == 900
+    assert get_llm_client_stats()["providers"]["deepseek"]["models_reused"] == 1
+
+
+def test_async_calls_from_separate_event_loops(completion_server):
+    params = {**BASE_PARAMS, "base_url": completion_server}
+
+    async def call():
+        llm = get_pooled_chat_model("openai", ChatOpenAI, params)
+        return (await llm.ainvoke("你好")).content
+
+    # 模拟工作线程 / Celery 中各自 asyncio.run 的事件循环：第二个循环不能复用第一个循环的连接
+    assert asyncio.run(call()) == "ok"
+    assert asyncio.run(call()) == "ok"
+
+    stats = get_llm_client_stats()
+    assert stats["http_pools"] == 1
+    assert stats["providers"]["openai"]["async_loop_pools"] == 2
+
+
+def test_overrides_are_validated():
+    get_pooled_chat_model("openrouter", ChatOpenAI, BASE_PARAMS)
+
+    with pytest.raises(ValueError):
+        get_pooled_chat_model("openrouter", ChatOpenAI, {**BASE_PARAMS, "n": 2, "streaming": True})
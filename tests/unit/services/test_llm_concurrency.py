@@ -0,0 +1,270 @@
+"""
+Unit tests for llm_concurrency（全局 LLM 并发控制器）
+
+Coverage
+--------
+- AIMD：成功加性增长、429 乘性减小、冷却期内只减一次
+- 优先级：交互调用先于后台批次出队，预留槽位只给交互调用
+- HTTP 传输层按 Key 限流、429 反馈；流式响应默认收到响应头即归还，LLM_HOLD_STREAM_SLOTS 时读完才归还
+- 已持有槽位的上下文中 HTTP 层不重复计数；事件循环线程中的同步调用超额放行，线程池中等待超时超额放行
+- 工作流节点优先级回调
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from intelligent_project_analyzer.services import llm_concurrency
+from intelligent_project_analyzer.services.llm_concurrency import (
+    AsyncGatedTransport,
+    GatedTransport,
+    LLMPriority,
+    attach_llm_priorities,
+    current_llm_priority,
+    get_llm_controller,
+    get_llm_stats,
+    llm_slot,
+)
+
+
+@pytest.fixture
+def controller_env(monkeypatch):
+    def configure(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        monkeypatch.setattr(llm_concurrency, "_provider_key_count", lambda provider: 0)
+        llm_concurrency.reset_semaphore()
+        return get_llm_controller()
+
+    yield configure
+    llm_concurrency.reset_semaphore()
+
+
+def test_aimd_increase_and_decrease(controller_env):
+    controller = controller_env(LLM_GLOBAL_CONCURRENCY=16, LLM_PROVIDER_CONCURRENCY=8, LLM_AIMD_COOLDOWN=60)
+    provider = controller._provider("deepseek")
+    assert provider.effective_limit == 8
+
+    controller.record_result("deepseek", rate_limited=True)
+    controller.record_result("deepseek", rate_limited=True)  # 冷却期内不重复减小
+    assert provider.effective_limit == 4
+
+    for _ in range(10):  # 加性增长：上限为 4 时 4 次成功 +1，上限为 5 时 5 次成功 +1
+        controller.record_result("deepseek", latency_ms=100)
+    assert provider.effective_limit == 6
+
+    stats = get_llm_stats()["providers"]["deepseek"]
+    assert (stats["rate_limited"], stats["decreases"], stats["increases"]) == (2, 1, 2)
+    assert stats["history"][0] == {**stats["history"][0], "from": 8, "to": 4}
+
+
+def test_latency_target_shrinks_limit(controller_env):
+    controller = controller_env(LLM_GLOBAL_CONCURRENCY=10, LLM_LATENCY_TARGET_MS=1000, LLM_AIMD_COOLDOWN=0)
+    controller.record_result("openrouter", latency_ms=5000)
+    assert controller._provider("openrouter").effective_limit == 9
+    assert get_llm_stats()["providers"]["openrouter"]["slow_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_jump_the_queue(controller_env):
+    controller = controller_env(LLM_GLOBAL_CONCURRENCY=2, LLM_INTERACTIVE_RESERVED=0)
+    held = [await controller.acquire("openrouter", priority=LLMPriority.BACKGROUND) for _ in range(2)]
+    order = []
+
+    async def call(name, priority):
+        slot = await controller.acquire("openrouter", priority=priority)
+        order.append(name)
+        return slot
+
+    tasks = [asyncio.create_task(call("expert", LLMPriority.BACKGROUND))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("questionnaire", LLMPriority.INTERACTIVE)))
+    await asyncio.sleep(0)
+    assert get_llm_stats()["waiting_by_priority"] == {"interactive": 1, "normal": 0, "background": 1}
+
+    held[0].release()
+    await asyncio.sleep(0.01)
+    assert order == ["questionnaire"]
+
+    held[1].release()
+    for slot in await asyncio.gather(*tasks):
+        slot.release()
+    assert order == ["questionnaire", "expert"]
+    assert get_llm_stats()["llm_active_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reserved_slot_only_for_interactive(controller_env):
+    controller = controller_env(LLM_GLOBAL_CONCURRENCY=2, LLM_INTERACTIVE_RESERVED=1)
+    background = await controller.acquire("openrouter", priority=LLMPriority.BACKGROUND)
+
+    waiting = asyncio.create_task(controller.acquire("openrouter", priority=LLMPriority.NORMAL))
+    interactive = await asyncio.wait_for(controller.acquire("openrouter", priority=LLMPriority.INTERACTIVE), 1)
+    assert not waiting.done()
+
+    interactive.release()
+    background.release()
+    (await asyncio.wait_for(waiting, 1)).release()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue(controller_env):
+    controller = controller_env(LLM_GLOBAL_CONCURRENCY=1)
+    held = await controller.acquire("openrouter")
+    waiter = asyncio.create_task(controller.acquire("openrouter"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    held.release()
+    assert get_llm_stats()["llm_waiting"] == 0
+    assert get_llm_stats()["llm_active_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_http_transport_limits_per_key_and_reports_429(controller_env):
+    controller_env(LLM_GLOBAL_CONCURRENCY=8, LLM_PER_KEY_CONCURRENCY=2, LLM_AIMD_COOLDOWN=60)
+    active = {"now": 0, "max": 0}
+
+    async def handler(request):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return httpx.Response(429 if request.url.path == "/limited" else 200, json={})
+
+    transport = AsyncGatedTransport("openrouter", httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport, base_url="https://llm.test") as client:
+        headers = {"Authorization": "Bearer key-a"}
+        await asyncio.gather(*(client.post("/chat", headers=headers) for _ in range(6)))
+        assert active["max"] == 2
+
+        await client.post("/limited", headers=headers)
+
+    stats = get_llm_stats()
+    assert stats["providers"]["openrouter"]["rate_limited"] == 1
+    assert stats["providers"]["openrouter"]["limit"] == 4
+    assert stats["llm_active_calls"] == 0
+
+
+def _sse_handler(request):
+    # 迭代器内容不会被 Response 预先读入，与真实网络响应一致
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=iter([b"data: {}\n\n"]))
+
+
+def test_stream_releases_slot_at_headers_by_default(controller_env):
+    controller_env(LLM_GLOBAL_CONCURRENCY=1)
+
+    with httpx.Client(transport=GatedTransport("openrouter", httpx.MockTransport(_sse_handler))) as client:
+        with client.stream("POST", "https://llm.test/chat") as first:
+            assert get_llm_stats()["llm_active_calls"] == 0
+            # 长时间未读完的流不占用槽位，上限为 1 时第二个请求也不会被阻塞
+            with client.stream("POST", "https://llm.test/chat") as second:
+                assert list(second.iter_lines()) == ["data: {}", ""]
+            assert list(first.iter_lines()) == ["data: {}", ""]
+    assert get_llm_stats()["providers"]["openrouter"]["calls"] == 2
+
+
+def test_sync_stream_holds_slot_until_closed(controller_env):
+    controller_env(LLM_GLOBAL_CONCURRENCY=4, LLM_HOLD_STREAM_SLOTS="true")
+    handler = _sse_handler
+
+    with httpx.Client(transport=GatedTransport("openai", httpx.MockTransport(handler))) as client:
+        with client.stream("POST", "https://llm.test/chat") as response:
+            assert get_llm_stats()["llm_active_calls"] == 1
+            assert list(response.iter_lines()) == ["data: {}", ""]
+        assert get_llm_stats()["llm_active_calls"] == 0
+
+        with client.stream("POST", "https://llm.test/chat"):
+            assert get_llm_stats()["llm_active_calls"] == 1  # 未读完直接关闭也归还
+        assert get_llm_stats()["llm_active_calls"] == 0
+
+        client.post("https://llm.test/chat")
+    assert get_llm_stats()["providers"]["openai"]["calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_held_slot_is_not_counted_twice(controller_env):
+    controller_env(LLM_GLOBAL_CONCURRENCY=1)
+    transport = AsyncGatedTransport("openrouter", httpx.MockTransport(lambda request: httpx.Response(429)))
+
+    async with llm_slot("openrouter") as slot:
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.post("https://llm.test/chat")  # 全局上限为 1，重复获取会死锁
+        assert get_llm_stats()["llm_active_calls"] == 1
+
+    assert slot.queued_ms >= 0
+    assert get_llm_stats()["providers"]["openrouter"]["rate_limited"] == 1
+    assert get_llm_stats()["llm_active_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_acquire_in_event_loop_does_not_block(controller_env):
+    controller = controller_env(LLM_GLOBAL_CONCURRENCY=1)
+    held = await controller.acquire("openai")
+
+    extra = controller.acquire_sync("openai")  # 事件循环线程中等待会阻塞持有者释放
+    assert get_llm_stats()["loop_bypass"] == 1
+    extra.release()
+    held.release()
+
+    acquired = threading.Event()
+    held = await controller.acquire("openai")
+    thread = threading.Thread(target=lambda: (controller.acquire_sync("openai").release(), acquired.set()))
+    thread.start()
+    await asyncio.sleep(0.02)
+    assert not acquired.is_set()  # 线程池中的同步调用正常排队
+    held.release()
+    await asyncio.to_thread(thread.join, 1)
+    assert acquired.is_set()
+
+
+def test_sync_acquire_overdrafts_after_timeout(controller_env):
+    controller = controller_env(LLM_GLOBAL_CONCURRENCY=1, LLM_SYNC_WAIT_TIMEOUT=0.05)
+    held = controller.acquire_sync("openai")
+
+    # 持有者可能正等待同一线程池中的线程，等待者不能无限期阻塞
+    extra = controller.acquire_sync("openai")
+    stats = get_llm_stats()
+    assert (stats["sync_overdraft"], stats["llm_active_calls"], stats["llm_waiting"]) == (1, 2, 0)
+
+    extra.release()
+    held.release()
+    assert get_llm_stats()["llm_active_calls"] == 0
+
+
+class _State(TypedDict):
+    priorities: list
+
+
+def test_node_priorities_applied_during_graph_run():
+    def questionnaire(state):
+        return {"priorities": state["priorities"] + [current_llm_priority()]}
+
+    async def expert(state):
+        seen = await asyncio.to_thread(current_llm_priority)
+        return {"priorities": state["priorities"] + [seen]}
+
+    def other(state):
+        return {"priorities": state["priorities"] + [current_llm_priority()]}
+
+    graph = StateGraph(_State)
+    graph.add_node("progressive_step1_core_task", questionnaire)
+    graph.add_node("agent_executor", expert)
+    graph.add_node("project_director", other)
+    graph.add_edge(START, "progressive_step1_core_task")
+    graph.add_edge("progressive_step1_core_task", "agent_executor")
+    graph.add_edge("agent_executor", "project_director")
+    graph.add_edge("project_director", END)
+    app = attach_llm_priorities(graph.compile())
+
+    result = asyncio.run(app.ainvoke({"priorities": []}))
+
+    assert result["priorities"] == [LLMPriority.INTERACTIVE, LLMPriority.BACKGROUND, LLMPriority.NORMAL]
+    assert current_llm_priority() is LLMPriority.NORMAL
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Prompt 前缀布局与 prompt 缓存统计 (services/prompt_cache_stats.py) 单元测试
+
+覆盖：
+- sf 知识注入文本只取决于模式组合（顺序、置信度不影响），并缓存
+- 专家 system prompt 以稳定前缀开头，会话相关内容在知识块之后
+- 审核 sf 评估上下文不含置信度
+- 从 OpenAI / DeepSeek usage 元数据提取命中缓存的 prompt token
+- 回调按智能体记录命中率、延迟与节省估算
+"""
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+from intelligent_project_analyzer.core.prompt_templates import ExpertPromptTemplate
+from intelligent_project_analyzer.review.review_agents import ReviewerRole
+from intelligent_project_analyzer.services import prompt_cache_stats
+from intelligent_project_analyzer.services.prompt_cache_stats import (
+    extract_cache_usage,
+    get_prompt_cache_stats,
+    prompt_cache_callback,
+    record_prompt_prefix,
+    reset_prompt_cache_stats,
+)
+from intelligent_project_analyzer.services.sf_knowledge_loader import get_full_knowledge_injection
+
+MODES_A = [{"mode": "M5_rural_context", "confidence": 0.85}, {"mode": "M1_concept_driven", "confidence": 0.6}]
+MODES_B = [{"mode": "M1_concept_driven", "confidence": 0.9}, {"mode": "M5_rural_context", "confidence": 0.3}]
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_prompt_cache_stats()
+    yield
+    reset_prompt_cache_stats()
+
+
+def _usage_message(input_tokens, cache_read):
+    return AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": 10,
+            "total_tokens": input_tokens + 10,
+            "input_token_details": {"cache_read": cache_read},
+        },
+    )
+
+
+def test_knowledge_injection_is_deterministic_per_mode_combination():
+    first = get_full_knowledge_injection(MODES_A)
+    second = get_full_knowledge_injection(MODES_B)
+
+    assert first == second
+    assert "85%" not in first and "90%" not in first
+    assert first.index("M1_concept_driven") < first.index("M5_rural_context")
+
+
+def test_expert_prompt_starts_with_stable_prefix():
+    template = ExpertPromptTemplate("V3", "你是叙事专家", {"version": "4.0", "protocol_content": "协议"})
+    knowledge = get_full_knowledge_injection(MODES_A)
+
+    with patch.object(ExpertPromptTemplate, "_build_few_shot_section", return_value=""):
+        prompts = [
+            template.render(
+                dynamic_role_name=name,
+                task_instruction={"objective": objective, "deliverables": []},
+                context="项目上下文",
+                state={"confirmed_core_tasks": []},
+                knowledge_prefix=knowledge,
+            )
+            for name, objective in (("乡村叙事专家", "分析村落"), ("民宿体验专家", "分析民宿"))
+        ]
+
+    assert prompts[0]["stable_prefix"] == prompts[1]["stable_prefix"]
+    for prompt in prompts:
+        system_prompt = prompt["system_prompt"]
+        assert system_prompt.startswith(prompt["stable_prefix"])
+        assert system_prompt.index("严格输出要求") < system_prompt.index("动态角色定义")
+        assert system_prompt.index(knowledge) < system_prompt.index("TaskInstruction - 你的明确任务指令")
+
+
+def test_review_context_omits_confidence():
+    with patch(
+        "intelligent_project_analyzer.services.sf_knowledge_loader.get_quality_floor_checklist",
+        return_value="Q1｜任务不得虚构",
+    ):
+        first = ReviewerRole._build_sf_evaluation_context({"_detected_design_modes": MODES_A})
+        second = ReviewerRole._build_sf_evaluation_context({"detected_design_modes": MODES_B})
+
+    assert first == second
+    assert "Q1｜任务不得虚构" in first
+
+
+def test_extract_cache_usage_from_provider_metadata():
+    assert extract_cache_usage(_usage_message(1200, 1024)) == (1200, 1024)
+
+    deepseek = AIMessage(
+        content="ok",
+        response_metadata={"token_usage": {"prompt_tokens": 900, "prompt_cache_hit_tokens": 640}},
+    )
+    assert extract_cache_usage(deepseek) == (900, 640)
+
+    openai_raw = {"token_usage": {"prompt_tokens": 500, "prompt_tokens_details": {"cached_tokens": 256}}}
+    assert extract_cache_usage(None, openai_raw) == (500, 256)
+    assert extract_cache_usage(AIMessage(content="ok")) is None
+
+
+def test_callback_records_per_agent_stats(monkeypatch):
+    monkeypatch.setattr(prompt_cache_stats, "PROMPT_CACHE_DISCOUNT", 0.1)
+    monkeypatch.setattr(prompt_cache_stats, "PROMPT_INPUT_PRICE_PER_1K_TOKENS", 2.0)
+    llm = FakeMessagesListChatModel(responses=[_usage_message(2000, 0), _usage_message(2000, 1500)])
+
+    for _ in range(2):
+        llm.invoke("你好", config={"callbacks": [prompt_cache_callback("V3")]})
+    no_usage = FakeMessagesListChatModel(responses=[AIMessage(content="ok")])
+    no_usage.invoke("你好", config={"callbacks": [prompt_cache_callback("V4")]})  # 无 usage 的响应只计调用数
+    record_prompt_prefix("V3", "稳定前缀")
+    record_prompt_prefix("V3", "稳定前缀")
+
+    stats = get_prompt_cache_stats()
+    v3 = stats["agents"]["V3"]
+    assert (v3["calls"], v3["cache_hit_calls"]) == (2, 1)
+    assert (v3["prompt_tokens"], v3["cached_tokens"], v3["uncached_tokens"]) == (4000, 1500, 2500)
+    assert v3["cache_hit_rate"] == 0.375
+    assert v3["saved_input_tokens"] == 1350
+    assert v3["avg_latency_ms_cached"] is not None and v3["avg_latency_ms_uncached"] is not None
+    assert v3["prefix_variants"] == 1
+    assert (stats["agents"]["V4"]["calls"], stats["agents"]["V4"]["calls_with_usage"]) == (1, 0)
+    assert stats["saved_cost"] == pytest.approx(2.7)
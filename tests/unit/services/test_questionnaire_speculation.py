@@ -0,0 +1,183 @@
+"""
+Unit tests for questionnaire_speculation（问卷推测式预生成）
+
+Coverage
+--------
+- 指纹一致命中（生成中则等待剩余时间）、修补命中、未命中重新生成
+- 节点从 interrupt 恢复后重放直接复用结果
+- 预生成异常时回退同步生成
+- 渐进式问卷：Step 1 等待期间预生成补充问题，Step 3 取用；Step 3 等待期间预生成雷达维度
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from intelligent_project_analyzer.interaction.nodes import progressive_questionnaire
+from intelligent_project_analyzer.interaction.nodes.progressive_questionnaire import ProgressiveQuestionnaireNode
+from intelligent_project_analyzer.services import questionnaire_speculation
+from intelligent_project_analyzer.services.questionnaire_speculation import (
+    get_speculation_stats,
+    reset_speculation,
+    resolve_speculation,
+    speculate,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_speculation(monkeypatch):
+    monkeypatch.setattr(questionnaire_speculation, "QUESTIONNAIRE_SPECULATION_ENABLED", True)
+    reset_speculation()
+    yield
+    reset_speculation()
+
+
+def _fail():
+    raise AssertionError("不应同步生成")
+
+
+def test_hit_waits_for_running_speculation_and_replays():
+    release = threading.Event()
+
+    def generate():
+        release.wait(1)
+        return [{"id": "q1"}]
+
+    assert speculate("s1", "gap", {"tasks": ["a"]}, generate)
+    assert not speculate("s1", "gap", {"tasks": ["a"]}, generate)  # 节点重放不重复提交
+    release.set()
+
+    questions = resolve_speculation("s1", "gap", {"tasks": ["a"]}, _fail)
+    questions[0]["id"] = "mutated"
+    assert resolve_speculation("s1", "gap", {"tasks": ["a"]}, _fail) == [{"id": "q1"}]
+
+    stats = get_speculation_stats()["stages"]["gap"]
+    assert (stats["speculated"], stats["hits"], stats["replays"], stats["hit_rate"]) == (1, 1, 1, 1.0)
+    assert stats["saved_ms"] >= 0
+
+
+def test_patch_and_miss():
+    speculate("s1", "gap", {"tasks": ["a", "b"], "dims": ["预算"]}, lambda: ["budget?"])
+    patched = resolve_speculation(
+        "s1",
+        "gap",
+        {"tasks": ["a", "c"], "dims": ["预算"]},
+        _fail,
+        patch=lambda old, value: value if old["dims"] == ["预算"] else None,
+    )
+    assert patched == ["budget?"]
+
+    speculate("s2", "gap", {"dims": ["预算"]}, lambda: ["budget?"])
+    assert resolve_speculation("s2", "gap", {"dims": ["工期"]}, lambda: ["deadline?"], patch=lambda *_: None) == [
+        "deadline?"
+    ]
+
+    stats = get_speculation_stats()["stages"]["gap"]
+    assert (stats["patched"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_failed_speculation_falls_back():
+    def broken():
+        raise RuntimeError("llm down")
+
+    speculate("s1", "radar", {"x": 1}, broken)
+    assert resolve_speculation("s1", "radar", {"x": 1}, lambda: ["dim"]) == ["dim"]
+    assert get_speculation_stats()["stages"]["radar"]["errors"] == 1
+    assert resolve_speculation("", "radar", {"x": 1}, lambda: ["no-session"]) == ["no-session"]
+
+
+def test_progressive_questionnaire_uses_speculated_steps(monkeypatch):
+    calls = {"gap": 0, "radar": 0}
+
+    def build_gap(user_input, confirmed_tasks, completeness, existing_info_summary):
+        calls["gap"] += 1
+        return [{"id": "gap_q_1", "question": "预算范围？", "type": "open_ended"}]
+
+    def build_radar(state):
+        calls["radar"] += 1
+        return [{"id": "dim_1", "name": "风格", "default_value": 50}]
+
+    monkeypatch.setattr(ProgressiveQuestionnaireNode, "_build_gap_questions", staticmethod(build_gap))
+    monkeypatch.setattr(ProgressiveQuestionnaireNode, "_build_radar_dimensions", staticmethod(build_radar))
+    monkeypatch.setattr(progressive_questionnaire, "interrupt", lambda payload: {"answers": {"gap_q_1": "50万"}})
+
+    tasks = [{"title": "客厅改造", "description": "老房客厅改造"}]
+    state = {"session_id": "sess-q", "user_input": "老房改造", "agent_results": {}}
+
+    ProgressiveQuestionnaireNode._speculate_after_step1(state, tasks)
+    step3_state = {**state, "confirmed_core_tasks": tasks, "confirmed_core_task": "客厅改造"}
+    command = ProgressiveQuestionnaireNode.step3_gap_filling(step3_state)
+    ProgressiveQuestionnaireNode.step3_gap_filling(step3_state)  # interrupt 恢复后节点重放
+
+    assert command.update["task_gap_filling_questionnaire"]["questions"][0]["id"] == "gap_q_1"
+    assert calls == {"gap": 1, "radar": 1}
+
+    monkeypatch.setattr(progressive_questionnaire, "interrupt", lambda payload: {"values": {"dim_1": 80}})
+    command = ProgressiveQuestionnaireNode.step2_radar(step3_state)
+    assert command.update["radar_dimension_values"] == {"dim_1": 80}
+    assert calls == {"gap": 1, "radar": 1}
+
+    stages = get_speculation_stats()["stages"]
+    assert (stages["gap_questions"]["hits"], stages["gap_questions"]["replays"]) == (1, 1)
+    assert stages["radar_dimensions"]["hits"] == 1
+    assert get_speculation_stats()["cached"] == 0  # 问卷结束后释放
+
+
+def test_queued_speculation_is_computed_immediately(monkeypatch):
+    executor = questionnaire_speculation.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(questionnaire_speculation, "_executor", executor)
+    release = threading.Event()
+    executor.submit(release.wait, 5)  # 占住唯一的线程，预生成只能排队
+
+    try:
+        speculate("s1", "gap", {"tasks": ["a"]}, _fail)
+        started = time.perf_counter()
+        assert resolve_speculation("s1", "gap", {"tasks": ["a"]}, lambda: ["now"]) == ["now"]
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert get_speculation_stats()["stages"]["gap"]["misses"] == 1
+
+
+def test_step1_replay_reuses_decomposition(monkeypatch):
+    calls = {"decompose": 0, "gap": 0, "radar": 0}
+
+    def decompose(user_input, structured_data, input_features):
+        calls["decompose"] += 1  # temperature 0.7：每次拆解结果都不同
+        return None, [{"title": f"客厅改造{calls['decompose']}", "description": "老房客厅改造"}]
+
+    def build_gap(*args):
+        calls["gap"] += 1
+        return []
+
+    def build_radar(state):
+        calls["radar"] += 1
+        return []
+
+    class Paused(Exception):
+        pass
+
+    def pause(payload):
+        raise Paused()
+
+    monkeypatch.setattr(ProgressiveQuestionnaireNode, "_decompose_core_tasks", staticmethod(decompose))
+    monkeypatch.setattr(ProgressiveQuestionnaireNode, "_build_gap_questions", staticmethod(build_gap))
+    monkeypatch.setattr(ProgressiveQuestionnaireNode, "_build_radar_dimensions", staticmethod(build_radar))
+    monkeypatch.setattr(progressive_questionnaire, "interrupt", pause)
+
+    state = {"session_id": "sess-q", "user_input": "老房改造", "agent_results": {}}
+    with pytest.raises(Paused):
+        ProgressiveQuestionnaireNode.step1_core_task(state)
+
+    monkeypatch.setattr(progressive_questionnaire, "interrupt", lambda payload: {"action": "skip"})
+    command = ProgressiveQuestionnaireNode.step1_core_task(state)  # interrupt 恢复后节点重放
+
+    assert command.update["confirmed_core_tasks"][0]["title"] == "客厅改造1"
+    assert calls["decompose"] == 1
+    stages = get_speculation_stats()["stages"]
+    assert sum(stages[stage]["speculated"] for stage in ("gap_questions", "radar_dimensions") if stage in stages) == 1
+    assert stages["core_tasks"]["replays"] == 1
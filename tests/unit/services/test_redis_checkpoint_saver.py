@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Redis 检查点存储 (services/redis_checkpoint_saver.py) 单元测试
+
+覆盖：
+- put / get_tuple / list 往返，大对象压缩
+- 通道写入（普通写入只写一次、特殊通道覆盖）
+- keep_last 裁剪保留中断点、TTL 设置、删除线程、线程索引清理过期线程
+- 真实 LangGraph 图：实例 A 中断，实例 B 通过共享 Redis 恢复
+
+使用内存版 redis.asyncio 替身（仅实现本模块用到的命令），无需 Redis 服务。
+"""
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, interrupt
+
+from intelligent_project_analyzer.services.redis_checkpoint_saver import INTERRUPT_CHANNEL, AsyncRedisSaver
+
+
+class FakeRedis:
+    """最小化的 redis.asyncio 替身（bytes 语义）"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    @staticmethod
+    def _b(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        h = self.data.setdefault(key, {})
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        for k, v in items.items():
+            h[self._b(k)] = self._b(v)
+        return len(items)
+
+    async def hsetnx(self, key, field, value):
+        h = self.data.setdefault(key, {})
+        if self._b(field) in h:
+            return 0
+        h[self._b(field)] = self._b(value)
+        return 1
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hvals(self, key):
+        return list(self.data.get(key, {}).values())
+
+    async def zadd(self, key, mapping):
+        z = self.data.setdefault(key, {})
+        z.update((self._b(m), score) for m, score in mapping.items())
+
+    async def zcard(self, key):
+        return len(self.data.get(key, ()))
+
+    async def zrem(self, key, *members):
+        z = self.data.get(key, {})
+        for m in members:
+            z.pop(self._b(m), None)
+
+    async def zremrangebyscore(self, key, min, max):
+        z = self.data.get(key, {})
+        low = float(min)
+        stale = [m for m, score in z.items() if low <= score <= float(max)]
+        for m in stale:
+            del z[m]
+        return len(stale)
+
+    async def zrange(self, key, start, end):
+        return sorted(self.data.get(key, ()))
+
+    async def zrangebylex(self, key, min, max):
+        return sorted(self.data.get(key, ()))
+
+    async def zrevrangebylex(self, key, max, min, start=None, num=None):
+        members = sorted(self.data.get(key, ()), reverse=True)
+        if max.startswith("("):
+            members = [m for m in members if m < max[1:].encode()]
+        if num is not None:
+            members = members[start : start + num]
+        return members
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(self._b(m) for m in members)
+
+    async def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(self._b(m) for m in members)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def expire(self, key, seconds):
+        self.ttl[key] = seconds
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def _queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def config(thread_id, checkpoint_id=None):
+    cfg = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    if checkpoint_id:
+        cfg["configurable"]["checkpoint_id"] = checkpoint_id
+    return cfg
+
+
+async def put_checkpoints(saver, thread_id, n, payload=""):
+    cfg = config(thread_id)
+    for step in range(n):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"step": step, "payload": payload}
+        cfg = await saver.aput(cfg, checkpoint, {"step": step, "source": "loop"}, {})
+    return cfg
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def saver(redis):
+    return AsyncRedisSaver(redis, ttl=3600, keep_last=0)
+
+
+class TestRoundTrip:
+    @pytest.mark.asyncio
+    async def test_put_and_get_latest(self, saver):
+        last = await put_checkpoints(saver, "s1", 3)
+
+        result = await saver.aget_tuple(config("s1"))
+        assert result.config["configurable"]["checkpoint_id"] == last["configurable"]["checkpoint_id"]
+        assert result.checkpoint["channel_values"]["step"] == 2
+        assert result.metadata["step"] == 2
+        assert result.parent_config is not None
+        assert await saver.aget_tuple(config("missing")) is None
+
+    @pytest.mark.asyncio
+    async def test_large_checkpoint_is_compressed(self, saver, redis):
+        last = await put_checkpoints(saver, "s1", 1, payload="设计" * 5000)
+        key = saver._cp_key("s1", "", last["configurable"]["checkpoint_id"])
+
+        assert redis.data[key][b"type"].endswith(b":z")
+        assert len(redis.data[key][b"checkpoint"]) < 5000
+        result = await saver.aget_tuple(config("s1"))
+        assert result.checkpoint["channel_values"]["payload"] == "设计" * 5000
+
+    @pytest.mark.asyncio
+    async def test_list_filter_before_limit(self, saver):
+        await put_checkpoints(saver, "s1", 4)
+        await put_checkpoints(saver, "s2", 1)
+
+        steps = [t.metadata["step"] async for t in saver.alist(config("s1"))]
+        assert steps == [3, 2, 1, 0]
+
+        latest = await saver.aget_tuple(config("s1"))
+        before = [t.metadata["step"] async for t in saver.alist(config("s1"), before=latest.config, limit=2)]
+        assert before == [2, 1]
+
+        filtered = [t async for t in saver.alist(None, filter={"step": 0})]
+        assert {t.config["configurable"]["thread_id"] for t in filtered} == {"s1", "s2"}
+
+    @pytest.mark.asyncio
+    async def test_ttl_applied(self, saver, redis):
+        await put_checkpoints(saver, "s1", 1)
+        assert redis.ttl[saver._idx_key("s1", "")] == 3600
+
+
+class TestWrites:
+    @pytest.mark.asyncio
+    async def test_regular_writes_are_write_once(self, saver):
+        cfg = await put_checkpoints(saver, "s1", 1)
+        await saver.aput_writes(cfg, [("messages", "a"), ("notes", "b")], task_id="t1")
+        await saver.aput_writes(cfg, [("messages", "changed")], task_id="t1")
+
+        result = await saver.aget_tuple(config("s1"))
+        assert result.pending_writes == [("t1", "messages", "a"), ("t1", "notes", "b")]
+
+    @pytest.mark.asyncio
+    async def test_special_writes_overwrite(self, saver):
+        cfg = await put_checkpoints(saver, "s1", 1)
+        await saver.aput_writes(cfg, [(INTERRUPT_CHANNEL, "first")], task_id="t1")
+        await saver.aput_writes(cfg, [(INTERRUPT_CHANNEL, "second")], task_id="t1")
+
+        result = await saver.aget_tuple(config("s1"))
+        assert result.pending_writes == [("t1", INTERRUPT_CHANNEL, "second")]
+
+
+class TestLifecycle:
+    @pytest.mark.asyncio
+    async def test_keep_last_preserves_interrupts(self, redis):
+        saver = AsyncRedisSaver(redis, keep_last=2)
+        first = await put_checkpoints(saver, "s1", 1)
+        await saver.aput_writes(first, [(INTERRUPT_CHANNEL, "确认")], task_id="t1")
+        await put_checkpoints(saver, "s1", 5)
+
+        ids = await redis.zrange(saver._idx_key("s1", ""), 0, -1)
+        assert len(ids) == 3
+        assert await saver.aget_tuple(first) is not None
+
+    @pytest.mark.asyncio
+    async def test_delete_thread(self, saver, redis):
+        cfg = await put_checkpoints(saver, "s1", 2)
+        await saver.aput_writes(cfg, [("messages", "a")], task_id="t1")
+        await put_checkpoints(saver, "s2", 1)
+
+        await saver.adelete_thread("s1")
+        assert await saver.aget_tuple(config("s1")) is None
+        assert not any(key.startswith("ckpt:cp:s1:") or key.startswith("ckpt:w:s1:") for key in redis.data)
+        assert await saver.aget_tuple(config("s2")) is not None
+
+    @pytest.mark.asyncio
+    async def test_thread_index_drops_expired_threads(self, saver, redis, monkeypatch):
+        from intelligent_project_analyzer.services import redis_checkpoint_saver
+
+        await put_checkpoints(saver, "old", 1)
+        clock = redis_checkpoint_saver.time.time() + 3601  # old 的线程键已按 TTL 过期
+        monkeypatch.setattr(redis_checkpoint_saver.time, "time", lambda: clock)
+        await put_checkpoints(saver, "new", 1)
+
+        assert set(redis.data[saver._threads_key]) == {b"new"}
+        assert redis.ttl[saver._threads_key] == 3600
+        assert {t.config["configurable"]["thread_id"] async for t in saver.alist(None)} == {"new"}
+
+        await saver.adelete_thread("new")
+        assert not redis.data[saver._threads_key]
+
+    def test_sync_api_requires_bound_loop(self, saver):
+        import asyncio
+
+        with pytest.raises(asyncio.InvalidStateError):
+            saver.get_tuple(config("s1"))
+
+
+class State(TypedDict):
+    answers: Annotated[list, operator.add]
+
+
+def build_graph(checkpointer):
+    def ask(state: State):
+        return {"answers": [interrupt("请确认项目类型")]}
+
+    def finish(state: State):
+        return {"answers": ["done"]}
+
+    graph = StateGraph(State)
+    graph.add_node("ask", ask)
+    graph.add_node("finish", finish)
+    graph.add_edge(START, "ask")
+    graph.add_edge("ask", "finish")
+    graph.add_edge("finish", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+@pytest.mark.asyncio
+async def test_resume_on_another_instance(redis):
+    cfg = {"configurable": {"thread_id": "session-1"}}
+
+    chunks = [c async for c in build_graph(AsyncRedisSaver(redis)).astream({"answers": []}, cfg)]
+    assert "__interrupt__" in chunks[-1]
+
+    # 另一个 API 实例 / worker：全新的 saver 与图，只共享 Redis
+    other = build_graph(AsyncRedisSaver(redis))
+    result = await other.ainvoke(Command(resume="住宅"), cfg)
+    assert result["answers"] == ["住宅", "done"]
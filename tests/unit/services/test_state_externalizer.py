@@ -0,0 +1,183 @@
+"""
+Unit tests for state_externalizer（checkpoint 大字段外部化）
+
+Coverage
+--------
+- 超过阈值的策略字段以引用写入 checkpoint，读取时透明还原
+- 字段未变化时复用引用，不重复写入外部存储；复用时续期，已过期则重新写入
+- 解引用缓存；引用失效时抛出 ExternalStateMissingError
+- 在真实 StateGraph + SqliteSaver 上运行，节点读到完整值且 checkpoint 变小
+- install_state_externalizer 开关与幂等
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+from typing import Annotated, Any, Dict, Optional
+from unittest.mock import patch
+
+import pytest
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from intelligent_project_analyzer.core.state import merge_agent_results
+from intelligent_project_analyzer.services import state_externalizer
+from intelligent_project_analyzer.services.external_state_store import get_store, reset_store
+from intelligent_project_analyzer.services.state_externalizer import (
+    REF_MARKER,
+    ExternalizingSerializer,
+    ExternalStateMissingError,
+    get_state_externalizer_stats,
+    install_state_externalizer,
+    reset_state_externalizer_stats,
+)
+
+BIG_RESULT = {"V3_叙事专家_3-1": {"content": "空间叙事分析" * 2000}}
+
+
+def _checkpoint(**values: Any) -> Dict[str, Any]:
+    return {
+        "v": 4,
+        "id": "cp-1",
+        "ts": "2026-01-01T00:00:00",
+        "channel_values": {"session_id": "sess-ext", **values},
+        "channel_versions": {},
+        "versions_seen": {},
+    }
+
+
+@pytest.fixture(autouse=True)
+def clean_store():
+    with patch.dict(os.environ, {}, clear=False):
+        os.environ.pop("REDIS_URL", None)
+        reset_store()
+        reset_state_externalizer_stats()
+        yield
+        reset_store()
+        reset_state_externalizer_stats()
+
+
+@pytest.fixture()
+def serde() -> ExternalizingSerializer:
+    return ExternalizingSerializer(JsonPlusSerializer(), fields=("agent_results", "final_report"), min_bytes=1024)
+
+
+class TestExternalizingSerializer:
+    def test_large_field_stored_by_reference(self, serde):
+        checkpoint = _checkpoint(agent_results=BIG_RESULT, final_report="短报告", current_stage="init")
+        data = serde.dumps_typed(checkpoint)
+
+        raw = JsonPlusSerializer().loads_typed(data)["channel_values"]
+        assert REF_MARKER in raw["agent_results"]
+        assert raw["final_report"] == "短报告"  # 未超过阈值，原样保留
+
+        restored = serde.loads_typed(data)["channel_values"]
+        assert restored["agent_results"] == BIG_RESULT
+        assert restored["current_stage"] == "init"
+
+        stats = get_state_externalizer_stats()
+        session = stats["sessions"]["sess-ext"]
+        assert session["last"]["externalized"] == ["agent_results"]
+        assert session["after_bytes"] < session["before_bytes"] / 5
+
+    def test_unchanged_field_reuses_reference(self, serde):
+        first = JsonPlusSerializer().loads_typed(serde.dumps_typed(_checkpoint(agent_results=BIG_RESULT)))
+        second = JsonPlusSerializer().loads_typed(serde.dumps_typed(_checkpoint(agent_results=dict(BIG_RESULT))))
+
+        ref = first["channel_values"]["agent_results"][REF_MARKER]
+        assert second["channel_values"]["agent_results"][REF_MARKER] == ref
+        assert get_store().size() == 1
+        assert get_state_externalizer_stats()["reused"] == 1
+
+    def test_cache_and_missing_reference(self, serde):
+        data = serde.dumps_typed(_checkpoint(agent_results=BIG_RESULT))
+        first = serde.loads_typed(data)["channel_values"]["agent_results"]
+        first["mutated"] = True  # 每次解引用得到独立对象
+        assert "mutated" not in serde.loads_typed(data)["channel_values"]["agent_results"]
+        assert get_state_externalizer_stats()["cache_hits"] == 2
+
+        fresh = ExternalizingSerializer(JsonPlusSerializer(), fields=("agent_results",), min_bytes=1024)
+        assert fresh.loads_typed(data)["channel_values"]["agent_results"] == BIG_RESULT
+        assert get_state_externalizer_stats()["store_reads"] == 1
+
+        reset_store()  # 外部存储丢失（如内存后端重启）
+        lost = ExternalizingSerializer(JsonPlusSerializer(), fields=("agent_results",), min_bytes=1024)
+        with pytest.raises(ExternalStateMissingError):
+            lost.loads_typed(data)
+        assert get_state_externalizer_stats()["missing"] == 1
+
+    def test_reuse_refreshes_ttl_and_rewrites_expired_reference(self):
+        serde = ExternalizingSerializer(JsonPlusSerializer(), fields=("agent_results",), min_bytes=1024, ttl=3600)
+        backend = get_store()._backend
+        ref = JsonPlusSerializer().loads_typed(serde.dumps_typed(_checkpoint(agent_results=BIG_RESULT)))[
+            "channel_values"
+        ]["agent_results"][REF_MARKER]
+        payload, expires_at = backend._store[ref]
+        backend._store[ref] = (payload, expires_at - 3000)
+
+        serde.dumps_typed(_checkpoint(agent_results=BIG_RESULT))
+        assert backend._store[ref][1] > expires_at - 60  # 复用时续期
+        assert get_state_externalizer_stats()["reused"] == 1
+
+        backend._store[ref] = (payload, 0.0)  # 已过期
+        data = serde.dumps_typed(_checkpoint(agent_results=BIG_RESULT))
+        new_ref = JsonPlusSerializer().loads_typed(data)["channel_values"]["agent_results"][REF_MARKER]
+        assert new_ref != ref
+        fresh = ExternalizingSerializer(JsonPlusSerializer(), fields=("agent_results",), min_bytes=1024)
+        assert fresh.loads_typed(data)["channel_values"]["agent_results"] == BIG_RESULT
+
+    def test_non_checkpoint_objects_pass_through(self, serde):
+        assert serde.loads_typed(serde.dumps_typed({"agent_results": BIG_RESULT})) == {"agent_results": BIG_RESULT}
+        assert get_store().size() == 0
+
+
+class _GraphState(TypedDict):
+    session_id: str
+    agent_results: Annotated[Optional[Dict[str, Any]], merge_agent_results]
+    final_report: Optional[str]
+
+
+def _build_graph(checkpointer):
+    def expert(state):
+        return {"agent_results": BIG_RESULT}
+
+    def aggregate(state):
+        # 节点读到的是完整值，而非引用
+        assert state["agent_results"] == BIG_RESULT
+        return {"final_report": f"共 {len(state['agent_results'])} 位专家"}
+
+    graph = StateGraph(_GraphState)
+    graph.add_node("expert", expert)
+    graph.add_node("aggregate", aggregate)
+    graph.add_edge(START, "expert")
+    graph.add_edge("expert", "aggregate")
+    graph.add_edge("aggregate", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def test_graph_run_with_sqlite_checkpointer(monkeypatch):
+    monkeypatch.setattr(state_externalizer, "STATE_EXTERNALIZE_MIN_BYTES", 1024)
+    saver = SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False))
+    assert install_state_externalizer(saver, force=True)
+    assert install_state_externalizer(saver, force=True)  # 幂等
+    assert isinstance(saver.serde, ExternalizingSerializer) and not isinstance(saver.serde.inner, ExternalizingSerializer)
+
+    app = _build_graph(saver)
+    config = {"configurable": {"thread_id": "sess-ext"}}
+    result = app.invoke({"session_id": "sess-ext", "agent_results": {}, "final_report": None}, config)
+
+    assert result["final_report"] == "共 1 位专家"
+    assert app.get_state(config).values["agent_results"] == BIG_RESULT
+    session = get_state_externalizer_stats()["sessions"]["sess-ext"]
+    assert session["supersteps"] >= 3
+    assert session["after_bytes"] < session["before_bytes"]
+    assert get_store().size() == 1  # expert 之后的 superstep 复用同一引用
+
+
+def test_install_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(state_externalizer, "STATE_EXTERNALIZE_ENABLED", False)
+    saver = SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False))
+    assert install_state_externalizer(saver) is False
+    assert not isinstance(saver.serde, ExternalizingSerializer)
@@ -0,0 +1,174 @@
+"""
+Unit tests for state_profiler 与哈希索引 merge_lists reducer
+
+Coverage
+--------
+- merge_lists 去重语义（字典 / 字符串 / right 内部重复）
+- 列表或其中的元素被原地修改后仍正确去重
+- profile_reducer 按会话记录 reducer 耗时，未启用时不记录
+- 在真实 StateGraph + SqliteSaver 上记录节点 delta、字段大小与 checkpoint 字节数
+- install_state_profiler 幂等，且与外部化 serde 叠加时互相识别
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Annotated, Any, Dict, List, Optional
+
+import pytest
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from intelligent_project_analyzer.core import state as state_module
+from intelligent_project_analyzer.core.state import merge_agent_results, merge_lists
+from intelligent_project_analyzer.core.trace_context import TraceContext
+from intelligent_project_analyzer.services import state_profiler
+from intelligent_project_analyzer.services.state_externalizer import ExternalizingSerializer, install_state_externalizer
+from intelligent_project_analyzer.services.state_profiler import (
+    ProfilingSerializer,
+    attach_state_profiler,
+    get_state_profile,
+    get_state_profile_summary,
+    install_state_profiler,
+    reset_state_profiles,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_profiles(monkeypatch):
+    monkeypatch.setattr(state_profiler, "STATE_PROFILER_ENABLED", True)
+    reset_state_profiles()
+    TraceContext.clear()
+    yield
+    reset_state_profiles()
+    TraceContext.clear()
+
+
+class TestMergeLists:
+    @pytest.fixture(autouse=True, params=[32, 0], ids=["linear", "indexed"])
+    def merge_path(self, request, monkeypatch):
+        monkeypatch.setattr(state_module, "_LINEAR_MERGE_MAX", request.param)
+
+    def test_dedup_dicts_and_strings(self):
+        refs = [{"url": "a", "score": 1}, {"url": "b", "score": 2}]
+        merged = merge_lists(refs, [{"url": "a", "score": 1}, {"url": "a", "score": 3}, {"url": "c", "tags": ["x"]}])
+        assert merged == refs + [{"url": "a", "score": 3}, {"url": "c", "tags": ["x"]}]
+
+        assert merge_lists(["a", "b"], ["b", "c", "c", "a", "d"]) == ["a", "b", "c", "d"]
+        assert merge_lists(None, ["x"]) == ["x"]
+        assert merge_lists(["x"], None) == ["x"]
+
+    def test_unhashable_and_nested_values(self):
+        left = [[1, 2], {"items": [1]}]
+        assert merge_lists(left, [[1, 2], [3], {"items": [1]}, {"items": [2]}]) == [
+            [1, 2],
+            {"items": [1]},
+            [3],
+            {"items": [2]},
+        ]
+
+    def test_accumulating_merges(self):
+        state = []
+        for step in range(20):
+            state = merge_lists(state, [f"item-{step}", f"item-{step // 2}"])
+        assert state == [f"item-{i}" for i in range(20)]
+
+        previous = merge_lists(state, ["new"])
+        assert merge_lists(state, ["item-3", "other"]) == state + ["other"]
+        assert previous[-1] == "new" and type(previous) is list
+
+    def test_mutated_list_and_items(self):
+        merged = merge_lists(["a"], ["b"])
+        merged.append("c")  # 节点原地修改
+        assert merge_lists(merged, ["c", "d"]) == ["a", "b", "c", "d"]
+
+        replaced = merge_lists([1, 2], [3])
+        replaced[0] = 9
+        assert merge_lists(replaced, [9]) == [9, 2, 3]
+
+        tasks = merge_lists([], [{"id": 1, "status": "pending"}])
+        tasks[0]["status"] = "done"  # 如 core_task_decomposer 给任务字典补字段
+        assert merge_lists(tasks, [{"id": 1, "status": "done"}]) == [{"id": 1, "status": "done"}]
+
+
+def test_reducer_timing_per_session(monkeypatch):
+    TraceContext.init_trace("sess-reducer")
+    merge_lists(["a"], ["b"])
+    merge_agent_results({"v1": 1}, {"v2": 2})
+
+    reducers = get_state_profile("sess-reducer")["reducers"]
+    assert reducers["merge_lists"]["calls"] == 1
+    assert reducers["merge_agent_results"]["calls"] == 1
+
+    monkeypatch.setattr(state_profiler, "STATE_PROFILER_ENABLED", False)
+    merge_lists(["a"], ["b"])
+    assert get_state_profile("sess-reducer")["reducers"]["merge_lists"]["calls"] == 1
+
+
+class _GraphState(TypedDict):
+    session_id: str
+    agent_results: Annotated[Optional[Dict[str, Any]], merge_agent_results]
+    search_references: Annotated[List[Dict[str, Any]], merge_lists]
+    final_report: Optional[str]
+
+
+def _build_graph(checkpointer):
+    def expert(state):
+        return {
+            "agent_results": {"V3_叙事专家_3-1": {"content": "空间叙事分析" * 500}},
+            "search_references": [{"url": "https://example.com", "title": "案例"}],
+        }
+
+    def aggregate(state):
+        return {"final_report": "报告", "search_references": [{"url": "https://example.com", "title": "案例"}]}
+
+    graph = StateGraph(_GraphState)
+    graph.add_node("expert", expert)
+    graph.add_node("aggregate", aggregate)
+    graph.add_edge(START, "expert")
+    graph.add_edge("expert", "aggregate")
+    graph.add_edge("aggregate", END)
+    return attach_state_profiler(graph.compile(checkpointer=checkpointer))
+
+
+def test_graph_profile_with_sqlite_checkpointer():
+    saver = SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False))
+    assert install_state_profiler(saver)
+    app = _build_graph(saver)
+
+    config = {"configurable": {"thread_id": "sess-graph"}}
+    result = app.invoke({"session_id": "sess-graph", "agent_results": {}, "search_references": []}, config)
+    assert result["search_references"] == [{"url": "https://example.com", "title": "案例"}]
+
+    profile = get_state_profile("sess-graph")
+    assert list(profile["nodes"]) == ["expert", "aggregate"]  # 按 delta 字节降序
+    assert profile["nodes"]["expert"]["last_fields"] == ["agent_results", "search_references"]
+    assert profile["fields"]["agent_results"]["last_bytes"] > 3000
+    assert profile["fields"]["search_references"]["writes"] == 2
+    assert profile["checkpoints"]["count"] >= 3
+    assert profile["checkpoints"]["max_bytes"] > profile["fields"]["agent_results"]["last_bytes"]
+
+    summary = get_state_profile_summary()["sessions"]["sess-graph"]
+    assert summary["node_calls"] == 2
+    assert get_state_profile("missing") is None
+
+
+def test_install_idempotent_with_externalizer():
+    saver = SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False))
+    assert install_state_externalizer(saver, force=True)
+    assert install_state_profiler(saver)
+    assert install_state_profiler(saver)
+    assert install_state_externalizer(saver, force=True)  # 外部化层在 ProfilingSerializer 之下，不重复安装
+
+    assert isinstance(saver.serde, ProfilingSerializer)
+    assert isinstance(saver.serde.inner, ExternalizingSerializer)
+    assert not isinstance(saver.serde.inner.inner, (ProfilingSerializer, ExternalizingSerializer))
+
+
+def test_disabled_is_noop(monkeypatch):
+    monkeypatch.setattr(state_profiler, "STATE_PROFILER_ENABLED", False)
+    saver = SqliteSaver(sqlite3.connect(":memory:", check_same_thread=False))
+    graph = object()
+    assert install_state_profiler(saver) is False
+    assert attach_state_profiler(graph) is graph
+    assert not isinstance(saver.serde, ProfilingSerializer)
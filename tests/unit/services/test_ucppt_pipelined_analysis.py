@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+ucppt 流水线分析单元测试
+
+覆盖：
+- 统一分析流中"我们的分析维度"板块一结束即启动首轮搜索（后续板块仍在生成）
+- 步骤1深度分析（4 步骤流程）不启动提前搜索：尚无后续步骤消费其结果
+- 关闭流水线模式时不启动提前搜索
+"""
+import asyncio
+
+import pytest
+
+from intelligent_project_analyzer.services import ucppt_search_engine as engine_module
+from intelligent_project_analyzer.services.ucppt_search_engine import UcpptSearchEngine
+
+DIALOGUE = """**【我们如何理解您的需求】**
+
+### 问题解构
+
+**用户画像**：30岁设计师
+**显性需求**：海边民宿设计
+
+### 我们的分析维度
+
+- 在地材料研究：对应主导动机
+- [海景采光分析]
+
+### 我们的设计重点
+
+- 优先考虑：安静
+---
+**【您将获得什么】**
+
+**1️⃣ 案例参考**（约5页）
+"""
+
+DEEP_ANALYSIS = """**核心目标**：设计海边民宿
+**搜索方向提示**：
+- 维度1：海边民宿案例
+- 维度2：防潮材料
+**板块1：案例研究**
+- 1.1 国内案例：说明
+**输出质量标准**
+- 专业
+"""
+
+
+def _chunks(text, size=6):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.fixture
+def engine():
+    eng = UcpptSearchEngine.__new__(UcpptSearchEngine)
+    eng._used_queries = []
+    eng._query_similarity_threshold = 0.8
+    eng.thinking_model = "test-model"
+    eng.config = {"deep_analysis_prompt_template": "{user_input}"}
+    eng.search_calls = []
+
+    async def fake_parallel_search(queries):
+        eng.search_calls.append(list(queries))
+        return [{"url": f"https://example.com/{i}", "title": q} for i, q in enumerate(queries)]
+
+    eng._execute_parallel_search = fake_parallel_search
+    eng._build_dialogue_analysis_prompt = lambda query, context=None: query
+    return eng
+
+
+@pytest.mark.asyncio
+async def test_unified_stream_starts_search_before_analysis_ends(engine):
+    chunks = _chunks(DIALOGUE)
+    progress = {"sent": 0}
+
+    async def fake_stream(prompt, model=None, max_tokens=None):
+        for chunk in chunks:
+            progress["sent"] += 1
+            yield {"type": "content", "content": chunk}
+
+    engine._call_llm_stream_with_reasoning = fake_stream
+
+    started = None
+    async for event in engine._unified_analysis_stream("海边民宿设计"):
+        if event["type"] == "early_search_started":
+            started = event
+            sent_at_start = progress["sent"]
+            break
+
+    assert started is not None
+    assert sent_at_start < len(chunks)
+    handle = started["_internal_early_search"]
+    assert handle.queries == ["海边民宿设计 在地材料研究", "海边民宿设计 海景采光分析"]
+    sources = await handle.collect(1)
+    assert len(sources) == 2
+    assert engine._used_queries == handle.queries
+
+
+@pytest.mark.asyncio
+async def test_step1_stream_does_not_start_early_search(engine):
+    # 4 步骤流程尚无步骤 2-4 消费首轮搜索结果，不应启动并等待提前搜索
+    async def fake_thinking_stream(prompt, model):
+        for chunk in _chunks(DEEP_ANALYSIS):
+            await asyncio.sleep(0)
+            yield chunk
+
+    engine._call_thinking_model_stream = fake_thinking_stream
+
+    events = [event async for event in engine._step1_deep_analysis_stream("海边民宿", "s1")]
+    names = [event["event"] for event in events]
+
+    assert "early_search_started" not in names and "early_search_ready" not in names
+    assert engine.search_calls == []
+    assert events[-1]["event"] == "step1_complete"
+    assert "early_sources" not in events[-1]
+
+
+@pytest.mark.asyncio
+async def test_pipelining_disabled(engine, monkeypatch):
+    monkeypatch.setattr(engine_module, "PIPELINED_ANALYSIS_ENABLED", False)
+
+    async def fake_stream(prompt, model=None, max_tokens=None):
+        for chunk in _chunks(DIALOGUE):
+            yield {"type": "content", "content": chunk}
+
+    engine._call_llm_stream_with_reasoning = fake_stream
+
+    types = []
+    async for event in engine._unified_analysis_stream("海边民宿设计"):
+        types.append(event["type"])
+        if event["type"] == "two_sections_stream_complete":
+            break
+    assert "two_sections_stream_complete" in types
+    assert "early_search_started" not in types
+    assert engine.search_calls == []
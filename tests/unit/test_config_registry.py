@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+共享配置注册表 (core/config_registry.py) 单元测试
+
+覆盖：
+- 同一文件只解析一次，调用方共享同一对象
+- copy=True 返回独立副本
+- 二进制快照：新注册表实例命中快照、文件变更后快照失效
+- 热重载：check_for_changes / load 发现变更后原子替换并通知订阅者
+- 重载失败保留旧版本
+- 加载报告
+"""
+import os
+import time
+
+import pytest
+import yaml
+
+from intelligent_project_analyzer.core.config_registry import ConfigRegistry
+
+
+def write_yaml(path, data):
+    path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+    # 保证 mtime 变化（部分文件系统 mtime 精度较低）
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "sample.yaml"
+    write_yaml(path, {"modes": {"M1": {"name": "概念驱动"}}})
+    return path
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ConfigRegistry(snapshot_dir=tmp_path / "cache", snapshot_enabled=True)
+
+
+class TestLoad:
+    def test_shared_object(self, registry, config_file):
+        first = registry.load(config_file)
+        second = registry.load(str(config_file))
+        assert first is second
+        assert first["modes"]["M1"]["name"] == "概念驱动"
+
+    def test_copy_returns_independent_object(self, registry, config_file):
+        shared = registry.load(config_file)
+        private = registry.load(config_file, copy=True)
+        private["modes"]["M1"]["name"] = "changed"
+        assert shared["modes"]["M1"]["name"] == "概念驱动"
+
+    def test_missing_file_raises(self, registry, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            registry.load(tmp_path / "missing.yaml")
+
+
+class TestSnapshot:
+    def test_new_registry_hits_snapshot(self, tmp_path, config_file):
+        ConfigRegistry(snapshot_dir=tmp_path / "cache").load(config_file)
+
+        cold = ConfigRegistry(snapshot_dir=tmp_path / "cache")
+        assert cold.load(config_file)["modes"]["M1"]["name"] == "概念驱动"
+        assert cold.get_load_report()["snapshot_hits"] == 1
+
+    def test_snapshot_invalidated_on_change(self, tmp_path, config_file):
+        ConfigRegistry(snapshot_dir=tmp_path / "cache").load(config_file)
+        write_yaml(config_file, {"modes": {"M1": {"name": "新名称"}}})
+
+        cold = ConfigRegistry(snapshot_dir=tmp_path / "cache")
+        assert cold.load(config_file)["modes"]["M1"]["name"] == "新名称"
+        assert cold.get_load_report()["yaml_parsed"] == 1
+        assert len(list((tmp_path / "cache").glob("*.pickle"))) == 1
+
+    def test_disabled_snapshot_writes_nothing(self, tmp_path, config_file):
+        ConfigRegistry(snapshot_dir=tmp_path / "cache", snapshot_enabled=False).load(config_file)
+        assert not (tmp_path / "cache").exists()
+
+
+class TestHotReload:
+    def test_check_for_changes_swaps_and_notifies(self, registry, config_file):
+        old = registry.load(config_file)
+        notified = []
+        registry.subscribe(notified.append, config_file)
+
+        write_yaml(config_file, {"modes": {"M2": {}}})
+        changed = registry.check_for_changes()
+
+        assert changed == [config_file.resolve()]
+        assert notified == [config_file.resolve()]
+        assert "M2" in registry.load(config_file)["modes"]
+        assert "M1" in old["modes"]  # 旧引用不被原地修改
+
+    def test_load_detecting_change_also_notifies(self, registry, config_file):
+        registry.load(config_file)
+        notified = []
+        registry.subscribe(notified.append)
+
+        write_yaml(config_file, {"modes": {}})
+        registry.load(config_file)
+        assert notified == [config_file.resolve()]
+        assert registry.check_for_changes() == []
+
+    def test_duplicate_subscription_ignored(self, registry, config_file):
+        registry.load(config_file)
+        notified = []
+        registry.subscribe(notified.append)
+        registry.subscribe(notified.append)
+
+        write_yaml(config_file, {"x": 1})
+        registry.check_for_changes()
+        assert len(notified) == 1
+
+    def test_invalid_yaml_keeps_previous_version(self, registry, config_file):
+        registry.load(config_file)
+        config_file.write_text("modes: [unclosed", encoding="utf-8")
+        time.sleep(0.01)
+        os.utime(config_file)
+
+        assert registry.check_for_changes() == []
+        assert registry.get_cached(config_file)["modes"]["M1"]["name"] == "概念驱动"
+
+
+class TestReport:
+    def test_report_records_each_file(self, registry, tmp_path, config_file):
+        other = tmp_path / "other.yaml"
+        write_yaml(other, {"a": 1})
+        registry.load(config_file)
+        registry.load(other)
+        registry.load(other)
+
+        report = registry.get_load_report()
+        assert report["files"] == 2
+        assert report["yaml_parsed"] == 2
+        assert {r["source"] for r in report["records"]} == {"yaml"}
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+上下文压缩器 (workflow/context_compressor.py) Token 预算与摘要缓存单元测试
+
+覆盖：
+- Batch1 预算充足时完整传递（保持原标题与内容）
+- 摘要按内容指纹缓存，结果变化时失效重建
+- 预算不足时依赖专家优先获得更详细的级别，其余逐级降级到交付物清单
+- 单次运行统计汇总
+"""
+import pytest
+
+from intelligent_project_analyzer.workflow import context_compressor as cc
+from intelligent_project_analyzer.workflow.context_compressor import (
+    ContextCompressor,
+    count_tokens,
+    summarize_compression_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def estimate_tokens(monkeypatch):
+    # 不依赖 tiktoken 编码表下载，统一使用估算
+    monkeypatch.setattr(cc, "TIKTOKEN_AVAILABLE", False)
+
+
+def _result(name, content, deliverable="交付物"):
+    return {
+        "expert_name": name,
+        "structured_output": {
+            "task_execution_report": {
+                "deliverable_outputs": [
+                    {"deliverable_name": deliverable, "content": content, "completion_status": "completed"}
+                ],
+                "overall_conclusions": ["结论一"],
+            }
+        },
+    }
+
+
+def test_count_tokens_estimate():
+    assert count_tokens("") == 0
+    assert count_tokens("空间设计") == 4
+    assert count_tokens("abcdefgh") == 2
+
+
+def test_minimal_within_budget_keeps_full_content():
+    compressor = ContextCompressor("minimal")
+    results = {"V4_设计研究员_4-1": _result("设计研究员", "祖父母日常照顾孙辈。" * 80)}
+
+    context = compressor.compress_agent_results(results, "V5_场景专家_5-1")
+
+    assert "## 前序专家的分析成果" in context
+    assert context.count("祖父母日常照顾孙辈") == 80
+    stats = compressor.get_compression_stats()
+    assert stats["levels"] == {"V4_设计研究员_4-1": "minimal"}
+    assert stats["cache_misses"] == 1
+
+
+def test_summaries_are_cached_by_fingerprint():
+    results = {"V4_设计研究员_4-1": _result("设计研究员", "内容" * 100)}
+    cache = {}
+
+    first = ContextCompressor("balanced")
+    first.compress_agent_results(results, "V3_叙事专家_3-1", summary_cache=cache)
+    assert set(first.new_summaries) == {"V4_设计研究员_4-1"}
+
+    second = ContextCompressor("aggressive")
+    second.compress_agent_results(results, "V2_设计总监_2-1", summary_cache=cache)
+    assert second.new_summaries == {}
+    assert second.get_compression_stats()["cache_hits"] == 1
+
+    results["V4_设计研究员_4-1"] = _result("设计研究员", "修订后的内容" * 50)
+    third = ContextCompressor("balanced")
+    third.compress_agent_results(results, "V3_叙事专家_3-1", summary_cache=cache)
+    assert third.get_compression_stats()["cache_misses"] == 1
+
+
+def test_budget_prefers_dependencies():
+    results = {
+        "V4_设计研究员_4-1": _result("设计研究员", "研究内容。" * 400, "用户画像"),
+        "V5_场景专家_5-1": _result("场景专家", "场景内容。" * 400, "场景设计"),
+    }
+    compressor = ContextCompressor("balanced", token_budget=1200)
+
+    context = compressor.compress_agent_results(results, "V6_技术总监_6-1", dependencies=["V5_场景专家_5-1"])
+
+    levels = compressor.get_compression_stats()["levels"]
+    order = list(cc.SUMMARY_LEVELS)
+    assert order.index(levels["V5_场景专家_5-1"]) < order.index(levels["V4_设计研究员_4-1"])
+    assert "用户画像" in context and "场景设计" in context
+
+    stats = compressor.get_compression_stats()
+    assert stats["compressed_tokens"] < stats["original_tokens"]
+    assert stats["tokens_saved"] == stats["original_tokens"] - stats["compressed_tokens"]
+
+
+def test_tiny_budget_falls_back_to_headline():
+    results = {"V4_设计研究员_4-1": _result("设计研究员", "很长的内容。" * 500, "用户画像")}
+    compressor = ContextCompressor("aggressive", token_budget=10)
+
+    context = compressor.compress_agent_results(results, "V5_场景专家_5-1")
+
+    assert compressor.get_compression_stats()["levels"]["V4_设计研究员_4-1"] == "headline"
+    assert "**交付物清单** (1个): 用户画像" in context
+
+
+def test_summarize_compression_stats():
+    totals = summarize_compression_stats(
+        {
+            "a": {"original_tokens": 1000, "compressed_tokens": 400, "tokens_saved": 600, "cache_hits": 1},
+            "b": {"original_tokens": 1000, "compressed_tokens": 600, "tokens_saved": 400, "cache_misses": 2},
+        }
+    )
+    assert totals["experts"] == 2
+    assert totals["tokens_saved"] == 1000
+    assert totals["savings_percent"] == 50.0
+    assert (totals["cache_hits"], totals["cache_misses"]) == (1, 2)
+    assert summarize_compression_stats(None)["experts"] == 0
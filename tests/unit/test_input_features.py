@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+单次输入理解阶段 (services/input_features.py) 单元测试
+
+覆盖：
+- 合并扫描的命中与各消费方自行扫描一致
+- to_dict / from_dict 往返（存入状态）后仍可复用
+- 文本或关键词集签名不一致时回退为自行扫描
+- 用户输入变化后状态中的特征失效
+- 消费方耗时统计
+"""
+import pytest
+
+from intelligent_project_analyzer.security.content_safety_guard import ContentSafetyGuard
+from intelligent_project_analyzer.security.domain_classifier import DomainClassifier
+from intelligent_project_analyzer.services import input_features as inf
+from intelligent_project_analyzer.services.dimension_selector import DimensionSelector
+from intelligent_project_analyzer.services.input_features import (
+    InputFeatures,
+    build_input_features,
+    get_consumer_timings,
+    get_state_input_features,
+    reset_consumer_timings,
+    time_consumer,
+)
+from intelligent_project_analyzer.services.mode_detector import DesignModeDetector
+from intelligent_project_analyzer.services.project_type_detector import ProjectTypeDetector
+from intelligent_project_analyzer.utils.keyword_matcher import KeywordMatcher
+
+SAMPLES = [
+    "我想在杭州做一个200平米的精品咖啡馆，兼顾书店与展览功能，预算80万",
+    "不要做KTV，我们计划在海边建一座精品民宿酒店",
+    "为三代同堂的家庭设计一套疗愈型住宅，老人需要无障碍设施",
+]
+
+
+@pytest.fixture(scope="module")
+def features():
+    return [build_input_features(text) for text in SAMPLES]
+
+
+def test_hits_match_consumer_scans(features):
+    consumers = {
+        inf.SOURCE_SAFETY: ContentSafetyGuard().get_keyword_matcher(),
+        inf.SOURCE_DOMAIN_DESIGN: DomainClassifier.get_keyword_matcher(DomainClassifier.DESIGN_KEYWORDS),
+        inf.SOURCE_MODE: DesignModeDetector.get_keyword_matcher(),
+        inf.SOURCE_DIMENSION: DimensionSelector().get_keyword_matcher(),
+    }
+    for feature in features:
+        for source, matcher in consumers.items():
+            assert feature.keyword_positions(source, matcher, feature.text_lower) == matcher.first_positions(
+                feature.text_lower
+            ), source
+
+        matcher = ProjectTypeDetector().get_keyword_matcher()
+        positions = feature.keyword_positions(inf.SOURCE_PROJECT_TYPE, matcher, feature.normalized_text)
+        assert positions == matcher.first_positions(feature.normalized_text)
+
+
+def test_round_trip_and_detection_unchanged(features):
+    detector = ProjectTypeDetector()
+    for feature in features:
+        restored = InputFeatures.from_dict(feature.to_dict())
+        assert restored.keyword_hits == feature.keyword_hits
+        assert detector.detect(feature.text, features=restored) == detector.detect(feature.text)
+
+    assert features[0].stats["area_sqm"] == 200.0
+    assert features[0].stats["budget_wan"] == 80.0
+    assert features[1].stats["has_negation"] is True
+
+
+def test_mismatch_falls_back_to_scan(features):
+    feature = features[0]
+    matcher = DesignModeDetector.get_keyword_matcher()
+    assert feature.keyword_positions(inf.SOURCE_MODE, matcher, "另一段输入") is None
+
+    other = KeywordMatcher((kw, None) for kw in ["咖啡馆"])
+    assert feature.keyword_positions(inf.SOURCE_MODE, other, feature.text_lower) is None
+    expected = {"咖啡馆": SAMPLES[0].find("咖啡馆")}
+    assert other.resolve_positions(feature.text_lower, feature, inf.SOURCE_MODE) == expected
+
+    assert InputFeatures.from_dict({**feature.to_dict(), "version": -1}) is None
+
+
+def test_state_features_invalidated_when_input_changes(features):
+    state = {"user_input": SAMPLES[0], "input_features": features[0].to_dict()}
+    assert get_state_input_features(state).text == SAMPLES[0]
+
+    state["user_input"] = "补充：增加一个屋顶花园"
+    assert get_state_input_features(state) is None
+    assert get_state_input_features({"user_input": SAMPLES[0]}) is None
+
+
+def test_consumer_timings(features):
+    reset_consumer_timings()
+    with time_consumer("content_safety", features[0]):
+        pass
+    with time_consumer("content_safety"):
+        pass
+    with time_consumer("content_safety"):
+        pass
+
+    timings = get_consumer_timings()["content_safety"]
+    assert timings["features"]["calls"] == 1
+    assert timings["scan"]["calls"] == 2
+    assert "avg_ms" in timings["scan"]
+    reset_consumer_timings()
+    assert get_consumer_timings() == {}
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+编译型关键词匹配器 (utils/keyword_matcher.py) 单元测试
+
+覆盖：
+- 重叠命中与位置、忽略大小写、空关键词
+- 分组命中与逐个 kw in text 的旧实现一致（项目类型注册表 / 设计模式签名）
+- 项目类型检测的否定语境按首次出现位置判断
+- reload_extensions() / 安全规则重载后匹配器自动重建
+"""
+import pytest
+
+from intelligent_project_analyzer.security.content_safety_guard import ContentSafetyGuard
+from intelligent_project_analyzer.security.domain_classifier import DomainClassifier
+from intelligent_project_analyzer.services import project_type_detector as ptd
+from intelligent_project_analyzer.services.mode_detector import DesignModeDetector
+from intelligent_project_analyzer.utils.keyword_matcher import KeywordHit, KeywordMatcher, get_cached_matcher
+
+SAMPLES = [
+    "我想在杭州做一个200平米的精品咖啡馆，兼顾书店与展览功能",
+    "乡村振兴背景下的民宿改造，保留老宅的夯土墙",
+    "不要做KTV，想要做亲子餐厅和儿童游乐区",
+    "为三代同堂的家庭设计一套疗愈型住宅，老人需要无障碍设施",
+]
+
+
+def test_overlapping_hits_with_positions():
+    matcher = KeywordMatcher((kw, None) for kw in ["he", "she", "his", "hers"])
+    assert matcher.find_all("ushers") == [
+        KeywordHit(1, 4, "she"),
+        KeywordHit(2, 4, "he"),
+        KeywordHit(2, 6, "hers"),
+    ]
+    assert matcher.first_positions("ahishers") == {"his": 1, "she": 3, "he": 4, "hers": 4}
+
+
+def test_ignore_case_and_empty_keywords():
+    matcher = KeywordMatcher.from_groups({"tech": ["BIM", "", "Python"]}, ignore_case=True)
+    assert len(matcher) == 2
+    assert matcher.match_groups("用 bim 和 PYTHON 建模") == {"tech": [0, 2]}
+    assert KeywordMatcher.from_groups({"tech": ["BIM"]}).match_groups("bim") == {}
+
+
+def test_registry_groups_match_legacy_loop():
+    registry = ptd.ProjectTypeDetector._get_registry()
+    matcher = ptd._build_registry_matcher(registry)
+    for text in SAMPLES:
+        text = text.lower()
+        hits = matcher.match_groups(text)
+        for type_id, cfg in registry.items():
+            if not cfg.get("keywords"):
+                continue
+            for field in ("keywords", "secondary_keywords"):
+                legacy = [i for i, kw in enumerate(cfg.get(field, [])) if kw in text]
+                assert hits.get((type_id, field), []) == legacy
+
+
+def test_mode_detection_matches_legacy_loop():
+    text = SAMPLES[3]
+    results = {mode_id: matched for mode_id, _, matched in DesignModeDetector.detect(text)}
+    for mode_id, matched in results.items():
+        signature = DesignModeDetector.MODE_SIGNATURES[mode_id]
+        legacy = [kw for kw in signature["keywords"] if kw.lower() in text.lower()]
+        legacy += [f"场景:{s}" for s in signature["scenarios"] if s.lower() in text.lower()]
+        assert matched == legacy
+
+
+def test_negated_keyword_not_counted():
+    detector = ptd.ProjectTypeDetector()
+    assert detector.detect("做一个KTV")[0] == "leisure_entertainment"
+    type_id, _, reason = detector.detect("不要做KTV，我们计划在海边建一座精品民宿酒店")
+    assert type_id == "commercial_hospitality"
+    assert "ktv" not in reason
+
+
+def test_reload_extensions_rebuilds_matcher(monkeypatch):
+    monkeypatch.setattr(ptd.ProjectTypeDetector, "_merged_registry", None)
+    monkeypatch.setattr(ptd, "_load_extension_registry", lambda: {})
+    detector = ptd.ProjectTypeDetector()
+    assert detector.detect("设计一个星际穹顶观测站")[0] is None
+
+    extension = {
+        "stellar_dome": {
+            "name": "星际穹顶",
+            "name_en": "stellar dome",
+            "keywords": ["星际穹顶"],
+            "priority": 15,
+        }
+    }
+    monkeypatch.setattr(ptd, "_load_extension_registry", lambda: extension)
+    ptd.ProjectTypeDetector.reload_extensions()
+
+    assert ptd.ProjectTypeDetector().detect("设计一个星际穹顶观测站")[0] == "stellar_dome"
+
+
+def test_safety_rule_generation_invalidates_matcher():
+    class Loader:
+        generation = 1
+        keywords = {"违法犯罪": {"words": ["走私"], "severity": "high"}}
+
+        def get_keywords(self):
+            return self.keywords
+
+    guard = ContentSafetyGuard(use_dynamic_rules=True)
+    loader = Loader()
+    guard._rule_loader = loader
+    assert guard._check_keywords("走私货物")[0]["matched_keywords"] == ["走私"]
+
+    # 原地修改规则并递增版本号
+    loader.keywords["违法犯罪"]["words"].append("偷渡")
+    loader.generation += 1
+    assert guard._check_keywords("偷渡")[0]["matched_keywords"] == ["偷渡"]
+
+
+def test_cached_matcher_reuses_compiled_automaton():
+    source = {"a": ["x"]}
+    first = get_cached_matcher(source, KeywordMatcher.from_groups)
+    assert get_cached_matcher(source, KeywordMatcher.from_groups) is first
+    assert get_cached_matcher(source, KeywordMatcher.from_groups, token=2) is not first
+    assert get_cached_matcher(dict(source), KeywordMatcher.from_groups) is not first
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_domain_classifier_stats_unchanged(text):
+    classifier = DomainClassifier()
+    stats = classifier._analyze_keywords(text.lower(), classifier.DESIGN_KEYWORDS)
+    legacy_hits = sum(1 for kws in classifier.DESIGN_KEYWORDS.values() for kw in kws if kw.lower() in text.lower())
+    assert stats["hits"] == legacy_hits
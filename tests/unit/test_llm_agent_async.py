@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+LLMAgent 异步调用路径 (agents/base.py ainvoke_llm) 与事件循环延迟监控单元测试
+
+覆盖：
+- ainvoke_llm 使用 ainvoke，LLM 等待期间事件循环可继续调度其他任务
+- 重试退避使用 asyncio.sleep
+- 全局 LLM 并发 Semaphore 限制同时调用数
+- 熔断器打开时快速失败（不发起请求、不重试）
+- 事件循环线程中的同步 invoke_llm 被记录为阻塞调用，线程池中的调用不计入
+"""
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from intelligent_project_analyzer.agents.base import LLMAgent
+from intelligent_project_analyzer.core.state import AgentType
+from intelligent_project_analyzer.services import llm_concurrency
+from intelligent_project_analyzer.services.circuit_breaker import CircuitBreakerOpenError, get_breaker, reset_registry
+from intelligent_project_analyzer.services.loop_lag_monitor import (
+    LoopLagMonitor,
+    get_loop_lag_stats,
+    reset_loop_lag_stats,
+    track_blocking_call,
+)
+
+MESSAGES = [HumanMessage(content="你好")]
+
+
+class FakeLLM:
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return AIMessage(content="sync")
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.calls <= self.failures:
+                raise ConnectionError("upstream 502")
+            return AIMessage(content="async")
+        finally:
+            self.active -= 1
+
+
+class DemoAgent(LLMAgent):
+    def __init__(self, llm_model):
+        super().__init__(
+            agent_type=AgentType.REQUIREMENTS_ANALYST,
+            name="DemoAgent",
+            description="测试",
+            llm_model=llm_model,
+            config={"llm": {"provider": "test-provider"}},
+        )
+
+    def execute(self, state, config, store=None):
+        return None
+
+    def validate_input(self, state):
+        return True
+
+    def get_system_prompt(self):
+        return ""
+
+    def get_task_description(self, state):
+        return ""
+
+
+@pytest.fixture(autouse=True)
+def clean_globals(monkeypatch):
+    monkeypatch.setenv("LLM_GLOBAL_CONCURRENCY", "1")
+    llm_concurrency.reset_semaphore()
+    reset_registry()
+    reset_loop_lag_stats()
+    yield
+    llm_concurrency.reset_semaphore()
+    reset_registry()
+    reset_loop_lag_stats()
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_llm_does_not_block_loop():
+    agent = DemoAgent(FakeLLM(delay=0.05))
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(1)
+            await asyncio.sleep(0.005)
+
+    response, _ = await asyncio.gather(agent.ainvoke_llm(MESSAGES), ticker())
+
+    assert response.content == "async"
+    assert len(ticks) == 5
+    assert get_loop_lag_stats()["blocking_llm_calls"] == {}
+
+
+@pytest.mark.asyncio
+async def test_retry_backoff_is_async(monkeypatch):
+    waits = []
+
+    async def fake_sleep(seconds):
+        if seconds:  # FakeLLM 自身的 sleep(0) 不计入
+            waits.append(seconds)
+
+    llm = FakeLLM(failures=2)
+    agent = DemoAgent(llm)
+    monkeypatch.setattr("intelligent_project_analyzer.agents.base.asyncio.sleep", fake_sleep)
+
+    response = await agent.ainvoke_llm(MESSAGES)
+
+    assert response.content == "async"
+    assert llm.calls == 3
+    assert waits == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_global_semaphore_limits_concurrency():
+    llm = FakeLLM(delay=0.01)
+    agent = DemoAgent(llm)
+
+    await asyncio.gather(*(agent.ainvoke_llm(MESSAGES) for _ in range(3)))
+
+    assert llm.calls == 3
+    assert llm.max_active == 1
+    assert llm_concurrency.get_llm_stats()["llm_active_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    breaker = get_breaker("test-provider", failure_threshold=1)
+    breaker.record_failure()
+    llm = FakeLLM()
+    agent = DemoAgent(llm)
+
+    with pytest.raises(CircuitBreakerOpenError):
+        await agent.ainvoke_llm(MESSAGES)
+    assert llm.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_invoke_inside_loop_is_reported():
+    agent = DemoAgent(FakeLLM())
+
+    agent.invoke_llm(MESSAGES)
+    await asyncio.to_thread(agent.invoke_llm, MESSAGES)
+
+    blocking = get_loop_lag_stats()["blocking_llm_calls"]
+    assert list(blocking) == ["DemoAgent.invoke_llm"]
+    assert blocking["DemoAgent.invoke_llm"]["calls"] == 1
+
+
+def test_sync_invoke_outside_loop_not_reported():
+    DemoAgent(FakeLLM()).invoke_llm(MESSAGES)
+    assert get_loop_lag_stats()["blocking_llm_calls"] == {}
+
+
+@pytest.mark.asyncio
+async def test_monitor_attributes_stall_to_blocking_call():
+    monitor = LoopLagMonitor(interval=0.01, threshold_ms=5)
+    window_start = time.perf_counter()
+    with track_blocking_call("SlowAgent.invoke_llm"):
+        pass
+
+    monitor.record(lag_ms=50, window_start=window_start)
+    monitor.record(lag_ms=1, window_start=window_start)
+
+    stats = monitor.stats()
+    assert stats["samples"] == 2
+    assert stats["stalls"] == 1
+    assert stats["max_lag_ms"] == 50
+
+    monitor.start()
+    await asyncio.sleep(0.03)
+    assert monitor.running and monitor.samples > 2
+    await monitor.stop()
+    assert not monitor.running
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+流式 Markdown 板块追踪器 (utils/stream_sections.py) 单元测试
+
+覆盖：
+- 按标题层级增量关闭板块，内层先于外层返回
+- 外层板块正文包含子标题，分隔线关闭全部板块
+- 列表项提取（- / * / 1. / **加粗**）与占位括号清理
+"""
+from intelligent_project_analyzer.utils.stream_sections import StreamSectionTracker, extract_list_items
+
+TEXT = """**【我们如何理解您的需求】**
+
+### 问题解构
+
+**用户画像**：30岁设计师
+
+### 我们的分析维度
+
+- 在地材料研究：对应主导动机
+- [海景采光分析]
+
+### 我们的设计重点
+
+- 优先考虑：安静
+---
+**【您将获得什么】**
+
+**1️⃣ 案例参考**（约5页）
+"""
+
+
+def _chunks(text, size=6):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_section_closes_when_next_heading_arrives():
+    tracker = StreamSectionTracker()
+    received = ""
+    for chunk in _chunks(TEXT):
+        received += chunk
+        sections = dict(tracker.feed(chunk))
+        if "我们的分析维度" in sections:
+            break
+
+    assert sections["我们的分析维度"] == "- 在地材料研究：对应主导动机\n- [海景采光分析]"
+    # 下一个同级标题一到即关闭，此时后续板块尚未生成
+    assert received.endswith("### 我们的设计重点\n") or "### 我们的设计重点\n" in received
+    assert "---" not in received
+
+
+def test_tracker_closes_sections_by_level():
+    tracker = StreamSectionTracker()
+    closed = []
+    for chunk in _chunks(TEXT):
+        closed.extend(heading for heading, _ in tracker.feed(chunk))
+
+    assert closed.index("我们的分析维度") < closed.index("我们的设计重点")
+    # 外层板块在分隔线处关闭，正文包含子标题
+    assert "我们如何理解您的需求" in closed
+    body = dict(tracker.completed)["我们如何理解您的需求"]
+    assert "### 我们的分析维度" in body and "30岁设计师" in body
+    assert [h for h, _ in tracker.finish()] == ["1️⃣ 案例参考", "您将获得什么"]
+
+
+def test_extract_list_items():
+    body = "- 在地材料研究：说明\n* [海景采光]\n1. 第三项\n**维度4：灯光**\n正文"
+    assert extract_list_items(body) == ["在地材料研究：说明", "海景采光", "第三项", "维度4：灯光"]
+    assert extract_list_items(body, limit=2) == ["在地材料研究：说明", "海景采光"]
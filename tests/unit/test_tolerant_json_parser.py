@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+单遍容错 JSON 解析器 (utils/tolerant_json_parser.py) 单元测试
+
+覆盖：
+- Markdown 围栏 / 说明文字 / 正文中的括号定位
+- 尾逗号、缺失逗号、注释、全角引号、Python 字面量、裸换行修复
+- 截断补全（字符串、容器、悬空键、数字、\\u 转义）与截断标记
+- 单引号（Python dict 风格）字符串
+- json_parser.parse_json_safe / extract_json_from_markdown 共享同一解析器，且不接受截断输出
+"""
+import json
+
+import pytest
+
+from intelligent_project_analyzer.utils.json_parser import extract_json_from_markdown, parse_json_safe
+from intelligent_project_analyzer.utils.tolerant_json_parser import (
+    parse_json_tolerant,
+    parse_partial_json,
+    repair_json,
+)
+
+MISSIONS = (
+    '```json\n{"creation_command": "设计民宿", '
+    '"mission_1_user_problem_analysis": {"title": "用户问题分析", "content": {"tags": ["自然", "安静"]}}, '
+    '"mission_2_clear_objectives": {"title": "明确目标", "content": {"n": 2}}}\n```'
+)
+
+
+def test_fenced_object_and_root_array():
+    assert parse_partial_json(MISSIONS) == json.loads(MISSIONS[len("```json\n") : -len("\n```")])
+    assert parse_partial_json('结果如下：[{"index": 0}, {"index": 1}] 以上') == [{"index": 0}, {"index": 1}]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+        ('{"a": "x"\n"b": {"c": 1}\n"d": 2}', {"a": "x", "b": {"c": 1}, "d": 2}),
+        ('{"a": 1, // 说明\n "b": /* 注释 */ 2}', {"a": 1, "b": 2}),
+        ("{“a”: “值”, \"b\": \"他说“你好”\"}", {"a": "值", "b": "他说“你好”"}),
+        ('{"a": True, "b": None, "c": false}', {"a": True, "b": None, "c": False}),
+        ('{"a": "第一行\n第二行", "p": "C:\\d"}', {"a": "第一行\n第二行", "p": "C:\\d"}),
+        ('{"a": 1, b: "x"}', {"a": 1, "b": "x"}),
+        ('模板变量 {user_input} 之后才是 JSON：{"k": [1]}', {"k": [1]}),
+        ("[见附录] 输出：[1, 2]", [1, 2]),
+    ],
+)
+def test_single_pass_repairs(text, expected):
+    assert parse_partial_json(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": "被截', {"a": "被截"}),
+        ('{"a": 1, "b"', {"a": 1, "b": None}),
+        ('{"a": 1, "b": ', {"a": 1, "b": None}),
+        ('{"a": [1, {"b": 2', {"a": [1, {"b": 2}]}),
+        ('{"a": 1.', {"a": 1}),
+        ('{"a": "x\\u4e', {"a": "x"}),
+        ('{"a": 1, "b": [', {"a": 1, "b": []}),
+    ],
+)
+def test_truncation_repair(text, expected):
+    assert parse_partial_json(text) == expected
+
+
+def test_no_json():
+    assert parse_partial_json("没有 JSON") is None
+    assert repair_json("") is None
+    assert parse_json_tolerant("") == (None, False)
+
+
+def test_json_parser_rejects_truncated_output():
+    assert parse_json_safe('```json\n{"dimensions": [{"id": "d1"}, {"id": "d2"}]}\n```') == {
+        "dimensions": [{"id": "d1"}, {"id": "d2"}]
+    }
+    truncated = '{"questions": [{"id": 1, "text": "abc'
+    assert parse_json_safe(truncated, default={}) == {}
+    assert extract_json_from_markdown(truncated) == truncated
+
+    assert json.loads(extract_json_from_markdown('前言 ```json\n{"a": [1,],}\n``` 后记')) == {"a": [1]}
+    assert extract_json_from_markdown("纯文本") == "纯文本"
+
+
+def test_single_quoted_python_dict():
+    text = "{'a': 'it\\'s', 'b': [1, 'x\"y'], 'c': None}"
+    assert parse_partial_json(text) == {"a": "it's", "b": [1, 'x"y'], "c": None}
+    assert parse_partial_json('{"a": "it\'s"}') == {"a": "it's"}
+
+
+def test_truncation_is_visible():
+    assert parse_json_tolerant('{"a": [1]}') == ({"a": [1]}, False)
+    assert parse_json_tolerant('{"a": [1') == ({"a": [1]}, True)
+
+    assert parse_partial_json('{"a": [1', allow_truncated=False) is None
+    assert repair_json('{"a": [1', allow_truncated=False) is None
+    assert parse_partial_json('说明 ```json\n{"a": 1,}\n```', allow_truncated=False) == {"a": 1}